@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+"""
+Benchmark analytics event persistence against a local SQLite database.
+
+Compares the previous one-transaction-per-event path with the batching
+worker (bulk INSERT per batch), end to end through the event handlers.
+
+Usage:
+    python scripts/bench_analytics_events.py
+    python scripts/bench_analytics_events.py --events 20000 --batch-size 500
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+# Add repo root and src to path (the service imports via the src package)
+sys.path.insert(0, ".")
+sys.path.insert(0, "src")
+
+from sqlalchemy import Column, Table
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from src.database.models import AnalyticsEventRecord
+from src.events.journey_events import AdvisorMessageSent
+from src.services.analytics_event_service import AnalyticsEventService
+
+
+def _create_schema(sync_conn):
+    metadata = AnalyticsEventRecord.metadata
+    firms = metadata.tables.get("firms")
+    if firms is None:
+        firms = Table("firms", metadata, Column("firm_id", UUID(as_uuid=True), primary_key=True))
+    metadata.create_all(sync_conn, tables=[firms, AnalyticsEventRecord.__table__])
+
+
+async def _session_factory(path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(_create_schema)
+    return engine, async_sessionmaker(engine, expire_on_commit=False)
+
+
+def _emit(service, n):
+    for i in range(n):
+        service._handle_advisor_message_sent(AdvisorMessageSent(
+            session_id=f"s{i % 100}", tenant_id="bench", user_id=f"u{i % 50}",
+            message_text="How much can I deduct for my home office?",
+        ))
+
+
+async def bench_per_event(path, n):
+    engine, factory = await _session_factory(path)
+    service = AnalyticsEventService(factory, queue_maxsize=n)
+    _emit(service, n)
+
+    start = time.perf_counter()
+    while not service._event_queue.empty():
+        await service._persist_event(**service._event_queue.get_nowait())
+    elapsed = time.perf_counter() - start
+    await engine.dispose()
+    return elapsed
+
+
+async def bench_batched(path, n, batch_size, flush_ms):
+    engine, factory = await _session_factory(path)
+    service = AnalyticsEventService(
+        factory, batch_size=batch_size, flush_interval_ms=flush_ms, queue_maxsize=n,
+    )
+    service._start_worker()
+
+    start = time.perf_counter()
+    _emit(service, n)
+    await asyncio.to_thread(service.shutdown, 120.0)
+    elapsed = time.perf_counter() - start
+    metrics = service.get_metrics()
+    await engine.dispose()
+    return elapsed, metrics
+
+
+async def run(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        per_event_n = min(args.events, args.per_event_events)
+        per_event = await bench_per_event(os.path.join(tmp, "per_event.db"), per_event_n)
+        batched, metrics = await bench_batched(
+            os.path.join(tmp, "batched.db"), args.events, args.batch_size, args.flush_ms,
+        )
+
+    before = per_event_n / per_event
+    after = args.events / batched
+    print(f"per-event commits: {per_event_n} events in {per_event:.2f}s ({before:,.0f} events/s)")
+    print(f"batched worker:    {args.events} events in {batched:.2f}s ({after:,.0f} events/s)")
+    print(f"speedup:           {after / before:.1f}x")
+    print(f"batches:           {metrics['batches']} (avg flush {metrics['avg_flush_ms']:.1f} ms, "
+          f"max {metrics['max_flush_ms']:.1f} ms)")
+    print(f"dropped/failed:    {metrics['dropped']}/{metrics['failed']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analytics event persistence benchmark")
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--per-event-events", type=int, default=2000,
+                        help="Events for the slow per-event baseline")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--flush-ms", type=int, default=250)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
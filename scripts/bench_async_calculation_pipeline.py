@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+"""
+Benchmark AsyncCalculationPipeline: event-loop responsiveness and batch throughput.
+
+Compares the previous pipeline (federal engine called inline on the event
+loop, one return after another) with the executor-backed pipeline. A
+heartbeat coroutine measures how long the loop is blocked while the
+returns are calculated; throughput is returns per second for the batch.
+
+With the thread executor the GIL still serialises engine work, so the
+main gain is loop responsiveness; --executor process adds CPU parallelism.
+
+Usage:
+    python scripts/bench_async_calculation_pipeline.py
+    python scripts/bench_async_calculation_pipeline.py --returns 5000 --workers 4 --executor process
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+import time
+
+# Add src to path
+sys.path.insert(0, "src")
+
+from calculator.engine import FederalTaxEngine
+from models.credits import TaxCredits
+from models.deductions import Deductions
+from models.income import Income, W2Info
+from models.tax_return import TaxReturn
+from models.taxpayer import FilingStatus, TaxpayerInfo
+from services.async_calculation_pipeline import (
+    AsyncCalculationPipeline,
+    AsyncFederalCalculationStep,
+    AsyncOutputValidationStep,
+    AsyncPrepareStep,
+    AsyncValidationStep,
+    CalculationExecutor,
+    PipelineRequest,
+)
+
+STATUSES = [FilingStatus.SINGLE, FilingStatus.MARRIED_JOINT, FilingStatus.HEAD_OF_HOUSEHOLD]
+
+
+class InlineFederalStep(AsyncFederalCalculationStep):
+    """The previous federal step: engine.calculate() directly on the loop."""
+
+    async def execute(self, context):
+        start = time.time()
+        context.breakdown = self._engine.calculate(context.tax_return)
+        context.record_step_timing(self.name, int((time.time() - start) * 1000))
+        return context
+
+
+def _requests(n):
+    requests = []
+    for i in range(n):
+        tax_return = TaxReturn(
+            tax_year=2025,
+            taxpayer=TaxpayerInfo(first_name="A", last_name="Doe", filing_status=STATUSES[i % 3]),
+            income=Income(
+                w2_forms=[W2Info(employer_name="Acme", wages=40_000 + 97 * i, federal_tax_withheld=4_000)],
+                self_employment_income=float(i % 5) * 8_000,
+                interest_income=250.0,
+            ),
+            deductions=Deductions(use_standard_deduction=True),
+            credits=TaxCredits(),
+        )
+        requests.append(PipelineRequest(tax_return=tax_return, tax_return_data={"tax_year": 2025},
+                                        return_id=f"r{i}"))
+    return requests
+
+
+def _pipeline(federal_step):
+    return AsyncCalculationPipeline(steps=[
+        AsyncValidationStep(), AsyncPrepareStep(), federal_step, AsyncOutputValidationStep(),
+    ])
+
+
+async def _heartbeat(stop, lags, interval=0.001):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+
+
+async def _measure(run):
+    stop, lags = asyncio.Event(), []
+    beat = asyncio.ensure_future(_heartbeat(stop, lags))
+    await asyncio.sleep(0.01)
+    start = time.perf_counter()
+    contexts = await run()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await beat
+    assert all(c.breakdown is not None for c in contexts), "calculation failures during benchmark"
+    return elapsed, max(lags) * 1000 if lags else 0.0
+
+
+async def bench(n, workers, kind, concurrency):
+    engine = FederalTaxEngine()
+
+    legacy = _pipeline(InlineFederalStep(engine=engine))
+    requests = _requests(n)
+
+    async def run_legacy():
+        return [await legacy.execute(r.tax_return, r.tax_return_data, r.return_id) for r in requests]
+
+    legacy_s, legacy_lag = await _measure(run_legacy)
+
+    executor = CalculationExecutor(workers=workers, max_pending=max(64, concurrency), kind=kind)
+    pipeline = _pipeline(AsyncFederalCalculationStep(engine=engine, executor=executor))
+    requests = _requests(n)
+    await executor.run(int)  # start the pool outside the measurement
+    batch_s, batch_lag = await _measure(lambda: pipeline.execute_batch(requests, concurrency=concurrency))
+    stats = executor.get_stats()
+    executor.shutdown()
+
+    print(f"{n} returns, {kind} executor with {workers} workers, batch concurrency {concurrency}")
+    print(f"  inline, sequential:   {n / legacy_s:>8,.0f} returns/s | max loop stall {legacy_lag:8.2f} ms")
+    print(f"  executor, batch:      {n / batch_s:>8,.0f} returns/s | max loop stall {batch_lag:8.2f} ms")
+    print(f"  executor queue:       max depth {stats['max_queue_depth']}, "
+          f"avg wait {stats['avg_wait_ms']:.2f} ms, avg run {stats['avg_run_ms']:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Async calculation pipeline benchmark")
+    parser.add_argument("--returns", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--executor", choices=["thread", "process"], default="thread")
+    parser.add_argument("--concurrency", type=int, default=0, help="Batch concurrency (default 2 x workers)")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)  # per-return validation warnings
+
+    asyncio.run(bench(args.returns, args.workers, args.executor, args.concurrency or 2 * args.workers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+"""
+Benchmark AuditLogger paging, counting and export over a large audit log.
+
+Seeds a year of synthetic audit events, times the previous access paths
+(LIMIT/OFFSET pages and exact COUNT(*) on the old single-column indexes),
+then swaps in the composite (filter, timestamp, event_id) indexes and
+times keyset pages, estimate_count() and export() on the same rows.
+
+Usage:
+    python scripts/bench_audit_query.py
+    python scripts/bench_audit_query.py --rows 1000000
+"""
+
+import argparse
+import logging
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Add src to path
+sys.path.insert(0, "src")
+
+from audit.audit_logger import (
+    AUDIT_LOG_INDEXES,
+    AuditEventType,
+    AuditLogger,
+    _encode_cursor,
+)
+
+LEGACY_INDEXES = {
+    "idx_audit_timestamp": "timestamp",
+    "idx_audit_user": "user_id",
+    "idx_audit_tenant": "tenant_id",
+    "idx_audit_event_type": "event_type",
+    "idx_audit_resource": "resource_type, resource_id",
+}
+EVENT_TYPES = [t.value for t in AuditEventType][:20]
+START = datetime(2025, 1, 1)
+
+
+def _seed(db_path, rows, users, seed=1):
+    rng = random.Random(seed)
+    step = timedelta(days=365) / rows
+
+    def events():
+        for i in range(rows):
+            user = rng.randrange(users)
+            yield (
+                f"{i:010d}", rng.choice(EVENT_TYPES), (START + step * i).isoformat(),
+                f"user-{user}", f"tenant-{user % 50}", f"res-{rng.randrange(rows // 20)}",
+            )
+
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany(
+            "INSERT INTO audit_log (event_id, event_type, severity, timestamp, user_id, tenant_id, action, "
+            "resource_type, resource_id, success) VALUES (?, ?, 'info', ?, ?, ?, 'update', 'tax_return', ?, 1)",
+            events(),
+        )
+
+
+def _set_indexes(db_path, create, drop):
+    start = time.perf_counter()
+    with sqlite3.connect(db_path) as conn:
+        for name in drop:
+            conn.execute(f"DROP INDEX IF EXISTS {name}")
+        for name, columns in create.items():
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON audit_log({columns})")
+        conn.execute("ANALYZE")
+    return time.perf_counter() - start
+
+
+def _time(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000000)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--export-rows", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "audit.db")
+        audit = AuditLogger(db_path)
+        _set_indexes(db_path, LEGACY_INDEXES, AUDIT_LOG_INDEXES)
+        start = time.perf_counter()
+        _seed(db_path, args.rows, args.users)
+        print(f"audit events: {args.rows:,} over one year, {args.users:,} users "
+              f"(seeded in {time.perf_counter() - start:.0f} s)")
+
+        year = {"start_date": START}
+        user = {"user_id": "user-7", "start_date": START}
+        event_type = {"event_type": AuditEventType(EVENT_TYPES[3]), "start_date": START}
+        per_user = args.rows // args.users
+        per_type = args.rows // len(EVENT_TYPES)
+        # (label, filters, page depth)
+        cases = [
+            ("all events, deep page", year, args.rows // 2),
+            ("one user, deep page", user, per_user // 2),
+            ("one event type, deep page", event_type, per_type // 2),
+        ]
+
+        legacy, cursors = {}, {}
+        for label, filters, depth in cases:
+            legacy[label] = _time(lambda: audit.query(limit=100, offset=depth, **filters), args.repeat)
+            last = audit.query(limit=1, offset=depth - 1, **filters)[0]
+            cursors[label] = _encode_cursor(last["timestamp"], last["event_id"])
+        legacy_count = {}
+        for label, filters in (("count, whole year", year), ("count, one user", user)):
+            with sqlite3.connect(db_path) as conn:
+                start = time.perf_counter()
+                exact = conn.execute(
+                    "SELECT COUNT(*) FROM audit_log WHERE timestamp >= ?" + (" AND user_id = ?" if "user_id" in filters else ""),
+                    [START.isoformat()] + ([filters["user_id"]] if "user_id" in filters else []),
+                ).fetchone()[0]
+                legacy_count[label] = (time.perf_counter() - start, exact, filters)
+        start = time.perf_counter()
+        offset = 0
+        while offset < args.export_rows:
+            audit.query(limit=1000, offset=offset, **year)
+            offset += 1000
+        legacy_export = time.perf_counter() - start
+
+        index_time = _set_indexes(db_path, AUDIT_LOG_INDEXES, LEGACY_INDEXES)
+        print(f"composite indexes built in {index_time:.1f} s\n")
+        print(f"{'':44} {'previous':>12} {'keyset':>12}")
+        for label, filters, depth in cases:
+            keyset = _time(lambda: audit.query_page(limit=100, cursor=cursors[label], **filters), args.repeat)
+            page = audit.query_page(limit=100, cursor=cursors[label], **filters)["events"]
+            assert [e["event_id"] for e in page] == [
+                e["event_id"] for e in audit.query(limit=100, offset=depth, **filters)
+            ]
+            print(f"{label + f' (offset {depth:,})':44} {legacy[label] * 1000:9.1f} ms {keyset * 1000:9.2f} ms  "
+                  f"({legacy[label] / keyset:,.0f}x)")
+        for label, (elapsed, exact, filters) in legacy_count.items():
+            estimate = {}
+
+            def _estimate():
+                estimate.update(audit.estimate_count(**filters))
+
+            estimated = _time(_estimate, args.repeat)
+            error = abs(estimate["count"] - exact) / exact * 100
+            print(f"{label:44} {elapsed * 1000:9.1f} ms {estimated * 1000:9.2f} ms  "
+                  f"(exact {exact:,}, estimate {estimate['count']:,}, {error:.1f}% off)")
+
+        start = time.perf_counter()
+        exported = 0
+        for _ in audit.export(**year):
+            exported += 1
+            if exported >= args.export_rows:
+                break
+        keyset_export = time.perf_counter() - start
+        print(f"{f'export first {args.export_rows:,} rows':44} {legacy_export * 1000:9.1f} ms "
+              f"{keyset_export * 1000:9.1f} ms  ({args.export_rows / keyset_export:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+"""
+Benchmark batch export of many returns to practice software formats.
+
+Compares the previous flow (load every return, ProfessionalExporter
+.export_batch into a list of in-memory results, then zip them) with
+run_batch_export on a thread pool and on a process pool. Returns are
+stored as JSON in SQLite and re-validated into TaxReturn on load, with an
+optional per-load latency to model a networked database round trip.
+Reports returns/s and peak Python memory (tracemalloc; for the process
+pool this covers the parent only).
+
+Usage:
+    python scripts/bench_batch_export.py
+    python scripts/bench_batch_export.py --returns 2000 --io-latency-ms 0 --workers 8
+"""
+
+import argparse
+import logging
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import zipfile
+
+# Add src to path
+sys.path.insert(0, "src")
+
+from export.batch_export import run_batch_export
+from export.professional_formats import ExportFormat, ProfessionalExporter
+from models.credits import TaxCredits
+from models.deductions import Deductions
+from models.income import Income
+from models.tax_return import TaxReturn
+from models.taxpayer import FilingStatus, TaxpayerInfo
+
+_local = threading.local()
+DB_PATH = ""
+IO_LATENCY = 0.0
+
+
+def load_return(return_id):
+    """Load one return the way a persistence layer would (module-level for the process pool)."""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = _local.conn = sqlite3.connect(DB_PATH)
+    if IO_LATENCY:
+        time.sleep(IO_LATENCY)
+    row = conn.execute("SELECT data FROM returns WHERE id = ?", (return_id,)).fetchone()
+    return TaxReturn.model_validate_json(row[0]) if row else None
+
+
+def _populate(path, n):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE returns (id TEXT PRIMARY KEY, data TEXT)")
+    rows = []
+    for i in range(n):
+        tax_return = TaxReturn(
+            tax_year=2025,
+            taxpayer=TaxpayerInfo(first_name="Pat", last_name="Smith", ssn=f"123-45-{i % 10000:04d}",
+                                  filing_status=FilingStatus.SINGLE),
+            income=Income(w2_wages=40000.0 + i, federal_withholding=6000.0),
+            deductions=Deductions(use_standard_deduction=True),
+            credits=TaxCredits(),
+        )
+        tax_return.calculate()
+        rows.append((f"ret-{i:06d}", tax_return.model_dump_json()))
+    conn.executemany("INSERT INTO returns VALUES (?, ?)", rows)
+    conn.commit()
+    conn.close()
+
+
+def legacy(ids, output_dir):
+    returns = [load_return(return_id) for return_id in ids]
+    results = ProfessionalExporter().export_batch(returns, ExportFormat.DRAKE)
+    with zipfile.ZipFile(os.path.join(output_dir, "legacy.zip"), "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for return_id, result in zip(ids, results):
+            archive.writestr(f"{return_id}_{result.filename}", result.content)
+
+
+def _measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 2**20
+
+
+def main():
+    global DB_PATH, IO_LATENCY
+    parser = argparse.ArgumentParser(description="Batch export benchmark")
+    parser.add_argument("--returns", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--io-latency-ms", type=float, default=2.0, help="simulated DB round trip per load")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        DB_PATH = os.path.join(tmp, "returns.db")
+        IO_LATENCY = args.io_latency_ms / 1000
+        _populate(DB_PATH, args.returns)
+        ids = [f"ret-{i:06d}" for i in range(args.returns)]
+        print(f"{args.returns:,} returns to Drake, {args.io_latency_ms} ms simulated load latency, "
+              f"{args.workers} workers")
+
+        runs = {
+            "legacy sequential": lambda: legacy(ids, tmp),
+            "thread pool": lambda: run_batch_export(ids, "drake", tmp, load_return, job_id="bench-thread",
+                                                    workers=args.workers, executor="thread"),
+            "process pool": lambda: run_batch_export(ids, "drake", tmp, load_return, job_id="bench-process",
+                                                     workers=args.workers, executor="process"),
+        }
+        for name, fn in runs.items():
+            elapsed, peak = _measure(fn)
+            print(f"  {name:18s} {elapsed:7.2f} s | {args.returns / elapsed:8,.0f} returns/s | peak mem {peak:7.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
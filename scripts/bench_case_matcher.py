@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+"""
+Benchmark case matching against a large synthetic corpus.
+
+Compares the old per-query loop (embedding lookup + pure-Python cosine per
+case) with the precomputed EmbeddingIndex (one mat-vec + argpartition).
+Embeddings come from a local fake provider so only matching cost is measured.
+
+Usage:
+    python scripts/bench_case_matcher.py
+    python scripts/bench_case_matcher.py --cases 5000 --dim 1536 --queries 50
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, "src")
+
+from services.case_matcher import CaseType, OpenAICaseMatcher, _case_text
+
+
+class LocalEmbeddings:
+    """Random-but-stable embeddings without a network round trip."""
+
+    def __init__(self, dim):
+        self.dim = dim
+        self.calls = 0
+
+    async def get_embedding(self, text, provider=None):
+        self.calls += 1
+        rng = np.random.default_rng(abs(hash(text)) % (2 ** 32))
+        return SimpleNamespace(embedding=rng.normal(size=self.dim).tolist())
+
+
+def _corpus(n):
+    types = [CaseType.TAX_COURT, CaseType.IRS_RULING, CaseType.CIRCUIT_COURT]
+    return [
+        {
+            "id": f"case_{i}",
+            "type": types[i % len(types)].value,
+            "title": f"Ruling {i}",
+            "summary": f"Synthetic ruling {i}",
+            "key_facts": [],
+            "outcome": "unknown",
+            "tags": [f"tag{i % 13}"],
+        }
+        for i in range(n)
+    ]
+
+
+async def legacy_match(matcher, query, top_k):
+    """The pre-index matching loop (embedding cache already warm)."""
+    scored = []
+    for case in matcher.cases:
+        vector = await matcher._get_embedding(_case_text(case))
+        scored.append((matcher._cosine_similarity(query, vector), case["id"]))
+    scored.sort(key=lambda x: x[0], reverse=True)
+    return scored[:top_k]
+
+
+async def run(args):
+    ai = LocalEmbeddings(args.dim)
+    matcher = OpenAICaseMatcher(ai_service=ai, cases=_corpus(args.cases), vectors_path=None)
+
+    start = time.perf_counter()
+    await matcher.warm()
+    print(f"corpus:        {args.cases} cases x {args.dim} dims")
+    print(f"index build:   {time.perf_counter() - start:.2f}s")
+
+    queries = [(await ai.get_embedding(f"query {i}")).embedding for i in range(args.queries)]
+
+    # Warm the legacy path's cache so it is measured at its best
+    import services.case_matcher as module
+    module.QUERY_EMBEDDING_CACHE_SIZE = args.cases + args.queries + 10
+    for case in matcher.cases:
+        await matcher._get_embedding(_case_text(case))
+
+    legacy = []
+    for q in queries[: args.legacy_queries]:
+        t = time.perf_counter()
+        await legacy_match(matcher, q, args.top_k)
+        legacy.append((time.perf_counter() - t) * 1000)
+
+    indexed = []
+    for q in queries:
+        t = time.perf_counter()
+        await matcher._match_cases(q, args.top_k)
+        indexed.append((time.perf_counter() - t) * 1000)
+
+    filtered = []
+    for q in queries:
+        t = time.perf_counter()
+        await matcher._match_cases(q, args.top_k, CaseType.IRS_RULING)
+        filtered.append((time.perf_counter() - t) * 1000)
+
+    print(f"legacy loop:   median {statistics.median(legacy):.2f} ms/query")
+    print(f"index:         median {statistics.median(indexed):.3f} ms/query")
+    print(f"index+filter:  median {statistics.median(filtered):.3f} ms/query")
+    print(f"speedup:       {statistics.median(legacy) / statistics.median(indexed):.0f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Case matcher benchmark")
+    parser.add_argument("--cases", type=int, default=5000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--legacy-queries", type=int, default=5)
+    parser.add_argument("--top-k", type=int, default=5)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
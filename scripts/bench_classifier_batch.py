@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+"""
+Benchmark per-document vs batched document classification.
+
+Builds a synthetic corpus with SyntheticDataGenerator and reports docs/sec for
+each classifier called once per document and through classify_batch(). The
+OpenAI stage is disabled so the numbers reflect local work only.
+
+Usage:
+    python scripts/bench_classifier_batch.py
+    python scripts/bench_classifier_batch.py --samples-per-type 50 --repeat 5
+"""
+
+import argparse
+import sys
+import time
+
+# Add src to path
+sys.path.insert(0, "src")
+
+from ml.classifiers.ensemble_classifier import EnsembleClassifier
+from ml.classifiers.regex_classifier import RegexClassifier
+from ml.classifiers.tfidf_classifier import TFIDFClassifier
+from ml.training.synthetic_data_generator import SyntheticDataGenerator
+
+
+class _NoOpenAI:
+    name = "openai"
+
+    def is_available(self):
+        return False
+
+
+def _best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Classifier batch benchmark")
+    parser.add_argument("--samples-per-type", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    texts, _ = SyntheticDataGenerator(seed=args.seed).generate_dataset(
+        samples_per_type=args.samples_per_type
+    )
+    tfidf = TFIDFClassifier()
+    classifiers = [RegexClassifier()]
+    if tfidf.is_available():
+        classifiers.append(tfidf)
+    classifiers.append(EnsembleClassifier(openai_classifier=_NoOpenAI(), tfidf_classifier=tfidf))
+
+    # Warm up lazy model loading and regex compilation
+    for clf in classifiers:
+        clf.classify_batch(texts[:2])
+
+    print(f"corpus: {len(texts)} documents")
+    print(f"{'classifier':<10} {'per-doc/s':>12} {'batch/s':>12} {'speedup':>8}  match")
+    for clf in classifiers:
+        single = [clf.classify(t) for t in texts]
+        batch = clf.classify_batch(texts)
+        match = all(s.document_type == b.document_type for s, b in zip(single, batch))
+
+        per_doc = _best_of(lambda: [clf.classify(t) for t in texts], args.repeat)
+        batched = _best_of(lambda: clf.classify_batch(texts), args.repeat)
+        print(
+            f"{clf.name:<10} {len(texts) / per_doc:>12,.0f} {len(texts) / batched:>12,.0f} "
+            f"{per_doc / batched:>7.1f}x  {match}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+"""
+Benchmark ContradictionDetector per-answer latency on simulated interviews.
+
+Each interview answers --steps questions one at a time and checks for
+contradictions after every answer. Compares a full check (every rule on
+every answer, the previous behaviour) with incremental session checks,
+both with the answered field passed in and with change detection by
+diffing against the previous answer set. Synthetic rules, each reading
+two fields from a pool, grow the rule set to show how latency scales.
+
+Usage:
+    python scripts/bench_contradiction_detector.py
+    python scripts/bench_contradiction_detector.py --interviews 500 --rules 15,200,2000
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+
+# Add src to path
+sys.path.insert(0, "src")
+
+from onboarding.contradiction_detector import Contradiction, ContradictionDetector, ContradictionSeverity
+
+BASE_ANSWERS = {
+    "filing_status": ["single", "mfj", "mfs", "hoh", "qw"],
+    "spouse_name": [None, "Pat"],
+    "spouse_death_year": [None, 2024],
+    "has_dependent_child": [True, False],
+    "claiming_eitc": [True, False],
+    "claiming_ctc": [True, False],
+    "dependents": [[], [{"name": "Kid", "age": 5, "ssn": "123-45-6789", "relationship": "son"}]],
+    "wages": [50_000, 120_000],
+    "self_employment_income": [0, 20_000],
+    "ordinary_dividends": [100, 1_000],
+    "qualified_dividends": [50, 500],
+    "investment_income": [0, 20_000],
+    "will_itemize": [True, False],
+    "total_itemized_deductions": [5_000, 40_000],
+    "salt_deduction": [5_000, 15_000],
+    "earned_income": [0, 40_000],
+}
+FIELD_POOL = [f"q{i}" for i in range(400)]
+
+
+def _synthetic_rule(a, b, n):
+    def rule(data):
+        if data.get(a) and data.get(b):
+            return Contradiction(id=f"synthetic_{n}", severity=ContradictionSeverity.INFO,
+                                 title="Synthetic", message=f"{a} with {b}", fields_involved=[a, b])
+        return None
+    rule.__name__ = f"synthetic_{n}"
+    return rule
+
+
+def _detector(total_rules, rng):
+    detector = ContradictionDetector()
+    for n in range(max(0, total_rules - len(detector._rules))):
+        a, b = rng.sample(FIELD_POOL, 2)
+        detector.add_rule(_synthetic_rule(a, b, n), inputs=[a, b])
+    return detector
+
+
+def _interview(rng, steps):
+    answers = []
+    for _ in range(steps):
+        if rng.random() < 0.5:
+            name = rng.choice(list(BASE_ANSWERS))
+            answers.append((name, rng.choice(BASE_ANSWERS[name])))
+        else:
+            answers.append((rng.choice(FIELD_POOL), rng.random() < 0.5))
+    return answers
+
+
+def _run(detector, interviews, mode):
+    latencies = []
+    for i, answers in enumerate(interviews):
+        data, session = {}, f"s{i}"
+        for name, value in answers:
+            data[name] = value
+            start = time.perf_counter()
+            if mode == "full":
+                detector.check(data)
+            elif mode == "changed":
+                detector.check(data, session_id=session, changed_fields=[name])
+            else:
+                detector.check(data, session_id=session)
+            latencies.append((time.perf_counter() - start) * 1e6)
+        detector.clear_session(session)
+    latencies.sort()
+    return statistics.mean(latencies), latencies[int(len(latencies) * 0.95)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ContradictionDetector benchmark")
+    parser.add_argument("--interviews", type=int, default=200)
+    parser.add_argument("--steps", type=int, default=50)
+    parser.add_argument("--rules", default="15,100,500,2000", help="Comma-separated rule-set sizes")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    interviews = [_interview(rng, args.steps) for _ in range(args.interviews)]
+    print(f"{args.interviews} interviews x {args.steps} answers, per-answer check latency (mean / p95, us)")
+    print(f"  {'rules':>6} | {'full check':>17} | {'incremental':>17} | {'incremental+diff':>17}")
+    for total in (int(r) for r in args.rules.split(",")):
+        detector = _detector(total, random.Random(total))
+        row = [_run(detector, interviews, mode) for mode in ("full", "changed", "diff")]
+        print(f"  {len(detector._rules):>6} | " + " | ".join(f"{m:7.1f} / {p:7.1f}" for m, p in row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+"""
+Benchmark the CPA CSV exports on a large firm.
+
+Compares the previous shape of the export (fetch every row, build one
+StringIO with csv.DictWriter, send it as a single chunk) with the
+keyset-paginated streaming export. Reports time to first byte, total
+time, rows/s and peak Python memory (tracemalloc) for each, plus the
+gzip ratio of the streamed output.
+
+Usage:
+    python scripts/bench_csv_export.py
+    python scripts/bench_csv_export.py --rows 500000 --batch-size 5000
+"""
+
+import argparse
+import asyncio
+import csv
+import io
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+
+# Add src to path
+sys.path.insert(0, "src")
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from cpa_panel.services.csv_export_service import EXPORTS, stream_export
+
+FIRM = "bench-firm"
+
+
+async def _populate(engine, n):
+    base = datetime(2025, 1, 1)
+    async with engine.begin() as conn:
+        await conn.execute(text(
+            "CREATE TABLE audit_logs (log_id TEXT PRIMARY KEY, firm_id TEXT, timestamp TEXT, event_type TEXT, "
+            "event_category TEXT, severity TEXT, user_id TEXT, user_role TEXT, description TEXT)"
+        ))
+        await conn.execute(text("CREATE INDEX ix_audit_firm_keyset ON audit_logs (firm_id, timestamp, log_id)"))
+        rows = [
+            {"id": f"log-{i:09d}", "firm": FIRM if i % 4 else "other-firm",
+             "ts": (base + timedelta(seconds=i // 2)).isoformat(), "desc": f"Viewed return {i}"}
+            for i in range(n)
+        ]
+        await conn.execute(text(
+            "INSERT INTO audit_logs VALUES (:id, :firm, :ts, 'view_client', 'data_access', 'info', "
+            "'user-1', 'cpa', :desc)"
+        ), rows)
+
+
+async def legacy_export(sessions):
+    """Previous shape: every row in memory, one CSV string, one chunk."""
+    spec = EXPORTS["activity"]
+    async with sessions() as session:
+        result = await session.execute(text(
+            f"SELECT {spec.select} FROM audit_logs WHERE firm_id = :firm_id ORDER BY timestamp, log_id"
+        ), {"firm_id": FIRM})
+        rows = [dict(zip(spec.header, spec.to_row(row))) for row in result.mappings().all()]
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=rows[0].keys())
+    writer.writeheader()
+    writer.writerows(rows)
+    yield output.getvalue().encode("utf-8")
+
+
+async def _measure(stream):
+    tracemalloc.start()
+    start = time.perf_counter()
+    first = None
+    size = 0
+    async for chunk in stream:
+        if first is None:
+            first = time.perf_counter() - start
+        size += len(chunk)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return first * 1000, elapsed, size, peak / 2**20
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="CSV export benchmark")
+    parser.add_argument("--rows", type=int, default=400_000, help="audit rows (3/4 belong to the firm)")
+    parser.add_argument("--batch-size", type=int, default=2000)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}", poolclass=NullPool)
+        await _populate(engine, args.rows)
+        factory = async_sessionmaker(engine, expire_on_commit=False)
+
+        @asynccontextmanager
+        async def sessions():
+            async with factory() as session:
+                yield session
+
+        firm_rows = sum(1 for i in range(args.rows) if i % 4)
+        print(f"{firm_rows:,} activity rows for one firm ({args.rows:,} total), batch size {args.batch_size}")
+
+        results = {
+            "legacy buffered": await _measure(legacy_export(sessions)),
+            "streaming": await _measure(stream_export(
+                "activity", FIRM, batch_size=args.batch_size, session_scope=sessions)),
+            "streaming gzip": await _measure(stream_export(
+                "activity", FIRM, gzip_output=True, batch_size=args.batch_size, session_scope=sessions)),
+        }
+        for name, (ttfb, elapsed, size, peak) in results.items():
+            print(f"  {name:16s} first byte {ttfb:9.2f} ms | total {elapsed:6.2f} s | "
+                  f"{firm_rows / elapsed:9,.0f} rows/s | {size / 2**20:7.1f} MiB out | peak mem {peak:7.1f} MiB")
+        plain, gz = results["streaming"][2], results["streaming gzip"][2]
+        print(f"  gzip ratio {plain / gz:.1f}x")
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+"""
+Benchmark DeadlineService queries and the reminder sweep at 1M deadlines.
+
+Compares the previous implementations (scan every deadline in the
+service for each call) with the indexed ones: per-firm date ranges for
+upcoming/calendar views, the client index, and the per-firm reminder
+heap that the hourly reminder job reads. Also reports the cost the
+indexes add to create_deadline.
+
+Usage:
+    python scripts/bench_deadline_service.py
+    python scripts/bench_deadline_service.py --deadlines 200000 --firms 20
+"""
+
+import argparse
+import logging
+import random
+import sys
+import time
+from datetime import date, timedelta
+from uuid import uuid4
+
+# Add src to path
+sys.path.insert(0, "src")
+
+from cpa_panel.deadlines.deadline_models import DeadlineStatus, DeadlineType, ReminderType
+from cpa_panel.deadlines.deadline_service import DeadlineService
+
+TODAY = date.today()
+
+
+def legacy_firm_scan(service, firm_id, from_date=None, to_date=None, client_id=None, include_completed=False):
+    deadlines = []
+    for deadline in service._deadlines.values():
+        if deadline.firm_id != firm_id:
+            continue
+        deadline.update_status()
+        if client_id and deadline.client_id != client_id:
+            continue
+        if not include_completed and deadline.status == DeadlineStatus.COMPLETED:
+            continue
+        effective_date = deadline.effective_due_date
+        if from_date and effective_date < from_date:
+            continue
+        if to_date and effective_date > to_date:
+            continue
+        deadlines.append(deadline)
+    deadlines.sort(key=lambda d: d.effective_due_date or date.max)
+    return deadlines
+
+
+def legacy_pending_reminders(service, firm_id=None):
+    pending = []
+    for deadline in service._deadlines.values():
+        if firm_id is not None and deadline.firm_id != firm_id:
+            continue
+        if deadline.status in [DeadlineStatus.COMPLETED, DeadlineStatus.WAIVED]:
+            continue
+        for reminder in deadline.reminders:
+            if reminder.is_sent:
+                continue
+            reminder_date = deadline.effective_due_date - timedelta(days=reminder.days_before)
+            if reminder_date <= TODAY:
+                pending.append((deadline, reminder, reminder_date))
+    return pending
+
+
+def _populate(service, n, firms, clients, rng):
+    types = list(DeadlineType)
+    start = time.perf_counter()
+    for _ in range(n):
+        deadline = service.create_deadline(
+            firm_id=rng.choice(firms),
+            deadline_type=rng.choice(types),
+            due_date=TODAY + timedelta(days=rng.randint(-365, 365)),
+            client_id=rng.choice(clients),
+            auto_reminders=False,
+        )
+        reminder = service.add_reminder(deadline.id, rng.choice([1, 3, 7, 14]), ReminderType.EMAIL, "cpa")
+        if deadline.due_date < TODAY:
+            # Past deadlines are mostly done and reminded
+            if rng.random() < 0.95:
+                service.complete_deadline(deadline.id)
+            if rng.random() < 0.99:
+                service.mark_reminder_sent(deadline.id, reminder.id)
+    return time.perf_counter() - start
+
+
+def _time(fn, rounds):
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return sorted(samples)[len(samples) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DeadlineService benchmark")
+    parser.add_argument("--deadlines", type=int, default=1_000_000)
+    parser.add_argument("--firms", type=int, default=100)
+    parser.add_argument("--clients", type=int, default=100_000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)  # per-deadline log lines
+
+    rng = random.Random(17)
+    firms = [uuid4() for _ in range(args.firms)]
+    clients = [uuid4() for _ in range(args.clients)]
+    service = DeadlineService()
+    elapsed = _populate(service, args.deadlines, firms, clients, rng)
+    print(f"{args.deadlines:,} deadlines, {args.firms} firms, {args.clients:,} clients "
+          f"({elapsed / args.deadlines * 1e6:.1f} us per create_deadline incl. index upkeep)")
+
+    firm = firms[0]
+    client = next(d.client_id for d in service._deadlines.values() if d.firm_id == firm)
+    assert len(service.get_pending_reminders(firm)) == len(legacy_pending_reminders(service, firm))
+    assert len(service.get_due_reminders()) == len(legacy_pending_reminders(service))
+    assert [d.id for d in service.get_upcoming_deadlines(firm)] == \
+        [d.id for d in sorted(legacy_firm_scan(service, firm, TODAY, TODAY + timedelta(days=30)),
+                              key=lambda d: (d.effective_due_date, d.id))]
+
+    month_start = TODAY.replace(day=1)
+    month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    cases = [
+        ("upcoming 30 days (one firm)",
+         lambda: legacy_firm_scan(service, firm, TODAY, TODAY + timedelta(days=30)),
+         lambda: service.get_upcoming_deadlines(firm)),
+        ("calendar month (one firm)",
+         lambda: legacy_firm_scan(service, firm, month_start, month_end, include_completed=True),
+         lambda: service.get_calendar_view(firm, TODAY.year, TODAY.month)),
+        ("client deadlines",
+         lambda: legacy_firm_scan(service, firm, client_id=client),
+         lambda: service.get_deadlines_for_client(firm, client)),
+        ("pending reminders (one firm)",
+         lambda: legacy_pending_reminders(service, firm),
+         lambda: service.get_pending_reminders(firm)),
+        ("reminder sweep (all firms)",
+         lambda: legacy_pending_reminders(service),
+         lambda: service.get_due_reminders()),
+    ]
+
+    print(f"median of {args.rounds} rounds:")
+    for name, legacy, indexed in cases:
+        legacy_ms = _time(legacy, args.rounds)
+        indexed_ms = _time(indexed, args.rounds)
+        print(f"  {name:<29} legacy {legacy_ms:9.2f} ms | indexed {indexed_ms:8.3f} ms | "
+              f"{legacy_ms / indexed_ms:,.0f}x")
+
+
+if __name__ == "__main__":
+    main()
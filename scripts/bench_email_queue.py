@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+"""
+Benchmark bulk email delivery against a local stub SMTP server.
+
+Compares the previous path (one connect + login + sendmail per message,
+sent sequentially) with the async delivery queue (worker pool, persistent
+sessions, pipelined envelopes). The stub delays every reply batch by
+--latency-ms to model the round trip to a real mail server.
+
+Usage:
+    python scripts/bench_email_queue.py
+    python scripts/bench_email_queue.py --messages 2000 --workers 8 --latency-ms 5
+"""
+
+import argparse
+import asyncio
+import smtplib
+import sys
+import time
+
+# Add src and the test helpers to path
+sys.path.insert(0, "src")
+sys.path.insert(0, "tests/notifications")
+
+from notifications.email_provider import EmailMessage
+from notifications.email_queue import EmailDeliveryQueue
+from notifications.smtp_provider import SMTPProvider
+from smtp_stub import StubSMTPServer
+
+
+def _messages(n):
+    return [
+        EmailMessage(to=f"client{i}@example.com", subject=f"Deadline reminder {i}",
+                     body_text="Your Form 1040 is due in 7 days.")
+        for i in range(n)
+    ]
+
+
+def _provider(server):
+    return SMTPProvider(
+        host="127.0.0.1", port=server.port, username="bench", password="secret",
+        use_tls=False, from_email="noreply@example.com",
+    )
+
+
+def bench_per_message(latency, n):
+    """Previous behaviour: a fresh authenticated connection for every message."""
+    server = StubSMTPServer(latency=latency).start()
+    provider = _provider(server)
+    try:
+        start = time.perf_counter()
+        for message in _messages(n):
+            from_email, recipients, payload = provider.build_mime(message)
+            with smtplib.SMTP(provider.host, provider.port, timeout=30) as smtp:
+                smtp.login(provider.username, provider.password)
+                smtp.sendmail(from_email, recipients, payload)
+        elapsed = time.perf_counter() - start
+    finally:
+        server.stop()
+    return elapsed, server.connections
+
+
+async def bench_queue(latency, n, workers):
+    server = StubSMTPServer(latency=latency).start()
+    queue = EmailDeliveryQueue(provider=_provider(server), workers=workers)
+    try:
+        start = time.perf_counter()
+        results = await queue.send_batch(_messages(n))
+        elapsed = time.perf_counter() - start
+        stats = queue.get_stats()
+        await queue.stop()
+    finally:
+        server.stop()
+    assert all(r.success for r in results), "delivery failures during benchmark"
+    return elapsed, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk email delivery benchmark")
+    parser.add_argument("--messages", type=int, default=1000)
+    parser.add_argument("--baseline-messages", type=int, default=200,
+                        help="Messages for the slow per-message baseline")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=2.0,
+                        help="Simulated round-trip time per reply batch")
+    args = parser.parse_args()
+    latency = args.latency_ms / 1000
+
+    baseline_n = min(args.messages, args.baseline_messages)
+    before_s, before_conns = bench_per_message(latency, baseline_n)
+    after_s, stats = asyncio.run(bench_queue(latency, args.messages, args.workers))
+
+    before = baseline_n / before_s
+    after = args.messages / after_s
+    print(f"per-message connections: {baseline_n} emails in {before_s:.2f}s "
+          f"({before:,.0f} msg/s, {before_conns} connections)")
+    print(f"queue ({args.workers} workers):       {args.messages} emails in {after_s:.2f}s "
+          f"({after:,.0f} msg/s, {stats['connections_opened']} connections)")
+    print(f"speedup:                 {after / before:.1f}x")
+    print(f"avg enqueue->delivered:  {stats['avg_latency_ms']:.1f} ms, retries {stats['retries']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+"""
+Benchmark template field extraction on large OCR texts.
+
+Compares the single-pass anchor scanner used by FieldExtractor.extract with
+searching every field pattern over the full text, checks that both produce
+identical fields, and reports MB/s for each document type.
+
+Usage:
+    python scripts/bench_field_extraction.py
+    python scripts/bench_field_extraction.py --pages 200 --repeat 5
+"""
+
+import argparse
+import random
+import sys
+import time
+
+# Add src to path
+sys.path.insert(0, "src")
+
+from services.ocr.field_extractor import DOCUMENT_TEMPLATES, FieldExtractor
+from services.ocr.ocr_engine import OCRResult
+
+FILLER = (
+    "Instructions for Employee. See the separate instructions. Keep for your records. "
+    "This information is being furnished to the Internal Revenue Service. "
+    "Department of the Treasury 2025 OMB No. 1545-0008 Copy B To Be Filed With "
+    "Employee's FEDERAL Tax Return. Void Corrected Statutory employee Retirement plan "
+)
+
+FORMS = {
+    "w2": (
+        "b Employer identification number (EIN) 12-3456789\n"
+        "c Employer's name, address, and ZIP code\nAcme Corporation\n"
+        "1 Wages, tips, other compensation $85,000.00\n"
+        "2 Federal income tax withheld $12,750.00\n"
+        "3 Social security wages 85000.00\n"
+    ),
+    "1099-int": (
+        "PAYER'S name: First National Bank\nPAYER'S TIN: 98-7654321\n"
+        "1 Interest income $1,250.00\n"
+    ),
+    "1099-div": "PAYER'S name: Vanguard\n1a Total ordinary dividends $3,200.00\n",
+    "1099-nec": "PAYER'S name: Tech Inc\n1 Nonemployee compensation $45,000.00\n",
+    "1099-misc": "PAYER'S name: Landlord LLC\n1 Rents $12,000.00\n",
+}
+
+
+def _build_text(doc_type, pages, rng):
+    """Multi-page OCR text with the form fields on the last page."""
+    lines = []
+    for _ in range(pages):
+        words = FILLER.split()
+        rng.shuffle(words)
+        lines.append(" ".join(words))
+    lines.append(FORMS[doc_type])
+    return "\n".join(lines)
+
+
+def _best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Field extraction benchmark")
+    parser.add_argument("--pages", type=int, default=100, help="Filler pages per document")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    extractor = FieldExtractor()
+
+    print(f"{'document':<10} {'size':>8} {'full-scan MB/s':>15} {'scanner MB/s':>13} {'speedup':>8}  match")
+    for doc_type, make_templates in DOCUMENT_TEMPLATES.items():
+        templates = make_templates()
+        text = _build_text(doc_type, args.pages, rng)
+        ocr = OCRResult(raw_text=text, blocks=[], confidence=90.0, engine_used="bench")
+        mb = len(text) / 1e6
+
+        def full_scan():
+            return [
+                f for f in (extractor._extract_field(text, t, ocr.confidence) for t in templates) if f
+            ]
+
+        def scanned():
+            return extractor.extract(ocr, templates)
+
+        match = [f.to_dict() for f in full_scan()] == [f.to_dict() for f in scanned()]
+        before = _best_of(full_scan, args.repeat)
+        after = _best_of(scanned, args.repeat)
+        print(
+            f"{doc_type:<10} {len(text) / 1024:>6.0f}KB {mb / before:>15.2f} {mb / after:>13.2f} "
+            f"{before / after:>7.1f}x  {match}"
+        )
+
+
+if __name__ == "__main__":
+    main()
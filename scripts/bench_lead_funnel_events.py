@@ -0,0 +1,226 @@
+#!/usr/bin/env python
+"""
+Benchmark lead magnet funnel event ingestion and KPI queries.
+
+Generates a year of synthetic funnel traffic and compares, through
+_DbConnectionAdapter:
+- ingestion: one connection + INSERT + screen UPDATE + commit per event
+  (previous track_event) vs FunnelEventBuffer batches with rollups
+- KPIs: the previous date(created_at)/LIKE scan over lead_magnet_events
+  vs the daily rollup query, for a 30-day window and the full year
+
+Runs on SQLite by default; pass --postgres-url to also run on Postgres
+(uses a throwaway schema, dropped afterwards; needs psycopg2).
+
+Usage:
+    python scripts/bench_lead_funnel_events.py
+    python scripts/bench_lead_funnel_events.py --events-per-day 2000
+    python scripts/bench_lead_funnel_events.py --postgres-url postgresql://localhost/bench
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+# Add src to path
+sys.path.insert(0, "src")
+
+from cpa_panel.services.lead_magnet.events import (
+    EVENT_COLUMNS,
+    ROLLUP_INDEX_SQL,
+    ROLLUP_TABLE_SQL,
+    SQLITE_ROLLUP_TABLE_SQL,
+    FunnelEventBuffer,
+    rebuild_rollups,
+)
+from cpa_panel.services.lead_magnet_service import LeadMagnetService, _DbConnectionAdapter
+
+PG_SCHEMA = "bench_lead_funnel"
+
+SCHEMA = [
+    """CREATE TABLE lead_magnet_sessions (session_id TEXT PRIMARY KEY, current_screen TEXT, last_activity TEXT)""",
+    """CREATE TABLE lead_magnet_events (
+        event_id TEXT UNIQUE NOT NULL, session_id TEXT NOT NULL, cpa_id TEXT, event_name TEXT NOT NULL,
+        step TEXT, variant_id TEXT, utm_source TEXT, utm_medium TEXT, utm_campaign TEXT, device_type TEXT,
+        metadata_json TEXT DEFAULT '{}', created_at TEXT)""",
+    "CREATE INDEX idx_lead_magnet_events_name ON lead_magnet_events(event_name, created_at)",
+    "CREATE INDEX idx_lead_magnet_events_variant ON lead_magnet_events(variant_id, created_at)",
+    "CREATE INDEX idx_lead_magnet_events_utm_source ON lead_magnet_events(utm_source, created_at)",
+]
+
+STEPS = [("start", None), ("step_complete", "profile"), ("step_complete", "teaser_view"),
+         ("step_complete", "contact_view"), ("step_complete", "score_interaction"),
+         ("lead_submit", "contact"), ("report_view", None), ("drop_off", "profile")]
+
+LEGACY_KPI_SQL = [
+    "SELECT event_name, step, COUNT(*) AS cnt FROM lead_magnet_events WHERE {clause} GROUP BY event_name, step",
+    "SELECT COUNT(*) AS cnt FROM lead_magnet_events WHERE {clause} AND event_name = 'step_complete' "
+    "AND (step = 'score_interaction' OR metadata_json LIKE '%subscore_click%')",
+]
+ROLLUP_KPI_SQL = (
+    "SELECT event_name, step, SUM(event_count) AS cnt, SUM(score_interactions) AS score_cnt "
+    "FROM lead_magnet_event_rollups WHERE {clause} GROUP BY event_name, step"
+)
+
+
+def _events(days, per_day, sessions, seed=1):
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)  # first_day in _run
+    for i in range(days * per_day):
+        name, step = rng.choice(STEPS)
+        metadata = {"action": "subscore_click"} if name == "step_complete" and rng.random() < 0.1 else {}
+        yield {
+            "event_id": f"evt-{i:09d}",
+            "session_id": f"s-{rng.randrange(sessions)}",
+            "cpa_id": rng.choice([None, "cpa-1", "cpa-2", "cpa-3"]),
+            "event_name": name,
+            "step": step,
+            "variant_id": rng.choice(["A", "B"]),
+            "utm_source": rng.choice([None, "google", "facebook", "newsletter"]),
+            "utm_medium": None,
+            "utm_campaign": None,
+            "device_type": rng.choice(["mobile", "desktop", "tablet"]),
+            "metadata_json": json.dumps(metadata),
+            "created_at": (start + timedelta(seconds=i * 86400 // per_day)).isoformat(),
+        }
+
+
+def _time(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def _run(label, connect, args, is_postgres=False):
+    conn = connect()
+    cursor = conn.cursor()
+    for statement in SCHEMA:
+        cursor.execute(statement)
+    cursor.execute(ROLLUP_TABLE_SQL if is_postgres else SQLITE_ROLLUP_TABLE_SQL)
+    cursor.execute(ROLLUP_INDEX_SQL)
+    cursor.executemany(
+        "INSERT INTO lead_magnet_sessions (session_id, current_screen) VALUES (?, 'welcome')",
+        [(f"s-{i}",) for i in range(args.sessions)],
+    )
+    conn.commit()
+    conn.close()
+
+    events = _events(args.days, args.events_per_day, args.sessions)
+    insert_sql = (
+        f"INSERT INTO lead_magnet_events ({', '.join(EVENT_COLUMNS)}) VALUES ({', '.join('?' for _ in EVENT_COLUMNS)})"
+    )
+
+    # Previous track_event: a connection and a commit per event, plus the screen update
+    legacy_events = [next(events) for _ in range(args.legacy_events)]
+    start = time.perf_counter()
+    for event in legacy_events:
+        conn = connect()
+        conn.cursor().execute(insert_sql, tuple(event[c] for c in EVENT_COLUMNS))
+        conn.commit()
+        conn.close()
+        if event["step"]:
+            conn = connect()
+            conn.cursor().execute(
+                "UPDATE lead_magnet_sessions SET current_screen = ?, last_activity = ? WHERE session_id = ?",
+                (event["step"], event["created_at"], event["session_id"]),
+            )
+            conn.commit()
+            conn.close()
+    legacy_rate = len(legacy_events) / (time.perf_counter() - start)
+
+    # Legacy-ingested events still need rollups for the KPI comparison
+    conn = connect()
+    rebuild_rollups(conn)
+    conn.close()
+
+    buffer = FunnelEventBuffer(connect, batch_size=args.batch_size, flush_interval_ms=60000)
+    start = time.perf_counter()
+    buffered = 0
+    for event in events:
+        buffer.add(event, screen=event["step"])
+        buffered += 1
+    buffer.flush()
+    buffered_rate = buffered / (time.perf_counter() - start)
+
+    def kpi(sql_list, clause, params):
+        conn = connect()
+        cursor = conn.cursor()
+        for sql in sql_list:
+            sql = sql.format(clause=clause)
+            # psycopg2 needs literal '%' doubled once parameters are bound
+            cursor.execute(sql.replace("%", "%%") if is_postgres else sql, params)
+            cursor.fetchall()
+        conn.close()
+
+    first_day = datetime(2025, 1, 1).date()
+    last_day = first_day + timedelta(days=args.days - 1)
+    windows = {
+        "30 days": (str(max(first_day, last_day - timedelta(days=29))), str(last_day)),
+        f"{args.days} days": (str(first_day), str(last_day)),
+    }
+    print(f"\n[{label}] {args.days} days x {args.events_per_day} events/day")
+    print(f"  ingest  per-event commits: {legacy_rate:10,.0f} events/s   ({len(legacy_events)} events)")
+    print(f"  ingest  buffered batches:  {buffered_rate:10,.0f} events/s   ({buffered} events, "
+          f"{buffered_rate / legacy_rate:,.0f}x)")
+    for name, (date_from, date_to) in windows.items():
+        legacy_clause = "date(created_at) >= date(?) AND date(created_at) <= date(?) AND variant_id = ?"
+        legacy = _time(lambda: kpi(LEGACY_KPI_SQL, legacy_clause, (date_from, date_to, "B")), args.repeat)
+        clause, params = LeadMagnetService._rollup_filters("day", date_from, date_to, variant_id="B")
+        rollup = _time(lambda: kpi([ROLLUP_KPI_SQL], clause, params), args.repeat)
+        print(f"  KPIs {name:>9}: raw scan {legacy * 1000:9.2f} ms   rollups {rollup * 1000:7.2f} ms   "
+              f"({legacy / rollup:,.0f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--events-per-day", type=int, default=1000)
+    parser.add_argument("--sessions", type=int, default=20000)
+    parser.add_argument("--legacy-events", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--postgres-url", help="Also benchmark against this Postgres database")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "funnel.db")
+
+        def sqlite_connect():
+            conn = sqlite3.connect(path)
+            conn.row_factory = sqlite3.Row
+            return _DbConnectionAdapter(conn, is_postgres=False)
+
+        _run("sqlite", sqlite_connect, args)
+
+    if args.postgres_url:
+        import psycopg2
+
+        admin = psycopg2.connect(args.postgres_url)
+        admin.autocommit = True
+        admin.cursor().execute(f"DROP SCHEMA IF EXISTS {PG_SCHEMA} CASCADE; CREATE SCHEMA {PG_SCHEMA}")
+
+        def pg_connect():
+            conn = psycopg2.connect(args.postgres_url, options=f"-c search_path={PG_SCHEMA}")
+            return _DbConnectionAdapter(conn, is_postgres=True)
+
+        try:
+            _run("postgres", pg_connect, args, is_postgres=True)
+        finally:
+            admin.cursor().execute(f"DROP SCHEMA IF EXISTS {PG_SCHEMA} CASCADE")
+            admin.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+"""
+Benchmark the CPA lead pipeline views at 100k leads per tenant.
+
+Compares the previous implementations (score, serialize and sort every
+monetizable lead for the priority queue; serialize every lead in every
+state for the Kanban view) with the index-backed ones that only touch
+the requested page. Also reports the cost the index adds to
+process_signal.
+
+Usage:
+    python scripts/bench_lead_pipeline.py
+    python scripts/bench_lead_pipeline.py --leads 200000 --rounds 10
+"""
+
+import argparse
+import logging
+import random
+import sys
+import time
+from datetime import timedelta
+
+# Add src to path
+sys.path.insert(0, "src")
+
+from cpa_panel.lead_state import LeadState, SIGNAL_CATALOG
+from cpa_panel.lead_state.engine import LeadStateEngine
+from cpa_panel.services.pipeline_service import LeadPipelineService
+
+TENANT = "bench-tenant"
+
+
+def legacy_priority_queue(service, engine, limit):
+    scored = []
+    for lead in engine.get_monetizable_leads(TENANT):
+        lead_dict = lead.to_dict()
+        lead_dict["priority_score"] = service._calculate_priority_score(lead)
+        lead_dict["estimated_value"] = service._estimate_lead_value(lead_dict)
+        lead_dict["recommended_action"] = service._get_recommended_action(lead)
+        scored.append(lead_dict)
+    scored.sort(key=lambda x: x["priority_score"], reverse=True)
+    return scored[:limit]
+
+
+def legacy_pipeline(service, engine):
+    pipeline = {}
+    for state in LeadState:
+        lead_dicts = [l.to_dict() for l in engine.get_leads_by_state(state, TENANT)]
+        for lead_dict in lead_dicts:
+            lead_dict["estimated_value"] = service._estimate_lead_value(lead_dict)
+        pipeline[state.name] = {"leads": lead_dicts, "count": len(lead_dicts),
+                                "total_value": sum(l["estimated_value"] for l in lead_dicts)}
+    return pipeline
+
+
+def _populate(engine, n, rng):
+    signals = list(SIGNAL_CATALOG)
+    # Mostly early-funnel traffic, like real lead magnets
+    weights = [8 if s.startswith("discovery.") else 3 if s.startswith("evaluation.") else 1 for s in signals]
+    start = time.perf_counter()
+    calls = 0
+    for i in range(n):
+        for signal in rng.choices(signals, weights=weights, k=rng.randint(1, 5)):
+            engine.process_signal(f"lead-{i}", signal, session_id=f"s{i}", tenant_id=TENANT)
+            calls += 1
+        lead = engine._leads[f"lead-{i}"]
+        if lead.transitions:
+            lead.transitions[-1].timestamp -= timedelta(days=rng.randint(0, 20))
+            engine._index.upsert(lead)
+    return calls, time.perf_counter() - start
+
+
+def _time(fn, rounds):
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return sorted(samples)[len(samples) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lead pipeline benchmark")
+    parser.add_argument("--leads", type=int, default=100_000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)  # per-transition log lines
+
+    rng = random.Random(11)
+    engine = LeadStateEngine()
+    calls, elapsed = _populate(engine, args.leads, rng)
+    print(f"{args.leads:,} leads for one tenant ({calls:,} signals, "
+          f"{elapsed / calls * 1e6:.1f} us per process_signal incl. index upkeep)")
+
+    service = LeadPipelineService()
+    service._engine = engine
+    counts = engine.get_state_totals(TENANT)
+    print("  states: " + ", ".join(f"{s}={c['count']:,}" for s, c in counts.items()))
+
+    legacy_q = _time(lambda: legacy_priority_queue(service, engine, args.limit), args.rounds)
+    indexed_q = _time(lambda: service.get_priority_queue(TENANT, args.limit), args.rounds)
+    cursor = service.get_priority_queue(TENANT, args.limit)["next_cursor"]
+    indexed_q2 = _time(lambda: service.get_priority_queue(TENANT, args.limit, cursor=cursor), args.rounds)
+    legacy_k = _time(lambda: legacy_pipeline(service, engine), args.rounds)
+    indexed_k = _time(lambda: service.get_pipeline_by_state(TENANT), args.rounds)
+
+    assert [l["priority_score"] for l in legacy_priority_queue(service, engine, args.limit)] == \
+        [l["priority_score"] for l in service.get_priority_queue(TENANT, args.limit)["priority_queue"]]
+
+    print(f"median of {args.rounds} rounds:")
+    print(f"  priority queue (top {args.limit}): legacy {legacy_q:9.2f} ms | indexed {indexed_q:7.3f} ms "
+          f"| next page {indexed_q2:7.3f} ms | {legacy_q / indexed_q:,.0f}x")
+    print(f"  kanban + totals:          legacy {legacy_k:9.2f} ms | indexed {indexed_k:7.3f} ms "
+          f"|                   | {legacy_k / indexed_k:,.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+"""
+Benchmark core.caching.MemoryCache under a full cache and thread contention.
+
+Compares the previous single-lock cache (scan + sort on every set once
+full, full scan for invalidate_pattern) with the lock-striped LRU/TTL
+cache. Python threads share the GIL, so the contention numbers mostly show
+lock hand-off and critical-section length rather than true parallelism.
+
+Usage:
+    python scripts/bench_memory_cache.py
+    python scripts/bench_memory_cache.py --max-size 50000 --threads 16
+"""
+
+import argparse
+import random
+import sys
+import threading
+import time
+
+# Add src to path
+sys.path.insert(0, "src")
+
+from core.caching import CacheEntry, MemoryCache
+
+
+class LegacyMemoryCache:
+    """The previous MemoryCache: one RLock, O(n log n) cleanup when full."""
+
+    def __init__(self, default_ttl=300, max_size=1000):
+        self._cache = {}
+        self._lock = threading.RLock()
+        self._default_ttl = default_ttl
+        self._max_size = max_size
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None or entry.is_expired():
+                self._cache.pop(key, None)
+                return default
+            entry.touch()
+            return entry.value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            if len(self._cache) >= self._max_size:
+                self._cleanup()
+            self._cache[key] = CacheEntry(value, ttl or self._default_ttl)
+
+    def invalidate_pattern(self, pattern):
+        with self._lock:
+            keys = [k for k in self._cache if k.startswith(pattern)]
+            for key in keys:
+                del self._cache[key]
+            return len(keys)
+
+    def _cleanup(self):
+        oldest = []
+        for key, entry in list(self._cache.items()):
+            if entry.is_expired():
+                del self._cache[key]
+            else:
+                oldest.append((key, entry.created_at))
+        if len(self._cache) >= self._max_size:
+            oldest.sort(key=lambda x: x[1])
+            for key, _ in oldest[:max(1, len(oldest) // 10)]:
+                del self._cache[key]
+
+
+def _keys(n, key_space, seed):
+    rng = random.Random(seed)
+    prefixes = ["dashboard", "leads", "lead", "cpa", "tenant"]
+    return [f"{rng.choice(prefixes)}:{rng.randrange(50)}:{rng.randrange(key_space)}" for _ in range(n)]
+
+
+def run_mixed(cache, threads, ops_per_thread, key_space, write_ratio, max_size):
+    """Fill the cache, then each thread does a get/set mix; returns total ops per second."""
+    for i, key in enumerate(_keys(max_size, key_space, seed=-1)):
+        cache.set(key, i)
+    keysets = [_keys(ops_per_thread, key_space, seed) for seed in range(threads)]
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(keys):
+        barrier.wait()
+        for i, key in enumerate(keys):
+            if i % 100 < write_ratio:
+                cache.set(key, i)
+            else:
+                cache.get(key)
+
+    workers = [threading.Thread(target=worker, args=(k,)) for k in keysets]
+    for t in workers:
+        t.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for t in workers:
+        t.join()
+    return threads * ops_per_thread / (time.perf_counter() - start)
+
+
+def run_invalidation(cache, size, rounds):
+    for i in range(size):
+        cache.set(f"dashboard:{i % 50}:{i}" if i % 10 == 0 else f"leads:{i % 50}:{i}", i)
+    start = time.perf_counter()
+    for r in range(rounds):
+        cache.invalidate_pattern(f"dashboard:{r % 50}:")
+    return (time.perf_counter() - start) / rounds * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MemoryCache contention benchmark")
+    parser.add_argument("--max-size", type=int, default=20000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--ops", type=int, default=20000, help="Operations per thread")
+    parser.add_argument("--write-ratio", type=int, default=30, help="Percent of operations that are sets")
+    args = parser.parse_args()
+    key_space = args.max_size * 4  # keeps the cache full and evicting
+
+    print(f"max_size={args.max_size} threads={args.threads} ops/thread={args.ops} "
+          f"writes={args.write_ratio}%")
+    for threads in (1, args.threads):
+        legacy_ops = args.ops // 10  # the legacy cache is far slower once full
+        legacy = run_mixed(LegacyMemoryCache(max_size=args.max_size), threads, legacy_ops,
+                           key_space, args.write_ratio, args.max_size)
+        striped = run_mixed(MemoryCache(max_size=args.max_size), threads, args.ops,
+                            key_space, args.write_ratio, args.max_size)
+        print(f"  {threads:>2} thread(s): legacy {legacy:>10,.0f} ops/s | "
+              f"striped LRU {striped:>10,.0f} ops/s | {striped / legacy:6.1f}x")
+
+    legacy_ms = run_invalidation(LegacyMemoryCache(max_size=args.max_size * 2), args.max_size, 200)
+    indexed_ms = run_invalidation(MemoryCache(max_size=args.max_size * 2), args.max_size, 200)
+    print(f"  invalidate_pattern('dashboard:N:') over {args.max_size} keys: "
+          f"legacy {legacy_ms:.3f} ms | indexed {indexed_ms:.3f} ms | {legacy_ms / indexed_ms:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+"""
+Microbenchmark PII field encryption for list/export workloads.
+
+Compares the previous per-call path (re-derive the field key and build a
+new AESGCM for every value) with the cached-cipher decrypt_pii() and the
+bulk decrypt_many(). Also times DataEncryptor re-decrypting the same rows
+with and without its per-salt derived-key cache.
+
+Usage:
+    python scripts/bench_pii_encryption.py
+    python scripts/bench_pii_encryption.py --values 50000
+"""
+
+import argparse
+import base64
+import os
+import secrets
+import sys
+import time
+
+# Add src to path
+sys.path.insert(0, "src")
+
+os.environ.setdefault("ENCRYPTION_MASTER_KEY", secrets.token_hex(32))
+
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+import database.encrypted_fields as ef
+from security.encryption import DataEncryptor
+
+
+def _uncached_decrypt(ciphertext, field_type, associated_data):
+    """decrypt_pii() as it was: derive key and build a cipher per value."""
+    parts = ciphertext.split(":")
+    nonce = base64.urlsafe_b64decode(parts[1])
+    data = base64.urlsafe_b64decode(parts[2]) + base64.urlsafe_b64decode(parts[3])
+    key = ef._derive_field_key(ef.get_encryption_key(), field_type)
+    return AESGCM(key).decrypt(nonce, data, associated_data).decode("utf-8")
+
+
+def _rate(n, seconds):
+    return f"{n / seconds:>12,.0f} values/s"
+
+
+def bench_fields(n):
+    ad = b"tenant-1"
+    ssns = [f"{i:09d}" for i in range(n)]
+    tokens = ef.encrypt_many(ssns, field_type="ssn", associated_data=ad)
+
+    start = time.perf_counter()
+    for token in tokens:
+        _uncached_decrypt(token, "ssn", ad)
+    uncached = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for token in tokens:
+        ef.decrypt_pii(token, field_type="ssn", associated_data=ad)
+    cached = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = ef.decrypt_many(tokens, field_type="ssn", associated_data=ad)
+    bulk = time.perf_counter() - start
+    assert result == ssns
+
+    print(f"encrypted_fields, {n} SSNs")
+    print(f"  per-call key + AESGCM:  {uncached:7.3f}s {_rate(n, uncached)}")
+    print(f"  cached cipher:          {cached:7.3f}s {_rate(n, cached)}  ({uncached / cached:.1f}x)")
+    print(f"  decrypt_many:           {bulk:7.3f}s {_rate(n, bulk)}  ({uncached / bulk:.1f}x)")
+
+
+def bench_encryptor(n):
+    enc = DataEncryptor(master_key=secrets.token_hex(32))
+    values = [f"{i:09d}" for i in range(n)]
+
+    start = time.perf_counter()
+    for value in values:
+        enc.encrypt(value)
+    per_value = time.perf_counter() - start
+
+    start = time.perf_counter()
+    tokens = enc.encrypt_many(values)
+    batch = time.perf_counter() - start
+
+    # Re-reading rows: a fresh encryptor has a cold cache (previous behaviour)
+    cold = DataEncryptor(master_key=enc._master_key)
+    single = [enc.encrypt(v) for v in values]
+    start = time.perf_counter()
+    cold.decrypt_many(single)
+    cold_time = time.perf_counter() - start
+    start = time.perf_counter()
+    cold.decrypt_many(single)
+    warm_time = time.perf_counter() - start
+    assert enc.decrypt_many(tokens) == values
+
+    print(f"DataEncryptor (PBKDF2 {DataEncryptor.ITERATIONS:,} iterations), {n} values")
+    print(f"  encrypt per value:      {per_value:7.3f}s {_rate(n, per_value)}")
+    print(f"  encrypt_many:           {batch:7.3f}s {_rate(n, batch)}  ({per_value / batch:.1f}x)")
+    print(f"  decrypt, cold keys:     {cold_time:7.3f}s {_rate(n, cold_time)}")
+    print(f"  decrypt, cached keys:   {warm_time:7.3f}s {_rate(n, warm_time)}  ({cold_time / warm_time:.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PII encryption microbenchmark")
+    parser.add_argument("--values", type=int, default=20000, help="Field values for encrypted_fields")
+    parser.add_argument("--encryptor-values", type=int, default=50,
+                        help="Values for DataEncryptor (PBKDF2 makes each cold call slow)")
+    args = parser.parse_args()
+
+    bench_fields(args.values)
+    bench_encryptor(args.encryptor_values)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+"""
+Benchmark the practice intelligence dashboard read path.
+
+Compares the previous request shape (load every engagement and return of
+the firm, then run PracticeIntelligenceService over the lists) with a
+read from the stored per-year aggregates, and times the incremental
+save hook that keeps those aggregates current.
+
+Usage:
+    python scripts/bench_practice_intelligence.py
+    python scripts/bench_practice_intelligence.py --returns 200000
+"""
+
+import argparse
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+# Add src to path
+sys.path.insert(0, "src")
+
+from cpa_panel.practice_intelligence.aggregates import PortfolioAggregateStore, portfolio_record
+from cpa_panel.practice_intelligence.intelligence_service import PracticeIntelligenceService
+from database.practice_metrics_persistence import PracticeMetricsPersistence
+
+TENANT = "bench-firm"
+ENGAGEMENT_TYPES = ["tax_preparation", "tax_advisory", "tax_planning", "amended_return"]
+
+
+def _records(n, seed=1):
+    rng = random.Random(seed)
+    return [
+        portfolio_record(f"r{i}", {
+            "tax_year": rng.choice([2023, 2024, 2025]),
+            "engagement_type": rng.choice(ENGAGEMENT_TYPES),
+            "total_income": rng.uniform(20000, 1500000),
+            "total_tax": round(rng.uniform(0, 90000), 2),
+            "total_deductions": round(rng.uniform(0, 80000), 2),
+            "refund_amount": round(rng.uniform(0, 9000), 2),
+        })
+        for i in range(n)
+    ]
+
+
+def _time(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--returns", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--updates", type=int, default=500)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    records = _records(args.returns)
+    service = PracticeIntelligenceService()
+
+    def recompute():
+        service.get_portfolio_metrics(
+            tenant_id=TENANT,
+            engagements=records,
+            current_year_returns=[r for r in records if r["tax_year"] == 2025],
+            prior_year_returns=[r for r in records if r["tax_year"] == 2024],
+            current_year=2025,
+            prior_year=2024,
+        ).to_dict()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PortfolioAggregateStore(PracticeMetricsPersistence(os.path.join(tmp, "metrics.db")))
+        start = time.perf_counter()
+        store.rebuild(TENANT, engagements=records, returns=records)
+        rebuild = time.perf_counter() - start
+
+        def read():
+            store.portfolio_metrics(TENANT, 2025, 2024).to_dict()
+
+        legacy = _time(recompute, args.repeat)
+        cached = _time(read, args.repeat * 20)
+
+        rng = random.Random(2)
+        start = time.perf_counter()
+        for i in range(args.updates):
+            store.record_return(TENANT, f"r{rng.randrange(args.returns)}", {
+                "tax_year": 2025, "engagement_type": "tax_advisory",
+                "total_income": 120000, "total_tax": 9000.0,
+            })
+        per_update = (time.perf_counter() - start) / args.updates
+
+    print(f"returns: {args.returns}")
+    print(f"full recompute (in-memory lists, no DB load): {legacy * 1000:9.2f} ms")
+    print(f"stored aggregates read:                       {cached * 1000:9.2f} ms  ({legacy / cached:,.0f}x)")
+    print(f"incremental save hook:                        {per_update * 1000:9.2f} ms per return")
+    print(f"full rebuild:                                 {rebuild * 1000:9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
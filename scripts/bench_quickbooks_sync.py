@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+"""
+Benchmark QuickBooks sync for many companies against the local QBO stub.
+
+Compares the previous access pattern (a new httpx client - and so a new
+connection - per API call, companies and pages one after another) with
+QuickBooksSyncService (one pooled keep-alive client, companies and pages
+in parallel under per-realm throttles), then times an incremental CDC
+run after a small share of records changed.
+
+The stub charges --handshake-ms per new connection (TCP+TLS stand-in)
+and --latency-ms per request.
+
+Usage:
+    python scripts/bench_quickbooks_sync.py
+    python scripts/bench_quickbooks_sync.py --companies 500 --journal-entries 3000 --latency-ms 20
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+import time
+
+# Add src and the stub server to path
+sys.path.insert(0, "src")
+sys.path.insert(0, "tests/unit")
+
+from integrations.quickbooks.client import QB_MAX_PAGE_SIZE, QuickBooksAPIClient
+from integrations.quickbooks.sync import InMemoryCursorStore, QBCompany, QuickBooksSyncService
+from qb_stub_server import QBStubServer
+
+
+async def legacy_sync(base_url, companies):
+    """Previous pattern: per-call clients, everything sequential."""
+    client = QuickBooksAPIClient(base_url=base_url)
+    records = 0
+    for company in companies:
+        for entity in ("JournalEntry", "Account"):
+            start = 1
+            while True:
+                page = await client.query_entities(company.realm_id, company.access_token, entity,
+                                                   start_position=start)
+                records += len(page)
+                if len(page) < QB_MAX_PAGE_SIZE:
+                    break
+                start += QB_MAX_PAGE_SIZE
+    return records
+
+
+def _report(label, elapsed, records, requests, connections):
+    print(f"  {label:<24} {elapsed:8.2f}s | {records:>10,} records | "
+          f"{requests:>6,} requests | {connections:>6,} connections")
+
+
+async def bench(args):
+    stub = QBStubServer(latency=args.latency_ms / 1000, handshake_latency=args.handshake_ms / 1000).start()
+    for i in range(args.companies):
+        stub.add_company(f"realm-{i}", journal_entries=args.journal_entries, accounts=args.accounts)
+    companies = [QBCompany(realm_id=f"realm-{i}", access_token=f"token-realm-{i}") for i in range(args.companies)]
+    print(f"{args.companies} companies x ({args.journal_entries} journal entries + {args.accounts} accounts), "
+          f"latency {args.latency_ms} ms, handshake {args.handshake_ms} ms")
+
+    if not args.skip_legacy:
+        start = time.perf_counter()
+        records = await legacy_sync(stub.base_url, companies)
+        _report("legacy sequential", time.perf_counter() - start, records, stub.requests, stub.connections)
+
+    service = QuickBooksSyncService(
+        cursor_store=InMemoryCursorStore(),
+        base_url=stub.base_url,
+        concurrency=args.concurrency,
+        max_connections=args.connections,
+    )
+
+    def _totals(results):
+        assert all(r.success for r in results), [r.error for r in results if not r.success][:3]
+        records = sum(sum(r.upserted.values()) + sum(r.deleted.values()) for r in results)
+        return records, sum(r.requests for r in results)
+
+    connections = stub.connections
+    start = time.perf_counter()
+    results = await service.sync_companies(companies)
+    elapsed = time.perf_counter() - start
+    records, requests = _totals(results)
+    _report("pooled full sync", elapsed, records, requests, stub.connections - connections)
+
+    changed = max(1, args.journal_entries * args.changed_pct // 100)
+    for i in range(args.companies):
+        stub.touch(f"realm-{i}", "JournalEntry", range(1, changed + 1))
+    connections = stub.connections
+    start = time.perf_counter()
+    results = await service.sync_companies(companies)
+    elapsed = time.perf_counter() - start
+    records, requests = _totals(results)
+    _report(f"pooled CDC ({args.changed_pct}% changed)", elapsed, records, requests,
+            stub.connections - connections)
+
+    await service.aclose()
+    stub.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="QuickBooks multi-company sync benchmark")
+    parser.add_argument("--companies", type=int, default=300)
+    parser.add_argument("--journal-entries", type=int, default=2500)
+    parser.add_argument("--accounts", type=int, default=60)
+    parser.add_argument("--latency-ms", type=float, default=10.0)
+    parser.add_argument("--handshake-ms", type=float, default=30.0)
+    parser.add_argument("--concurrency", type=int, default=20, help="Companies synced at once")
+    parser.add_argument("--connections", type=int, default=50, help="Pooled connections")
+    parser.add_argument("--changed-pct", type=int, default=2, help="Journal entries touched before the CDC run")
+    parser.add_argument("--skip-legacy", action="store_true")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)  # per-company sync log lines
+
+    asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+"""
+Benchmark Redis cache invalidation: SCAN-driven delete_pattern vs tag sets.
+
+Fills Redis with --keys unrelated cache entries plus --affected
+calculation entries for one return, then times invalidating that return
+with delete_pattern("calc:<id>*") (walks the whole keyspace) and with
+invalidate_tags("calc:<id>") (reads only the tag's members).
+
+Uses an in-process fakeredis server by default; pass --url to run
+against a local Redis (the database is flushed).
+
+Usage:
+    python scripts/bench_redis_tag_invalidation.py
+    python scripts/bench_redis_tag_invalidation.py --keys 100000 --rounds 5
+    python scripts/bench_redis_tag_invalidation.py --url redis://localhost:6379/15
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from unittest.mock import MagicMock
+
+# Add src to path
+sys.path.insert(0, "src")
+
+from cache.calculation_cache import CalculationCache
+from cache.redis_client import RedisClient
+
+
+async def _client(url):
+    settings = MagicMock()
+    settings.key_prefix = "bench:"
+    settings.default_ttl = 3600
+    client = RedisClient(settings=settings)
+    if url:
+        import redis.asyncio as redis
+        client._client = redis.Redis.from_url(url, decode_responses=True)
+    else:
+        import fakeredis
+        client._client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    client._connected = True
+    await client._client.flushdb()
+    return client
+
+
+async def _fill(client, n):
+    """Unrelated entries (other returns, sessions) that SCAN has to walk past."""
+    chunk = 10_000
+    for start in range(0, n, chunk):
+        pipe = client._client.pipeline(transaction=False)
+        for i in range(start, min(start + chunk, n)):
+            kind = "session" if i % 2 else "calc"
+            pipe.set(f"bench:{kind}:other-{i}", "{}", ex=3600)
+        await pipe.execute()
+
+
+async def _populate_return(cache, return_id, affected):
+    for i in range(affected):
+        await cache.set_calculation(return_id, {"total_tax": i}, context_hash=f"ctx{i}")
+
+
+async def run(url, keys, affected, rounds):
+    client = await _client(url)
+    cache = CalculationCache(client=client)
+
+    start = time.perf_counter()
+    await _fill(client, keys)
+    print(f"filled {keys:,} keys in {time.perf_counter() - start:.1f}s "
+          f"({'redis ' + url if url else 'fakeredis'})")
+
+    scan_ms, tag_ms = [], []
+    for r in range(rounds):
+        return_id = f"target-{r}"
+
+        await _populate_return(cache, return_id, affected)
+        start = time.perf_counter()
+        deleted = await client.delete_pattern(f"calc:{return_id}*")
+        scan_ms.append((time.perf_counter() - start) * 1000)
+        assert deleted == affected, deleted
+        await client.invalidate_tags(f"calc:{return_id}")  # drop the now-stale tag set
+
+        await _populate_return(cache, return_id, affected)
+        start = time.perf_counter()
+        deleted = await client.invalidate_tags(f"calc:{return_id}")
+        tag_ms.append((time.perf_counter() - start) * 1000)
+        assert deleted == affected, deleted
+
+    await client._client.flushdb()
+    await client._client.aclose()
+
+    scan = sorted(scan_ms)[len(scan_ms) // 2]
+    tag = sorted(tag_ms)[len(tag_ms) // 2]
+    print(f"invalidate one return ({affected} entries), median of {rounds}:")
+    print(f"  delete_pattern (SCAN):  {scan:10.2f} ms")
+    print(f"  invalidate_tags:        {tag:10.2f} ms")
+    print(f"  speedup:                {scan / tag:10.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Redis invalidation benchmark")
+    parser.add_argument("--keys", type=int, default=1_000_000, help="Unrelated keys in Redis")
+    parser.add_argument("--affected", type=int, default=50, help="Entries cached for the invalidated return")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--url", default=None, help="Local Redis URL (flushed); fakeredis if omitted")
+    args = parser.parse_args()
+
+    asyncio.run(run(args.url, args.keys, args.affected, args.rounds))
+
+
+if __name__ == "__main__":
+    main()
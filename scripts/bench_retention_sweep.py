@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+"""
+Benchmark the expired-session purge and audit log trim.
+
+Seeds a session database (sessions plus documents, upload references and
+tax returns) and an audit log database, then compares:
+
+- sessions: the previous purge (delete_session per expired id, timed on a
+  sample) with the chunked SESSION_SWEEP over every expired session
+- audit log: the previous trim (one open-ended DELETE, then VACUUM) with
+  the chunked AUDIT_LOG_SWEEP, on identical copies of the database
+
+The longest single transaction is reported as the write-lock hold time.
+
+Usage:
+    python scripts/bench_retention_sweep.py
+    python scripts/bench_retention_sweep.py --sessions 2000000 --audit 5000000
+"""
+
+import argparse
+import logging
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, "src")
+
+from audit.audit_logger import AuditLogger
+from database.retention import AUDIT_LOG_SWEEP, SESSION_SWEEP, ensure_retention_tables, run_sweep
+from database.session_persistence import SessionPersistence
+
+NOW = datetime.now(timezone.utc)
+
+
+def _seed_sessions(db_path, count, expired_fraction):
+    now = NOW.isoformat()
+    expired = int(count * expired_fraction)
+
+    def sessions():
+        for i in range(count):
+            offset = timedelta(minutes=i % 100000)
+            expires = NOW - timedelta(days=1) - offset if i < expired else NOW + timedelta(days=1) + offset
+            yield f"s{i:09d}", now, now, expires.isoformat()
+
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany(
+            "INSERT INTO session_states (session_id, created_at, last_activity, expires_at) VALUES (?, ?, ?, ?)",
+            sessions(),
+        )
+        conn.executemany(
+            "INSERT INTO document_processing (document_id, session_id, created_at) VALUES (?, ?, ?)",
+            ((f"d{i:09d}", f"s{i:09d}", now) for i in range(count)),
+        )
+        conn.executemany(
+            "INSERT INTO upload_references (file_path, owner_type, document_id, session_id, created_at) "
+            "VALUES (?, 'document', ?, ?, ?)",
+            ((f"/uploads/d{i:09d}.pdf", f"d{i:09d}", f"s{i:09d}", now) for i in range(count)),
+        )
+        conn.executemany(
+            "INSERT INTO session_tax_returns (session_id, created_at, updated_at) VALUES (?, ?, ?)",
+            ((f"s{i:09d}", now, now) for i in range(count)),
+        )
+    return expired
+
+
+def _seed_audit(db_path, count, expired_fraction):
+    AuditLogger(str(db_path))
+    expired = int(count * expired_fraction)
+
+    def rows():
+        # Appended oldest first, like the live log: 400 days past retention,
+        # then the retention window
+        for i in range(count):
+            if i < expired:
+                age = timedelta(days=2555 + 400 * (expired - i) / expired)
+            else:
+                age = timedelta(days=2555 * (count - i) / (count - expired))
+            yield f"e{i:09d}", (NOW - age).isoformat(), '{"k": "v"}'
+
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany(
+            "INSERT INTO audit_log (event_id, event_type, severity, timestamp, action, resource_type, "
+            "details, success) VALUES (?, 'data.export', 'info', ?, 'bench', 'data_retention', ?, 1)",
+            rows(),
+        )
+    return expired
+
+
+def _legacy_session_purge(persistence, sample):
+    # The previous task: list every expired id, then delete_session() per id
+    start = time.perf_counter()
+    with sqlite3.connect(persistence.db_path) as conn:
+        expired_ids = [row[0] for row in conn.execute(
+            "SELECT session_id FROM session_states WHERE expires_at < ?", (NOW.isoformat(),)
+        )]
+    list_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for sid in expired_ids[:sample]:
+        persistence.delete_session(sid)
+    per_row = (time.perf_counter() - start) / min(sample, len(expired_ids))
+    return list_time, per_row
+
+
+def _legacy_audit_trim(db_path, cutoff):
+    with sqlite3.connect(db_path) as conn:
+        start = time.perf_counter()
+        conn.execute("SELECT COUNT(*) FROM audit_log WHERE timestamp < ?", (cutoff,)).fetchone()
+        deleted = conn.execute("DELETE FROM audit_log WHERE timestamp < ?", (cutoff,)).rowcount
+        conn.commit()
+        delete_time = time.perf_counter() - start
+        start = time.perf_counter()
+        conn.execute("VACUUM")
+        vacuum_time = time.perf_counter() - start
+    return deleted, delete_time, vacuum_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=1000000)
+    parser.add_argument("--audit", type=int, default=2000000)
+    parser.add_argument("--expired", type=float, default=0.8, help="fraction of rows past retention")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--legacy-sample", type=int, default=5000)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        session_db = os.path.join(tmp, "sessions.db")
+        persistence = SessionPersistence(Path(session_db))
+        expired = _seed_sessions(session_db, args.sessions, args.expired)
+        list_time, per_row = _legacy_session_purge(persistence, args.legacy_sample)
+        legacy_rate = 1 / per_row
+        sweep = run_sweep(session_db, SESSION_SWEEP, NOW.isoformat(), chunk_size=args.chunk_size, pause_seconds=0)
+        dependents = sum(sweep["dependent_rows_deleted"].values())
+
+        print(f"sessions: {args.sessions:,} ({expired:,} expired, 3 dependent rows each)")
+        print(f"  previous purge (delete_session per id): {legacy_rate:10,.0f} sessions/s  "
+              f"-> ~{expired / legacy_rate / 60:,.1f} min for all, plus {list_time:.2f} s listing ids")
+        print(f"  chunked sweep:                          {sweep['rows_per_second']:10,.0f} sessions/s  "
+              f"-> {sweep['elapsed_seconds']:.1f} s, {sweep['chunks']} chunks, "
+              f"{dependents:,} dependent rows, longest chunk {sweep['max_chunk_seconds'] * 1000:.0f} ms  "
+              f"({sweep['rows_per_second'] / legacy_rate:,.0f}x)")
+
+        audit_db = os.path.join(tmp, "audit.db")
+        expired = _seed_audit(audit_db, args.audit, args.expired)
+        legacy_db = os.path.join(tmp, "audit_legacy.db")
+        shutil.copyfile(audit_db, legacy_db)
+        cutoff = (NOW - timedelta(days=2555)).isoformat()
+        deleted, delete_time, vacuum_time = _legacy_audit_trim(legacy_db, cutoff)
+        start = time.perf_counter()
+        with sqlite3.connect(audit_db) as conn:
+            ensure_retention_tables(conn, AUDIT_LOG_SWEEP)
+        index_time = time.perf_counter() - start
+        sweep = run_sweep(audit_db, AUDIT_LOG_SWEEP, cutoff, chunk_size=args.chunk_size, pause_seconds=0)
+        assert sweep["rows_deleted"] == deleted
+
+        print(f"audit log: {args.audit:,} entries ({expired:,} past retention)")
+        print(f"  previous trim: DELETE {delete_time:.2f} s ({deleted / delete_time:,.0f} rows/s) in one "
+              f"transaction, then VACUUM {vacuum_time:.2f} s")
+        print(f"  chunked sweep: {sweep['elapsed_seconds']:.2f} s ({sweep['rows_per_second']:,.0f} rows/s), "
+              f"{sweep['chunks']} chunks, longest chunk {sweep['max_chunk_seconds'] * 1000:.0f} ms "
+              f"(after a one-time {index_time:.2f} s build of {AUDIT_LOG_SWEEP.index})")
+
+
+if __name__ == "__main__":
+    main()
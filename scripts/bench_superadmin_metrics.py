@@ -0,0 +1,207 @@
+#!/usr/bin/env python
+"""
+Benchmark the superadmin dashboard, MRR and churn reads.
+
+Compares the previous request shape (sequential aggregates over firms,
+users and subscriptions on every page load) with PlatformMetricsStore
+reading the snapshot tables concurrently, uncached and cached, and times
+the full refresh and applying a batch of queued firm events.
+
+Runs on SQLite through aiosqlite.
+
+Usage:
+    python scripts/bench_superadmin_metrics.py
+    python scripts/bench_superadmin_metrics.py --firms 200000
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+# Add src to path
+sys.path.insert(0, "src")
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from admin_panel.models.platform_metrics import (
+    PlatformChurnCohort,
+    PlatformDailyMetrics,
+    PlatformMetricContribution,
+    PlatformMetricEvent,
+    PlatformMrrByTier,
+)
+from admin_panel.services.platform_metrics import PlatformMetricsStore
+
+SCHEMA = [
+    """CREATE TABLE firms (firm_id TEXT PRIMARY KEY, name TEXT, is_active BOOLEAN,
+        created_at TIMESTAMP, updated_at TIMESTAMP, deleted_at TIMESTAMP)""",
+    """CREATE TABLE users (user_id TEXT PRIMARY KEY, firm_id TEXT, is_active BOOLEAN, last_login_at TIMESTAMP)""",
+    "CREATE INDEX ix_user_firm_active ON users(firm_id, is_active)",
+    """CREATE TABLE subscription_plans (plan_id TEXT PRIMARY KEY, name TEXT, code TEXT,
+        monthly_price NUMERIC, annual_price NUMERIC)""",
+    """CREATE TABLE subscriptions (subscription_id TEXT PRIMARY KEY, firm_id TEXT, plan_id TEXT,
+        billing_cycle TEXT, status TEXT, cancelled_at TIMESTAMP, created_at TIMESTAMP, updated_at TIMESTAMP)""",
+    "CREATE INDEX ix_subscription_firm_status ON subscriptions(firm_id, status)",
+    "CREATE TABLE feature_flags (feature_key TEXT, rollout_percentage INTEGER, is_enabled_globally BOOLEAN)",
+]
+SNAPSHOT_TABLES = [
+    PlatformDailyMetrics.__table__, PlatformMrrByTier.__table__, PlatformChurnCohort.__table__,
+    PlatformMetricContribution.__table__, PlatformMetricEvent.__table__,
+]
+
+# The previous /dashboard, /subscriptions/mrr and /subscriptions/churn
+# aggregates, with their column names corrected
+LEGACY_SQL = [
+    """SELECT COUNT(*), SUM(CASE WHEN f.is_active = true THEN 1 ELSE 0 END),
+              SUM(CASE WHEN s.status = 'trialing' THEN 1 ELSE 0 END)
+       FROM firms f LEFT JOIN subscriptions s ON f.firm_id = s.firm_id AND s.status IN ('active', 'trialing')""",
+    """SELECT COALESCE(sp.code, 'starter'), COUNT(*) FROM firms f
+       LEFT JOIN subscriptions s ON f.firm_id = s.firm_id AND s.status = 'active'
+       LEFT JOIN subscription_plans sp ON s.plan_id = sp.plan_id
+       WHERE f.is_active = true GROUP BY COALESCE(sp.code, 'starter')""",
+    """SELECT COALESCE(SUM(CASE WHEN s.billing_cycle = 'annual' THEN sp.annual_price / 12.0
+                                ELSE sp.monthly_price END), 0)
+       FROM subscriptions s JOIN subscription_plans sp ON s.plan_id = sp.plan_id WHERE s.status = 'active'""",
+    """SELECT SUM(CASE WHEN f.is_active = false AND f.updated_at >= :since THEN 1 ELSE 0 END),
+              SUM(CASE WHEN f.created_at < :since THEN 1 ELSE 0 END) FROM firms f""",
+    """SELECT AVG(CASE WHEN u.last_login_at >= :week THEN 100 WHEN u.last_login_at >= :since THEN 75 ELSE 50 END)
+       FROM users u WHERE u.is_active = true""",
+    "SELECT feature_key, rollout_percentage FROM feature_flags WHERE is_enabled_globally = true",
+    """SELECT COALESCE(sp.code, 'starter'), COUNT(*) FROM subscriptions s
+       LEFT JOIN subscription_plans sp ON sp.plan_id = s.plan_id WHERE s.status = 'active' GROUP BY 1""",
+    """SELECT COALESCE(sp.code, 'starter'), COUNT(*) FROM subscriptions s
+       LEFT JOIN subscription_plans sp ON sp.plan_id = s.plan_id
+       WHERE s.status = 'active' AND s.created_at <= :since GROUP BY 1""",
+    """SELECT COALESCE(sp.code, 'starter'), COUNT(*) FROM subscriptions s
+       LEFT JOIN subscription_plans sp ON sp.plan_id = s.plan_id
+       WHERE s.status = 'cancelled' AND s.cancelled_at >= :quarter GROUP BY 1""",
+]
+
+
+async def _seed(factory, firms, seed=1):
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    plans = {"starter": (199, 1990), "professional": (499, 4990), "enterprise": (999, 9990)}
+    firm_rows, user_rows, sub_rows = [], [], []
+    for i in range(firms):
+        created = now - timedelta(days=rng.randrange(1000))
+        firm_rows.append({"id": f"f{i}", "name": f"Firm {i}", "active": rng.random() < 0.9, "created": created})
+        for j in range(rng.randrange(1, 6)):
+            user_rows.append({"id": f"u{i}-{j}", "firm": f"f{i}", "active": True,
+                              "login": now - timedelta(days=rng.randrange(90))})
+        status = rng.choice(["active", "active", "active", "trialing", "cancelled", "past_due"])
+        sub_rows.append({
+            "id": f"s{i}", "firm": f"f{i}", "plan": f"plan-{rng.choice(list(plans))}",
+            "cycle": rng.choice(["monthly", "annual"]), "status": status,
+            "cancelled": now - timedelta(days=rng.randrange(365)) if status == "cancelled" else None,
+            "created": created,
+        })
+    async with factory() as session:
+        await session.execute(text("INSERT INTO subscription_plans VALUES (:id, :code, :code, :m, :a)"), [
+            {"id": f"plan-{code}", "code": code, "m": m, "a": a} for code, (m, a) in plans.items()
+        ])
+        await session.execute(text("INSERT INTO firms VALUES (:id, :name, :active, :created, :created, NULL)"), firm_rows)
+        await session.execute(text("INSERT INTO users VALUES (:id, :firm, :active, :login)"), user_rows)
+        await session.execute(text(
+            "INSERT INTO subscriptions VALUES (:id, :firm, :plan, :cycle, :status, :cancelled, :created, :created)"
+        ), sub_rows)
+        await session.commit()
+    return len(user_rows)
+
+
+async def _time(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+async def _run(args, path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+    async with engine.begin() as conn:
+        for statement in SCHEMA:
+            await conn.execute(text(statement))
+        for table in SNAPSHOT_TABLES:
+            await conn.run_sync(table.create)
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+    users = await _seed(factory, args.firms)
+
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    params = {"since": now - timedelta(days=30), "week": now - timedelta(days=7), "quarter": now - timedelta(days=90)}
+
+    async def legacy():
+        async with factory() as session:
+            for sql in LEGACY_SQL:
+                (await session.execute(text(sql), params)).fetchall()
+
+    store = PlatformMetricsStore(session_factory=factory, cache_ttl=0)
+
+    async def refresh():
+        async with factory() as session:
+            await store.refresh(session)
+
+    refresh_time = await _time(refresh, 1)
+
+    async def snapshots():
+        await asyncio.gather(store.dashboard(), store.mrr_breakdown(), store.churn_analysis())
+
+    cached_store = PlatformMetricsStore(session_factory=factory, cache_ttl=3600)
+
+    async def cached():
+        await asyncio.gather(cached_store.dashboard(), cached_store.mrr_breakdown(), cached_store.churn_analysis())
+
+    await cached()
+    legacy_time = await _time(legacy, args.repeat)
+    snapshot_time = await _time(snapshots, args.repeat)
+    cached_time = await _time(cached, args.repeat * 20)
+
+    rng = random.Random(2)
+    async with factory() as session:
+        for _ in range(args.events):
+            firm = f"f{rng.randrange(args.firms)}"
+            await session.execute(text("UPDATE subscriptions SET status = 'cancelled', cancelled_at = :now "
+                                       "WHERE firm_id = :firm"), {"now": now, "firm": firm})
+            await session.execute(text("INSERT INTO platform_metric_events (firm_id) VALUES (:firm)"), {"firm": firm})
+        await session.commit()
+    start = time.perf_counter()
+    async with factory() as session:
+        await store.apply_pending_events(session)
+    apply_time = time.perf_counter() - start
+    async with factory() as session:
+        consistent = (await store.check_consistency(session))["consistent"]
+    await engine.dispose()
+
+    print(f"firms: {args.firms}  users: {users}  subscriptions: {args.firms}")
+    print(f"previous per-request aggregates (3 pages): {legacy_time * 1000:9.2f} ms")
+    print(f"snapshot reads, uncached (3 pages):         {snapshot_time * 1000:9.2f} ms  "
+          f"({legacy_time / snapshot_time:,.0f}x)")
+    print(f"snapshot reads, cached (3 pages):           {cached_time * 1000:9.3f} ms")
+    print(f"full refresh:                               {refresh_time * 1000:9.2f} ms")
+    print(f"apply {args.events} queued firm events:           {apply_time * 1000:9.2f} ms  (consistent: {consistent})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--firms", type=int, default=50000)
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(_run(args, os.path.join(tmp, "platform.db")))
+
+
+if __name__ == "__main__":
+    main()
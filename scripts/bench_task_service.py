@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+"""
+Benchmark TaskService list views against the previous full scans.
+
+Populates a busy-season store (many firms, most tasks already done)
+and compares the previous implementations (scan, filter and sort every
+task across all firms on each call) with the indexed views, including a
+50-task first page. Also reports the cost the indexes add to writes.
+
+Usage:
+    python scripts/bench_task_service.py
+    python scripts/bench_task_service.py --tasks 1000000 --firms 200
+"""
+
+import argparse
+import logging
+import random
+import sys
+import time
+from datetime import date, timedelta
+from uuid import uuid4
+
+# Add src to path
+sys.path.insert(0, "src")
+
+from cpa_panel.tasks.task_models import TaskCategory, TaskPriority, TaskStatus
+from cpa_panel.tasks.task_service import TaskService
+
+TODAY = date.today()
+PRIORITY_ORDER = {TaskPriority.URGENT: 0, TaskPriority.HIGH: 1, TaskPriority.NORMAL: 2, TaskPriority.LOW: 3}
+
+
+def legacy_tasks_for_firm(service, firm_id, assigned_to=None, client_id=None, include_completed=False):
+    tasks = []
+    for task in service._tasks.values():
+        if task.firm_id != firm_id:
+            continue
+        if assigned_to and task.assigned_to != assigned_to:
+            continue
+        if client_id and task.client_id != client_id:
+            continue
+        if not include_completed and task.status == TaskStatus.COMPLETED:
+            continue
+        tasks.append(task)
+    tasks.sort(key=lambda t: (PRIORITY_ORDER.get(t.priority, 2), t.due_date or date.max))
+    return tasks
+
+
+def legacy_unassigned(service, firm_id):
+    return [t for t in service._tasks.values() if t.firm_id == firm_id and t.assigned_to is None
+            and t.status not in [TaskStatus.COMPLETED, TaskStatus.CANCELLED]]
+
+
+def legacy_overdue(service, firm_id):
+    return [t for t in service._tasks.values() if t.firm_id == firm_id and t.is_overdue]
+
+
+def legacy_session(service, session_id):
+    return [t for t in service._tasks.values() if t.session_id == session_id and t.status != TaskStatus.COMPLETED]
+
+
+def legacy_subtasks(service, parent_id):
+    return [t for t in service._tasks.values() if t.parent_task_id == parent_id]
+
+
+def _populate(service, n, firms, staff, clients, rng):
+    statuses = list(TaskStatus)
+    start = time.perf_counter()
+    for i in range(n):
+        firm = rng.randrange(len(firms))
+        task = service.create_task(
+            firm_id=firms[firm],
+            title=f"task {i}",
+            category=rng.choice(list(TaskCategory)),
+            client_id=rng.choice(clients[firm]),
+            session_id=f"session-{rng.randrange(n // 4)}",
+            assigned_to=rng.choice(staff[firm]) if rng.random() < 0.9 else None,
+            priority=rng.choice(list(TaskPriority)),
+            due_date=TODAY + timedelta(days=rng.randint(-90, 60)),
+        )
+        # Busy season: most work is already done
+        if rng.random() < 0.7:
+            service.complete_task(task.id)
+        elif rng.random() < 0.5:
+            service.update_status(task.id, rng.choice(statuses[:4]))
+    return time.perf_counter() - start
+
+
+def _time(fn, rounds):
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return sorted(samples)[len(samples) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TaskService benchmark")
+    parser.add_argument("--tasks", type=int, default=300_000)
+    parser.add_argument("--firms", type=int, default=100)
+    parser.add_argument("--staff", type=int, default=20, help="Staff per firm")
+    parser.add_argument("--clients", type=int, default=500, help="Clients per firm")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)  # per-task log lines
+
+    rng = random.Random(23)
+    firms = [uuid4() for _ in range(args.firms)]
+    staff = [[uuid4() for _ in range(args.staff)] for _ in firms]
+    clients = [[uuid4() for _ in range(args.clients)] for _ in firms]
+    service = TaskService()
+    elapsed = _populate(service, args.tasks, firms, staff, clients, rng)
+    print(f"{args.tasks:,} tasks, {args.firms} firms ({elapsed / args.tasks * 1e6:.1f} us per "
+          f"create + status change incl. index upkeep)")
+
+    firm, user, client = firms[0], staff[0][0], clients[0][0]
+    session = next(t.session_id for t in service._tasks.values())
+    parent = service.create_task(firm_id=firm, title="parent")
+    for _ in range(5):
+        service.create_task(firm_id=firm, title="child", parent_task_id=parent.id)
+
+    assert [t.id for t in service.get_tasks_for_firm(firm)] == [t.id for t in legacy_tasks_for_firm(service, firm)]
+    assert len(service.get_overdue_tasks(firm)) == len(legacy_overdue(service, firm))
+
+    cases = [
+        ("firm tasks (open)",
+         lambda: legacy_tasks_for_firm(service, firm),
+         lambda: service.get_tasks_for_firm(firm)),
+        ("firm tasks, first 50",
+         lambda: legacy_tasks_for_firm(service, firm)[:50],
+         lambda: service.get_tasks_page(firm, limit=50)),
+        ("my tasks",
+         lambda: legacy_tasks_for_firm(service, firm, assigned_to=user),
+         lambda: service.get_my_tasks(firm, user)),
+        ("unassigned",
+         lambda: legacy_unassigned(service, firm),
+         lambda: service.get_unassigned_tasks(firm)),
+        ("overdue",
+         lambda: legacy_overdue(service, firm),
+         lambda: service.get_overdue_tasks(firm)),
+        ("client tasks",
+         lambda: legacy_tasks_for_firm(service, firm, client_id=client),
+         lambda: service.get_tasks_for_client(firm, client)),
+        ("session tasks",
+         lambda: legacy_session(service, session),
+         lambda: service.get_tasks_for_session(session)),
+        ("subtasks",
+         lambda: legacy_subtasks(service, parent.id),
+         lambda: service.get_subtasks(parent.id)),
+    ]
+
+    print(f"median of {args.rounds} rounds:")
+    for name, legacy, indexed in cases:
+        legacy_ms = _time(legacy, args.rounds)
+        indexed_ms = _time(indexed, args.rounds)
+        print(f"  {name:<21} legacy {legacy_ms:8.2f} ms | indexed {indexed_ms:7.3f} ms | "
+              f"{legacy_ms / indexed_ms:,.0f}x")
+
+
+if __name__ == "__main__":
+    main()
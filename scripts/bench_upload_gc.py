@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+"""
+Benchmark orphaned-upload cleanup with the upload reference index.
+
+Creates a temporary upload tree (default 100k files, half referenced), a
+session database with one document_processing row per referenced file, and
+times:
+  - the legacy check (two LIKE scans per file) on a sample, extrapolated
+  - the index-based dry run and real cleanup over the full tree
+
+Usage:
+    python scripts/bench_upload_gc.py
+    python scripts/bench_upload_gc.py --files 20000 --legacy-sample 200
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, "src")
+
+from database.upload_references import UploadReferenceIndex
+from tasks.data_retention import collect_orphaned_uploads
+
+
+def _legacy_is_referenced(conn, filepath):
+    """The per-file check the cleanup task used before the index."""
+    filename = os.path.basename(filepath)
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT COUNT(*) FROM document_processing WHERE result_json LIKE ?",
+        (f"%{filename}%",),
+    )
+    if cursor.fetchone()[0] > 0:
+        return True
+    cursor.execute(
+        "SELECT COUNT(*) FROM session_states WHERE data_json LIKE ?",
+        (f"%{filename}%",),
+    )
+    return cursor.fetchone()[0] > 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Orphaned upload GC benchmark")
+    parser.add_argument("--files", type=int, default=100_000)
+    parser.add_argument("--per-dir", type=int, default=50, help="Files per session directory")
+    parser.add_argument("--referenced", type=float, default=0.5, help="Share of files still referenced")
+    parser.add_argument("--legacy-sample", type=int, default=300)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        upload_dir = root / "uploads"
+        db_path = root / "sessions.db"
+        old = time.time() - 90 * 86400
+
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE TABLE session_states (session_id TEXT PRIMARY KEY, data_json TEXT)")
+        conn.execute(
+            "CREATE TABLE document_processing (document_id TEXT PRIMARY KEY, session_id TEXT, result_json TEXT)"
+        )
+
+        start = time.perf_counter()
+        paths, referenced, doc_rows = [], [], []
+        for i in range(args.files):
+            session = f"session-{i // args.per_dir:05d}"
+            path = upload_dir / session / f"doc-{i:08d}.pdf"
+            if i % args.per_dir == 0:
+                path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(b"%PDF")
+            os.utime(path, (old, old))
+            paths.append(path)
+            if (i % 100) < args.referenced * 100:
+                referenced.append(path)
+                doc_rows.append((f"doc-{i}", session, json.dumps({"file_path": str(path)})))
+        conn.executemany("INSERT INTO document_processing VALUES (?, ?, ?)", doc_rows)
+        conn.commit()
+
+        index = UploadReferenceIndex(db_path)
+        index.register_many(referenced, owner_type="document")
+        index.mark_backfilled()
+        print(f"setup:            {args.files:,} files, {len(referenced):,} referenced "
+              f"({time.perf_counter() - start:.1f}s)")
+
+        # Legacy: two LIKE scans per file, measured on a sample
+        sample = paths[:: max(1, len(paths) // args.legacy_sample)][: args.legacy_sample]
+        start = time.perf_counter()
+        for path in sample:
+            _legacy_is_referenced(conn, str(path))
+        per_file = (time.perf_counter() - start) / len(sample)
+        conn.close()
+        print(f"legacy check:     {per_file * 1000:.2f} ms/file -> ~{per_file * args.files:,.0f}s "
+              f"for {args.files:,} files (extrapolated from {len(sample)})")
+
+        cutoff = datetime.now(timezone.utc) - timedelta(days=30)
+
+        start = time.perf_counter()
+        report = collect_orphaned_uploads([str(upload_dir)], index, cutoff, dry_run=True)
+        dry = time.perf_counter() - start
+        print(f"index dry run:    {dry:.2f}s, {report['orphans_found']:,} orphans, "
+              f"{report['files_checked'] / dry:,.0f} files/s")
+
+        start = time.perf_counter()
+        report = collect_orphaned_uploads([str(upload_dir)], index, cutoff)
+        real = time.perf_counter() - start
+        print(f"index cleanup:    {real:.2f}s, {report['files_deleted']:,} deleted, "
+              f"{report['files_checked'] / real:,.0f} files/s")
+        print(f"speedup vs legacy (dry run): {per_file * args.files / dry:,.0f}x")
+
+
+if __name__ == "__main__":
+    main()
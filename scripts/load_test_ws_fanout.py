@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+"""
+Local load test for WebSocket fan-out in the realtime ConnectionManager.
+
+Registers thousands of simulated sockets in one firm, broadcasts a stream of
+events and reports per-frame delivery latency (broadcast call -> socket write).
+A configurable share of sockets is "slow" to show that stalled clients only
+affect their own queues.
+
+Usage:
+    python scripts/load_test_ws_fanout.py
+    python scripts/load_test_ws_fanout.py --sockets 5000 --events 50 --slow 50
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from uuid import uuid4
+
+# Add src to path
+sys.path.insert(0, "src")
+
+from realtime.connection_manager import ConnectionInfo, ConnectionManager
+from realtime.events import EventType, RealtimeEvent
+
+
+class SimulatedSocket:
+    """Socket stand-in that records when each frame was written."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.received = []
+
+    async def send_text(self, text):
+        # Healthy sockets still yield once, like a transport write would
+        await asyncio.sleep(self.latency)
+        self.received.append(time.perf_counter())
+
+    async def close(self):
+        pass
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run(args):
+    manager = ConnectionManager(
+        send_timeout=args.send_timeout,
+        outbound_queue_size=args.queue_size,
+    )
+    firm_id = uuid4()
+
+    sockets = []
+    for i in range(args.sockets):
+        slow = i < args.slow
+        ws = SimulatedSocket(latency=args.slow_latency if slow else random.uniform(0, args.jitter))
+        user_id = uuid4()
+        manager._connections[user_id] = ConnectionInfo(
+            websocket=ws,
+            user_id=user_id,
+            firm_id=firm_id,
+            user_email=f"load-{i}@example.com",
+            user_role="staff",
+        )
+        manager._firm_connections.setdefault(firm_id, set()).add(user_id)
+        sockets.append((ws, slow))
+
+    sent_at = []
+    start = time.perf_counter()
+    for n in range(args.events):
+        event = RealtimeEvent(
+            event_type=EventType.RETURN_UPDATED,
+            firm_id=firm_id,
+            data={"seq": n, "payload": "x" * args.payload_bytes},
+        )
+        sent_at.append(time.perf_counter())
+        await manager.broadcast_event(event, _via_pubsub=True)
+        await asyncio.sleep(args.interval)
+
+    # Only wait for the healthy sockets; slow ones are expected to lag or drop
+    deadline = time.perf_counter() + 30
+    while time.perf_counter() < deadline:
+        if all(len(ws.received) >= args.events for ws, slow in sockets if not slow):
+            break
+        await asyncio.sleep(0.005)
+    elapsed = time.perf_counter() - start
+
+    latencies = []
+    for ws, slow in sockets:
+        if slow:
+            continue
+        for seq, received_at in enumerate(ws.received):
+            latencies.append((received_at - sent_at[seq]) * 1000)
+
+    stats = manager.get_stats()["outbound"]
+    delivered = sum(len(ws.received) for ws, _ in sockets)
+
+    print(f"sockets:          {args.sockets} ({args.slow} slow)")
+    print(f"events:           {args.events}")
+    print(f"frames delivered: {delivered} in {elapsed:.2f}s ({delivered / elapsed:,.0f}/s)")
+    print(f"latency p50:      {statistics.median(latencies) if latencies else 0:.2f} ms")
+    print(f"latency p95:      {_percentile(latencies, 95):.2f} ms")
+    print(f"latency p99:      {_percentile(latencies, 99):.2f} ms")
+    print(f"latency max:      {max(latencies) if latencies else 0:.2f} ms")
+    print(f"dropped frames:   {stats['dropped']}")
+    print(f"send timeouts:    {stats['send_timeouts']}")
+
+    for connection in list(manager._connections.values()):
+        await manager._remove_connection(connection)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WebSocket fan-out load test")
+    parser.add_argument("--sockets", type=int, default=2000)
+    parser.add_argument("--events", type=int, default=20)
+    parser.add_argument("--slow", type=int, default=20, help="Number of stalled sockets")
+    parser.add_argument("--slow-latency", type=float, default=2.0, help="Seconds per write for slow sockets")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Max per-write latency for healthy sockets")
+    parser.add_argument("--interval", type=float, default=0.2, help="Seconds between broadcasts")
+    parser.add_argument("--payload-bytes", type=int, default=512)
+    parser.add_argument("--send-timeout", type=float, default=1.0)
+    parser.add_argument("--queue-size", type=int, default=8)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
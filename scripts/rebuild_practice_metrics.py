@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Rebuild or verify the stored practice intelligence aggregates.
+
+The dashboard reads per-tenant, per-year accumulators that the return
+save/delete hooks keep current. Run this after bulk imports, data fixes
+or migrations that bypass those hooks, or with --check to report drift.
+
+Usage:
+    python scripts/rebuild_practice_metrics.py --tenant <firm_id>
+    python scripts/rebuild_practice_metrics.py --all
+    python scripts/rebuild_practice_metrics.py --all --check
+
+Exit codes:
+    0: Success (rebuilt, or all checked tenants consistent)
+    1: --check found tenants whose aggregates drifted
+    2: Failure
+"""
+
+import sys
+import logging
+import asyncio
+from datetime import datetime
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def main():
+    """Rebuild (or check) the aggregates of the requested tenants."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Rebuild practice intelligence aggregates")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--tenant", action="append", help="Firm ID to process (repeatable)")
+    target.add_argument("--all", action="store_true", help="Process every firm with returns")
+    parser.add_argument("--check", action="store_true", help="Compare against a full recomputation instead of rebuilding")
+    parser.add_argument("--current-year", type=int, default=datetime.now().year, help="Current tax year for --check")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Verbose logging")
+    args = parser.parse_args()
+
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+
+    try:
+        from database.async_engine import get_async_session
+        from cpa_panel.practice_intelligence.aggregates import (
+            get_portfolio_aggregate_store,
+            list_portfolio_tenants,
+            load_portfolio_records,
+        )
+
+        store = get_portfolio_aggregate_store()
+        async with get_async_session() as session:
+            tenants = args.tenant or await list_portfolio_tenants(session)
+            drifted = []
+            for tenant_id in tenants:
+                records = await load_portfolio_records(session, tenant_id)
+                if args.check:
+                    result = store.check_consistency(
+                        tenant_id, engagements=records, returns=records,
+                        current_year=args.current_year, prior_year=args.current_year - 1,
+                    )
+                    if result["consistent"]:
+                        logger.info(f"✓ {tenant_id}: consistent")
+                    else:
+                        drifted.append(tenant_id)
+                        logger.warning(f"✗ {tenant_id}: drifted in {sorted(result['differences'])}")
+                else:
+                    summary = store.rebuild(tenant_id, engagements=records, returns=records)
+                    logger.info(f"✓ {tenant_id}: {summary['returns']} returns, {summary['tax_years']} tax years")
+
+        logger.info(f"Processed {len(tenants)} tenant(s)")
+        return 1 if drifted else 0
+
+    except Exception as e:
+        logger.error(f"✗ Unexpected error: {e}", exc_info=True)
+        return 2
+
+
+if __name__ == "__main__":
+    exit_code = asyncio.run(main())
+    sys.exit(exit_code)
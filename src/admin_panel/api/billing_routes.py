@@ -31,8 +31,10 @@ from ..auth.rbac import (
     require_permission,
 )
 from ..models.user import UserPermission
+from ..services.platform_metrics import queue_subscription_metric_events
 from database.async_engine import get_async_session, get_db_session
 from calculator.decimal_math import money, to_decimal
+from rbac.firm_status_cache import notify_firm_status_changed
 
 router = APIRouter(prefix="/billing", tags=["Billing"])
 logger = logging.getLogger(__name__)
@@ -1095,6 +1097,10 @@ async def upgrade_plan(
         "max_team": target_row[3],
         "updated_at": now.isoformat(),
     })
+    # Plan and billing cycle feed the materialized platform metrics
+    await queue_subscription_metric_events(
+        session, "s.subscription_id = :subscription_id", {"subscription_id": current_row[0]}
+    )
 
     # Log the upgrade event
     event_id = str(uuid4())
@@ -1621,7 +1627,9 @@ async def stripe_webhook(
                 text("UPDATE firms SET subscription_status = 'active', updated_at = :now WHERE firm_id = :firm_id"),
                 {"firm_id": firm_id, "now": now},
             )
+            await queue_subscription_metric_events(session, "s.firm_id = :firm_id", {"firm_id": firm_id})
             await session.commit()
+            await notify_firm_status_changed(firm_id)
             logger.info(f"Subscription activated for firm {firm_id}")
 
     elif event_type == "invoice.paid":
@@ -1662,6 +1670,9 @@ async def stripe_webhook(
                 """),
                 {"customer_id": customer_id, "now": now},
             )
+            await queue_subscription_metric_events(
+                session, "s.stripe_customer_id = :customer_id", {"customer_id": customer_id}
+            )
             await session.commit()
             logger.warning(f"Payment failed for customer {customer_id}")
 
@@ -1677,6 +1688,9 @@ async def stripe_webhook(
                 """),
                 {"sub_id": stripe_sub_id, "status": sub_status or "active", "now": now},
             )
+            await queue_subscription_metric_events(
+                session, "s.stripe_subscription_id = :sub_id", {"sub_id": stripe_sub_id}
+            )
             await session.commit()
 
     elif event_type == "customer.subscription.deleted":
@@ -1696,7 +1710,12 @@ async def stripe_webhook(
                     text("UPDATE firms SET subscription_status = 'cancelled', updated_at = :now WHERE firm_id = :firm_id"),
                     {"firm_id": firm_id, "now": now},
                 )
+            await queue_subscription_metric_events(
+                session, "s.stripe_subscription_id = :sub_id", {"sub_id": stripe_sub_id}
+            )
             await session.commit()
+            if firm_id:
+                await notify_firm_status_changed(firm_id)
             logger.info(f"Subscription cancelled: {stripe_sub_id}")
 
     return {"status": "received", "type": event_type}
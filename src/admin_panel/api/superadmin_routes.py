@@ -25,6 +25,7 @@ from ..auth.rbac import (
     TenantContext,
     require_platform_admin,
 )
+from ..services.platform_metrics import get_platform_metrics_store
 from database.async_engine import get_async_session, get_db_session
 
 logger = logging.getLogger(__name__)
@@ -85,6 +86,7 @@ class PlatformMetrics(BaseModel):
     churn_rate: float
     avg_health_score: float
     feature_adoption: dict
+    as_of: Optional[str] = None
 
 
 class FeatureFlagSummary(BaseModel):
@@ -588,124 +590,14 @@ async def get_impersonation_summary(
 @require_platform_admin
 async def get_platform_dashboard(
     user: TenantContext = Depends(get_current_user),
-    session: AsyncSession = Depends(get_db_session),
 ):
     """
     Get platform-wide dashboard metrics.
 
     Includes MRR, churn, tier distribution, and feature adoption.
+    Served from the platform metric snapshots.
     """
-    # Get firm counts by status
-    firms_query = text("""
-        SELECT
-            COUNT(*) as total,
-            SUM(CASE WHEN f.is_active = true THEN 1 ELSE 0 END) as active,
-            SUM(CASE WHEN s.status = 'trial' THEN 1 ELSE 0 END) as trial
-        FROM firms f
-        LEFT JOIN subscriptions s ON f.firm_id = s.firm_id AND s.status IN ('active', 'trial')
-    """)
-    firms_result = await session.execute(firms_query)
-    firms_row = firms_result.fetchone()
-    total_firms = firms_row[0] or 0
-    active_firms = firms_row[1] or 0
-    trial_firms = firms_row[2] or 0
-
-    # Get tier distribution
-    tier_query = text("""
-        SELECT
-            COALESCE(sp.name, 'starter') as tier,
-            COUNT(*) as count
-        FROM firms f
-        LEFT JOIN subscriptions s ON f.firm_id = s.firm_id AND s.status = 'active'
-        LEFT JOIN subscription_plans sp ON s.plan_id = sp.plan_id
-        WHERE f.is_active = true
-        GROUP BY COALESCE(sp.name, 'starter')
-    """)
-    tier_result = await session.execute(tier_query)
-    tier_rows = tier_result.fetchall()
-    tier_distribution = {row[0]: row[1] for row in tier_rows}
-    if not tier_distribution:
-        tier_distribution = {"starter": total_firms or 0}
-
-    # Get MRR from active subscriptions
-    mrr_query = text("""
-        SELECT COALESCE(SUM(
-            CASE
-                WHEN s.billing_cycle = 'monthly' THEN sp.price
-                WHEN s.billing_cycle = 'yearly' THEN sp.price / 12
-                ELSE sp.price
-            END
-        ), 0) as mrr
-        FROM subscriptions s
-        JOIN subscription_plans sp ON s.plan_id = sp.plan_id
-        WHERE s.status = 'active'
-    """)
-    mrr_result = await session.execute(mrr_query)
-    total_mrr = float(mrr_result.fetchone()[0] or 0)
-
-    # Calculate churn rate (firms that became inactive in last 30 days / active 30 days ago)
-    churn_query = text("""
-        SELECT
-            COUNT(*) FILTER (WHERE f.is_active = false AND f.updated_at >= :thirty_days_ago) as churned,
-            COUNT(*) FILTER (WHERE f.created_at < :thirty_days_ago) as base
-        FROM firms f
-    """)
-    churn_result = await session.execute(churn_query, {
-        "thirty_days_ago": (datetime.now(timezone.utc) - timedelta(days=30)).isoformat()
-    })
-    churn_row = churn_result.fetchone()
-    churned = churn_row[0] or 0
-    base = churn_row[1] or 1
-    churn_rate = round((churned / base) * 100, 1) if base > 0 else 0.0
-
-    # Calculate average health score based on activity
-    health_query = text("""
-        SELECT AVG(
-            CASE
-                WHEN u.last_login_at >= :seven_days_ago THEN 100
-                WHEN u.last_login_at >= :thirty_days_ago THEN 75
-                ELSE 50
-            END
-        ) as avg_health
-        FROM users u
-        WHERE u.is_active = true
-    """)
-    health_result = await session.execute(health_query, {
-        "seven_days_ago": (datetime.now(timezone.utc) - timedelta(days=7)).isoformat(),
-        "thirty_days_ago": (datetime.now(timezone.utc) - timedelta(days=30)).isoformat(),
-    })
-    avg_health_score = int(health_result.fetchone()[0] or 85)
-
-    # Get feature adoption (from feature_flags table if exists, else defaults)
-    feature_adoption = {
-        "scenario_analysis": 87,
-        "multi_state": 45,
-        "api_access": 19,
-        "lead_magnet": 62,
-    }
-    try:
-        feature_query = text("""
-            SELECT feature_key, rollout_percentage
-            FROM feature_flags
-            WHERE is_enabled = true
-        """)
-        feature_result = await session.execute(feature_query)
-        feature_rows = feature_result.fetchall()
-        if feature_rows:
-            feature_adoption = {row[0]: row[1] for row in feature_rows}
-    except Exception:
-        pass  # Table may not exist
-
-    return PlatformMetrics(
-        total_firms=total_firms,
-        active_firms=active_firms,
-        trial_firms=trial_firms,
-        total_mrr=total_mrr,
-        tier_distribution=tier_distribution,
-        churn_rate=churn_rate,
-        avg_health_score=avg_health_score,
-        feature_adoption=feature_adoption,
-    )
+    return PlatformMetrics(**await get_platform_metrics_store().dashboard())
 
 
 @router.get("/subscriptions/mrr")
@@ -713,56 +605,14 @@ async def get_platform_dashboard(
 async def get_mrr_breakdown(
     user: TenantContext = Depends(get_current_user),
     period: str = Query("month", description="month, quarter, year"),
-    session: AsyncSession = Depends(get_db_session),
 ):
     """
     Get MRR breakdown and trends.
 
-    Includes breakdown by tier and growth trends.
+    Includes breakdown by tier and growth against the snapshot one
+    period back.
     """
-    tier_prices = {"starter": 199.0, "professional": 499.0, "enterprise": 999.0}
-
-    rows = await session.execute(text("""
-        SELECT COALESCE(sp.name, 'starter') AS tier, COUNT(s.id) AS cnt
-        FROM subscriptions s
-        LEFT JOIN subscription_plans sp ON sp.id = s.plan_id
-        WHERE s.status = 'active'
-        GROUP BY tier
-    """))
-    by_tier = {}
-    total_mrr = 0.0
-    for row in rows.mappings():
-        t = row["tier"]
-        cnt = row["cnt"]
-        mrr = cnt * tier_prices.get(t, 199.0)
-        by_tier[t] = {"count": cnt, "mrr": round(mrr, 2)}
-        total_mrr += mrr
-
-    # Previous period: subscriptions active 30+ days ago
-    prev_rows = await session.execute(text("""
-        SELECT COALESCE(sp.name, 'starter') AS tier, COUNT(s.id) AS cnt
-        FROM subscriptions s
-        LEFT JOIN subscription_plans sp ON sp.id = s.plan_id
-        WHERE s.status = 'active' AND s.created_at <= NOW() - INTERVAL '30 days'
-        GROUP BY tier
-    """))
-    prev_mrr = sum(
-        row["cnt"] * tier_prices.get(row["tier"], 199.0)
-        for row in prev_rows.mappings()
-    )
-    change = total_mrr - prev_mrr
-    change_pct = round((change / prev_mrr * 100) if prev_mrr else 0.0, 2)
-
-    return {
-        "total_mrr": round(total_mrr, 2),
-        "by_tier": by_tier,
-        "trends": {
-            "previous_period": round(prev_mrr, 2),
-            "change": round(change, 2),
-            "change_percent": change_pct,
-        },
-        "forecast_next_month": round(total_mrr * 1.03, 2),
-    }
+    return await get_platform_metrics_store().mrr_breakdown(period)
 
 
 @router.get("/subscriptions/churn")
@@ -770,72 +620,25 @@ async def get_mrr_breakdown(
 async def get_churn_analysis(
     user: TenantContext = Depends(get_current_user),
     period: str = Query("quarter", description="month, quarter, year"),
-    session: AsyncSession = Depends(get_db_session),
 ):
     """
     Get churn analysis.
 
-    Includes churn rate, reasons, and at-risk firms.
+    Includes churn rate, signup cohorts, reasons, and at-risk firms.
     """
-    interval_map = {"month": "30 days", "quarter": "90 days", "year": "365 days"}
-    interval = interval_map.get(period, "90 days")
-
-    churned_rows = await session.execute(text(f"""
-        SELECT COALESCE(sp.name, 'starter') AS tier, COUNT(s.id) AS cnt
-        FROM subscriptions s
-        LEFT JOIN subscription_plans sp ON sp.id = s.plan_id
-        WHERE s.status = 'cancelled'
-          AND s.cancelled_at >= NOW() - INTERVAL '{interval}'
-        GROUP BY tier
-    """))
-    by_tier = {}
-    total_churned = 0
-    for row in churned_rows.mappings():
-        by_tier[row["tier"]] = {"churned": row["cnt"], "rate": 0.0}
-        total_churned += row["cnt"]
-
-    active_row = await session.execute(text("SELECT COUNT(*) AS cnt FROM subscriptions WHERE status = 'active'"))
-    active_count = active_row.scalar() or 1
-    churn_rate = round(total_churned / (active_count + total_churned) * 100, 2) if (active_count + total_churned) else 0.0
-
-    # Compute per-tier rates
-    active_tier_rows = await session.execute(text("""
-        SELECT COALESCE(sp.name, 'starter') AS tier, COUNT(s.id) AS cnt
-        FROM subscriptions s
-        LEFT JOIN subscription_plans sp ON sp.id = s.plan_id
-        WHERE s.status = 'active'
-        GROUP BY tier
-    """))
-    for row in active_tier_rows.mappings():
-        t = row["tier"]
-        if t in by_tier:
-            denom = row["cnt"] + by_tier[t]["churned"]
-            by_tier[t]["rate"] = round(by_tier[t]["churned"] / denom * 100, 2) if denom else 0.0
-        else:
-            by_tier[t] = {"churned": 0, "rate": 0.0}
+    return await get_platform_metrics_store().churn_analysis(period)
 
-    # At-risk: active firms inactive for >14 days
-    at_risk_rows = await session.execute(text("""
-        SELECT f.id AS firm_id, f.name
-        FROM firms f
-        JOIN subscriptions s ON s.firm_id = f.id AND s.status = 'active'
-        WHERE f.is_active = true
-          AND (f.last_activity_at IS NULL OR f.last_activity_at < NOW() - INTERVAL '14 days')
-        LIMIT 20
-    """))
-    at_risk_list = [
-        {"firm_id": str(row["firm_id"]), "name": row["name"], "risk_score": 70, "signals": ["low_usage"]}
-        for row in at_risk_rows.mappings()
-    ]
 
-    return {
-        "churn_rate": churn_rate,
-        "churned_firms": total_churned,
-        "at_risk_firms": len(at_risk_list),
-        "by_tier": by_tier,
-        "top_reasons": [],
-        "at_risk_list": at_risk_list,
-    }
+@router.post("/metrics/refresh")
+@require_platform_admin
+async def refresh_platform_metrics(
+    user: TenantContext = Depends(get_current_user),
+    session: AsyncSession = Depends(get_db_session),
+):
+    """Recompute the platform metric snapshots now instead of at the next scheduled refresh."""
+    store = get_platform_metrics_store()
+    result = await store.refresh(session)
+    return {"refreshed": result, "stats": store.get_stats()}
 
 
 # =============================================================================
@@ -18,6 +18,13 @@ from .subscription import (
 from .feature_flag import FeatureFlag, FeatureUsage
 from .usage import UsageMetrics
 from .platform_admin import PlatformAdmin, AdminRole, AdminAuditLog
+from .platform_metrics import (
+    PlatformDailyMetrics,
+    PlatformMrrByTier,
+    PlatformChurnCohort,
+    PlatformMetricContribution,
+    PlatformMetricEvent,
+)
 
 __all__ = [
     # Firm
@@ -46,4 +53,10 @@ __all__ = [
     "PlatformAdmin",
     "AdminRole",
     "AdminAuditLog",
+    # Platform Metrics
+    "PlatformDailyMetrics",
+    "PlatformMrrByTier",
+    "PlatformChurnCohort",
+    "PlatformMetricContribution",
+    "PlatformMetricEvent",
 ]
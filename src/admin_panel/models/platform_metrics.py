@@ -0,0 +1,121 @@
+"""
+Platform Metrics Models - Materialized snapshots for the superadmin dashboard.
+
+Tables maintained by admin_panel.services.platform_metrics:
+- platform_daily_metrics: firm and user counts per day
+- platform_mrr_by_tier: subscriptions, trials and MRR per (day, tier)
+- platform_churn_cohorts: subscriptions started/cancelled per
+  (signup month, tier, day)
+- platform_metric_contributions: what each firm and subscription currently
+  contributes to the snapshots, so a change can be applied as a delta
+- platform_metric_events: outbox of firms whose firm or subscription rows
+  changed, queued in the same transaction as the change
+
+Days are stored as 'YYYY-MM-DD' and months as 'YYYY-MM' (UTC).
+"""
+
+from datetime import datetime, timezone
+
+from sqlalchemy import (
+    Column, String, Integer, DateTime, Numeric, Index, event
+)
+from sqlalchemy.orm import Session
+
+from database.models import Base
+from .firm import Firm
+from .subscription import Subscription
+
+
+class PlatformDailyMetrics(Base):
+    """Platform-wide firm and user counts, one row per day."""
+    __tablename__ = "platform_daily_metrics"
+
+    day = Column(String(10), primary_key=True)
+
+    total_firms = Column(Integer, nullable=False, default=0, comment="Not deleted")
+    active_firms = Column(Integer, nullable=False, default=0, comment="Not deleted and is_active")
+    trial_firms = Column(Integer, nullable=False, default=0, comment="Trialing subscriptions")
+    total_users = Column(Integer, nullable=False, default=0, comment="Active users")
+    users_active_7d = Column(Integer, nullable=False, default=0, comment="Logged in within 7 days")
+    users_active_30d = Column(Integer, nullable=False, default=0, comment="Logged in within 30 days")
+
+    refreshed_at = Column(DateTime, nullable=True, comment="Last full refresh of this row")
+
+
+class PlatformMrrByTier(Base):
+    """Active subscriptions, trials and MRR per tier, one row per (day, tier)."""
+    __tablename__ = "platform_mrr_by_tier"
+
+    day = Column(String(10), primary_key=True)
+    tier = Column(String(50), primary_key=True)
+
+    subscriptions = Column(Integer, nullable=False, default=0, comment="Active subscriptions")
+    trials = Column(Integer, nullable=False, default=0, comment="Trialing subscriptions")
+    mrr = Column(Numeric(14, 2), nullable=False, default=0)
+
+
+class PlatformChurnCohort(Base):
+    """
+    Subscriptions started and cancelled on a day, by signup month and tier.
+
+    Summing over day gives the cohort view; summing cancellations over a
+    day range gives churn for a period.
+    """
+    __tablename__ = "platform_churn_cohorts"
+
+    cohort_month = Column(String(7), primary_key=True)
+    tier = Column(String(50), primary_key=True)
+    day = Column(String(10), primary_key=True)
+
+    started = Column(Integer, nullable=False, default=0)
+    cancelled = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("ix_platform_churn_cohorts_day", "day"),
+    )
+
+
+class PlatformMetricContribution(Base):
+    """Current snapshot contribution of one firm or subscription."""
+    __tablename__ = "platform_metric_contributions"
+
+    entity_type = Column(String(20), primary_key=True, comment="firm, subscription")
+    entity_id = Column(String(36), primary_key=True)
+    firm_id = Column(String(36), nullable=False)
+
+    tier = Column(String(50), nullable=False, default="")
+    status = Column(String(20), nullable=False, comment="active, inactive, trial, cancelled, other")
+    monthly_amount = Column(Numeric(12, 2), nullable=False, default=0)
+    cohort_month = Column(String(7), nullable=False, default="")
+
+    __table_args__ = (
+        Index("ix_platform_metric_contributions_firm", "firm_id"),
+    )
+
+
+class PlatformMetricEvent(Base):
+    """A firm whose firm or subscription rows changed, pending materialization."""
+    __tablename__ = "platform_metric_events"
+
+    event_id = Column(Integer, primary_key=True, autoincrement=True)
+    firm_id = Column(String(36), nullable=False)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+
+# =============================================================================
+# EVENT LISTENERS
+# =============================================================================
+
+@event.listens_for(Session, "before_flush")
+def queue_platform_metric_events(session, flush_context, instances):
+    """Queue an outbox row for every firm whose Firm or Subscription rows change."""
+    firm_ids = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if not isinstance(obj, (Firm, Subscription)):
+            continue
+        if obj in session.dirty and not session.is_modified(obj, include_collections=False):
+            continue
+        if obj.firm_id is not None:
+            firm_ids.add(str(obj.firm_id))
+    for firm_id in sorted(firm_ids):
+        session.add(PlatformMetricEvent(firm_id=firm_id))
@@ -7,6 +7,7 @@ Business logic for:
 - Billing & subscriptions
 - AI-driven alerts
 - Compliance & audit
+- Platform metric snapshots
 """
 
 from .firm_service import FirmService
@@ -14,6 +15,7 @@ from .team_service import TeamService
 from .billing_service import BillingService
 from .alert_service import AlertService
 from .audit_service import AuditService
+from .platform_metrics import PlatformMetricsStore, get_platform_metrics_store
 
 __all__ = [
     "FirmService",
@@ -21,4 +23,6 @@ __all__ = [
     "BillingService",
     "AlertService",
     "AuditService",
+    "PlatformMetricsStore",
+    "get_platform_metrics_store",
 ]
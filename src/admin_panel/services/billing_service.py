@@ -28,6 +28,7 @@ from ..models.subscription import (
 )
 from ..models.firm import Firm
 from ..models.usage import UsageMetrics
+from rbac.firm_status_cache import notify_firm_status_changed
 
 
 logger = logging.getLogger(__name__)
@@ -173,6 +174,7 @@ class BillingService:
             firm.max_clients = plan.max_clients
 
         await self.db.commit()
+        await notify_firm_status_changed(firm_id)
         logger.info(f"Created subscription {subscription_id} for firm {firm_id}")
 
         return await self.get_subscription(firm_id)
@@ -292,6 +294,7 @@ class BillingService:
                 firm.subscription_status = "canceled"
 
             await self.db.commit()
+            await notify_firm_status_changed(firm_id)
 
             return {
                 "status": "canceled",
@@ -349,6 +352,7 @@ class BillingService:
             firm.subscription_status = "active"
 
         await self.db.commit()
+        await notify_firm_status_changed(firm_id)
 
         return {"status": "reactivated"}
 
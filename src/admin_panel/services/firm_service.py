@@ -19,6 +19,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from ..models.firm import Firm, FirmSettings
 from ..models.user import User
 from ..models.subscription import Subscription, SubscriptionPlan
+from rbac.firm_status_cache import notify_firm_status_changed
 
 
 logger = logging.getLogger(__name__)
@@ -184,6 +185,7 @@ class FirmService:
         firm.updated_at = datetime.now(timezone.utc)
 
         await self.db.commit()
+        await notify_firm_status_changed(firm_id)
         logger.info(f"Soft deleted firm {firm_id}")
 
         return True
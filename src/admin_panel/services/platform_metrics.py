@@ -0,0 +1,865 @@
+"""
+Platform Metrics Service - Materialized metrics for the superadmin dashboard.
+
+The superadmin /dashboard, /subscriptions/mrr and /subscriptions/churn
+endpoints read snapshot tables (see admin_panel.models.platform_metrics)
+instead of aggregating firms, users and subscriptions on every request:
+
+- refresh(): recomputes today's snapshot rows, the churn cohorts and the
+  per-firm/per-subscription contributions from the source tables. Runs
+  hourly from tasks.platform_metrics, and on the first read.
+- apply_pending_events(): drains platform_metric_events. Each queued firm
+  is reloaded with its subscriptions and diffed against the stored
+  contributions; only the difference is applied to today's rows. Runs
+  every minute from tasks.platform_metrics.
+- dashboard() / mrr_breakdown() / churn_analysis(): run their snapshot
+  queries concurrently, one session each, behind a short TTL cache.
+
+Firm and subscription counts, MRR and churn follow events; user counts
+change on refresh only.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.async_engine import get_async_session
+
+logger = logging.getLogger(__name__)
+
+PLATFORM_METRICS_CACHE_TTL = float(os.environ.get("PLATFORM_METRICS_CACHE_TTL", "30"))
+PLATFORM_METRICS_EVENT_BATCH = int(os.environ.get("PLATFORM_METRICS_EVENT_BATCH", "1000"))
+
+# Postgres advisory lock serializing refresh and event application
+PLATFORM_METRICS_LOCK_KEY = 0x504D4554
+
+DEFAULT_TIER = "starter"
+PERIOD_DAYS = {"month": 30, "quarter": 90, "year": 365}
+AT_RISK_INACTIVE_DAYS = 14
+COHORT_MONTHS = 12
+
+DEFAULT_FEATURE_ADOPTION = {
+    "scenario_analysis": 87,
+    "multi_state": 45,
+    "api_access": 19,
+    "lead_magnet": 62,
+}
+
+_CENTS = Decimal("0.01")
+_TRIAL_STATUSES = ("trialing", "trial")
+_CANCELLED_STATUSES = ("cancelled", "canceled")
+_ANNUAL_CYCLES = ("annual", "yearly")
+
+# SQL versions of subscription_status_class() and monthly_amount()
+_STATUS_CLASS_SQL = """CASE
+    WHEN LOWER(s.status) = 'active' THEN 'active'
+    WHEN LOWER(s.status) IN ('trialing', 'trial') THEN 'trial'
+    WHEN LOWER(s.status) IN ('cancelled', 'canceled') THEN 'cancelled'
+    ELSE 'other' END"""
+_MONTHLY_AMOUNT_SQL = """ROUND(CASE
+    WHEN LOWER(s.billing_cycle) IN ('annual', 'yearly') THEN COALESCE(sp.annual_price, 0) / 12.0
+    ELSE COALESCE(sp.monthly_price, 0) END, 2)"""
+
+_LATEST_DAILY_SQL = """
+    SELECT * FROM platform_daily_metrics
+    WHERE day = (SELECT MAX(day) FROM platform_daily_metrics)
+"""
+_TIERS_AS_OF_SQL = """
+    SELECT tier, subscriptions, trials, mrr FROM platform_mrr_by_tier
+    WHERE day = (SELECT MAX(day) FROM platform_mrr_by_tier WHERE day <= :as_of)
+"""
+
+
+# =============================================================================
+# CONTRIBUTIONS
+# =============================================================================
+
+def subscription_status_class(status: Any) -> str:
+    """Bucket a subscription status: active, trial, cancelled or other."""
+    status = str(getattr(status, "value", status) or "").lower()
+    if status == "active":
+        return "active"
+    if status in _TRIAL_STATUSES:
+        return "trial"
+    if status in _CANCELLED_STATUSES:
+        return "cancelled"
+    return "other"
+
+
+def monthly_amount(monthly_price: Any, annual_price: Any, billing_cycle: Any) -> Decimal:
+    """Monthly recurring revenue of one subscription, rounded to cents."""
+    cycle = str(getattr(billing_cycle, "value", billing_cycle) or "").lower()
+    if cycle in _ANNUAL_CYCLES:
+        amount = _money(annual_price) / 12
+    else:
+        amount = _money(monthly_price)
+    return amount.quantize(_CENTS, rounding=ROUND_HALF_UP)
+
+
+def _money(value: Any) -> Decimal:
+    return Decimal(str(value)) if value is not None else Decimal("0")
+
+
+@dataclass(frozen=True)
+class Contribution:
+    """What one firm or subscription adds to the snapshot tables."""
+    entity_type: str  # firm, subscription
+    entity_id: str
+    firm_id: str
+    tier: str = ""
+    status: str = ""
+    monthly_amount: Decimal = Decimal("0")
+    cohort_month: str = ""
+
+    @property
+    def key(self) -> Tuple[str, str]:
+        return (self.entity_type, self.entity_id)
+
+
+@dataclass
+class SnapshotDelta:
+    """Changes to today's snapshot rows."""
+    daily: Dict[str, int] = field(default_factory=lambda: {"total_firms": 0, "active_firms": 0, "trial_firms": 0})
+    # tier -> [subscriptions, trials, mrr]
+    tiers: Dict[str, List[Any]] = field(default_factory=dict)
+    # (cohort_month, tier) -> [started, cancelled]
+    cohorts: Dict[Tuple[str, str], List[int]] = field(default_factory=dict)
+
+    def add(self, contribution: Contribution, sign: int) -> None:
+        if contribution.entity_type == "firm":
+            self.daily["total_firms"] += sign
+            if contribution.status == "active":
+                self.daily["active_firms"] += sign
+            return
+        tier = self.tiers.setdefault(contribution.tier, [0, 0, Decimal("0")])
+        if contribution.status == "active":
+            tier[0] += sign
+            tier[2] += sign * contribution.monthly_amount
+        elif contribution.status == "trial":
+            tier[1] += sign
+            self.daily["trial_firms"] += sign
+
+    def count(self, contribution: Contribution, started: int = 0, cancelled: int = 0) -> None:
+        if not contribution.cohort_month:
+            return
+        cohort = self.cohorts.setdefault((contribution.cohort_month, contribution.tier), [0, 0])
+        cohort[0] += started
+        cohort[1] += cancelled
+
+
+def contribution_delta(
+    stored: Dict[Tuple[str, str], Contribution],
+    current: Dict[Tuple[str, str], Contribution],
+) -> SnapshotDelta:
+    """
+    Snapshot changes that turn the stored contributions into the current ones.
+
+    A subscription seen for the first time counts as started today; one
+    moving into a cancelled status counts as cancelled today. Reactivating
+    a subscription does not retract its cancellation until the next refresh.
+    """
+    delta = SnapshotDelta()
+    for key, before in stored.items():
+        if current.get(key) != before:
+            delta.add(before, -1)
+    for key, after in current.items():
+        before = stored.get(key)
+        if before != after:
+            delta.add(after, 1)
+        if after.entity_type != "subscription":
+            continue
+        if before is None:
+            delta.count(after, started=1)
+        elif after.status == "cancelled" and before.status != "cancelled":
+            delta.count(after, cancelled=1)
+    return delta
+
+
+# =============================================================================
+# STORE
+# =============================================================================
+
+class PlatformMetricsStore:
+    """
+    Maintains and serves the superadmin platform metric snapshots.
+
+    Write methods take the caller's session and commit it. Reads open one
+    session per query through ``session_factory`` so they can run
+    concurrently, and cache each response for ``cache_ttl`` seconds.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Any]] = None,
+        cache_ttl: float = PLATFORM_METRICS_CACHE_TTL,
+    ):
+        self._session_factory = session_factory or get_async_session
+        self.cache_ttl = cache_ttl
+        # key -> (value, expires_at)
+        self._cache: Dict[Tuple, Tuple[Any, float]] = {}
+        self._inflight: Dict[Tuple, asyncio.Future] = {}
+
+        self._hits = 0
+        self._misses = 0
+        self._refreshes = 0
+        self._events_applied = 0
+        self._last_refresh_ms = 0.0
+
+    # =========================================================================
+    # MATERIALIZATION
+    # =========================================================================
+
+    async def refresh(self, session: AsyncSession, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Recompute today's snapshot rows, the cohorts and all contributions.
+
+        Events queued before the refresh started are covered by it and
+        removed; later ones are applied by the next apply_pending_events().
+        """
+        start = time.perf_counter()
+        now = now or datetime.now(timezone.utc)
+        day = now.strftime("%Y-%m-%d")
+        moment = now.astimezone(timezone.utc).replace(tzinfo=None)
+        dialect = session.get_bind().dialect.name
+
+        await self._lock(session, dialect)
+        last_event = (await session.execute(text("SELECT MAX(event_id) FROM platform_metric_events"))).scalar()
+
+        await session.execute(text("DELETE FROM platform_metric_contributions"))
+        await session.execute(text("""
+            INSERT INTO platform_metric_contributions
+                (entity_type, entity_id, firm_id, tier, status, monthly_amount, cohort_month)
+            SELECT 'firm', CAST(f.firm_id AS VARCHAR(36)), CAST(f.firm_id AS VARCHAR(36)), '',
+                   CASE WHEN f.is_active THEN 'active' ELSE 'inactive' END, 0, ''
+            FROM firms f
+            WHERE f.deleted_at IS NULL
+        """))
+        await session.execute(text(f"""
+            INSERT INTO platform_metric_contributions
+                (entity_type, entity_id, firm_id, tier, status, monthly_amount, cohort_month)
+            SELECT 'subscription', CAST(s.subscription_id AS VARCHAR(36)), CAST(s.firm_id AS VARCHAR(36)),
+                   COALESCE(sp.code, '{DEFAULT_TIER}'), {_STATUS_CLASS_SQL}, {_MONTHLY_AMOUNT_SQL},
+                   COALESCE({_date_sql(dialect, 's.created_at', month=True)}, '')
+            FROM subscriptions s
+            LEFT JOIN subscription_plans sp ON sp.plan_id = s.plan_id
+        """))
+
+        counts = {
+            (row[0], row[1]): row[2]
+            for row in await session.execute(text("""
+                SELECT entity_type, status, COUNT(*) FROM platform_metric_contributions
+                GROUP BY entity_type, status
+            """))
+        }
+        users = (await session.execute(text("""
+            SELECT COUNT(*),
+                   COALESCE(SUM(CASE WHEN last_login_at >= :seven_days_ago THEN 1 ELSE 0 END), 0),
+                   COALESCE(SUM(CASE WHEN last_login_at >= :thirty_days_ago THEN 1 ELSE 0 END), 0)
+            FROM users
+            WHERE is_active = true
+        """), {
+            "seven_days_ago": moment - timedelta(days=7),
+            "thirty_days_ago": moment - timedelta(days=30),
+        })).fetchone()
+
+        await session.execute(text("DELETE FROM platform_daily_metrics WHERE day = :day"), {"day": day})
+        await session.execute(text("""
+            INSERT INTO platform_daily_metrics
+                (day, total_firms, active_firms, trial_firms, total_users,
+                 users_active_7d, users_active_30d, refreshed_at)
+            VALUES (:day, :total_firms, :active_firms, :trial_firms, :total_users,
+                    :users_active_7d, :users_active_30d, :refreshed_at)
+        """), {
+            "day": day,
+            "total_firms": counts.get(("firm", "active"), 0) + counts.get(("firm", "inactive"), 0),
+            "active_firms": counts.get(("firm", "active"), 0),
+            "trial_firms": counts.get(("subscription", "trial"), 0),
+            "total_users": users[0] or 0,
+            "users_active_7d": users[1] or 0,
+            "users_active_30d": users[2] or 0,
+            "refreshed_at": moment,
+        })
+
+        await session.execute(text("DELETE FROM platform_mrr_by_tier WHERE day = :day"), {"day": day})
+        await session.execute(text("""
+            INSERT INTO platform_mrr_by_tier (day, tier, subscriptions, trials, mrr)
+            SELECT :day, tier,
+                   SUM(CASE WHEN status = 'active' THEN 1 ELSE 0 END),
+                   SUM(CASE WHEN status = 'trial' THEN 1 ELSE 0 END),
+                   COALESCE(SUM(CASE WHEN status = 'active' THEN monthly_amount ELSE 0 END), 0)
+            FROM platform_metric_contributions
+            WHERE entity_type = 'subscription'
+            GROUP BY tier
+        """), {"day": day})
+
+        cohorts = await self._rebuild_cohorts(session, dialect)
+
+        if last_event is not None:
+            await session.execute(
+                text("DELETE FROM platform_metric_events WHERE event_id <= :last_event"),
+                {"last_event": last_event},
+            )
+        await session.commit()
+        self.invalidate()
+
+        self._refreshes += 1
+        self._last_refresh_ms = (time.perf_counter() - start) * 1000
+        logger.info(f"[PlatformMetrics] Refreshed snapshots for {day} in {self._last_refresh_ms:.0f}ms")
+        return {
+            "day": day,
+            "firms": counts.get(("firm", "active"), 0) + counts.get(("firm", "inactive"), 0),
+            "subscriptions": sum(n for (kind, _), n in counts.items() if kind == "subscription"),
+            "cohort_rows": cohorts,
+            "duration_ms": round(self._last_refresh_ms, 1),
+        }
+
+    async def _rebuild_cohorts(self, session: AsyncSession, dialect: str) -> int:
+        tier = f"COALESCE(sp.code, '{DEFAULT_TIER}')"
+        cohort_month = _date_sql(dialect, "s.created_at", month=True)
+        cancelled_at = "COALESCE(s.cancelled_at, s.updated_at)"
+        started = await session.execute(text(f"""
+            SELECT {cohort_month}, {tier}, {_date_sql(dialect, 's.created_at')}, COUNT(*)
+            FROM subscriptions s
+            LEFT JOIN subscription_plans sp ON sp.plan_id = s.plan_id
+            WHERE s.created_at IS NOT NULL
+            GROUP BY 1, 2, 3
+        """))
+        rows: Dict[Tuple[str, str, str], List[int]] = {}
+        for month, tier_name, day, count in started:
+            rows.setdefault((month, tier_name, day), [0, 0])[0] += count
+        cancelled = await session.execute(text(f"""
+            SELECT {cohort_month}, {tier}, {_date_sql(dialect, cancelled_at)}, COUNT(*)
+            FROM subscriptions s
+            LEFT JOIN subscription_plans sp ON sp.plan_id = s.plan_id
+            WHERE LOWER(s.status) IN ('cancelled', 'canceled')
+              AND s.created_at IS NOT NULL AND {cancelled_at} IS NOT NULL
+            GROUP BY 1, 2, 3
+        """))
+        for month, tier_name, day, count in cancelled:
+            rows.setdefault((month, tier_name, day), [0, 0])[1] += count
+
+        await session.execute(text("DELETE FROM platform_churn_cohorts"))
+        if rows:
+            await session.execute(
+                text("""
+                    INSERT INTO platform_churn_cohorts (cohort_month, tier, day, started, cancelled)
+                    VALUES (:cohort_month, :tier, :day, :started, :cancelled)
+                """),
+                [
+                    {"cohort_month": month, "tier": tier_name, "day": day, "started": counts[0], "cancelled": counts[1]}
+                    for (month, tier_name, day), counts in rows.items()
+                ],
+            )
+        return len(rows)
+
+    async def apply_pending_events(
+        self,
+        session: AsyncSession,
+        limit: int = PLATFORM_METRICS_EVENT_BATCH,
+        now: Optional[datetime] = None,
+    ) -> Dict[str, Any]:
+        """
+        Apply up to ``limit`` queued firm events to today's snapshot rows.
+
+        Runs a full refresh instead if the snapshots were never built.
+        """
+        now = now or datetime.now(timezone.utc)
+        day = now.strftime("%Y-%m-%d")
+        dialect = session.get_bind().dialect.name
+
+        await self._lock(session, dialect)
+        if not await self._is_built(session):
+            result = await self.refresh(session, now=now)
+            return {"events": 0, "firms": 0, "refreshed": result}
+
+        events = (await session.execute(
+            text("SELECT event_id, firm_id FROM platform_metric_events ORDER BY event_id LIMIT :limit"),
+            {"limit": limit},
+        )).fetchall()
+        if not events:
+            await session.commit()
+            return {"events": 0, "firms": 0}
+
+        firm_ids = sorted({str(row[1]) for row in events})
+        stored = await self._stored_contributions(session, firm_ids)
+        current = await self._source_contributions(session, dialect, firm_ids)
+        delta = contribution_delta(stored, current)
+        await self._apply_delta(session, day, delta)
+
+        await session.execute(
+            text("DELETE FROM platform_metric_contributions WHERE firm_id IN :firm_ids")
+            .bindparams(bindparam("firm_ids", expanding=True)),
+            {"firm_ids": firm_ids},
+        )
+        if current:
+            await session.execute(
+                text("""
+                    INSERT INTO platform_metric_contributions
+                        (entity_type, entity_id, firm_id, tier, status, monthly_amount, cohort_month)
+                    VALUES (:entity_type, :entity_id, :firm_id, :tier, :status, :monthly_amount, :cohort_month)
+                """),
+                [
+                    {
+                        "entity_type": c.entity_type, "entity_id": c.entity_id, "firm_id": c.firm_id,
+                        "tier": c.tier, "status": c.status, "monthly_amount": float(c.monthly_amount),
+                        "cohort_month": c.cohort_month,
+                    }
+                    for c in current.values()
+                ],
+            )
+        await session.execute(
+            text("DELETE FROM platform_metric_events WHERE event_id IN :event_ids")
+            .bindparams(bindparam("event_ids", expanding=True)),
+            {"event_ids": [row[0] for row in events]},
+        )
+        await session.commit()
+        self.invalidate()
+
+        self._events_applied += len(events)
+        return {"events": len(events), "firms": len(firm_ids)}
+
+    async def _apply_delta(self, session: AsyncSession, day: str, delta: SnapshotDelta) -> None:
+        # Today's first change starts from the latest snapshot
+        await session.execute(text("""
+            INSERT INTO platform_daily_metrics
+                (day, total_firms, active_firms, trial_firms, total_users,
+                 users_active_7d, users_active_30d, refreshed_at)
+            SELECT :day, total_firms, active_firms, trial_firms, total_users,
+                   users_active_7d, users_active_30d, refreshed_at
+            FROM platform_daily_metrics
+            WHERE day = (SELECT MAX(day) FROM platform_daily_metrics)
+              AND day < :day
+        """), {"day": day})
+        await session.execute(text("""
+            INSERT INTO platform_mrr_by_tier (day, tier, subscriptions, trials, mrr)
+            SELECT :day, tier, subscriptions, trials, mrr
+            FROM platform_mrr_by_tier
+            WHERE day = (SELECT MAX(day) FROM platform_mrr_by_tier)
+              AND day < :day
+        """), {"day": day})
+
+        if any(delta.daily.values()):
+            await session.execute(text("""
+                UPDATE platform_daily_metrics SET
+                    total_firms = total_firms + :total_firms,
+                    active_firms = active_firms + :active_firms,
+                    trial_firms = trial_firms + :trial_firms
+                WHERE day = :day
+            """), {"day": day, **delta.daily})
+
+        tiers = [
+            {"day": day, "tier": tier, "subscriptions": counts[0], "trials": counts[1], "mrr": float(counts[2])}
+            for tier, counts in delta.tiers.items()
+            if counts[0] or counts[1] or counts[2]
+        ]
+        if tiers:
+            await session.execute(text("""
+                INSERT INTO platform_mrr_by_tier (day, tier, subscriptions, trials, mrr)
+                VALUES (:day, :tier, :subscriptions, :trials, :mrr)
+                ON CONFLICT (day, tier) DO UPDATE SET
+                    subscriptions = platform_mrr_by_tier.subscriptions + excluded.subscriptions,
+                    trials = platform_mrr_by_tier.trials + excluded.trials,
+                    mrr = platform_mrr_by_tier.mrr + excluded.mrr
+            """), tiers)
+
+        cohorts = [
+            {"cohort_month": month, "tier": tier, "day": day, "started": counts[0], "cancelled": counts[1]}
+            for (month, tier), counts in delta.cohorts.items()
+            if counts[0] or counts[1]
+        ]
+        if cohorts:
+            await session.execute(text("""
+                INSERT INTO platform_churn_cohorts (cohort_month, tier, day, started, cancelled)
+                VALUES (:cohort_month, :tier, :day, :started, :cancelled)
+                ON CONFLICT (cohort_month, tier, day) DO UPDATE SET
+                    started = platform_churn_cohorts.started + excluded.started,
+                    cancelled = platform_churn_cohorts.cancelled + excluded.cancelled
+            """), cohorts)
+
+    async def _stored_contributions(
+        self, session: AsyncSession, firm_ids: List[str]
+    ) -> Dict[Tuple[str, str], Contribution]:
+        result = await session.execute(
+            text("""
+                SELECT entity_type, entity_id, firm_id, tier, status, monthly_amount, cohort_month
+                FROM platform_metric_contributions
+                WHERE firm_id IN :firm_ids
+            """).bindparams(bindparam("firm_ids", expanding=True)),
+            {"firm_ids": firm_ids},
+        )
+        contributions = (
+            Contribution(
+                entity_type=row[0], entity_id=row[1], firm_id=row[2], tier=row[3], status=row[4],
+                monthly_amount=_money(row[5]).quantize(_CENTS, rounding=ROUND_HALF_UP), cohort_month=row[6],
+            )
+            for row in result
+        )
+        return {c.key: c for c in contributions}
+
+    async def _source_contributions(
+        self, session: AsyncSession, dialect: str, firm_ids: Optional[List[str]] = None
+    ) -> Dict[Tuple[str, str], Contribution]:
+        """Contributions computed from firms/subscriptions; every firm if firm_ids is None."""
+        firm_filter = sub_filter = ""
+        params: Dict[str, Any] = {}
+        if firm_ids is not None:
+            firm_filter, sub_filter = "AND f.firm_id IN :firm_ids", "WHERE s.firm_id IN :firm_ids"
+            params["firm_ids"] = firm_ids
+
+        def _query(sql: str):
+            statement = text(sql)
+            if firm_ids is not None:
+                statement = statement.bindparams(bindparam("firm_ids", expanding=True))
+            return session.execute(statement, params)
+
+        contributions: Dict[Tuple[str, str], Contribution] = {}
+        for firm_id, is_active in await _query(
+            f"SELECT f.firm_id, f.is_active FROM firms f WHERE f.deleted_at IS NULL {firm_filter}"
+        ):
+            c = Contribution("firm", str(firm_id), str(firm_id), status="active" if is_active else "inactive")
+            contributions[c.key] = c
+        for row in await _query(f"""
+            SELECT s.subscription_id, s.firm_id, s.status, s.billing_cycle, s.created_at,
+                   sp.code, sp.monthly_price, sp.annual_price
+            FROM subscriptions s
+            LEFT JOIN subscription_plans sp ON sp.plan_id = s.plan_id
+            {sub_filter}
+        """):
+            created_at = _as_datetime(row[4])
+            c = Contribution(
+                "subscription", str(row[0]), str(row[1]),
+                tier=row[5] or DEFAULT_TIER,
+                status=subscription_status_class(row[2]),
+                monthly_amount=monthly_amount(row[6], row[7], row[3]),
+                cohort_month=created_at.strftime("%Y-%m") if created_at else "",
+            )
+            contributions[c.key] = c
+        return contributions
+
+    async def check_consistency(self, session: AsyncSession) -> Dict[str, Any]:
+        """
+        Compare the latest snapshot with a recomputation from the source tables.
+
+        Covers firm/trial counts and per-tier subscriptions, trials and MRR.
+        """
+        dialect = session.get_bind().dialect.name
+        expected = contribution_delta({}, await self._source_contributions(session, dialect))
+        daily = (await session.execute(text(_LATEST_DAILY_SQL))).mappings().first()
+        tiers = (await session.execute(text(_TIERS_AS_OF_SQL), {"as_of": "9999-12-31"})).mappings().all()
+
+        differences: Dict[str, Any] = {}
+        for name, value in expected.daily.items():
+            stored = daily[name] if daily else 0
+            if stored != value:
+                differences[name] = {"stored": stored, "expected": value}
+        stored_tiers = {
+            row["tier"]: (row["subscriptions"], row["trials"], _money(row["mrr"]).quantize(_CENTS))
+            for row in tiers
+            if row["subscriptions"] or row["trials"] or row["mrr"]
+        }
+        expected_tiers = {
+            tier: (counts[0], counts[1], counts[2].quantize(_CENTS))
+            for tier, counts in expected.tiers.items()
+            if counts[0] or counts[1] or counts[2]
+        }
+        if stored_tiers != expected_tiers:
+            differences["tiers"] = {
+                "stored": {t: [v[0], v[1], float(v[2])] for t, v in stored_tiers.items()},
+                "expected": {t: [v[0], v[1], float(v[2])] for t, v in expected_tiers.items()},
+            }
+        return {"consistent": not differences, "differences": differences}
+
+    async def _is_built(self, session: AsyncSession) -> bool:
+        return (await session.execute(text("SELECT 1 FROM platform_daily_metrics LIMIT 1"))).first() is not None
+
+    @staticmethod
+    async def _lock(session: AsyncSession, dialect: str) -> None:
+        if dialect == "postgresql":
+            await session.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": PLATFORM_METRICS_LOCK_KEY})
+
+    # =========================================================================
+    # READS
+    # =========================================================================
+
+    async def dashboard(self) -> Dict[str, Any]:
+        """Firm counts, MRR, tier distribution, churn, health and feature adoption."""
+        return await self._cached(("dashboard",), self._load_dashboard)
+
+    async def mrr_breakdown(self, period: str = "month") -> Dict[str, Any]:
+        """MRR by tier, compared with the snapshot one period back."""
+        return await self._cached(("mrr", period), lambda: self._load_mrr(period))
+
+    async def churn_analysis(self, period: str = "quarter") -> Dict[str, Any]:
+        """Churn over the period by tier, signup cohorts and at-risk firms."""
+        return await self._cached(("churn", period), lambda: self._load_churn(period))
+
+    async def _load_dashboard(self) -> Dict[str, Any]:
+        today = datetime.now(timezone.utc)
+        daily, tiers, churned, feature_adoption = await asyncio.gather(
+            self._fetch(_LATEST_DAILY_SQL),
+            self._fetch(_TIERS_AS_OF_SQL, {"as_of": today.strftime("%Y-%m-%d")}),
+            self._fetch(
+                "SELECT COALESCE(SUM(cancelled), 0) AS cancelled FROM platform_churn_cohorts WHERE day > :since",
+                {"since": (today - timedelta(days=30)).strftime("%Y-%m-%d")},
+            ),
+            self._feature_adoption(),
+        )
+        if not daily:
+            await self._build()
+            return await self._load_dashboard()
+        daily = daily[0]
+
+        # Active firms without an active subscription count as starter
+        tier_distribution = {row["tier"]: row["subscriptions"] for row in tiers if row["subscriptions"]}
+        unsubscribed = (daily.get("active_firms") or 0) - sum(tier_distribution.values())
+        if unsubscribed > 0:
+            tier_distribution[DEFAULT_TIER] = tier_distribution.get(DEFAULT_TIER, 0) + unsubscribed
+
+        active_subscriptions = sum(row["subscriptions"] for row in tiers)
+        cancelled = int(churned[0]["cancelled"] or 0) if churned else 0
+        base = active_subscriptions + cancelled
+
+        users = daily.get("total_users") or 0
+        if users:
+            recent, monthly = daily["users_active_7d"], daily["users_active_30d"]
+            health = (100 * recent + 75 * (monthly - recent) + 50 * (users - monthly)) / users
+        else:
+            health = 85
+
+        return {
+            "total_firms": daily.get("total_firms") or 0,
+            "active_firms": daily.get("active_firms") or 0,
+            "trial_firms": daily.get("trial_firms") or 0,
+            "total_mrr": round(sum(float(row["mrr"] or 0) for row in tiers), 2),
+            "tier_distribution": tier_distribution,
+            "churn_rate": round(cancelled / base * 100, 1) if base else 0.0,
+            "avg_health_score": int(health),
+            "feature_adoption": feature_adoption,
+            "as_of": daily.get("day"),
+        }
+
+    async def _load_mrr(self, period: str) -> Dict[str, Any]:
+        today = datetime.now(timezone.utc)
+        lookback = PERIOD_DAYS.get(period, 30)
+        daily, current, previous = await asyncio.gather(
+            self._fetch(_LATEST_DAILY_SQL),
+            self._fetch(_TIERS_AS_OF_SQL, {"as_of": today.strftime("%Y-%m-%d")}),
+            self._fetch(_TIERS_AS_OF_SQL, {"as_of": (today - timedelta(days=lookback)).strftime("%Y-%m-%d")}),
+        )
+        if not daily:
+            await self._build()
+            return await self._load_mrr(period)
+        by_tier = {
+            row["tier"]: {"count": row["subscriptions"], "mrr": round(float(row["mrr"] or 0), 2)}
+            for row in current
+            if row["subscriptions"] or row["mrr"]
+        }
+        total_mrr = sum(float(row["mrr"] or 0) for row in current)
+        prev_mrr = sum(float(row["mrr"] or 0) for row in previous)
+        change = total_mrr - prev_mrr
+        return {
+            "total_mrr": round(total_mrr, 2),
+            "by_tier": by_tier,
+            "trends": {
+                "previous_period": round(prev_mrr, 2),
+                "change": round(change, 2),
+                "change_percent": round((change / prev_mrr * 100) if prev_mrr else 0.0, 2),
+            },
+            "forecast_next_month": round(total_mrr * 1.03, 2),
+        }
+
+    async def _load_churn(self, period: str) -> Dict[str, Any]:
+        today = datetime.now(timezone.utc)
+        since = (today - timedelta(days=PERIOD_DAYS.get(period, 90))).strftime("%Y-%m-%d")
+        months = today.year * 12 + today.month - COHORT_MONTHS
+        first_cohort = f"{months // 12:04d}-{months % 12 + 1:02d}"
+        daily, churned, active, cohorts, at_risk = await asyncio.gather(
+            self._fetch(_LATEST_DAILY_SQL),
+            self._fetch("""
+                SELECT tier, SUM(cancelled) AS cancelled FROM platform_churn_cohorts
+                WHERE day > :since GROUP BY tier
+            """, {"since": since}),
+            self._fetch(_TIERS_AS_OF_SQL, {"as_of": today.strftime("%Y-%m-%d")}),
+            self._fetch("""
+                SELECT cohort_month, tier, SUM(started) AS started, SUM(cancelled) AS cancelled
+                FROM platform_churn_cohorts
+                WHERE cohort_month >= :first_cohort
+                GROUP BY cohort_month, tier
+                ORDER BY cohort_month, tier
+            """, {"first_cohort": first_cohort}),
+            self._fetch("""
+                SELECT f.firm_id, f.name
+                FROM firms f
+                JOIN subscriptions s ON s.firm_id = f.firm_id AND LOWER(s.status) = 'active'
+                WHERE f.is_active = true AND f.deleted_at IS NULL
+                  AND NOT EXISTS (
+                      SELECT 1 FROM users u
+                      WHERE u.firm_id = f.firm_id AND u.is_active = true AND u.last_login_at >= :cutoff
+                  )
+                LIMIT 20
+            """, {"cutoff": (today - timedelta(days=AT_RISK_INACTIVE_DAYS)).replace(tzinfo=None)}),
+        )
+        if not daily:
+            await self._build()
+            return await self._load_churn(period)
+
+        by_tier = {}
+        for row in churned:
+            if row["cancelled"]:
+                by_tier[row["tier"]] = {"churned": int(row["cancelled"]), "rate": 0.0}
+        total_churned = sum(entry["churned"] for entry in by_tier.values())
+        active_by_tier = {row["tier"]: row["subscriptions"] for row in active if row["subscriptions"]}
+        for tier, count in active_by_tier.items():
+            by_tier.setdefault(tier, {"churned": 0, "rate": 0.0})
+        for tier, entry in by_tier.items():
+            denom = active_by_tier.get(tier, 0) + entry["churned"]
+            entry["rate"] = round(entry["churned"] / denom * 100, 2) if denom else 0.0
+        base = sum(active_by_tier.values()) + total_churned
+
+        at_risk_list = [
+            {"firm_id": str(row["firm_id"]), "name": row["name"], "risk_score": 70, "signals": ["low_usage"]}
+            for row in at_risk
+        ]
+        return {
+            "churn_rate": round(total_churned / base * 100, 2) if base else 0.0,
+            "churned_firms": total_churned,
+            "at_risk_firms": len(at_risk_list),
+            "by_tier": by_tier,
+            "cohorts": [
+                {
+                    "cohort": row["cohort_month"],
+                    "tier": row["tier"],
+                    "started": int(row["started"] or 0),
+                    "churned": int(row["cancelled"] or 0),
+                }
+                for row in cohorts
+            ],
+            "top_reasons": [],
+            "at_risk_list": at_risk_list,
+        }
+
+    async def _feature_adoption(self) -> Dict[str, Any]:
+        try:
+            rows = await self._fetch("""
+                SELECT feature_key, rollout_percentage
+                FROM feature_flags
+                WHERE is_enabled_globally = true
+            """)
+        except Exception:
+            return dict(DEFAULT_FEATURE_ADOPTION)  # Table may not exist
+        return {row["feature_key"]: row["rollout_percentage"] for row in rows} or dict(DEFAULT_FEATURE_ADOPTION)
+
+    async def _fetch(self, sql: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        async with self._session_factory() as session:
+            result = await session.execute(text(sql), params or {})
+            return [dict(row) for row in result.mappings()]
+
+    async def _build(self) -> None:
+        """First read on an empty snapshot table: build it."""
+        async with self._session_factory() as session:
+            await self.refresh(session)
+
+    # =========================================================================
+    # CACHE
+    # =========================================================================
+
+    async def _cached(self, key: Tuple, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Serve ``key`` from the cache, sharing one load between concurrent misses."""
+        entry = self._cache.get(key)
+        if entry is not None and time.monotonic() < entry[1]:
+            self._hits += 1
+            return entry[0]
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self._hits += 1
+            return await asyncio.shield(pending)
+
+        self._misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Nobody else may be waiting; mark the exception retrieved
+            future.exception()
+            raise
+        else:
+            if self.cache_ttl > 0:
+                self._cache[key] = (value, time.monotonic() + self.cache_ttl)
+            future.set_result(value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    def invalidate(self) -> None:
+        """Drop every cached response in this process."""
+        self._cache.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache hit/miss counts and materialization counters."""
+        lookups = self._hits + self._misses
+        return {
+            "cache_entries": len(self._cache),
+            "cache_hits": self._hits,
+            "cache_misses": self._misses,
+            "cache_hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+            "cache_ttl_seconds": self.cache_ttl,
+            "refreshes": self._refreshes,
+            "last_refresh_ms": round(self._last_refresh_ms, 1),
+            "events_applied": self._events_applied,
+        }
+
+
+def _date_sql(dialect: str, column: str, month: bool = False) -> str:
+    if dialect == "postgresql":
+        return f"to_char({column}, '{'YYYY-MM' if month else 'YYYY-MM-DD'}')"
+    return f"strftime('{'%Y-%m' if month else '%Y-%m-%d'}', {column})"
+
+
+def _as_datetime(value: Any) -> Optional[datetime]:
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value))
+
+
+async def queue_subscription_metric_events(session: AsyncSession, where: str, params: Dict[str, Any]) -> None:
+    """
+    Queue platform metric events for the firms of matching subscriptions.
+
+    For raw-SQL subscription updates, which bypass the ORM flush hook in
+    admin_panel.models.platform_metrics. Runs in the caller's transaction.
+    """
+    await session.execute(
+        text(f"""
+            INSERT INTO platform_metric_events (firm_id, created_at)
+            SELECT DISTINCT CAST(s.firm_id AS VARCHAR(36)), :queued_at
+            FROM subscriptions s
+            WHERE {where}
+        """),
+        {**params, "queued_at": datetime.now(timezone.utc).replace(tzinfo=None)},
+    )
+
+
+# Singleton instance
+_platform_metrics_store: Optional[PlatformMetricsStore] = None
+
+
+def get_platform_metrics_store() -> PlatformMetricsStore:
+    """Get the global platform metrics store."""
+    global _platform_metrics_store
+    if _platform_metrics_store is None:
+        _platform_metrics_store = PlatformMetricsStore()
+    return _platform_metrics_store
@@ -7,8 +7,9 @@ Logs all sensitive actions with full context.
 
 import sqlite3
 import json
+import base64
 from datetime import datetime
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, Iterator, List, Tuple
 from pathlib import Path
 from enum import Enum
 from dataclasses import dataclass
@@ -154,6 +155,92 @@ class AuditEvent:
     error_message: Optional[str] = None
 
 
+# Composite indexes on audit_log, by name
+AUDIT_LOG_INDEXES = {
+    "idx_audit_timestamp_event": "timestamp, event_id",
+    "idx_audit_user_time": "user_id, timestamp, event_id",
+    "idx_audit_tenant_time": "tenant_id, timestamp, event_id",
+    "idx_audit_event_type_time": "event_type, timestamp, event_id",
+    "idx_audit_resource_time": "resource_type, resource_id, timestamp, event_id",
+    "idx_audit_resource_id_time": "resource_id, timestamp, event_id",
+}
+
+# estimate_count() counts exactly up to this many matches
+EXACT_COUNT_LIMIT = 10000
+
+# Events read per batch by export()
+EXPORT_BATCH_SIZE = 1000
+
+
+def _filter_sql(
+    user_id: Optional[str] = None,
+    tenant_id: Optional[str] = None,
+    event_type: Optional[AuditEventType] = None,
+    resource_type: Optional[str] = None,
+    resource_id: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    severity: Optional[AuditSeverity] = None,
+    success_only: Optional[bool] = None,
+) -> Tuple[str, List[Any]]:
+    """Build the WHERE clause and parameters for the query() filters."""
+    clauses = ["1=1"]
+    params: List[Any] = []
+
+    if user_id:
+        clauses.append("user_id = ?")
+        params.append(user_id)
+
+    if tenant_id:
+        clauses.append("tenant_id = ?")
+        params.append(tenant_id)
+
+    if event_type:
+        clauses.append("event_type = ?")
+        params.append(event_type.value)
+
+    if resource_type:
+        clauses.append("resource_type = ?")
+        params.append(resource_type)
+
+    if resource_id:
+        clauses.append("resource_id = ?")
+        params.append(resource_id)
+
+    if start_date:
+        clauses.append("timestamp >= ?")
+        params.append(start_date.isoformat())
+
+    if end_date:
+        clauses.append("timestamp <= ?")
+        params.append(end_date.isoformat())
+
+    if severity:
+        clauses.append("severity = ?")
+        params.append(severity.value)
+
+    if success_only is not None:
+        clauses.append("success = ?")
+        params.append(1 if success_only else 0)
+
+    return " AND ".join(clauses), params
+
+
+def _encode_cursor(timestamp: str, event_id: str) -> str:
+    return base64.urlsafe_b64encode(json.dumps([timestamp, event_id]).encode()).decode()
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[str, str]]:
+    """Decode a page cursor; invalid cursors raise ValueError."""
+    if not cursor:
+        return None
+    try:
+        timestamp, event_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return str(timestamp), str(event_id)
+    except Exception as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
 class AuditLogger:
     """
     Audit logging system with database persistence.
@@ -199,12 +286,15 @@ class AuditLogger:
                 )
             """)
 
-            # Indexes for querying
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_audit_timestamp ON audit_log(timestamp)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_audit_user ON audit_log(user_id)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_audit_tenant ON audit_log(tenant_id)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_audit_event_type ON audit_log(event_type)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_audit_resource ON audit_log(resource_type, resource_id)")
+            # Indexes for querying: each filter column followed by the
+            # (timestamp, event_id) page order, so a filtered page is an
+            # index seek and counts over a filter are index-only
+            for name, columns in AUDIT_LOG_INDEXES.items():
+                cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON audit_log({columns})")
+            # Single-column indexes superseded by the composites above
+            for name in ("idx_audit_timestamp", "idx_audit_user", "idx_audit_tenant",
+                         "idx_audit_event_type", "idx_audit_resource"):
+                cursor.execute(f"DROP INDEX IF EXISTS {name}")
 
             conn.commit()
 
@@ -285,55 +375,123 @@ class AuditLogger:
         severity: Optional[AuditSeverity] = None,
         success_only: Optional[bool] = None,
         limit: int = 100,
-        offset: int = 0
+        offset: int = 0,
+        cursor: Optional[str] = None,
     ) -> List[Dict]:
-        """Query audit log with filters"""
-
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-
-            query = "SELECT * FROM audit_log WHERE 1=1"
-            params = []
-
-            if user_id:
-                query += " AND user_id = ?"
-                params.append(user_id)
-
-            if tenant_id:
-                query += " AND tenant_id = ?"
-                params.append(tenant_id)
-
-            if event_type:
-                query += " AND event_type = ?"
-                params.append(event_type.value)
+        """
+        Query audit log with filters, newest first.
 
-            if resource_type:
-                query += " AND resource_type = ?"
-                params.append(resource_type)
+        Deep pages should use cursor (see query_page) rather than offset:
+        offset rows are skipped one by one, a cursor seeks on the index.
+        """
+        where, params = _filter_sql(
+            user_id=user_id, tenant_id=tenant_id, event_type=event_type,
+            resource_type=resource_type, resource_id=resource_id,
+            start_date=start_date, end_date=end_date,
+            severity=severity, success_only=success_only,
+        )
+        return self._page(where, params, limit, after=decode_cursor(cursor), offset=offset)
 
-            if resource_id:
-                query += " AND resource_id = ?"
-                params.append(resource_id)
+    def query_page(self, limit: int = 100, cursor: Optional[str] = None, **filters: Any) -> Dict[str, Any]:
+        """
+        Fetch one page of audit events, newest first.
 
-            if start_date:
-                query += " AND timestamp >= ?"
-                params.append(start_date.isoformat())
+        Takes the same filters as query(). Pass the returned next_cursor
+        back to get the following page; it is None on the last page.
 
-            if end_date:
-                query += " AND timestamp <= ?"
-                params.append(end_date.isoformat())
+        Raises:
+            ValueError: If cursor is not one returned by this method.
+        """
+        where, params = _filter_sql(**filters)
+        events = self._page(where, params, limit + 1, after=decode_cursor(cursor))
+        next_cursor = None
+        if len(events) > limit:
+            events = events[:limit]
+            next_cursor = _encode_cursor(events[-1]["timestamp"], events[-1]["event_id"])
+        return {"events": events, "next_cursor": next_cursor}
+
+    def estimate_count(self, exact_limit: int = EXACT_COUNT_LIMIT, **filters: Any) -> Dict[str, Any]:
+        """
+        Count the events matching query() filters, estimating large counts.
 
-            if severity:
-                query += " AND severity = ?"
-                params.append(severity.value)
+        Up to exact_limit matches are counted exactly. Beyond that the
+        count is extrapolated from the time span the newest exact_limit
+        matches cover over the span of the whole range, so the cost is
+        bounded by exact_limit index entries however large the range is.
 
-            if success_only is not None:
-                query += " AND success = ?"
-                params.append(1 if success_only else 0)
+        Returns:
+            {"count": int, "exact": bool}
+        """
+        where, params = _filter_sql(**filters)
+        with sqlite3.connect(self.db_path) as conn:
+            count = conn.execute(
+                f"SELECT COUNT(*) FROM (SELECT 1 FROM audit_log WHERE {where} LIMIT ?)",
+                [*params, exact_limit + 1],
+            ).fetchone()[0]
+            if count <= exact_limit:
+                return {"count": count, "exact": True}
+
+            def _timestamp(order: str, offset: int = 0) -> datetime:
+                row = conn.execute(
+                    f"SELECT timestamp FROM audit_log WHERE {where} "
+                    f"ORDER BY timestamp {order}, event_id {order} LIMIT 1 OFFSET ?",
+                    [*params, offset],
+                ).fetchone()
+                return datetime.fromisoformat(row[0]).replace(tzinfo=None)
+
+            newest = _timestamp("DESC")
+            boundary = _timestamp("DESC", exact_limit)
+            oldest = _timestamp("ASC")
+
+        covered = (newest - boundary).total_seconds()
+        if covered <= 0:
+            # Too many events share a timestamp to extrapolate; count them
+            with sqlite3.connect(self.db_path) as conn:
+                count = conn.execute(f"SELECT COUNT(*) FROM audit_log WHERE {where}", params).fetchone()[0]
+            return {"count": count, "exact": True}
+        estimate = round(exact_limit * (newest - oldest).total_seconds() / covered)
+        return {"count": max(estimate, exact_limit + 1), "exact": False}
+
+    def export(self, batch_size: int = EXPORT_BATCH_SIZE, **filters: Any) -> Iterator[Dict]:
+        """
+        Stream every event matching query() filters, oldest first.
 
-            query += " ORDER BY timestamp DESC LIMIT ? OFFSET ?"
-            params.extend([limit, offset])
+        Reads keyset batches of batch_size on a fresh connection each, so
+        a full dump holds neither the whole log in memory nor a read
+        transaction open between batches.
+        """
+        where, params = _filter_sql(**filters)
+        after = None
+        while True:
+            batch = self._page(where, params, batch_size, after=after, newest_first=False)
+            yield from batch
+            if len(batch) < batch_size:
+                return
+            after = (batch[-1]["timestamp"], batch[-1]["event_id"])
+
+    def _page(
+        self,
+        where: str,
+        params: List[Any],
+        limit: int,
+        after: Optional[Tuple[str, str]] = None,
+        offset: int = 0,
+        newest_first: bool = True,
+    ) -> List[Dict]:
+        """Fetch events in (timestamp, event_id) order, after a keyset position."""
+        order, op = ("DESC", "<") if newest_first else ("ASC", ">")
+        params = list(params)
+        if after:
+            where += f" AND (timestamp, event_id) {op} (?, ?)"
+            params.extend(after)
+        query = (
+            f"SELECT * FROM audit_log WHERE {where} "
+            f"ORDER BY timestamp {order}, event_id {order} LIMIT ? OFFSET ?"
+        )
+        params.extend([limit, offset])
 
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
             cursor.execute(query, params)
             rows = cursor.fetchall()
 
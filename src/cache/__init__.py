@@ -17,6 +17,8 @@ from .calculation_cache import (
     cached_calculation,
     CacheInvalidator,
     DEFAULT_CALCULATION_TTL,
+    tenant_tag,
+    tax_year_tag,
 )
 
 __all__ = [
@@ -31,4 +33,6 @@ __all__ = [
     "cached_calculation",
     "CacheInvalidator",
     "DEFAULT_CALCULATION_TTL",
+    "tenant_tag",
+    "tax_year_tag",
 ]
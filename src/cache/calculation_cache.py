@@ -34,6 +34,19 @@ CALC_PREFIX = "calc:"
 RETURN_PREFIX = "return:"
 SCENARIO_PREFIX = "scenario:"
 
+# Tag covering every cached calculation (see RedisClient.invalidate_tags)
+ALL_CALCULATIONS_TAG = "calc"
+
+
+def tenant_tag(tenant_id: str) -> str:
+    """Tag for entries belonging to a tenant."""
+    return f"tenant:{tenant_id}"
+
+
+def tax_year_tag(tax_year: Union[int, str]) -> str:
+    """Tag for entries computed for a tax year."""
+    return f"year:{tax_year}"
+
 
 class CalculationCache:
     """Cache for tax calculation results.
@@ -53,6 +66,10 @@ class CalculationCache:
 
         # Invalidate on data change
         await cache.invalidate_return(return_id)
+
+    Entries are tagged by return (and optionally tenant / tax year), so
+    invalidation deletes exactly the affected keys instead of scanning
+    Redis.
     """
 
     def __init__(
@@ -95,6 +112,14 @@ class CalculationCache:
         """Make cache key for scenario calculation."""
         return f"{SCENARIO_PREFIX}{return_id}:{scenario_id}"
 
+    def _calc_tag(self, return_id: str) -> str:
+        """Tag for all calculation entries of a return."""
+        return f"{CALC_PREFIX}{return_id}"
+
+    def _scenario_tag(self, return_id: str) -> str:
+        """Tag for all scenario entries of a return."""
+        return f"{SCENARIO_PREFIX}{return_id}"
+
     def _hash_context(self, context: Dict[str, Any]) -> str:
         """Create hash of context for cache key.
 
@@ -145,6 +170,7 @@ class CalculationCache:
         calculation: Dict[str, Any],
         context_hash: Optional[str] = None,
         ttl: Optional[int] = None,
+        tags: Optional[List[str]] = None,
     ) -> bool:
         """Cache a calculation result.
 
@@ -153,6 +179,7 @@ class CalculationCache:
             calculation: Calculation result to cache.
             context_hash: Optional context hash for versioning.
             ttl: Optional TTL override.
+            tags: Extra tags, e.g. tenant_tag() / tax_year_tag().
 
         Returns:
             True if cached successfully.
@@ -167,6 +194,7 @@ class CalculationCache:
             key,
             calculation,
             ttl=ttl or self._ttl,
+            tags=[ALL_CALCULATIONS_TAG, self._calc_tag(return_id), *(tags or [])],
         )
 
         if success:
@@ -186,8 +214,7 @@ class CalculationCache:
         await self.connect()
 
         # Delete main calculation and any versioned entries
-        pattern = f"{CALC_PREFIX}{return_id}*"
-        deleted = await self.client.delete_pattern(pattern)
+        deleted = await self.client.invalidate_tags(self._calc_tag(return_id))
 
         if deleted > 0:
             logger.info(
@@ -218,6 +245,7 @@ class CalculationCache:
         return_id: str,
         data: Dict[str, Any],
         ttl: Optional[int] = None,
+        tags: Optional[List[str]] = None,
     ) -> bool:
         """Cache return data.
 
@@ -225,6 +253,7 @@ class CalculationCache:
             return_id: Tax return ID.
             data: Return data to cache.
             ttl: Optional TTL override.
+            tags: Optional tags, e.g. tenant_tag() / tax_year_tag().
 
         Returns:
             True if cached successfully.
@@ -234,6 +263,7 @@ class CalculationCache:
             self._make_return_key(return_id),
             data,
             ttl=ttl or self._ttl,
+            tags=tags,
         )
 
     async def invalidate_return(self, return_id: str) -> int:
@@ -263,8 +293,7 @@ class CalculationCache:
             deleted += 1
 
         # Invalidate scenarios
-        pattern = f"{SCENARIO_PREFIX}{return_id}:*"
-        deleted += await self.client.delete_pattern(pattern)
+        deleted += await self.invalidate_scenarios(return_id)
 
         logger.info(f"Invalidated {deleted} cache entries for return {return_id}")
         return deleted
@@ -296,6 +325,7 @@ class CalculationCache:
         scenario_id: str,
         calculation: Dict[str, Any],
         ttl: Optional[int] = None,
+        tags: Optional[List[str]] = None,
     ) -> bool:
         """Cache a scenario calculation.
 
@@ -304,6 +334,7 @@ class CalculationCache:
             scenario_id: Scenario ID.
             calculation: Calculation result.
             ttl: Optional TTL override.
+            tags: Extra tags, e.g. tenant_tag() / tax_year_tag().
 
         Returns:
             True if cached successfully.
@@ -313,6 +344,7 @@ class CalculationCache:
             self._make_scenario_key(return_id, scenario_id),
             calculation,
             ttl=ttl or self._ttl,
+            tags=[self._scenario_tag(return_id), *(tags or [])],
         )
 
     async def invalidate_scenarios(self, return_id: str) -> int:
@@ -325,8 +357,34 @@ class CalculationCache:
             Number of scenarios invalidated.
         """
         await self.connect()
-        pattern = f"{SCENARIO_PREFIX}{return_id}:*"
-        return await self.client.delete_pattern(pattern)
+        return await self.client.invalidate_tags(self._scenario_tag(return_id))
+
+    async def invalidate_tenant(self, tenant_id: str) -> int:
+        """Invalidate entries written with tenant_tag(tenant_id).
+
+        Returns:
+            Number of cache entries invalidated.
+        """
+        await self.connect()
+        return await self.client.invalidate_tags(tenant_tag(tenant_id))
+
+    async def invalidate_tax_year(self, tax_year: Union[int, str]) -> int:
+        """Invalidate entries written with tax_year_tag(tax_year).
+
+        Returns:
+            Number of cache entries invalidated.
+        """
+        await self.connect()
+        return await self.client.invalidate_tags(tax_year_tag(tax_year))
+
+    async def invalidate_all_calculations(self) -> int:
+        """Invalidate every cached calculation result.
+
+        Returns:
+            Number of cache entries invalidated.
+        """
+        await self.connect()
+        return await self.client.invalidate_tags(ALL_CALCULATIONS_TAG)
 
     # Bulk operations
 
@@ -499,7 +557,7 @@ class CacheInvalidator:
         """
         cache = await self.get_cache()
         # Delete all calculation caches
-        deleted = await cache.client.delete_pattern(f"{CALC_PREFIX}*")
+        deleted = await cache.invalidate_all_calculations()
         logger.warning(f"Config changed: invalidated {deleted} calculation caches")
 
     async def on_prior_year_updated(
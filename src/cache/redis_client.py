@@ -8,14 +8,17 @@ from __future__ import annotations
 
 import json
 import logging
+import time
 from contextlib import asynccontextmanager
 from datetime import timedelta
 from typing import (
     Any,
     AsyncGenerator,
     Dict,
+    Iterable,
     List,
     Optional,
+    Sequence,
     Union,
 )
 
@@ -33,6 +36,12 @@ from config.settings import RedisSettings, get_settings
 
 logger = logging.getLogger(__name__)
 
+# Tag sets live under this prefix: a sorted set of full keys scored by expiry
+TAG_KEY_PREFIX = "tags:"
+
+# Members fetched and unlinked per round trip when invalidating a tag
+TAG_INVALIDATION_BATCH = 1000
+
 # Global client instance
 _redis_client: Optional["RedisClient"] = None
 
@@ -55,6 +64,10 @@ class RedisClient:
         await client.hset("hash", "field", "value")
         value = await client.hget("hash", "field")
 
+        # Tagged entries, invalidated together
+        await client.set("calc:r1", result, ttl=3600, tags=["calc:r1", "year:2025"])
+        await client.invalidate_tags("year:2025")
+
         await client.close()
     """
 
@@ -192,6 +205,7 @@ class RedisClient:
         key: str,
         value: Any,
         ttl: Optional[Union[int, timedelta]] = None,
+        tags: Optional[Sequence[str]] = None,
     ) -> bool:
         """Set a value with optional TTL.
 
@@ -199,6 +213,8 @@ class RedisClient:
             key: Cache key.
             value: Value to cache.
             ttl: Time-to-live in seconds or timedelta.
+            tags: Optional tags (e.g. return id, tenant, tax year) to
+                register the key under for invalidate_tags().
 
         Returns:
             True if successful.
@@ -217,7 +233,15 @@ class RedisClient:
             if isinstance(ttl, timedelta):
                 ttl = int(ttl.total_seconds())
 
-            await self._client.set(full_key, serialized, ex=ttl)
+            if not tags:
+                await self._client.set(full_key, serialized, ex=ttl)
+                return True
+
+            # One round trip: the value plus its tag memberships
+            pipe = self._client.pipeline(transaction=False)
+            pipe.set(full_key, serialized, ex=ttl)
+            self._add_tag_commands(pipe, tags, [full_key], ttl)
+            await pipe.execute()
             return True
 
         except Exception as e:
@@ -444,6 +468,10 @@ class RedisClient:
     async def delete_pattern(self, pattern: str) -> int:
         """Delete all keys matching a pattern.
 
+        Walks the whole keyspace with SCAN, so the cost grows with the
+        size of Redis, not with the number of matches. Prefer tagging
+        keys on write and calling invalidate_tags().
+
         Args:
             pattern: Glob-style pattern (e.g., "calc:*").
 
@@ -458,9 +486,14 @@ class RedisClient:
             full_pattern = f"{prefix}{pattern}" if prefix else pattern
 
             deleted = 0
-            async for key in self._client.scan_iter(match=full_pattern):
-                await self._client.delete(key)
-                deleted += 1
+            batch: List[str] = []
+            async for key in self._client.scan_iter(match=full_pattern, count=TAG_INVALIDATION_BATCH):
+                batch.append(key)
+                if len(batch) >= TAG_INVALIDATION_BATCH:
+                    deleted += await self._client.unlink(*batch)
+                    batch = []
+            if batch:
+                deleted += await self._client.unlink(*batch)
 
             return deleted
 
@@ -468,6 +501,71 @@ class RedisClient:
             logger.warning(f"Redis DELETE PATTERN error for {pattern}: {e}")
             return 0
 
+    # Tag-based invalidation
+
+    def _tag_key(self, tag: str) -> str:
+        prefix = self.settings.key_prefix
+        return f"{prefix}{TAG_KEY_PREFIX}{tag}" if prefix else f"{TAG_KEY_PREFIX}{tag}"
+
+    def _add_tag_commands(
+        self,
+        pipe: Any,
+        tags: Iterable[str],
+        full_keys: Sequence[str],
+        ttl: int,
+    ) -> None:
+        """Queue commands registering keys under tags.
+
+        Members are scored by their expiry time so expired ones can be
+        dropped lazily (ZREMRANGEBYSCORE on every write). The tag set's
+        own TTL only ever grows (EXPIRE NX + GT), so it outlives every
+        member it indexes.
+        """
+        now = time.time()
+        expires_at = now + ttl
+        members = {full_key: expires_at for full_key in full_keys}
+        for tag in tags:
+            tag_key = self._tag_key(tag)
+            pipe.zadd(tag_key, members)
+            pipe.zremrangebyscore(tag_key, "-inf", now)
+            pipe.expire(tag_key, ttl, nx=True)
+            pipe.expire(tag_key, ttl, gt=True)
+
+    async def invalidate_tags(self, *tags: str) -> int:
+        """Delete every key registered under any of the tags.
+
+        Cost is proportional to the number of tagged keys: members are
+        read from the tag set in batches and removed with pipelined
+        UNLINK (freed in the background by Redis) + ZREM. Keys tagged
+        while this runs are picked up by the next batch.
+
+        Args:
+            *tags: Tags to invalidate.
+
+        Returns:
+            Number of live keys deleted.
+        """
+        if not self._client or not tags:
+            return 0
+
+        deleted = 0
+        for tag in tags:
+            tag_key = self._tag_key(tag)
+            try:
+                while True:
+                    members = await self._client.zrange(tag_key, 0, TAG_INVALIDATION_BATCH - 1)
+                    if not members:
+                        break
+                    pipe = self._client.pipeline(transaction=False)
+                    pipe.unlink(*members)
+                    pipe.zrem(tag_key, *members)
+                    unlinked, _ = await pipe.execute()
+                    deleted += unlinked
+            except Exception as e:
+                logger.warning(f"Redis INVALIDATE TAG error for {tag}: {e}")
+
+        return deleted
+
     async def flush_all(self) -> bool:
         """Flush all data (use with caution!).
 
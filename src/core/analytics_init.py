@@ -11,6 +11,9 @@ Usage:
     # In FastAPI lifespan or startup handler:
     session_factory = get_async_session_factory()
     initialize_analytics_service(session_factory)
+
+    # In the shutdown handler, flush queued events:
+    shutdown_analytics_service()
 """
 
 import logging
@@ -50,3 +53,13 @@ def initialize_analytics_service(session_factory: async_sessionmaker) -> Analyti
 def get_analytics_service() -> Optional[AnalyticsEventService]:
     """Get the global analytics service instance."""
     return _analytics_service
+
+
+def shutdown_analytics_service(timeout: float = 10.0) -> None:
+    """Flush queued analytics events and stop the worker."""
+    global _analytics_service
+
+    if _analytics_service is not None:
+        _analytics_service.shutdown(timeout)
+        logger.info(f"[Analytics] Event persistence service stopped: {_analytics_service.get_metrics()}")
+        _analytics_service = None
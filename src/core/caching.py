@@ -3,14 +3,12 @@ Simple In-Memory Cache for Performance Optimization
 
 Provides:
 1. Time-based expiration
-2. Automatic cleanup
-3. Thread-safe operations
-4. Optional Redis backend (for production scaling)
+2. LRU eviction when full
+3. Thread-safe operations (lock-striped)
+4. Indexed prefix invalidation
 
 Usage:
     from core.caching import cache, cached
-from decimal import Decimal, ROUND_HALF_UP
-from calculator.decimal_math import money, to_decimal
 
     # Manual cache operations
     cache.set("key", value, ttl=60)
@@ -28,11 +26,15 @@ import time
 import threading
 import functools
 import hashlib
+import heapq
 import json
 import logging
-from typing import Optional, Any, Dict, Callable, TypeVar
+from collections import OrderedDict
+from typing import Optional, Any, Dict, Callable, List, Set, Tuple, TypeVar
 from datetime import datetime
 
+from calculator.decimal_math import money
+
 logger = logging.getLogger(__name__)
 
 T = TypeVar('T')
@@ -55,32 +57,157 @@ class CacheEntry:
         self.hits += 1
 
 
+class _CacheShard:
+    """
+    One lock stripe of a MemoryCache.
+
+    Entries live in an OrderedDict kept in LRU order (most recent last).
+    A min-heap of (expires_at, key) finds expired entries without a scan;
+    heap items for replaced or deleted keys are skipped when popped. The
+    prefix index maps every ':'-terminated prefix of a key ("dashboard:",
+    "dashboard:cpa-1:") to the keys under it.
+    """
+
+    __slots__ = ("lock", "entries", "expiry_heap", "prefixes", "max_size",
+                 "hits", "misses", "sets", "evictions")
+
+    def __init__(self, max_size: int):
+        self.lock = threading.Lock()
+        self.entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self.expiry_heap: List[Tuple[float, str]] = []
+        self.prefixes: Dict[str, Set[str]] = {}
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.evictions = 0
+
+    # The methods below expect ``lock`` to be held.
+
+    def add(self, key: str, entry: CacheEntry) -> None:
+        if key in self.entries:
+            self.entries.move_to_end(key)
+        else:
+            if len(self.entries) >= self.max_size:
+                self.evict(time.time())
+            for prefix in _key_prefixes(key):
+                self.prefixes.setdefault(prefix, set()).add(key)
+        self.entries[key] = entry
+        heapq.heappush(self.expiry_heap, (entry.expires_at, key))
+        if len(self.expiry_heap) > 2 * len(self.entries) + 64:
+            self.compact_heap()
+
+    def remove(self, key: str) -> bool:
+        if self.entries.pop(key, None) is None:
+            return False
+        for prefix in _key_prefixes(key):
+            keys = self.prefixes.get(prefix)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.prefixes[prefix]
+        return True
+
+    def evict(self, now: float) -> None:
+        """Make room for one entry: drop expired entries, else the LRU one."""
+        if self.purge_expired(now) == 0 and self.entries:
+            key = next(iter(self.entries))
+            self.remove(key)
+            self.evictions += 1
+
+    def purge_expired(self, now: float) -> int:
+        removed = 0
+        heap = self.expiry_heap
+        while heap and heap[0][0] < now:
+            expires_at, key = heapq.heappop(heap)
+            entry = self.entries.get(key)
+            # Stale heap item: key was deleted or re-set with a new expiry
+            if entry is not None and entry.expires_at == expires_at:
+                self.remove(key)
+                removed += 1
+        self.evictions += removed
+        return removed
+
+    def compact_heap(self) -> None:
+        self.expiry_heap = [(e.expires_at, k) for k, e in self.entries.items()]
+        heapq.heapify(self.expiry_heap)
+
+    def matching_keys(self, pattern: str) -> List[str]:
+        """Keys starting with ``pattern``, using the prefix index when possible."""
+        keys = self.prefixes.get(pattern)
+        if keys is not None:
+            return list(keys)
+        # Narrow to the longest indexed prefix of the pattern, then filter
+        cut = pattern.rfind(":")
+        while cut >= 0:
+            keys = self.prefixes.get(pattern[:cut + 1])
+            if keys is not None:
+                return [k for k in keys if k.startswith(pattern)]
+            if cut == 0:
+                break
+            cut = pattern.rfind(":", 0, cut)
+        if ":" in pattern:
+            # Not even the first segment is indexed, so nothing can match
+            return []
+        return [k for k in self.entries if k.startswith(pattern)]
+
+    def clear(self) -> int:
+        count = len(self.entries)
+        self.entries.clear()
+        self.expiry_heap.clear()
+        self.prefixes.clear()
+        return count
+
+
+def _key_prefixes(key: str) -> List[str]:
+    """Every ':'-terminated prefix of a key: "a:b:c" -> ["a:", "a:b:"]."""
+    prefixes = []
+    cut = key.find(":")
+    while cut >= 0:
+        prefixes.append(key[:cut + 1])
+        cut = key.find(":", cut + 1)
+    return prefixes
+
+
 class MemoryCache:
     """
-    Thread-safe in-memory cache with TTL.
+    Thread-safe in-memory cache with TTL and LRU eviction.
+
+    Keys are spread over independently locked shards so concurrent threads
+    rarely wait on each other. Within a shard, get/set/delete and eviction
+    are amortized O(1) (O(log n) for the expiry heap), and
+    invalidate_pattern only touches keys under the pattern's indexed
+    prefix instead of scanning the whole cache.
 
     Good for single-instance deployments. For multi-instance,
     use Redis backend.
     """
 
-    def __init__(self, default_ttl: int = 300, max_size: int = 1000):
+    # Shards never hold fewer than this many entries, so small caches
+    # keep (nearly) exact LRU order
+    MIN_ENTRIES_PER_SHARD = 64
+
+    def __init__(self, default_ttl: int = 300, max_size: int = 1000, shards: int = 16):
         """
         Initialize cache.
 
         Args:
             default_ttl: Default time-to-live in seconds (5 min)
-            max_size: Maximum number of entries before cleanup
+            max_size: Maximum number of entries; the least recently used
+                entry is evicted once full
+            shards: Number of lock stripes (reduced for small caches)
         """
-        self._cache: Dict[str, CacheEntry] = {}
-        self._lock = threading.RLock()
         self._default_ttl = default_ttl
         self._max_size = max_size
-        self._stats = {
-            "hits": 0,
-            "misses": 0,
-            "sets": 0,
-            "evictions": 0,
-        }
+        shard_count = max(1, min(shards, max_size // self.MIN_ENTRIES_PER_SHARD))
+        base, extra = divmod(max_size, shard_count)
+        self._shards = [
+            _CacheShard(max(1, base + (1 if i < extra else 0)))
+            for i in range(shard_count)
+        ]
+
+    def _shard(self, key: str) -> _CacheShard:
+        return self._shards[hash(key) % len(self._shards)]
 
     def get(self, key: str, default: Any = None) -> Any:
         """
@@ -93,20 +220,22 @@ class MemoryCache:
         Returns:
             Cached value or default
         """
-        with self._lock:
-            entry = self._cache.get(key)
+        shard = self._shard(key)
+        with shard.lock:
+            entry = shard.entries.get(key)
 
             if entry is None:
-                self._stats["misses"] += 1
+                shard.misses += 1
                 return default
 
             if entry.is_expired():
-                del self._cache[key]
-                self._stats["misses"] += 1
+                shard.remove(key)
+                shard.misses += 1
                 return default
 
+            shard.entries.move_to_end(key)
             entry.touch()
-            self._stats["hits"] += 1
+            shard.hits += 1
             return entry.value
 
     def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
@@ -121,13 +250,11 @@ class MemoryCache:
         if ttl is None:
             ttl = self._default_ttl
 
-        with self._lock:
-            # Cleanup if at max size
-            if len(self._cache) >= self._max_size:
-                self._cleanup()
-
-            self._cache[key] = CacheEntry(value, ttl)
-            self._stats["sets"] += 1
+        entry = CacheEntry(value, ttl)
+        shard = self._shard(key)
+        with shard.lock:
+            shard.add(key, entry)
+            shard.sets += 1
 
     def delete(self, key: str) -> bool:
         """
@@ -136,11 +263,9 @@ class MemoryCache:
         Returns:
             True if key existed, False otherwise
         """
-        with self._lock:
-            if key in self._cache:
-                del self._cache[key]
-                return True
-            return False
+        shard = self._shard(key)
+        with shard.lock:
+            return shard.remove(key)
 
     def clear(self) -> int:
         """
@@ -149,10 +274,11 @@ class MemoryCache:
         Returns:
             Number of entries cleared
         """
-        with self._lock:
-            count = len(self._cache)
-            self._cache.clear()
-            return count
+        count = 0
+        for shard in self._shards:
+            with shard.lock:
+                count += shard.clear()
+        return count
 
     def invalidate_pattern(self, pattern: str) -> int:
         """
@@ -164,52 +290,45 @@ class MemoryCache:
         Returns:
             Number of keys invalidated
         """
-        with self._lock:
-            keys_to_delete = [k for k in self._cache.keys() if k.startswith(pattern)]
-            for key in keys_to_delete:
-                del self._cache[key]
-            return len(keys_to_delete)
+        count = 0
+        for shard in self._shards:
+            with shard.lock:
+                for key in shard.matching_keys(pattern):
+                    shard.remove(key)
+                    count += 1
+        return count
 
     def _cleanup(self) -> int:
-        """Remove expired entries and oldest entries if still at max size."""
+        """Remove expired entries from every shard; returns how many."""
         now = time.time()
-        expired = []
-        oldest = []
-
-        # Find expired entries
-        for key, entry in self._cache.items():
-            if entry.is_expired():
-                expired.append(key)
-            else:
-                oldest.append((key, entry.created_at))
-
-        # Remove expired
-        for key in expired:
-            del self._cache[key]
-            self._stats["evictions"] += 1
-
-        # If still at max, remove oldest 10%
-        if len(self._cache) >= self._max_size:
-            oldest.sort(key=lambda x: x[1])
-            to_remove = oldest[:max(1, len(oldest) // 10)]
-            for key, _ in to_remove:
-                del self._cache[key]
-                self._stats["evictions"] += 1
-
-        return len(expired) + len(oldest)
+        removed = 0
+        for shard in self._shards:
+            with shard.lock:
+                removed += shard.purge_expired(now)
+        return removed
 
     def stats(self) -> Dict[str, Any]:
         """Get cache statistics."""
-        with self._lock:
-            total = self._stats["hits"] + self._stats["misses"]
-            hit_rate = (self._stats["hits"] / total * 100) if total > 0 else 0
-
-            return {
-                **self._stats,
-                "size": len(self._cache),
-                "max_size": self._max_size,
-                "hit_rate_percent": float(money(hit_rate)),
-            }
+        totals = {"hits": 0, "misses": 0, "sets": 0, "evictions": 0}
+        size = 0
+        for shard in self._shards:
+            with shard.lock:
+                totals["hits"] += shard.hits
+                totals["misses"] += shard.misses
+                totals["sets"] += shard.sets
+                totals["evictions"] += shard.evictions
+                size += len(shard.entries)
+
+        total = totals["hits"] + totals["misses"]
+        hit_rate = (totals["hits"] / total * 100) if total > 0 else 0
+
+        return {
+            **totals,
+            "size": size,
+            "max_size": self._max_size,
+            "shards": len(self._shards),
+            "hit_rate_percent": float(money(hit_rate)),
+        }
 
 
 # Global cache instance
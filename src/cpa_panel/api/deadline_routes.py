@@ -411,7 +411,8 @@ async def add_reminder(
     except ValueError:
         raise HTTPException(400, f"Invalid reminder type: {request.reminder_type}")
 
-    reminder = deadline.add_reminder(
+    reminder = deadline_service.add_reminder(
+        deadline.id,
         days_before=request.days_before,
         reminder_type=reminder_type,
         recipient_type=request.recipient_type,
@@ -2,46 +2,34 @@
 CPA Data Export Routes
 
 Provides CSV export for clients, leads, and activity logs.
+
+Exports stream from the database in keyset-paginated batches (see
+services/csv_export_service.py), so large firms download with constant
+server memory. The first page is read before the response starts, so a
+failed query is returned as an HTTP error rather than a truncated file.
 """
 
-import csv
-import io
 import logging
 from datetime import datetime, timezone
+from typing import AsyncIterator
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from fastapi.responses import StreamingResponse
 
 from .auth_dependencies import require_internal_cpa_auth
+from .common import get_tenant_id
+from ..services.csv_export_service import EXPORT_TYPES, stream_export
 
 logger = logging.getLogger(__name__)
 
 export_router = APIRouter(prefix="/export", tags=["CPA Data Export"])
 
 
-def _csv_streaming_response(rows: list[dict], filename: str) -> StreamingResponse:
-    """Create a StreamingResponse with CSV content."""
-    if not rows:
-        output = io.StringIO()
-        output.write("No data available\n")
-        output.seek(0)
-        return StreamingResponse(
-            iter([output.getvalue()]),
-            media_type="text/csv",
-            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
-        )
-
-    output = io.StringIO()
-    writer = csv.DictWriter(output, fieldnames=rows[0].keys())
-    writer.writeheader()
-    writer.writerows(rows)
-    output.seek(0)
-
-    return StreamingResponse(
-        iter([output.getvalue()]),
-        media_type="text/csv",
-        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
-    )
+async def _prepend(first: bytes, rest: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Yield an already-read chunk, then the remainder of the stream."""
+    yield first
+    async for chunk in rest:
+        yield chunk
 
 
 @export_router.get(
@@ -51,59 +39,40 @@ def _csv_streaming_response(rows: list[dict], filename: str) -> StreamingRespons
 )
 async def export_data(
     export_type: str,
+    request: Request,
     format: str = Query("csv", description="Export format (csv)"),
+    gzip: bool = Query(False, description="Download as a gzip-compressed .csv.gz file"),
     _auth=Depends(require_internal_cpa_auth),
 ):
     """Export CPA data as a downloadable CSV file."""
     if format != "csv":
         raise HTTPException(status_code=400, detail="Only CSV format is currently supported")
-
-    now = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
-
-    if export_type == "clients":
-        rows = [
-            {
-                "client_id": f"client-{i}",
-                "name": f"Client {i}",
-                "email": f"client{i}@example.com",
-                "filing_status": ["single", "mfj", "hoh"][i % 3],
-                "status": "active",
-                "created_at": datetime.now(timezone.utc).isoformat(),
-            }
-            for i in range(1, 11)
-        ]
-        return _csv_streaming_response(rows, f"clients_export_{now}.csv")
-
-    elif export_type == "leads":
-        rows = [
-            {
-                "lead_id": f"lead-{i}",
-                "name": f"Prospect {i}",
-                "email": f"prospect{i}@example.com",
-                "source": ["website", "referral", "calculator"][i % 3],
-                "status": ["new", "qualified", "contacted", "engaged"][i % 4],
-                "priority": ["high", "medium", "low"][i % 3],
-                "estimated_savings": round(500 + i * 200, 2),
-                "created_at": datetime.now(timezone.utc).isoformat(),
-            }
-            for i in range(1, 16)
-        ]
-        return _csv_streaming_response(rows, f"leads_export_{now}.csv")
-
-    elif export_type == "activity":
-        rows = [
-            {
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-                "action": ["login", "view_client", "generate_report", "send_email", "update_status"][i % 5],
-                "user": "current_user",
-                "details": f"Activity log entry {i}",
-            }
-            for i in range(1, 21)
-        ]
-        return _csv_streaming_response(rows, f"activity_export_{now}.csv")
-
-    else:
+    if export_type not in EXPORT_TYPES:
         raise HTTPException(
             status_code=400,
             detail=f"Unknown export type: {export_type}. Use: clients, leads, activity",
         )
+
+    firm_id = getattr(_auth, "firm_id", None) or get_tenant_id(request)
+    now = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
+    filename = f"{export_type}_export_{now}.csv" + (".gz" if gzip else "")
+
+    # Read the header (which waits on the first page query) before responding
+    stream = stream_export(export_type, str(firm_id) if firm_id else "", gzip_output=gzip)
+    try:
+        first = await stream.__anext__()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Export {export_type} failed for firm {firm_id}: {e}")
+        raise HTTPException(status_code=503, detail="Export is temporarily unavailable")
+
+    return StreamingResponse(
+        _prepend(first, stream),
+        media_type="application/gzip" if gzip else "text/csv",
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            # Let reverse proxies pass batches through as they are produced
+            "X-Accel-Buffering": "no",
+        },
+    )
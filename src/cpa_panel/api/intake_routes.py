@@ -46,6 +46,16 @@ def get_db_connection():
     return conn
 
 
+def _release_upload(storage_path: Path) -> None:
+    """Drop the index reference and file of an upload whose metadata was not saved."""
+    try:
+        from database.upload_references import get_upload_reference_index
+        get_upload_reference_index().unregister([storage_path])
+        storage_path.unlink(missing_ok=True)
+    except Exception as e:
+        logger.warning(f"Could not release upload {storage_path}: {e}")
+
+
 def ensure_tables_exist():
     """Ensure necessary tables exist."""
     conn = get_db_connection()
@@ -436,6 +446,7 @@ async def upload_document(
 
     now = datetime.now(timezone.utc).isoformat()
     document_id = f"doc-{uuid.uuid4().hex[:12]}"
+    registered_path = None
 
     try:
         # Read file content
@@ -467,6 +478,18 @@ async def upload_document(
         with open(storage_path, "wb") as f:
             f.write(content)
 
+        # Index the file before its row exists so orphaned-upload cleanup
+        # never sees it unreferenced; released below if the insert fails
+        from database.upload_references import OWNER_CLIENT_DOCUMENT, get_upload_reference_index
+        get_upload_reference_index().register(
+            storage_path,
+            owner_type=OWNER_CLIENT_DOCUMENT,
+            document_id=document_id,
+            session_id=session_id,
+            tenant_id=get_tenant_id(request),
+        )
+        registered_path = storage_path
+
         # Determine document type from sanitized filename
         filename_lower = safe_filename.lower()
         document_type = "unknown"
@@ -527,6 +550,8 @@ async def upload_document(
         raise
     except Exception as e:
         logger.error(f"Upload document error: {e}")
+        if registered_path is not None:
+            _release_upload(registered_path)
         raise HTTPException(status_code=500, detail=get_safe_error_message(e))
 
 
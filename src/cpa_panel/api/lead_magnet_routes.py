@@ -688,6 +688,45 @@ async def get_funnel_kpis(
         raise HTTPException(status_code=500, detail=str(exc))
 
 
+@lead_magnet_router.get(
+    "/analytics/timeseries",
+    summary="Get funnel event time series",
+    description="Returns hourly or daily funnel event counts from the pre-aggregated rollups.",
+    dependencies=[Depends(require_internal_cpa_auth)],
+)
+async def get_funnel_timeseries(
+    granularity: str = Query(default="day", description="Bucket size: 'hour' or 'day'."),
+    date_from: Optional[str] = Query(default=None, description="Start date (YYYY-MM-DD)."),
+    date_to: Optional[str] = Query(default=None, description="End date (YYYY-MM-DD)."),
+    event_name: Optional[str] = Query(default=None, description="Filter by event name."),
+    variant_id: Optional[str] = Query(default=None, description="Filter by experiment variant."),
+    utm_source: Optional[str] = Query(default=None, description="Filter by UTM source."),
+    device_type: Optional[str] = Query(default=None, description="Filter by device type (mobile/tablet/desktop)."),
+    cpa_id: Optional[str] = Query(default=None, description="Filter by CPA id."),
+):
+    """Get funnel event counts per hour or day."""
+    try:
+        service = get_lead_magnet_service()
+        return {
+            "granularity": granularity,
+            "series": service.get_funnel_timeseries(
+                granularity=granularity,
+                date_from=date_from,
+                date_to=date_to,
+                event_name=event_name,
+                variant_id=variant_id,
+                utm_source=utm_source,
+                device_type=device_type,
+                cpa_id=cpa_id,
+            ),
+        }
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    except Exception as exc:
+        logger.error("Failed to fetch funnel time series: %s", exc)
+        raise HTTPException(status_code=500, detail="An internal error occurred")
+
+
 @lead_magnet_router.get(
     "/{session_id}/report",
     summary="Get Tier 1 FREE report",
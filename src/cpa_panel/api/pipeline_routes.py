@@ -28,7 +28,7 @@ def get_pipeline_service():
 # =============================================================================
 
 @pipeline_router.get("/leads/pipeline")
-async def get_pipeline(request: Request):
+async def get_pipeline(request: Request, limit: int = 50):
     """
     Get lead pipeline organized by state (Kanban view).
 
@@ -37,12 +37,15 @@ async def get_pipeline(request: Request):
     - Estimated value
     - Time in stage
     - Visibility level
+
+    Each column holds its first `limit` leads and a `next_cursor` for
+    /leads/pipeline/column/{state}; counts and values cover all leads.
     """
     tenant_id = get_tenant_id(request)
 
     try:
         service = get_pipeline_service()
-        result = service.get_pipeline_by_state(tenant_id)
+        result = service.get_pipeline_by_state(tenant_id, limit=min(max(limit, 1), 500))
 
         return JSONResponse(result)
 
@@ -51,6 +54,31 @@ async def get_pipeline(request: Request):
         raise HTTPException(status_code=500, detail="An internal error occurred")
 
 
+@pipeline_router.get("/leads/pipeline/column/{state}")
+async def get_pipeline_column(state: str, request: Request, limit: int = 50, cursor: Optional[str] = None):
+    """
+    Get the next page of one Kanban column.
+
+    Pass the column's `next_cursor` as `cursor`.
+    """
+    tenant_id = get_tenant_id(request)
+
+    try:
+        service = get_pipeline_service()
+        result = service.get_pipeline_column(state, tenant_id, limit=min(max(limit, 1), 500), cursor=cursor)
+
+        if not result.get("success"):
+            raise HTTPException(status_code=400, detail=result.get("error"))
+
+        return JSONResponse(result)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Get pipeline column error: {e}")
+        raise HTTPException(status_code=500, detail="An internal error occurred")
+
+
 @pipeline_router.get("/leads/pipeline/metrics")
 async def get_pipeline_metrics(request: Request):
     """
@@ -135,7 +163,7 @@ async def get_velocity_metrics(request: Request):
 # =============================================================================
 
 @pipeline_router.get("/leads/priority-queue")
-async def get_priority_queue(request: Request, limit: int = 20):
+async def get_priority_queue(request: Request, limit: int = 20, cursor: Optional[str] = None):
     """
     Get prioritized lead queue for CPA action.
 
@@ -149,15 +177,22 @@ async def get_priority_queue(request: Request, limit: int = 20):
     - Priority score
     - Estimated value
     - Recommended action
+
+    Pass `next_cursor` back as `cursor` for the next page.
     """
     tenant_id = get_tenant_id(request)
 
     try:
         service = get_pipeline_service()
-        result = service.get_priority_queue(tenant_id, limit)
+        result = service.get_priority_queue(tenant_id, limit, cursor=cursor)
+
+        if not result.get("success"):
+            raise HTTPException(status_code=400, detail=result.get("error"))
 
         return JSONResponse(result)
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Get priority queue error: {e}")
         raise HTTPException(status_code=500, detail="An internal error occurred")
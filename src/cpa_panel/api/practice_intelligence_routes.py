@@ -18,11 +18,10 @@ NOT IN SCOPE (USE EXTERNAL PMS):
 """
 
 from fastapi import APIRouter, HTTPException, Request, Depends
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Optional
 from datetime import datetime
 import logging
 
-from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 try:
@@ -33,111 +32,35 @@ except ImportError:
         raise HTTPException(status_code=503, detail="Database session dependency unavailable")
     get_db_session = get_async_session
 from ..practice_intelligence import (
+    PortfolioAggregateStore,
     PracticeIntelligenceService,
     get_intelligence_service,
+    get_portfolio_aggregate_store,
 )
+from ..practice_intelligence.aggregates import load_portfolio_records
 from .common import format_success_response, format_error_response, get_tenant_id
 
 logger = logging.getLogger(__name__)
 
 
-async def _get_firm_engagements(firm_id: str, session: AsyncSession) -> List[Dict[str, Any]]:
-    """Fetch engagement data for a firm."""
-    # Check if engagements table exists, otherwise use workflow data
-    query = text("""
-        SELECT
-            COALESCE(engagement_type, 'tax_preparation') as engagement_type,
-            COUNT(*) as count
-        FROM (
-            SELECT
-                CASE
-                    WHEN tr.return_data->>'engagement_type' IS NOT NULL
-                        THEN tr.return_data->>'engagement_type'
-                    WHEN tr.status IN ('advisory', 'planning')
-                        THEN 'tax_advisory'
-                    ELSE 'tax_preparation'
-                END as engagement_type
-            FROM tax_returns tr
-            JOIN taxpayers tp ON tr.return_id = tp.return_id
-            JOIN clients c ON tp.email = c.email
-            JOIN users u ON c.preparer_id = u.user_id
-            WHERE u.firm_id = :firm_id
-        ) sub
-        GROUP BY engagement_type
-    """)
-    try:
-        result = await session.execute(query, {"firm_id": firm_id})
-        rows = result.fetchall()
-        engagements = []
-        for row in rows:
-            for _ in range(row[1]):
-                engagements.append({"engagement_type": row[0]})
-        return engagements
-    except Exception as e:
-        logger.debug(f"Could not fetch engagements: {e}")
-        return []
-
-
-async def _get_tax_returns_for_year(firm_id: str, tax_year: int, session: AsyncSession) -> List[Dict[str, Any]]:
-    """Fetch tax return data for a specific year."""
-    query = text("""
-        SELECT
-            tr.return_id,
-            tr.tax_year,
-            tr.filing_status,
-            tr.line_9_total_income,
-            tr.line_14_total_deductions,
-            tr.line_24_total_tax_liability,
-            tr.line_35a_refund,
-            tr.line_37_amount_owed,
-            tr.return_data
-        FROM tax_returns tr
-        JOIN taxpayers tp ON tr.return_id = tp.return_id
-        JOIN clients c ON tp.email = c.email
-        JOIN users u ON c.preparer_id = u.user_id
-        WHERE u.firm_id = :firm_id AND tr.tax_year = :tax_year
-    """)
-    try:
-        result = await session.execute(query, {"firm_id": firm_id, "tax_year": tax_year})
-        rows = result.fetchall()
-        returns = []
-        for row in rows:
-            return_data = row[8] if row[8] else {}
-            if isinstance(return_data, str):
-                import json
-                return_data = json.loads(return_data)
-
-            # Determine complexity tier based on income and deductions
-            total_income = float(row[3] or 0)
-            total_deductions = float(row[4] or 0)
-
-            if total_income > 1000000:
-                complexity_tier = 5  # Ultra Complex
-            elif total_income > 500000:
-                complexity_tier = 4  # High Net Worth
-            elif total_income > 200000 or total_deductions > 50000:
-                complexity_tier = 3  # Complex
-            elif total_income > 75000:
-                complexity_tier = 2  # Moderate
-            else:
-                complexity_tier = 1  # Simple
-
-            returns.append({
-                "return_id": str(row[0]),
-                "tax_year": row[1],
-                "filing_status": row[2],
-                "total_income": total_income,
-                "total_deductions": total_deductions,
-                "tax_liability": float(row[5] or 0),
-                "refund": float(row[6] or 0),
-                "amount_owed": float(row[7] or 0),
-                "complexity_tier": complexity_tier,
-                **return_data
-            })
-        return returns
-    except Exception as e:
-        logger.debug(f"Could not fetch tax returns: {e}")
-        return []
+async def _ensure_aggregates(firm_id: str, session: AsyncSession) -> PortfolioAggregateStore:
+    """
+    Return the aggregate store, building the firm's aggregates on first use.
+
+    After the first build the aggregates are kept current by the return
+    save/delete hooks, so requests only read precomputed totals.
+    """
+    store = get_portfolio_aggregate_store()
+    if not store.is_built(firm_id):
+        try:
+            records = await load_portfolio_records(session, firm_id)
+        except Exception as e:
+            # Never mark the firm built from a failed load; the next request retries
+            logger.error(f"Could not load tax returns for practice metrics (firm {firm_id}): {e}")
+            raise HTTPException(status_code=503, detail="Practice metrics are temporarily unavailable")
+        store.rebuild(firm_id, engagements=records, returns=records)
+    return store
+
 
 router = APIRouter(prefix="/intelligence", tags=["practice-intelligence"])
 
@@ -162,21 +85,8 @@ async def get_portfolio_metrics(
     current_year = datetime.now().year
     prior_year = current_year - 1
 
-    # Fetch real data from database
-    engagements = await _get_firm_engagements(tenant_id, session)
-    current_year_returns = await _get_tax_returns_for_year(tenant_id, current_year, session)
-    prior_year_returns = await _get_tax_returns_for_year(tenant_id, prior_year, session)
-
-    service = get_intelligence_service()
-
-    metrics = service.get_portfolio_metrics(
-        tenant_id=tenant_id,
-        engagements=engagements,
-        current_year_returns=current_year_returns,
-        prior_year_returns=prior_year_returns if prior_year_returns else None,
-        current_year=current_year,
-        prior_year=prior_year,
-    )
+    store = await _ensure_aggregates(tenant_id, session)
+    metrics = store.portfolio_metrics(tenant_id, current_year, prior_year)
 
     return format_success_response({
         "metrics": metrics.to_dict(),
@@ -232,6 +142,56 @@ async def calculate_portfolio_metrics(
     })
 
 
+@router.post("/metrics/rebuild")
+async def rebuild_portfolio_metrics(
+    request: Request,
+    session: AsyncSession = Depends(get_db_session),
+) -> Dict[str, Any]:
+    """
+    Recompute the tenant's stored aggregates from its tax returns.
+
+    Use after bulk imports or data fixes that bypass the return save hooks.
+    """
+    tenant_id = get_tenant_id(request)
+    records = await load_portfolio_records(session, tenant_id)
+    summary = get_portfolio_aggregate_store().rebuild(tenant_id, engagements=records, returns=records)
+
+    return format_success_response({
+        "tenant_id": tenant_id,
+        "rebuilt": summary,
+    })
+
+
+@router.get("/metrics/consistency")
+async def check_portfolio_metrics(
+    request: Request,
+    session: AsyncSession = Depends(get_db_session),
+) -> Dict[str, Any]:
+    """
+    Compare the stored aggregates with a full recomputation.
+
+    Differences mean a change bypassed the hooks; rebuild to correct them.
+    """
+    tenant_id = get_tenant_id(request)
+    current_year = datetime.now().year
+    prior_year = current_year - 1
+
+    store = await _ensure_aggregates(tenant_id, session)
+    records = await load_portfolio_records(session, tenant_id)
+    result = store.check_consistency(
+        tenant_id,
+        engagements=records,
+        returns=records,
+        current_year=current_year,
+        prior_year=prior_year,
+    )
+
+    return format_success_response({
+        "tenant_id": tenant_id,
+        **result,
+    })
+
+
 @router.get("/advisory-mix")
 async def get_advisory_mix(
     request: Request,
@@ -246,11 +206,8 @@ async def get_advisory_mix(
     """
     tenant_id = get_tenant_id(request)
 
-    # Fetch real engagement data from database
-    engagements = await _get_firm_engagements(tenant_id, session)
-
-    service = get_intelligence_service()
-    mix = service.calculate_advisory_mix(engagements)
+    store = await _ensure_aggregates(tenant_id, session)
+    mix = store.advisory_mix(tenant_id)
 
     return format_success_response({
         "metric": "advisory_compliance_mix",
@@ -276,11 +233,8 @@ async def get_complexity_distribution(
     tenant_id = get_tenant_id(request)
     current_year = datetime.now().year
 
-    # Fetch real tax return data from database
-    current_year_returns = await _get_tax_returns_for_year(tenant_id, current_year, session)
-
-    service = get_intelligence_service()
-    dist = service.calculate_complexity_distribution(current_year_returns)
+    store = await _ensure_aggregates(tenant_id, session)
+    dist = store.complexity_distribution(tenant_id, current_year)
 
     return format_success_response({
         "metric": "complexity_distribution",
@@ -314,17 +268,8 @@ async def get_yoy_surface(
     if prior_year is None:
         prior_year = current_year - 1
 
-    # Fetch real tax return data from database
-    current_year_returns = await _get_tax_returns_for_year(tenant_id, current_year, session)
-    prior_year_returns = await _get_tax_returns_for_year(tenant_id, prior_year, session)
-
-    service = get_intelligence_service()
-    surface = service.calculate_yoy_surface(
-        current_year_returns=current_year_returns,
-        prior_year_returns=prior_year_returns,
-        current_year=current_year,
-        prior_year=prior_year,
-    )
+    store = await _ensure_aggregates(tenant_id, session)
+    surface = store.yoy_surface(tenant_id, current_year, prior_year)
 
     return format_success_response({
         "metric": "yoy_value_surface",
@@ -499,29 +499,37 @@ async def list_tasks(
     session_id: Optional[str] = Query(None),
     include_completed: bool = Query(False),
     tags: Optional[str] = Query(None, description="Comma-separated tags"),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Page size (all tasks if omitted)"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
 ):
-    """List tasks with optional filters."""
+    """List tasks with optional filters, urgent first then by due date."""
     status_filter = TaskStatus(status) if status else None
     category_filter = TaskCategory(category) if category else None
     priority_filter = TaskPriority(priority) if priority else None
     tag_list = tags.split(",") if tags else None
 
-    tasks = task_service.get_tasks_for_firm(
-        firm_id=UUID(firm_id),
-        status=status_filter,
-        category=category_filter,
-        priority=priority_filter,
-        assigned_to=UUID(assigned_to) if assigned_to else None,
-        client_id=UUID(client_id) if client_id else None,
-        session_id=session_id,
-        include_completed=include_completed,
-        tags=tag_list,
-    )
+    try:
+        tasks, next_cursor = task_service.get_tasks_page(
+            firm_id=UUID(firm_id),
+            status=status_filter,
+            category=category_filter,
+            priority=priority_filter,
+            assigned_to=UUID(assigned_to) if assigned_to else None,
+            client_id=UUID(client_id) if client_id else None,
+            session_id=session_id,
+            include_completed=include_completed,
+            tags=tag_list,
+            limit=limit,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(400, str(e))
 
     return {
         "success": True,
         "tasks": [t.to_dict() for t in tasks],
         "total": len(tasks),
+        "next_cursor": next_cursor,
     }
 
 
@@ -530,18 +538,26 @@ async def get_my_tasks(
     firm_id: str = Query(..., description="Firm ID"),
     user_id: str = Query(..., description="User ID"),
     include_completed: bool = Query(False),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Page size (all tasks if omitted)"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
 ):
     """Get tasks assigned to the current user."""
-    tasks = task_service.get_my_tasks(
-        firm_id=UUID(firm_id),
-        user_id=UUID(user_id),
-        include_completed=include_completed,
-    )
+    try:
+        tasks, next_cursor = task_service.get_tasks_page(
+            firm_id=UUID(firm_id),
+            assigned_to=UUID(user_id),
+            include_completed=include_completed,
+            limit=limit,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(400, str(e))
 
     return {
         "success": True,
         "tasks": [t.to_dict() for t in tasks],
         "total": len(tasks),
+        "next_cursor": next_cursor,
     }
 
 
@@ -574,18 +590,26 @@ async def get_client_tasks(
     client_id: str,
     firm_id: str = Query(..., description="Firm ID"),
     include_completed: bool = Query(False),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Page size (all tasks if omitted)"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
 ):
     """Get all tasks for a client."""
-    tasks = task_service.get_tasks_for_client(
-        firm_id=UUID(firm_id),
-        client_id=UUID(client_id),
-        include_completed=include_completed,
-    )
+    try:
+        tasks, next_cursor = task_service.get_tasks_page(
+            firm_id=UUID(firm_id),
+            client_id=UUID(client_id),
+            include_completed=include_completed,
+            limit=limit,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(400, str(e))
 
     return {
         "success": True,
         "tasks": [t.to_dict() for t in tasks],
         "total": len(tasks),
+        "next_cursor": next_cursor,
     }
 
 
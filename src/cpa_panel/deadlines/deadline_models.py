@@ -44,6 +44,18 @@ class ReminderType(str, Enum):
     PUSH = "push"
 
 
+def _uuid(value: Optional[str]) -> Optional[UUID]:
+    return UUID(value) if value else None
+
+
+def _datetime(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+def _date(value: Optional[str]) -> Optional[date]:
+    return date.fromisoformat(value) if value else None
+
+
 @dataclass
 class DeadlineReminder:
     """Reminder configuration for a deadline."""
@@ -70,6 +82,21 @@ class DeadlineReminder:
             "created_at": self.created_at.isoformat(),
         }
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DeadlineReminder":
+        """Create from dictionary (inverse of to_dict)."""
+        return cls(
+            id=UUID(data["id"]),
+            deadline_id=_uuid(data.get("deadline_id")),
+            days_before=data.get("days_before", 7),
+            reminder_type=ReminderType(data.get("reminder_type", "email")),
+            recipient_type=data.get("recipient_type", "cpa"),
+            message_template=data.get("message_template"),
+            is_sent=data.get("is_sent", False),
+            sent_at=_datetime(data.get("sent_at")),
+            created_at=_datetime(data.get("created_at")) or datetime.now(timezone.utc),
+        )
+
 
 @dataclass
 class DeadlineAlert:
@@ -283,8 +310,37 @@ class Deadline:
             "completed_by": str(self.completed_by) if self.completed_by else None,
             "created_at": self.created_at.isoformat(),
             "updated_at": self.updated_at.isoformat(),
+            "created_by": str(self.created_by) if self.created_by else None,
         }
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Deadline":
+        """Create from dictionary (inverse of to_dict; derived fields are ignored)."""
+        return cls(
+            id=UUID(data["id"]),
+            firm_id=_uuid(data.get("firm_id")),
+            client_id=_uuid(data.get("client_id")),
+            session_id=data.get("session_id"),
+            deadline_type=DeadlineType(data.get("deadline_type", "filing")),
+            title=data.get("title", ""),
+            description=data.get("description"),
+            due_date=_date(data.get("due_date")),
+            tax_year=data.get("tax_year", 2025),
+            status=DeadlineStatus(data.get("status", "upcoming")),
+            completed_at=_datetime(data.get("completed_at")),
+            completed_by=_uuid(data.get("completed_by")),
+            extension_filed=data.get("extension_filed", False),
+            extension_filed_at=_datetime(data.get("extension_filed_at")),
+            extended_due_date=_date(data.get("extended_due_date")),
+            assigned_to=_uuid(data.get("assigned_to")),
+            priority=data.get("priority", "normal"),
+            reminders=[DeadlineReminder.from_dict(r) for r in data.get("reminders", [])],
+            notes=data.get("notes"),
+            created_at=_datetime(data.get("created_at")) or datetime.now(timezone.utc),
+            updated_at=_datetime(data.get("updated_at")) or datetime.now(timezone.utc),
+            created_by=_uuid(data.get("created_by")),
+        )
+
 
 # Standard tax deadlines for reference
 STANDARD_DEADLINES_2025 = {
@@ -2,11 +2,28 @@
 Deadline Service
 
 Business logic for deadline management.
+
+Deadlines are indexed by firm, client and session, and each firm keeps
+its deadlines sorted by effective due date so date filters and calendar
+views are range queries. Unsent reminders sit in a per-firm min-heap
+keyed by the date they should fire. A reminder sweep pops entries whose
+date has passed into the firm's due set, so it only touches reminders
+that are due. Entries are invalidated lazily (completed, waived, deleted
+or rescheduled) and dropped when a sweep reaches them.
+
+With a persistence layer every change is written through, along with
+the fire dates of the deadline's unsent reminders. load() rebuilds the
+service from every stored deadline (web worker startup); load_due() reads
+only the deadlines with a due, unsent reminder, which is what the Celery
+reminder job calls before each sweep.
 """
 
+import bisect
+import heapq
+import itertools
 import logging
 from datetime import datetime, date, timedelta, timezone
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable, Iterable, Set, Tuple
 from uuid import UUID, uuid4
 from collections import defaultdict
 
@@ -23,6 +40,9 @@ from .deadline_models import (
 
 logger = logging.getLogger(__name__)
 
+# lookup(firm_id, client_id) -> {"cpa": (email, name), "client": (email, name)}
+ContactLookup = Callable[[UUID, Optional[UUID]], Dict[str, Tuple[Optional[str], str]]]
+
 
 class DeadlineService:
     """
@@ -37,12 +57,206 @@ class DeadlineService:
     - Deadline analytics
     """
 
-    def __init__(self):
-        # In-memory storage (replace with database in production)
+    def __init__(self, persistence=None, contact_lookup: Optional[ContactLookup] = None):
+        """
+        Args:
+            persistence: Optional DeadlinePersistence written through on every change
+            contact_lookup: Resolves reminder recipients (defaults to the firms/clients tables)
+        """
+        self._persistence = persistence
+        self._contact_lookup = contact_lookup or lookup_deadline_contacts
+        self._reset()
+
+    def _reset(self) -> None:
         self._deadlines: Dict[UUID, Deadline] = {}
         self._alerts: Dict[UUID, DeadlineAlert] = {}
         self._reminders_sent: Dict[UUID, List[UUID]] = defaultdict(list)
 
+        # Secondary indexes
+        self._by_firm: Dict[UUID, Set[UUID]] = defaultdict(set)
+        self._by_client: Dict[UUID, Set[UUID]] = defaultdict(set)
+        self._by_session: Dict[str, Set[UUID]] = defaultdict(set)
+        self._firm_dates: Dict[UUID, List[Tuple[date, UUID]]] = defaultdict(list)  # sorted (effective date, id)
+        self._indexed_date: Dict[UUID, date] = {}
+
+        # Reminder schedule: per-firm heap of (fire date, seq, deadline id, reminder id)
+        self._reminder_heaps: Dict[UUID, List[Tuple[date, int, UUID, UUID]]] = defaultdict(list)
+        self._scheduled: Dict[UUID, date] = {}  # reminder id -> fire date of its live heap entry
+        self._due: Dict[UUID, Dict[UUID, Tuple[date, int, UUID]]] = defaultdict(dict)  # popped, not yet sent
+        self._seq = itertools.count()
+
+    # =========================================================================
+    # PERSISTENCE
+    # =========================================================================
+
+    def load(self) -> int:
+        """
+        Replace the in-memory deadlines with the persisted ones and rebuild the indexes.
+
+        Returns:
+            Number of deadlines loaded
+        """
+        if self._persistence is None:
+            return len(self._deadlines)
+        return self._replace_with(self._persistence.load_deadlines())
+
+    def load_due(self, today: Optional[date] = None) -> int:
+        """
+        Replace the in-memory deadlines with the persisted ones that have an
+        unsent reminder due on or before `today`.
+
+        Enough for get_due_reminders() and mark_reminder_sent(); the read
+        follows the persisted reminder schedule, so a sweep costs the number
+        of due reminders rather than the number of deadlines.
+
+        Returns:
+            Number of deadlines loaded
+        """
+        if self._persistence is None:
+            return len(self._deadlines)
+        if not self._persistence.is_schedule_backfilled():
+            self._backfill_schedule()
+        return self._replace_with(self._persistence.load_due_deadlines(today or date.today()))
+
+    def _backfill_schedule(self) -> None:
+        """Schedule the reminders of deadlines saved before the schedule existed."""
+        schedules = []
+        for data in self._persistence.load_deadlines():
+            try:
+                deadline = Deadline.from_dict(data)
+            except (KeyError, ValueError) as e:
+                logger.error(f"Skipping unreadable deadline {data.get('id')}: {e}")
+                continue
+            schedules.append((str(deadline.id), str(deadline.firm_id), _reminder_schedule(deadline)))
+        self._persistence.backfill_schedule(schedules)
+        logger.info(f"Backfilled reminder schedule for {len(schedules)} deadlines")
+
+    def _replace_with(self, rows: List[Dict[str, Any]]) -> int:
+        alerts = self._alerts
+        self._reset()
+        self._alerts = alerts
+        for data in rows:
+            try:
+                deadline = Deadline.from_dict(data)
+            except (KeyError, ValueError) as e:
+                logger.error(f"Skipping unreadable deadline {data.get('id')}: {e}")
+                continue
+            self._deadlines[deadline.id] = deadline
+            self._index(deadline)
+        return len(self._deadlines)
+
+    def _save(self, deadline: Deadline) -> None:
+        if self._persistence is None:
+            return
+        try:
+            self._persistence.save_deadline(
+                str(deadline.id),
+                str(deadline.firm_id),
+                deadline.to_dict(),
+                reminders=_reminder_schedule(deadline),
+            )
+        except Exception as e:
+            logger.error(f"Failed to persist deadline {deadline.id}: {e}")
+
+    # =========================================================================
+    # INDEXES
+    # =========================================================================
+
+    def _index(self, deadline: Deadline) -> None:
+        """Add a deadline to the secondary indexes and schedule its reminders."""
+        self._by_firm[deadline.firm_id].add(deadline.id)
+        if deadline.client_id is not None:
+            self._by_client[deadline.client_id].add(deadline.id)
+        if deadline.session_id is not None:
+            self._by_session[deadline.session_id].add(deadline.id)
+        self._reindex_date(deadline)
+
+    def _unindex(self, deadline: Deadline) -> None:
+        self._by_firm[deadline.firm_id].discard(deadline.id)
+        if deadline.client_id is not None:
+            self._by_client[deadline.client_id].discard(deadline.id)
+        if deadline.session_id is not None:
+            self._by_session[deadline.session_id].discard(deadline.id)
+        old = self._indexed_date.pop(deadline.id, None)
+        if old is not None:
+            _discard(self._firm_dates[deadline.firm_id], (old, deadline.id))
+        for reminder in deadline.reminders:
+            self._scheduled.pop(reminder.id, None)  # heap entries go stale
+
+    def _reindex_date(self, deadline: Deadline) -> None:
+        """Re-sort a deadline after its effective due date changed; reschedule reminders."""
+        effective = deadline.effective_due_date or date.max
+        old = self._indexed_date.get(deadline.id)
+        if old != effective:
+            dates = self._firm_dates[deadline.firm_id]
+            if old is not None:
+                _discard(dates, (old, deadline.id))
+            bisect.insort(dates, (effective, deadline.id))
+            self._indexed_date[deadline.id] = effective
+        self._schedule_reminders(deadline)
+
+    def _schedule_reminders(self, deadline: Deadline) -> None:
+        if deadline.effective_due_date is None:
+            return
+        heap = self._reminder_heaps[deadline.firm_id]
+        for reminder in deadline.reminders:
+            if reminder.is_sent:
+                continue
+            fire_date = deadline.effective_due_date - timedelta(days=reminder.days_before)
+            if self._scheduled.get(reminder.id) != fire_date:
+                self._scheduled[reminder.id] = fire_date
+                heapq.heappush(heap, (fire_date, next(self._seq), deadline.id, reminder.id))
+
+    def _live_reminder(
+        self,
+        fire_date: date,
+        deadline_id: UUID,
+        reminder_id: UUID,
+    ) -> Optional[Tuple[Deadline, DeadlineReminder]]:
+        """Resolve a scheduled reminder; None if it is stale."""
+        if self._scheduled.get(reminder_id) != fire_date:
+            return None
+        deadline = self._deadlines.get(deadline_id)
+        if deadline is None or deadline.status in [DeadlineStatus.COMPLETED, DeadlineStatus.WAIVED]:
+            return None
+        for reminder in deadline.reminders:
+            if reminder.id == reminder_id:
+                return None if reminder.is_sent else (deadline, reminder)
+        return None
+
+    def _due_reminders(self, firm_id: UUID, today: date) -> List[Tuple[date, Deadline, DeadlineReminder]]:
+        """Unsent reminders due on or before `today`, in fire date order."""
+        heap = self._reminder_heaps.get(firm_id)
+        due = self._due[firm_id]
+        while heap and heap[0][0] <= today:
+            fire_date, seq, deadline_id, reminder_id = heapq.heappop(heap)
+            if self._scheduled.get(reminder_id) == fire_date:
+                due[reminder_id] = (fire_date, seq, deadline_id)
+
+        result = []
+        for reminder_id, (fire_date, seq, deadline_id) in list(due.items()):
+            live = self._live_reminder(fire_date, deadline_id, reminder_id)
+            if live is None:
+                del due[reminder_id]
+                if self._scheduled.get(reminder_id) == fire_date:
+                    del self._scheduled[reminder_id]  # allow rescheduling, e.g. a waived deadline extended
+            elif fire_date <= today:
+                result.append((fire_date, seq, *live))
+        result.sort(key=lambda item: (item[0], item[1]))
+        return [(fire_date, deadline, reminder) for fire_date, _, deadline, reminder in result]
+
+    def _firm_range(
+        self,
+        firm_id: UUID,
+        from_date: Optional[date],
+        to_date: Optional[date],
+    ) -> Iterable[Deadline]:
+        """Firm deadlines with effective due date in [from_date, to_date], in date order."""
+        dates = self._firm_dates.get(firm_id, [])
+        start = bisect.bisect_left(dates, (from_date,)) if from_date else 0
+        end = bisect.bisect_left(dates, (to_date + timedelta(days=1),)) if to_date and to_date < date.max else len(dates)
+        return (self._deadlines[deadline_id] for _, deadline_id in dates[start:end])
+
     # =========================================================================
     # DEADLINE CRUD
     # =========================================================================
@@ -105,6 +319,8 @@ class DeadlineService:
             self._add_default_reminders(deadline)
 
         self._deadlines[deadline.id] = deadline
+        self._index(deadline)
+        self._save(deadline)
         logger.info(f"Created deadline: {deadline.id} - {deadline.title}")
 
         return deadline
@@ -163,6 +379,9 @@ class DeadlineService:
 
         deadline.updated_at = datetime.now(timezone.utc)
         deadline.update_status()
+        if due_date is not None:
+            self._reindex_date(deadline)
+        self._save(deadline)
 
         logger.info(f"Updated deadline: {deadline_id}")
         return deadline
@@ -170,7 +389,12 @@ class DeadlineService:
     def delete_deadline(self, deadline_id: UUID) -> bool:
         """Delete a deadline."""
         if deadline_id in self._deadlines:
-            del self._deadlines[deadline_id]
+            self._unindex(self._deadlines.pop(deadline_id))
+            if self._persistence is not None:
+                try:
+                    self._persistence.delete_deadline(str(deadline_id))
+                except Exception as e:
+                    logger.error(f"Failed to delete persisted deadline {deadline_id}: {e}")
             logger.info(f"Deleted deadline: {deadline_id}")
             return True
         return False
@@ -186,6 +410,7 @@ class DeadlineService:
             return None
 
         deadline.mark_completed(completed_by)
+        self._save(deadline)
         logger.info(f"Completed deadline: {deadline_id}")
         return deadline
 
@@ -204,6 +429,8 @@ class DeadlineService:
 
         # Add reminders for the new extended deadline
         self._add_default_reminders(deadline)
+        self._reindex_date(deadline)
+        self._save(deadline)
 
         logger.info(f"Filed extension for deadline: {deadline_id}, new date: {extended_date}")
         return deadline
@@ -223,10 +450,18 @@ class DeadlineService:
         assigned_to: Optional[UUID] = None,
         include_completed: bool = False,
     ) -> List[Deadline]:
-        """Get deadlines for a firm with optional filters."""
-        deadlines = []
+        """Get deadlines for a firm with optional filters, ordered by due date."""
+        if client_id and not from_date and not to_date:
+            # A client's deadlines are a handful; cheaper than the firm's date range
+            candidates = sorted(
+                (self._deadlines[deadline_id] for deadline_id in self._by_client.get(client_id, ())),
+                key=lambda d: (self._indexed_date[d.id], d.id),
+            )
+        else:
+            candidates = self._firm_range(firm_id, from_date, to_date)
 
-        for deadline in self._deadlines.values():
+        deadlines = []
+        for deadline in candidates:
             if deadline.firm_id != firm_id:
                 continue
 
@@ -245,18 +480,8 @@ class DeadlineService:
             if not include_completed and deadline.status == DeadlineStatus.COMPLETED:
                 continue
 
-            # Date range filter
-            effective_date = deadline.effective_due_date
-            if from_date and effective_date < from_date:
-                continue
-            if to_date and effective_date > to_date:
-                continue
-
             deadlines.append(deadline)
 
-        # Sort by due date
-        deadlines.sort(key=lambda d: d.effective_due_date or date.max)
-
         return deadlines
 
     def get_upcoming_deadlines(
@@ -299,10 +524,7 @@ class DeadlineService:
         session_id: str,
     ) -> List[Deadline]:
         """Get all deadlines for a specific tax return session."""
-        return [
-            d for d in self._deadlines.values()
-            if d.session_id == session_id
-        ]
+        return [self._deadlines[deadline_id] for deadline_id in self._by_session.get(session_id, ())]
 
     # =========================================================================
     # STANDARD DEADLINE GENERATION
@@ -355,6 +577,7 @@ class DeadlineService:
             created_by=created_by,
         )
         extension.status = DeadlineStatus.WAIVED  # Not active until extension filed
+        self._save(extension)
         deadlines.append(extension)
 
         # Estimated tax deadlines
@@ -479,32 +702,80 @@ class DeadlineService:
     def get_pending_reminders(
         self,
         firm_id: UUID,
+        today: Optional[date] = None,
     ) -> List[Dict[str, Any]]:
-        """Get reminders that should be sent today."""
-        today = date.today()
-        pending = []
-
-        for deadline in self._deadlines.values():
-            if deadline.firm_id != firm_id:
-                continue
-            if deadline.status in [DeadlineStatus.COMPLETED, DeadlineStatus.WAIVED]:
-                continue
+        """Get reminders that should be sent today (or are overdue to send)."""
+        return [
+            {
+                "deadline": deadline.to_dict(),
+                "reminder": reminder.to_dict(),
+                "should_send_on": reminder_date.isoformat(),
+            }
+            for reminder_date, deadline, reminder in self._due_reminders(firm_id, today or date.today())
+        ]
 
-            for reminder in deadline.reminders:
-                if reminder.is_sent:
-                    continue
+    def get_due_reminders(self, today: Optional[date] = None) -> List[Dict[str, Any]]:
+        """
+        Unsent reminders due across all firms, for the periodic reminder job.
 
-                # Calculate when this reminder should fire
-                reminder_date = deadline.effective_due_date - timedelta(days=reminder.days_before)
+        Only due heap entries are visited. Reminders stay due until
+        mark_reminder_sent() is called, so a failed send is retried on
+        the next run.
 
-                if reminder_date <= today:
-                    pending.append({
-                        "deadline": deadline.to_dict(),
-                        "reminder": reminder.to_dict(),
-                        "should_send_on": reminder_date.isoformat(),
+        Each reminder yields one entry per recipient its recipient_type
+        names ("cpa" is the firm, "client" the deadline's client, "both"
+        is both). Recipients without an email address are left out.
+        """
+        today = today or date.today()
+        contacts: Dict[Tuple[UUID, Optional[UUID]], Dict[str, Tuple[Optional[str], str]]] = {}
+        due = []
+        for firm_id in list(self._reminder_heaps):
+            for reminder_date, deadline, reminder in self._due_reminders(firm_id, today):
+                key = (deadline.firm_id, deadline.client_id)
+                if key not in contacts:
+                    try:
+                        contacts[key] = self._contact_lookup(*key)
+                    except Exception as e:
+                        logger.error(f"Failed to look up reminder recipients for deadline {deadline.id}: {e}")
+                        contacts[key] = {}
+
+                roles = ["cpa", "client"] if reminder.recipient_type == "both" else [reminder.recipient_type]
+                client_name = contacts[key].get("client", (None, None))[1]
+                for role in roles:
+                    email, name = contacts[key].get(role, (None, ""))
+                    if not email:
+                        logger.warning(f"No {role} email for deadline {deadline.id}; reminder {reminder.id} not sent")
+                        continue
+                    due.append({
+                        "firm_id": firm_id,
+                        "deadline_id": deadline.id,
+                        "reminder_id": reminder.id,
+                        "deadline": deadline,
+                        "reminder": reminder,
+                        "should_send_on": reminder_date,
+                        "recipient_type": role,
+                        "recipient_email": email,
+                        "recipient_name": name,
+                        "client_name": client_name,
                     })
+        return due
+
+    def add_reminder(
+        self,
+        deadline_id: UUID,
+        days_before: int,
+        reminder_type: ReminderType = ReminderType.EMAIL,
+        recipient_type: str = "cpa",
+    ) -> Optional[DeadlineReminder]:
+        """Add a reminder to a deadline and schedule it."""
+        deadline = self._deadlines.get(deadline_id)
+        if not deadline:
+            return None
 
-        return pending
+        reminder = deadline.add_reminder(days_before, reminder_type, recipient_type)
+        self._schedule_reminders(deadline)
+        self._save(deadline)
+        return reminder
 
     def mark_reminder_sent(
         self,
@@ -520,6 +791,13 @@ class DeadlineService:
             if reminder.id == reminder_id:
                 reminder.is_sent = True
                 reminder.sent_at = datetime.now(timezone.utc)
+                self._scheduled.pop(reminder_id, None)
+                self._due[deadline.firm_id].pop(reminder_id, None)
+                if self._persistence is not None:
+                    try:
+                        self._persistence.mark_reminder_sent(str(deadline_id), str(reminder_id), reminder.sent_at)
+                    except Exception as e:
+                        logger.error(f"Failed to persist sent reminder {reminder_id}: {e}")
                 return True
 
         return False
@@ -527,19 +805,15 @@ class DeadlineService:
     def generate_alerts(self, firm_id: UUID) -> List[DeadlineAlert]:
         """Generate alerts for deadlines needing attention."""
         alerts = []
+        alerted = {a.deadline_id for a in self._alerts.values() if not a.is_dismissed}
 
-        for deadline in self._deadlines.values():
-            if deadline.firm_id != firm_id:
-                continue
+        for deadline_id in self._by_firm.get(firm_id, ()):
+            deadline = self._deadlines[deadline_id]
             if deadline.status in [DeadlineStatus.COMPLETED, DeadlineStatus.WAIVED]:
                 continue
 
             # Check if we already have an active alert for this deadline
-            existing_alert = any(
-                a.deadline_id == deadline.id and not a.is_dismissed
-                for a in self._alerts.values()
-            )
-            if existing_alert:
+            if deadline.id in alerted:
                 continue
 
             # Generate alert based on urgency
@@ -612,5 +886,64 @@ class DeadlineService:
         return False
 
 
+def _discard(items: List, key) -> None:
+    i = bisect.bisect_left(items, key)
+    if i < len(items) and items[i] == key:
+        del items[i]
+
+
+def _reminder_schedule(deadline: Deadline) -> List[Tuple[str, date]]:
+    """(reminder id, fire date) for each reminder a sweep may still send."""
+    if deadline.effective_due_date is None or deadline.status in [DeadlineStatus.COMPLETED, DeadlineStatus.WAIVED]:
+        return []
+    return [
+        (str(reminder.id), deadline.effective_due_date - timedelta(days=reminder.days_before))
+        for reminder in deadline.reminders
+        if not reminder.is_sent
+    ]
+
+
+def lookup_deadline_contacts(
+    firm_id: UUID,
+    client_id: Optional[UUID],
+) -> Dict[str, Tuple[Optional[str], str]]:
+    """
+    Reminder recipients for a deadline from the firms and clients tables.
+
+    Returns:
+        {"cpa": (firm email, firm name), "client": (client email, client name)};
+        "client" is absent for firm-wide deadlines
+    """
+    from sqlalchemy import text
+    from database.connection import get_db_session
+
+    contacts: Dict[str, Tuple[Optional[str], str]] = {}
+    with get_db_session() as session:
+        firm = session.execute(
+            text("SELECT email, name FROM firms WHERE firm_id = :firm_id"),
+            {"firm_id": str(firm_id)},
+        ).first()
+        if firm is not None:
+            contacts["cpa"] = (firm.email, firm.name or "")
+        if client_id is not None:
+            client = session.execute(
+                text("SELECT email, first_name, last_name FROM clients WHERE client_id = :client_id"),
+                {"client_id": str(client_id)},
+            ).first()
+            if client is not None:
+                name = f"{client.first_name or ''} {client.last_name or ''}".strip()
+                contacts["client"] = (client.email, name)
+    return contacts
+
+
+def _default_persistence():
+    try:
+        from database.deadline_persistence import get_deadline_persistence
+        return get_deadline_persistence()
+    except ImportError as e:
+        logger.warning(f"Deadline persistence unavailable, deadlines are in-memory only: {e}")
+        return None
+
+
 # Global service instance
-deadline_service = DeadlineService()
+deadline_service = DeadlineService(persistence=_default_persistence())
@@ -8,9 +8,10 @@ Supports optional database persistence via LeadStatePersistence.
 """
 
 from dataclasses import dataclass, field
-from datetime import datetime, timezone
-from typing import List, Dict, Optional, Set, Any, TYPE_CHECKING
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Optional, Set, Any, Tuple, TYPE_CHECKING
 import logging
+import time
 
 from .states import (
     LeadState,
@@ -21,12 +22,19 @@ from .states import (
     VALID_TRANSITIONS,
 )
 from .signals import LeadSignal, SignalType, SIGNAL_CATALOG, get_signal
+from .priority_index import LeadPriorityIndex
 
 if TYPE_CHECKING:
     from database.lead_state_persistence import LeadStatePersistence
 
 logger = logging.getLogger(__name__)
 
+# Index refresh from persistence (other workers' changes): at most one
+# refresh query per tenant per interval, re-reading an overlap window so
+# writes committed slightly out of timestamp order are not missed.
+INDEX_REFRESH_INTERVAL_SECONDS = 1.0
+INDEX_REFRESH_OVERLAP = timedelta(seconds=5)
+
 
 class TransitionError(Exception):
     """Raised when an invalid state transition is attempted."""
@@ -150,6 +158,16 @@ class LeadStateEngine:
         """
         self._leads: Dict[str, LeadRecord] = {}
         self._persistence = persistence
+        # Priority queue / Kanban index over cached leads
+        self._index = LeadPriorityIndex()
+        # tenant_id -> (updated_at watermark, monotonic time of last refresh)
+        self._index_watermarks: Dict[str, Tuple[str, float]] = {}
+
+    def _cache(self, lead: LeadRecord) -> LeadRecord:
+        """Cache a lead in memory and index it."""
+        self._leads[lead.lead_id] = lead
+        self._index.upsert(lead)
+        return lead
 
     def get_or_create_lead(
         self,
@@ -167,17 +185,14 @@ class LeadStateEngine:
             db_lead = self._persistence.load_lead(lead_id, tenant_id)
             if db_lead:
                 # Restore from database
-                lead = self._restore_lead_from_db(db_lead)
-                self._leads[lead_id] = lead
-                return lead
+                return self._cache(self._restore_lead_from_db(db_lead))
 
         # Create new lead
-        lead = LeadRecord(
+        lead = self._cache(LeadRecord(
             lead_id=lead_id,
             session_id=session_id,
             tenant_id=tenant_id,
-        )
-        self._leads[lead_id] = lead
+        ))
 
         # Persist if available
         if self._persistence:
@@ -205,23 +220,32 @@ class LeadStateEngine:
         if self._persistence:
             db_lead = self._persistence.load_lead(lead_id, tenant_id)
             if db_lead:
-                lead = self._restore_lead_from_db(db_lead)
-                self._leads[lead_id] = lead
-                return lead
+                return self._cache(self._restore_lead_from_db(db_lead))
 
         return None
 
-    def _restore_lead_from_db(self, db_lead) -> LeadRecord:
-        """Restore a LeadRecord from database record."""
-        # Get signals and transitions from DB
+    def _restore_lead_from_db(
+        self,
+        db_lead,
+        signal_ids: Optional[List[str]] = None,
+        db_transitions: Optional[List[Any]] = None,
+    ) -> LeadRecord:
+        """
+        Restore a LeadRecord from database record.
+
+        Signal IDs and transition records are read from persistence unless
+        the caller already bulk-loaded them (see _restore_leads).
+        """
         signals = []
         transitions = []
 
         if self._persistence:
-            signal_ids = self._persistence.get_signal_ids_for_lead(db_lead.lead_id)
+            if signal_ids is None:
+                signal_ids = self._persistence.get_signal_ids_for_lead(db_lead.lead_id)
             signals = signal_ids
 
-            db_transitions = self._persistence.get_transitions_for_lead(db_lead.lead_id)
+            if db_transitions is None:
+                db_transitions = self._persistence.get_transitions_for_lead(db_lead.lead_id)
             for t in db_transitions:
                 trigger_signal = get_signal(t.trigger_signal_id)
                 if not trigger_signal:
@@ -254,6 +278,22 @@ class LeadStateEngine:
             metadata=db_lead.metadata,
         )
 
+    def _restore_leads(self, tenant_id: str, db_leads: List[Any], whole_tenant: bool = False) -> None:
+        """Cache many persisted leads, reading their history in bulk."""
+        if not db_leads:
+            return
+        signals, transitions = self._persistence.get_history_for_leads(
+            tenant_id,
+            None if whole_tenant else [db_lead.lead_id for db_lead in db_leads],
+        )
+        for db_lead in db_leads:
+            # Persistence is authoritative: replace any stale cached copy
+            self._cache(self._restore_lead_from_db(
+                db_lead,
+                signal_ids=signals.get(db_lead.lead_id, []),
+                db_transitions=transitions.get(db_lead.lead_id, []),
+            ))
+
     def process_signal(
         self,
         lead_id: str,
@@ -290,18 +330,16 @@ class LeadStateEngine:
             if self._persistence:
                 db_lead = self._persistence.load_lead(lead_id, tenant_id)
                 if db_lead:
-                    lead = self._restore_lead_from_db(db_lead)
-                    self._leads[lead_id] = lead
+                    lead = self._cache(self._restore_lead_from_db(db_lead))
 
         if not lead:
             if not session_id:
                 raise ValueError("session_id required for new lead")
-            lead = LeadRecord(
+            lead = self._cache(LeadRecord(
                 lead_id=lead_id,
                 session_id=session_id,
                 tenant_id=tenant_id,
-            )
-            self._leads[lead_id] = lead
+            ))
 
             # Persist new lead
             if self._persistence:
@@ -330,6 +368,8 @@ class LeadStateEngine:
 
         if new_state and new_state > lead.current_state:
             self._apply_transition(lead, new_state, signal, metadata)
+        else:
+            self._index.upsert(lead)  # signal counts feed the priority score
 
         return lead
 
@@ -425,6 +465,7 @@ class LeadStateEngine:
         lead.transitions.append(transition)
         lead.current_state = new_state
         lead.updated_at = datetime.now(timezone.utc)
+        self._index.upsert(lead)
 
         # Persist transition and updated lead state
         if self._persistence:
@@ -513,10 +554,83 @@ class LeadStateEngine:
             return
 
         db_leads = self._persistence.list_leads(tenant_id=tenant_id, limit=1000)
-        for db_lead in db_leads:
-            if db_lead.lead_id not in self._leads:
-                lead = self._restore_lead_from_db(db_lead)
-                self._leads[db_lead.lead_id] = lead
+        self._restore_leads(tenant_id, [db_lead for db_lead in db_leads if db_lead.lead_id not in self._leads])
+
+    def _ensure_tenant_indexed(self, tenant_id: Optional[str]) -> None:
+        """
+        Bring a tenant's index up to date with persistence.
+
+        The first call loads every persisted lead; later calls (at most one
+        per INDEX_REFRESH_INTERVAL_SECONDS) reload only leads whose
+        updated_at moved since the last refresh, so leads created, signalled
+        or advanced by other workers show up in this worker's queue. Signals
+        and transitions are read in bulk (one query per table for a first
+        load), not per lead.
+        """
+        if not self._persistence or not tenant_id:
+            return
+
+        now = time.monotonic()
+        watermark = self._index_watermarks.get(tenant_id)
+        if watermark is not None and now - watermark[1] < INDEX_REFRESH_INTERVAL_SECONDS:
+            return
+
+        next_since = (datetime.now(timezone.utc) - INDEX_REFRESH_OVERLAP).isoformat()
+        page_size, offset = 1000, 0
+        loaded = []
+        while True:
+            if watermark is None:
+                db_leads = self._persistence.list_leads(tenant_id=tenant_id, limit=page_size, offset=offset)
+            else:
+                db_leads = self._persistence.list_leads_updated_since(
+                    tenant_id, watermark[0], limit=page_size, offset=offset
+                )
+            loaded.extend(db_leads)
+            if len(db_leads) < page_size:
+                break
+            offset += page_size
+        # First load: one history query per table for the whole tenant
+        self._restore_leads(tenant_id, loaded, whole_tenant=watermark is None)
+        self._index_watermarks[tenant_id] = (next_since, now)
+
+    def get_priority_page(
+        self,
+        tenant_id: Optional[str] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Tuple[float, LeadRecord]], Optional[str], int]:
+        """
+        Monetizable leads by priority score, served from the index.
+
+        Returns:
+            ([(priority_score, lead), ...], next_cursor, total_monetizable)
+
+        Raises:
+            ValueError: If the cursor is invalid
+        """
+        self._ensure_tenant_indexed(tenant_id)
+        return self._index.priority_page(tenant_id, limit, cursor)
+
+    def get_state_page(
+        self,
+        state: LeadState,
+        tenant_id: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[LeadRecord], Optional[str]]:
+        """
+        One page of leads in a state (oldest first), served from the index.
+
+        Raises:
+            ValueError: If the cursor is invalid
+        """
+        self._ensure_tenant_indexed(tenant_id)
+        return self._index.state_page(state.name, tenant_id, limit, cursor)
+
+    def get_state_totals(self, tenant_id: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+        """Per-state lead counts and estimated value sums from the index."""
+        self._ensure_tenant_indexed(tenant_id)
+        return self._index.state_totals(tenant_id)
 
     def get_leads_by_state(
         self,
@@ -535,9 +649,7 @@ class LeadStateEngine:
                 if db_lead.lead_id in self._leads:
                     result.append(self._leads[db_lead.lead_id])
                 else:
-                    lead = self._restore_lead_from_db(db_lead)
-                    self._leads[db_lead.lead_id] = lead
-                    result.append(lead)
+                    result.append(self._cache(self._restore_lead_from_db(db_lead)))
             return result
 
         # Fall back to in-memory
@@ -0,0 +1,352 @@
+"""
+Lead Priority Index
+
+Incrementally maintained per-tenant views over LeadRecords so the CPA
+pipeline can be served without scanning every lead:
+
+- Priority queue: monetizable leads ordered by priority score. The score
+  is a static part (state, signal counts) plus a recency bonus that only
+  depends on the last transition time, so leads are bucketed by static
+  score and kept sorted by last activity inside each bucket. The top of
+  the queue is a k-way merge over the bucket heads, which stays exact as
+  recency bonuses decay over time.
+- Kanban columns: leads per state ordered by creation time.
+- Per-state counts and estimated value sums.
+
+Pages are addressed with opaque cursors (the sort key of the last item
+returned), so a page costs O(page size + buckets), not O(leads).
+
+The engine calls upsert() whenever a lead is cached, receives a signal
+or changes state.
+"""
+
+import base64
+import bisect
+import heapq
+import json
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from .states import LeadState
+
+# Priority score components (see LeadPipelineService.get_priority_queue)
+STATE_PRIORITY_SCORES = {
+    LeadState.BROWSING: 0,
+    LeadState.CURIOUS: 10,
+    LeadState.EVALUATING: 25,
+    LeadState.ADVISORY_READY: 40,
+    LeadState.HIGH_LEVERAGE: 50,
+}
+
+# Estimated dollar value of a lead by state
+STATE_VALUES = {
+    "BROWSING": 0,
+    "CURIOUS": 100,
+    "EVALUATING": 300,
+    "ADVISORY_READY": 600,
+    "HIGH_LEVERAGE": 1200,
+}
+
+_NO_ACTIVITY = float("-inf")
+
+# All-tenant view key (tenant_id=None queries)
+_ALL = object()
+
+
+def base_priority_score(lead) -> float:
+    """Time-independent part of the priority score: state, signals, engagement."""
+    score = STATE_PRIORITY_SCORES.get(lead.current_state, 0)
+    score += min(len(lead.signals_received) * 2, 20)
+    high_value_signals = [s for s in lead.signals_received if "tax_savings" in s or "schedule" in s]
+    score += min(len(high_value_signals) * 3, 15)
+    return score
+
+
+def recency_bonus(last_activity: Optional[datetime], now: Optional[datetime] = None) -> float:
+    """Bonus for recent state changes (0-15 points)."""
+    if last_activity is None:
+        return 0
+    days_since = ((now or datetime.now(timezone.utc)) - last_activity).days
+    if days_since == 0:
+        return 15
+    if days_since <= 3:
+        return 10
+    if days_since <= 7:
+        return 5
+    return 0
+
+
+def last_activity(lead) -> Optional[datetime]:
+    """Timestamp of the lead's last state transition, if any."""
+    return lead.transitions[-1].timestamp if lead.transitions else None
+
+
+def encode_cursor(*parts: Any) -> str:
+    return base64.urlsafe_b64encode(json.dumps(parts).encode()).decode()
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[List[Any]]:
+    """Decode a cursor; invalid cursors raise ValueError."""
+    if not cursor:
+        return None
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except Exception as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _priority_cursor(cursor: Optional[str]) -> Optional[List[Any]]:
+    """Decode a priority-queue cursor: [score, activity_ts or null, lead_id]."""
+    after = decode_cursor(cursor)
+    if after is None:
+        return None
+    if not (
+        isinstance(after, list) and len(after) == 3
+        and _is_number(after[0])
+        and (after[1] is None or _is_number(after[1]))
+        and isinstance(after[2], str)
+    ):
+        raise ValueError("Invalid cursor")
+    return after
+
+
+def _column_cursor(cursor: Optional[str]) -> Optional[Tuple[float, str]]:
+    """Decode a Kanban column cursor: [created_ts, lead_id]."""
+    after = decode_cursor(cursor)
+    if after is None:
+        return None
+    if not (isinstance(after, list) and len(after) == 2 and _is_number(after[0]) and isinstance(after[1], str)):
+        raise ValueError("Invalid cursor")
+    return after[0], after[1]
+
+
+@dataclass
+class _Entry:
+    """Where a lead currently sits in the index."""
+    lead: Any
+    tenant_id: str
+    state: str
+    column_key: Tuple[float, str]               # (created_ts, lead_id)
+    priority: Optional[Tuple[float, float, str]]  # (base_score, -activity_ts, lead_id) if monetizable
+
+
+class _TenantView:
+    """Sorted structures for one tenant (or the all-tenant view)."""
+
+    def __init__(self):
+        self.buckets: Dict[float, List[Tuple[float, str]]] = {}  # base -> [(-activity_ts, lead_id)]
+        self.columns: Dict[str, List[Tuple[float, str]]] = {s.name: [] for s in LeadState}
+        self.counts: Dict[str, int] = {s.name: 0 for s in LeadState}
+        self.values: Dict[str, float] = {s.name: 0.0 for s in LeadState}
+        self.monetizable = 0
+
+    def add(self, entry: _Entry) -> None:
+        bisect.insort(self.columns[entry.state], entry.column_key)
+        self.counts[entry.state] += 1
+        self.values[entry.state] += STATE_VALUES.get(entry.state, 0)
+        if entry.priority is not None:
+            base, neg_ts, lead_id = entry.priority
+            bisect.insort(self.buckets.setdefault(base, []), (neg_ts, lead_id))
+            self.monetizable += 1
+
+    def remove(self, entry: _Entry) -> None:
+        _discard(self.columns[entry.state], entry.column_key)
+        self.counts[entry.state] -= 1
+        self.values[entry.state] -= STATE_VALUES.get(entry.state, 0)
+        if entry.priority is not None:
+            base, neg_ts, lead_id = entry.priority
+            bucket = self.buckets[base]
+            _discard(bucket, (neg_ts, lead_id))
+            if not bucket:
+                del self.buckets[base]
+            self.monetizable -= 1
+
+
+def _discard(items: List, key) -> None:
+    i = bisect.bisect_left(items, key)
+    if i < len(items) and items[i] == key:
+        del items[i]
+
+
+class LeadPriorityIndex:
+    """
+    Per-tenant priority queue, Kanban columns and state totals.
+
+    Thread-safe; all reads and writes hold one lock.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, _Entry] = {}
+        self._views: Dict[Any, _TenantView] = {}
+        self._lock = threading.RLock()
+
+    def _views_for(self, tenant_id: str) -> Tuple[_TenantView, _TenantView]:
+        tenant = self._views.get(tenant_id)
+        if tenant is None:
+            tenant = self._views[tenant_id] = _TenantView()
+        everyone = self._views.get(_ALL)
+        if everyone is None:
+            everyone = self._views[_ALL] = _TenantView()
+        return tenant, everyone
+
+    def upsert(self, lead) -> None:
+        """Index a lead, or re-index it after a signal or transition."""
+        activity = last_activity(lead)
+        activity_ts = activity.timestamp() if activity else _NO_ACTIVITY
+        entry = _Entry(
+            lead=lead,
+            tenant_id=lead.tenant_id,
+            state=lead.current_state.name,
+            column_key=(lead.created_at.timestamp(), lead.lead_id),
+            priority=(base_priority_score(lead), -activity_ts, lead.lead_id) if lead.is_monetizable else None,
+        )
+        with self._lock:
+            old = self._entries.get(lead.lead_id)
+            if old is not None:
+                if (old.tenant_id, old.state, old.column_key, old.priority) == (
+                    entry.tenant_id, entry.state, entry.column_key, entry.priority
+                ):
+                    old.lead = lead
+                    return
+                for view in self._views_for(old.tenant_id):
+                    view.remove(old)
+            for view in self._views_for(entry.tenant_id):
+                view.add(entry)
+            self._entries[lead.lead_id] = entry
+
+    def remove(self, lead_id: str) -> None:
+        with self._lock:
+            old = self._entries.pop(lead_id, None)
+            if old is not None:
+                for view in self._views_for(old.tenant_id):
+                    view.remove(old)
+
+    def __contains__(self, lead_id: str) -> bool:
+        return lead_id in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _view(self, tenant_id: Optional[str]) -> Optional[_TenantView]:
+        return self._views.get(_ALL if tenant_id is None else tenant_id)
+
+    # -------------------------------------------------------------------------
+    # Queries
+    # -------------------------------------------------------------------------
+
+    def priority_page(
+        self,
+        tenant_id: Optional[str] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        now: Optional[datetime] = None,
+    ) -> Tuple[List[Tuple[float, Any]], Optional[str], int]:
+        """
+        Monetizable leads by priority score (desc), then last activity
+        (most recent first), then lead_id.
+
+        Returns:
+            ([(priority_score, lead), ...], next_cursor, total_monetizable)
+        """
+        after = _priority_cursor(cursor)
+        now = now or datetime.now(timezone.utc)
+
+        def total(base: float, neg_ts: float) -> float:
+            if neg_ts == -_NO_ACTIVITY:
+                return base
+            return base + recency_bonus(datetime.fromtimestamp(-neg_ts, timezone.utc), now)
+
+        with self._lock:
+            view = self._view(tenant_id)
+            if view is None:
+                return [], None, 0
+
+            heap = []
+            for base, bucket in view.buckets.items():
+                position = 0 if after is None else _first_after(bucket, base, after, total)
+                if position < len(bucket):
+                    neg_ts, lead_id = bucket[position]
+                    heapq.heappush(heap, (-total(base, neg_ts), neg_ts, lead_id, base, position))
+
+            page = []
+            while heap and len(page) < limit:
+                neg_score, neg_ts, lead_id, base, position = heapq.heappop(heap)
+                page.append((-neg_score, self._entries[lead_id].lead, neg_ts))
+                bucket = view.buckets[base]
+                if position + 1 < len(bucket):
+                    next_ts, next_id = bucket[position + 1]
+                    heapq.heappush(heap, (-total(base, next_ts), next_ts, next_id, base, position + 1))
+
+            next_cursor = None
+            if heap and page:
+                score, lead, neg_ts = page[-1]
+                next_cursor = encode_cursor(score, _json_ts(neg_ts), lead.lead_id)
+            return [(score, lead) for score, lead, _ in page], next_cursor, view.monetizable
+
+    def state_page(
+        self,
+        state: str,
+        tenant_id: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Any], Optional[str]]:
+        """
+        Leads in one state ordered by creation time.
+
+        Returns:
+            (leads, next_cursor)
+        """
+        after = _column_cursor(cursor)
+        with self._lock:
+            view = self._view(tenant_id)
+            if view is None:
+                return [], None
+            column = view.columns[state]
+            start = 0 if after is None else bisect.bisect_right(column, after)
+            keys = column[start:start + limit]
+            leads = [self._entries[lead_id].lead for _, lead_id in keys]
+            next_cursor = encode_cursor(*keys[-1]) if keys and start + limit < len(column) else None
+            return leads, next_cursor
+
+    def state_totals(self, tenant_id: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+        """{state: {"count": n, "total_value": v}} for every state."""
+        with self._lock:
+            view = self._view(tenant_id)
+            return {
+                state.name: {
+                    "count": view.counts[state.name] if view else 0,
+                    "total_value": view.values[state.name] if view else 0.0,
+                }
+                for state in LeadState
+            }
+
+
+def _json_ts(neg_ts: float) -> Optional[float]:
+    return None if neg_ts == -_NO_ACTIVITY else neg_ts
+
+
+def _first_after(bucket: List[Tuple[float, str]], base: float, after: List[Any], total) -> int:
+    """
+    First position in a bucket that sorts after the cursor.
+
+    Within a bucket, score never increases along the list, so "after the
+    cursor" holds for a suffix and can be binary searched.
+    """
+    score, neg_ts, lead_id = after
+    neg_ts = -_NO_ACTIVITY if neg_ts is None else neg_ts
+    lo, hi = 0, len(bucket)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        item_ts, item_id = bucket[mid]
+        item_score = total(base, item_ts)
+        if item_score < score or (item_score == score and (item_ts, item_id) > (neg_ts, lead_id)):
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
@@ -30,9 +30,19 @@ from .intelligence_service import (
     PortfolioMetrics,
     get_intelligence_service,
 )
+from .aggregates import (
+    PortfolioAggregateStore,
+    get_portfolio_aggregate_store,
+    sync_saved_return,
+    sync_deleted_return,
+)
 
 __all__ = [
     "PracticeIntelligenceService",
     "PortfolioMetrics",
     "get_intelligence_service",
+    "PortfolioAggregateStore",
+    "get_portfolio_aggregate_store",
+    "sync_saved_return",
+    "sync_deleted_return",
 ]
@@ -0,0 +1,498 @@
+"""
+Portfolio Aggregates
+
+Per-tenant, per-tax-year accumulators behind the 3 practice intelligence
+metrics, so the dashboard reads precomputed totals instead of loading
+and re-scanning every engagement and return on each request.
+
+Each accumulator holds:
+- Engagement counts by type, plus advisory/compliance totals
+- Return counts by complexity tier and the summed tier score
+- Sums and non-null counts of refund_amount, total_tax and
+  total_deductions for the YoY averages
+
+Every engagement or return contributes a small record; when it changes,
+its previous contribution is subtracted and the new one added, all in
+one transaction (database.practice_metrics_persistence). Sums are kept
+as Decimal strings so repeated add/subtract cycles never drift.
+
+A return belongs to the firm recorded in tax_returns.firm_id, and both
+the incremental hooks (sync_saved_return / sync_deleted_return, called
+by TaxReturnService and the returns API) and the rebuild path
+(load_portfolio_records) normalise the stored return JSON through
+portfolio_record(), so the two paths agree.
+
+rebuild() recomputes a tenant from full lists, and check_consistency()
+compares the stored aggregates with PracticeIntelligenceService's full
+recomputation.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .intelligence_service import (
+    AdvisoryComplianceMix,
+    ComplexityDistribution,
+    ComplexityTier,
+    EngagementType,
+    PortfolioMetrics,
+    PracticeIntelligenceService,
+    YoYValueSurface,
+)
+
+logger = logging.getLogger(__name__)
+
+ENGAGEMENT = "engagement"
+RETURN = "return"
+
+YOY_FIELDS = ("refund_amount", "total_tax", "total_deductions")
+
+_DEFAULT_TIER = ComplexityTier.TIER_2_MODERATE.value
+_TIER_SCORES = {tier.value: score for tier, score in PracticeIntelligenceService.TIER_SCORES.items()}
+_ADVISORY_TYPES = {t.value for t in PracticeIntelligenceService.ADVISORY_TYPES}
+_ADVISORY_STATUSES = {"advisory", "planning"}
+
+
+def complexity_tier_for(total_income: float, total_deductions: float) -> str:
+    """Complexity tier of a return from its income and deductions."""
+    if total_income > 1000000:
+        return ComplexityTier.TIER_5_ULTRA_COMPLEX.value
+    if total_income > 500000:
+        return ComplexityTier.TIER_4_HIGH_NET_WORTH.value
+    if total_income > 200000 or total_deductions > 50000:
+        return ComplexityTier.TIER_3_COMPLEX.value
+    if total_income > 75000:
+        return ComplexityTier.TIER_2_MODERATE.value
+    return ComplexityTier.TIER_1_SIMPLE.value
+
+
+def _first_present(data: Dict[str, Any], *keys: str) -> Any:
+    for key in keys:
+        if data.get(key) is not None:
+            return data[key]
+    return None
+
+
+def portfolio_record(return_id: str, return_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Normalise a saved tax return into the record shape the metrics read.
+
+    Accepts the field names used by the returns API as well as the
+    ones the metrics expect, so the same record feeds both the
+    engagement and the return side of the aggregates.
+    """
+    total_income = float(_first_present(return_data, "total_income", "adjusted_gross_income", "gross_income") or 0)
+    total_deductions = _first_present(return_data, "total_deductions", "deduction_amount", "total_deduction")
+    refund = return_data.get("refund_amount")
+    if refund is None and return_data.get("refund_or_owed") is not None:
+        refund = max(float(return_data["refund_or_owed"]), 0.0)
+
+    engagement_type = return_data.get("engagement_type")
+    if not engagement_type:
+        status = str(return_data.get("status") or "").lower()
+        engagement_type = (
+            EngagementType.TAX_ADVISORY.value if status in _ADVISORY_STATUSES
+            else EngagementType.TAX_PREPARATION.value
+        )
+
+    return {
+        "return_id": str(return_id),
+        "tax_year": int(return_data.get("tax_year") or 2025),
+        "engagement_type": engagement_type,
+        "complexity_tier": return_data.get("complexity_tier")
+        or complexity_tier_for(total_income, float(total_deductions or 0)),
+        "refund_amount": refund,
+        "total_tax": _first_present(return_data, "total_tax", "tax_liability"),
+        "total_deductions": total_deductions,
+    }
+
+
+# -------------------------------------------------------------------------
+# Contributions: what one record adds to its year's accumulator
+# -------------------------------------------------------------------------
+
+def engagement_contribution(engagement: Dict[str, Any], tax_year: int) -> Dict[str, Any]:
+    return {"tax_year": int(tax_year), "engagement_type": engagement.get("engagement_type") or "tax_preparation"}
+
+
+def return_contribution(ret: Dict[str, Any], tax_year: int) -> Dict[str, Any]:
+    tier = ret.get("complexity_tier", _DEFAULT_TIER)
+    if tier not in _TIER_SCORES:
+        tier = _DEFAULT_TIER
+    contribution: Dict[str, Any] = {"tax_year": int(tax_year), "tier": tier}
+    for name in YOY_FIELDS:
+        value = ret.get(name)
+        if value is not None:
+            contribution[name] = str(Decimal(str(value)))
+    return contribution
+
+
+@dataclass
+class PortfolioAccumulator:
+    """Running totals for one tenant and tax year."""
+    engagement_types: Dict[str, int] = field(default_factory=dict)
+    advisory_count: int = 0
+    compliance_count: int = 0
+    tier_counts: Dict[str, int] = field(default_factory=dict)
+    tier_score_total: Decimal = Decimal(0)
+    return_count: int = 0
+    field_totals: Dict[str, Decimal] = field(default_factory=dict)
+    field_counts: Dict[str, int] = field(default_factory=dict)
+
+    def apply(self, record_type: str, contribution: Dict[str, Any], sign: int) -> None:
+        if record_type == ENGAGEMENT:
+            eng_type = contribution["engagement_type"]
+            _bump(self.engagement_types, eng_type, sign)
+            if eng_type in _ADVISORY_TYPES:
+                self.advisory_count += sign
+            else:
+                self.compliance_count += sign
+            return
+
+        tier = contribution["tier"]
+        _bump(self.tier_counts, tier, sign)
+        self.tier_score_total += sign * Decimal(str(_TIER_SCORES[tier]))
+        self.return_count += sign
+        for name in YOY_FIELDS:
+            if name in contribution:
+                total = self.field_totals.get(name, Decimal(0)) + sign * Decimal(contribution[name])
+                self.field_totals[name] = total
+                _bump(self.field_counts, name, sign)
+
+    def average(self, name: str) -> float:
+        count = self.field_counts.get(name, 0)
+        return float(self.field_totals[name] / count) if count else 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "engagement_types": self.engagement_types,
+            "advisory_count": self.advisory_count,
+            "compliance_count": self.compliance_count,
+            "tier_counts": self.tier_counts,
+            "tier_score_total": str(self.tier_score_total),
+            "return_count": self.return_count,
+            "field_totals": {name: str(total) for name, total in self.field_totals.items()},
+            "field_counts": self.field_counts,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "PortfolioAccumulator":
+        if not data:
+            return cls()
+        return cls(
+            engagement_types=dict(data["engagement_types"]),
+            advisory_count=data["advisory_count"],
+            compliance_count=data["compliance_count"],
+            tier_counts=dict(data["tier_counts"]),
+            tier_score_total=Decimal(data["tier_score_total"]),
+            return_count=data["return_count"],
+            field_totals={name: Decimal(total) for name, total in data["field_totals"].items()},
+            field_counts=dict(data["field_counts"]),
+        )
+
+
+def _bump(counts: Dict[str, int], key: str, sign: int) -> None:
+    value = counts.get(key, 0) + sign
+    if value:
+        counts[key] = value
+    else:
+        counts.pop(key, None)
+
+
+def _folder(record_type: str):
+    """fold() for PracticeMetricsPersistence.apply_change."""
+    def fold(aggregates: Dict[int, Dict[str, Any]], old: Optional[Dict[str, Any]],
+             new: Optional[Dict[str, Any]]) -> Iterable[int]:
+        touched = set()
+        for contribution, sign in ((old, -1), (new, 1)):
+            if contribution is None:
+                continue
+            year = contribution["tax_year"]
+            accumulator = PortfolioAccumulator.from_dict(aggregates.get(year))
+            accumulator.apply(record_type, contribution, sign)
+            aggregates[year] = accumulator.to_dict()
+            touched.add(year)
+        return touched
+    return fold
+
+
+class PortfolioAggregateStore:
+    """
+    Persisted portfolio accumulators with O(1) metric reads.
+
+    Reads load the tenant's per-year rows (one per tax year) and derive
+    the metrics from totals; nothing scans engagements or returns.
+    """
+
+    def __init__(self, persistence=None):
+        self._persistence = persistence
+
+    @property
+    def persistence(self):
+        if self._persistence is None:
+            from database.practice_metrics_persistence import get_practice_metrics_persistence
+            self._persistence = get_practice_metrics_persistence()
+        return self._persistence
+
+    # -------------------------------------------------------------------------
+    # Change hooks
+    # -------------------------------------------------------------------------
+
+    def record_engagement(self, tenant_id: str, engagement_id: str,
+                          engagement: Dict[str, Any], tax_year: int) -> None:
+        self.persistence.apply_change(
+            ENGAGEMENT, str(engagement_id), tenant_id,
+            engagement_contribution(engagement, tax_year), _folder(ENGAGEMENT),
+        )
+
+    def remove_engagement(self, engagement_id: str) -> None:
+        self.persistence.apply_change(ENGAGEMENT, str(engagement_id), None, None, _folder(ENGAGEMENT))
+
+    def record_return(self, tenant_id: str, return_id: str, return_data: Dict[str, Any]) -> None:
+        """Add or update a saved return; it counts as both an engagement and a return."""
+        record = portfolio_record(return_id, return_data)
+        self.record_engagement(tenant_id, return_id, record, record["tax_year"])
+        self.persistence.apply_change(
+            RETURN, str(return_id), tenant_id,
+            return_contribution(record, record["tax_year"]), _folder(RETURN),
+        )
+
+    def remove_return(self, return_id: str) -> None:
+        self.remove_engagement(return_id)
+        self.persistence.apply_change(RETURN, str(return_id), None, None, _folder(RETURN))
+
+    # -------------------------------------------------------------------------
+    # Reads
+    # -------------------------------------------------------------------------
+
+    def is_built(self, tenant_id: str) -> bool:
+        return self.persistence.is_built(tenant_id)
+
+    def _load(self, tenant_id: str) -> Dict[int, PortfolioAccumulator]:
+        return {
+            year: PortfolioAccumulator.from_dict(data)
+            for year, data in self.persistence.load_aggregates(tenant_id).items()
+        }
+
+    @staticmethod
+    def _advisory_mix(years: Dict[int, PortfolioAccumulator]) -> AdvisoryComplianceMix:
+        breakdown: Dict[str, int] = {}
+        advisory = compliance = 0
+        for accumulator in years.values():
+            for eng_type, count in accumulator.engagement_types.items():
+                breakdown[eng_type] = breakdown.get(eng_type, 0) + count
+            advisory += accumulator.advisory_count
+            compliance += accumulator.compliance_count
+        total = advisory + compliance
+        return AdvisoryComplianceMix(
+            advisory_count=advisory,
+            compliance_count=compliance,
+            advisory_percentage=(advisory / total * 100) if total > 0 else 0,
+            compliance_percentage=(compliance / total * 100) if total > 0 else 0,
+            breakdown=breakdown,
+        )
+
+    @staticmethod
+    def _complexity(accumulator: PortfolioAccumulator) -> ComplexityDistribution:
+        distribution = {tier.value: accumulator.tier_counts.get(tier.value, 0) for tier in ComplexityTier}
+        total = accumulator.return_count
+        return ComplexityDistribution(
+            distribution=distribution,
+            total_returns=total,
+            average_complexity_score=float(accumulator.tier_score_total / total) if total > 0 else 2.0,
+        )
+
+    @staticmethod
+    def _yoy(current: PortfolioAccumulator, prior: PortfolioAccumulator,
+             current_year: int, prior_year: int) -> YoYValueSurface:
+        return YoYValueSurface(
+            current_year=current_year,
+            prior_year=prior_year,
+            avg_refund_current=current.average("refund_amount"),
+            avg_refund_prior=prior.average("refund_amount"),
+            avg_tax_liability_current=current.average("total_tax"),
+            avg_tax_liability_prior=prior.average("total_tax"),
+            avg_deductions_current=current.average("total_deductions"),
+            avg_deductions_prior=prior.average("total_deductions"),
+            returns_current=current.return_count,
+            returns_prior=prior.return_count,
+        )
+
+    def advisory_mix(self, tenant_id: str) -> AdvisoryComplianceMix:
+        """Metric 1 across all of the tenant's engagements."""
+        return self._advisory_mix(self._load(tenant_id))
+
+    def complexity_distribution(self, tenant_id: str, tax_year: int) -> ComplexityDistribution:
+        """Metric 2 for one tax year."""
+        return self._complexity(self._load(tenant_id).get(tax_year, PortfolioAccumulator()))
+
+    def yoy_surface(self, tenant_id: str, current_year: int, prior_year: int) -> YoYValueSurface:
+        """Metric 3 between two tax years."""
+        years = self._load(tenant_id)
+        empty = PortfolioAccumulator()
+        return self._yoy(years.get(current_year, empty), years.get(prior_year, empty), current_year, prior_year)
+
+    def portfolio_metrics(self, tenant_id: str, current_year: int, prior_year: int) -> PortfolioMetrics:
+        """Same result as PracticeIntelligenceService.get_portfolio_metrics, from the stored totals."""
+        from datetime import datetime, timezone
+
+        years = self._load(tenant_id)
+        empty = PortfolioAccumulator()
+        current = years.get(current_year, empty)
+        prior = years.get(prior_year, empty)
+        return PortfolioMetrics(
+            tenant_id=tenant_id,
+            as_of=datetime.now(timezone.utc),
+            advisory_mix=self._advisory_mix(years),
+            complexity_distribution=self._complexity(current),
+            yoy_surface=self._yoy(current, prior, current_year, prior_year) if prior.return_count else None,
+        )
+
+    # -------------------------------------------------------------------------
+    # Rebuild and consistency check
+    # -------------------------------------------------------------------------
+
+    def rebuild(self, tenant_id: str, engagements: List[Dict[str, Any]],
+                returns: List[Dict[str, Any]], default_year: int = 2025) -> Dict[str, int]:
+        """
+        Recompute a tenant's aggregates from full lists and replace the stored ones.
+
+        Records are keyed by their engagement_id / return_id (list position
+        when absent) and bucketed by tax_year (default_year when absent).
+        """
+        accumulators: Dict[int, PortfolioAccumulator] = {}
+        contributions: List[Tuple[str, str, Dict[str, Any]]] = []
+        sources = (
+            (ENGAGEMENT, engagements, "engagement_id", engagement_contribution),
+            (RETURN, returns, "return_id", return_contribution),
+        )
+        for record_type, records, id_key, contribute in sources:
+            for i, record in enumerate(records):
+                record_id = str(record.get(id_key) or record.get("return_id") or f"{record_type}-{i}")
+                contribution = contribute(record, record.get("tax_year") or default_year)
+                accumulators.setdefault(contribution["tax_year"], PortfolioAccumulator()).apply(
+                    record_type, contribution, 1
+                )
+                contributions.append((record_type, record_id, contribution))
+
+        self.persistence.replace_tenant(
+            tenant_id, {year: acc.to_dict() for year, acc in accumulators.items()}, contributions
+        )
+        logger.info(
+            f"Rebuilt practice metrics for tenant {tenant_id}: "
+            f"{len(engagements)} engagements, {len(returns)} returns, {len(accumulators)} tax years"
+        )
+        return {"engagements": len(engagements), "returns": len(returns), "tax_years": len(accumulators)}
+
+    def check_consistency(self, tenant_id: str, engagements: List[Dict[str, Any]],
+                          returns: List[Dict[str, Any]], current_year: int, prior_year: int,
+                          default_year: int = 2025) -> Dict[str, Any]:
+        """
+        Compare the stored metrics with a full recomputation from the given lists.
+
+        Returns:
+            {"consistent": bool, "differences": {metric: {"stored", "recomputed"}}}
+        """
+        def year_of(record):
+            return record.get("tax_year") or default_year
+
+        current_returns = [r for r in returns if year_of(r) == current_year]
+        prior_returns = [r for r in returns if year_of(r) == prior_year]
+        recomputed = PracticeIntelligenceService().get_portfolio_metrics(
+            tenant_id=tenant_id,
+            engagements=engagements,
+            current_year_returns=current_returns,
+            prior_year_returns=prior_returns or None,
+            current_year=current_year,
+            prior_year=prior_year,
+        ).to_dict()["metrics"]
+        stored = self.portfolio_metrics(tenant_id, current_year, prior_year).to_dict()["metrics"]
+
+        differences = {
+            name: {"stored": stored[name], "recomputed": recomputed[name]}
+            for name in recomputed
+            if stored[name] != recomputed[name]
+        }
+        if differences:
+            logger.warning(f"Practice metrics for tenant {tenant_id} drifted: {sorted(differences)}")
+        return {"consistent": not differences, "differences": differences}
+
+
+
+# Singleton instance
+_aggregate_store: Optional[PortfolioAggregateStore] = None
+
+
+def get_portfolio_aggregate_store() -> PortfolioAggregateStore:
+    """Get the global portfolio aggregate store instance."""
+    global _aggregate_store
+    if _aggregate_store is None:
+        _aggregate_store = PortfolioAggregateStore()
+    return _aggregate_store
+
+
+def sync_saved_return(return_id: str, return_data: Dict[str, Any], firm_id: Optional[str]) -> None:
+    """
+    Fold a saved return into its owning firm's aggregates (best effort).
+
+    A return with no owning firm is not part of any portfolio, so any
+    earlier contribution is removed.
+    """
+    try:
+        store = get_portfolio_aggregate_store()
+        if firm_id:
+            store.record_return(str(firm_id), str(return_id), return_data)
+        else:
+            store.remove_return(str(return_id))
+    except Exception as e:
+        logger.warning(f"Could not update practice metrics for return {return_id}: {e}")
+
+
+def sync_deleted_return(return_id: str) -> None:
+    """Remove a deleted return from the aggregates (best effort)."""
+    try:
+        get_portfolio_aggregate_store().remove_return(str(return_id))
+    except Exception as e:
+        logger.warning(f"Could not update practice metrics for return {return_id}: {e}")
+
+
+async def load_portfolio_records(session, firm_id: str) -> List[Dict[str, Any]]:
+    """
+    Load every return of a firm as a portfolio record (all tax years, one query).
+
+    Uses the same ownership rule (tax_returns.firm_id) and normalisation
+    (portfolio_record over the stored return JSON) as the save hooks.
+    Each record doubles as the engagement record for its return.
+    """
+    import json
+    from sqlalchemy import text
+
+    query = text("""
+        SELECT tr.return_id, tr.tax_year, tr.return_data
+        FROM tax_returns tr
+        WHERE tr.firm_id = :firm_id
+    """)
+    result = await session.execute(query, {"firm_id": firm_id})
+    records = []
+    for return_id, tax_year, return_data in result.fetchall():
+        if isinstance(return_data, str):
+            return_data = json.loads(return_data)
+        data = dict(return_data or {})
+        if data.get("tax_year") is None:
+            data["tax_year"] = tax_year
+        records.append(portfolio_record(str(return_id), data))
+    return records
+
+
+async def list_portfolio_tenants(session) -> List[str]:
+    """Firms that own at least one return."""
+    from sqlalchemy import text
+
+    result = await session.execute(text("""
+        SELECT DISTINCT firm_id
+        FROM tax_returns
+        WHERE firm_id IS NOT NULL
+    """))
+    return [str(row[0]) for row in result.fetchall()]
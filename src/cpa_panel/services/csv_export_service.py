@@ -0,0 +1,202 @@
+"""
+CSV Export Service
+
+Streams firm-scoped CSV exports of clients, leads and activity straight
+from the database.
+
+Rows are read in keyset-paginated batches (WHERE key > last key ORDER BY
+key LIMIT n), so every batch is an index range scan no matter how deep
+into the export it is, and each batch uses its own short session; a slow
+download never pins a pooled connection. Batches are CSV-encoded (and
+optionally gzip-compressed) into an async generator, so memory stays at
+one batch. The first page is queried before the header is yielded, so a
+bad firm or an unavailable database fails the first read of the stream,
+while the route can still turn it into an HTTP error.
+"""
+
+import csv
+import io
+import logging
+import os
+import zlib
+from dataclasses import dataclass
+from typing import Any, AsyncContextManager, AsyncIterator, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+EXPORT_BATCH_SIZE = int(os.environ.get("CPA_EXPORT_BATCH_SIZE", "2000"))
+EXPORT_GZIP_LEVEL = int(os.environ.get("CPA_EXPORT_GZIP_LEVEL", "6"))
+
+
+@dataclass(frozen=True)
+class ExportSpec:
+    """One export type: its keyset query and how a row maps to CSV."""
+    table: str
+    select: str
+    key: Tuple[str, ...]          # keyset columns, unique together, in ORDER BY order
+    header: Tuple[str, ...]
+    to_row: Callable[[Mapping[str, Any]], Sequence[Any]]
+
+    def page_sql(self, after: bool) -> str:
+        key_list = ", ".join(self.key)
+        conditions = ["firm_id = :firm_id"]
+        if after:
+            placeholders = ", ".join(f":after_{i}" for i in range(len(self.key)))
+            conditions.append(f"({key_list}) > ({placeholders})" if len(self.key) > 1
+                              else f"{self.key[0]} > :after_0")
+        return (
+            f"SELECT {self.select} FROM {self.table} "
+            f"WHERE {' AND '.join(conditions)} "
+            f"ORDER BY {key_list} LIMIT :limit"
+        )
+
+
+def _iso(value: Any) -> Any:
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+
+def _lead_status(row: Mapping[str, Any]) -> str:
+    if row["converted"]:
+        return "converted"
+    if row["engaged"]:
+        return "engaged"
+    return "new"
+
+
+EXPORTS: Dict[str, ExportSpec] = {
+    "clients": ExportSpec(
+        table="clients",
+        select="client_id, external_id, first_name, last_name, email, phone, state, is_active, created_at",
+        key=("client_id",),
+        header=("client_id", "external_id", "name", "email", "phone", "state", "status", "created_at"),
+        to_row=lambda r: (
+            r["client_id"], r["external_id"], f"{r['first_name'] or ''} {r['last_name'] or ''}".strip(),
+            r["email"], r["phone"], r["state"], "active" if r["is_active"] else "inactive", _iso(r["created_at"]),
+        ),
+    ),
+    "leads": ExportSpec(
+        table="lead_magnet_leads",
+        select=(
+            "id, lead_id, first_name, email, filing_status, complexity, lead_score, lead_temperature, "
+            "estimated_engagement_value, savings_range_high, engaged, converted, created_at"
+        ),
+        key=("id",),
+        header=(
+            "lead_id", "name", "email", "filing_status", "complexity", "status", "lead_score",
+            "temperature", "estimated_value", "estimated_savings", "created_at",
+        ),
+        to_row=lambda r: (
+            r["lead_id"], r["first_name"], r["email"], r["filing_status"], r["complexity"], _lead_status(r),
+            r["lead_score"], r["lead_temperature"], r["estimated_engagement_value"], r["savings_range_high"],
+            _iso(r["created_at"]),
+        ),
+    ),
+    "activity": ExportSpec(
+        table="audit_logs",
+        select="log_id, timestamp, event_type, event_category, severity, user_id, user_role, description",
+        key=("timestamp", "log_id"),
+        header=("timestamp", "action", "category", "severity", "user", "role", "details"),
+        to_row=lambda r: (
+            _iso(r["timestamp"]), r["event_type"], r["event_category"], r["severity"],
+            r["user_id"], r["user_role"], r["description"],
+        ),
+    ),
+}
+
+EXPORT_TYPES = tuple(EXPORTS)
+
+
+def _default_session_scope() -> AsyncContextManager:
+    from database.async_engine import get_async_session
+    return get_async_session()
+
+
+class _Encoder:
+    """CSV (and optionally gzip) encoder that hands back bytes per batch."""
+
+    def __init__(self, gzip_output: bool, gzip_level: int):
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+        # wbits=31: gzip container, so the stream is a valid .gz file
+        self._compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 31) if gzip_output else None
+
+    def write(self, rows: Sequence[Sequence[Any]], flush: bool = False) -> bytes:
+        self._writer.writerows(rows)
+        data = self._buffer.getvalue().encode("utf-8")
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        if self._compressor is None:
+            return data
+        chunk = self._compressor.compress(data)
+        if flush:
+            chunk += self._compressor.flush(zlib.Z_SYNC_FLUSH)
+        return chunk
+
+    def close(self) -> bytes:
+        return self._compressor.flush() if self._compressor is not None else b""
+
+
+async def stream_export(
+    export_type: str,
+    firm_id: str,
+    gzip_output: bool = False,
+    batch_size: Optional[int] = None,
+    session_scope: Optional[Callable[[], AsyncContextManager]] = None,
+    gzip_level: int = EXPORT_GZIP_LEVEL,
+) -> AsyncIterator[bytes]:
+    """
+    Stream one export as CSV bytes, batch by batch.
+
+    Args:
+        export_type: One of EXPORT_TYPES
+        firm_id: Firm whose rows are exported
+        gzip_output: Emit a gzip stream instead of plain CSV
+        batch_size: Rows per keyset page (default EXPORT_BATCH_SIZE)
+        session_scope: Factory for an async session context manager
+            (default database.async_engine.get_async_session)
+
+    Raises:
+        KeyError: Unknown export type
+        ValueError: Missing firm_id
+        Exception: Whatever the first page query raises; both surface on
+            the first read of the stream, before any bytes are produced
+    """
+    spec = EXPORTS[export_type]
+    if not firm_id:
+        raise ValueError("firm_id is required for an export")
+    batch_size = batch_size or EXPORT_BATCH_SIZE
+    session_scope = session_scope or _default_session_scope
+    encoder = _Encoder(gzip_output, gzip_level)
+
+    first_sql, next_sql = text(spec.page_sql(after=False)), text(spec.page_sql(after=True))
+    params: Dict[str, Any] = {"firm_id": firm_id, "limit": batch_size}
+    after: Optional[List[Any]] = None
+    total = 0
+    header_sent = False
+    while True:
+        if after is not None:
+            params.update({f"after_{i}": value for i, value in enumerate(after)})
+        async with session_scope() as session:
+            result = await session.execute(next_sql if after is not None else first_sql, params)
+            rows = result.mappings().all()
+        if not header_sent:
+            # Header only after the first page succeeded, so errors stay HTTP errors
+            header_sent = True
+            yield encoder.write([spec.header], flush=True)
+        if not rows:
+            break
+
+        total += len(rows)
+        chunk = encoder.write([spec.to_row(row) for row in rows], flush=True)
+        if chunk:
+            yield chunk
+        if len(rows) < batch_size:
+            break
+        after = [rows[-1][column] for column in spec.key]
+
+    tail = encoder.close()
+    if tail:
+        yield tail
+    logger.info(f"Exported {total} {export_type} rows for firm {firm_id}")
@@ -0,0 +1,383 @@
+"""
+Lead magnet funnel event ingestion and rollups.
+
+Used by LeadMagnetService:
+- FunnelEventBuffer: buffers tracked events and writes them in batches
+- lead_magnet_event_rollups: hourly and daily event counts per
+  (cpa_id, event_name, step, variant_id, utm_source, device_type)
+
+A flush writes the raw events, the rollup increments and the latest
+session screen per session in one transaction on one connection, so the
+rollups always match the raw event table. Funnel KPIs read the daily
+rollups instead of scanning events.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+try:
+    import psycopg2
+except ImportError:  # pragma: no cover - optional dependency
+    psycopg2 = None
+
+logger = logging.getLogger(__name__)
+
+LEAD_EVENT_BATCH_SIZE = int(os.environ.get("LEAD_MAGNET_EVENT_BATCH_SIZE", "200"))
+LEAD_EVENT_FLUSH_INTERVAL_MS = int(os.environ.get("LEAD_MAGNET_EVENT_FLUSH_INTERVAL_MS", "1000"))
+LEAD_EVENT_MAX_PENDING = int(os.environ.get("LEAD_MAGNET_EVENT_MAX_PENDING", "20000"))
+
+EVENT_COLUMNS = (
+    "event_id", "session_id", "cpa_id", "event_name", "step", "variant_id",
+    "utm_source", "utm_medium", "utm_campaign", "device_type", "metadata_json", "created_at",
+)
+
+# Rollup dimensions; NULLs are stored as '' so they take part in the key
+ROLLUP_DIMENSIONS = ("cpa_id", "event_name", "step", "variant_id", "utm_source", "device_type")
+ROLLUP_KEY = ("granularity", "bucket") + ROLLUP_DIMENSIONS
+
+ROLLUP_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS lead_magnet_event_rollups (
+        granularity TEXT NOT NULL,
+        bucket TEXT NOT NULL,
+        cpa_id TEXT NOT NULL DEFAULT '',
+        event_name TEXT NOT NULL,
+        step TEXT NOT NULL DEFAULT '',
+        variant_id TEXT NOT NULL DEFAULT '',
+        utm_source TEXT NOT NULL DEFAULT '',
+        device_type TEXT NOT NULL DEFAULT '',
+        event_count INTEGER NOT NULL DEFAULT 0,
+        score_interactions INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (granularity, bucket, cpa_id, event_name, step, variant_id, utm_source, device_type)
+    )
+"""
+# SQLite: cluster rows on the primary key so bucket range scans read no extra pages
+SQLITE_ROLLUP_TABLE_SQL = ROLLUP_TABLE_SQL.rstrip() + " WITHOUT ROWID"
+ROLLUP_INDEX_SQL = """
+    CREATE INDEX IF NOT EXISTS idx_lead_magnet_rollups_cpa
+    ON lead_magnet_event_rollups(cpa_id, granularity, bucket)
+"""
+
+_INSERT_EVENT_SQL = (
+    f"INSERT INTO lead_magnet_events ({', '.join(EVENT_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in EVENT_COLUMNS)})"
+)
+_UPSERT_ROLLUP_SQL = (
+    f"INSERT INTO lead_magnet_event_rollups ({', '.join(ROLLUP_KEY)}, event_count, score_interactions) "
+    f"VALUES ({', '.join('?' for _ in ROLLUP_KEY)}, ?, ?) "
+    f"ON CONFLICT ({', '.join(ROLLUP_KEY)}) DO UPDATE SET "
+    "event_count = lead_magnet_event_rollups.event_count + excluded.event_count, "
+    "score_interactions = lead_magnet_event_rollups.score_interactions + excluded.score_interactions"
+)
+# Skips sessions written since the event, so a late flush never rolls a screen back
+_UPDATE_SCREEN_SQL = (
+    "UPDATE lead_magnet_sessions SET current_screen = ?, last_activity = ? "
+    "WHERE session_id = ? AND (last_activity IS NULL OR last_activity <= ?)"
+)
+
+
+# SQLite OperationalErrors that clear up on their own (another writer, I/O hiccup)
+_TRANSIENT_SQLITE_ERRORS = ("locked", "busy", "unable to open", "disk i/o")
+
+
+def _is_transient(exc: Exception) -> bool:
+    """Whether a write failed because of the database, not the rows."""
+    if isinstance(exc, sqlite3.OperationalError):
+        message = str(exc).lower()
+        return any(text in message for text in _TRANSIENT_SQLITE_ERRORS)
+    if psycopg2 is not None and isinstance(exc, (psycopg2.OperationalError, psycopg2.InterfaceError)):
+        return True
+    return False
+
+
+def _is_integrity_error(exc: Exception) -> bool:
+    if isinstance(exc, sqlite3.IntegrityError):
+        return True
+    return psycopg2 is not None and isinstance(exc, psycopg2.IntegrityError)
+
+
+def _rollback(conn) -> None:
+    try:
+        conn.rollback()
+    except Exception as exc:  # connection already gone
+        logger.debug("Lead magnet event rollback failed: %s", exc)
+
+
+def _as_utc(value: Any) -> datetime:
+    if isinstance(value, datetime):
+        moment = value
+    else:
+        moment = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+
+def is_score_interaction(event: Mapping[str, Any]) -> bool:
+    """Score-panel interaction: a score_interaction step or a subscore click."""
+    if event["event_name"] != "step_complete":
+        return False
+    return event.get("step") == "score_interaction" or "subscore_click" in (event.get("metadata_json") or "").lower()
+
+
+def rollup_increments(events: Iterable[Mapping[str, Any]]) -> Dict[Tuple[str, ...], List[int]]:
+    """Hourly and daily [event_count, score_interactions] increments for a batch of events."""
+    increments: Dict[Tuple[str, ...], List[int]] = {}
+    for event in events:
+        created = _as_utc(event["created_at"])
+        dimensions = tuple(event.get(name) or "" for name in ROLLUP_DIMENSIONS)
+        score = 1 if is_score_interaction(event) else 0
+        for granularity, bucket in (("hour", created.strftime("%Y-%m-%dT%H")), ("day", created.strftime("%Y-%m-%d"))):
+            counts = increments.setdefault((granularity, bucket) + dimensions, [0, 0])
+            counts[0] += 1
+            counts[1] += score
+    return increments
+
+
+def _upsert_rollups(cursor, increments: Dict[Tuple[str, ...], List[int]]) -> None:
+    if increments:
+        cursor.executemany(_UPSERT_ROLLUP_SQL, [key + tuple(counts) for key, counts in increments.items()])
+
+
+def rebuild_rollups(conn, batch_size: int = 5000) -> int:
+    """
+    Recompute the rollup table from lead_magnet_events.
+
+    For backfilling data recorded before the rollups existed, or after
+    events were deleted directly. Returns the number of events read.
+    """
+    read_cursor = conn.cursor()
+    read_cursor.execute(
+        "SELECT event_name, step, cpa_id, variant_id, utm_source, device_type, metadata_json, created_at "
+        "FROM lead_magnet_events WHERE created_at IS NOT NULL"
+    )
+    increments: Dict[Tuple[str, ...], List[int]] = {}
+    total = 0
+    while True:
+        rows = read_cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        total += len(rows)
+        for key, counts in rollup_increments(dict(row) for row in rows).items():
+            existing = increments.setdefault(key, [0, 0])
+            existing[0] += counts[0]
+            existing[1] += counts[1]
+
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM lead_magnet_event_rollups")
+    _upsert_rollups(cursor, increments)
+    conn.commit()
+    return total
+
+
+class FunnelEventBuffer:
+    """
+    Batches funnel events and session screen updates.
+
+    add() queues an event and flushes once batch_size events are pending
+    or the oldest pending event is flush_interval_ms old. A daemon thread
+    started on the first add() flushes on the same interval when no new
+    events arrive, so a quiet buffer is never left holding events.
+    Readers call flush() first so KPIs include everything tracked so far
+    in this process; events buffered by other workers show up within
+    one flush interval.
+
+    Events are acknowledged before they are persisted: add() returns as
+    soon as the event is queued. Pending events are flushed by close()
+    (registered at exit), but a worker killed outright (SIGKILL, OOM)
+    loses up to one interval / batch of events. Funnel analytics accept
+    that trade; don't route anything that must not be lost through here.
+
+    If a batch violates a constraint it is retried one event per
+    transaction, so a single bad row (e.g. a duplicate or foreign-key miss)
+    doesn't block the rest. If the database is unreachable, locked or busy,
+    or the connection drops, the batch is put back and retried on the next
+    flush, up to max_pending events. Any other error fails the batch.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        batch_size: int = LEAD_EVENT_BATCH_SIZE,
+        flush_interval_ms: int = LEAD_EVENT_FLUSH_INTERVAL_MS,
+        max_pending: int = LEAD_EVENT_MAX_PENDING,
+    ):
+        self._connect = connect
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = max(0, flush_interval_ms) / 1000.0
+        self.max_pending = max(self.batch_size, max_pending)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._events: List[Dict[str, Any]] = []
+        self._screens: Dict[str, Tuple[str, str]] = {}
+        self._oldest: Optional[float] = None
+        self._stop = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        # Metrics
+        self._persisted = 0
+        self._failed = 0
+        self._dropped = 0
+        self._batches = 0
+        self._last_flush_ms = 0.0
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._events)
+
+    def add(self, event: Dict[str, Any], screen: Optional[str] = None) -> None:
+        """Queue an event (and the session's new screen, if any)."""
+        with self._lock:
+            self._events.append(event)
+            if screen:
+                self._screens[event["session_id"]] = (screen, event["created_at"])
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            if self._flusher is None and self.flush_interval > 0:
+                self._flusher = threading.Thread(
+                    target=self._run_flusher, name="lead-magnet-event-flush", daemon=True
+                )
+                self._flusher.start()
+            due = (
+                len(self._events) >= self.batch_size
+                or time.monotonic() - self._oldest >= self.flush_interval
+            )
+        if due:
+            self.flush()
+
+    def flush(self) -> int:
+        """Write every pending event. Returns the number persisted."""
+        with self._flush_lock:
+            with self._lock:
+                events, screens = self._events, self._screens
+                self._events, self._screens, self._oldest = [], {}, None
+            if not events and not screens:
+                return 0
+
+            start = time.perf_counter()
+            try:
+                conn = self._connect()
+            except Exception as exc:
+                logger.error("Lead magnet event flush failed, %d events re-queued: %s", len(events), exc)
+                self._requeue(events, screens)
+                return 0
+
+            try:
+                persisted, requeued = self._write(conn, events, screens)
+            finally:
+                conn.close()
+
+            with self._lock:
+                self._persisted += persisted
+                self._failed += len(events) - persisted - requeued
+                self._batches += 1
+                self._last_flush_ms = (time.perf_counter() - start) * 1000
+            return persisted
+
+    def close(self) -> int:
+        """Stop the background flusher and write what is pending."""
+        self._stop.set()
+        flusher = self._flusher
+        if flusher is not None and flusher is not threading.current_thread():
+            flusher.join(timeout=max(self.flush_interval, 1.0) + 5.0)
+        return self.flush()
+
+    def _run_flusher(self) -> None:
+        """Flush whenever the oldest pending event reaches the flush interval."""
+        while True:
+            with self._lock:
+                if self._oldest is None:
+                    wait = self.flush_interval
+                else:
+                    wait = max(0.0, self._oldest + self.flush_interval - time.monotonic())
+            if self._stop.wait(wait):
+                return
+            with self._lock:
+                due = self._oldest is not None and time.monotonic() - self._oldest >= self.flush_interval
+            if due:
+                try:
+                    self.flush()
+                except Exception:
+                    logger.exception("Lead magnet background event flush failed")
+
+    def _requeue(self, events: List[Dict[str, Any]], screens: Dict[str, Tuple[str, str]]) -> None:
+        with self._lock:
+            self._events[:0] = events
+            for session_id, screen in screens.items():
+                self._screens.setdefault(session_id, screen)
+            overflow = len(self._events) - self.max_pending
+            if overflow > 0:
+                del self._events[:overflow]
+                self._dropped += overflow
+                logger.warning("Lead magnet event buffer full; dropped %d oldest events", overflow)
+            if self._events and self._oldest is None:
+                self._oldest = time.monotonic()
+
+    def _write(
+        self, conn, events: List[Dict[str, Any]], screens: Dict[str, Tuple[str, str]]
+    ) -> Tuple[int, int]:
+        """Write a batch; returns (events persisted, events re-queued)."""
+        try:
+            self._write_batch(conn, events, screens)
+            return len(events), 0
+        except Exception as exc:
+            _rollback(conn)
+            if _is_transient(exc):
+                logger.error("Lead magnet event flush failed, %d events re-queued: %s", len(events), exc)
+                self._requeue(events, screens)
+                return 0, len(events)
+            if not _is_integrity_error(exc):
+                logger.error("Failed to persist %d lead magnet events: %s", len(events), exc)
+                return 0, 0
+            logger.warning("Lead magnet event batch failed, retrying per event: %s", exc)
+
+        persisted = 0
+        for i, event in enumerate(events):
+            try:
+                self._write_batch(conn, [event], {})
+                persisted += 1
+            except Exception as exc:
+                _rollback(conn)
+                if _is_transient(exc):
+                    remaining = events[i:]
+                    logger.error("Lead magnet event flush failed, %d events re-queued: %s", len(remaining), exc)
+                    self._requeue(remaining, screens)
+                    return persisted, len(remaining)
+                logger.error("Failed to persist lead magnet event %s: %s", event["event_id"], exc)
+        try:
+            self._write_batch(conn, [], screens)
+        except Exception as exc:
+            _rollback(conn)
+            if _is_transient(exc):
+                self._requeue([], screens)
+            logger.error("Failed to update lead magnet session screens: %s", exc)
+        return persisted, 0
+
+    @staticmethod
+    def _write_batch(conn, events: List[Dict[str, Any]], screens: Dict[str, Tuple[str, str]]) -> None:
+        cursor = conn.cursor()
+        if events:
+            cursor.executemany(_INSERT_EVENT_SQL, [tuple(event[name] for name in EVENT_COLUMNS) for event in events])
+            _upsert_rollups(cursor, rollup_increments(events))
+        if screens:
+            cursor.executemany(
+                _UPDATE_SCREEN_SQL,
+                [(screen, at, session_id, at) for session_id, (screen, at) in screens.items()],
+            )
+        conn.commit()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Pending depth and flush counters."""
+        with self._lock:
+            return {
+                "pending": len(self._events),
+                "persisted": self._persisted,
+                "failed": self._failed,
+                "dropped": self._dropped,
+                "batches": self._batches,
+                "last_flush_ms": round(self._last_flush_ms, 3),
+            }
@@ -12,6 +12,7 @@ This service powers the lead magnet funnel:
 
 from __future__ import annotations
 
+import atexit
 import uuid
 import json
 import logging
@@ -28,6 +29,12 @@ from urllib.parse import parse_qsl, urlencode, urlparse
 
 from config.database import get_database_settings
 from ..config.lead_magnet_score_config import SCORE_BENCHMARKS, get_score_weights
+from .lead_magnet.events import (
+    ROLLUP_INDEX_SQL,
+    SQLITE_ROLLUP_TABLE_SQL,
+    FunnelEventBuffer,
+    rebuild_rollups,
+)
 logger = logging.getLogger(__name__)
 
 try:
@@ -118,6 +125,10 @@ class _DbCursorAdapter:
             self._cursor.execute(normalized_query, params)
         return self
 
+    def executemany(self, query: str, params_seq: List[Tuple[Any, ...]]):
+        self._cursor.executemany(self._normalize_query(query, self._is_postgres), params_seq)
+        return self
+
     def fetchone(self):
         row = self._cursor.fetchone()
         # sqlite3.Row supports key access but not .get() — normalize to dict
@@ -534,6 +545,10 @@ class LeadMagnetService:
             self._ensure_core_tables()
             self._ensure_event_table()
             self._ensure_session_columns()
+        # Funnel events are written in batches (also on a background
+        # interval); stop the flusher and write what's left at exit
+        self._event_buffer = FunnelEventBuffer(self._get_db_connection)
+        atexit.register(self._event_buffer.close)
 
     def _get_db_connection(self):
         """Get database connection."""
@@ -691,6 +706,12 @@ class LeadMagnetService:
                 CREATE INDEX IF NOT EXISTS idx_lead_magnet_events_utm_source
                 ON lead_magnet_events(utm_source, created_at DESC)
             """)
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type='table' AND name = 'lead_magnet_event_rollups'"
+            )
+            rollups_existed = cursor.fetchone() is not None
+            cursor.execute(SQLITE_ROLLUP_TABLE_SQL)
+            cursor.execute(ROLLUP_INDEX_SQL)
             self._ensure_column(
                 cursor,
                 table_name="lead_magnet_events",
@@ -722,6 +743,11 @@ class LeadMagnetService:
                 column_def="TEXT",
             )
             conn.commit()
+            if not rollups_existed:
+                # Backfill rollups for events recorded before they existed
+                backfilled = rebuild_rollups(conn)
+                if backfilled:
+                    logger.info("Backfilled lead magnet event rollups from %d events", backfilled)
             conn.close()
         except Exception as exc:
             logger.warning("Failed to ensure lead_magnet_events table: %s", exc)
@@ -745,7 +771,8 @@ class LeadMagnetService:
             self._validate_sql_identifier(table_name)
             self._validate_sql_identifier(column_name)
             cursor.execute(f"PRAGMA table_info({table_name})")
-            columns = {row[1] for row in cursor.fetchall()}
+            # The cursor adapter returns sqlite rows as dicts
+            columns = {row["name"] if isinstance(row, dict) else row[1] for row in cursor.fetchall()}
             if column_name not in columns:
                 cursor.execute(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column_def}")
         except Exception as exc:
@@ -1108,7 +1135,11 @@ class LeadMagnetService:
         device_type: Optional[str] = None,
     ) -> Dict[str, Any]:
         """
-        Persist a funnel analytics event.
+        Record a funnel analytics event.
+
+        Events are buffered and written in batches together with their
+        hourly/daily rollups; flush_events() forces a write. The event is
+        returned before it is persisted (see FunnelEventBuffer).
 
         This powers launch KPIs:
         - start
@@ -1136,36 +1167,26 @@ class LeadMagnetService:
         derived_utm_campaign = utm_campaign or safe_metadata.get("utm_campaign") or session.utm_campaign
         derived_device = device_type or safe_metadata.get("device_type") or safe_metadata.get("device") or session.device_type
 
-        try:
-            conn = self._get_db_connection()
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO lead_magnet_events (
-                    event_id, session_id, cpa_id, event_name, step, variant_id,
-                    utm_source, utm_medium, utm_campaign, device_type, metadata_json, created_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                event_id,
-                session_id,
-                self._persistable_cpa_id(session.cpa_profile),
-                event_name,
-                step,
-                derived_variant,
-                derived_utm_source,
-                derived_utm_medium,
-                derived_utm_campaign,
-                derived_device,
-                json.dumps(safe_metadata),
-                created_at,
-            ))
-            conn.commit()
-            conn.close()
-        except Exception as exc:
-            logger.error("Failed to persist lead magnet event: %s", exc)
-            raise
+        # Buffered: the event, its rollup increments and the session's
+        # screen are written with the next batch (see FunnelEventBuffer)
+        self._event_buffer.add({
+            "event_id": event_id,
+            "session_id": session_id,
+            "cpa_id": self._persistable_cpa_id(session.cpa_profile),
+            "event_name": event_name,
+            "step": step,
+            "variant_id": derived_variant,
+            "utm_source": derived_utm_source,
+            "utm_medium": derived_utm_medium,
+            "utm_campaign": derived_utm_campaign,
+            "device_type": derived_device,
+            "metadata_json": json.dumps(safe_metadata),
+            "created_at": created_at,
+        }, screen=step)
 
         if step:
-            self.update_session_screen(session_id, step)
+            session.current_screen = step
+            session.last_activity = datetime.now(timezone.utc)
 
         logger.debug("Tracked lead-magnet event %s for session %s", event_name, session_id)
         return {
@@ -2255,11 +2276,24 @@ class LeadMagnetService:
             conn = self._get_db_connection()
             cursor = conn.cursor()
 
-            query = "SELECT * FROM lead_magnet_leads"
+            # Aggregated in SQL: one row per (temperature, complexity)
+            # instead of every lead
+            query = """
+                SELECT
+                    lead_temperature,
+                    complexity,
+                    COUNT(*) AS lead_count,
+                    SUM(CASE WHEN engaged THEN 1 ELSE 0 END) AS engaged_count,
+                    SUM(CASE WHEN converted THEN 1 ELSE 0 END) AS converted_count,
+                    SUM(lead_score) AS score_total,
+                    SUM(estimated_engagement_value) AS value_total
+                FROM lead_magnet_leads
+            """
             params = []
             if cpa_id:
                 query += " WHERE cpa_id = ?"
                 params.append(cpa_id)
+            query += " GROUP BY lead_temperature, complexity"
 
             cursor.execute(query, params)
             rows = cursor.fetchall()
@@ -2270,24 +2304,21 @@ class LeadMagnetService:
 
             total_score = 0
             for row in rows:
-                stats["total_leads"] += 1
+                count = int(row["lead_count"])
+                stats["total_leads"] += count
 
                 temp = row["lead_temperature"]
                 if temp in stats["by_temperature"]:
-                    stats["by_temperature"][temp] += 1
+                    stats["by_temperature"][temp] += count
 
                 complexity = row["complexity"]
                 if complexity in stats["by_complexity"]:
-                    stats["by_complexity"][complexity] += 1
-
-                if row["engaged"]:
-                    stats["engaged_count"] += 1
+                    stats["by_complexity"][complexity] += count
 
-                if row["converted"]:
-                    stats["converted_count"] += 1
-
-                total_score += row["lead_score"]
-                stats["total_potential_value"] += row["estimated_engagement_value"]
+                stats["engaged_count"] += int(row["engaged_count"] or 0)
+                stats["converted_count"] += int(row["converted_count"] or 0)
+                total_score += row["score_total"] or 0
+                stats["total_potential_value"] += float(row["value_total"] or 0)
 
             stats["average_lead_score"] = total_score / stats["total_leads"] if stats["total_leads"] > 0 else 0
 
@@ -2305,67 +2336,43 @@ class LeadMagnetService:
         device_type: Optional[str] = None,
         cpa_id: Optional[str] = None,
     ) -> Dict[str, Any]:
-        """Return funnel KPI aggregates by date window and experiment variant."""
-        where_clauses = ["1=1"]
-        params: List[Any] = []
-        if date_from:
-            where_clauses.append("date(created_at) >= date(?)")
-            params.append(date_from)
-        if date_to:
-            where_clauses.append("date(created_at) <= date(?)")
-            params.append(date_to)
-        if variant_id:
-            where_clauses.append("variant_id = ?")
-            params.append(variant_id)
-        if utm_source:
-            where_clauses.append("utm_source = ?")
-            params.append(utm_source)
-        if device_type:
-            where_clauses.append("device_type = ?")
-            params.append(device_type)
-        if cpa_id:
-            where_clauses.append("cpa_id = ?")
-            params.append(cpa_id)
-
-        clause = " AND ".join(where_clauses)
+        """
+        Return funnel KPI aggregates by date window and experiment variant.
+
+        Reads the daily rollups (one row per day and dimension combination)
+        rather than scanning lead_magnet_events.
+        """
+        clause, params = self._rollup_filters(
+            "day", date_from, date_to, variant_id=variant_id,
+            utm_source=utm_source, device_type=device_type, cpa_id=cpa_id,
+        )
         event_counts: Dict[Tuple[str, Optional[str]], int] = {}
         total_events = 0
         score_interactions = 0
 
         try:
+            self.flush_events()
             conn = self._get_db_connection()
             cursor = conn.cursor()
             cursor.execute(
                 f"""
-                SELECT event_name, step, COUNT(*) AS cnt
-                FROM lead_magnet_events
+                SELECT event_name, step,
+                       SUM(event_count) AS cnt,
+                       SUM(score_interactions) AS score_cnt
+                FROM lead_magnet_event_rollups
                 WHERE {clause}
                 GROUP BY event_name, step
                 """,
                 params,
             )
             rows = cursor.fetchall()
+            conn.close()
             for row in rows:
-                key = (row["event_name"], row["step"])
+                key = (row["event_name"], row["step"] or None)
                 count = int(row["cnt"] or 0)
                 event_counts[key] = count
                 total_events += count
-
-            cursor.execute(
-                f"""
-                SELECT COUNT(*) AS cnt
-                FROM lead_magnet_events
-                WHERE {clause}
-                  AND event_name = 'step_complete'
-                  AND (
-                    step = 'score_interaction'
-                    OR metadata_json LIKE '%subscore_click%'
-                  )
-                """,
-                params,
-            )
-            score_interactions = int((cursor.fetchone() or {"cnt": 0})["cnt"] or 0)
-            conn.close()
+                score_interactions += int(row["score_cnt"] or 0)
         except Exception as exc:
             logger.error("Failed to compute funnel KPIs: %s", exc)
             return {
@@ -2420,6 +2427,92 @@ class LeadMagnetService:
             },
         }
 
+    @staticmethod
+    def _rollup_filters(
+        granularity: str,
+        date_from: Optional[str],
+        date_to: Optional[str],
+        **dimensions: Optional[str],
+    ) -> Tuple[str, List[Any]]:
+        """WHERE clause over lead_magnet_event_rollups (a primary-key range scan)."""
+        where_clauses = ["granularity = ?"]
+        params: List[Any] = [granularity]
+        # Buckets are 'YYYY-MM-DD' (day) or 'YYYY-MM-DDTHH' (hour) in UTC
+        if date_from:
+            where_clauses.append("bucket >= ?")
+            params.append(date_from[:10])
+        if date_to:
+            # '~' sorts after 'T', so every hour bucket of date_to is included
+            where_clauses.append("bucket < ?")
+            params.append(date_to[:10] + "~")
+        for column, value in dimensions.items():
+            if value:
+                where_clauses.append(f"{column} = ?")
+                params.append(value)
+        return " AND ".join(where_clauses), params
+
+    def get_funnel_timeseries(
+        self,
+        granularity: str = "day",
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        event_name: Optional[str] = None,
+        variant_id: Optional[str] = None,
+        utm_source: Optional[str] = None,
+        device_type: Optional[str] = None,
+        cpa_id: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Event counts per hour or day bucket from the rollups.
+
+        Returns:
+            [{"bucket", "event_name", "count"}] ordered by bucket
+        """
+        if granularity not in ("hour", "day"):
+            raise ValueError(f"Unsupported granularity '{granularity}'")
+        clause, params = self._rollup_filters(
+            granularity, date_from, date_to, event_name=event_name, variant_id=variant_id,
+            utm_source=utm_source, device_type=device_type, cpa_id=cpa_id,
+        )
+        self.flush_events()
+        conn = self._get_db_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(
+                f"""
+                SELECT bucket, event_name, SUM(event_count) AS cnt
+                FROM lead_magnet_event_rollups
+                WHERE {clause}
+                GROUP BY bucket, event_name
+                ORDER BY bucket, event_name
+                """,
+                params,
+            )
+            rows = cursor.fetchall()
+        finally:
+            conn.close()
+        return [
+            {"bucket": row["bucket"], "event_name": row["event_name"], "count": int(row["cnt"] or 0)}
+            for row in rows
+        ]
+
+    def flush_events(self) -> int:
+        """Write buffered funnel events now. Returns the number persisted."""
+        return self._event_buffer.flush()
+
+    def get_event_ingest_metrics(self) -> Dict[str, Any]:
+        """Funnel event buffer depth and flush counters."""
+        return self._event_buffer.get_metrics()
+
+    def rebuild_event_rollups(self) -> int:
+        """Recompute the funnel rollups from lead_magnet_events. Returns events read."""
+        self.flush_events()
+        conn = self._get_db_connection()
+        try:
+            return rebuild_rollups(conn)
+        finally:
+            conn.close()
+
     def convert_lead(
         self,
         lead_id: str,
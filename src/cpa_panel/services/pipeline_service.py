@@ -12,9 +12,13 @@ from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta, timezone
 from collections import defaultdict
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
+# Leads returned per Kanban column; the rest are paged in with the column cursor
+PIPELINE_COLUMN_PAGE_SIZE = int(os.environ.get("PIPELINE_COLUMN_PAGE_SIZE", "50"))
+
 
 @dataclass
 class PipelineStage:
@@ -73,11 +77,18 @@ class LeadPipelineService:
             self._engine = get_lead_state_engine()
         return self._engine
 
-    def get_pipeline_by_state(self, tenant_id: Optional[str] = None) -> Dict[str, Any]:
+    def get_pipeline_by_state(
+        self,
+        tenant_id: Optional[str] = None,
+        limit: int = PIPELINE_COLUMN_PAGE_SIZE,
+    ) -> Dict[str, Any]:
         """
         Get leads organized by pipeline state.
 
-        Returns Kanban-style view of leads in each state.
+        Returns Kanban-style view of leads in each state. Each column holds
+        its first `limit` leads plus a `next_cursor` for
+        get_pipeline_column(); counts and values cover every lead and come
+        from the engine's per-state totals.
         """
         from cpa_panel.lead_state import LeadState
         from cpa_panel.lead_state.states import STATE_VISIBILITY
@@ -85,16 +96,12 @@ class LeadPipelineService:
         pipeline = {}
         total_leads = 0
         total_value = 0
+        totals = self.engine.get_state_totals(tenant_id)
 
         for state in LeadState:
-            leads = self.engine.get_leads_by_state(state, tenant_id)
-            lead_dicts = [l.to_dict() for l in leads]
-
-            # Calculate estimated value for each lead
-            for lead_dict in lead_dicts:
-                lead_dict['estimated_value'] = self._estimate_lead_value(lead_dict)
-
-            state_value = sum(l['estimated_value'] for l in lead_dicts)
+            leads, next_cursor = self.engine.get_state_page(state, tenant_id, limit=limit)
+            count = totals[state.name]["count"]
+            state_value = totals[state.name]["total_value"]
 
             pipeline[state.name] = {
                 "state": state.name,
@@ -102,12 +109,13 @@ class LeadPipelineService:
                 "visibility": STATE_VISIBILITY[state].value,
                 "is_monetizable": state.is_monetizable,
                 "is_priority": state.is_priority,
-                "leads": lead_dicts,
-                "count": len(leads),
+                "leads": self._column_dicts(leads),
+                "count": count,
                 "total_value": state_value,
+                "next_cursor": next_cursor,
             }
 
-            total_leads += len(leads)
+            total_leads += count
             total_value += state_value
 
         return {
@@ -121,6 +129,40 @@ class LeadPipelineService:
             "timestamp": datetime.now(timezone.utc).isoformat(),
         }
 
+    def get_pipeline_column(
+        self,
+        state: str,
+        tenant_id: Optional[str] = None,
+        limit: int = PIPELINE_COLUMN_PAGE_SIZE,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Get the next page of one Kanban column."""
+        from cpa_panel.lead_state import LeadState
+
+        try:
+            target = LeadState[state.upper()]
+        except KeyError:
+            return {"success": False, "error": f"Invalid state: {state}"}
+
+        try:
+            leads, next_cursor = self.engine.get_state_page(target, tenant_id, limit=limit, cursor=cursor)
+        except ValueError as e:
+            return {"success": False, "error": str(e)}
+
+        return {
+            "success": True,
+            "state": target.name,
+            "leads": self._column_dicts(leads),
+            "next_cursor": next_cursor,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        }
+
+    def _column_dicts(self, leads) -> List[Dict[str, Any]]:
+        lead_dicts = [l.to_dict() for l in leads]
+        for lead_dict in lead_dicts:
+            lead_dict['estimated_value'] = self._estimate_lead_value(lead_dict)
+        return lead_dicts
+
     def get_conversion_metrics(self, tenant_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Get lead conversion metrics.
@@ -290,7 +332,12 @@ class LeadPipelineService:
             "timestamp": datetime.now(timezone.utc).isoformat(),
         }
 
-    def get_priority_queue(self, tenant_id: Optional[str] = None, limit: int = 20) -> Dict[str, Any]:
+    def get_priority_queue(
+        self,
+        tenant_id: Optional[str] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
         """
         Get prioritized lead queue for CPA action.
 
@@ -299,29 +346,30 @@ class LeadPipelineService:
         - Engagement level (signal count)
         - Time in current state
         - Estimated value
-        """
-        from cpa_panel.lead_state import LeadState
 
-        # Get monetizable leads (ADVISORY_READY and above)
-        monetizable = self.engine.get_monetizable_leads(tenant_id)
+        Served from the engine's priority index: only the requested page
+        is scored and serialized. Pass `next_cursor` back as `cursor` for
+        the following page.
+        """
+        # Monetizable leads (ADVISORY_READY and above), best first
+        try:
+            page, next_cursor, total = self.engine.get_priority_page(tenant_id, limit=limit, cursor=cursor)
+        except ValueError as e:
+            return {"success": False, "error": str(e)}
 
-        # Score and rank leads
         scored_leads = []
-        for lead in monetizable:
-            score = self._calculate_priority_score(lead)
+        for score, lead in page:
             lead_dict = lead.to_dict()
             lead_dict['priority_score'] = score
             lead_dict['estimated_value'] = self._estimate_lead_value(lead_dict)
             lead_dict['recommended_action'] = self._get_recommended_action(lead)
             scored_leads.append(lead_dict)
 
-        # Sort by priority score
-        scored_leads.sort(key=lambda x: x['priority_score'], reverse=True)
-
         return {
             "success": True,
-            "priority_queue": scored_leads[:limit],
-            "total_monetizable": len(scored_leads),
+            "priority_queue": scored_leads,
+            "total_monetizable": total,
+            "next_cursor": next_cursor,
             "timestamp": datetime.now(timezone.utc).isoformat(),
         }
 
@@ -417,54 +465,24 @@ class LeadPipelineService:
         return {"dates": dates, "new_leads": new_leads, "conversions": conversions}
 
     def _calculate_priority_score(self, lead) -> float:
-        """Calculate priority score for a lead."""
-        from cpa_panel.lead_state import LeadState
-
-        score = 0
-
-        # State-based scoring (0-50 points)
-        state_scores = {
-            LeadState.BROWSING: 0,
-            LeadState.CURIOUS: 10,
-            LeadState.EVALUATING: 25,
-            LeadState.ADVISORY_READY: 40,
-            LeadState.HIGH_LEVERAGE: 50,
-        }
-        score += state_scores.get(lead.current_state, 0)
-
-        # Signal count (0-20 points)
-        signal_count = len(lead.signals_received)
-        score += min(signal_count * 2, 20)
-
-        # Recency bonus (0-15 points)
-        if lead.transitions:
-            last_activity = lead.transitions[-1].timestamp
-            days_since = (datetime.now(timezone.utc) - last_activity).days
-            if days_since == 0:
-                score += 15
-            elif days_since <= 3:
-                score += 10
-            elif days_since <= 7:
-                score += 5
+        """
+        Calculate priority score for a lead.
 
-        # Engagement strength (0-15 points)
-        high_value_signals = [s for s in lead.signals_received if "tax_savings" in s or "schedule" in s]
-        score += min(len(high_value_signals) * 3, 15)
+        State (0-50) + signal count (0-20) + engagement strength (0-15)
+        + recency bonus (0-15). Scoring lives with the priority index so
+        the queue and this method always agree.
+        """
+        from cpa_panel.lead_state.priority_index import base_priority_score, last_activity, recency_bonus
 
-        return score
+        return base_priority_score(lead) + recency_bonus(last_activity(lead))
 
     def _estimate_lead_value(self, lead_dict: Dict[str, Any]) -> float:
         """Estimate the dollar value of a lead."""
+        from cpa_panel.lead_state.priority_index import STATE_VALUES
+
         # Base value by state
         state = lead_dict.get("current_state", "BROWSING")
-        base_values = {
-            "BROWSING": 0,
-            "CURIOUS": 100,
-            "EVALUATING": 300,
-            "ADVISORY_READY": 600,
-            "HIGH_LEVERAGE": 1200,
-        }
-        return base_values.get(state, 0)
+        return STATE_VALUES.get(state, 0)
 
     def _get_recommended_action(self, lead) -> str:
         """Get recommended action for a lead."""
@@ -0,0 +1,241 @@
+"""
+Task Index
+
+Incrementally maintained secondary indexes over Tasks so the task list
+views don't scan every task across all firms:
+
+- Ordered key lists per (firm, status), (firm, assignee, status),
+  (firm, client, status) and (session, status). Every list is sorted in
+  list-view order: priority (urgent first), due date, then creation
+  order. A query k-way merges the lists for the statuses it wants from
+  the narrowest dimension it filters on; a priority filter is a key
+  range, other filters are applied while streaming.
+- Open tasks with a due date per firm ordered by due date, so overdue
+  tasks are a prefix.
+- Subtasks per parent task.
+
+Pages are addressed with opaque cursors (the key of the last task
+returned), so a page costs O(page size + lists), not O(tasks).
+
+TaskService calls upsert() after every change to a task and remove()
+when a task is deleted.
+"""
+
+import bisect
+import heapq
+import itertools
+import threading
+from dataclasses import dataclass
+from datetime import date
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+from uuid import UUID
+
+from .task_models import Task, TaskPriority, TaskStatus
+from ..lead_state.priority_index import decode_cursor, encode_cursor
+
+# List-view sort order (urgent first)
+PRIORITY_ORDER = {
+    TaskPriority.URGENT: 0,
+    TaskPriority.HIGH: 1,
+    TaskPriority.NORMAL: 2,
+    TaskPriority.LOW: 3,
+}
+
+OPEN_STATUSES = tuple(s for s in TaskStatus if s not in (TaskStatus.COMPLETED, TaskStatus.CANCELLED))
+
+_NO_DUE_DATE = date.max.toordinal()
+
+Key = Tuple[int, int, int]  # (priority rank, due date ordinal, creation seq)
+
+
+@dataclass
+class _Entry:
+    """Where a task currently sits in the index."""
+    task: Task
+    key: Key
+    lists: Tuple[tuple, ...]
+    firm_id: UUID
+    due: Optional[Tuple[int, int]]  # (due date ordinal, seq) while open with a due date
+    parent_id: Optional[UUID]
+
+
+def firm_list(firm_id: UUID, status: TaskStatus) -> tuple:
+    return ("firm", firm_id, status)
+
+
+def assignee_list(firm_id: UUID, assigned_to: Optional[UUID], status: TaskStatus) -> tuple:
+    return ("assignee", firm_id, assigned_to, status)
+
+
+def client_list(firm_id: UUID, client_id: UUID, status: TaskStatus) -> tuple:
+    return ("client", firm_id, client_id, status)
+
+
+def session_list(session_id: str, status: TaskStatus) -> tuple:
+    return ("session", session_id, status)
+
+
+def _discard(items: List, key) -> None:
+    i = bisect.bisect_left(items, key)
+    if i < len(items) and items[i] == key:
+        del items[i]
+
+
+def _iter_range(keys: List[Key], start: int, end: int):
+    for i in range(start, end):
+        yield keys[i]
+
+
+class TaskIndex:
+    """
+    Ordered per-dimension task lists, a due-date index and subtask links.
+
+    Thread-safe; all reads and writes hold one lock.
+    """
+
+    def __init__(self):
+        self._entries: Dict[UUID, _Entry] = {}
+        self._by_seq: Dict[int, Task] = {}
+        self._lists: Dict[tuple, List[Key]] = {}
+        self._due: Dict[UUID, List[Tuple[int, int]]] = {}
+        self._children: Dict[UUID, Set[int]] = {}
+        self._seq = itertools.count()
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _lists_for(task: Task) -> Tuple[tuple, ...]:
+        lists = [
+            firm_list(task.firm_id, task.status),
+            assignee_list(task.firm_id, task.assigned_to, task.status),
+        ]
+        if task.client_id is not None:
+            lists.append(client_list(task.firm_id, task.client_id, task.status))
+        if task.session_id is not None:
+            lists.append(session_list(task.session_id, task.status))
+        return tuple(lists)
+
+    def upsert(self, task: Task) -> None:
+        """Index a task, or re-index it after a change."""
+        with self._lock:
+            old = self._entries.get(task.id)
+            seq = old.key[2] if old is not None else next(self._seq)
+            due_ordinal = task.due_date.toordinal() if task.due_date else _NO_DUE_DATE
+            entry = _Entry(
+                task=task,
+                key=(PRIORITY_ORDER.get(task.priority, 2), due_ordinal, seq),
+                lists=self._lists_for(task),
+                firm_id=task.firm_id,
+                due=(due_ordinal, seq) if task.due_date and task.status in OPEN_STATUSES else None,
+                parent_id=task.parent_task_id,
+            )
+            if old is not None:
+                if (old.key, old.lists, old.firm_id, old.due, old.parent_id) == (
+                    entry.key, entry.lists, entry.firm_id, entry.due, entry.parent_id
+                ):
+                    old.task = task
+                    return
+                self._unlink(old)
+            self._link(entry)
+
+    def remove(self, task_id: UUID) -> None:
+        with self._lock:
+            old = self._entries.get(task_id)
+            if old is not None:
+                self._unlink(old)
+
+    def _link(self, entry: _Entry) -> None:
+        for name in entry.lists:
+            bisect.insort(self._lists.setdefault(name, []), entry.key)
+        if entry.due is not None:
+            bisect.insort(self._due.setdefault(entry.firm_id, []), entry.due)
+        if entry.parent_id is not None:
+            self._children.setdefault(entry.parent_id, set()).add(entry.key[2])
+        self._entries[entry.task.id] = entry
+        self._by_seq[entry.key[2]] = entry.task
+
+    def _unlink(self, entry: _Entry) -> None:
+        for name in entry.lists:
+            keys = self._lists[name]
+            _discard(keys, entry.key)
+            if not keys:
+                del self._lists[name]
+        if entry.due is not None:
+            _discard(self._due[entry.firm_id], entry.due)
+        if entry.parent_id is not None:
+            self._children[entry.parent_id].discard(entry.key[2])
+        del self._entries[entry.task.id]
+        del self._by_seq[entry.key[2]]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # -------------------------------------------------------------------------
+    # Queries
+    # -------------------------------------------------------------------------
+
+    def page(
+        self,
+        lists: Sequence[tuple],
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        predicate: Optional[Callable[[Task], bool]] = None,
+        priority: Optional[TaskPriority] = None,
+    ) -> Tuple[List[Task], Optional[str]]:
+        """
+        Tasks in the given lists, in list-view order.
+
+        Returns:
+            (tasks, next_cursor); next_cursor is None on the last page
+        """
+        after = decode_cursor(cursor)
+        if after is not None:
+            if not isinstance(after, list) or len(after) != 3 or not all(isinstance(part, int) for part in after):
+                raise ValueError("Invalid cursor")
+            after = tuple(after)
+
+        low = (PRIORITY_ORDER.get(priority, 2),) if priority is not None else None
+        high = (low[0] + 1,) if low is not None else None
+
+        with self._lock:
+            streams = []
+            for name in lists:
+                keys = self._lists.get(name)
+                if not keys:
+                    continue
+                start = 0
+                if low is not None:
+                    start = bisect.bisect_left(keys, low)
+                if after is not None:
+                    start = max(start, bisect.bisect_right(keys, after))
+                end = bisect.bisect_left(keys, high) if high is not None else len(keys)
+                if start < end:
+                    streams.append(_iter_range(keys, start, end))
+
+            tasks: List[Task] = []
+            last = None
+            for key in heapq.merge(*streams):
+                task = self._by_seq[key[2]]
+                if predicate is not None and not predicate(task):
+                    continue
+                if limit is not None and len(tasks) == limit:
+                    return tasks, encode_cursor(*last)
+                tasks.append(task)
+                last = key
+            return tasks, None
+
+    def count(self, lists: Sequence[tuple]) -> int:
+        with self._lock:
+            return sum(len(self._lists.get(name, ())) for name in lists)
+
+    def overdue(self, firm_id: UUID, today: Optional[date] = None) -> List[Task]:
+        """Open tasks due before today, most overdue first."""
+        today = today or date.today()
+        with self._lock:
+            due = self._due.get(firm_id, [])
+            end = bisect.bisect_left(due, (today.toordinal(),))
+            return [self._by_seq[seq] for _, seq in due[:end]]
+
+    def subtasks(self, parent_task_id: UUID) -> List[Task]:
+        """Subtasks in creation order."""
+        with self._lock:
+            return [self._by_seq[seq] for seq in sorted(self._children.get(parent_task_id, ()))]
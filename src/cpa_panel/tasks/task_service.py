@@ -2,11 +2,14 @@
 Task Service
 
 Business logic for task management.
+
+List views are served from TaskIndex (see task_index.py), which every
+mutation below keeps current.
 """
 
 import logging
 from datetime import datetime, date, timedelta, timezone
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from uuid import UUID
 from collections import defaultdict
 
@@ -19,6 +22,14 @@ from .task_models import (
     TaskCategory,
     STANDARD_TEMPLATES,
 )
+from .task_index import (
+    OPEN_STATUSES,
+    TaskIndex,
+    assignee_list,
+    client_list,
+    firm_list,
+    session_list,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -40,6 +51,7 @@ class TaskService:
         # In-memory storage (replace with database in production)
         self._tasks: Dict[UUID, Task] = {}
         self._templates: Dict[UUID, TaskTemplate] = {}
+        self._index = TaskIndex()
 
         # Initialize standard templates
         for template in STANDARD_TEMPLATES:
@@ -119,6 +131,7 @@ class TaskService:
                 task.add_checklist_item(item_text)
 
         self._tasks[task.id] = task
+        self._index.upsert(task)
         logger.info(f"Created task: {task.id} - {task.title}")
 
         return task
@@ -148,6 +161,7 @@ class TaskService:
         )
 
         self._tasks[task.id] = task
+        self._index.upsert(task)
         logger.info(f"Created task from template: {task.id} - {task.title}")
 
         return task
@@ -188,6 +202,7 @@ class TaskService:
             task.tags = tags
 
         task.updated_at = datetime.now(timezone.utc)
+        self._index.upsert(task)
         logger.info(f"Updated task: {task_id}")
 
         return task
@@ -196,6 +211,7 @@ class TaskService:
         """Delete a task."""
         if task_id in self._tasks:
             del self._tasks[task_id]
+            self._index.remove(task_id)
             logger.info(f"Deleted task: {task_id}")
             return True
         return False
@@ -218,6 +234,7 @@ class TaskService:
         task.assigned_to = assigned_to
         task.assigned_to_name = assigned_to_name
         task.updated_at = datetime.now(timezone.utc)
+        self._index.upsert(task)
 
         logger.info(f"Assigned task {task_id} to {assigned_to}")
         return task
@@ -231,6 +248,7 @@ class TaskService:
         task.assigned_to = None
         task.assigned_to_name = None
         task.updated_at = datetime.now(timezone.utc)
+        self._index.upsert(task)
 
         logger.info(f"Unassigned task {task_id}")
         return task
@@ -254,6 +272,7 @@ class TaskService:
         task.assigned_to = new_assignee
         task.assigned_to_name = new_assignee_name
         task.updated_at = datetime.now(timezone.utc)
+        self._index.upsert(task)
 
         # Add a comment about the reassignment
         if add_comment:
@@ -292,6 +311,7 @@ class TaskService:
         elif new_status == TaskStatus.COMPLETED:
             task.completed_at = datetime.now(timezone.utc)
             task.completed_by = updated_by
+        self._index.upsert(task)
 
         logger.info(f"Task {task_id} status: {old_status.value} -> {new_status.value}")
         return task
@@ -318,6 +338,7 @@ class TaskService:
 
         task.status = TaskStatus.BLOCKED
         task.updated_at = datetime.now(timezone.utc)
+        self._index.upsert(task)
 
         # Add comment about block
         task.add_comment(
@@ -343,6 +364,7 @@ class TaskService:
 
         task.status = TaskStatus.IN_PROGRESS
         task.updated_at = datetime.now(timezone.utc)
+        self._index.upsert(task)
 
         task.add_comment(
             content="Task unblocked",
@@ -444,47 +466,74 @@ class TaskService:
         include_completed: bool = False,
         tags: Optional[List[str]] = None,
     ) -> List[Task]:
-        """Get tasks for a firm with optional filters."""
-        tasks = []
+        """Get tasks for a firm with optional filters, urgent first then by due date."""
+        tasks, _ = self.get_tasks_page(
+            firm_id=firm_id,
+            status=status,
+            category=category,
+            priority=priority,
+            assigned_to=assigned_to,
+            client_id=client_id,
+            session_id=session_id,
+            include_completed=include_completed,
+            tags=tags,
+            limit=None,
+        )
+        return tasks
 
-        for task in self._tasks.values():
-            if task.firm_id != firm_id:
-                continue
+    def get_tasks_page(
+        self,
+        firm_id: UUID,
+        status: Optional[TaskStatus] = None,
+        category: Optional[TaskCategory] = None,
+        priority: Optional[TaskPriority] = None,
+        assigned_to: Optional[UUID] = None,
+        client_id: Optional[UUID] = None,
+        session_id: Optional[str] = None,
+        include_completed: bool = False,
+        tags: Optional[List[str]] = None,
+        limit: Optional[int] = 50,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Task], Optional[str]]:
+        """
+        One page of get_tasks_for_firm().
 
-            # Apply filters
-            if status and task.status != status:
-                continue
-            if category and task.category != category:
-                continue
-            if priority and task.priority != priority:
-                continue
-            if assigned_to and task.assigned_to != assigned_to:
-                continue
-            if client_id and task.client_id != client_id:
-                continue
-            if session_id and task.session_id != session_id:
-                continue
-            if not include_completed and task.status == TaskStatus.COMPLETED:
-                continue
-            if tags:
-                if not any(tag in task.tags for tag in tags):
-                    continue
-
-            tasks.append(task)
-
-        # Sort by priority (urgent first) then due date
-        priority_order = {
-            TaskPriority.URGENT: 0,
-            TaskPriority.HIGH: 1,
-            TaskPriority.NORMAL: 2,
-            TaskPriority.LOW: 3,
-        }
-        tasks.sort(key=lambda t: (
-            priority_order.get(t.priority, 2),
-            t.due_date or date.max,
-        ))
+        Pass the returned next_cursor back as `cursor` for the following
+        page; it is None on the last page. Invalid cursors raise ValueError.
 
-        return tasks
+        Returns:
+            (tasks, next_cursor)
+        """
+        statuses = [status] if status else list(TaskStatus)
+        if not include_completed:
+            statuses = [s for s in statuses if s != TaskStatus.COMPLETED]
+
+        # Stream from the narrowest index the filters allow
+        checks = []
+        if assigned_to:
+            lists = [assignee_list(firm_id, assigned_to, s) for s in statuses]
+        elif client_id:
+            lists = [client_list(firm_id, client_id, s) for s in statuses]
+        elif session_id:
+            lists = [session_list(session_id, s) for s in statuses]
+            checks.append(lambda t: t.firm_id == firm_id)
+        else:
+            lists = [firm_list(firm_id, s) for s in statuses]
+
+        if category:
+            checks.append(lambda t: t.category == category)
+        if assigned_to and client_id:
+            checks.append(lambda t: t.client_id == client_id)
+        if session_id and (assigned_to or client_id):
+            checks.append(lambda t: t.session_id == session_id)
+        if tags:
+            checks.append(lambda t: any(tag in t.tags for tag in tags))
+
+        predicate = None
+        if checks:
+            predicate = lambda t: all(check(t) for check in checks)
+
+        return self._index.page(lists, limit=limit, cursor=cursor, predicate=predicate, priority=priority)
 
     def get_my_tasks(
         self,
@@ -500,19 +549,13 @@ class TaskService:
         )
 
     def get_unassigned_tasks(self, firm_id: UUID) -> List[Task]:
-        """Get tasks without assignment."""
-        return [
-            t for t in self._tasks.values()
-            if t.firm_id == firm_id and t.assigned_to is None
-            and t.status not in [TaskStatus.COMPLETED, TaskStatus.CANCELLED]
-        ]
+        """Get open tasks without assignment."""
+        tasks, _ = self._index.page([assignee_list(firm_id, None, s) for s in OPEN_STATUSES])
+        return tasks
 
     def get_overdue_tasks(self, firm_id: UUID) -> List[Task]:
-        """Get all overdue tasks."""
-        return [
-            t for t in self._tasks.values()
-            if t.firm_id == firm_id and t.is_overdue
-        ]
+        """Get all overdue tasks, most overdue first."""
+        return self._index.overdue(firm_id)
 
     def get_tasks_for_client(
         self,
@@ -533,18 +576,13 @@ class TaskService:
         include_completed: bool = False,
     ) -> List[Task]:
         """Get all tasks for a tax return session."""
-        return [
-            t for t in self._tasks.values()
-            if t.session_id == session_id
-            and (include_completed or t.status != TaskStatus.COMPLETED)
-        ]
+        statuses = [s for s in TaskStatus if include_completed or s != TaskStatus.COMPLETED]
+        tasks, _ = self._index.page([session_list(session_id, s) for s in statuses])
+        return tasks
 
     def get_subtasks(self, parent_task_id: UUID) -> List[Task]:
         """Get subtasks of a parent task."""
-        return [
-            t for t in self._tasks.values()
-            if t.parent_task_id == parent_task_id
-        ]
+        return self._index.subtasks(parent_task_id)
 
     # =========================================================================
     # TEMPLATES
@@ -686,20 +724,16 @@ class TaskService:
 
     def get_kanban_view(self, firm_id: UUID) -> Dict[str, List[Dict[str, Any]]]:
         """Get tasks organized for kanban board display."""
-        all_tasks = self.get_tasks_for_firm(firm_id, include_completed=True)
-
-        kanban = {
-            "todo": [],
-            "in_progress": [],
-            "in_review": [],
-            "blocked": [],
-            "completed": [],
-        }
-
-        for task in all_tasks:
-            if task.status == TaskStatus.CANCELLED:
-                continue
-            kanban[task.status.value].append(task.to_dict())
+        kanban = {}
+        for status in [
+            TaskStatus.TODO,
+            TaskStatus.IN_PROGRESS,
+            TaskStatus.IN_REVIEW,
+            TaskStatus.BLOCKED,
+            TaskStatus.COMPLETED,
+        ]:
+            tasks, _ = self._index.page([firm_list(firm_id, status)])
+            kanban[status.value] = [task.to_dict() for task in tasks]
 
         return kanban
 
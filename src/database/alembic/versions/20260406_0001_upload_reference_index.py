@@ -0,0 +1,50 @@
+"""Add upload reference index for orphaned upload cleanup.
+
+Revision ID: 20260406_0001
+Revises: 20260405_0002
+Create Date: 2026-04-06
+
+Maps every stored upload file to the document/session that owns it, so the
+nightly orphaned-upload cleanup is a set difference between the upload
+directory listing and this table instead of LIKE scans per file.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20260406_0001"
+down_revision = "20260405_0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create upload_references and upload_reference_meta tables."""
+    op.create_table(
+        'upload_references',
+        sa.Column('file_path', sa.Text, primary_key=True),
+        sa.Column('owner_type', sa.Text, nullable=False),
+        sa.Column('document_id', sa.Text, nullable=True),
+        sa.Column('session_id', sa.Text, nullable=True),
+        sa.Column('tenant_id', sa.Text, nullable=False, server_default='default'),
+        sa.Column('created_at', sa.Text, nullable=False),
+        if_not_exists=True,
+    )
+    op.create_index('idx_upload_ref_session', 'upload_references', ['session_id'], if_not_exists=True)
+    op.create_index('idx_upload_ref_document', 'upload_references', ['document_id'], if_not_exists=True)
+
+    op.create_table(
+        'upload_reference_meta',
+        sa.Column('key', sa.Text, primary_key=True),
+        sa.Column('value', sa.Text, nullable=False),
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Drop upload reference tables."""
+    op.drop_index('idx_upload_ref_document', table_name='upload_references')
+    op.drop_index('idx_upload_ref_session', table_name='upload_references')
+    op.drop_table('upload_reference_meta')
+    op.drop_table('upload_references')
@@ -0,0 +1,46 @@
+"""Add firm-scoped keyset indexes for streaming CSV exports.
+
+Revision ID: 20260410_0001
+Revises: 20260406_0001
+Create Date: 2026-04-10
+
+CPA exports page through clients, leads and audit logs with
+WHERE firm_id = :firm_id AND key > :last ORDER BY key LIMIT n. These
+composite indexes make every page an index range scan.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20260410_0001"
+down_revision = "20260406_0001"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_client_firm_keyset", "clients", ["firm_id", "client_id"]),
+    ("ix_lm_leads_firm_keyset", "lead_magnet_leads", ["firm_id", "id"]),
+    ("ix_audit_firm_keyset", "audit_logs", ["firm_id", "timestamp", "log_id"]),
+]
+
+
+def _has_columns(inspector, table_name: str, columns) -> bool:
+    if table_name not in inspector.get_table_names():
+        return False
+    existing = {column["name"] for column in inspector.get_columns(table_name)}
+    return set(columns) <= existing
+
+
+def upgrade() -> None:
+    """Create the keyset indexes where the tables exist."""
+    inspector = sa.inspect(op.get_bind())
+    for name, table_name, columns in INDEXES:
+        if _has_columns(inspector, table_name, columns):
+            op.create_index(name, table_name, columns, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Drop the keyset indexes."""
+    for name, table_name, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table_name, if_exists=True)
@@ -0,0 +1,87 @@
+"""Add hourly/daily rollups for lead magnet funnel events.
+
+Revision ID: 20260418_0001
+Revises: 20260410_0001
+Create Date: 2026-04-18
+
+LeadMagnetService writes funnel events in batches and upserts per-hour
+and per-day counts for each (cpa_id, event_name, step, variant_id,
+utm_source, device_type) in the same transaction. Funnel KPIs read these
+rollups instead of scanning lead_magnet_events. Existing events are
+backfilled here.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20260418_0001"
+down_revision = "20260410_0001"
+branch_labels = None
+depends_on = None
+
+TABLE = "lead_magnet_event_rollups"
+DIMENSIONS = ["cpa_id", "event_name", "step", "variant_id", "utm_source", "device_type"]
+
+SCORE_INTERACTION = (
+    "CASE WHEN event_name = 'step_complete' AND (step = 'score_interaction' "
+    "OR lower(COALESCE(metadata_json, '')) LIKE '%subscore_click%') THEN 1 ELSE 0 END"
+)
+
+
+def _bucket_expressions(dialect: str):
+    if dialect == "postgresql":
+        return {
+            "hour": "to_char(created_at, 'YYYY-MM-DD\"T\"HH24')",
+            "day": "to_char(created_at, 'YYYY-MM-DD')",
+        }
+    return {
+        "hour": "strftime('%Y-%m-%dT%H', created_at)",
+        "day": "strftime('%Y-%m-%d', created_at)",
+    }
+
+
+def upgrade() -> None:
+    """Create the rollup table and backfill it from lead_magnet_events."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    created = TABLE not in inspector.get_table_names()
+    if created:
+        op.create_table(
+            TABLE,
+            sa.Column("granularity", sa.String(8), nullable=False),
+            sa.Column("bucket", sa.String(16), nullable=False),
+            *[
+                sa.Column(name, sa.String(255), nullable=False, server_default=sa.text("''"))
+                for name in DIMENSIONS
+            ],
+            sa.Column("event_count", sa.BigInteger(), nullable=False, server_default=sa.text("0")),
+            sa.Column("score_interactions", sa.BigInteger(), nullable=False, server_default=sa.text("0")),
+            sa.PrimaryKeyConstraint("granularity", "bucket", *DIMENSIONS, name="pk_lead_magnet_event_rollups"),
+        )
+    op.create_index(
+        "idx_lead_magnet_rollups_cpa", TABLE, ["cpa_id", "granularity", "bucket"], if_not_exists=True
+    )
+
+    # Backfill only a table created here; an existing one is already maintained
+    if not created or "lead_magnet_events" not in inspector.get_table_names():
+        return
+
+    dimensions = ", ".join(f"COALESCE({name}, '')" for name in DIMENSIONS)
+    for granularity, bucket in _bucket_expressions(bind.dialect.name).items():
+        op.execute(
+            f"""
+            INSERT INTO {TABLE} (granularity, bucket, {', '.join(DIMENSIONS)}, event_count, score_interactions)
+            SELECT '{granularity}', {bucket}, {dimensions}, COUNT(*), SUM({SCORE_INTERACTION})
+            FROM lead_magnet_events
+            WHERE created_at IS NOT NULL
+            GROUP BY {bucket}, {dimensions}
+            """
+        )
+
+
+def downgrade() -> None:
+    """Drop the rollup table."""
+    op.drop_index("idx_lead_magnet_rollups_cpa", table_name=TABLE, if_exists=True)
+    op.drop_table(TABLE)
@@ -0,0 +1,98 @@
+"""Add snapshot tables for the superadmin platform metrics.
+
+Revision ID: 20260420_0001
+Revises: 20260418_0001
+Create Date: 2026-04-20
+
+The superadmin dashboard, MRR and churn endpoints read daily firm/user
+counts, MRR by tier and churn cohorts from these tables instead of
+aggregating firms, users and subscriptions per request. Firm and
+subscription changes are queued in platform_metric_events and applied as
+deltas against platform_metric_contributions. The tables are filled by
+the first refresh (tasks.platform_metrics or the first dashboard read).
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20260420_0001"
+down_revision = "20260418_0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create the snapshot, contribution and event tables."""
+    tables = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "platform_daily_metrics" not in tables:
+        op.create_table(
+            "platform_daily_metrics",
+            sa.Column("day", sa.String(10), primary_key=True),
+            sa.Column("total_firms", sa.Integer(), nullable=False, server_default=sa.text("0")),
+            sa.Column("active_firms", sa.Integer(), nullable=False, server_default=sa.text("0")),
+            sa.Column("trial_firms", sa.Integer(), nullable=False, server_default=sa.text("0")),
+            sa.Column("total_users", sa.Integer(), nullable=False, server_default=sa.text("0")),
+            sa.Column("users_active_7d", sa.Integer(), nullable=False, server_default=sa.text("0")),
+            sa.Column("users_active_30d", sa.Integer(), nullable=False, server_default=sa.text("0")),
+            sa.Column("refreshed_at", sa.DateTime(), nullable=True),
+        )
+
+    if "platform_mrr_by_tier" not in tables:
+        op.create_table(
+            "platform_mrr_by_tier",
+            sa.Column("day", sa.String(10), primary_key=True),
+            sa.Column("tier", sa.String(50), primary_key=True),
+            sa.Column("subscriptions", sa.Integer(), nullable=False, server_default=sa.text("0")),
+            sa.Column("trials", sa.Integer(), nullable=False, server_default=sa.text("0")),
+            sa.Column("mrr", sa.Numeric(14, 2), nullable=False, server_default=sa.text("0")),
+        )
+
+    if "platform_churn_cohorts" not in tables:
+        op.create_table(
+            "platform_churn_cohorts",
+            sa.Column("cohort_month", sa.String(7), primary_key=True),
+            sa.Column("tier", sa.String(50), primary_key=True),
+            sa.Column("day", sa.String(10), primary_key=True),
+            sa.Column("started", sa.Integer(), nullable=False, server_default=sa.text("0")),
+            sa.Column("cancelled", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        )
+    op.create_index(
+        "ix_platform_churn_cohorts_day", "platform_churn_cohorts", ["day"], if_not_exists=True
+    )
+
+    if "platform_metric_contributions" not in tables:
+        op.create_table(
+            "platform_metric_contributions",
+            sa.Column("entity_type", sa.String(20), primary_key=True),
+            sa.Column("entity_id", sa.String(36), primary_key=True),
+            sa.Column("firm_id", sa.String(36), nullable=False),
+            sa.Column("tier", sa.String(50), nullable=False, server_default=sa.text("''")),
+            sa.Column("status", sa.String(20), nullable=False),
+            sa.Column("monthly_amount", sa.Numeric(12, 2), nullable=False, server_default=sa.text("0")),
+            sa.Column("cohort_month", sa.String(7), nullable=False, server_default=sa.text("''")),
+        )
+    op.create_index(
+        "ix_platform_metric_contributions_firm", "platform_metric_contributions", ["firm_id"],
+        if_not_exists=True,
+    )
+
+    if "platform_metric_events" not in tables:
+        op.create_table(
+            "platform_metric_events",
+            sa.Column("event_id", sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column("firm_id", sa.String(36), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+        )
+
+
+def downgrade() -> None:
+    """Drop the platform metric tables."""
+    op.drop_table("platform_metric_events")
+    op.drop_index("ix_platform_metric_contributions_firm", table_name="platform_metric_contributions", if_exists=True)
+    op.drop_table("platform_metric_contributions")
+    op.drop_index("ix_platform_churn_cohorts_day", table_name="platform_churn_cohorts", if_exists=True)
+    op.drop_table("platform_churn_cohorts")
+    op.drop_table("platform_mrr_by_tier")
+    op.drop_table("platform_daily_metrics")
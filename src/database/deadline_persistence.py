@@ -0,0 +1,259 @@
+"""
+Deadline Persistence Layer.
+
+Durable storage for the CPA panel deadline service, so deadlines created
+in a web worker are visible to the Celery reminder job and survive
+restarts.
+
+Tables:
+- cpa_deadlines: One row per deadline, stored as JSON (Deadline.to_dict)
+- cpa_deadline_reminders_sent: Reminders that have been delivered. Kept
+  apart from the deadline row so a web worker saving a deadline with a
+  stale copy of its reminders never un-sends one.
+- cpa_deadline_reminder_schedule: One row per scheduled reminder with its
+  fire date and a sent flag, indexed so the reminder job reads only the
+  deadlines that have a due, unsent reminder.
+"""
+
+import json
+import sqlite3
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Use same database path as main persistence
+DEFAULT_DB_PATH = Path(__file__).parent.parent.parent / "data" / "tax_returns.db"
+
+_SCHEDULE_BACKFILL_META_KEY = "reminder_schedule_backfilled_at"
+
+# Deadlines with at least one unsent reminder due on or before the bound date
+_DUE_DEADLINE_IDS = """
+    SELECT DISTINCT deadline_id FROM cpa_deadline_reminder_schedule
+    WHERE sent = 0 AND fire_date <= ?
+"""
+
+
+class DeadlinePersistence:
+    """
+    SQLite storage for deadlines and delivered reminders.
+
+    Deadline payloads are opaque JSON here; conversion lives in
+    cpa_panel.deadlines.deadline_models.
+    """
+
+    def __init__(self, db_path: Optional[Path] = None):
+        """
+        Initialize deadline persistence.
+
+        Args:
+            db_path: Path to SQLite database file.
+        """
+        self.db_path = Path(db_path) if db_path else DEFAULT_DB_PATH
+        self._tables_ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._tables_ready:
+            self._ensure_tables_exist()
+        return sqlite3.connect(self.db_path)
+
+    def _ensure_tables_exist(self):
+        """Create tables if they don't exist."""
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS cpa_deadlines (
+                    deadline_id TEXT PRIMARY KEY,
+                    firm_id TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_cpa_deadlines_firm
+                ON cpa_deadlines(firm_id)
+            """)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS cpa_deadline_reminders_sent (
+                    reminder_id TEXT PRIMARY KEY,
+                    deadline_id TEXT NOT NULL,
+                    sent_at TEXT NOT NULL
+                )
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_cpa_reminders_sent_deadline
+                ON cpa_deadline_reminders_sent(deadline_id)
+            """)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS cpa_deadline_reminder_schedule (
+                    reminder_id TEXT PRIMARY KEY,
+                    deadline_id TEXT NOT NULL,
+                    firm_id TEXT NOT NULL,
+                    fire_date TEXT NOT NULL,
+                    sent INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_cpa_reminder_schedule_due
+                ON cpa_deadline_reminder_schedule(sent, fire_date)
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_cpa_reminder_schedule_deadline
+                ON cpa_deadline_reminder_schedule(deadline_id)
+            """)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS cpa_deadline_meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                )
+            """)
+            conn.commit()
+        self._tables_ready = True
+
+    def save_deadline(
+        self,
+        deadline_id: str,
+        firm_id: str,
+        data: Dict[str, Any],
+        reminders: Optional[Iterable[Tuple[str, date]]] = None,
+    ) -> None:
+        """
+        Insert or replace one deadline.
+
+        Args:
+            reminders: (reminder id, fire date) of the deadline's unsent
+                reminders. Replaces its unsent schedule rows; reminders
+                already marked sent stay sent.
+        """
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cpa_deadlines (deadline_id, firm_id, data, updated_at) "
+                "VALUES (?, ?, ?, ?)",
+                (deadline_id, firm_id, json.dumps(data), datetime.now(timezone.utc).isoformat()),
+            )
+            if reminders is not None:
+                self._write_schedule(conn, deadline_id, firm_id, reminders)
+
+    def _write_schedule(
+        self,
+        conn: sqlite3.Connection,
+        deadline_id: str,
+        firm_id: str,
+        reminders: Iterable[Tuple[str, date]],
+    ) -> None:
+        conn.execute(
+            "DELETE FROM cpa_deadline_reminder_schedule WHERE deadline_id = ? AND sent = 0",
+            (deadline_id,),
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO cpa_deadline_reminder_schedule "
+            "(reminder_id, deadline_id, firm_id, fire_date) VALUES (?, ?, ?, ?)",
+            [(reminder_id, deadline_id, firm_id, fire_date.isoformat()) for reminder_id, fire_date in reminders],
+        )
+
+    def delete_deadline(self, deadline_id: str) -> None:
+        """Delete a deadline, its reminder schedule and delivered-reminder records."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM cpa_deadlines WHERE deadline_id = ?", (deadline_id,))
+            conn.execute("DELETE FROM cpa_deadline_reminder_schedule WHERE deadline_id = ?", (deadline_id,))
+            conn.execute("DELETE FROM cpa_deadline_reminders_sent WHERE deadline_id = ?", (deadline_id,))
+
+    def mark_reminder_sent(self, deadline_id: str, reminder_id: str, sent_at: datetime) -> None:
+        """Record a delivered reminder; the first delivery time wins."""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO cpa_deadline_reminders_sent (reminder_id, deadline_id, sent_at) "
+                "VALUES (?, ?, ?)",
+                (reminder_id, deadline_id, sent_at.isoformat()),
+            )
+            conn.execute(
+                "UPDATE cpa_deadline_reminder_schedule SET sent = 1 WHERE reminder_id = ?",
+                (reminder_id,),
+            )
+
+    def load_deadlines(self) -> List[Dict[str, Any]]:
+        """
+        All deadlines, with delivered reminders marked sent.
+
+        Returns:
+            Deadline dicts as saved, reminders patched with is_sent/sent_at
+        """
+        with self._connect() as conn:
+            rows = conn.execute("SELECT data FROM cpa_deadlines").fetchall()
+            sent = dict(conn.execute(
+                "SELECT reminder_id, sent_at FROM cpa_deadline_reminders_sent"
+            ).fetchall())
+        return _with_sent_reminders(rows, sent)
+
+    def load_due_deadlines(self, today: date) -> List[Dict[str, Any]]:
+        """
+        Deadlines with an unsent reminder due on or before `today`.
+
+        Reads through the reminder schedule index, so the cost follows the
+        number of due reminders rather than the number of deadlines.
+        """
+        bound = today.isoformat()
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT data FROM cpa_deadlines WHERE deadline_id IN ({_DUE_DEADLINE_IDS})",
+                (bound,),
+            ).fetchall()
+            sent = dict(conn.execute(
+                "SELECT reminder_id, sent_at FROM cpa_deadline_reminders_sent "
+                f"WHERE deadline_id IN ({_DUE_DEADLINE_IDS})",
+                (bound,),
+            ).fetchall())
+        return _with_sent_reminders(rows, sent)
+
+    # =========================================================================
+    # SCHEDULE BACKFILL (deadlines saved before the schedule table existed)
+    # =========================================================================
+
+    def is_schedule_backfilled(self) -> bool:
+        """Whether every stored deadline has its reminders in the schedule."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value FROM cpa_deadline_meta WHERE key = ?",
+                (_SCHEDULE_BACKFILL_META_KEY,),
+            ).fetchone()
+            return row is not None
+
+    def backfill_schedule(self, schedules: Iterable[Tuple[str, str, Iterable[Tuple[str, date]]]]) -> None:
+        """Write (deadline id, firm id, unsent reminders) schedules and record the backfill."""
+        with self._connect() as conn:
+            for deadline_id, firm_id, reminders in schedules:
+                self._write_schedule(conn, deadline_id, firm_id, reminders)
+            conn.execute(
+                "INSERT OR REPLACE INTO cpa_deadline_meta (key, value) VALUES (?, ?)",
+                (_SCHEDULE_BACKFILL_META_KEY, datetime.now(timezone.utc).isoformat()),
+            )
+
+
+def _with_sent_reminders(rows: List[Tuple[str]], sent: Dict[str, str]) -> List[Dict[str, Any]]:
+    """Decode deadline rows and mark their delivered reminders sent."""
+    deadlines = []
+    for (data,) in rows:
+        deadline = json.loads(data)
+        for reminder in deadline.get("reminders", []):
+            sent_at = sent.get(reminder.get("id"))
+            if sent_at is not None:
+                reminder["is_sent"] = True
+                reminder["sent_at"] = sent_at
+        deadlines.append(deadline)
+    return deadlines
+
+
+# Global instance
+_deadline_persistence: Optional[DeadlinePersistence] = None
+
+
+def get_deadline_persistence() -> DeadlinePersistence:
+    """Get the global deadline persistence instance."""
+    global _deadline_persistence
+    if _deadline_persistence is None:
+        _deadline_persistence = DeadlinePersistence()
+    return _deadline_persistence
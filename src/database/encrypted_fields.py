@@ -17,15 +17,24 @@ Usage:
 
     # Decrypt when reading
     decrypted_email = decrypt_pii(encrypted_email, field_type="email")
+
+    # List screens and exports: one call per column
+    emails = decrypt_many(encrypted_emails, field_type="email")
+
+Key rotation:
+    After changing ENCRYPTION_MASTER_KEY in a running process, call
+    clear_encryption_key_cache() so the master key and the derived
+    per-field ciphers are rebuilt.
 """
 
+import asyncio
 import os
 import base64
 import hashlib
 import logging
 import pathlib
 import secrets
-from typing import Optional, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 from functools import lru_cache
 
 logger = logging.getLogger(__name__)
@@ -34,6 +43,9 @@ logger = logging.getLogger(__name__)
 _ENVIRONMENT = os.environ.get("APP_ENVIRONMENT", "development")
 _IS_PRODUCTION = _ENVIRONMENT in ("production", "prod", "staging")
 
+# Batches at least this large are decrypted off the event loop by the async helpers
+PII_OFFLOAD_THRESHOLD = int(os.environ.get("PII_OFFLOAD_THRESHOLD", "256"))
+
 
 # =============================================================================
 # KEY MANAGEMENT
@@ -121,6 +133,43 @@ def _derive_field_key(master_key: bytes, field_type: str) -> bytes:
     return hashlib.sha256(master_key + context).digest()
 
 
+# (ENCRYPTION_VERSION, field context) -> (master key it was derived from, AESGCM)
+_cipher_cache: Dict[Tuple[int, str], Tuple[bytes, Any]] = {}
+
+
+def _get_cipher(field_type: str) -> Any:
+    """
+    Get the AESGCM cipher for a field type, deriving it once per master key.
+
+    Entries remember the master key object they were built from; once
+    get_encryption_key() returns a different key (after its cache is
+    cleared for rotation), the cipher is rebuilt.
+
+    Raises:
+        ImportError: If the cryptography package is not installed
+        EncryptionKeyError: If encryption key is not configured
+    """
+    master_key = get_encryption_key()
+    context = field_type if field_type in FIELD_CONTEXTS else "generic"
+    cache_key = (ENCRYPTION_VERSION, context)
+
+    entry = _cipher_cache.get(cache_key)
+    if entry is not None and entry[0] is master_key:
+        return entry[1]
+
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+    cipher = AESGCM(_derive_field_key(master_key, context))
+    _cipher_cache[cache_key] = (master_key, cipher)
+    return cipher
+
+
+def clear_encryption_key_cache() -> None:
+    """Forget the cached master key and derived ciphers (call after key rotation)."""
+    get_encryption_key.cache_clear()
+    _cipher_cache.clear()
+
+
 def encrypt_pii(
     plaintext: str,
     field_type: str = "generic",
@@ -149,23 +198,24 @@ def encrypt_pii(
     if not plaintext:
         return ""
 
+    # Get field-specific cipher
     try:
-        from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+        aesgcm = _get_cipher(field_type)
     except ImportError:
         raise RuntimeError(
             "FATAL: 'cryptography' package is required for PII encryption. "
             "Install with: pip install cryptography"
         )
 
-    # Get field-specific key
-    master_key = get_encryption_key()
-    field_key = _derive_field_key(master_key, field_type)
+    return _encrypt_with(aesgcm, plaintext, associated_data)
+
 
+def _encrypt_with(aesgcm: Any, plaintext: str, associated_data: Optional[bytes]) -> str:
+    """Encrypt one value with an already-derived cipher."""
     # Generate random nonce
     nonce = os.urandom(12)
 
     # Encrypt with AES-GCM
-    aesgcm = AESGCM(field_key)
     ciphertext = aesgcm.encrypt(
         nonce,
         plaintext.encode('utf-8'),
@@ -214,12 +264,26 @@ def decrypt_pii(
     if ciphertext.startswith("fallback:"):
         return _fallback_decode(ciphertext, field_type)
 
+    # Get field-specific cipher
     try:
-        from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+        aesgcm = _get_cipher(field_type)
     except ImportError:
         logger.error("cryptography not installed - cannot decrypt")
         raise ImportError("cryptography package required for decryption")
 
+    return _decrypt_with(aesgcm, ciphertext, field_type, associated_data)
+
+
+def _decrypt_with(
+    aesgcm: Any,
+    ciphertext: str,
+    field_type: str,
+    associated_data: Optional[bytes],
+) -> str:
+    """Decrypt one value with an already-derived cipher."""
+    if ciphertext.startswith("fallback:"):
+        return _fallback_decode(ciphertext, field_type)
+
     # Parse versioned format
     try:
         parts = ciphertext.split(":")
@@ -234,15 +298,10 @@ def decrypt_pii(
     except Exception as e:
         raise ValueError(f"Failed to parse ciphertext: {e}")
 
-    # Get field-specific key
-    master_key = get_encryption_key()
-    field_key = _derive_field_key(master_key, field_type)
-
     # Reconstruct ciphertext with tag
     full_ciphertext = encrypted_data + tag
 
     # Decrypt
-    aesgcm = AESGCM(field_key)
     try:
         plaintext = aesgcm.decrypt(nonce, full_ciphertext, associated_data)
         return plaintext.decode('utf-8')
@@ -251,6 +310,103 @@ def decrypt_pii(
         raise ValueError("Decryption failed - invalid key or corrupted data")
 
 
+# =============================================================================
+# BULK ENCRYPTION
+# =============================================================================
+
+def encrypt_many(
+    plaintexts: Sequence[Optional[str]],
+    field_type: str = "generic",
+    associated_data: Optional[bytes] = None,
+) -> List[str]:
+    """
+    Encrypt a column of values of one field type.
+
+    Same output as calling encrypt_pii() per value, but the cipher is
+    looked up once for the whole batch. Empty values map to "".
+    """
+    if not any(plaintexts):
+        return ["" for _ in plaintexts]
+    try:
+        aesgcm = _get_cipher(field_type)
+    except ImportError:
+        raise RuntimeError(
+            "FATAL: 'cryptography' package is required for PII encryption. "
+            "Install with: pip install cryptography"
+        )
+    return [
+        _encrypt_with(aesgcm, value, associated_data) if value else ""
+        for value in plaintexts
+    ]
+
+
+def decrypt_many(
+    ciphertexts: Sequence[Optional[str]],
+    field_type: str = "generic",
+    associated_data: Optional[bytes] = None,
+    strict: bool = True,
+) -> List[Optional[str]]:
+    """
+    Decrypt a column of values of one field type.
+
+    Args:
+        ciphertexts: Values from encrypt_pii()/encrypt_many()
+        field_type: Type of field (must match encryption)
+        associated_data: Context data shared by every value (must match encryption)
+        strict: If False, values that fail to decrypt become None instead of
+            raising, so one corrupt row doesn't fail a whole listing
+
+    Returns:
+        Plaintexts in input order ("" for empty values)
+
+    Raises:
+        ValueError: If strict and any value fails to decrypt
+    """
+    if not any(ciphertexts):
+        return ["" for _ in ciphertexts]
+    try:
+        aesgcm = _get_cipher(field_type)
+    except ImportError:
+        logger.error("cryptography not installed - cannot decrypt")
+        raise ImportError("cryptography package required for decryption")
+
+    results: List[Optional[str]] = []
+    for value in ciphertexts:
+        if not value:
+            results.append("")
+            continue
+        try:
+            results.append(_decrypt_with(aesgcm, value, field_type, associated_data))
+        except ValueError:
+            if strict:
+                raise
+            results.append(None)
+    return results
+
+
+async def encrypt_many_async(
+    plaintexts: Sequence[Optional[str]],
+    field_type: str = "generic",
+    associated_data: Optional[bytes] = None,
+) -> List[str]:
+    """encrypt_many() for async code; large batches run in a worker thread."""
+    if len(plaintexts) < PII_OFFLOAD_THRESHOLD:
+        return encrypt_many(plaintexts, field_type, associated_data)
+    return await asyncio.to_thread(encrypt_many, plaintexts, field_type, associated_data)
+
+
+async def decrypt_many_async(
+    ciphertexts: Sequence[Optional[str]],
+    field_type: str = "generic",
+    associated_data: Optional[bytes] = None,
+    strict: bool = True,
+) -> List[Optional[str]]:
+    """decrypt_many() for async code; large batches run in a worker thread."""
+    if len(ciphertexts) < PII_OFFLOAD_THRESHOLD:
+        return decrypt_many(ciphertexts, field_type, associated_data, strict)
+    return await asyncio.to_thread(decrypt_many, ciphertexts, field_type, associated_data, strict)
+
+
 # =============================================================================
 # FALLBACK ENCODING (for development without cryptography)
 # =============================================================================
@@ -18,7 +18,7 @@ import sqlite3
 import json
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 from dataclasses import dataclass, field
 import logging
 
@@ -26,7 +26,8 @@ from .encrypted_fields import (
     encrypt_email, decrypt_email,
     encrypt_phone, decrypt_phone,
     encrypt_ssn, decrypt_ssn,
-    mask_email, mask_phone, mask_ssn
+    mask_email, mask_phone, mask_ssn,
+    decrypt_many,
 )
 
 logger = logging.getLogger(__name__)
@@ -34,6 +35,17 @@ logger = logging.getLogger(__name__)
 # PII fields that should be encrypted in metadata
 PII_FIELDS = {'email', 'phone', 'ssn', 'social_security_number'}
 
+# Metadata key -> field type its value was encrypted with
+_PII_FIELD_TYPES = {
+    'email': 'email',
+    'phone': 'phone',
+    'ssn': 'ssn',
+    'social_security_number': 'ssn',
+}
+
+# SQLite limits bound parameters per statement; stay well below it
+MAX_SQL_PARAMS = 500
+
 # Use same database path as main persistence
 DEFAULT_DB_PATH = Path(__file__).parent.parent.parent / "data" / "tax_returns.db"
 
@@ -172,18 +184,70 @@ class LeadStatePersistence:
 
         except Exception as e:
             logger.error(f"Failed to decrypt lead metadata: {e}")
-            # Return with masked values for safety
-            if 'email_masked' in decrypted:
-                decrypted['email'] = decrypted['email_masked']
-            if 'phone_masked' in decrypted:
-                decrypted['phone'] = decrypted['phone_masked']
-            if 'ssn_masked' in decrypted:
-                for ssn_field in ['ssn', 'social_security_number']:
-                    if ssn_field in decrypted:
-                        decrypted[ssn_field] = decrypted.get('ssn_masked', '***-**-****')
+            self._apply_masked_fallback(decrypted)
 
         return decrypted
 
+    def _decrypt_metadata_many(
+        self,
+        metadatas: List[Dict[str, Any]],
+        tenant_id: str
+    ) -> List[Dict[str, Any]]:
+        """
+        Decrypt PII fields for a page of leads from one tenant.
+
+        Same result as _decrypt_metadata() per row, but each PII column is
+        decrypted with a single decrypt_many() call.
+        """
+        decrypted = [
+            m.copy() if m and m.get('_pii_encrypted') else m
+            for m in metadatas
+        ]
+        associated_data = tenant_id.encode() if tenant_id else None
+        failed = set()
+
+        try:
+            for field_name, field_type in _PII_FIELD_TYPES.items():
+                rows = [
+                    i for i, m in enumerate(decrypted)
+                    if m and m.get('_pii_encrypted') and m.get(field_name)
+                ]
+                if not rows:
+                    continue
+                values = decrypt_many(
+                    [decrypted[i][field_name] for i in rows],
+                    field_type=field_type,
+                    associated_data=associated_data,
+                    strict=False,
+                )
+                for i, value in zip(rows, values):
+                    if value is None:
+                        failed.add(i)
+                    else:
+                        decrypted[i][field_name] = value
+        except Exception as e:
+            logger.error(f"Bulk lead metadata decryption failed, decrypting per lead: {e}")
+            return [self._decrypt_metadata(m, tenant_id) for m in metadatas]
+
+        if failed:
+            logger.error(f"Failed to decrypt metadata for {len(failed)} lead(s)")
+            for i in failed:
+                self._apply_masked_fallback(decrypted[i])
+
+        return decrypted
+
+    @staticmethod
+    def _apply_masked_fallback(decrypted: Dict[str, Any]) -> None:
+        """Replace PII with the stored masked values after a decryption failure."""
+        if 'email_masked' in decrypted:
+            decrypted['email'] = decrypted['email_masked']
+        if 'phone_masked' in decrypted:
+            decrypted['phone'] = decrypted['phone_masked']
+        if 'ssn_masked' in decrypted:
+            for ssn_field in ['ssn', 'social_security_number']:
+                if ssn_field in decrypted:
+                    decrypted[ssn_field] = decrypted.get('ssn_masked', '***-**-****')
+
     def _ensure_tables_exist(self):
         """Create tables if they don't exist."""
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
@@ -236,6 +300,10 @@ class LeadStatePersistence:
                 CREATE INDEX IF NOT EXISTS idx_leads_tenant
                 ON leads(tenant_id)
             """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_leads_tenant_updated
+                ON leads(tenant_id, updated_at)
+            """)
             cursor.execute("""
                 CREATE INDEX IF NOT EXISTS idx_leads_state
                 ON leads(current_state)
@@ -469,25 +537,49 @@ class LeadStatePersistence:
                 LIMIT ? OFFSET ?
             """, (tenant_id, limit, offset))
 
-            leads = []
-            for row in cursor.fetchall():
-                raw_metadata = json.loads(row[6]) if row[6] else {}
-
-                if decrypt_pii:
-                    metadata = self._decrypt_metadata(raw_metadata, tenant_id)
-                else:
-                    metadata = raw_metadata
-
-                leads.append(LeadDbRecord(
-                    lead_id=row[0],
-                    session_id=row[1],
-                    tenant_id=row[2],
-                    current_state=row[3],
-                    created_at=row[4],
-                    updated_at=row[5],
-                    metadata=metadata
-                ))
-            return leads
+            rows = cursor.fetchall()
+
+        return self._rows_to_records(rows, tenant_id, decrypt_pii)
+
+    def list_leads_updated_since(
+        self,
+        tenant_id: str,
+        since: str,
+        limit: int = 1000,
+        offset: int = 0,
+        decrypt_pii: bool = True
+    ) -> List[LeadDbRecord]:
+        """
+        List a tenant's leads updated at or after a timestamp, oldest first.
+
+        Signals bump the lead's updated_at, so this picks up every lead
+        whose state or signals changed.
+
+        Args:
+            tenant_id: Tenant identifier
+            since: ISO-8601 timestamp (inclusive)
+            limit: Maximum number of leads to return
+            offset: Pagination offset
+            decrypt_pii: Whether to decrypt PII fields (default True)
+
+        Returns:
+            List of LeadDbRecord
+        """
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT lead_id, session_id, tenant_id,
+                       current_state, created_at, updated_at,
+                       metadata_json
+                FROM leads
+                WHERE tenant_id = ? AND updated_at >= ?
+                ORDER BY updated_at, lead_id
+                LIMIT ? OFFSET ?
+            """, (tenant_id, since, limit, offset))
+
+            rows = cursor.fetchall()
+
+        return self._rows_to_records(rows, tenant_id, decrypt_pii)
 
     def list_leads_by_state(
         self,
@@ -522,25 +614,33 @@ class LeadStatePersistence:
                 LIMIT ? OFFSET ?
             """, (state, tenant_id, limit, offset))
 
-            leads = []
-            for row in cursor.fetchall():
-                raw_metadata = json.loads(row[6]) if row[6] else {}
-
-                if decrypt_pii:
-                    metadata = self._decrypt_metadata(raw_metadata, tenant_id)
-                else:
-                    metadata = raw_metadata
-
-                leads.append(LeadDbRecord(
-                    lead_id=row[0],
-                    session_id=row[1],
-                    tenant_id=row[2],
-                    current_state=row[3],
-                    created_at=row[4],
-                    updated_at=row[5],
-                    metadata=metadata
-                ))
-            return leads
+            rows = cursor.fetchall()
+
+        return self._rows_to_records(rows, tenant_id, decrypt_pii)
+
+    def _rows_to_records(
+        self,
+        rows: List[tuple],
+        tenant_id: str,
+        decrypt_pii: bool
+    ) -> List[LeadDbRecord]:
+        """Build records for a listing, decrypting PII column by column."""
+        metadatas = [json.loads(row[6]) if row[6] else {} for row in rows]
+        if decrypt_pii:
+            metadatas = self._decrypt_metadata_many(metadatas, tenant_id)
+
+        return [
+            LeadDbRecord(
+                lead_id=row[0],
+                session_id=row[1],
+                tenant_id=row[2],
+                current_state=row[3],
+                created_at=row[4],
+                updated_at=row[5],
+                metadata=metadata
+            )
+            for row, metadata in zip(rows, metadatas)
+        ]
 
     def get_state_counts(
         self,
@@ -608,8 +708,13 @@ class LeadStatePersistence:
                 now,
                 json.dumps(metadata, default=str)
             ))
-            conn.commit()
             signal_record_id = cursor.lastrowid
+            # Signals feed the priority score; let other workers see the change
+            cursor.execute(
+                "UPDATE leads SET updated_at = ? WHERE lead_id = ?",
+                (now, lead_id)
+            )
+            conn.commit()
 
         return SignalDbRecord(
             id=signal_record_id,
@@ -748,6 +853,76 @@ class LeadStatePersistence:
                 ))
             return transitions
 
+    # =========================================================================
+    # BULK HISTORY (for loading many leads at once)
+    # =========================================================================
+
+    def get_history_for_leads(
+        self,
+        tenant_id: str,
+        lead_ids: Optional[List[str]] = None
+    ) -> Tuple[Dict[str, List[str]], Dict[str, List[TransitionDbRecord]]]:
+        """
+        Signal IDs and transitions for many leads, grouped by lead_id.
+
+        Reads each table once for the whole tenant (or once per
+        MAX_SQL_PARAMS lead IDs when lead_ids is given) instead of once
+        per lead.
+
+        Args:
+            tenant_id: Tenant identifier
+            lead_ids: Restrict to these leads (default: every lead of the tenant)
+
+        Returns:
+            ({lead_id: [signal_id, ...]}, {lead_id: [TransitionDbRecord, ...]}),
+            each list oldest first
+        """
+        if lead_ids is None:
+            filters = [("l.tenant_id = ?", [tenant_id])]
+        else:
+            filters = [
+                (
+                    "l.tenant_id = ? AND l.lead_id IN ({})".format(",".join("?" * len(chunk))),
+                    [tenant_id] + chunk,
+                )
+                for chunk in (
+                    lead_ids[i:i + MAX_SQL_PARAMS] for i in range(0, len(lead_ids), MAX_SQL_PARAMS)
+                )
+            ]
+
+        signals: Dict[str, List[str]] = {}
+        transitions: Dict[str, List[TransitionDbRecord]] = {}
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            for where, params in filters:
+                cursor.execute(f"""
+                    SELECT s.lead_id, s.signal_id
+                    FROM lead_signals s JOIN leads l ON l.lead_id = s.lead_id
+                    WHERE {where}
+                    ORDER BY s.timestamp ASC, s.id ASC
+                """, params)
+                for lead_id, signal_id in cursor.fetchall():
+                    signals.setdefault(lead_id, []).append(signal_id)
+
+                cursor.execute(f"""
+                    SELECT t.id, t.lead_id, t.from_state, t.to_state,
+                           t.trigger_signal_id, t.timestamp, t.metadata_json
+                    FROM lead_transitions t JOIN leads l ON l.lead_id = t.lead_id
+                    WHERE {where}
+                    ORDER BY t.timestamp ASC, t.id ASC
+                """, params)
+                for row in cursor.fetchall():
+                    transitions.setdefault(row[1], []).append(TransitionDbRecord(
+                        id=row[0],
+                        lead_id=row[1],
+                        from_state=row[2],
+                        to_state=row[3],
+                        trigger_signal_id=row[4],
+                        timestamp=row[5],
+                        metadata=json.loads(row[6]) if row[6] else {}
+                    ))
+        return signals, transitions
+
     # =========================================================================
     # FULL LEAD LOAD (with signals and transitions)
     # =========================================================================
@@ -1117,6 +1117,7 @@ class AuditLogRecord(Base):
         Index('ix_audit_timestamp', 'timestamp'),
         Index('ix_audit_event', 'event_type', 'event_category'),
         Index('ix_audit_user', 'user_id', 'timestamp'),
+        Index('ix_audit_firm_keyset', 'firm_id', 'timestamp', 'log_id'),
     )
 
 
@@ -1488,6 +1489,7 @@ class ClientRecord(Base):
         Index('ix_client_preparer', 'preparer_id', 'is_active'),
         Index('ix_client_name', 'last_name', 'first_name'),
         Index('ix_client_ssn_hash', 'ssn_hash'),
+        Index('ix_client_firm_keyset', 'firm_id', 'client_id'),
         UniqueConstraint('preparer_id', 'external_id', name='uq_client_external_id'),
     )
 
@@ -353,6 +353,22 @@ class TaxReturnPersistence:
                 return json.loads(row[0])
             return None
 
+    def get_return_firm_id(self, return_id: str) -> Optional[str]:
+        """
+        Firm that owns a return.
+
+        Args:
+            return_id: The return ID
+
+        Returns:
+            The stored firm_id, or None if the return is not firm-owned or not found
+        """
+        with sqlite3.connect(self.db_path) as conn:
+            row = conn.execute(
+                "SELECT firm_id FROM tax_returns WHERE return_id = ?", (return_id,)
+            ).fetchone()
+        return row[0] if row else None
+
     def load_by_session(self, session_id: str) -> Optional[Dict[str, Any]]:
         """
         Load the most recent tax return for a session.
@@ -0,0 +1,235 @@
+"""
+Practice Metrics Persistence Layer.
+
+Durable storage for the practice intelligence portfolio accumulators,
+so the precomputed aggregates survive restarts.
+
+Tables:
+- practice_metric_aggregates: One accumulator per (tenant_id, tax_year),
+  stored as JSON
+- practice_metric_contributions: What each engagement/return last added
+  to the aggregates, so a change can subtract the old values before
+  adding the new ones
+- practice_metric_tenants: Tenants whose aggregates have been built
+
+Every change is applied inside one write transaction (BEGIN IMMEDIATE),
+so concurrent workers never lose each other's updates.
+"""
+
+import json
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Use same database path as main persistence
+DEFAULT_DB_PATH = Path(__file__).parent.parent.parent / "data" / "tax_returns.db"
+
+# fold(aggregates_by_year, old_contribution, new_contribution) updates the
+# aggregates in place and returns the years it touched
+FoldFn = Callable[[Dict[int, Dict[str, Any]], Optional[Dict[str, Any]], Optional[Dict[str, Any]]], Iterable[int]]
+
+
+class PracticeMetricsPersistence:
+    """
+    SQLite storage for per-tenant, per-year portfolio aggregates.
+
+    The aggregate and contribution payloads are opaque JSON here; the
+    arithmetic lives in cpa_panel.practice_intelligence.aggregates.
+    """
+
+    def __init__(self, db_path: Optional[Path] = None):
+        """
+        Initialize practice metrics persistence.
+
+        Args:
+            db_path: Path to SQLite database file.
+        """
+        self.db_path = Path(db_path) if db_path else DEFAULT_DB_PATH
+        self._ensure_tables_exist()
+
+    def _ensure_tables_exist(self):
+        """Create tables if they don't exist."""
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS practice_metric_aggregates (
+                    tenant_id TEXT NOT NULL,
+                    tax_year INTEGER NOT NULL,
+                    data TEXT NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    PRIMARY KEY (tenant_id, tax_year)
+                )
+            """)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS practice_metric_contributions (
+                    record_type TEXT NOT NULL,
+                    record_id TEXT NOT NULL,
+                    tenant_id TEXT NOT NULL,
+                    tax_year INTEGER NOT NULL,
+                    data TEXT NOT NULL,
+                    PRIMARY KEY (record_type, record_id)
+                )
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_practice_contrib_tenant
+                ON practice_metric_contributions(tenant_id)
+            """)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS practice_metric_tenants (
+                    tenant_id TEXT PRIMARY KEY,
+                    built_at TEXT NOT NULL
+                )
+            """)
+            conn.commit()
+
+    @contextmanager
+    def _write(self):
+        conn = sqlite3.connect(self.db_path, isolation_level=None)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.close()
+
+    def is_built(self, tenant_id: str) -> bool:
+        with sqlite3.connect(self.db_path) as conn:
+            row = conn.execute(
+                "SELECT 1 FROM practice_metric_tenants WHERE tenant_id = ?", (tenant_id,)
+            ).fetchone()
+        return row is not None
+
+    def list_built_tenants(self) -> List[str]:
+        with sqlite3.connect(self.db_path) as conn:
+            rows = conn.execute("SELECT tenant_id FROM practice_metric_tenants ORDER BY tenant_id").fetchall()
+        return [row[0] for row in rows]
+
+    def load_aggregates(self, tenant_id: str) -> Dict[int, Dict[str, Any]]:
+        """All of a tenant's aggregates, keyed by tax year."""
+        with sqlite3.connect(self.db_path) as conn:
+            rows = conn.execute(
+                "SELECT tax_year, data FROM practice_metric_aggregates WHERE tenant_id = ?",
+                (tenant_id,),
+            ).fetchall()
+        return {year: json.loads(data) for year, data in rows}
+
+    def apply_change(
+        self,
+        record_type: str,
+        record_id: str,
+        tenant_id: Optional[str],
+        contribution: Optional[Dict[str, Any]],
+        fold: FoldFn,
+    ) -> None:
+        """
+        Replace one record's contribution and fold the difference into the aggregates.
+
+        Args:
+            record_type: "engagement" or "return"
+            record_id: Record identifier
+            tenant_id: Owning tenant (ignored when removing)
+            contribution: New contribution (must carry tax_year), or None to remove
+            fold: Applies (old, new) to the loaded aggregates
+        """
+        with self._write() as conn:
+            row = conn.execute(
+                "SELECT tenant_id, tax_year, data FROM practice_metric_contributions "
+                "WHERE record_type = ? AND record_id = ?",
+                (record_type, record_id),
+            ).fetchone()
+            old = json.loads(row[2]) if row else None
+            if old is None and contribution is None:
+                return
+            if row is not None and contribution is not None and row[0] != tenant_id:
+                # Record moved between tenants: take it out of the old one first
+                self._fold_tenant(conn, row[0], old, None, fold)
+                old = None
+            if contribution is None:
+                tenant_id = row[0]
+            self._fold_tenant(conn, tenant_id, old, contribution, fold)
+
+            if contribution is None:
+                conn.execute(
+                    "DELETE FROM practice_metric_contributions WHERE record_type = ? AND record_id = ?",
+                    (record_type, record_id),
+                )
+            else:
+                conn.execute(
+                    "INSERT OR REPLACE INTO practice_metric_contributions "
+                    "(record_type, record_id, tenant_id, tax_year, data) VALUES (?, ?, ?, ?, ?)",
+                    (record_type, record_id, tenant_id, contribution["tax_year"], json.dumps(contribution)),
+                )
+
+    @staticmethod
+    def _fold_tenant(conn, tenant_id: str, old, new, fold: FoldFn) -> None:
+        years = {c["tax_year"] for c in (old, new) if c is not None}
+        placeholders = ", ".join("?" for _ in years)
+        rows = conn.execute(
+            f"SELECT tax_year, data FROM practice_metric_aggregates "
+            f"WHERE tenant_id = ? AND tax_year IN ({placeholders})",
+            (tenant_id, *years),
+        ).fetchall()
+        aggregates = {year: json.loads(data) for year, data in rows}
+        now = datetime.now(timezone.utc).isoformat()
+        for year in fold(aggregates, old, new):
+            conn.execute(
+                "INSERT OR REPLACE INTO practice_metric_aggregates (tenant_id, tax_year, data, updated_at) "
+                "VALUES (?, ?, ?, ?)",
+                (tenant_id, year, json.dumps(aggregates[year]), now),
+            )
+
+    def replace_tenant(
+        self,
+        tenant_id: str,
+        aggregates: Dict[int, Dict[str, Any]],
+        contributions: List[Tuple[str, str, Dict[str, Any]]],
+    ) -> None:
+        """
+        Replace all of a tenant's aggregates and contributions (rebuild).
+
+        Args:
+            contributions: (record_type, record_id, contribution) triples
+        """
+        now = datetime.now(timezone.utc).isoformat()
+        with self._write() as conn:
+            conn.execute("DELETE FROM practice_metric_aggregates WHERE tenant_id = ?", (tenant_id,))
+            conn.execute("DELETE FROM practice_metric_contributions WHERE tenant_id = ?", (tenant_id,))
+            conn.executemany(
+                "INSERT INTO practice_metric_aggregates (tenant_id, tax_year, data, updated_at) VALUES (?, ?, ?, ?)",
+                [(tenant_id, year, json.dumps(data), now) for year, data in aggregates.items()],
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO practice_metric_contributions "
+                "(record_type, record_id, tenant_id, tax_year, data) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (record_type, record_id, tenant_id, contribution["tax_year"], json.dumps(contribution))
+                    for record_type, record_id, contribution in contributions
+                ],
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO practice_metric_tenants (tenant_id, built_at) VALUES (?, ?)",
+                (tenant_id, now),
+            )
+
+
+# Global instance
+_practice_metrics_persistence: Optional[PracticeMetricsPersistence] = None
+
+
+def get_practice_metrics_persistence() -> PracticeMetricsPersistence:
+    """Get the global practice metrics persistence instance."""
+    global _practice_metrics_persistence
+    if _practice_metrics_persistence is None:
+        _practice_metrics_persistence = PracticeMetricsPersistence()
+    return _practice_metrics_persistence
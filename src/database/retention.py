@@ -0,0 +1,248 @@
+"""
+Chunked Retention Sweeps.
+
+Deletes expired rows from the SQLite stores in bounded chunks walked along a
+(key, id) index: each chunk's upper bound is found with an index-only seek,
+dependent rows are removed with one set-based DELETE per table against the
+same range, and the chunk is committed together with a checkpoint of the last
+(key, id) deleted. Callers that cache per-row state can ask for the ids each
+chunk deleted once it has committed. Write locks are held for one chunk at a time, the sweep
+sleeps between chunks so request traffic can get in, and a run that stops on
+its time budget or is interrupted resumes from the checkpoint.
+"""
+
+import logging
+import sqlite3
+import time
+from contextlib import closing
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from .upload_references import SESSION_OWNED_CONDITION
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 5000
+DEFAULT_CHUNK_PAUSE_SECONDS = 0.05
+
+
+@dataclass(frozen=True)
+class Dependent:
+    """A table whose rows are deleted along with the swept rows they reference."""
+    table: str
+    column: str
+    where: str = ""
+
+
+@dataclass(frozen=True)
+class RetentionSweep:
+    """
+    A table swept by expiry key.
+
+    Rows with key_column < cutoff are deleted in (key_column, id_column)
+    order; index covers that order so chunk bounds are index seeks.
+    """
+    name: str
+    table: str
+    key_column: str
+    id_column: str
+    index: str
+    dependents: Tuple[Dependent, ...] = ()
+
+
+SESSION_SWEEP = RetentionSweep(
+    name="expired_sessions",
+    table="session_states",
+    key_column="expires_at",
+    id_column="session_id",
+    index="idx_session_expires_id",
+    dependents=(
+        Dependent("document_processing", "session_id"),
+        Dependent("upload_references", "session_id", SESSION_OWNED_CONDITION),
+        Dependent("session_tax_returns", "session_id"),
+    ),
+)
+
+AUDIT_LOG_SWEEP = RetentionSweep(
+    name="audit_log",
+    table="audit_log",
+    key_column="timestamp",
+    id_column="event_id",
+    index="idx_audit_timestamp_event",
+)
+
+
+def ensure_retention_tables(conn: sqlite3.Connection, sweep: RetentionSweep) -> None:
+    """Create the checkpoint table and the sweep's (key, id) index if missing."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS retention_checkpoints (
+            sweep TEXT PRIMARY KEY,
+            cutoff TEXT NOT NULL,
+            last_key TEXT NOT NULL,
+            last_id TEXT NOT NULL,
+            rows_deleted INTEGER NOT NULL DEFAULT 0,
+            started_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        )
+    """)
+    conn.execute(
+        f"CREATE INDEX IF NOT EXISTS {sweep.index} "
+        f"ON {sweep.table}({sweep.key_column}, {sweep.id_column})"
+    )
+    conn.commit()
+
+
+def load_checkpoint(db_path: Union[str, Path], sweep_name: str) -> Optional[Dict[str, Any]]:
+    """Return the saved position of an unfinished sweep, if any."""
+    with closing(sqlite3.connect(db_path)) as conn:
+        try:
+            row = conn.execute(
+                "SELECT cutoff, last_key, last_id, rows_deleted, started_at, updated_at "
+                "FROM retention_checkpoints WHERE sweep = ?",
+                (sweep_name,),
+            ).fetchone()
+        except sqlite3.OperationalError:
+            return None
+    if not row:
+        return None
+    keys = ("cutoff", "last_key", "last_id", "rows_deleted", "started_at", "updated_at")
+    return dict(zip(keys, row))
+
+
+def run_sweep(
+    db_path: Union[str, Path],
+    sweep: RetentionSweep,
+    cutoff: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    pause_seconds: float = DEFAULT_CHUNK_PAUSE_SECONDS,
+    max_seconds: Optional[float] = None,
+    on_chunk_deleted: Optional[Callable[[List[str]], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Delete rows of sweep.table whose key is older than cutoff.
+
+    Args:
+        db_path: SQLite database holding the table and its dependents.
+        sweep: What to delete and what cascades with it.
+        cutoff: Rows with key < cutoff are deleted (ISO timestamps compare
+            as strings).
+        chunk_size: Rows deleted per transaction.
+        pause_seconds: Sleep between chunks, releasing the write lock.
+        max_seconds: Stop after this long, leaving a checkpoint to resume.
+        on_chunk_deleted: Called with the ids each chunk deleted, after the
+            chunk commits. Failures are logged and do not stop the sweep.
+
+    Returns:
+        Rows deleted (total and per dependent table), chunks, the longest
+        chunk (write lock held), elapsed time, rows per second, and whether
+        the sweep finished or was resumed.
+    """
+    table, key, id_col = sweep.table, sweep.key_column, sweep.id_column
+    start = time.perf_counter()
+    now = datetime.now(timezone.utc).isoformat()
+    result: Dict[str, Any] = {
+        "rows_deleted": 0,
+        "dependent_rows_deleted": {dep.table: 0 for dep in sweep.dependents},
+        "chunks": 0,
+        "max_chunk_seconds": 0.0,
+        "resumed": False,
+        "completed": False,
+    }
+
+    with closing(sqlite3.connect(db_path, timeout=30)) as conn:
+        ensure_retention_tables(conn, sweep)
+        checkpoint = conn.execute(
+            "SELECT last_key, last_id, rows_deleted, started_at FROM retention_checkpoints WHERE sweep = ?",
+            (sweep.name,),
+        ).fetchone()
+        position: Optional[Tuple[str, str]] = None
+        total_deleted, started_at = 0, now
+        if checkpoint:
+            # Rows behind the position were deleted by the interrupted run
+            position = (checkpoint[0], checkpoint[1])
+            total_deleted, started_at = checkpoint[2], checkpoint[3]
+            result["resumed"] = True
+
+        while True:
+            after_sql = f" AND ({key}, {id_col}) > (?, ?)" if position else ""
+            after_params = list(position) if position else []
+            bound = conn.execute(
+                f"SELECT {key}, {id_col} FROM {table} WHERE {key} < ?{after_sql} "
+                f"ORDER BY {key}, {id_col} LIMIT 1 OFFSET ?",
+                [cutoff, *after_params, chunk_size - 1],
+            ).fetchone()
+
+            if bound is not None:
+                # Bound the range on the index at both ends; a plain
+                # key < cutoff filter would rescan every remaining row
+                range_sql = f"({key}, {id_col}) <= (?, ?){after_sql}"
+                params = [*bound, *after_params]
+            else:
+                range_sql = f"{key} < ?{after_sql}"
+                params = [cutoff, *after_params]
+
+            chunk_start = time.perf_counter()
+            deleted_ids: List[str] = []
+            with conn:
+                if on_chunk_deleted is not None:
+                    deleted_ids = [
+                        row[0] for row in conn.execute(
+                            f"SELECT {id_col} FROM {table} WHERE {range_sql}", params
+                        )
+                    ]
+                for dep in sweep.dependents:
+                    extra = f"{dep.where} AND " if dep.where else ""
+                    cursor = conn.execute(
+                        f"DELETE FROM {dep.table} WHERE {extra}{dep.column} IN "
+                        f"(SELECT {id_col} FROM {table} WHERE {range_sql})",
+                        params,
+                    )
+                    result["dependent_rows_deleted"][dep.table] += max(cursor.rowcount, 0)
+                deleted = conn.execute(f"DELETE FROM {table} WHERE {range_sql}", params).rowcount
+                result["rows_deleted"] += deleted
+                total_deleted += deleted
+
+                if bound is None:
+                    # Fewer than chunk_size rows were left: the sweep is done
+                    conn.execute("DELETE FROM retention_checkpoints WHERE sweep = ?", (sweep.name,))
+                else:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO retention_checkpoints "
+                        "(sweep, cutoff, last_key, last_id, rows_deleted, started_at, updated_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (sweep.name, cutoff, bound[0], bound[1], total_deleted, started_at,
+                         datetime.now(timezone.utc).isoformat()),
+                    )
+            result["chunks"] += 1
+            result["max_chunk_seconds"] = max(
+                result["max_chunk_seconds"], round(time.perf_counter() - chunk_start, 4)
+            )
+            if deleted_ids:
+                try:
+                    on_chunk_deleted(deleted_ids)
+                except Exception as e:
+                    logger.warning(f"Retention sweep {sweep.name}: chunk callback failed: {e}")
+
+            if bound is None:
+                result["completed"] = True
+                break
+            position = (bound[0], bound[1])
+            if result["chunks"] % 20 == 0:
+                logger.info(f"Retention sweep {sweep.name}: {total_deleted} rows deleted so far")
+            if max_seconds is not None and time.perf_counter() - start >= max_seconds:
+                logger.info(f"Retention sweep {sweep.name} hit its time budget, will resume from checkpoint")
+                break
+            if pause_seconds:
+                time.sleep(pause_seconds)
+
+    elapsed = time.perf_counter() - start
+    result["elapsed_seconds"] = round(elapsed, 3)
+    result["rows_per_second"] = round(result["rows_deleted"] / elapsed) if elapsed > 0 else 0
+    if result["rows_deleted"]:
+        logger.info(
+            f"Retention sweep {sweep.name}: deleted {result['rows_deleted']} rows in "
+            f"{result['chunks']} chunks, {result['rows_per_second']} rows/s"
+        )
+    return result
@@ -24,6 +24,7 @@ from typing import Optional, Dict, Any, List
 from dataclasses import dataclass, field
 import logging
 from .unified_session import UnifiedFilingSession
+from .upload_references import SESSION_OWNED_CONDITION, ensure_upload_reference_tables
 
 logger = logging.getLogger(__name__)
 
@@ -103,6 +104,21 @@ class DocumentProcessingRecord:
     error_message: Optional[str] = None
 
 
+def _invalidate_report_cache(session_id: str) -> None:
+    """Drop premium report sections cached for a session whose return changed."""
+    try:
+        from export.premium_report_generator import invalidate_report_cache
+    except ImportError:
+        return
+    invalidate_report_cache(session_id)
+
+
+def invalidate_report_caches(session_ids: List[str]) -> None:
+    """Drop premium report sections cached for sessions that were deleted."""
+    for session_id in session_ids:
+        _invalidate_report_cache(session_id)
+
+
 class SessionPersistence:
     """
     Database-backed persistence for web session state.
@@ -178,6 +194,9 @@ class SessionPersistence:
                     CREATE INDEX IF NOT EXISTS idx_session_transfers_user
                     ON session_transfers(to_user_id)
                 """)
+
+                # Ensure upload reference index exists (orphaned upload GC)
+                ensure_upload_reference_tables(cursor)
                 conn.commit()
                 return
 
@@ -293,6 +312,9 @@ class SessionPersistence:
                 ON session_transfers(to_user_id)
             """)
 
+            # Upload file -> owning document/session index
+            ensure_upload_reference_tables(cursor)
+
             # =================================================================
             # AUDIT TRAILS TABLE - CPA COMPLIANCE REQUIREMENT
             # =================================================================
@@ -601,11 +623,15 @@ class SessionPersistence:
         with sqlite3.connect(self.db_path) as conn:
             cursor = conn.cursor()
 
-            # Delete related documents
+            # Delete related documents and release their upload files
             cursor.execute(
                 "DELETE FROM document_processing WHERE session_id = ?",
                 (session_id,)
             )
+            cursor.execute(
+                f"DELETE FROM upload_references WHERE session_id = ? AND {SESSION_OWNED_CONDITION}",
+                (session_id,)
+            )
 
             # Delete related tax returns
             cursor.execute(
@@ -620,7 +646,9 @@ class SessionPersistence:
             )
 
             conn.commit()
-            return cursor.rowcount > 0
+            deleted = cursor.rowcount > 0
+        _invalidate_report_cache(session_id)
+        return deleted
 
     def touch_session(self, session_id: str) -> bool:
         """Update session last_activity and extend expiry."""
@@ -669,11 +697,12 @@ class SessionPersistence:
 
     def cleanup_expired_sessions(self, batch_size: int = 500) -> int:
         """
-        Remove all expired sessions in batches to prevent memory issues.
+        Remove all expired sessions and their documents, upload references
+        and tax returns.
 
-        PERFORMANCE: Uses batched deletion to avoid loading all expired
-        session IDs into memory at once, which can cause OOM errors
-        when many sessions have expired.
+        PERFORMANCE: Deletes in index-ordered chunks of batch_size sessions,
+        one set-based DELETE per dependent table per chunk, so memory and
+        write-lock time stay bounded however many sessions have expired.
 
         Args:
             batch_size: Number of sessions to delete per batch (default: 500)
@@ -681,49 +710,14 @@ class SessionPersistence:
         Returns:
             Total number of sessions deleted
         """
-        now = datetime.now(timezone.utc).isoformat()
-        total_deleted = 0
-
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-
-            while True:
-                # Get batch of expired session IDs (with LIMIT for pagination)
-                cursor.execute(
-                    "SELECT session_id FROM session_states WHERE expires_at < ? LIMIT ?",
-                    (now, batch_size)
-                )
-                expired_ids = [row[0] for row in cursor.fetchall()]
-
-                if not expired_ids:
-                    break
+        from .retention import SESSION_SWEEP, run_sweep
 
-                # Delete related data for this batch
-                placeholders = ",".join("?" * len(expired_ids))
-                cursor.execute(
-                    f"DELETE FROM document_processing WHERE session_id IN ({placeholders})",
-                    expired_ids
-                )
-                cursor.execute(
-                    f"DELETE FROM session_tax_returns WHERE session_id IN ({placeholders})",
-                    expired_ids
-                )
-                cursor.execute(
-                    f"DELETE FROM session_states WHERE session_id IN ({placeholders})",
-                    expired_ids
-                )
-
-                conn.commit()
-                total_deleted += len(expired_ids)
-
-                # Log progress for large cleanups
-                if total_deleted % 1000 == 0:
-                    logger.info(f"Cleanup progress: {total_deleted} sessions deleted")
-
-        if total_deleted > 0:
-            logger.info(f"Cleanup complete: {total_deleted} expired sessions deleted")
-
-        return total_deleted
+        now = datetime.now(timezone.utc).isoformat()
+        result = run_sweep(
+            self.db_path, SESSION_SWEEP, now, chunk_size=batch_size, pause_seconds=0,
+            on_chunk_deleted=invalidate_report_caches,
+        )
+        return result["rows_deleted"]
 
     # =========================================================================
     # DOCUMENT PROCESSING METHODS (replaces _DOCUMENTS)
@@ -906,8 +900,13 @@ class SessionPersistence:
                 "DELETE FROM document_processing WHERE document_id = ?",
                 (document_id,)
             )
+            deleted = cursor.rowcount > 0
+            cursor.execute(
+                f"DELETE FROM upload_references WHERE document_id = ? AND {SESSION_OWNED_CONDITION}",
+                (document_id,)
+            )
             conn.commit()
-            return cursor.rowcount > 0
+            return deleted
 
     # =========================================================================
     # TAX RETURN METHODS (replaces _TAX_RETURNS)
@@ -979,6 +978,7 @@ class SessionPersistence:
                 ))
 
             conn.commit()
+        _invalidate_report_cache(session_id)
 
     def load_session_tax_return(
         self,
@@ -1030,7 +1030,9 @@ class SessionPersistence:
                 (session_id, tenant_id)
             )
             conn.commit()
-            return cursor.rowcount > 0
+            deleted = cursor.rowcount > 0
+        _invalidate_report_cache(session_id)
+        return deleted
 
     # =========================================================================
     # AUDIT TRAIL METHODS - CPA COMPLIANCE REQUIREMENT
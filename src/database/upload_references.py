@@ -0,0 +1,227 @@
+"""
+Upload Reference Index.
+
+Maintains a table mapping every stored upload file to the document, session
+or feature that owns it. Upload handlers register files when they are
+written and owners drop their references when they are deleted, so orphan
+detection is a set difference between a directory listing and this table
+instead of a LIKE scan over session data per file.
+"""
+
+import os
+import sqlite3
+import logging
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Owner types
+OWNER_DOCUMENT = "document"                # document_processing / session uploads
+OWNER_CLIENT_DOCUMENT = "client_document"  # CPA intake client_documents
+OWNER_BRANDING = "branding"                # CPA branding assets (local fallback)
+OWNER_LEGACY = "legacy"                    # files found referenced during backfill
+
+# Owner types whose references are released when their session or document
+# is deleted (branding and legacy references are not session-owned)
+SESSION_OWNER_TYPES = (OWNER_DOCUMENT, OWNER_CLIENT_DOCUMENT)
+SESSION_OWNED_CONDITION = "owner_type IN ({})".format(
+    ", ".join(f"'{owner}'" for owner in SESSION_OWNER_TYPES)
+)
+
+# SQLite limits bound parameters per statement; stay well below it
+MAX_SQL_PARAMS = 500
+
+_BACKFILL_META_KEY = "backfill_completed_at"
+
+
+def normalize_upload_path(path) -> str:
+    """Canonical form used as the index key for a stored file."""
+    return os.path.realpath(os.fspath(path))
+
+
+def ensure_upload_reference_tables(cursor: sqlite3.Cursor) -> None:
+    """Create the upload reference tables and indexes if missing."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS upload_references (
+            file_path TEXT PRIMARY KEY,
+            owner_type TEXT NOT NULL,
+            document_id TEXT,
+            session_id TEXT,
+            tenant_id TEXT NOT NULL DEFAULT 'default',
+            created_at TEXT NOT NULL
+        )
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_upload_ref_session
+        ON upload_references(session_id)
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_upload_ref_document
+        ON upload_references(document_id)
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS upload_reference_meta (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        )
+    """)
+
+
+def _chunks(items: List[str], size: int = MAX_SQL_PARAMS):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+class UploadReferenceIndex:
+    """
+    SQLite-backed index of upload file path -> owning document/session.
+
+    Lives in the session database next to document_processing and
+    session_states so session and document deletes can drop references
+    in the same transaction.
+    """
+
+    def __init__(self, db_path: Optional[Path] = None):
+        if db_path is None:
+            from database.session_persistence import DEFAULT_DB_PATH
+            db_path = DEFAULT_DB_PATH
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with sqlite3.connect(self.db_path) as conn:
+            ensure_upload_reference_tables(conn.cursor())
+            conn.commit()
+
+    # =========================================================================
+    # MAINTENANCE (called from upload and delete paths)
+    # =========================================================================
+
+    def register(
+        self,
+        file_path,
+        owner_type: str = OWNER_DOCUMENT,
+        document_id: Optional[str] = None,
+        session_id: Optional[str] = None,
+        tenant_id: str = "default",
+    ) -> str:
+        """
+        Record that a stored file is owned by a document/session.
+
+        Returns:
+            The normalized path used as the index key.
+        """
+        key = normalize_upload_path(file_path)
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO upload_references (
+                    file_path, owner_type, document_id, session_id, tenant_id, created_at
+                ) VALUES (?, ?, ?, ?, ?, ?)
+            """, (
+                key,
+                owner_type,
+                document_id,
+                session_id,
+                tenant_id,
+                datetime.now(timezone.utc).isoformat(),
+            ))
+            conn.commit()
+        return key
+
+    def register_many(self, file_paths: Iterable, owner_type: str = OWNER_LEGACY) -> int:
+        """Record many ownerless references at once (used by backfill)."""
+        now = datetime.now(timezone.utc).isoformat()
+        rows = [(normalize_upload_path(p), owner_type, now) for p in file_paths]
+        with sqlite3.connect(self.db_path) as conn:
+            conn.executemany("""
+                INSERT OR IGNORE INTO upload_references (file_path, owner_type, created_at)
+                VALUES (?, ?, ?)
+            """, rows)
+            conn.commit()
+        return len(rows)
+
+    def unregister(self, file_paths: Iterable) -> int:
+        """Drop references for the given files (e.g. after deleting them)."""
+        keys = [normalize_upload_path(p) for p in file_paths]
+        removed = 0
+        with sqlite3.connect(self.db_path) as conn:
+            for chunk in _chunks(keys):
+                placeholders = ",".join("?" * len(chunk))
+                cursor = conn.execute(
+                    f"DELETE FROM upload_references WHERE file_path IN ({placeholders})",
+                    chunk,
+                )
+                removed += cursor.rowcount
+            conn.commit()
+        return removed
+
+    def unregister_session(self, session_id: str) -> int:
+        """Drop every reference owned by a session."""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.execute(
+                "DELETE FROM upload_references WHERE session_id = ?",
+                (session_id,),
+            )
+            conn.commit()
+            return cursor.rowcount
+
+    # =========================================================================
+    # QUERIES (used by orphan collection)
+    # =========================================================================
+
+    def referenced_paths(self) -> Set[str]:
+        """All indexed file paths."""
+        with sqlite3.connect(self.db_path) as conn:
+            return {row[0] for row in conn.execute("SELECT file_path FROM upload_references")}
+
+    def filter_referenced(self, file_paths: List[str]) -> Set[str]:
+        """Return the subset of (normalized) paths that are indexed right now."""
+        found: Set[str] = set()
+        with sqlite3.connect(self.db_path) as conn:
+            for chunk in _chunks(file_paths):
+                placeholders = ",".join("?" * len(chunk))
+                cursor = conn.execute(
+                    f"SELECT file_path FROM upload_references WHERE file_path IN ({placeholders})",
+                    chunk,
+                )
+                found.update(row[0] for row in cursor)
+        return found
+
+    def count(self) -> int:
+        """Number of indexed files."""
+        with sqlite3.connect(self.db_path) as conn:
+            return conn.execute("SELECT COUNT(*) FROM upload_references").fetchone()[0]
+
+    # =========================================================================
+    # BACKFILL STATE
+    # =========================================================================
+
+    def is_backfilled(self) -> bool:
+        """Whether files stored before the index existed have been indexed."""
+        with sqlite3.connect(self.db_path) as conn:
+            row = conn.execute(
+                "SELECT value FROM upload_reference_meta WHERE key = ?",
+                (_BACKFILL_META_KEY,),
+            ).fetchone()
+            return row is not None
+
+    def mark_backfilled(self) -> None:
+        """Record that the legacy backfill finished."""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO upload_reference_meta (key, value) VALUES (?, ?)",
+                (_BACKFILL_META_KEY, datetime.now(timezone.utc).isoformat()),
+            )
+            conn.commit()
+
+
+# Global instance
+_upload_reference_index: Optional[UploadReferenceIndex] = None
+
+
+def get_upload_reference_index() -> UploadReferenceIndex:
+    """Get the global upload reference index."""
+    global _upload_reference_index
+    if _upload_reference_index is None:
+        _upload_reference_index = UploadReferenceIndex()
+    return _upload_reference_index
@@ -0,0 +1,363 @@
+"""
+Batch Export Jobs - Parallel multi-return export into ZIP archives.
+
+Hands off many returns to professional tax software at once. Each
+return is loaded and converted on a worker pool and written to a ZIP
+archive as soon as it completes, so only the returns in flight are held
+in memory rather than the whole batch.
+
+A job is resumable. Its record (<job_id>.job.json in the output
+directory) tracks the per-return status and the archive parts written
+so far. The archive rolls to a new part every EXPORT_BATCH_PART_SIZE
+returns and the record is saved after each part closes, so a crash
+loses at most one part. Re-running the job with the same job_id
+verifies the existing parts and exports only the returns that are not
+in a readable part yet, including previous failures. Every part carries
+a manifest.json with the status of the returns it covers.
+
+Formats are ExportFormat values (ProfessionalExporter) or one of the
+practice software formats drake_csv, lacerte_csv and universal_json
+(PracticeSoftwareExporter).
+
+Configuration:
+    EXPORT_BATCH_EXECUTOR: "thread" (default) or "process"
+    EXPORT_BATCH_WORKERS: Returns loaded and converted concurrently
+        (default: min(8, 2 x CPUs))
+    EXPORT_BATCH_PART_SIZE: Returns per archive part (default: 500)
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field, fields
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .practice_software_export import PracticeSoftwareExporter
+from .professional_formats import ExportFormat, ProfessionalExporter
+
+logger = logging.getLogger(__name__)
+
+EXPORT_BATCH_EXECUTOR = os.environ.get("EXPORT_BATCH_EXECUTOR", "thread").lower()
+EXPORT_BATCH_WORKERS = int(os.environ.get("EXPORT_BATCH_WORKERS", str(min(8, 2 * (os.cpu_count() or 1)))))
+EXPORT_BATCH_PART_SIZE = int(os.environ.get("EXPORT_BATCH_PART_SIZE", "500"))
+
+# Practice software formats: (exporter method, filename suffix)
+PRACTICE_FORMATS = {
+    "drake_csv": ("export_drake_csv", "drake.csv"),
+    "lacerte_csv": ("export_lacerte_csv", "lacerte.txt"),
+    "universal_json": ("export_universal_json", "universal.json"),
+}
+
+STATUS_EXPORTED = "exported"
+STATUS_FAILED = "failed"
+
+_UNSAFE_NAME = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+@dataclass
+class ManifestEntry:
+    """Outcome of exporting one return."""
+    return_id: str
+    status: str
+    filename: str = ""
+    part: str = ""
+    size: int = 0
+    duration_ms: float = 0.0
+    warnings: List[str] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+
+
+@dataclass
+class BatchExportJob:
+    """Persisted state of a batch export job."""
+    job_id: str
+    format: str
+    output_dir: str
+    return_ids: List[str]
+    entries: Dict[str, ManifestEntry] = field(default_factory=dict)
+    parts: List[str] = field(default_factory=list)
+    parts_opened: int = 0
+    status: str = "pending"
+    created_at: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    updated_at: str = ""
+    stats: Dict[str, Any] = field(default_factory=dict)
+
+    @staticmethod
+    def record_path(output_dir: str, job_id: str) -> str:
+        return os.path.join(output_dir, f"{job_id}.job.json")
+
+    @property
+    def path(self) -> str:
+        return self.record_path(self.output_dir, self.job_id)
+
+    def pending_ids(self) -> List[str]:
+        """Returns not yet in a readable archive part, in request order."""
+        return [
+            return_id for return_id in self.return_ids
+            if return_id not in self.entries or self.entries[return_id].status != STATUS_EXPORTED
+        ]
+
+    def counts(self) -> Dict[str, int]:
+        exported = sum(1 for e in self.entries.values() if e.status == STATUS_EXPORTED)
+        failed = sum(1 for e in self.entries.values() if e.status == STATUS_FAILED)
+        return {"total": len(self.return_ids), "exported": exported, "failed": failed,
+                "pending": len(self.return_ids) - exported - failed}
+
+    def to_dict(self) -> Dict[str, Any]:
+        # Shallow copies; asdict() would deep-copy every entry on each checkpoint
+        data = {f.name: getattr(self, f.name) for f in fields(self)}
+        data["entries"] = [vars(entry) for entry in self.entries.values()]
+        data["counts"] = self.counts()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BatchExportJob":
+        data = dict(data)
+        data.pop("counts", None)
+        entries = {e["return_id"]: ManifestEntry(**e) for e in data.pop("entries", [])}
+        return cls(entries=entries, **data)
+
+    def save(self) -> None:
+        """Write the job record atomically."""
+        self.updated_at = datetime.now(timezone.utc).isoformat()
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, self.path)
+
+    @classmethod
+    def load(cls, output_dir: str, job_id: str) -> Optional["BatchExportJob"]:
+        path = cls.record_path(output_dir, job_id)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+def convert_return(return_id: str, tax_return: Any, format: str,
+                   options: Optional[Dict[str, Any]] = None) -> Tuple[str, bytes, List[str]]:
+    """
+    Convert one return to the target format.
+
+    Returns:
+        (archive member name, content, warnings)
+
+    Raises:
+        ValueError: Unknown format, or the exporter reported failure
+    """
+    safe_id = _UNSAFE_NAME.sub("_", str(return_id))
+    if format in PRACTICE_FORMATS:
+        method, suffix = PRACTICE_FORMATS[format]
+        return_data = tax_return
+        if not isinstance(return_data, dict):
+            return_data = tax_return.to_dict() if hasattr(tax_return, "to_dict") else {}
+        content = getattr(PracticeSoftwareExporter(), method)(return_data)
+        if not isinstance(content, str):
+            content = json.dumps(content, indent=2, default=str)
+        return f"{safe_id}_{suffix}", content.encode("utf-8"), []
+
+    result = ProfessionalExporter().export(tax_return, ExportFormat(format), options)
+    if not result.success:
+        raise ValueError("; ".join(result.errors) or "Export failed")
+    return f"{safe_id}_{result.filename}", result.content.encode("utf-8"), list(result.warnings)
+
+
+def _export_one(return_id: str, load_return: Callable[[str], Any], format: str,
+                options: Optional[Dict[str, Any]]) -> Tuple[ManifestEntry, bytes]:
+    """Load and convert one return on a worker. Module-level so a process pool can pickle it."""
+    start = time.perf_counter()
+    try:
+        tax_return = load_return(return_id)
+        if tax_return is None:
+            raise LookupError("Tax return not found")
+        filename, content, warnings = convert_return(return_id, tax_return, format, options)
+        entry = ManifestEntry(return_id, STATUS_EXPORTED, filename=filename, size=len(content), warnings=warnings)
+    except Exception as e:
+        content = b""
+        entry = ManifestEntry(return_id, STATUS_FAILED, errors=[f"{type(e).__name__}: {e}"])
+    entry.duration_ms = round((time.perf_counter() - start) * 1000, 3)
+    return entry, content
+
+
+def _readable(path: str) -> bool:
+    try:
+        with zipfile.ZipFile(path) as archive:
+            return archive.testzip() is None
+    except (OSError, zipfile.BadZipFile):
+        return False
+
+
+def _verify_parts(job: BatchExportJob) -> None:
+    """Drop archive parts that did not survive (e.g. a crash mid-part)."""
+    kept = []
+    for part in job.parts:
+        path = os.path.join(job.output_dir, part)
+        if _readable(path):
+            kept.append(part)
+            continue
+        logger.warning(f"Batch export {job.job_id}: part {part} unreadable, re-exporting its returns")
+        for return_id, entry in list(job.entries.items()):
+            if entry.part == part:
+                del job.entries[return_id]
+        if os.path.exists(path):
+            os.remove(path)
+    job.parts = kept
+
+
+def _new_executor(kind: str, workers: int) -> Executor:
+    if kind == "process":
+        return ProcessPoolExecutor(max_workers=workers)
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch-export")
+
+
+class _PartWriter:
+    """Writes completed returns into rolling archive parts."""
+
+    def __init__(self, job: BatchExportJob, part_size: int):
+        self.job = job
+        self.part_size = max(1, part_size)
+        self._archive: Optional[zipfile.ZipFile] = None
+        self._part = ""
+        self._manifest: List[ManifestEntry] = []
+        self._written = 0
+
+    def write(self, entry: ManifestEntry, content: bytes) -> None:
+        if self._archive is None:
+            self._open()
+        if entry.status == STATUS_EXPORTED:
+            entry.part = self._part
+            self._archive.writestr(entry.filename, content)
+            self._written += 1
+        self._manifest.append(entry)
+        self.job.entries[entry.return_id] = entry
+        if self._written >= self.part_size:
+            self.close()
+
+    def _open(self) -> None:
+        # Numbered by parts ever opened, so a re-export never reuses a dropped part's name
+        self.job.parts_opened += 1
+        self._part = f"{self.job.job_id}-{self.job.parts_opened:03d}.zip"
+        path = os.path.join(self.job.output_dir, self._part)
+        self._archive = zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED)
+        self._manifest = []
+        self._written = 0
+
+    def close(self) -> None:
+        """Finish the current part and checkpoint the job record."""
+        if self._archive is None:
+            return
+        manifest = {
+            "job_id": self.job.job_id,
+            "format": self.job.format,
+            "part": self._part,
+            "returns": [vars(entry) for entry in self._manifest],
+        }
+        self._archive.writestr("manifest.json", json.dumps(manifest, indent=2))
+        self._archive.close()
+        self._archive = None
+        self.job.parts.append(self._part)
+        self.job.save()
+
+
+def run_batch_export(
+    return_ids: Iterable[str],
+    format: str,
+    output_dir: str,
+    load_return: Callable[[str], Any],
+    job_id: Optional[str] = None,
+    options: Optional[Dict[str, Any]] = None,
+    workers: int = EXPORT_BATCH_WORKERS,
+    executor: str = EXPORT_BATCH_EXECUTOR,
+    part_size: int = EXPORT_BATCH_PART_SIZE,
+) -> BatchExportJob:
+    """
+    Export many returns into ZIP archive parts, resuming a previous run of the same job.
+
+    Args:
+        return_ids: Returns to export, in the order they should be submitted
+        format: ExportFormat value or a PRACTICE_FORMATS key
+        output_dir: Directory for the archive parts and the job record
+        load_return: Loads one return (TaxReturn or return-data dict) by id;
+            must be picklable when executor is "process"
+        job_id: Job to create or resume (default: generated)
+        workers: Returns loaded and converted concurrently
+        executor: "thread" or "process"
+        part_size: Returns per archive part
+
+    Returns:
+        The job record, also saved as <job_id>.job.json in output_dir
+
+    Raises:
+        ValueError: Unknown format, or job_id exists with a different format
+    """
+    if format not in PRACTICE_FORMATS:
+        ExportFormat(format)  # raises ValueError for unknown formats
+
+    os.makedirs(output_dir, exist_ok=True)
+    job_id = job_id or f"export-{datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S%f')}"
+    job = BatchExportJob.load(output_dir, job_id)
+    if job is None:
+        job = BatchExportJob(job_id=job_id, format=format, output_dir=output_dir, return_ids=list(return_ids))
+    elif job.format != format:
+        raise ValueError(f"Job {job_id} exports {job.format}, not {format}")
+    else:
+        _verify_parts(job)
+
+    pending = job.pending_ids()
+    job.status = "running"
+    job.save()
+
+    workers = max(1, workers)
+    max_in_flight = 2 * workers
+    writer = _PartWriter(job, part_size)
+    peak_buffered = 0
+    start = time.perf_counter()
+
+    pool = _new_executor(executor, workers)
+    try:
+        ids = enumerate(pending)
+        in_flight: Dict[Future, int] = {}
+        while True:
+            # Keep the pool fed but bounded, so results never pile up in memory
+            for seq, return_id in ids:
+                in_flight[pool.submit(_export_one, return_id, load_return, format, options)] = seq
+                if len(in_flight) >= max_in_flight:
+                    break
+            if not in_flight:
+                break
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            # Returns that finished together are written in submission order
+            results = [future.result() for future in sorted(done, key=in_flight.get)]
+            for future in done:
+                del in_flight[future]
+            peak_buffered = max(peak_buffered, sum(len(content) for _, content in results))
+            for entry, content in results:
+                writer.write(entry, content)
+    finally:
+        pool.shutdown(wait=True)
+        writer.close()
+
+    elapsed = time.perf_counter() - start
+    counts = job.counts()
+    job.status = "completed" if counts["failed"] == 0 else "completed_with_errors"
+    job.stats = {
+        "executor": executor,
+        "workers": workers,
+        "returns_processed": len(pending),
+        "elapsed_seconds": round(elapsed, 3),
+        "returns_per_second": round(len(pending) / elapsed, 1) if elapsed > 0 else 0.0,
+        "peak_buffered_bytes": peak_buffered,
+    }
+    job.save()
+    logger.info(
+        f"Batch export {job_id}: {counts['exported']} exported, {counts['failed']} failed, "
+        f"{job.stats['returns_per_second']} returns/s across {len(job.parts)} part(s)"
+    )
+    return job
@@ -24,18 +24,41 @@ from calculator.decimal_math import money, to_decimal
 
 from __future__ import annotations
 
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Any, FrozenSet, TYPE_CHECKING
+from typing import Dict, List, Optional, Any, FrozenSet, Tuple, TYPE_CHECKING
 from datetime import datetime, timezone
 from enum import Enum
 from uuid import UUID
+import copy
+import dataclasses
+import hashlib
+import json
 import logging
+import threading
+import time
+
+from calculator.decimal_math import money
 
 if TYPE_CHECKING:
     from models.tax_return import TaxReturn
 
 logger = logging.getLogger(__name__)
 
+# Section builders are independent of each other, so they run on a small pool.
+DEFAULT_SECTION_WORKERS = 4
+
+# Built sections are cached per return fingerprint. Tier only selects which
+# sections appear, so it is not part of the key: a tier upgrade reuses every
+# section the lower tier already built.
+SECTION_CACHE_TTL_SECONDS = 3600
+SECTION_CACHE_MAX_ENTRIES = 4000
+
+# Cache slot for the prioritized action item list (distinct from the
+# ACTION_ITEMS placeholder section)
+_ACTION_ITEMS_CACHE_PART = "__action_item_list__"
+
 
 # =============================================================================
 # ENUMS
@@ -351,14 +374,28 @@ class PremiumReportGenerator:
     2. Single orchestration call: generate(session_id, tier, format)
     """
 
-    def __init__(self):
-        """Initialize the report generator."""
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_SECTION_WORKERS,
+        section_cache: Optional["SectionCache"] = None,
+    ):
+        """
+        Initialize the report generator.
+
+        Args:
+            max_workers: Threads used to build sections (1 = sequential)
+            section_cache: Cache for built sections (module-wide by default)
+        """
+        self._max_workers = max(1, max_workers)
+        self._section_cache = section_cache if section_cache is not None else _section_cache
         self._tax_return_adapter = None
         self._computation_generator = None
         self._draft_generator = None
         self._advisory_service = None
         self._scenario_service = None
         self._pdf_generator = None
+        # Per-thread flag set by builders that fall back after a service failure
+        self._build_state = threading.local()
 
     # =========================================================================
     # LAZY-LOADED ADAPTERS
@@ -486,16 +523,15 @@ class PremiumReportGenerator:
 
         # Get sections for this tier
         allowed_sections = TIER_SECTIONS[tier]
-
-        # Generate all sections
-        sections: List[SectionContent] = []
-        for section in ReportSection:
-            if section in allowed_sections:
-                section_content = self._generate_section(
-                    section, tax_return, session_id
-                )
-                if section_content:
-                    sections.append(section_content)
+        fingerprint = fingerprint_tax_return(tax_return)
+
+        # Generate all sections (cached sections are reused, the rest run concurrently)
+        sections, section_timings, cache_hits = self._build_sections(
+            [section for section in ReportSection if section in allowed_sections],
+            tax_return,
+            session_id,
+            fingerprint,
+        )
 
         # Sort by order
         sections.sort(key=lambda s: SECTION_METADATA.get(s.section_id, {}).get("order", 50))
@@ -503,7 +539,11 @@ class PremiumReportGenerator:
         # Generate action items (Premium only)
         action_items: List[ActionItem] = []
         if tier == ReportTier.PREMIUM:
-            action_items = self._generate_action_items(tax_return, session_id)
+            action_items, elapsed_ms, hit = self._cached_action_items(
+                tax_return, session_id, fingerprint
+            )
+            section_timings["action_item_list"] = elapsed_ms
+            cache_hits += int(hit)
 
         # Create report
         report = GeneratedReport(
@@ -521,6 +561,9 @@ class PremiumReportGenerator:
                 "action_item_count": len(action_items),
                 "tier_sections": [s.value for s in allowed_sections],
                 "brand_name": brand_name,
+                "return_fingerprint": fingerprint,
+                "section_timings_ms": section_timings,
+                "sections_from_cache": cache_hits,
             },
         )
 
@@ -543,6 +586,117 @@ class PremiumReportGenerator:
     # SECTION GENERATORS
     # =========================================================================
 
+    def _build_sections(
+        self,
+        wanted: List[ReportSection],
+        tax_return: "TaxReturn",
+        session_id: str,
+        fingerprint: Optional[str],
+    ) -> Tuple[List[SectionContent], Dict[str, float], int]:
+        """
+        Build the requested sections, reusing cached ones.
+
+        Returns:
+            (sections, per-section build time in ms, number of cache hits)
+        """
+        built: Dict[ReportSection, SectionContent] = {}
+        timings: Dict[str, float] = {}
+        pending: List[ReportSection] = []
+
+        for section in wanted:
+            cached = self._cache_get(session_id, fingerprint, section.value)
+            if cached is not None:
+                built[section] = cached
+                timings[section.value] = 0.0
+            else:
+                pending.append(section)
+
+        hits = len(wanted) - len(pending)
+
+        if pending:
+            # Resolve lazy adapters up front so worker threads don't race on them
+            _ = self.advisory_service, self.scenario_service, self.computation_generator
+
+            if self._max_workers > 1 and len(pending) > 1:
+                workers = min(self._max_workers, len(pending))
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="report-section") as pool:
+                    futures = {
+                        pool.submit(self._timed_section, section, tax_return, session_id): section
+                        for section in pending
+                    }
+                    results = [(futures[f], f.result()) for f in as_completed(futures)]
+            else:
+                results = [
+                    (section, self._timed_section(section, tax_return, session_id))
+                    for section in pending
+                ]
+
+            for section, (content, elapsed_ms, degraded) in results:
+                timings[section.value] = elapsed_ms
+                if content is None:
+                    continue
+                built[section] = content
+                if degraded:
+                    logger.warning(f"Section {section.value} degraded for session {session_id}; not cached")
+                else:
+                    self._cache_set(session_id, fingerprint, section.value, content)
+
+        sections = [built[section] for section in wanted if section in built]
+        return sections, timings, hits
+
+    def _timed_section(
+        self,
+        section: ReportSection,
+        tax_return: "TaxReturn",
+        session_id: str,
+    ) -> Tuple[Optional[SectionContent], float, bool]:
+        """Generate one section; returns (content, build time in ms, degraded)."""
+        self._build_state.degraded = False
+        start = time.perf_counter()
+        content = self._generate_section(section, tax_return, session_id)
+        elapsed_ms = round((time.perf_counter() - start) * 1000, 3)
+        return content, elapsed_ms, self._build_state.degraded
+
+    def _mark_degraded(self) -> None:
+        """
+        Flag the output being built as a fallback after a service failure.
+
+        Degraded sections and action items are returned but never cached,
+        so the next request retries the service. Local builders whose
+        failure is deterministic for a given return don't use this.
+        """
+        self._build_state.degraded = True
+
+    def _cached_action_items(
+        self,
+        tax_return: "TaxReturn",
+        session_id: str,
+        fingerprint: Optional[str],
+    ) -> Tuple[List[ActionItem], float, bool]:
+        """Return (action items, build time in ms, served from cache)."""
+        cached = self._cache_get(session_id, fingerprint, _ACTION_ITEMS_CACHE_PART)
+        if cached is not None:
+            return cached, 0.0, True
+
+        self._build_state.degraded = False
+        start = time.perf_counter()
+        items = self._generate_action_items(tax_return, session_id)
+        elapsed_ms = round((time.perf_counter() - start) * 1000, 3)
+        if not self._build_state.degraded:
+            self._cache_set(session_id, fingerprint, _ACTION_ITEMS_CACHE_PART, items)
+        return items, elapsed_ms, False
+
+    def _cache_get(self, session_id: str, fingerprint: Optional[str], part: str) -> Any:
+        if not fingerprint:
+            return None
+        value = self._section_cache.get((session_id, fingerprint, part))
+        # Hand out copies so callers can't mutate the cached entry
+        return copy.deepcopy(value) if value is not None else None
+
+    def _cache_set(self, session_id: str, fingerprint: Optional[str], part: str, value: Any) -> None:
+        if fingerprint:
+            self._section_cache.set((session_id, fingerprint, part), copy.deepcopy(value))
+
     def _generate_section(
         self,
         section: ReportSection,
@@ -617,6 +771,7 @@ class PremiumReportGenerator:
                 section_id=section,
                 title=title,
                 content=content,
+                html=self._content_to_html(content),
                 order=order,
             )
 
@@ -736,8 +891,10 @@ class PremiumReportGenerator:
                             "recommendations": result.recommendations,
                             "warnings": result.warnings,
                         }
+                    self._mark_degraded()
             except Exception as e:
                 logger.error(f"Credit analysis error: {e}")
+                self._mark_degraded()
 
         return {
             "credits_claimed": [],
@@ -760,8 +917,10 @@ class PremiumReportGenerator:
                             "recommendations": result.recommendations,
                             "warnings": result.warnings,
                         }
+                    self._mark_degraded()
             except Exception as e:
                 logger.error(f"Deduction analysis error: {e}")
+                self._mark_degraded()
 
         return {
             "standard_deduction": 0,
@@ -785,8 +944,10 @@ class PremiumReportGenerator:
                             "recommendations": result.recommendations,
                             "warnings": result.warnings,
                         }
+                    self._mark_degraded()
             except Exception as e:
                 logger.error(f"Filing status error: {e}")
+                self._mark_degraded()
 
         return {
             "current_status": "unknown",
@@ -812,8 +973,10 @@ class PremiumReportGenerator:
                             "recommendations": strategy.recommendations,
                             "warnings": strategy.warnings,
                         }
+                    self._mark_degraded()
             except Exception as e:
                 logger.error(f"Retirement strategy error: {e}")
+                self._mark_degraded()
 
         income = tax_return.income
 
@@ -881,6 +1044,7 @@ class PremiumReportGenerator:
                         "analysis_timestamp": results.get("analysis_timestamp"),
                     }
 
+                self._mark_degraded()
                 return {
                     "baseline": {"tax_liability": tax_return.tax_liability or 0},
                     "scenarios": [],
@@ -888,6 +1052,7 @@ class PremiumReportGenerator:
                 }
             except Exception as e:
                 logger.error(f"Scenario comparison error: {e}")
+                self._mark_degraded()
 
         return {
             "baseline": {"tax_liability": tax_return.tax_liability or 0},
@@ -912,8 +1077,10 @@ class PremiumReportGenerator:
                             "recommendations": result.recommendations,
                             "warnings": result.warnings,
                         }
+                    self._mark_degraded()
             except Exception as e:
                 logger.error(f"Entity structure optimization error: {e}")
+                self._mark_degraded()
 
         income = tax_return.income
         se_income = getattr(income, 'self_employment_income', 0) or 0
@@ -961,9 +1128,12 @@ class PremiumReportGenerator:
                                 "recommendations": result.recommendations,
                                 "warnings": result.warnings,
                             }
-            except Exception:
+                    else:
+                        self._mark_degraded()
+            except Exception as e:
                 # Fall through to deterministic local summary.
-                pass
+                logger.error(f"Investment analysis error: {e}")
+                self._mark_degraded()
 
         income = tax_return.income
 
@@ -1152,8 +1322,11 @@ class PremiumReportGenerator:
                         items.sort(key=lambda x: (x.priority, -x.potential_savings))
                         if items:
                             return items[:10]
+                    else:
+                        self._mark_degraded()
             except Exception as e:
                 logger.error(f"Action item strategy generation error: {e}")
+                self._mark_degraded()
 
         items: List[ActionItem] = []
 
@@ -1261,7 +1434,7 @@ class PremiumReportGenerator:
             <section id="{section.section_id.value}" class="report-section">
                 <h2>{section.title}</h2>
                 <div class="section-content">
-                    {self._content_to_html(section.content)}
+                    {section.html or self._content_to_html(section.content)}
                 </div>
             </section>
             """
@@ -1682,6 +1855,99 @@ class PremiumReportGenerator:
         )
 
 
+# =============================================================================
+# SECTION CACHE
+# =============================================================================
+
+class SectionCache:
+    """
+    Thread-safe LRU cache of built sections with a TTL.
+
+    Keys are (session_id, return fingerprint, section id). A changed return
+    gets a new fingerprint, so stale entries simply age out of the LRU;
+    session and return writes also drop a session's entries through
+    invalidate_report_cache(), since some sections read session state
+    beyond the return itself.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = SECTION_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = SECTION_CACHE_TTL_SECONDS,
+    ):
+        self._entries: "OrderedDict[Tuple[str, str, str], Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_entries = max_entries
+        self._ttl = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple[str, str, str]) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Tuple[str, str, str], value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self._ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_session(self, session_id: str) -> int:
+        with self._lock:
+            keys = [k for k in self._entries if k[0] == session_id]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+_section_cache = SectionCache()
+
+
+def fingerprint_tax_return(tax_return: Any) -> Optional[str]:
+    """
+    Stable hash of a return's data, used as the section cache key.
+
+    Handles core ``TaxReturn`` models and the adapter's ``TaxReturnWrapper``
+    (which wraps a ``DatabaseTaxReturn`` dataclass). Returns None when the
+    return can't be serialized, which disables caching for that request.
+    """
+    source = getattr(tax_return, "_db", tax_return)
+    try:
+        if hasattr(source, "model_dump"):
+            payload = source.model_dump(mode="json")
+        elif dataclasses.is_dataclass(source) and not isinstance(source, type):
+            payload = dataclasses.asdict(source)
+        else:
+            return None
+        blob = json.dumps(payload, sort_keys=True, default=str)
+    except Exception as e:
+        logger.debug(f"Could not fingerprint tax return: {e}")
+        return None
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:32]
+
+
+def invalidate_report_cache(session_id: str) -> int:
+    """Drop every cached report section for a session."""
+    return _section_cache.invalidate_session(session_id)
+
+
 # =============================================================================
 # CONVENIENCE FUNCTIONS
 # =============================================================================
@@ -7,7 +7,7 @@ tax software used by CPAs, EAs, and tax preparers.
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Any, TYPE_CHECKING
+from typing import Callable, Dict, List, Optional, Any, TYPE_CHECKING
 from enum import Enum
 from datetime import datetime
 import json
@@ -16,6 +16,7 @@ import io
 
 if TYPE_CHECKING:
     from models.tax_return import TaxReturn
+    from .batch_export import BatchExportJob
 
 
 class ExportFormat(Enum):
@@ -206,6 +207,29 @@ class ProfessionalExporter:
             results.append(result)
         return results
 
+    def export_batch_to_zip(
+        self,
+        return_ids: List[str],
+        format: ExportFormat,
+        output_dir: str,
+        load_return: Callable[[str], Any],
+        job_id: Optional[str] = None,
+        options: Optional[Dict[str, Any]] = None,
+        **job_options: Any,
+    ) -> "BatchExportJob":
+        """
+        Export many returns in parallel into ZIP archive parts.
+
+        Unlike export_batch, results are written to disk as they complete
+        and the job can be resumed by job_id. See export.batch_export.
+        """
+        from .batch_export import run_batch_export
+
+        return run_batch_export(
+            return_ids, format.value, output_dir, load_return,
+            job_id=job_id, options=options, **job_options,
+        )
+
     def get_supported_formats(self) -> List[Dict[str, Any]]:
         """Get list of supported export formats with details."""
         return [
@@ -14,6 +14,14 @@ from .client import (
     QBBadRequestError,
     get_quickbooks_api_client,
 )
+from .sync import (
+    QuickBooksSyncService,
+    QBCompany,
+    CompanySyncResult,
+    InMemoryCursorStore,
+    ConnectionCursorStore,
+    get_quickbooks_sync_service,
+)
 
 __all__ = [
     "QB_CONFIG",
@@ -24,4 +32,10 @@ __all__ = [
     "QBRateLimitError",
     "QBBadRequestError",
     "get_quickbooks_api_client",
+    "QuickBooksSyncService",
+    "QBCompany",
+    "CompanySyncResult",
+    "InMemoryCursorStore",
+    "ConnectionCursorStore",
+    "get_quickbooks_sync_service",
 ]
@@ -9,6 +9,8 @@ Covered endpoints:
 - Reports: ProfitAndLoss (v4)
 - Query: Account entities
 - Query: JournalEntry entities
+- Query: paged entity queries and COUNT(*) (used by the sync service)
+- ChangeDataCapture: entities changed since a timestamp
 
 Error surface:
 - QBAuthError       -> caller maps to HTTP 401
@@ -19,7 +21,7 @@ Error surface:
 import os
 import json
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 import httpx
 
@@ -71,6 +73,9 @@ def _api_base() -> str:
 _QB_ENTITY_PATH = "/v3/company/{realm_id}"
 _QB_REPORT_PATH = "/v3/company/{realm_id}/reports"   # Reports live under v3 path in QBO
 
+# Largest page QB returns for a query (MAXRESULTS) and per entity from CDC
+QB_MAX_PAGE_SIZE = 1000
+
 
 # ---------------------------------------------------------------------------
 # Client class
@@ -81,7 +86,10 @@ class QuickBooksAPIClient:
     Async QuickBooks Online API client.
 
     Stateless — all methods receive realm_id and access_token per call.
-    A new httpx.AsyncClient is created per request to match project patterns.
+    By default a new httpx.AsyncClient is created per request. Bulk callers
+    (see sync.QuickBooksSyncService) pass a shared keep-alive http_client so
+    requests reuse pooled connections instead of paying a TCP+TLS handshake
+    each; the caller owns and closes that client.
 
     Usage:
         client = QuickBooksAPIClient()
@@ -93,6 +101,50 @@ class QuickBooksAPIClient:
         )
     """
 
+    def __init__(
+        self,
+        http_client: Optional[httpx.AsyncClient] = None,
+        base_url: Optional[str] = None,
+    ):
+        """
+        Args:
+            http_client: Shared client to send every request through
+            base_url:    API base URL override (defaults to _api_base())
+        """
+        self._http_client = http_client
+        self._base_url = base_url
+
+    def _entity_url(self, realm_id: str, suffix: str) -> str:
+        return f"{self._base_url or _api_base()}{_QB_ENTITY_PATH.format(realm_id=realm_id)}{suffix}"
+
+    async def _get(
+        self,
+        operation: str,
+        realm_id: str,
+        url: str,
+        access_token: str,
+        params: Dict[str, Any],
+    ) -> httpx.Response:
+        """GET through the shared client (or a one-off client) and check status."""
+        headers = self._build_headers(access_token)
+        try:
+            if self._http_client is not None:
+                response = await self._http_client.get(url, headers=headers, params=params)
+            else:
+                async with httpx.AsyncClient(
+                    timeout=httpx.Timeout(QB_CONFIG.REQUEST_TIMEOUT_SECONDS, connect=10.0)
+                ) as client:
+                    response = await client.get(url, headers=headers, params=params)
+        except httpx.TimeoutException as exc:
+            logger.error("QB %s timed out: realm=%s", operation, realm_id)
+            raise QBAPIError("QB API request timed out") from exc
+        except httpx.ConnectError as exc:
+            logger.error("QB %s connection error: %s", operation, exc)
+            raise QBAPIError("Cannot connect to QuickBooks API") from exc
+
+        self._raise_for_status(response)
+        return response
+
     def _build_headers(self, access_token: str) -> Dict[str, str]:
         """Build standard QB API request headers."""
         return {
@@ -190,7 +242,7 @@ class QuickBooksAPIClient:
             QBAPIError:         Any other QB API fault
         """
         url = (
-            f"{_api_base()}"
+            f"{self._base_url or _api_base()}"
             f"{_QB_REPORT_PATH.format(realm_id=realm_id)}"
             "/ProfitAndLoss"
         )
@@ -205,23 +257,9 @@ class QuickBooksAPIClient:
             realm_id, start_date, end_date,
         )
 
-        try:
-            async with httpx.AsyncClient(
-                timeout=httpx.Timeout(QB_CONFIG.REQUEST_TIMEOUT_SECONDS, connect=10.0)
-            ) as client:
-                response = await client.get(
-                    url,
-                    headers=self._build_headers(access_token),
-                    params=params,
-                )
-        except httpx.TimeoutException as exc:
-            logger.error("QB get_profit_loss_report timed out: realm=%s", realm_id)
-            raise QBAPIError("QB API request timed out") from exc
-        except httpx.ConnectError as exc:
-            logger.error("QB get_profit_loss_report connection error: %s", exc)
-            raise QBAPIError("Cannot connect to QuickBooks API") from exc
-
-        self._raise_for_status(response)
+        response = await self._get(
+            "get_profit_loss_report", realm_id, url, access_token, params
+        )
         logger.info("QB get_profit_loss_report success: realm=%s", realm_id)
         return response.json()
 
@@ -255,11 +293,7 @@ class QuickBooksAPIClient:
         Raises:
             QBAuthError, QBRateLimitError, QBBadRequestError, QBAPIError
         """
-        url = (
-            f"{_api_base()}"
-            f"{_QB_ENTITY_PATH.format(realm_id=realm_id)}"
-            "/query"
-        )
+        url = self._entity_url(realm_id, "/query")
 
         if account_type:
             sql = (
@@ -274,23 +308,10 @@ class QuickBooksAPIClient:
             realm_id, account_type or "all",
         )
 
-        try:
-            async with httpx.AsyncClient(
-                timeout=httpx.Timeout(QB_CONFIG.REQUEST_TIMEOUT_SECONDS, connect=10.0)
-            ) as client:
-                response = await client.get(
-                    url,
-                    headers=self._build_headers(access_token),
-                    params={"query": sql, "minorversion": "65"},
-                )
-        except httpx.TimeoutException as exc:
-            logger.error("QB get_accounts timed out: realm=%s", realm_id)
-            raise QBAPIError("QB API request timed out") from exc
-        except httpx.ConnectError as exc:
-            logger.error("QB get_accounts connection error: %s", exc)
-            raise QBAPIError("Cannot connect to QuickBooks API") from exc
-
-        self._raise_for_status(response)
+        response = await self._get(
+            "get_accounts", realm_id, url, access_token,
+            {"query": sql, "minorversion": QB_CONFIG.QB_ENTITY_MINOR_VERSION},
+        )
 
         body = response.json()
         raw_accounts = (
@@ -346,11 +367,7 @@ class QuickBooksAPIClient:
         Raises:
             QBAuthError, QBRateLimitError, QBBadRequestError, QBAPIError
         """
-        url = (
-            f"{_api_base()}"
-            f"{_QB_ENTITY_PATH.format(realm_id=realm_id)}"
-            "/query"
-        )
+        url = self._entity_url(realm_id, "/query")
 
         sql = (
             f"SELECT * FROM JournalEntry "
@@ -363,23 +380,10 @@ class QuickBooksAPIClient:
             realm_id, start_date, end_date,
         )
 
-        try:
-            async with httpx.AsyncClient(
-                timeout=httpx.Timeout(QB_CONFIG.REQUEST_TIMEOUT_SECONDS, connect=10.0)
-            ) as client:
-                response = await client.get(
-                    url,
-                    headers=self._build_headers(access_token),
-                    params={"query": sql, "minorversion": "65"},
-                )
-        except httpx.TimeoutException as exc:
-            logger.error("QB get_journal_entries timed out: realm=%s", realm_id)
-            raise QBAPIError("QB API request timed out") from exc
-        except httpx.ConnectError as exc:
-            logger.error("QB get_journal_entries connection error: %s", exc)
-            raise QBAPIError("Cannot connect to QuickBooks API") from exc
-
-        self._raise_for_status(response)
+        response = await self._get(
+            "get_journal_entries", realm_id, url, access_token,
+            {"query": sql, "minorversion": QB_CONFIG.QB_ENTITY_MINOR_VERSION},
+        )
 
         body = response.json()
         raw_entries = (
@@ -394,6 +398,110 @@ class QuickBooksAPIClient:
         )
         return [self._normalize_journal_entry(je) for je in raw_entries]
 
+    async def query_entities(
+        self,
+        realm_id: str,
+        access_token: str,
+        entity: str,
+        where: str = "",
+        start_position: int = 1,
+        max_results: int = QB_MAX_PAGE_SIZE,
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch one page of raw entities with the QB query language.
+
+        Args:
+            realm_id:       QB Company ID
+            access_token:   Decrypted Bearer token
+            entity:         QB entity name, e.g. "JournalEntry"
+            where:          Optional WHERE clause body (without "WHERE")
+            start_position: 1-based offset of the page
+            max_results:    Page size (QB caps this at 1000)
+
+        Returns:
+            Raw entity dicts for the page (empty past the last page).
+
+        Raises:
+            QBAuthError, QBRateLimitError, QBBadRequestError, QBAPIError
+        """
+        sql = f"SELECT * FROM {entity}"
+        if where:
+            sql += f" WHERE {where}"
+        sql += f" ORDERBY Id STARTPOSITION {start_position} MAXRESULTS {min(max_results, QB_MAX_PAGE_SIZE)}"
+
+        response = await self._get(
+            "query_entities", realm_id, self._entity_url(realm_id, "/query"), access_token,
+            {"query": sql, "minorversion": QB_CONFIG.QB_ENTITY_MINOR_VERSION},
+        )
+        return response.json().get("QueryResponse", {}).get(entity, [])
+
+    async def count_entities(
+        self,
+        realm_id: str,
+        access_token: str,
+        entity: str,
+        where: str = "",
+    ) -> int:
+        """
+        Count entities matching an optional WHERE clause (SELECT COUNT(*)).
+
+        Raises:
+            QBAuthError, QBRateLimitError, QBBadRequestError, QBAPIError
+        """
+        sql = f"SELECT COUNT(*) FROM {entity}"
+        if where:
+            sql += f" WHERE {where}"
+
+        response = await self._get(
+            "count_entities", realm_id, self._entity_url(realm_id, "/query"), access_token,
+            {"query": sql, "minorversion": QB_CONFIG.QB_ENTITY_MINOR_VERSION},
+        )
+        return int(response.json().get("QueryResponse", {}).get("totalCount", 0))
+
+    async def get_changes(
+        self,
+        realm_id: str,
+        access_token: str,
+        entities: Iterable[str],
+        changed_since: str,
+    ) -> Tuple[Dict[str, List[Dict[str, Any]]], Optional[str]]:
+        """
+        Fetch entities created, updated or deleted since a timestamp (CDC).
+
+        QB only looks back 30 days and returns at most 1000 objects per
+        entity; deleted objects carry status "Deleted" and just an Id.
+
+        Args:
+            realm_id:      QB Company ID
+            access_token:  Decrypted Bearer token
+            entities:      Entity names, e.g. ["JournalEntry", "Account"]
+            changed_since: ISO-8601 timestamp
+
+        Returns:
+            (raw entities keyed by entity name, server time of the response)
+            The server time is the cursor for the next call.
+
+        Raises:
+            QBAuthError, QBRateLimitError, QBBadRequestError, QBAPIError
+        """
+        entities = list(entities)
+        response = await self._get(
+            "get_changes", realm_id, self._entity_url(realm_id, "/cdc"), access_token,
+            {
+                "entities": ",".join(entities),
+                "changedSince": changed_since,
+                "minorversion": QB_CONFIG.QB_ENTITY_MINOR_VERSION,
+            },
+        )
+        body = response.json()
+
+        changes: Dict[str, List[Dict[str, Any]]] = {entity: [] for entity in entities}
+        for cdc in body.get("CDCResponse", []):
+            for query_response in cdc.get("QueryResponse", []):
+                for entity in entities:
+                    changes[entity].extend(query_response.get(entity, []))
+        return changes, body.get("time")
+
     # -----------------------------------------------------------------------
     # Normalizers — shape raw QB JSON into stable internal dicts
     # -----------------------------------------------------------------------
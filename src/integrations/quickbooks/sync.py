@@ -0,0 +1,521 @@
+"""
+QuickBooks Online multi-company sync.
+
+Pulls JournalEntry and Account data for many connected companies through
+one pooled, keep-alive httpx client:
+
+- Companies sync concurrently (QB_SYNC_CONCURRENCY at a time).
+- Each realm gets one limiter, shared by every sync of that realm on
+  the service, that respects QuickBooks throttles (concurrent requests
+  and requests per minute per realm); 429s are retried with exponential
+  back-off.
+- Full pulls count matching rows first, then fetch all pages
+  concurrently instead of one page after another.
+- After a successful pull the company's cursor (server time of the
+  pull) is stored per entity; the next run asks the ChangeDataCapture
+  endpoint only for what changed since. Cursors older than the CDC
+  look-back window, or CDC responses that hit QB's 1000-object cap,
+  fall back to a paged LastUpdatedTime query (deletes in the capped
+  response are delivered first; a query cannot return them).
+
+Records are handed to an optional async sink as they arrive rather than
+being accumulated in memory.
+
+Usage:
+    service = QuickBooksSyncService(cursor_store=ConnectionCursorStore())
+    results = await service.sync_companies(companies, sink=store_records)
+    await service.aclose()
+
+Configuration:
+    QB_SYNC_CONCURRENCY: Companies synced at once (default: 20)
+    QB_SYNC_MAX_CONNECTIONS: Pooled HTTP connections (default: 50)
+    QB_REALM_MAX_CONCURRENT: In-flight requests per realm (default: 4; QB allows 10)
+    QB_REALM_REQUESTS_PER_MINUTE: Requests per realm per minute (default: 450; QB allows 500)
+"""
+
+import asyncio
+import logging
+import math
+import os
+import time
+import weakref
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Protocol, Tuple
+
+import httpx
+
+from .client import (
+    QB_MAX_PAGE_SIZE,
+    QBAPIError,
+    QBAuthError,
+    QBRateLimitError,
+    QuickBooksAPIClient,
+)
+from .config import QB_CONFIG
+
+logger = logging.getLogger(__name__)
+
+QB_SYNC_CONCURRENCY = int(os.environ.get("QB_SYNC_CONCURRENCY", "20"))
+QB_SYNC_MAX_CONNECTIONS = int(os.environ.get("QB_SYNC_MAX_CONNECTIONS", "50"))
+QB_REALM_MAX_CONCURRENT = int(os.environ.get("QB_REALM_MAX_CONCURRENT", "4"))
+QB_REALM_REQUESTS_PER_MINUTE = int(os.environ.get("QB_REALM_REQUESTS_PER_MINUTE", "450"))
+
+# QB ChangeDataCapture only looks back this far
+CDC_MAX_LOOKBACK = timedelta(days=30)
+
+# Cursor is taken slightly before the pull starts so clock skew can't skip changes
+CURSOR_SKEW = timedelta(seconds=60)
+
+SYNC_ENTITIES = ("JournalEntry", "Account")
+
+_NORMALIZERS = {
+    "JournalEntry": QuickBooksAPIClient._normalize_journal_entry,
+    "Account": QuickBooksAPIClient._normalize_account,
+}
+
+
+@dataclass
+class QBCompany:
+    """A connected QuickBooks company to sync."""
+    realm_id: str
+    access_token: str
+    connection_id: Optional[str] = None
+
+    @property
+    def key(self) -> str:
+        """Cursor key: the connection when known, else the realm."""
+        return self.connection_id or self.realm_id
+
+
+@dataclass
+class CompanySyncResult:
+    """Outcome of syncing one company."""
+    realm_id: str
+    mode: Dict[str, str] = field(default_factory=dict)       # entity -> "full" | "cdc" | "incremental"
+    upserted: Dict[str, int] = field(default_factory=dict)   # entity -> records delivered
+    deleted: Dict[str, int] = field(default_factory=dict)    # entity -> deleted ids delivered
+    requests: int = 0
+    retries: int = 0
+    duration_ms: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def success(self) -> bool:
+        return self.error is None
+
+
+# sink(company, entity, upserted_records, deleted_ids)
+RecordSink = Callable[[QBCompany, str, List[Dict[str, Any]], List[str]], Awaitable[None]]
+
+
+class SyncCursorStore(Protocol):
+    """Where per-company, per-entity sync cursors live."""
+
+    async def get(self, company: QBCompany, entity: str) -> Optional[str]:
+        ...
+
+    async def set(self, company: QBCompany, entity: str, cursor: str) -> None:
+        ...
+
+
+class InMemoryCursorStore:
+    """Process-local cursor store (tests, one-off syncs)."""
+
+    def __init__(self):
+        self._cursors: Dict[Tuple[str, str], str] = {}
+
+    async def get(self, company: QBCompany, entity: str) -> Optional[str]:
+        return self._cursors.get((company.key, entity))
+
+    async def set(self, company: QBCompany, entity: str, cursor: str) -> None:
+        self._cursors[(company.key, entity)] = cursor
+
+
+class ConnectionCursorStore:
+    """
+    Cursors kept on QuickBooksConnectionRecord.synced_data_types.
+
+    Stored as {"JournalEntry": {"cursor": "<iso>", "synced_at": "<iso>"}, ...}.
+    Requires companies to carry their connection_id.
+    """
+
+    def __init__(self, session_factory: Optional[Callable[[], Any]] = None):
+        self._session_factory = session_factory
+
+    def _sessions(self):
+        if self._session_factory is None:
+            from database import get_async_session_factory
+            self._session_factory = get_async_session_factory()
+        return self._session_factory()
+
+    async def _load(self, session, company: QBCompany):
+        from uuid import UUID
+
+        from sqlalchemy import select
+
+        from database import QuickBooksConnectionRecord
+
+        if not company.connection_id:
+            return None
+        result = await session.execute(
+            select(QuickBooksConnectionRecord).where(
+                QuickBooksConnectionRecord.connection_id == UUID(str(company.connection_id))
+            )
+        )
+        return result.scalar_one_or_none()
+
+    async def get(self, company: QBCompany, entity: str) -> Optional[str]:
+        async with self._sessions() as session:
+            record = await self._load(session, company)
+            if record is None:
+                return None
+            return (record.synced_data_types or {}).get(entity, {}).get("cursor")
+
+    async def set(self, company: QBCompany, entity: str, cursor: str) -> None:
+        async with self._sessions() as session:
+            record = await self._load(session, company)
+            if record is None:
+                logger.warning("QB sync: no connection record for %s, cursor not saved", company.key)
+                return
+            synced = dict(record.synced_data_types or {})
+            synced[entity] = {"cursor": cursor, "synced_at": datetime.now(timezone.utc).isoformat()}
+            record.synced_data_types = synced  # reassign so the JSON change is flushed
+            await session.commit()
+
+
+class _RealmLimiter:
+    """Per-realm throttle: bounded concurrency plus a minimum spacing between requests."""
+
+    def __init__(self, max_concurrent: int, requests_per_minute: int):
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrent))
+        self._interval = 60.0 / max(1, requests_per_minute)
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        await self._semaphore.acquire()
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self._interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return self
+
+    async def __aexit__(self, *exc):
+        self._semaphore.release()
+
+
+class _LoopResources:
+    """Pooled client and realm limiters for one event loop (neither can cross loops)."""
+
+    def __init__(self, http: httpx.AsyncClient, api: QuickBooksAPIClient):
+        self.http = http
+        self.api = api
+        self.limiters: Dict[str, _RealmLimiter] = {}
+
+
+class QuickBooksSyncService:
+    """
+    Syncs many QuickBooks companies over one pooled HTTP client.
+
+    The pooled httpx.AsyncClient and the per-realm limiters are created
+    on first use in each event loop, so the shared service also works
+    from callers that run a fresh loop per job (e.g. asyncio.run in a
+    Celery task). Call aclose() from the loop when done with it.
+    """
+
+    def __init__(
+        self,
+        cursor_store: Optional[SyncCursorStore] = None,
+        base_url: Optional[str] = None,
+        concurrency: int = QB_SYNC_CONCURRENCY,
+        max_connections: int = QB_SYNC_MAX_CONNECTIONS,
+        realm_max_concurrent: int = QB_REALM_MAX_CONCURRENT,
+        realm_requests_per_minute: int = QB_REALM_REQUESTS_PER_MINUTE,
+        max_retries: int = QB_CONFIG.MAX_RETRIES,
+        retry_delay: float = QB_CONFIG.RETRY_DELAY_SECONDS,
+        start_date: Optional[str] = None,
+    ):
+        """
+        Args:
+            cursor_store:   Per-company cursor storage (in-memory by default)
+            base_url:       API base URL override (e.g. a local stub server)
+            concurrency:    Companies synced at once
+            max_connections: Pooled HTTP connections shared by all companies
+            realm_max_concurrent: In-flight requests per realm
+            realm_requests_per_minute: Request rate per realm
+            max_retries:    Retries after a 429 before giving up on a request
+            retry_delay:    Initial back-off in seconds (doubles per retry)
+            start_date:     Only pull journal entries with TxnDate on/after this ISO date
+        """
+        self.cursor_store = cursor_store or InMemoryCursorStore()
+        self.base_url = base_url
+        self.concurrency = max(1, concurrency)
+        self.max_connections = max(1, max_connections)
+        self.realm_max_concurrent = realm_max_concurrent
+        self.realm_requests_per_minute = realm_requests_per_minute
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.start_date = start_date
+
+        self._resources: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopResources]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _loop_resources(self) -> _LoopResources:
+        loop = asyncio.get_running_loop()
+        resources = self._resources.get(loop)
+        if resources is None:
+            http = httpx.AsyncClient(
+                timeout=httpx.Timeout(QB_CONFIG.REQUEST_TIMEOUT_SECONDS, connect=10.0),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+            resources = _LoopResources(http, QuickBooksAPIClient(http_client=http, base_url=self.base_url))
+            self._resources[loop] = resources
+        return resources
+
+    @property
+    def api(self) -> QuickBooksAPIClient:
+        """API client sharing the running loop's keep-alive connection pool."""
+        return self._loop_resources().api
+
+    def _limiter(self, realm_id: str) -> _RealmLimiter:
+        """The realm's limiter, shared by every concurrent sync of that realm."""
+        limiters = self._loop_resources().limiters
+        limiter = limiters.get(realm_id)
+        if limiter is None:
+            limiter = limiters[realm_id] = _RealmLimiter(
+                self.realm_max_concurrent, self.realm_requests_per_minute
+            )
+        return limiter
+
+    async def aclose(self) -> None:
+        """Close the running loop's pooled connections."""
+        resources = self._resources.pop(asyncio.get_running_loop(), None)
+        if resources is not None:
+            await resources.http.aclose()
+
+    # -----------------------------------------------------------------------
+    # Public API
+    # -----------------------------------------------------------------------
+
+    async def sync_companies(
+        self,
+        companies: List[QBCompany],
+        sink: Optional[RecordSink] = None,
+    ) -> List[CompanySyncResult]:
+        """
+        Sync every company, at most `concurrency` at a time.
+
+        Returns:
+            One CompanySyncResult per company, in input order. Failures
+            (auth, exhausted retries) are reported per company.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run(company: QBCompany) -> CompanySyncResult:
+            async with semaphore:
+                return await self.sync_company(company, sink)
+
+        return list(await asyncio.gather(*(run(company) for company in companies)))
+
+    async def sync_company(
+        self,
+        company: QBCompany,
+        sink: Optional[RecordSink] = None,
+    ) -> CompanySyncResult:
+        """Sync one company's entities; incremental when a usable cursor exists."""
+        result = CompanySyncResult(realm_id=company.realm_id)
+        limiter = self._limiter(company.realm_id)
+        started = time.perf_counter()
+        try:
+            cursors = {entity: await self.cursor_store.get(company, entity) for entity in SYNC_ENTITIES}
+            next_cursor = (datetime.now(timezone.utc) - CURSOR_SKEW).isoformat()
+
+            cdc_entities = [e for e, cursor in cursors.items() if self._cdc_usable(cursor)]
+            full_entities = [e for e in SYNC_ENTITIES if e not in cdc_entities]
+
+            tasks = [self._pull_full(company, entity, limiter, result, sink) for entity in full_entities]
+            if cdc_entities:
+                tasks.append(self._pull_changes(company, cdc_entities, cursors, limiter, result, sink))
+            outcomes = await asyncio.gather(*tasks)
+
+            server_cursor = next((c for c in outcomes if isinstance(c, str)), None)
+            for entity in full_entities:
+                await self.cursor_store.set(company, entity, next_cursor)
+            for entity in cdc_entities:
+                await self.cursor_store.set(company, entity, server_cursor or next_cursor)
+
+        except QBAuthError as exc:
+            result.error = f"auth: {exc}"
+        except QBAPIError as exc:
+            result.error = str(exc)
+        except Exception as exc:
+            logger.exception("QB sync failed for realm %s", company.realm_id)
+            result.error = str(exc)
+
+        result.duration_ms = (time.perf_counter() - started) * 1000
+        if result.error:
+            logger.warning("QB sync failed: realm=%s error=%s", company.realm_id, result.error)
+        else:
+            logger.info(
+                "QB sync complete: realm=%s mode=%s upserted=%s deleted=%s requests=%d",
+                company.realm_id, result.mode, result.upserted, result.deleted, result.requests,
+            )
+        return result
+
+    # -----------------------------------------------------------------------
+    # Pulls
+    # -----------------------------------------------------------------------
+
+    @staticmethod
+    def _cdc_usable(cursor: Optional[str]) -> bool:
+        if not cursor:
+            return False
+        try:
+            since = datetime.fromisoformat(cursor)
+        except ValueError:
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return datetime.now(timezone.utc) - since < CDC_MAX_LOOKBACK
+
+    def _base_filter(self, entity: str) -> str:
+        if entity == "JournalEntry" and self.start_date:
+            return f"TxnDate >= '{self.start_date}'"
+        return ""
+
+    async def _call(self, limiter: _RealmLimiter, result: CompanySyncResult, fn, *args):
+        """One throttled API call, retrying 429s with exponential back-off."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with limiter:
+                    result.requests += 1
+                    return await fn(*args)
+            except QBRateLimitError:
+                if attempt == self.max_retries:
+                    raise
+                result.retries += 1
+                await asyncio.sleep(self.retry_delay * (2 ** attempt))
+
+    async def _deliver(
+        self,
+        company: QBCompany,
+        entity: str,
+        raw: List[Dict[str, Any]],
+        result: CompanySyncResult,
+        sink: Optional[RecordSink],
+    ) -> None:
+        normalize = _NORMALIZERS[entity]
+        upserts = [normalize(r) for r in raw if r.get("status") != "Deleted"]
+        deleted = [r.get("Id", "") for r in raw if r.get("status") == "Deleted"]
+        if entity == "JournalEntry" and self.start_date:
+            upserts = [r for r in upserts if r["txn_date"] >= self.start_date]
+        result.upserted[entity] = result.upserted.get(entity, 0) + len(upserts)
+        result.deleted[entity] = result.deleted.get(entity, 0) + len(deleted)
+        if sink is not None and (upserts or deleted):
+            await sink(company, entity, upserts, deleted)
+
+    async def _pull_pages(
+        self,
+        company: QBCompany,
+        entity: str,
+        where: str,
+        limiter: _RealmLimiter,
+        result: CompanySyncResult,
+        sink: Optional[RecordSink],
+    ) -> None:
+        """Fetch every page of a query, pages in parallel once the count is known."""
+        api = self.api
+        count_task = asyncio.ensure_future(
+            self._call(limiter, result, api.count_entities, company.realm_id, company.access_token, entity, where)
+        )
+        first = await self._call(
+            limiter, result, api.query_entities, company.realm_id, company.access_token, entity, where, 1
+        )
+        total = await count_task
+        await self._deliver(company, entity, first, result, sink)
+        if len(first) < QB_MAX_PAGE_SIZE:
+            return
+
+        async def page(start_position: int) -> None:
+            raw = await self._call(
+                limiter, result, api.query_entities,
+                company.realm_id, company.access_token, entity, where, start_position,
+            )
+            await self._deliver(company, entity, raw, result, sink)
+
+        # Rows added after COUNT(*) land past the counted pages; the cursor
+        # predates this pull, so the next CDC run picks them up.
+        pages = math.ceil(total / QB_MAX_PAGE_SIZE)
+        await asyncio.gather(*(page(1 + i * QB_MAX_PAGE_SIZE) for i in range(1, pages)))
+
+    async def _pull_full(
+        self,
+        company: QBCompany,
+        entity: str,
+        limiter: _RealmLimiter,
+        result: CompanySyncResult,
+        sink: Optional[RecordSink],
+    ) -> None:
+        result.mode[entity] = "full"
+        await self._pull_pages(company, entity, self._base_filter(entity), limiter, result, sink)
+
+    async def _pull_changes(
+        self,
+        company: QBCompany,
+        entities: List[str],
+        cursors: Dict[str, Optional[str]],
+        limiter: _RealmLimiter,
+        result: CompanySyncResult,
+        sink: Optional[RecordSink],
+    ) -> Optional[str]:
+        """CDC pull from the oldest cursor; returns the server time as the next cursor."""
+        since = min(cursors[entity] for entity in entities)
+        changes, server_time = await self._call(
+            limiter, result, self.api.get_changes, company.realm_id, company.access_token, entities, since
+        )
+
+        for entity in entities:
+            raw = changes.get(entity, [])
+            if len(raw) >= QB_MAX_PAGE_SIZE:
+                # CDC truncates at 1000 objects: page through everything updated since the
+                # cursor. Queries never return deleted objects, so deliver the deletes CDC
+                # did return before paging.
+                result.mode[entity] = "incremental"
+                deletes = [r for r in raw if r.get("status") == "Deleted"]
+                await self._deliver(company, entity, deletes, result, sink)
+                logger.warning(
+                    "QB sync: CDC response for realm=%s entity=%s hit the %d-object cap; "
+                    "deletes beyond it are not reported",
+                    company.realm_id, entity, QB_MAX_PAGE_SIZE,
+                )
+                where = f"MetaData.LastUpdatedTime >= '{since}'"
+                base = self._base_filter(entity)
+                await self._pull_pages(
+                    company, entity, f"{base} AND {where}" if base else where, limiter, result, sink
+                )
+            else:
+                result.mode[entity] = "cdc"
+                await self._deliver(company, entity, raw, result, sink)
+        return server_time
+
+
+# ---------------------------------------------------------------------------
+# Module-level singleton factory (matches get_quickbooks_api_client())
+# ---------------------------------------------------------------------------
+
+_sync_service: Optional[QuickBooksSyncService] = None
+
+
+def get_quickbooks_sync_service() -> QuickBooksSyncService:
+    """Return the shared QuickBooksSyncService (cursors on connection records)."""
+    global _sync_service
+    if _sync_service is None:
+        _sync_service = QuickBooksSyncService(cursor_store=ConnectionCursorStore())
+    return _sync_service
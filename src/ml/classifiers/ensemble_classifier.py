@@ -8,6 +8,8 @@ import logging
 import time
 from typing import List, Optional, Dict, Any
 
+import numpy as np
+
 from .base import BaseClassifier, ClassificationResult, DOCUMENT_TYPES
 from .openai_classifier import OpenAIClassifier
 from .tfidf_classifier import TFIDFClassifier
@@ -16,6 +18,15 @@ from ..settings import get_ml_settings
 
 logger = logging.getLogger(__name__)
 
+# Voting weight per classifier
+CLASSIFIER_WEIGHTS: Dict[str, float] = {
+    "openai": 1.0,      # Highest weight for LLM
+    "tfidf": 0.7,       # Medium weight for ML
+    "regex": 0.5,       # Lower weight for regex
+}
+
+_TYPE_INDEX = {dt: i for i, dt in enumerate(DOCUMENT_TYPES)}
+
 
 class EnsembleClassifier(BaseClassifier):
     """
@@ -188,60 +199,161 @@ class EnsembleClassifier(BaseClassifier):
             )
 
         # Multiple results - use weighted voting
-        votes: Dict[str, float] = {dt: 0.0 for dt in DOCUMENT_TYPES}
-        total_weight = 0.0
+        return self._vote([results])[0]
 
-        classifier_weights = {
-            "openai": 1.0,      # Highest weight for LLM
-            "tfidf": 0.7,       # Medium weight for ML
-            "regex": 0.5,       # Lower weight for regex
-        }
+    def _vote(self, batch: List[List[ClassificationResult]]) -> List[ClassificationResult]:
+        """
+        Weighted voting over many documents at once.
 
-        for result in results:
-            weight = classifier_weights.get(result.classifier_used, 0.5)
-            weighted_confidence = result.confidence * weight
-            votes[result.document_type] += weighted_confidence
-            total_weight += weight
+        Each row of the vote matrix is one document; each classifier result
+        adds confidence * weight to its document type's column.
+
+        Args:
+            batch: Per-document lists of classifier results (two or more each).
+
+        Returns:
+            One aggregated ClassificationResult per document.
+        """
+        votes = np.zeros((len(batch), len(DOCUMENT_TYPES)))
+        total_weight = np.zeros(len(batch))
+
+        for row, results in enumerate(batch):
+            for result in results:
+                weight = CLASSIFIER_WEIGHTS.get(result.classifier_used, 0.5)
+                votes[row, _TYPE_INDEX[result.document_type]] += result.confidence * weight
+                total_weight[row] += weight
 
         # Normalize votes
-        if total_weight > 0:
-            votes = {k: v / total_weight for k, v in votes.items()}
-
-        # Find winner
-        winner = max(votes.keys(), key=lambda k: votes[k])
-        confidence = votes[winner]
-
-        # Build probability distribution
-        total_votes = sum(votes.values())
-        if total_votes > 0:
-            probabilities = {k: v / total_votes for k, v in votes.items()}
-        else:
-            probabilities = votes
-
-        return ClassificationResult(
-            document_type=winner,
-            confidence=confidence,
-            probabilities=probabilities,
-            classifier_used=self.name,
-            metadata={
-                "voting_method": "weighted",
-                "classifiers_used": [r.classifier_used for r in results],
-                "votes": votes,
-                "all_results": [r.to_dict() for r in results],
-            },
-        )
+        has_weight = total_weight > 0
+        votes[has_weight] /= total_weight[has_weight, None]
+
+        # Find winners (argmax keeps the first type on ties, like max() over the dict)
+        winners = votes.argmax(axis=1)
+        total_votes = votes.sum(axis=1)
+
+        # Build probability distributions
+        probabilities = votes.copy()
+        has_votes = total_votes > 0
+        probabilities[has_votes] /= total_votes[has_votes, None]
+
+        aggregated = []
+        for row, results in enumerate(batch):
+            row_votes = dict(zip(DOCUMENT_TYPES, votes[row].tolist()))
+            winner = DOCUMENT_TYPES[winners[row]]
+            aggregated.append(ClassificationResult(
+                document_type=winner,
+                confidence=row_votes[winner],
+                probabilities=dict(zip(DOCUMENT_TYPES, probabilities[row].tolist())),
+                classifier_used=self.name,
+                metadata={
+                    "voting_method": "weighted",
+                    "classifiers_used": [r.classifier_used for r in results],
+                    "votes": row_votes,
+                    "all_results": [r.to_dict() for r in results],
+                },
+            ))
+        return aggregated
 
     def classify_batch(self, texts: List[str]) -> List[ClassificationResult]:
         """
         Classify multiple documents.
 
+        Runs the same cascade as classify(), but stage by stage: each
+        classifier sees every document that is still below the high
+        confidence threshold in one classify_batch() call, and the final
+        weighted vote is computed over the whole batch.
+
         Args:
             texts: List of document text contents.
 
         Returns:
             List of ClassificationResult objects.
         """
-        return [self.classify(text) for text in texts]
+        if not texts:
+            return []
+
+        start_time = time.time()
+        per_doc: List[List[ClassificationResult]] = [[] for _ in texts]
+        active = [i for i, text in enumerate(texts) if text]
+
+        for classifier in self.classifiers:
+            if not active:
+                break
+
+            stage = self._run_stage(classifier, [texts[i] for i in active])
+
+            still_active = []
+            for i, result in zip(active, stage):
+                if result is None:
+                    # Classifier failed for this document; try the next one
+                    still_active.append(i)
+                    continue
+                per_doc[i].append(result)
+                if result.confidence < self.settings.high_confidence_threshold:
+                    still_active.append(i)
+            active = still_active
+
+        per_doc_ms = self._measure_time(start_time) // len(texts)
+
+        final: List[Optional[ClassificationResult]] = [None] * len(texts)
+        voting_rows = []
+        for i, results in enumerate(per_doc):
+            if not texts[i]:
+                final[i] = ClassificationResult(
+                    document_type="unknown",
+                    confidence=0.0,
+                    classifier_used=self.name,
+                    metadata={"reason": "empty_text"},
+                )
+            elif not results:
+                final[i] = ClassificationResult(
+                    document_type="unknown",
+                    confidence=0.0,
+                    classifier_used=self.name,
+                    metadata={"reason": "all_classifiers_failed"},
+                )
+            elif len(results) == 1:
+                final[i] = self._aggregate_results(results, results[0])
+            else:
+                voting_rows.append(i)
+
+        if voting_rows:
+            for i, result in zip(voting_rows, self._vote([per_doc[i] for i in voting_rows])):
+                final[i] = result
+
+        for result in final:
+            result.processing_time_ms = per_doc_ms
+        return final
+
+    def _run_stage(
+        self, classifier: BaseClassifier, texts: List[str]
+    ) -> List[Optional[ClassificationResult]]:
+        """
+        Run one classifier over a batch.
+
+        Results line up with texts. Items the batch call did not return
+        (a short list, a None entry, or every item if the call raised) are
+        retried one document at a time; a document that still fails gets
+        None, as in classify().
+        """
+        results: List[Optional[ClassificationResult]] = [None] * len(texts)
+        try:
+            batch = classifier.classify_batch(texts)
+            if len(batch) != len(texts):
+                logger.warning(f"Classifier {classifier.name} returned {len(batch)} results for {len(texts)} texts")
+            for i, result in enumerate(batch[:len(texts)]):
+                results[i] = result
+        except Exception as e:
+            logger.warning(f"Classifier {classifier.name} batch failed, retrying per document: {e}")
+
+        for i, text in enumerate(texts):
+            if results[i] is not None:
+                continue
+            try:
+                results[i] = classifier.classify(text)
+            except Exception as e:
+                logger.warning(f"Classifier {classifier.name} failed: {e}")
+        return results
 
     def get_available_classifiers(self) -> List[str]:
         """Get list of available classifier names in the chain."""
@@ -7,7 +7,7 @@ Provides a fast, reliable fallback when ML classifiers are unavailable.
 
 import re
 import time
-from typing import Dict, List
+from typing import Dict, List, Optional, Pattern, Tuple
 
 from .base import BaseClassifier, ClassificationResult, DOCUMENT_TYPES
 
@@ -208,6 +208,50 @@ class RegexClassifier(BaseClassifier):
         ],
     }
 
+    # Compiled form of DOCUMENT_INDICATORS, built once per class:
+    # doc_type -> (combined alternation of all its patterns, [(pattern, compiled)])
+    _compiled_indicators: Optional[Dict[str, Tuple[Pattern, List[Tuple[str, Pattern]]]]] = None
+
+    @classmethod
+    def _get_compiled_indicators(cls) -> Dict[str, Tuple[Pattern, List[Tuple[str, Pattern]]]]:
+        """Compile indicator patterns on first use."""
+        compiled = cls.__dict__.get("_compiled_indicators")
+        if compiled is None:
+            compiled = {
+                doc_type: (
+                    re.compile("|".join(f"(?:{p})" for p in patterns)),
+                    [(p, re.compile(p)) for p in patterns],
+                )
+                for doc_type, patterns in cls.DOCUMENT_INDICATORS.items()
+            }
+            cls._compiled_indicators = compiled
+        return compiled
+
+    def _score_types(self, text_lower: str) -> Dict[str, Dict]:
+        """
+        Score every document type against lowercased text.
+
+        The combined matcher for a type matches iff at least one of its
+        patterns does, so types with no indicators present are skipped
+        after a single scan.
+        """
+        scores: Dict[str, Dict] = {}
+
+        for doc_type, (combined, patterns) in self._get_compiled_indicators().items():
+            if not combined.search(text_lower):
+                continue
+
+            matched_patterns = [p for p, regex in patterns if regex.search(text_lower)]
+            if matched_patterns:
+                # Normalize score (percentage of patterns matched)
+                scores[doc_type] = {
+                    "confidence": len(matched_patterns) / len(patterns),
+                    "matched_patterns": matched_patterns,
+                    "total_patterns": len(patterns),
+                }
+
+        return scores
+
     def classify(self, text: str) -> ClassificationResult:
         """
         Classify document using regex pattern matching.
@@ -229,26 +273,7 @@ class RegexClassifier(BaseClassifier):
                 metadata={"reason": "empty_text"},
             )
 
-        text_lower = text.lower()
-        scores: Dict[str, Dict] = {}
-
-        for doc_type, patterns in self.DOCUMENT_INDICATORS.items():
-            score = 0
-            matched_patterns = []
-
-            for pattern in patterns:
-                if re.search(pattern, text_lower):
-                    score += 1
-                    matched_patterns.append(pattern)
-
-            if score > 0:
-                # Normalize score (percentage of patterns matched)
-                confidence = score / len(patterns)
-                scores[doc_type] = {
-                    "confidence": confidence,
-                    "matched_patterns": matched_patterns,
-                    "total_patterns": len(patterns),
-                }
+        scores = self._score_types(text.lower())
 
         if not scores:
             return ClassificationResult(
@@ -156,34 +156,8 @@ class TFIDFClassifier(BaseClassifier):
             # Get prediction probabilities
             proba = self._classifier.predict_proba(features)[0]
 
-            # Get class labels
-            classes = self._label_encoder.classes_
-
-            # Find best class
-            best_idx = np.argmax(proba)
-            document_type = classes[best_idx]
-            confidence = float(proba[best_idx])
-
-            # Build full probability distribution
-            probabilities = {dt: 0.0 for dt in DOCUMENT_TYPES}
-            for i, cls in enumerate(classes):
-                if cls in probabilities:
-                    probabilities[cls] = float(proba[i])
-
-            # Ensure probabilities sum to 1
-            total = sum(probabilities.values())
-            if total > 0:
-                probabilities = {k: v / total for k, v in probabilities.items()}
-
-            return ClassificationResult(
-                document_type=document_type,
-                confidence=confidence,
-                probabilities=probabilities,
-                classifier_used=self.name,
-                processing_time_ms=self._measure_time(start_time),
-                metadata={
-                    "top_3": self._get_top_predictions(classes, proba, 3),
-                },
+            return self._result_from_proba(
+                self._label_encoder.classes_, proba, self._measure_time(start_time)
             )
 
         except Exception as e:
@@ -196,6 +170,36 @@ class TFIDFClassifier(BaseClassifier):
                 metadata={"error": str(e)},
             )
 
+    def _result_from_proba(
+        self, classes: np.ndarray, proba: np.ndarray, processing_time_ms: int
+    ) -> ClassificationResult:
+        """Build a result from one row of predict_proba output."""
+        best_idx = np.argmax(proba)
+        document_type = classes[best_idx]
+        confidence = float(proba[best_idx])
+
+        # Build full probability distribution
+        probabilities = {dt: 0.0 for dt in DOCUMENT_TYPES}
+        for i, cls in enumerate(classes):
+            if cls in probabilities:
+                probabilities[cls] = float(proba[i])
+
+        # Ensure probabilities sum to 1
+        total = sum(probabilities.values())
+        if total > 0:
+            probabilities = {k: v / total for k, v in probabilities.items()}
+
+        return ClassificationResult(
+            document_type=document_type,
+            confidence=confidence,
+            probabilities=probabilities,
+            classifier_used=self.name,
+            processing_time_ms=processing_time_ms,
+            metadata={
+                "top_3": self._get_top_predictions(classes, proba, 3),
+            },
+        )
+
     def _get_top_predictions(
         self, classes: np.ndarray, proba: np.ndarray, n: int
     ) -> List[Tuple[str, float]]:
@@ -229,41 +233,23 @@ class TFIDFClassifier(BaseClassifier):
             ]
 
         try:
-            # Preprocess all texts
-            processed_texts = [self.preprocess_text(t) for t in texts]
-
-            # Batch transform
-            features = self._vectorizer.transform(processed_texts)
-
-            # Batch predict
-            probas = self._classifier.predict_proba(features)
-
-            # Get class labels
-            classes = self._label_encoder.classes_
-
-            results = []
-            for i, proba in enumerate(probas):
-                best_idx = np.argmax(proba)
-                document_type = classes[best_idx]
-                confidence = float(proba[best_idx])
-
-                probabilities = {dt: 0.0 for dt in DOCUMENT_TYPES}
-                for j, cls in enumerate(classes):
-                    if cls in probabilities:
-                        probabilities[cls] = float(proba[j])
-
-                results.append(
-                    ClassificationResult(
-                        document_type=document_type,
-                        confidence=confidence,
-                        probabilities=probabilities,
-                        classifier_used=self.name,
-                        processing_time_ms=self._measure_time(start_time) / len(texts),
-                        metadata={
-                            "top_3": self._get_top_predictions(classes, proba, 3),
-                        },
-                    )
-                )
+            # Empty documents get the same result as classify(""); the rest
+            # share one transform and one predict_proba call.
+            results: List[Optional[ClassificationResult]] = [None] * len(texts)
+            indices = [i for i, t in enumerate(texts) if t]
+            for i, text in enumerate(texts):
+                if not text:
+                    results[i] = self.classify(text)
+
+            if indices:
+                processed_texts = [self.preprocess_text(texts[i]) for i in indices]
+                features = self._vectorizer.transform(processed_texts)
+                probas = self._classifier.predict_proba(features)
+                classes = self._label_encoder.classes_
+                per_doc_ms = self._measure_time(start_time) // len(indices)
+
+                for i, proba in zip(indices, probas):
+                    results[i] = self._result_from_proba(classes, proba, per_doc_ms)
 
             return results
 
@@ -0,0 +1,310 @@
+"""
+Async Email Delivery Queue
+
+Outbound mail queue for async code. Callers enqueue messages and await the
+delivery result without blocking the event loop; a pool of workers sends
+them through the configured provider.
+
+For SMTP, each worker keeps its own persistent, authenticated session
+(see SMTPSession), so a campaign of N messages costs one login per worker
+instead of one per message. Blocking provider I/O runs on a dedicated
+thread pool sized to the worker count.
+
+Usage:
+    from notifications.email_queue import get_email_queue
+
+    queue = get_email_queue()
+    result = await queue.send(message)              # one message
+    results = await queue.send_batch(messages)      # a campaign
+
+    await queue.stop()  # at shutdown: drain and close sessions
+
+Configuration:
+    EMAIL_QUEUE_WORKERS: Concurrent senders / SMTP sessions (default: 4)
+    EMAIL_QUEUE_MAXSIZE: Queued messages before enqueue waits (default: 5000)
+    EMAIL_SEND_RETRIES: Retries for transient failures (default: 2)
+"""
+
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from .email_provider import (
+    DeliveryResult,
+    DeliveryStatus,
+    EmailMessage,
+    EmailProvider,
+    get_email_provider,
+)
+
+logger = logging.getLogger(__name__)
+
+EMAIL_QUEUE_WORKERS = int(os.environ.get("EMAIL_QUEUE_WORKERS", "4"))
+EMAIL_QUEUE_MAXSIZE = int(os.environ.get("EMAIL_QUEUE_MAXSIZE", "5000"))
+EMAIL_SEND_RETRIES = int(os.environ.get("EMAIL_SEND_RETRIES", "2"))
+EMAIL_RETRY_BACKOFF_SECONDS = 0.5
+
+# Provider error codes worth retrying: 4xx replies and lost connections.
+# Permanent (5xx) SMTP errors fail immediately, and so does DELIVERY_UNCERTAIN
+# (connection lost after the server accepted DATA) to avoid duplicates.
+_RETRYABLE_ERROR_CODES = {"SMTP_TRANSIENT", "CONNECTION_ERROR"}
+
+
+@dataclass
+class _DeliveryJob:
+    message: EmailMessage
+    future: asyncio.Future
+    attempts: int = 0
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+
+class EmailDeliveryQueue:
+    """
+    Bounded async queue drained by a pool of delivery workers.
+
+    The queue binds to the event loop it is first used on. If it is used
+    from a new loop later (e.g. successive asyncio.run() calls in a Celery
+    task), the old workers and sessions are discarded and it restarts.
+    """
+
+    def __init__(
+        self,
+        provider: Optional[EmailProvider] = None,
+        workers: int = EMAIL_QUEUE_WORKERS,
+        maxsize: int = EMAIL_QUEUE_MAXSIZE,
+        max_retries: int = EMAIL_SEND_RETRIES,
+        retry_backoff: float = EMAIL_RETRY_BACKOFF_SECONDS,
+    ):
+        self._provider = provider
+        self.workers = max(1, workers)
+        self.maxsize = maxsize
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._sessions: Dict[int, Any] = {}
+
+        self._enqueued = 0
+        self._sent = 0
+        self._failed = 0
+        self._retries = 0
+        self._latency_total = 0.0
+        self._started_at: Optional[float] = None
+        self._closed_connects = 0
+        self._closed_reconnects = 0
+
+    @property
+    def provider(self) -> EmailProvider:
+        """Provider used by the workers (configured provider by default)."""
+        if self._provider is None:
+            self._provider = get_email_provider()
+        return self._provider
+
+    # =========================================================================
+    # PUBLIC API
+    # =========================================================================
+
+    async def enqueue(self, message: EmailMessage) -> asyncio.Future:
+        """
+        Queue a message; waits only while the queue is full.
+
+        Returns:
+            Future resolving to the message's DeliveryResult
+        """
+        self.provider  # resolve now so configuration errors reach the caller
+        self._ensure_started()
+        future = self._loop.create_future()
+        await self._queue.put(_DeliveryJob(message=message, future=future))
+        self._enqueued += 1
+        return future
+
+    async def enqueue_batch(self, messages: List[EmailMessage]) -> List[asyncio.Future]:
+        """Queue a campaign of messages; returns one future per message."""
+        return [await self.enqueue(message) for message in messages]
+
+    async def send(self, message: EmailMessage) -> DeliveryResult:
+        """Queue a message and wait for its delivery result."""
+        return await (await self.enqueue(message))
+
+    async def send_batch(self, messages: List[EmailMessage]) -> List[DeliveryResult]:
+        """Queue a campaign and wait for every result (in input order)."""
+        futures = await self.enqueue_batch(messages)
+        return list(await asyncio.gather(*futures))
+
+    async def flush(self) -> None:
+        """Wait until every queued message has been handled."""
+        if self._queue is not None and self._loop is asyncio.get_running_loop():
+            await self._queue.join()
+
+    async def stop(self, drain: bool = True) -> None:
+        """Stop the workers (after draining by default) and close sessions."""
+        if self._loop is None:
+            return
+        if drain and self._loop is asyncio.get_running_loop():
+            await self.flush()
+        for task in self._tasks:
+            task.cancel()
+        if self._loop is asyncio.get_running_loop():
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._fail_pending("Email queue stopped")
+        self._close_sessions()
+        self._reset()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth, delivery counts, SMTP session reuse and throughput."""
+        elapsed = time.perf_counter() - self._started_at if self._started_at else 0.0
+        delivered = self._sent + self._failed
+        connects = self._closed_connects + sum(getattr(s, "connects", 0) for s in self._sessions.values())
+        reconnects = self._closed_reconnects + sum(getattr(s, "reconnects", 0) for s in self._sessions.values())
+        return {
+            "workers": self.workers if self._tasks else 0,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "enqueued": self._enqueued,
+            "sent": self._sent,
+            "failed": self._failed,
+            "retries": self._retries,
+            "connections_opened": connects,
+            "reconnects": reconnects,
+            "avg_latency_ms": round(self._latency_total / delivered * 1000, 2) if delivered else 0.0,
+            "messages_per_second": round(delivered / elapsed, 1) if elapsed else 0.0,
+        }
+
+    # =========================================================================
+    # WORKERS
+    # =========================================================================
+
+    def _ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        if self._loop is not None:
+            # Previous loop is gone; its workers died with it
+            self._fail_pending("Email queue event loop closed")
+            self._close_sessions()
+            self._reset()
+
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="email-worker")
+        self._tasks = [
+            loop.create_task(self._worker(i), name=f"email-worker-{i}")
+            for i in range(self.workers)
+        ]
+        self._started_at = time.perf_counter()
+
+    async def _worker(self, index: int) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self._queue.get()
+            try:
+                if job.future.done():
+                    continue
+                result = await loop.run_in_executor(self._executor, self._deliver, index, job.message)
+                while self._should_retry(result, job):
+                    job.attempts += 1
+                    self._retries += 1
+                    await asyncio.sleep(self.retry_backoff * job.attempts)
+                    result = await loop.run_in_executor(self._executor, self._deliver, index, job.message)
+
+                self._latency_total += time.perf_counter() - job.enqueued_at
+                if result.success:
+                    self._sent += 1
+                else:
+                    self._failed += 1
+                job.future.set_result(result)
+            except asyncio.CancelledError:
+                if not job.future.done():
+                    job.future.cancel()
+                raise
+            except Exception as e:
+                logger.exception(f"[EmailQueue] Worker {index} delivery error: {e}")
+                self._failed += 1
+                if not job.future.done():
+                    job.future.set_result(DeliveryResult(
+                        success=False,
+                        status=DeliveryStatus.FAILED,
+                        provider=getattr(self._provider, "provider_name", None),
+                        error_message=str(e),
+                        error_code="SEND_ERROR",
+                    ))
+            finally:
+                self._queue.task_done()
+
+    def _deliver(self, index: int, message: EmailMessage) -> DeliveryResult:
+        """Runs on the executor; uses the worker's persistent session if supported."""
+        provider = self.provider
+        if not hasattr(provider, "open_session"):
+            return provider.send(message)
+
+        session = self._sessions.get(index)
+        if session is None:
+            session = provider.open_session()
+            self._sessions[index] = session
+        return session.send(message)
+
+    def _should_retry(self, result: DeliveryResult, job: _DeliveryJob) -> bool:
+        return (
+            not result.success
+            and result.error_code in _RETRYABLE_ERROR_CODES
+            and job.attempts < self.max_retries
+        )
+
+    # =========================================================================
+    # CLEANUP
+    # =========================================================================
+
+    def _fail_pending(self, reason: str) -> None:
+        if self._queue is None:
+            return
+        while not self._queue.empty():
+            job = self._queue.get_nowait()
+            if not job.future.done() and not job.future.get_loop().is_closed():
+                job.future.set_result(DeliveryResult(
+                    success=False,
+                    status=DeliveryStatus.FAILED,
+                    error_message=reason,
+                    error_code="QUEUE_STOPPED",
+                ))
+
+    def _close_sessions(self) -> None:
+        for session in self._sessions.values():
+            self._closed_connects += getattr(session, "connects", 0)
+            self._closed_reconnects += getattr(session, "reconnects", 0)
+            try:
+                session.close()
+            except Exception as e:
+                logger.debug(f"[EmailQueue] Error closing session: {e}")
+        self._sessions.clear()
+
+    def _reset(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        self._loop = None
+        self._queue = None
+        self._tasks = []
+        self._executor = None
+
+
+# Global queue instance
+_email_queue: Optional[EmailDeliveryQueue] = None
+
+
+def get_email_queue() -> EmailDeliveryQueue:
+    """Get the global email delivery queue."""
+    global _email_queue
+    if _email_queue is None:
+        _email_queue = EmailDeliveryQueue()
+    return _email_queue
+
+
+def set_email_queue(queue: Optional[EmailDeliveryQueue]) -> None:
+    """Replace the global email delivery queue (for testing)."""
+    global _email_queue
+    _email_queue = queue
@@ -14,6 +14,7 @@ Trigger Categories:
 - Account notifications (welcome, password, billing)
 """
 
+import asyncio
 import logging
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
@@ -25,8 +26,9 @@ from .email_provider import (
     get_email_provider,
     EmailMessage,
     DeliveryResult,
-    send_email,
+    DeliveryStatus,
 )
+from .email_queue import get_email_queue
 from decimal import Decimal, ROUND_HALF_UP
 from calculator.decimal_math import money, to_decimal
 
@@ -268,6 +270,21 @@ Thank you,
             entity_type="appointment",
         )
 
+    async def send_appointment_reminders(
+        self,
+        reminders: List[Dict[str, Any]],
+    ) -> List[DeliveryResult]:
+        """
+        Send a campaign of appointment reminders (queued together).
+
+        Args:
+            reminders: Keyword arguments for send_appointment_reminder, one dict per email
+
+        Returns:
+            Delivery results in the same order as ``reminders``
+        """
+        return await self._send_campaign(self.send_appointment_reminder, reminders)
+
     async def send_appointment_cancelled(
         self,
         recipient_email: str,
@@ -552,6 +569,26 @@ Thank you,
             entity_type="deadline",
         )
 
+    async def send_deadline_reminders(
+        self,
+        reminders: List[Dict[str, Any]],
+    ) -> List[DeliveryResult]:
+        """
+        Send a campaign of deadline reminders.
+
+        Every reminder is queued at once and delivered by the queue's
+        worker pool over persistent connections.
+
+        Args:
+            reminders: Keyword arguments for send_deadline_reminder, one dict per email
+
+        Returns:
+            Delivery results in the same order as ``reminders``; a reminder
+            that raised gets a failed result, so callers can still record
+            which of the others went out
+        """
+        return await self._send_campaign(self.send_deadline_reminder, reminders)
+
     # =========================================================================
     # CLIENT TRIGGERS
     # =========================================================================
@@ -917,14 +954,15 @@ Thank you,
         )
 
         try:
-            result = send_email(
+            # Delivered by the async queue's workers so SMTP I/O never blocks the loop
+            result = await get_email_queue().send(EmailMessage(
                 to=recipient_email,
                 subject=subject,
                 body_html=body_html,
                 body_text=body_text,
                 from_name=self._from_name,
                 tags=[f"trigger:{trigger_type.value}", f"entity:{entity_type}"] if entity_type else [],
-            )
+            ))
 
             if result.success:
                 notification.sent_at = datetime.now(timezone.utc)
@@ -958,6 +996,26 @@ Thank you,
                 error_message=str(e),
             )
 
+    async def _send_campaign(self, send, reminders: List[Dict[str, Any]]) -> List[DeliveryResult]:
+        """Run send(**reminder) for every reminder concurrently; one result each."""
+        results = await asyncio.gather(
+            *(send(**reminder) for reminder in reminders),
+            return_exceptions=True,
+        )
+        delivered = []
+        for reminder, result in zip(reminders, results):
+            if isinstance(result, BaseException):
+                if not isinstance(result, Exception):
+                    raise result
+                logger.error(f"[EMAIL] Reminder to {reminder.get('recipient_email')} failed: {result}")
+                result = DeliveryResult(
+                    success=False,
+                    status=DeliveryStatus.FAILED,
+                    error_message=str(result),
+                )
+            delivered.append(result)
+        return delivered
+
     def get_notification_stats(self) -> Dict[str, Any]:
         """Get email notification statistics."""
         total = len(self._notifications)
@@ -11,16 +11,19 @@ Configuration:
     SMTP_PASSWORD: SMTP authentication password
     SMTP_USE_TLS: Use TLS encryption (default: True)
     SMTP_FROM_EMAIL: Default sender email
+    SMTP_TIMEOUT: Socket timeout in seconds (default: 30)
+    SMTP_MAX_MESSAGES_PER_CONNECTION: Reconnect after this many messages (default: 100)
 """
 
 import logging
 import os
 import smtplib
 import ssl
+import uuid
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.utils import formataddr
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from .email_provider import (
     EmailProvider,
@@ -31,6 +34,9 @@ from .email_provider import (
 
 logger = logging.getLogger(__name__)
 
+SMTP_TIMEOUT_SECONDS = float(os.environ.get("SMTP_TIMEOUT", "30"))
+SMTP_MAX_MESSAGES_PER_CONNECTION = int(os.environ.get("SMTP_MAX_MESSAGES_PER_CONNECTION", "100"))
+
 
 class SMTPProvider(EmailProvider):
     """
@@ -53,6 +59,8 @@ class SMTPProvider(EmailProvider):
         use_ssl: bool = False,
         from_email: Optional[str] = None,
         from_name: Optional[str] = None,
+        timeout: float = SMTP_TIMEOUT_SECONDS,
+        max_messages_per_connection: int = SMTP_MAX_MESSAGES_PER_CONNECTION,
     ):
         """
         Initialize SMTP provider.
@@ -66,6 +74,9 @@ class SMTPProvider(EmailProvider):
             use_ssl: Use SSL/TLS (port 465)
             from_email: Default sender email
             from_name: Default sender name
+            timeout: Socket timeout for SMTP commands
+            max_messages_per_connection: Reconnect after this many messages
+                (many servers cap messages per session)
         """
         self.host = host or os.environ.get("SMTP_HOST")
         self.port = port or int(os.environ.get("SMTP_PORT", "587"))
@@ -83,6 +94,8 @@ class SMTPProvider(EmailProvider):
         self.from_name = from_name or os.environ.get(
             "SMTP_FROM_NAME", "Tax Filing Platform"
         )
+        self.timeout = timeout
+        self.max_messages_per_connection = max_messages_per_connection
 
     @property
     def provider_name(self) -> str:
@@ -96,6 +109,9 @@ class SMTPProvider(EmailProvider):
         """
         Send email via SMTP.
 
+        Opens a connection for this one message. Use open_session() (or the
+        async delivery queue) to send many messages over one connection.
+
         Args:
             message: Email message to send
 
@@ -103,156 +119,387 @@ class SMTPProvider(EmailProvider):
             DeliveryResult with status
         """
         if not self.is_configured():
-            return DeliveryResult(
-                success=False,
-                status=DeliveryStatus.FAILED,
-                provider=self.provider_name,
-                error_message="SMTP not configured (missing SMTP_HOST)",
-                error_code="NOT_CONFIGURED",
-            )
+            return self._not_configured()
 
-        message.validate()
+        session = self.open_session()
+        try:
+            return session.send(message)
+        finally:
+            session.close()
+
+    def send_batch(self, messages: List[EmailMessage]) -> List[DeliveryResult]:
+        """Send multiple emails over a single authenticated connection."""
+        if not self.is_configured():
+            return [self._not_configured() for _ in messages]
 
+        session = self.open_session()
+        try:
+            return [session.send(message) for message in messages]
+        finally:
+            session.close()
+
+    def open_session(self) -> "SMTPSession":
+        """Create a persistent session; it connects on first send."""
+        return SMTPSession(self)
+
+    def connect(self) -> smtplib.SMTP:
+        """Open an SMTP connection, upgrade to TLS and log in."""
+        if self.use_ssl:
+            # SSL connection (port 465)
+            context = ssl.create_default_context()
+            server = smtplib.SMTP_SSL(self.host, self.port, context=context, timeout=self.timeout)
+        else:
+            # STARTTLS connection (port 587) or plain
+            server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            if self.use_tls:
+                context = ssl.create_default_context()
+                server.starttls(context=context)
+        try:
+            if self.username and self.password:
+                server.login(self.username, self.password)
+            server.ehlo_or_helo_if_needed()
+        except Exception:
+            server.close()
+            raise
+        return server
+
+    def build_mime(self, message: EmailMessage) -> Tuple[str, List[str], str]:
+        """
+        Render a message for the wire.
+
+        Returns:
+            (envelope sender, envelope recipients, serialized MIME message)
+        """
+        msg = MIMEMultipart("alternative")
+
+        # Set headers
+        from_email = message.from_email or self.from_email
+        from_name = message.from_name or self.from_name
+        msg["From"] = formataddr((from_name, from_email))
+        msg["To"] = message.to
+        msg["Subject"] = message.subject
+
+        if message.reply_to:
+            msg["Reply-To"] = message.reply_to
+
+        if message.cc:
+            msg["Cc"] = ", ".join(message.cc)
+
+        # Add custom headers (sanitize against CRLF injection)
+        for key, value in message.headers.items():
+            if any(c in str(key) + str(value) for c in ('\r', '\n')):
+                logger.warning(f"Rejected email header with CRLF: {key!r}")
+                continue
+            msg[key] = value
+
+        # Add content
+        if message.body_text:
+            part1 = MIMEText(message.body_text, "plain", "utf-8")
+            msg.attach(part1)
+
+        if message.body_html:
+            part2 = MIMEText(message.body_html, "html", "utf-8")
+            msg.attach(part2)
+
+        # Build recipient list
+        recipients = [message.to]
+        if message.cc:
+            recipients.extend(message.cc)
+        if message.bcc:
+            recipients.extend(message.bcc)
+
+        return from_email, recipients, msg.as_string()
+
+    def _not_configured(self) -> DeliveryResult:
+        return DeliveryResult(
+            success=False,
+            status=DeliveryStatus.FAILED,
+            provider=self.provider_name,
+            error_message="SMTP not configured (missing SMTP_HOST)",
+            error_code="NOT_CONFIGURED",
+        )
+
+    def test_connection(self) -> bool:
+        """
+        Test SMTP connection.
+
+        Returns:
+            True if connection successful
+        """
         try:
-            # Build MIME message
-            msg = MIMEMultipart("alternative")
-
-            # Set headers
-            from_email = message.from_email or self.from_email
-            from_name = message.from_name or self.from_name
-            msg["From"] = formataddr((from_name, from_email))
-            msg["To"] = message.to
-            msg["Subject"] = message.subject
-
-            if message.reply_to:
-                msg["Reply-To"] = message.reply_to
-
-            if message.cc:
-                msg["Cc"] = ", ".join(message.cc)
-
-            # Add custom headers (sanitize against CRLF injection)
-            for key, value in message.headers.items():
-                if any(c in str(key) + str(value) for c in ('\r', '\n')):
-                    logger.warning(f"Rejected email header with CRLF: {key!r}")
-                    continue
-                msg[key] = value
-
-            # Add content
-            if message.body_text:
-                part1 = MIMEText(message.body_text, "plain", "utf-8")
-                msg.attach(part1)
-
-            if message.body_html:
-                part2 = MIMEText(message.body_html, "html", "utf-8")
-                msg.attach(part2)
-
-            # Build recipient list
-            recipients = [message.to]
-            if message.cc:
-                recipients.extend(message.cc)
-            if message.bcc:
-                recipients.extend(message.bcc)
-
-            # Send via SMTP
             if self.use_ssl:
-                # SSL connection (port 465)
                 context = ssl.create_default_context()
                 with smtplib.SMTP_SSL(self.host, self.port, context=context) as server:
                     if self.username and self.password:
                         server.login(self.username, self.password)
-                    server.sendmail(from_email, recipients, msg.as_string())
+                    server.noop()
             else:
-                # STARTTLS connection (port 587) or plain
                 with smtplib.SMTP(self.host, self.port) as server:
                     if self.use_tls:
                         context = ssl.create_default_context()
                         server.starttls(context=context)
                     if self.username and self.password:
                         server.login(self.username, self.password)
-                    server.sendmail(from_email, recipients, msg.as_string())
+                    server.noop()
+            logger.info(f"SMTP connection test successful: {self.host}:{self.port}")
+            return True
+        except Exception as e:
+            logger.error(f"SMTP connection test failed: {e}")
+            return False
+
+
+def _is_transient(smtp_code: Optional[int]) -> bool:
+    """4xx SMTP replies mean try again later."""
+    return isinstance(smtp_code, int) and 400 <= smtp_code < 500
+
+
+class SMTPSession:
+    """
+    A persistent, authenticated SMTP connection for sending many messages.
+
+    Connects and logs in once, then sends messages back to back. If the
+    server drops the connection (idle timeout, restart) the session
+    reconnects and retries the message once, unless the server had already
+    accepted DATA: it may have delivered the message, so the send fails
+    with DELIVERY_UNCERTAIN (not retried) rather than risk a duplicate.
+    The connection is also recycled after ``max_messages_per_connection``
+    messages.
+
+    Not thread-safe: use one session per worker.
+    """
+
+    def __init__(self, provider: SMTPProvider):
+        self.provider = provider
+        self._server: Optional[smtplib.SMTP] = None
+        self._sent_on_connection = 0
+        self.connects = 0
+        self.reconnects = 0
+        self._data_accepted = False
+
+    @property
+    def connected(self) -> bool:
+        return self._server is not None
+
+    def send(self, message: EmailMessage) -> DeliveryResult:
+        """Send one message over the session's connection."""
+        provider = self.provider
+        message.validate()
+
+        self._data_accepted = False
+        try:
+            from_email, recipients, payload = provider.build_mime(message)
+
+            if self._sent_on_connection >= provider.max_messages_per_connection:
+                self.close()
+            try:
+                self._sendmail(from_email, recipients, payload)
+            except smtplib.SMTPServerDisconnected as e:
+                if self._data_accepted:
+                    raise
+                self._reconnect(e)
+                self._sendmail(from_email, recipients, payload)
+            except smtplib.SMTPException:
+                raise
+            except OSError as e:
+                if self._data_accepted:
+                    raise
+                self._reconnect(e)
+                self._sendmail(from_email, recipients, payload)
 
             logger.info(f"SMTP: Email sent to {message.to}")
 
             # SMTP doesn't return a message ID, generate one
-            import uuid
-            message_id = f"smtp-{uuid.uuid4()}"
-
             return DeliveryResult(
                 success=True,
                 status=DeliveryStatus.SENT,
-                message_id=message_id,
-                provider=self.provider_name,
+                message_id=f"smtp-{uuid.uuid4()}",
+                provider=provider.provider_name,
             )
 
         except smtplib.SMTPAuthenticationError as e:
             logger.error(f"SMTP auth error: {e}")
+            self.close()
             return DeliveryResult(
                 success=False,
                 status=DeliveryStatus.FAILED,
-                provider=self.provider_name,
+                provider=provider.provider_name,
                 error_message=f"SMTP authentication failed: {e}",
                 error_code="AUTH_ERROR",
             )
         except smtplib.SMTPRecipientsRefused as e:
+            self._reset()
+            codes = [code for code, _ in e.recipients.values()]
+            if codes and all(_is_transient(code) for code in codes):
+                # Every recipient deferred (greylisting, full mailbox): try again later
+                logger.warning(f"SMTP recipients deferred: {e}")
+                return DeliveryResult(
+                    success=False,
+                    status=DeliveryStatus.FAILED,
+                    provider=provider.provider_name,
+                    error_message=f"Recipients deferred: {e}",
+                    error_code="SMTP_TRANSIENT",
+                )
             logger.error(f"SMTP recipients refused: {e}")
             return DeliveryResult(
                 success=False,
                 status=DeliveryStatus.BOUNCED,
-                provider=self.provider_name,
+                provider=provider.provider_name,
                 error_message=f"Recipients refused: {e}",
                 error_code="RECIPIENTS_REFUSED",
             )
+        except (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError) as e:
+            logger.error(f"SMTP connection error: {e}")
+            self.close()
+            return self._connection_failure(e)
         except smtplib.SMTPException as e:
+            # 4xx replies are temporary and worth retrying; 5xx are permanent
+            transient = _is_transient(getattr(e, "smtp_code", None))
             logger.error(f"SMTP error: {e}")
+            self._reset()
             return DeliveryResult(
                 success=False,
                 status=DeliveryStatus.FAILED,
-                provider=self.provider_name,
+                provider=provider.provider_name,
                 error_message=str(e),
-                error_code="SMTP_ERROR",
+                error_code="SMTP_TRANSIENT" if transient else "SMTP_ERROR",
             )
+        except OSError as e:
+            logger.error(f"SMTP connection error: {e}")
+            self.close()
+            return self._connection_failure(e)
         except Exception as e:
             logger.exception(f"SMTP send error: {e}")
+            self.close()
             return DeliveryResult(
                 success=False,
                 status=DeliveryStatus.FAILED,
-                provider=self.provider_name,
+                provider=provider.provider_name,
                 error_message=str(e),
                 error_code="SEND_ERROR",
             )
 
-    def send_batch(self, messages: List[EmailMessage]) -> List[DeliveryResult]:
-        """Send multiple emails (sends individually)."""
-        results = []
-        for message in messages:
-            result = self.send(message)
-            results.append(result)
-        return results
+    def _connection_failure(self, error: Exception) -> DeliveryResult:
+        if self._data_accepted:
+            # The body went out; the message may have been delivered
+            return DeliveryResult(
+                success=False,
+                status=DeliveryStatus.FAILED,
+                provider=self.provider.provider_name,
+                error_message=f"Connection lost after DATA was accepted: {error}",
+                error_code="DELIVERY_UNCERTAIN",
+            )
+        return DeliveryResult(
+            success=False,
+            status=DeliveryStatus.FAILED,
+            provider=self.provider.provider_name,
+            error_message=str(error),
+            error_code="CONNECTION_ERROR",
+        )
 
-    def test_connection(self) -> bool:
+    def close(self) -> None:
+        """Close the connection (QUIT if the server is still there)."""
+        server, self._server = self._server, None
+        self._sent_on_connection = 0
+        if server is None:
+            return
+        try:
+            server.quit()
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
+
+    def _reconnect(self, error: Exception) -> None:
+        # Stale connection (idle timeout, server restart): retry once on a new one
+        logger.info(f"SMTP connection lost ({error}); reconnecting")
+        self.close()
+        self.reconnects += 1
+
+    def _sendmail(self, from_email: str, recipients: List[str], payload: str) -> None:
+        if self._server is None:
+            self._server = self.provider.connect()
+            self.connects += 1
+        if self._server.has_extn("pipelining"):
+            self._envelope_pipelined(from_email, recipients)
+        else:
+            self._envelope(from_email, recipients)
+        self._data(payload)
+        self._sent_on_connection += 1
+
+    def _envelope(self, from_email: str, recipients: List[str]) -> None:
+        """MAIL and RCPT one command at a time (server without PIPELINING)."""
+        server = self._server
+        code, resp = server.mail(from_email)
+        if code != 250:
+            server.rset()
+            raise smtplib.SMTPSenderRefused(code, resp, from_email)
+        refused = {}
+        for rcpt in recipients:
+            code, resp = server.rcpt(rcpt)
+            if code not in (250, 251):
+                refused[rcpt] = (code, resp)
+        if len(refused) == len(recipients):
+            server.rset()
+            raise smtplib.SMTPRecipientsRefused(refused)
+
+    def _envelope_pipelined(self, from_email: str, recipients: List[str]) -> None:
         """
-        Test SMTP connection.
-
-        Returns:
-            True if connection successful
+        RFC 2920 pipelining: MAIL and every RCPT go out in one write, so the
+        envelope costs one round trip instead of one per command.
+        """
+        server = self._server
+        commands = [f"MAIL FROM:{smtplib.quoteaddr(from_email)}"]
+        commands.extend(f"RCPT TO:{smtplib.quoteaddr(r)}" for r in recipients)
+        server.send("".join(c + smtplib.CRLF for c in commands))
+
+        mail_code, mail_resp = server.getreply()
+        refused = {}
+        for rcpt in recipients:
+            code, resp = server.getreply()
+            if code not in (250, 251):
+                refused[rcpt] = (code, resp)
+
+        if mail_code != 250:
+            server.rset()
+            raise smtplib.SMTPSenderRefused(mail_code, mail_resp, from_email)
+        if len(refused) == len(recipients):
+            server.rset()
+            raise smtplib.SMTPRecipientsRefused(refused)
+
+    def _data(self, payload: str) -> None:
+        """
+        DATA, then the body with smtplib's line ending and dot-stuffing
+        encoding (smtplib.quotedata, as SMTP.data() uses). Records when the
+        server accepted DATA so a dropped connection after that point is
+        not retried.
         """
+        server = self._server
+        server.putcmd("data")
+        code, resp = server.getreply()
+        if code != 354:
+            raise smtplib.SMTPDataError(code, resp)
+        self._data_accepted = True
+
+        body = smtplib.quotedata(payload)
+        if not body.endswith(smtplib.CRLF):
+            body += smtplib.CRLF
+        server.send(body + "." + smtplib.CRLF)
+        code, resp = server.getreply()
+        if code != 250:
+            raise smtplib.SMTPDataError(code, resp)
+
+    def _reset(self) -> None:
+        """Clear a half-finished transaction so the connection can be reused."""
+        if self._server is None:
+            return
         try:
-            if self.use_ssl:
-                context = ssl.create_default_context()
-                with smtplib.SMTP_SSL(self.host, self.port, context=context) as server:
-                    if self.username and self.password:
-                        server.login(self.username, self.password)
-                    server.noop()
-            else:
-                with smtplib.SMTP(self.host, self.port) as server:
-                    if self.use_tls:
-                        context = ssl.create_default_context()
-                        server.starttls(context=context)
-                    if self.username and self.password:
-                        server.login(self.username, self.password)
-                    server.noop()
-            logger.info(f"SMTP connection test successful: {self.host}:{self.port}")
-            return True
-        except Exception as e:
-            logger.error(f"SMTP connection test failed: {e}")
-            return False
+            self._server.rset()
+        except Exception:
+            self.close()
+
+    def __enter__(self) -> "SMTPSession":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -9,18 +9,46 @@ Examples of contradictions:
 - Claiming child tax credit with no qualifying children
 - Negative income with no business losses
 - Self-employment income but no SE tax
+
+Rules declare the top-level fields they read (see `reads`). When a
+session_id is passed to `check`, the detector keeps that session's last
+result and re-runs only the rules whose inputs changed since, so
+per-answer cost tracks the answer rather than the size of the rule set.
 """
 
 from __future__ import annotations
 
+import copy
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Any, Callable
+from typing import Dict, FrozenSet, Iterable, List, Optional, Any, Callable
 from enum import Enum
 from decimal import Decimal
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
+# Interview sessions whose last result is kept for incremental checks
+CONTRADICTION_SESSION_CACHE_SIZE = int(os.environ.get("CONTRADICTION_SESSION_CACHE_SIZE", "1000"))
+
+
+def reads(*fields: str):
+    """
+    Declare the top-level data fields a rule reads.
+
+    Rules without a declaration are treated as reading everything and
+    run on every check.
+
+        @reads("filing_status", "spouse_ssn")
+        def my_rule(data): ...
+    """
+    def decorate(rule):
+        rule.contradiction_inputs = frozenset(fields)
+        return rule
+    return decorate
+
 
 class ContradictionSeverity(Enum):
     """Severity levels for contradictions."""
@@ -60,6 +88,24 @@ class ContradictionResult:
         return [c for c in self.contradictions if c.severity == ContradictionSeverity.INFO]
 
 
+@dataclass
+class _Rule:
+    """A registered rule and the fields it reads (None = all fields)."""
+    fn: Callable[[Dict], Optional[Contradiction]]
+    inputs: Optional[FrozenSet[str]]
+
+
+@dataclass
+class _SessionState:
+    """Last data seen and per-rule findings for one interview session."""
+    data: Dict[str, Any]
+    findings: Dict[int, Contradiction]  # rule index -> contradiction (only rules that fired)
+    rule_count: int
+
+
+_MISSING = object()
+
+
 class ContradictionDetector:
     """
     Detects contradictions in tax return data.
@@ -71,59 +117,159 @@ class ContradictionDetector:
         if result.has_errors:
             for error in result.errors:
                 print(f"ERROR: {error.title} - {error.message}")
+
+        # During an interview, per answer:
+        result = detector.check(tax_data, session_id=sid, changed_fields=["filing_status"])
     """
 
-    def __init__(self):
-        self._rules: List[Callable[[Dict], Optional[Contradiction]]] = []
+    def __init__(self, session_cache_size: int = CONTRADICTION_SESSION_CACHE_SIZE):
+        self._rules: List[_Rule] = []
+        self._rules_by_field: Dict[str, List[int]] = {}
+        self._unindexed: List[int] = []  # rules without declared inputs
+        self._sessions: "OrderedDict[str, _SessionState]" = OrderedDict()
+        self._session_cache_size = session_cache_size
+        self._lock = threading.Lock()
         self._register_default_rules()
 
     def _register_default_rules(self) -> None:
         """Register all default contradiction rules."""
         # Filing status rules
-        self._rules.append(self._check_hoh_with_spouse)
-        self._rules.append(self._check_mfs_with_dependent_credit)
-        self._rules.append(self._check_qw_requirements)
+        self.add_rule(self._check_hoh_with_spouse)
+        self.add_rule(self._check_mfs_with_dependent_credit)
+        self.add_rule(self._check_qw_requirements)
 
         # Dependent rules
-        self._rules.append(self._check_dependent_age_ctc)
-        self._rules.append(self._check_dependent_ssn)
-        self._rules.append(self._check_dependent_relationship)
+        self.add_rule(self._check_dependent_age_ctc)
+        self.add_rule(self._check_dependent_ssn)
+        self.add_rule(self._check_dependent_relationship)
 
         # Income rules
-        self._rules.append(self._check_negative_wages)
-        self._rules.append(self._check_se_income_without_se_tax)
-        self._rules.append(self._check_investment_income_consistency)
+        self.add_rule(self._check_negative_wages)
+        self.add_rule(self._check_se_income_without_se_tax)
+        self.add_rule(self._check_investment_income_consistency)
 
         # Deduction rules
-        self._rules.append(self._check_itemized_vs_standard)
-        self._rules.append(self._check_mortgage_interest_limits)
-        self._rules.append(self._check_salt_cap)
+        self.add_rule(self._check_itemized_vs_standard)
+        self.add_rule(self._check_mortgage_interest_limits)
+        self.add_rule(self._check_salt_cap)
 
         # Credit rules
-        self._rules.append(self._check_eitc_investment_income)
-        self._rules.append(self._check_aotc_years)
-        self._rules.append(self._check_child_care_credit_income)
-
-    def check(self, data: Dict[str, Any]) -> ContradictionResult:
+        self.add_rule(self._check_eitc_investment_income)
+        self.add_rule(self._check_aotc_years)
+        self.add_rule(self._check_child_care_credit_income)
+
+    def check(
+        self,
+        data: Dict[str, Any],
+        session_id: Optional[str] = None,
+        changed_fields: Optional[Iterable[str]] = None,
+    ) -> ContradictionResult:
         """
         Check tax data for contradictions.
 
+        Without a session_id every rule runs. With one, the first check
+        runs every rule and later checks re-run only rules reading a field
+        that changed; the other findings are carried over from the cached
+        result.
+
         Args:
             data: Tax return data dictionary
+            session_id: Interview session to check incrementally
+            changed_fields: Top-level fields changed by the latest answer.
+                If omitted, changes are found by comparing with the data
+                seen on the session's previous check.
 
         Returns:
             ContradictionResult with all detected issues
         """
-        contradictions = []
-
-        for rule in self._rules:
-            try:
-                result = rule(data)
-                if result:
-                    contradictions.append(result)
-            except Exception as e:
-                logger.warning(f"Rule {rule.__name__} failed: {e}")
+        if session_id is None:
+            findings = {}
+            for index in range(len(self._rules)):
+                self._run_rule(index, data, findings)
+            return self._result(findings)
+
+        with self._lock:
+            state = self._sessions.get(session_id)
+            if state is None or state.rule_count != len(self._rules):
+                state = _SessionState(data=copy.deepcopy(data), findings={}, rule_count=len(self._rules))
+                for index in range(len(self._rules)):
+                    self._run_rule(index, data, state.findings)
+            else:
+                if changed_fields is None:
+                    changed = [
+                        key for key in state.data.keys() | data.keys()
+                        if state.data.get(key, _MISSING) != data.get(key, _MISSING)
+                    ]
+                else:
+                    changed = list(changed_fields)
+                for index in self._affected_rules(changed):
+                    self._run_rule(index, data, state.findings)
+                for key in changed:
+                    if key in data:
+                        state.data[key] = copy.deepcopy(data[key])
+                    else:
+                        state.data.pop(key, None)
+
+            self._sessions[session_id] = state
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self._session_cache_size:
+                self._sessions.popitem(last=False)
+            return self._result(state.findings)
+
+    def clear_session(self, session_id: str) -> None:
+        """Drop a session's cached result (e.g. when the interview ends)."""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def add_rule(
+        self,
+        rule: Callable[[Dict], Optional[Contradiction]],
+        inputs: Optional[Iterable[str]] = None,
+    ) -> None:
+        """
+        Add a custom contradiction rule.
 
+        Args:
+            rule: Callable returning a Contradiction or None
+            inputs: Top-level fields the rule reads. Defaults to the
+                rule's @reads declaration; rules with neither run on
+                every check.
+        """
+        if inputs is None:
+            inputs = getattr(rule, "contradiction_inputs", None)
+        inputs = frozenset(inputs) if inputs is not None else None
+
+        index = len(self._rules)
+        self._rules.append(_Rule(fn=rule, inputs=inputs))
+        if inputs is None:
+            self._unindexed.append(index)
+        else:
+            for name in inputs:
+                self._rules_by_field.setdefault(name, []).append(index)
+
+    def _affected_rules(self, changed: Iterable[str]) -> List[int]:
+        """Indexes of rules reading any changed field, plus undeclared rules."""
+        affected = set(self._unindexed)
+        for name in changed:
+            affected.update(self._rules_by_field.get(name, ()))
+        return sorted(affected)
+
+    def _run_rule(self, index: int, data: Dict[str, Any], findings: Dict[int, Contradiction]) -> None:
+        rule = self._rules[index].fn
+        try:
+            result = rule(data)
+        except Exception as e:
+            logger.warning(f"Rule {getattr(rule, '__name__', rule)} failed: {e}")
+            result = None
+        if result:
+            findings[index] = result
+        else:
+            findings.pop(index, None)
+
+    @staticmethod
+    def _result(findings: Dict[int, Contradiction]) -> ContradictionResult:
+        # Registration order, as a full check would produce
+        contradictions = [findings[index] for index in sorted(findings)]
         has_errors = any(c.severity == ContradictionSeverity.ERROR for c in contradictions)
 
         return ContradictionResult(
@@ -131,14 +277,11 @@ class ContradictionDetector:
             contradictions=contradictions
         )
 
-    def add_rule(self, rule: Callable[[Dict], Optional[Contradiction]]) -> None:
-        """Add a custom contradiction rule."""
-        self._rules.append(rule)
-
     # =========================================================================
     # FILING STATUS RULES
     # =========================================================================
 
+    @reads("filing_status", "spouse_ssn", "spouse_name", "spouse")
     def _check_hoh_with_spouse(self, data: Dict) -> Optional[Contradiction]:
         """Check for HOH filing status with spouse information."""
         filing_status = data.get("filing_status")
@@ -157,6 +300,7 @@ class ContradictionDetector:
             )
         return None
 
+    @reads("filing_status", "claiming_eitc", "eitc_amount", "claiming_aotc", "aotc_amount")
     def _check_mfs_with_dependent_credit(self, data: Dict) -> Optional[Contradiction]:
         """MFS cannot claim certain credits."""
         filing_status = data.get("filing_status")
@@ -186,6 +330,7 @@ class ContradictionDetector:
                 )
         return None
 
+    @reads("filing_status", "spouse_death_year", "tax_year", "has_dependent_child")
     def _check_qw_requirements(self, data: Dict) -> Optional[Contradiction]:
         """Qualifying Widow(er) has specific requirements."""
         filing_status = data.get("filing_status")
@@ -230,6 +375,7 @@ class ContradictionDetector:
     # DEPENDENT RULES
     # =========================================================================
 
+    @reads("claiming_ctc", "ctc_amount", "dependents")
     def _check_dependent_age_ctc(self, data: Dict) -> Optional[Contradiction]:
         """Child must be under 17 for Child Tax Credit."""
         claiming_ctc = data.get("claiming_ctc") or data.get("ctc_amount", 0) > 0
@@ -249,6 +395,7 @@ class ContradictionDetector:
                 )
         return None
 
+    @reads("dependents", "claiming_ctc")
     def _check_dependent_ssn(self, data: Dict) -> Optional[Contradiction]:
         """Dependents need valid SSN for most credits."""
         dependents = data.get("dependents", [])
@@ -267,6 +414,7 @@ class ContradictionDetector:
                 )
         return None
 
+    @reads("dependents")
     def _check_dependent_relationship(self, data: Dict) -> Optional[Contradiction]:
         """Check dependent relationship is valid."""
         dependents = data.get("dependents", [])
@@ -293,6 +441,7 @@ class ContradictionDetector:
     # INCOME RULES
     # =========================================================================
 
+    @reads("wages", "income")
     def _check_negative_wages(self, data: Dict) -> Optional[Contradiction]:
         """Wages cannot be negative."""
         wages = data.get("wages", 0) or data.get("income", {}).get("wages", 0)
@@ -308,6 +457,7 @@ class ContradictionDetector:
             )
         return None
 
+    @reads("self_employment_income", "schedule_c_profit", "self_employment_tax")
     def _check_se_income_without_se_tax(self, data: Dict) -> Optional[Contradiction]:
         """Self-employment income should trigger SE tax."""
         se_income = data.get("self_employment_income", 0) or data.get("schedule_c_profit", 0)
@@ -325,6 +475,7 @@ class ContradictionDetector:
             )
         return None
 
+    @reads("ordinary_dividends", "qualified_dividends")
     def _check_investment_income_consistency(self, data: Dict) -> Optional[Contradiction]:
         """Investment income should be consistent."""
         dividends = data.get("ordinary_dividends", 0)
@@ -345,6 +496,7 @@ class ContradictionDetector:
     # DEDUCTION RULES
     # =========================================================================
 
+    @reads("will_itemize", "total_itemized_deductions", "filing_status")
     def _check_itemized_vs_standard(self, data: Dict) -> Optional[Contradiction]:
         """Check if itemizing makes sense."""
         will_itemize = data.get("will_itemize", False)
@@ -372,6 +524,7 @@ class ContradictionDetector:
             )
         return None
 
+    @reads("mortgage_interest", "mortgage_principal")
     def _check_mortgage_interest_limits(self, data: Dict) -> Optional[Contradiction]:
         """Mortgage interest has acquisition debt limits."""
         mortgage_interest = data.get("mortgage_interest", 0)
@@ -390,6 +543,7 @@ class ContradictionDetector:
             )
         return None
 
+    @reads("state_income_taxes", "property_taxes", "salt_deduction")
     def _check_salt_cap(self, data: Dict) -> Optional[Contradiction]:
         """SALT deduction capped at $10,000."""
         state_taxes = data.get("state_income_taxes", 0)
@@ -414,6 +568,7 @@ class ContradictionDetector:
     # CREDIT RULES
     # =========================================================================
 
+    @reads("claiming_eitc", "investment_income")
     def _check_eitc_investment_income(self, data: Dict) -> Optional[Contradiction]:
         """EITC has investment income limit."""
         claiming_eitc = data.get("claiming_eitc", False)
@@ -432,6 +587,7 @@ class ContradictionDetector:
             )
         return None
 
+    @reads("claiming_aotc", "prior_aotc_years")
     def _check_aotc_years(self, data: Dict) -> Optional[Contradiction]:
         """AOTC can only be claimed for 4 years."""
         claiming_aotc = data.get("claiming_aotc", False)
@@ -449,6 +605,7 @@ class ContradictionDetector:
             )
         return None
 
+    @reads("claiming_dependent_care_credit", "earned_income")
     def _check_child_care_credit_income(self, data: Dict) -> Optional[Contradiction]:
         """Child care credit requires earned income."""
         claiming_dcfc = data.get("claiming_dependent_care_credit", False)
@@ -136,7 +136,8 @@ async def _check_firm_subscription(ctx: AuthContext) -> None:
     Verify the user's firm has an active subscription.
 
     Raises 403 if the firm's subscription is cancelled or suspended.
-    Platform admins are exempt from this check.
+    Platform admins are exempt from this check. Firm status is served from
+    the firm status cache, so most requests do no database work.
     Skipped in development/test environments (subscription not enforced without production DB).
     """
     if ctx.user_type == UserType.PLATFORM_ADMIN or not ctx.firm_id:
@@ -149,30 +150,21 @@ async def _check_firm_subscription(ctx: AuthContext) -> None:
         return
 
     try:
-        from sqlalchemy import text as sa_text
-        from database.async_engine import get_async_session_factory
+        from .firm_status_cache import get_firm_status_cache
 
-        session_factory = get_async_session_factory()
-        if session_factory is None:
+        firm = await get_firm_status_cache().get_or_load(str(ctx.firm_id), _load_firm_status)
+        if firm is None:
             return  # No DB configured — skip check (dev/test)
 
-        async with session_factory() as session:
-            result = await session.execute(
-                sa_text("SELECT subscription_status, deleted_at FROM firms WHERE firm_id = :firm_id"),
-                {"firm_id": str(ctx.firm_id)},
-            )
-            row = result.fetchone()
-
-        if not row:
+        if not firm.exists:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Firm not found",
             )
 
-        sub_status = row[0] or "trial"
-        deleted_at = row[1]
+        sub_status = firm.subscription_status or "trial"
 
-        if deleted_at is not None:
+        if firm.deleted:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="This firm account has been deactivated",
@@ -190,6 +182,28 @@ async def _check_firm_subscription(ctx: AuthContext) -> None:
         logger.debug(f"Subscription check skipped: {e}")
 
 
+async def _load_firm_status(firm_id: str):
+    """Read a firm's subscription status from the database (cache loader)."""
+    from sqlalchemy import text as sa_text
+    from database.async_engine import get_async_session_factory
+    from .firm_status_cache import FIRM_NOT_FOUND, FirmStatus
+
+    session_factory = get_async_session_factory()
+    if session_factory is None:
+        return None
+
+    async with session_factory() as session:
+        result = await session.execute(
+            sa_text("SELECT subscription_status, deleted_at FROM firms WHERE firm_id = :firm_id"),
+            {"firm_id": firm_id},
+        )
+        row = result.fetchone()
+
+    if not row:
+        return FIRM_NOT_FOUND
+    return FirmStatus(exists=True, subscription_status=row[0], deleted=row[1] is not None)
+
+
 async def require_auth(
     ctx: AuthContext = Depends(get_auth_context),
 ) -> AuthContext:
@@ -0,0 +1,339 @@
+"""
+CA4CPA GLOBAL LLC - Firm Status Cache
+
+In-process cache of firm subscription status for the per-request
+subscription check in ``rbac.dependencies``.
+
+- Positive entries live for FIRM_STATUS_CACHE_TTL seconds, "firm not found"
+  for FIRM_STATUS_NEGATIVE_TTL seconds.
+- Concurrent misses for the same firm share one database query.
+- Admin and billing code call ``notify_firm_status_changed`` after changing a
+  firm's subscription status or deleting it. The local entry is dropped at
+  once and, when Redis is available, the change is published so every
+  worker process drops it too.
+
+Usage:
+    from rbac.firm_status_cache import notify_firm_status_changed
+
+    firm.subscription_status = "cancelled"
+    await session.commit()
+    await notify_firm_status_changed(firm.firm_id)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+FIRM_STATUS_CACHE_TTL = float(os.environ.get("FIRM_STATUS_CACHE_TTL", "30"))
+FIRM_STATUS_NEGATIVE_TTL = float(os.environ.get("FIRM_STATUS_NEGATIVE_TTL", "10"))
+FIRM_STATUS_CACHE_MAX_ENTRIES = int(os.environ.get("FIRM_STATUS_CACHE_MAX_ENTRIES", "10000"))
+
+# Redis channel carrying invalidations; payload is a firm_id or "*" for all
+FIRM_STATUS_CHANNEL = "rbac:firm_status"
+_INVALIDATE_ALL = "*"
+
+
+@dataclass(frozen=True)
+class FirmStatus:
+    """Subscription state of a firm as seen by the auth check."""
+    exists: bool
+    subscription_status: Optional[str] = None
+    deleted: bool = False
+
+
+FIRM_NOT_FOUND = FirmStatus(exists=False)
+
+
+class FirmStatusCache:
+    """
+    TTL cache of firm_id -> FirmStatus with negative caching.
+
+    Reads and writes happen on the event loop; the lock only guards against
+    invalidations arriving from other threads (e.g. sync admin code).
+    """
+
+    def __init__(
+        self,
+        ttl: float = FIRM_STATUS_CACHE_TTL,
+        negative_ttl: float = FIRM_STATUS_NEGATIVE_TTL,
+        max_entries: int = FIRM_STATUS_CACHE_MAX_ENTRIES,
+    ):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        # firm_id -> (status, loaded_at, expires_at)
+        self._entries: Dict[str, Tuple[FirmStatus, float, float]] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        # Bumped on every invalidation so in-flight loads don't store stale rows
+        self._version = 0
+
+        self._hits = 0
+        self._misses = 0
+        self._expired = 0
+        self._coalesced = 0
+        self._invalidations = 0
+        self._remote_invalidations = 0
+        self._served_age_total = 0.0
+        self._served_age_max = 0.0
+
+        self._redis_client: Optional[Any] = None
+        self._pubsub: Optional[Any] = None
+        self._listener: Optional[asyncio.Task] = None
+
+    # =========================================================================
+    # LOOKUP
+    # =========================================================================
+
+    def get(self, firm_id: str) -> Optional[FirmStatus]:
+        """Return the cached status, or None on a miss or expired entry."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(firm_id)
+            if entry is None:
+                self._misses += 1
+                return None
+            status, loaded_at, expires_at = entry
+            if now >= expires_at:
+                del self._entries[firm_id]
+                self._expired += 1
+                self._misses += 1
+                return None
+            age = now - loaded_at
+            self._hits += 1
+            self._served_age_total += age
+            self._served_age_max = max(self._served_age_max, age)
+            return status
+
+    def set(self, firm_id: str, status: FirmStatus, version: Optional[int] = None) -> None:
+        """Store a status; skipped if an invalidation happened since ``version``."""
+        now = time.monotonic()
+        ttl = self.ttl if status.exists else self.negative_ttl
+        with self._lock:
+            if version is not None and version != self._version:
+                return
+            if len(self._entries) >= self.max_entries and firm_id not in self._entries:
+                self._evict(now)
+            self._entries[firm_id] = (status, now, now + ttl)
+
+    async def get_or_load(
+        self,
+        firm_id: str,
+        loader: Callable[[str], Awaitable[Optional[FirmStatus]]],
+    ) -> Optional[FirmStatus]:
+        """
+        Return the cached status or load it, sharing one load per firm.
+
+        Loader exceptions propagate and are not cached; neither is a None
+        result (no database configured).
+        """
+        status = self.get(firm_id)
+        if status is not None:
+            return status
+
+        pending = self._inflight.get(firm_id)
+        if pending is not None:
+            self._coalesced += 1
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[firm_id] = future
+        version = self._version
+        try:
+            status = await loader(firm_id)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Nobody else may be waiting; mark the exception retrieved
+            future.exception()
+            raise
+        else:
+            if status is not None:
+                self.set(firm_id, status, version=version)
+            future.set_result(status)
+            return status
+        finally:
+            self._inflight.pop(firm_id, None)
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries, or the oldest tenth if none have expired."""
+        expired = [k for k, (_, _, exp) in self._entries.items() if exp <= now]
+        if not expired:
+            by_age = sorted(self._entries, key=lambda k: self._entries[k][1])
+            expired = by_age[: max(1, len(by_age) // 10)]
+        for key in expired:
+            del self._entries[key]
+
+    # =========================================================================
+    # INVALIDATION
+    # =========================================================================
+
+    def invalidate(self, firm_id: Optional[str] = None) -> None:
+        """Drop one firm's entry, or every entry when firm_id is None."""
+        with self._lock:
+            self._version += 1
+            self._invalidations += 1
+            if firm_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(firm_id, None)
+
+    async def publish_invalidation(self, firm_id: Optional[str] = None) -> None:
+        """Tell other worker processes to drop the entry (no-op without Redis)."""
+        if self._redis_client is None:
+            return
+        try:
+            await self._redis_client.publish(FIRM_STATUS_CHANNEL, firm_id or _INVALIDATE_ALL)
+        except Exception as e:
+            logger.warning(f"[FirmStatusCache] Invalidation publish failed: {e}")
+
+    def _handle_message(self, message: Dict[str, Any]) -> None:
+        data = message.get("data")
+        if isinstance(data, bytes):
+            data = data.decode()
+        if not data:
+            return
+        self.invalidate(None if data == _INVALIDATE_ALL else data)
+        self._remote_invalidations += 1
+
+    # =========================================================================
+    # CROSS-PROCESS FAN-OUT
+    # =========================================================================
+
+    async def start_listener(self, redis_client: Optional[Any] = None) -> bool:
+        """
+        Subscribe to invalidations from other workers.
+
+        Args:
+            redis_client: redis.asyncio client; created from settings if omitted
+
+        Returns:
+            True if the listener is running
+        """
+        if self._listener is not None:
+            return True
+
+        if redis_client is None:
+            try:
+                import redis.asyncio as aioredis
+            except ImportError:
+                logger.info("[FirmStatusCache] redis package not available; invalidations are local only")
+                return False
+            try:
+                from config.settings import get_settings
+                redis_url = get_settings().redis.url
+            except Exception:
+                redis_url = "redis://localhost:6379/0"
+            redis_client = aioredis.from_url(redis_url, decode_responses=True)
+
+        try:
+            pubsub = redis_client.pubsub()
+            await pubsub.subscribe(FIRM_STATUS_CHANNEL)
+        except Exception as e:
+            logger.warning(f"[FirmStatusCache] Failed to subscribe to invalidations: {e}")
+            return False
+
+        self._redis_client = redis_client
+        self._pubsub = pubsub
+        self._listener = asyncio.create_task(self._listen())
+        logger.info("[FirmStatusCache] Listening for firm status invalidations")
+        return True
+
+    async def stop_listener(self) -> None:
+        """Stop the invalidation listener and release the Redis connection."""
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.unsubscribe(FIRM_STATUS_CHANNEL)
+                await self._pubsub.close()
+            except Exception:
+                pass
+            self._pubsub = None
+        if self._redis_client is not None:
+            try:
+                await self._redis_client.aclose()
+            except Exception:
+                pass
+            self._redis_client = None
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if message and message.get("type") == "message":
+                    self._handle_message(message)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.warning(f"[FirmStatusCache] Listener error: {e}")
+                # Missed messages could leave stale entries; drop everything
+                self.invalidate()
+                await asyncio.sleep(1.0)
+
+    # =========================================================================
+    # METRICS
+    # =========================================================================
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counts, invalidations and the age of served entries."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "expired": self._expired,
+                "coalesced_loads": self._coalesced,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self._invalidations,
+                "remote_invalidations": self._remote_invalidations,
+                "avg_served_age_seconds": round(self._served_age_total / self._hits, 3) if self._hits else 0.0,
+                "max_served_age_seconds": round(self._served_age_max, 3),
+                "ttl_seconds": self.ttl,
+                "negative_ttl_seconds": self.negative_ttl,
+                "cross_process": self._listener is not None,
+            }
+
+
+# =============================================================================
+# GLOBAL INSTANCE
+# =============================================================================
+
+_firm_status_cache: Optional[FirmStatusCache] = None
+
+
+def get_firm_status_cache() -> FirmStatusCache:
+    """Get the global firm status cache."""
+    global _firm_status_cache
+    if _firm_status_cache is None:
+        _firm_status_cache = FirmStatusCache()
+    return _firm_status_cache
+
+
+async def notify_firm_status_changed(firm_id: Any = None) -> None:
+    """
+    Invalidate a firm's cached status in this and every other worker.
+
+    Call after committing a change to a firm's subscription_status or
+    deleted_at. Pass None to drop every cached firm.
+    """
+    key = str(firm_id) if firm_id is not None else None
+    cache = get_firm_status_cache()
+    cache.invalidate(key)
+    await cache.publish_invalidation(key)
@@ -63,6 +63,8 @@ from .connection_manager import (
     FieldLockManager,
     FieldLock,
     field_lock_manager,
+    OutboundQueue,
+    OverflowPolicy,
 )
 from .event_publisher import (
     EventPublisher,
@@ -94,6 +96,8 @@ __all__ = [
     "FieldLockManager",
     "FieldLock",
     "field_lock_manager",
+    "OutboundQueue",
+    "OverflowPolicy",
     # Event publisher
     "EventPublisher",
     "event_publisher",
@@ -7,8 +7,10 @@ Handles subscriptions, authentication, and event routing.
 
 import asyncio
 import logging
+from collections import deque
 from datetime import datetime, timezone
-from typing import Dict, List, Set, Optional, Any
+from enum import Enum
+from typing import Deque, Dict, Iterable, List, Set, Optional, Any, Tuple
 from uuid import UUID
 from dataclasses import dataclass, field
 from fastapi import WebSocket, WebSocketDisconnect
@@ -18,6 +20,164 @@ from .events import RealtimeEvent, EventType, EventPriority
 
 logger = logging.getLogger(__name__)
 
+# Fan-out defaults
+DEFAULT_SEND_TIMEOUT_SECONDS = 5.0
+DEFAULT_OUTBOUND_QUEUE_SIZE = 256
+
+# Events where only the latest value matters; a queued frame with the same
+# coalesce key is replaced in place instead of growing the queue.
+COALESCIBLE_EVENT_TYPES = frozenset({
+    EventType.PRESENCE_UPDATE,
+    EventType.CURSOR_POSITION,
+    EventType.TAX_CALC_UPDATE,
+})
+
+# asyncio.timeout (3.11+) avoids the extra task wait_for creates per send
+_asyncio_timeout = getattr(asyncio, "timeout", None)
+
+# Priorities that are never evicted to make room for lower-priority frames
+_PROTECTED_PRIORITIES = frozenset({EventPriority.HIGH, EventPriority.URGENT})
+
+
+class OverflowPolicy(str, Enum):
+    """What to do when a connection's outbound queue is full."""
+    DROP_OLDEST = "drop_oldest"  # Evict the oldest unprotected frame
+    DROP_NEWEST = "drop_newest"  # Discard the incoming frame
+
+
+def coalesce_key_for(event: RealtimeEvent) -> Optional[Tuple[str, Optional[str], Optional[str]]]:
+    """Return the coalesce key for an event, or None if it must be delivered as-is."""
+    if event.event_type not in COALESCIBLE_EVENT_TYPES:
+        return None
+    origin = event.data.get("user_id") if isinstance(event.data, dict) else None
+    if origin is None and event.user_id:
+        origin = str(event.user_id)
+    return (event.event_type.value, event.session_id, origin)
+
+
+@dataclass
+class _OutboundFrame:
+    """A serialized frame waiting to be written to a socket."""
+    text: str
+    priority: EventPriority
+    coalesce_key: Optional[Tuple] = None
+
+
+class OutboundQueue:
+    """
+    Bounded per-connection outbound queue.
+
+    Frames are pre-serialized text shared by every recipient of a fan-out.
+    When the queue is full the overflow policy decides which frame is lost;
+    HIGH/URGENT frames are only evicted when nothing else is left. A frame
+    taken by the writer counts as in flight until task_done(), so pending
+    covers frames that are being written as well as queued ones.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = DEFAULT_OUTBOUND_QUEUE_SIZE,
+        policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+    ):
+        self.maxsize = max(1, maxsize)
+        self.policy = policy
+        self._frames: Deque[_OutboundFrame] = deque()
+        self._not_empty: Optional[asyncio.Event] = None
+        self._in_flight = 0
+
+        # Stats
+        self.enqueued = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.high_water = 0
+
+    def _get_event(self) -> asyncio.Event:
+        if self._not_empty is None:
+            self._not_empty = asyncio.Event()
+        return self._not_empty
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    @property
+    def pending(self) -> int:
+        """Frames queued or currently being written."""
+        return len(self._frames) + self._in_flight
+
+    def put(self, frame: _OutboundFrame, front: bool = False) -> str:
+        """
+        Queue a frame without blocking.
+
+        Args:
+            frame: The frame to queue
+            front: Queue ahead of everything already waiting (control frames)
+
+        Returns:
+            "queued", "coalesced" or "dropped"
+        """
+        if frame.coalesce_key is not None:
+            for i, queued in enumerate(self._frames):
+                if queued.coalesce_key == frame.coalesce_key:
+                    self._frames[i] = frame
+                    self.coalesced += 1
+                    return "coalesced"
+
+        if len(self._frames) >= self.maxsize:
+            if not self._make_room(frame):
+                self.dropped += 1
+                return "dropped"
+            self.dropped += 1
+
+        if front:
+            self._frames.appendleft(frame)
+        else:
+            self._frames.append(frame)
+        self.enqueued += 1
+        self.high_water = max(self.high_water, len(self._frames))
+        self._get_event().set()
+        return "queued"
+
+    def _make_room(self, incoming: _OutboundFrame) -> bool:
+        """Evict one frame for ``incoming``. Returns False if ``incoming`` loses."""
+        if self.policy == OverflowPolicy.DROP_NEWEST:
+            return False
+
+        for i, queued in enumerate(self._frames):
+            if queued.priority not in _PROTECTED_PRIORITIES:
+                del self._frames[i]
+                return True
+
+        # Queue is all protected frames: only another protected frame may evict
+        if incoming.priority in _PROTECTED_PRIORITIES:
+            self._frames.popleft()
+            return True
+        return False
+
+    async def get(self) -> _OutboundFrame:
+        """Wait for and remove the oldest frame; call task_done() once it is written."""
+        event = self._get_event()
+        while not self._frames:
+            event.clear()
+            await event.wait()
+        self._in_flight += 1
+        return self._frames.popleft()
+
+    def task_done(self) -> None:
+        """Mark the frame last returned by get() as written (or abandoned)."""
+        self._in_flight = max(0, self._in_flight - 1)
+
+    def clear(self) -> None:
+        self._frames.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "depth": len(self._frames),
+            "high_water": self.high_water,
+            "enqueued": self.enqueued,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+        }
+
 
 @dataclass
 class ConnectionInfo:
@@ -37,6 +197,11 @@ class ConnectionInfo:
     # Stats
     messages_sent: int = 0
     messages_received: int = 0
+    send_timeouts: int = 0
+
+    # Outbound delivery (set up by the ConnectionManager on first fan-out)
+    outbound: Optional[OutboundQueue] = field(default=None, repr=False)
+    writer_task: Optional[asyncio.Task] = field(default=None, repr=False)
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary."""
@@ -51,6 +216,8 @@ class ConnectionInfo:
             "subscribed_events": list(self.subscribed_events),
             "messages_sent": self.messages_sent,
             "messages_received": self.messages_received,
+            "send_timeouts": self.send_timeouts,
+            "outbound": self.outbound.stats() if self.outbound else None,
         }
 
 
@@ -65,9 +232,21 @@ class ConnectionManager:
     - User-specific targeting
     - Session-based subscriptions
     - Heartbeat/keepalive
+    - Serialize-once fan-out through bounded per-connection queues, so a
+      slow client only delays (and eventually drops) its own frames
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        send_timeout: float = DEFAULT_SEND_TIMEOUT_SECONDS,
+        outbound_queue_size: int = DEFAULT_OUTBOUND_QUEUE_SIZE,
+        overflow_policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+    ):
+        # Fan-out settings
+        self._send_timeout = send_timeout
+        self._outbound_queue_size = outbound_queue_size
+        self._overflow_policy = overflow_policy
+
         # Active connections by user_id
         self._connections: Dict[UUID, ConnectionInfo] = {}
 
@@ -195,6 +374,13 @@ class ConnectionManager:
                 if not self._session_subscriptions[session_id]:
                     del self._session_subscriptions[session_id]
 
+        # Stop the outbound writer and discard undelivered frames
+        if connection.writer_task is not None:
+            connection.writer_task.cancel()
+            connection.writer_task = None
+        if connection.outbound is not None:
+            connection.outbound.clear()
+
         # Try to close websocket gracefully
         try:
             await connection.websocket.close()
@@ -267,8 +453,7 @@ class ConnectionManager:
         async with self._get_lock():
             connections = list(self._connections.values())
 
-        for connection in connections:
-            await self._send_to_connection(connection, event)
+        self.fan_out(connections, event)
 
         logger.debug(f"[WS] Broadcast to all: {event.event_type.value} ({len(connections)} clients)")
 
@@ -282,8 +467,7 @@ class ConnectionManager:
                 if uid in self._connections
             ]
 
-        for connection in connections:
-            await self._send_to_connection(connection, event)
+        self.fan_out(connections, event)
 
         logger.debug(f"[WS] Broadcast to firm {event.firm_id}: {event.event_type.value} ({len(connections)} clients)")
 
@@ -297,8 +481,7 @@ class ConnectionManager:
                 if uid in self._connections
             ]
 
-        for connection in connections:
-            await self._send_to_connection(connection, event)
+        self.fan_out(connections, event)
 
         logger.debug(f"[WS] Broadcast to session {event.session_id}: {event.event_type.value} ({len(connections)} clients)")
 
@@ -308,18 +491,110 @@ class ConnectionManager:
             connection = self._connections.get(event.user_id)
 
         if connection:
-            await self._send_to_connection(connection, event)
+            self.fan_out([connection], event)
             logger.debug(f"[WS] Sent to user {event.user_id}: {event.event_type.value}")
 
-    async def _send_to_connection(self, connection: ConnectionInfo, event: RealtimeEvent):
-        """Send event to a specific connection."""
+    def fan_out(self, connections: Iterable[ConnectionInfo], event: RealtimeEvent) -> Dict[str, int]:
+        """
+        Queue one event for many connections.
+
+        The event is serialized to a text frame exactly once and the same
+        string is handed to every connection's outbound queue. Writers drain
+        the queues concurrently, each send bounded by the send timeout.
+
+        Returns:
+            Counts of frames "queued", "coalesced" and "dropped"
+        """
+        frame_text = event.to_json()
+        coalesce_key = coalesce_key_for(event)
+
+        outcomes = {"queued": 0, "coalesced": 0, "dropped": 0}
+        for connection in connections:
+            queue = self._ensure_writer(connection)
+            outcome = queue.put(_OutboundFrame(
+                text=frame_text,
+                priority=event.priority,
+                coalesce_key=coalesce_key,
+            ))
+            outcomes[outcome] += 1
+
+        if outcomes["dropped"]:
+            logger.warning(
+                f"[WS] Dropped {outcomes['dropped']} frame(s) of {event.event_type.value} "
+                f"for slow consumers"
+            )
+        return outcomes
+
+    def _ensure_writer(self, connection: ConnectionInfo) -> OutboundQueue:
+        """Return the connection's outbound queue, starting its writer if needed."""
+        if connection.outbound is None:
+            connection.outbound = OutboundQueue(
+                maxsize=self._outbound_queue_size,
+                policy=self._overflow_policy,
+            )
+        if connection.writer_task is None or connection.writer_task.done():
+            connection.writer_task = asyncio.create_task(self._writer_loop(connection))
+        return connection.outbound
+
+    async def _writer_loop(self, connection: ConnectionInfo):
+        """Drain a connection's outbound queue, one frame at a time."""
+        queue = connection.outbound
+        while True:
+            frame = await queue.get()
+            try:
+                await self._send_text(connection, frame.text)
+            finally:
+                queue.task_done()
+
+    async def _send_text(self, connection: ConnectionInfo, text: str) -> bool:
+        """Write a pre-serialized frame, bounded by the send timeout."""
         try:
-            await connection.websocket.send_json(event.to_dict())
-            connection.messages_sent += 1
-            connection.last_activity = datetime.now(timezone.utc)
+            if _asyncio_timeout is not None:
+                async with _asyncio_timeout(self._send_timeout):
+                    await connection.websocket.send_text(text)
+            else:
+                await asyncio.wait_for(connection.websocket.send_text(text), timeout=self._send_timeout)
+        except asyncio.TimeoutError:
+            connection.send_timeouts += 1
+            logger.warning(f"[WS] Send to {connection.user_email} timed out after {self._send_timeout}s")
+            return False
         except Exception as e:
             logger.warning(f"[WS] Failed to send to {connection.user_email}: {e}")
             # Don't remove here - let the disconnect handler clean up
+            return False
+
+        connection.messages_sent += 1
+        connection.last_activity = datetime.now(timezone.utc)
+        return True
+
+    async def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every outbound queue is empty and no send is in flight.
+
+        Used on shutdown and by tests. Returns False if the timeout expired.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout if timeout is not None else None
+        while any(
+            c.outbound is not None and c.outbound.pending > 0
+            for c in list(self._connections.values())
+        ):
+            if deadline is not None and loop.time() >= deadline:
+                return False
+            await asyncio.sleep(0.001)
+        return True
+
+    async def _send_to_connection(self, connection: ConnectionInfo, event: RealtimeEvent):
+        """
+        Queue a control frame (welcome, heartbeat reply, lock denial) for one connection.
+
+        It goes through the connection's writer so it is never written
+        concurrently with fan-out frames, ahead of anything already queued
+        and at least HIGH priority so overflow does not evict it.
+        """
+        priority = event.priority if event.priority in _PROTECTED_PRIORITIES else EventPriority.HIGH
+        queue = self._ensure_writer(connection)
+        queue.put(_OutboundFrame(text=event.to_json(), priority=priority), front=True)
 
     async def handle_message(self, user_id: UUID, message: Dict[str, Any]):
         """
@@ -481,10 +756,19 @@ class ConnectionManager:
         firms_with_connections = len(self._firm_connections)
         active_sessions = len(self._session_subscriptions)
 
+        outbound = {"depth": 0, "dropped": 0, "coalesced": 0, "send_timeouts": 0}
+        for connection in self._connections.values():
+            outbound["send_timeouts"] += connection.send_timeouts
+            if connection.outbound is not None:
+                outbound["depth"] += len(connection.outbound)
+                outbound["dropped"] += connection.outbound.dropped
+                outbound["coalesced"] += connection.outbound.coalesced
+
         return {
             "total_connections": total_connections,
             "firms_with_connections": firms_with_connections,
             "active_session_subscriptions": active_sessions,
+            "outbound": outbound,
             "connections_by_firm": {
                 str(firm_id): len(users)
                 for firm_id, users in self._firm_connections.items()
@@ -12,7 +12,9 @@ import hashlib
 import logging
 import os
 import secrets
-from typing import Optional, Union
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Sequence, Union
 
 logger = logging.getLogger(__name__)
 
@@ -54,6 +56,12 @@ class DataEncryptor:
     - Unique random nonce for each encryption
     - Key derived from master key using PBKDF2
     - No plaintext exposure in memory longer than necessary
+
+    Keys derived while decrypting are cached per salt (bounded LRU), so
+    decrypting the same records again skips PBKDF2. Fresh salts from
+    encrypt() are never cached: each is used once and would only evict keys
+    worth keeping. encrypt_many() derives one key for a whole batch. The cache belongs to the instance: rotating the master key means
+    a new encryptor (see reset_encryptor()).
     """
 
     # Nonce size for GCM (96 bits recommended)
@@ -64,6 +72,8 @@ class DataEncryptor:
     KEY_SIZE = 32
     # PBKDF2 iterations
     ITERATIONS = 100000
+    # Derived keys kept per encryptor
+    KEY_CACHE_SIZE = 1024
 
     def __init__(self, master_key: Optional[str] = None):
         """
@@ -94,6 +104,10 @@ class DataEncryptor:
                 )
                 self._master_key = secrets.token_hex(32)
 
+        # salt -> AESGCM built from the PBKDF2-derived key
+        self._cipher_cache: "OrderedDict[bytes, AESGCM]" = OrderedDict()
+        self._cipher_cache_lock = threading.Lock()
+
     def encrypt(self, plaintext: Union[str, bytes], associated_data: Optional[bytes] = None) -> str:
         """
         Encrypt data using AES-256-GCM.
@@ -113,27 +127,59 @@ class DataEncryptor:
             if isinstance(plaintext, str):
                 plaintext = plaintext.encode("utf-8")
 
-            # Generate random salt and nonce
+            # Generate random salt and derive key from master key
             salt = secrets.token_bytes(self.SALT_SIZE)
-            nonce = secrets.token_bytes(self.NONCE_SIZE)
+            return self._encrypt_with(salt, AESGCM(self._derive_key(salt)), plaintext, associated_data)
 
-            # Derive key from master key
-            key = self._derive_key(salt)
-
-            # Encrypt with AES-GCM
-            aesgcm = AESGCM(key)
-            ciphertext = aesgcm.encrypt(nonce, plaintext, associated_data)
+        except (ValueError, TypeError, OverflowError) as e:
+            logger.error(f"Encryption failed: {type(e).__name__}")
+            raise EncryptionError("Failed to encrypt data") from e
 
-            # Combine salt, nonce, and ciphertext
-            combined = salt + nonce + ciphertext
+    def encrypt_many(
+        self,
+        plaintexts: Sequence[Union[str, bytes]],
+        associated_data: Optional[bytes] = None,
+    ) -> List[str]:
+        """
+        Encrypt a batch of values.
 
-            # Return base64 encoded
-            return base64.b64encode(combined).decode("utf-8")
+        The batch shares one random salt (so one PBKDF2 derivation); every
+        value still gets its own random nonce. Output is in the same format
+        as encrypt().
 
+        Raises:
+            EncryptionError: If encryption fails
+        """
+        try:
+            salt = secrets.token_bytes(self.SALT_SIZE)
+            aesgcm = AESGCM(self._derive_key(salt))
+            return [
+                self._encrypt_with(
+                    salt, aesgcm,
+                    value.encode("utf-8") if isinstance(value, str) else value,
+                    associated_data,
+                )
+                for value in plaintexts
+            ]
         except (ValueError, TypeError, OverflowError) as e:
             logger.error(f"Encryption failed: {type(e).__name__}")
             raise EncryptionError("Failed to encrypt data") from e
 
+    def _encrypt_with(
+        self,
+        salt: bytes,
+        aesgcm: "AESGCM",
+        plaintext: bytes,
+        associated_data: Optional[bytes],
+    ) -> str:
+        nonce = secrets.token_bytes(self.NONCE_SIZE)
+
+        # Encrypt with AES-GCM
+        ciphertext = aesgcm.encrypt(nonce, plaintext, associated_data)
+
+        # Combine salt, nonce, and ciphertext, return base64 encoded
+        return base64.b64encode(salt + nonce + ciphertext).decode("utf-8")
+
     def decrypt(self, encrypted_data: str, associated_data: Optional[bytes] = None) -> str:
         """
         Decrypt data encrypted with encrypt().
@@ -157,11 +203,10 @@ class DataEncryptor:
             nonce = combined[self.SALT_SIZE:self.SALT_SIZE + self.NONCE_SIZE]
             ciphertext = combined[self.SALT_SIZE + self.NONCE_SIZE:]
 
-            # Derive key from master key
-            key = self._derive_key(salt)
+            # Derive key from master key (cached per salt)
+            aesgcm = self._get_cipher(salt)
 
             # Decrypt with AES-GCM
-            aesgcm = AESGCM(key)
             plaintext = aesgcm.decrypt(nonce, ciphertext, associated_data)
 
             return plaintext.decode("utf-8")
@@ -170,6 +215,19 @@ class DataEncryptor:
             logger.error(f"Decryption failed: {type(e).__name__}")
             raise DecryptionError("Failed to decrypt data - possible tampering") from e
 
+    def decrypt_many(
+        self,
+        encrypted_values: Sequence[str],
+        associated_data: Optional[bytes] = None,
+    ) -> List[str]:
+        """
+        Decrypt a batch of values from encrypt() or encrypt_many().
+
+        Raises:
+            DecryptionError: If any value fails to decrypt
+        """
+        return [self.decrypt(value, associated_data) for value in encrypted_values]
+
     def encrypt_ssn(self, ssn: str) -> str:
         """
         Encrypt an SSN with additional validation.
@@ -242,6 +300,23 @@ class DataEncryptor:
         combined = salt_bytes + clean_ssn.encode("utf-8")
         return hashlib.sha256(combined).hexdigest()
 
+    def _get_cipher(self, salt: bytes) -> "AESGCM":
+        """AESGCM for a salt, deriving the key only on a cache miss."""
+        with self._cipher_cache_lock:
+            aesgcm = self._cipher_cache.get(salt)
+            if aesgcm is not None:
+                self._cipher_cache.move_to_end(salt)
+                return aesgcm
+
+        # Derive outside the lock; a concurrent miss on the same salt just
+        # derives the same key twice
+        aesgcm = AESGCM(self._derive_key(salt))
+        with self._cipher_cache_lock:
+            self._cipher_cache[salt] = aesgcm
+            while len(self._cipher_cache) > self.KEY_CACHE_SIZE:
+                self._cipher_cache.popitem(last=False)
+        return aesgcm
+
     def _derive_key(self, salt: bytes) -> bytes:
         """Derive encryption key from master key using PBKDF2."""
         kdf = PBKDF2HMAC(
@@ -265,6 +340,12 @@ def get_encryptor() -> DataEncryptor:
     return _encryptor
 
 
+def reset_encryptor() -> None:
+    """Drop the singleton (and its derived-key cache), e.g. after key rotation."""
+    global _encryptor
+    _encryptor = None
+
+
 def encrypt_sensitive_field(value: str) -> str:
     """Convenience function to encrypt a sensitive field."""
     return get_encryptor().encrypt(value)
@@ -11,18 +11,29 @@ Usage:
     session_factory = get_async_session_factory()
     analytics_svc = AnalyticsEventService(session_factory)
     analytics_svc.register_handlers()  # Call at app startup
+    ...
+    analytics_svc.shutdown()  # Flush queued events at app shutdown
+
+Events are written in batches: the worker drains up to ANALYTICS_BATCH_SIZE
+events, or whatever arrived within ANALYTICS_FLUSH_INTERVAL_MS of the first
+one, into a single bulk INSERT. The queue is bounded by
+ANALYTICS_QUEUE_MAXSIZE; when it is full new events are dropped and counted
+rather than blocking the emitter.
 """
 
 import asyncio
 import json
 import logging
+import os
 import threading
+import time
 from datetime import datetime, timezone
-from typing import Any, Optional, Dict
+from typing import Any, List, Optional, Dict
 from decimal import Decimal
 from uuid import uuid4
-from queue import Queue
+from queue import Empty, Full, Queue
 
+from sqlalchemy import insert
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from src.database.models import AnalyticsEventRecord
@@ -41,22 +52,54 @@ from src.events.journey_events import (
 
 logger = logging.getLogger(__name__)
 
+# Batching configuration
+ANALYTICS_BATCH_SIZE = int(os.environ.get("ANALYTICS_BATCH_SIZE", "500"))
+ANALYTICS_FLUSH_INTERVAL_MS = int(os.environ.get("ANALYTICS_FLUSH_INTERVAL_MS", "250"))
+ANALYTICS_QUEUE_MAXSIZE = int(os.environ.get("ANALYTICS_QUEUE_MAXSIZE", "10000"))
+
+# How long the worker blocks waiting for the first event of a batch
+_IDLE_POLL_SECONDS = 1.0
+
+# Log a dropped-event warning once per this many drops
+_DROP_LOG_EVERY = 1000
+
 
 class AnalyticsEventService:
     """Service for persisting journey events to analytics_events table.
 
     Uses a queue-based approach to persist events asynchronously without blocking
-    the event emitter. A background thread manages the async database operations.
+    the event emitter. A background thread manages the async database operations
+    and writes queued events in batches.
     """
 
-    def __init__(self, session_factory: async_sessionmaker):
-        """Initialize with database session factory."""
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        batch_size: int = ANALYTICS_BATCH_SIZE,
+        flush_interval_ms: int = ANALYTICS_FLUSH_INTERVAL_MS,
+        queue_maxsize: int = ANALYTICS_QUEUE_MAXSIZE,
+    ):
+        """Initialize with database session factory and batching limits."""
         self.session_factory = session_factory
         self.event_bus = get_event_bus()
-        self._event_queue: Queue[Dict[str, Any]] = Queue()
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = max(0, flush_interval_ms) / 1000.0
+        self._event_queue: Queue[Dict[str, Any]] = Queue(maxsize=queue_maxsize)
         self._background_thread: Optional[threading.Thread] = None
         self._shutdown_event = threading.Event()
 
+        # Metrics (updated from emitter threads and the worker thread)
+        self._metrics_lock = threading.Lock()
+        self._enqueued = 0
+        self._dropped = 0
+        self._persisted = 0
+        self._failed = 0
+        self._batches = 0
+        self._flush_ms_total = 0.0
+        self._flush_ms_max = 0.0
+        self._last_flush_ms = 0.0
+        self._last_batch_size = 0
+
     def register_handlers(self) -> None:
         """Register event bus handlers for all journey events.
 
@@ -79,11 +122,69 @@ class AnalyticsEventService:
     def _start_worker(self) -> None:
         """Start the background worker thread for async persistence."""
         if self._background_thread is None:
+            self._shutdown_event.clear()
             self._background_thread = threading.Thread(
                 target=self._worker_loop, daemon=True, name="AnalyticsEventWorker"
             )
             self._background_thread.start()
 
+    def shutdown(self, timeout: float = 10.0) -> bool:
+        """Stop the worker after flushing every queued event.
+
+        Call this at application shutdown.
+
+        Returns:
+            True if the worker finished within the timeout
+        """
+        self._shutdown_event.set()
+        thread = self._background_thread
+        if thread is None:
+            return True
+        thread.join(timeout)
+        if thread.is_alive():
+            logger.warning(
+                f"[AnalyticsEventService] Worker did not finish within {timeout}s; "
+                f"{self._event_queue.qsize()} events still queued"
+            )
+            return False
+        self._background_thread = None
+        return True
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Queue depth, throughput counters and flush latency."""
+        with self._metrics_lock:
+            return {
+                "queue_depth": self._event_queue.qsize(),
+                "queue_capacity": self._event_queue.maxsize,
+                "enqueued": self._enqueued,
+                "dropped": self._dropped,
+                "persisted": self._persisted,
+                "failed": self._failed,
+                "batches": self._batches,
+                "last_batch_size": self._last_batch_size,
+                "last_flush_ms": round(self._last_flush_ms, 3),
+                "avg_flush_ms": round(self._flush_ms_total / self._batches, 3) if self._batches else 0.0,
+                "max_flush_ms": round(self._flush_ms_max, 3),
+            }
+
+    def _enqueue(self, fields: Dict[str, Any]) -> bool:
+        """Queue an event without blocking; count it as dropped if the queue is full."""
+        fields.setdefault("occurred_at", fields["received_at"])
+        try:
+            self._event_queue.put_nowait(fields)
+        except Full:
+            with self._metrics_lock:
+                self._dropped += 1
+                dropped = self._dropped
+            if dropped == 1 or dropped % _DROP_LOG_EVERY == 0:
+                logger.warning(
+                    f"[AnalyticsEventService] Event queue full; dropped {dropped} events so far"
+                )
+            return False
+        with self._metrics_lock:
+            self._enqueued += 1
+        return True
+
     def _worker_loop(self) -> None:
         """Background thread main loop - processes events from queue."""
         try:
@@ -92,21 +193,87 @@ class AnalyticsEventService:
             logger.error(f"[AnalyticsEventService] Worker loop error: {e}", exc_info=True)
 
     async def _async_worker(self) -> None:
-        """Async worker that processes queued events."""
-        while not self._shutdown_event.is_set():
-            try:
-                # Non-blocking check for queued events
-                try:
-                    fields = self._event_queue.get(timeout=1.0)
-                except:
-                    # Queue timeout - check shutdown and continue
-                    continue
+        """Async worker that persists queued events in batches.
 
-                # Persist the event
-                await self._persist_event(**fields)
+        Keeps draining after shutdown is requested until the queue is empty.
+        """
+        while True:
+            try:
+                batch = self._next_batch()
+                if batch:
+                    await self._persist_batch(batch)
+                elif self._shutdown_event.is_set():
+                    break
             except Exception as e:
                 logger.error(f"[AnalyticsEventService] Worker error: {e}", exc_info=True)
 
+    def _next_batch(self) -> List[Dict[str, Any]]:
+        """Collect up to batch_size events, waiting at most flush_interval after the first."""
+        if self._shutdown_event.is_set():
+            # Shutting down: take whatever is queued, don't wait for more
+            batch = []
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._event_queue.get_nowait())
+                except Empty:
+                    break
+            return batch
+
+        try:
+            batch = [self._event_queue.get(timeout=_IDLE_POLL_SECONDS)]
+        except Empty:
+            return []
+
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0 or self._shutdown_event.is_set():
+                    batch.append(self._event_queue.get_nowait())
+                else:
+                    # Wake up periodically so shutdown isn't held by a long interval
+                    batch.append(self._event_queue.get(timeout=min(remaining, _IDLE_POLL_SECONDS)))
+            except Empty:
+                if remaining <= 0 or self._shutdown_event.is_set():
+                    break
+        return batch
+
+    async def _persist_batch(self, batch: List[Dict[str, Any]]) -> int:
+        """Write a batch with one bulk INSERT and one commit.
+
+        If the bulk insert fails, rows are retried one by one so a single
+        bad event doesn't lose the rest of the batch.
+
+        Returns:
+            Number of events persisted
+        """
+        start = time.perf_counter()
+        try:
+            async with self.session_factory() as session:
+                await session.execute(insert(AnalyticsEventRecord), batch)
+                await session.commit()
+            persisted = len(batch)
+        except Exception as e:
+            logger.warning(
+                f"[AnalyticsEventService] Bulk insert of {len(batch)} events failed, "
+                f"retrying individually: {e}"
+            )
+            persisted = 0
+            for fields in batch:
+                if await self._persist_event(**fields) is not None:
+                    persisted += 1
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self._metrics_lock:
+            self._persisted += persisted
+            self._failed += len(batch) - persisted
+            self._batches += 1
+            self._last_batch_size = len(batch)
+            self._last_flush_ms = elapsed_ms
+            self._flush_ms_total += elapsed_ms
+            self._flush_ms_max = max(self._flush_ms_max, elapsed_ms)
+        return persisted
+
     async def _persist_event(self, **fields) -> Optional[AnalyticsEventRecord]:
         """Persist an event record to the database.
 
@@ -130,7 +297,7 @@ class AnalyticsEventService:
     def _handle_advisor_profile_complete(self, event: AdvisorProfileComplete) -> None:
         """Queue AdvisorProfileComplete event for persistence."""
         try:
-            self._event_queue.put({
+            self._enqueue({
                 "event_id": uuid4(),
                 "received_at": datetime.now(timezone.utc),
                 "event_type": "AdvisorProfileComplete",
@@ -139,7 +306,7 @@ class AnalyticsEventService:
                 "session_id": event.session_id,
                 "profile_completeness": Decimal(str(event.profile_completeness)),
                 "extracted_forms": ",".join(event.extracted_forms) if event.extracted_forms else None,
-                "data_json": {
+                "event_payload": {
                     "session_id": event.session_id,
                     "profile_completeness": event.profile_completeness,
                     "extracted_forms": event.extracted_forms
@@ -151,7 +318,7 @@ class AnalyticsEventService:
     def _handle_advisor_message_sent(self, event: AdvisorMessageSent) -> None:
         """Queue AdvisorMessageSent event for persistence."""
         try:
-            self._event_queue.put({
+            self._enqueue({
                 "event_id": uuid4(),
                 "received_at": datetime.now(timezone.utc),
                 "event_type": "AdvisorMessageSent",
@@ -159,7 +326,7 @@ class AnalyticsEventService:
                 "user_id": event.user_id,
                 "session_id": event.session_id,
                 "message_text": event.message_text[:1000] if event.message_text else None,
-                "data_json": {
+                "event_payload": {
                     "session_id": event.session_id,
                     "message_length": len(event.message_text) if event.message_text else 0
                 },
@@ -170,7 +337,7 @@ class AnalyticsEventService:
     def _handle_document_processed(self, event: DocumentProcessed) -> None:
         """Queue DocumentProcessed event for persistence."""
         try:
-            self._event_queue.put({
+            self._enqueue({
                 "event_id": uuid4(),
                 "received_at": datetime.now(timezone.utc),
                 "event_type": "DocumentProcessed",
@@ -179,7 +346,7 @@ class AnalyticsEventService:
                 "document_id": event.document_id,
                 "document_type": event.document_type,
                 "fields_extracted": event.fields_extracted,
-                "data_json": {
+                "event_payload": {
                     "document_id": event.document_id,
                     "document_type": event.document_type,
                     "fields_extracted": event.fields_extracted
@@ -191,7 +358,7 @@ class AnalyticsEventService:
     def _handle_return_draft_saved(self, event: ReturnDraftSaved) -> None:
         """Queue ReturnDraftSaved event for persistence."""
         try:
-            self._event_queue.put({
+            self._enqueue({
                 "event_id": uuid4(),
                 "received_at": datetime.now(timezone.utc),
                 "event_type": "ReturnDraftSaved",
@@ -200,7 +367,7 @@ class AnalyticsEventService:
                 "session_id": event.session_id,
                 "return_id": event.return_id,
                 "return_completeness": Decimal(str(event.completeness)),
-                "data_json": {
+                "event_payload": {
                     "return_id": event.return_id,
                     "completeness": event.completeness
                 },
@@ -211,14 +378,14 @@ class AnalyticsEventService:
     def _handle_return_submitted(self, event: ReturnSubmittedForReview) -> None:
         """Queue ReturnSubmittedForReview event for persistence."""
         try:
-            self._event_queue.put({
+            self._enqueue({
                 "event_id": uuid4(),
                 "received_at": datetime.now(timezone.utc),
                 "event_type": "ReturnSubmittedForReview",
                 "tenant_id": event.tenant_id,
                 "user_id": event.user_id,
                 "session_id": event.session_id,
-                "data_json": {"session_id": event.session_id},
+                "event_payload": {"session_id": event.session_id},
             })
         except Exception as e:
             logger.error(f"[AnalyticsEventService] Failed to queue event: {e}")
@@ -226,7 +393,7 @@ class AnalyticsEventService:
     def _handle_scenario_created(self, event: ScenarioCreated) -> None:
         """Queue ScenarioCreated event for persistence."""
         try:
-            self._event_queue.put({
+            self._enqueue({
                 "event_id": uuid4(),
                 "received_at": datetime.now(timezone.utc),
                 "event_type": "ScenarioCreated",
@@ -236,7 +403,7 @@ class AnalyticsEventService:
                 "scenario_id": event.scenario_id,
                 "scenario_name": event.name,
                 "scenario_savings": Decimal(str(event.savings_amount)) if event.savings_amount else None,
-                "data_json": {
+                "event_payload": {
                     "scenario_id": event.scenario_id,
                     "name": event.name,
                     "savings_amount": event.savings_amount
@@ -248,7 +415,7 @@ class AnalyticsEventService:
     def _handle_review_completed(self, event: ReviewCompleted) -> None:
         """Queue ReviewCompleted event for persistence."""
         try:
-            self._event_queue.put({
+            self._enqueue({
                 "event_id": uuid4(),
                 "received_at": datetime.now(timezone.utc),
                 "event_type": "ReviewCompleted",
@@ -258,7 +425,7 @@ class AnalyticsEventService:
                 "cpa_id": event.cpa_id,
                 "review_status": event.status,
                 "review_notes": event.notes[:1000] if event.notes else None,
-                "data_json": {
+                "event_payload": {
                     "session_id": event.session_id,
                     "cpa_id": event.cpa_id,
                     "status": event.status,
@@ -271,7 +438,7 @@ class AnalyticsEventService:
     def _handle_report_generated(self, event: ReportGenerated) -> None:
         """Queue ReportGenerated event for persistence."""
         try:
-            self._event_queue.put({
+            self._enqueue({
                 "event_id": uuid4(),
                 "received_at": datetime.now(timezone.utc),
                 "event_type": "ReportGenerated",
@@ -280,7 +447,7 @@ class AnalyticsEventService:
                 "session_id": event.session_id,
                 "report_id": event.report_id,
                 "download_url": event.download_url,
-                "data_json": {
+                "event_payload": {
                     "report_id": event.report_id,
                     "download_url": event.download_url
                 },
@@ -291,17 +458,17 @@ class AnalyticsEventService:
     def _handle_lead_state_changed(self, event: LeadStateChanged) -> None:
         """Queue LeadStateChanged event for persistence."""
         try:
-            self._event_queue.put({
+            self._enqueue({
                 "event_id": uuid4(),
                 "received_at": datetime.now(timezone.utc),
                 "event_type": "LeadStateChanged",
                 "tenant_id": event.tenant_id,
                 "user_id": event.user_id,
                 "lead_id": event.lead_id,
-                "lead_from_state": event.from_state,
-                "lead_to_state": event.to_state,
+                "lead_previous_state": event.from_state,
+                "lead_new_state": event.to_state,
                 "lead_trigger": event.trigger,
-                "data_json": {
+                "event_payload": {
                     "lead_id": event.lead_id,
                     "from_state": event.from_state,
                     "to_state": event.to_state,
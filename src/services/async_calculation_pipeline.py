@@ -5,13 +5,34 @@ Async version of the calculation pipeline that supports:
 - Async pipeline steps
 - Integration with IUnitOfWork
 - Non-blocking tax calculations
+
+CPU-bound engine calls (federal and state) run on a shared
+CalculationExecutor rather than on the event loop, so one heavy return
+no longer stalls every other request on the worker. The executor applies
+admission control (PipelineOverloadedError once too many calculations are
+in flight) and reports queue depth and wait times via get_stats().
+
+Configuration:
+    CALC_EXECUTOR: "thread" (default) or "process"
+    CALC_EXECUTOR_WORKERS: Concurrent engine calls (default: min(4, CPUs))
+    CALC_MAX_PENDING: Running + queued engine calls before new ones are
+        rejected (default: 64)
+    CALC_BATCH_CONCURRENCY: Returns in flight per execute_batch() call
+        (default: 2 x workers)
+    CALC_RETRY_AFTER_SECONDS: Retry-After hint sent with the 503 for a
+        rejected calculation (default: 2)
 """
 
+import asyncio
+import functools
+import os
+import threading
 import time
 from abc import ABC, abstractmethod
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, Callable, Iterable, List, Tuple
 
 from .logging_config import get_logger, CalculationLogger
 
@@ -24,6 +45,212 @@ from domain import PriorYearCarryovers
 
 logger = get_logger(__name__)
 
+CALC_EXECUTOR = os.environ.get("CALC_EXECUTOR", "thread").lower()
+CALC_EXECUTOR_WORKERS = int(os.environ.get("CALC_EXECUTOR_WORKERS", str(min(4, os.cpu_count() or 1))))
+CALC_MAX_PENDING = int(os.environ.get("CALC_MAX_PENDING", "64"))
+CALC_BATCH_CONCURRENCY = int(os.environ.get("CALC_BATCH_CONCURRENCY", "0")) or 2 * CALC_EXECUTOR_WORKERS
+CALC_RETRY_AFTER_SECONDS = int(os.environ.get("CALC_RETRY_AFTER_SECONDS", "2"))
+
+
+class PipelineOverloadedError(RuntimeError):
+    """Raised when the calculation executor has no room for more work.
+
+    Web routes turn this into a 503 with a Retry-After header of
+    retry_after seconds (see web.dependencies.pipeline_overloaded_handler).
+    """
+
+    def __init__(self, message: str, retry_after: int = CALC_RETRY_AFTER_SECONDS):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _timed_call(fn: Callable[..., Any], args: Tuple[Any, ...]) -> Tuple[Any, float, float]:
+    """Run fn in a worker; returns (result, started_at, duration_seconds).
+
+    Module-level so it can be pickled for a process pool. time.monotonic()
+    is system-wide, so started_at is comparable across processes.
+    """
+    started_at = time.monotonic()
+    result = fn(*args)
+    return result, started_at, time.monotonic() - started_at
+
+
+def _calculate_federal(
+    engine: FederalTaxEngine, tax_return: TaxReturn
+) -> Tuple[CalculationBreakdown, TaxReturn]:
+    """Federal engine call that also hands back the return it updated.
+
+    The engine sets AGI / taxable income on the return in place; with a
+    process pool that happens on a copy, which _copy_back() applies to the
+    caller's object.
+    """
+    return engine.calculate(tax_return), tax_return
+
+
+def _copy_back(original: TaxReturn, updated: TaxReturn) -> TaxReturn:
+    """Apply a worker's updates to the caller's return and return it.
+
+    With a thread pool the worker mutates the original, so this is a no-op.
+    With a process pool the worker returns a pickled copy; copying its
+    attributes onto the original keeps every reference the caller holds
+    to context.tax_return current.
+    """
+    if updated is original:
+        return original
+    original.__dict__.update(updated.__dict__)
+    fields_set = getattr(updated, "__pydantic_fields_set__", None)
+    if fields_set is not None:
+        # Keep exclude_unset dumps of the original consistent with the copy
+        object.__setattr__(original, "__pydantic_fields_set__", set(fields_set))
+    return original
+
+
+class CalculationExecutor:
+    """
+    Runs CPU-bound calculation work off the event loop.
+
+    Work is admitted while fewer than max_pending calls are running or
+    queued; beyond that run() raises PipelineOverloadedError so callers
+    can shed load (e.g. respond 503) instead of queueing without bound.
+
+    The default thread pool keeps the loop responsive but shares the GIL.
+    A process pool ("process") adds CPU parallelism; engines, returns and
+    results must then be picklable.
+    """
+
+    def __init__(
+        self,
+        executor: Optional[Executor] = None,
+        workers: int = CALC_EXECUTOR_WORKERS,
+        max_pending: int = CALC_MAX_PENDING,
+        kind: str = CALC_EXECUTOR,
+    ):
+        self.workers = max(1, workers)
+        self.max_pending = max(1, max_pending)
+        self.kind = kind
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._lock = threading.Lock()
+
+        self._pending = 0
+        self._max_queue_depth = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._run_total = 0.0
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.kind == "process":
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers, thread_name_prefix="calc-worker"
+                    )
+            return self._executor
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run fn(*args) on the executor and await its result.
+
+        Raises:
+            PipelineOverloadedError: max_pending calls are already in flight
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._rejected += 1
+                raise PipelineOverloadedError(
+                    f"Calculation executor saturated "
+                    f"({self._pending} pending, limit {self.max_pending})"
+                )
+            self._pending += 1
+            self._submitted += 1
+            self._max_queue_depth = max(self._max_queue_depth, self._pending - self.workers)
+
+        submitted_at = time.monotonic()
+        try:
+            result, started_at, duration = await asyncio.get_running_loop().run_in_executor(
+                self._get_executor(), _timed_call, fn, args
+            )
+        except BaseException:
+            with self._lock:
+                self._pending -= 1
+                self._failed += 1
+            raise
+
+        wait = max(0.0, started_at - submitted_at)
+        with self._lock:
+            self._pending -= 1
+            self._completed += 1
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+            self._run_total += duration
+        return result
+
+    @property
+    def queue_depth(self) -> int:
+        """Admitted calls waiting for a free worker."""
+        return max(0, self._pending - self.workers)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Executor load and latency metrics."""
+        with self._lock:
+            completed = self._completed
+            return {
+                "executor": self.kind,
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": self._pending,
+                "running": min(self._pending, self.workers),
+                "queue_depth": max(0, self._pending - self.workers),
+                "max_queue_depth": self._max_queue_depth,
+                "submitted": self._submitted,
+                "completed": completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "avg_wait_ms": round(self._wait_total / completed * 1000, 3) if completed else 0.0,
+                "max_wait_ms": round(self._wait_max * 1000, 3),
+                "avg_run_ms": round(self._run_total / completed * 1000, 3) if completed else 0.0,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the executor (only if this instance created it)."""
+        if not self._owns_executor:
+            return
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+_calculation_executor: Optional[CalculationExecutor] = None
+
+
+def get_calculation_executor() -> CalculationExecutor:
+    """Get the process-wide calculation executor."""
+    global _calculation_executor
+    if _calculation_executor is None:
+        _calculation_executor = CalculationExecutor()
+    return _calculation_executor
+
+
+def set_calculation_executor(executor: Optional[CalculationExecutor]) -> None:
+    """Replace the shared executor (tests, custom pools)."""
+    global _calculation_executor
+    _calculation_executor = executor
+
+
+def reset_calculation_executor(wait: bool = True) -> None:
+    """Shut down and drop the shared executor."""
+    global _calculation_executor
+    executor, _calculation_executor = _calculation_executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
+
 
 @dataclass
 class PipelineContext:
@@ -74,8 +301,14 @@ class AsyncPipelineStep(ABC):
     Abstract base class for async pipeline steps.
 
     Each step processes the context asynchronously and passes it to the next step.
+
+    Consecutive steps with parallel_safe = True run concurrently. Such a
+    step may only read results of earlier steps and must update the
+    context in place (its return value is not threaded to the others).
     """
 
+    parallel_safe: bool = False
+
     @property
     @abstractmethod
     def name(self) -> str:
@@ -190,11 +423,16 @@ class AsyncPrepareStep(AsyncPipelineStep):
 
 
 class AsyncFederalCalculationStep(AsyncPipelineStep):
-    """Calculate federal taxes asynchronously."""
+    """Calculate federal taxes on the calculation executor."""
 
-    def __init__(self, engine: Optional[FederalTaxEngine] = None):
-        """Initialize with optional engine."""
+    def __init__(
+        self,
+        engine: Optional[FederalTaxEngine] = None,
+        executor: Optional[CalculationExecutor] = None,
+    ):
+        """Initialize with optional engine and executor (shared one by default)."""
         self._engine = engine or FederalTaxEngine()
+        self._executor = executor
 
     @property
     def name(self) -> str:
@@ -205,9 +443,12 @@ class AsyncFederalCalculationStep(AsyncPipelineStep):
         start = time.time()
 
         try:
-            # The actual calculation is CPU-bound but we wrap it
-            # for pipeline consistency
-            context.breakdown = self._engine.calculate(context.tax_return)
+            executor = self._executor or get_calculation_executor()
+            breakdown, updated = await executor.run(
+                _calculate_federal, self._engine, context.tax_return
+            )
+            context.breakdown = breakdown
+            context.tax_return = _copy_back(context.tax_return, updated)
 
             logger.info(
                 "Federal calculation complete",
@@ -218,6 +459,8 @@ class AsyncFederalCalculationStep(AsyncPipelineStep):
                 }}
             )
 
+        except PipelineOverloadedError:
+            raise
         except Exception as e:
             context.add_error(f"Federal calculation failed: {str(e)}")
             logger.exception("Federal calculation error")
@@ -227,11 +470,22 @@ class AsyncFederalCalculationStep(AsyncPipelineStep):
 
 
 class AsyncStateCalculationStep(AsyncPipelineStep):
-    """Calculate state taxes asynchronously."""
+    """Calculate state taxes on the calculation executor.
 
-    def __init__(self, engine: Optional[StateTaxEngine] = None):
-        """Initialize with optional engine."""
+    Needs only the federal AGI / taxable income / tax, so it runs
+    alongside output validation once the federal breakdown exists.
+    """
+
+    parallel_safe = True
+
+    def __init__(
+        self,
+        engine: Optional[StateTaxEngine] = None,
+        executor: Optional[CalculationExecutor] = None,
+    ):
+        """Initialize with optional engine and executor (shared one by default)."""
         self._engine = engine or StateTaxEngine()
+        self._executor = executor
 
     @property
     def name(self) -> str:
@@ -251,12 +505,16 @@ class AsyncStateCalculationStep(AsyncPipelineStep):
             return context
 
         try:
-            context.state_result = self._engine.calculate(
-                context.tax_return,
-                state_code,
-                federal_agi=context.breakdown.agi,
-                federal_taxable_income=context.breakdown.taxable_income,
-                federal_tax=context.breakdown.total_tax
+            executor = self._executor or get_calculation_executor()
+            context.state_result = await executor.run(
+                functools.partial(
+                    self._engine.calculate,
+                    context.tax_return,
+                    state_code,
+                    federal_agi=context.breakdown.agi,
+                    federal_taxable_income=context.breakdown.taxable_income,
+                    federal_tax=context.breakdown.total_tax,
+                )
             )
 
             logger.info(
@@ -267,6 +525,8 @@ class AsyncStateCalculationStep(AsyncPipelineStep):
                 }}
             )
 
+        except PipelineOverloadedError:
+            raise
         except Exception as e:
             context.add_warning(f"State calculation failed for {state_code}: {str(e)}")
             logger.warning(f"State calculation error for {state_code}: {e}")
@@ -278,6 +538,8 @@ class AsyncStateCalculationStep(AsyncPipelineStep):
 class AsyncOutputValidationStep(AsyncPipelineStep):
     """Validate calculation outputs."""
 
+    parallel_safe = True
+
     @property
     def name(self) -> str:
         return "output_validation"
@@ -316,11 +578,23 @@ class AsyncOutputValidationStep(AsyncPipelineStep):
         return context
 
 
+@dataclass
+class PipelineRequest:
+    """One return for AsyncCalculationPipeline.execute_batch()."""
+    tax_return: TaxReturn
+    tax_return_data: Dict[str, Any]
+    return_id: Optional[str] = None
+    session_id: Optional[str] = None
+    prior_year_carryovers: Optional[PriorYearCarryovers] = None
+
+
 class AsyncCalculationPipeline:
     """
     Orchestrates the async tax calculation pipeline.
 
-    Executes steps in sequence, passing context through each.
+    Executes steps in sequence, passing context through each; consecutive
+    parallel-safe steps (state calculation and output validation by
+    default) run concurrently once the federal result is known.
     Supports customization by adding/removing steps.
     """
 
@@ -393,6 +667,9 @@ class AsyncCalculationPipeline:
 
         Returns:
             PipelineContext with results
+
+        Raises:
+            PipelineOverloadedError: The calculation executor is saturated
         """
         calc_logger = CalculationLogger(return_id)
         start_time = time.time()
@@ -414,24 +691,29 @@ class AsyncCalculationPipeline:
             filing_status
         )
 
-        # Execute each step
-        for step in self._steps:
-            if not step.should_execute(context):
-                self._logger.debug(f"Skipping step: {step.name}")
+        # Execute each stage; a stage of several parallel-safe steps runs them concurrently
+        for stage in self._stages():
+            steps = []
+            for step in stage:
+                if step.should_execute(context):
+                    steps.append(step)
+                else:
+                    self._logger.debug(f"Skipping step: {step.name}")
+            if not steps:
                 continue
 
-            self._logger.debug(f"Executing step: {step.name}")
-
-            try:
-                context = await step.execute(context)
-            except Exception as e:
-                context.add_error(f"Step {step.name} failed: {str(e)}")
-                self._logger.exception(f"Pipeline step {step.name} failed")
+            if len(steps) == 1:
+                context, succeeded = await self._run_step(steps[0], context)
+            else:
+                outcomes = await asyncio.gather(*(self._run_step(step, context) for step in steps))
+                succeeded = all(ok for _, ok in outcomes)
+            if not succeeded:
                 break
 
             # Check for fatal errors
-            if not context.is_valid and step.name in ["input_validation", "federal_calculation"]:
-                self._logger.warning(f"Pipeline stopped at step: {step.name}")
+            fatal = [step.name for step in steps if step.name in ["input_validation", "federal_calculation"]]
+            if not context.is_valid and fatal:
+                self._logger.warning(f"Pipeline stopped at step: {fatal[0]}")
                 break
 
         # Record total time
@@ -466,6 +748,77 @@ class AsyncCalculationPipeline:
 
         return context
 
+    async def execute_batch(
+        self,
+        requests: Iterable["PipelineRequest"],
+        concurrency: int = CALC_BATCH_CONCURRENCY,
+    ) -> List[PipelineContext]:
+        """
+        Execute the pipeline for many returns with their stages overlapped.
+
+        Up to `concurrency` returns are in flight at once, so while one
+        return's federal calculation occupies an executor worker, others
+        are validating, calculating state tax or queued for the next free
+        worker. Keep concurrency below the executor's max_pending.
+
+        Args:
+            requests: Returns to calculate
+            concurrency: Returns in flight at once
+
+        Returns:
+            One PipelineContext per request, in input order. A return
+            rejected by admission control gets a context with an error
+            rather than failing the whole batch.
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def run_one(request: PipelineRequest) -> PipelineContext:
+            async with semaphore:
+                try:
+                    return await self.execute(
+                        tax_return=request.tax_return,
+                        tax_return_data=request.tax_return_data,
+                        return_id=request.return_id,
+                        session_id=request.session_id,
+                        prior_year_carryovers=request.prior_year_carryovers,
+                    )
+                except PipelineOverloadedError as e:
+                    context = PipelineContext(
+                        tax_return=request.tax_return,
+                        tax_return_data=request.tax_return_data,
+                        return_id=request.return_id,
+                        session_id=request.session_id,
+                        prior_year_carryovers=request.prior_year_carryovers,
+                    )
+                    context.add_error(f"Calculation rejected: {e}")
+                    return context
+
+        return list(await asyncio.gather(*(run_one(request) for request in requests)))
+
+    def _stages(self) -> List[List[AsyncPipelineStep]]:
+        """Group steps into stages; consecutive parallel-safe steps share one."""
+        stages: List[List[AsyncPipelineStep]] = []
+        for step in self._steps:
+            if step.parallel_safe and stages and stages[-1][-1].parallel_safe:
+                stages[-1].append(step)
+            else:
+                stages.append([step])
+        return stages
+
+    async def _run_step(
+        self, step: AsyncPipelineStep, context: PipelineContext
+    ) -> Tuple[PipelineContext, bool]:
+        """Run one step; returns (context, succeeded)."""
+        self._logger.debug(f"Executing step: {step.name}")
+        try:
+            return await step.execute(context), True
+        except PipelineOverloadedError:
+            raise
+        except Exception as e:
+            context.add_error(f"Step {step.name} failed: {str(e)}")
+            self._logger.exception(f"Pipeline step {step.name} failed")
+            return context, False
+
 
 # Pipeline builder for convenience
 def create_async_pipeline(
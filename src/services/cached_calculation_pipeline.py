@@ -34,6 +34,7 @@ try:
         CalculationCache,
         CacheInvalidator,
         get_calculation_cache,
+        tax_year_tag,
         DEFAULT_CALCULATION_TTL,
     )
     CACHE_AVAILABLE = True
@@ -42,6 +43,7 @@ except ImportError:
     CalculationCache = None
     CacheInvalidator = None
     get_calculation_cache = None
+    tax_year_tag = None
     DEFAULT_CALCULATION_TTL = 3600
 
 
@@ -245,12 +247,14 @@ class CachedCalculationPipeline:
             breakdown_dict = self._breakdown_to_dict(context)
 
             if breakdown_dict:
+                tax_year = getattr(tax_return, "tax_year", None)
                 try:
                     await cache.set_calculation(
                         return_id,
                         breakdown_dict,
                         context_hash=context_hash,
                         ttl=self._ttl,
+                        tags=[tax_year_tag(tax_year)] if tax_year else None,
                     )
                     logger.debug(f"Cached calculation for {return_id}")
                 except Exception as e:
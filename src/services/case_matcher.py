@@ -24,16 +24,39 @@ Usage:
     )
 """
 
+import asyncio
 import logging
 import json
 import hashlib
+import os
+import time
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import Any, Dict, List, Optional, Tuple
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# Query embeddings kept per matcher instance (LRU)
+QUERY_EMBEDDING_CACHE_SIZE = 1024
+
+# Concurrent provider calls while embedding the corpus
+CORPUS_EMBED_CONCURRENCY = 16
+
+# Optional .npz file the corpus vectors are loaded from / saved to
+CASE_VECTORS_PATH = os.environ.get("CASE_MATCHER_VECTORS_PATH")
+
+# Seconds to wait before retrying a warm-up that failed to embed the corpus
+INDEX_RETRY_SECONDS = 60
+
+
+class EmbeddingUnavailableError(Exception):
+    """The embedding provider could not return a vector for a text."""
+
 
 class CaseType(str, Enum):
     """Types of cases in the knowledge base."""
@@ -143,6 +166,116 @@ class SituationAnalysis:
         }
 
 
+def _case_text(case_data: Dict[str, Any]) -> str:
+    return f"{case_data['title']} {case_data['summary']} {' '.join(case_data['tags'])}"
+
+
+def _strategy_text(strategy_data: Dict[str, Any]) -> str:
+    return f"{strategy_data['title']} {strategy_data['description']} {' '.join(strategy_data['applicable_situations'])}"
+
+
+def _corpus_fingerprint(texts: Sequence[str]) -> str:
+    """Hash of the embedded texts; persisted vectors are only reused on a match."""
+    digest = hashlib.sha256()
+    for text in texts:
+        digest.update(text.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class EmbeddingIndex:
+    """
+    Row-normalized embedding matrix for one corpus.
+
+    Scoring a query is a single matrix-vector product; top-k comes from
+    argpartition over the scores. Optional boolean masks (e.g. one per
+    case type) restrict the candidates without rebuilding anything.
+    """
+
+    def __init__(
+        self,
+        vectors: Sequence[Sequence[float]],
+        masks: Optional[Dict[str, np.ndarray]] = None,
+    ):
+        dim = max((len(v) for v in vectors), default=0)
+        raw = np.zeros((len(vectors), dim), dtype=np.float32)
+        for row, vector in enumerate(vectors):
+            if len(vector) != dim:
+                logger.warning(
+                    f"Corpus embedding {row} has {len(vector)} dimensions, expected {dim}; zero-padding"
+                )
+            raw[row, :len(vector)] = vector
+
+        norms = np.linalg.norm(raw, axis=1)
+        safe = np.where(norms == 0, 1.0, norms)
+        self.matrix = raw / safe[:, None]
+        self.norms = norms.astype(np.float32)
+        self.masks = masks or {}
+
+    def __len__(self) -> int:
+        return self.matrix.shape[0]
+
+    @property
+    def dim(self) -> int:
+        return self.matrix.shape[1]
+
+    @property
+    def raw_vectors(self) -> np.ndarray:
+        """Original (un-normalized) vectors, for persisting."""
+        return self.matrix * self.norms[:, None]
+
+    def scores(self, query: Sequence[float]) -> np.ndarray:
+        """Cosine similarity of the query against every row."""
+        q = np.asarray(query, dtype=np.float32)
+        matrix = self.matrix
+        if q.shape[0] != self.dim:
+            # Dimension mismatch: compare on the shared prefix, as
+            # _cosine_similarity does for a single pair
+            shared = min(q.shape[0], self.dim)
+            q = q[:shared]
+            matrix = self.raw_vectors[:, :shared]
+            norms = np.linalg.norm(matrix, axis=1)
+            matrix = matrix / np.where(norms == 0, 1.0, norms)[:, None]
+
+        q_norm = float(np.linalg.norm(q))
+        if q_norm == 0:
+            return np.zeros(len(self), dtype=np.float32)
+        return matrix @ (q / q_norm)
+
+    def top_k(
+        self,
+        query: Sequence[float],
+        k: int,
+        mask: Optional[str] = None,
+    ) -> List[Tuple[int, float]]:
+        """
+        Return (row, score) for the k best rows, best first.
+
+        Ties keep corpus order. Rows outside ``mask`` are never returned.
+        """
+        if k <= 0 or len(self) == 0:
+            return []
+
+        scores = self.scores(query)
+        candidates = len(self)
+        if mask is not None:
+            allowed = self.masks.get(mask)
+            if allowed is None:
+                return []
+            candidates = int(allowed.sum())
+            scores = np.where(allowed, scores, -np.inf)
+
+        k = min(k, candidates)
+        if k == 0:
+            return []
+        if k < len(scores):
+            rows = np.argpartition(-scores, k - 1)[:k]
+        else:
+            rows = np.arange(len(scores))
+        order = np.lexsort((rows, -scores[rows]))
+        return [(int(rows[i]), float(scores[rows[i]])) for i in order]
+
+
 class OpenAICaseMatcher:
     """
     OpenAI-powered case matcher using embeddings.
@@ -237,15 +370,31 @@ class OpenAICaseMatcher:
         },
     ]
 
-    def __init__(self, ai_service=None):
+    def __init__(
+        self,
+        ai_service=None,
+        cases: Optional[List[Dict[str, Any]]] = None,
+        strategies: Optional[List[Dict[str, Any]]] = None,
+        vectors_path: Optional[str] = CASE_VECTORS_PATH,
+    ):
         """
         Initialize case matcher.
 
         Args:
             ai_service: UnifiedAIService instance (lazy-loaded if not provided)
+            cases: Case corpus (defaults to SAMPLE_CASES)
+            strategies: Strategy corpus (defaults to SAMPLE_STRATEGIES)
+            vectors_path: Optional .npz file for persisted corpus vectors
         """
         self._ai_service = ai_service
-        self._embedding_cache: Dict[str, List[float]] = {}
+        self._embedding_cache: "OrderedDict[str, List[float]]" = OrderedDict()
+        self.cases = list(cases if cases is not None else self.SAMPLE_CASES)
+        self.strategies = list(strategies if strategies is not None else self.SAMPLE_STRATEGIES)
+        self.vectors_path = Path(vectors_path) if vectors_path else None
+        self._case_index: Optional[EmbeddingIndex] = None
+        self._strategy_index: Optional[EmbeddingIndex] = None
+        self._index_lock: Optional[asyncio.Lock] = None
+        self._warm_retry_at = 0.0
 
     @property
     def ai_service(self):
@@ -255,6 +404,118 @@ class OpenAICaseMatcher:
             self._ai_service = get_ai_service()
         return self._ai_service
 
+    # =========================================================================
+    # CORPUS INDEX
+    # =========================================================================
+
+    async def warm(self) -> bool:
+        """
+        Build the case and strategy indexes.
+
+        Called at startup; otherwise the first query builds them. Vectors
+        are loaded from ``vectors_path`` when it holds an embedding of the
+        same corpus, and written there after embedding a new one.
+
+        If the provider fails for any corpus text nothing is built or
+        persisted; the warm-up is retried after ``INDEX_RETRY_SECONDS``.
+
+        Returns:
+            True when both indexes are available
+        """
+        if self._case_index is not None and self._strategy_index is not None:
+            return True
+        if time.monotonic() < self._warm_retry_at:
+            return False
+        if self._index_lock is None:
+            self._index_lock = asyncio.Lock()
+
+        async with self._index_lock:
+            if self._case_index is not None and self._strategy_index is not None:
+                return True
+            if time.monotonic() < self._warm_retry_at:
+                return False
+
+            case_texts = [_case_text(c) for c in self.cases]
+            strategy_texts = [_strategy_text(s) for s in self.strategies]
+            fingerprint = _corpus_fingerprint(case_texts + ["--"] + strategy_texts)
+
+            loaded = self._load_vectors(fingerprint)
+            if loaded is not None:
+                case_vectors, strategy_vectors = loaded
+            else:
+                try:
+                    case_vectors, strategy_vectors = await asyncio.gather(
+                        self._embed_corpus(case_texts),
+                        self._embed_corpus(strategy_texts),
+                    )
+                except EmbeddingUnavailableError as e:
+                    self._warm_retry_at = time.monotonic() + INDEX_RETRY_SECONDS
+                    logger.warning(
+                        f"Case matcher index not built, retrying in {INDEX_RETRY_SECONDS}s: {e}"
+                    )
+                    return False
+
+            self._case_index = EmbeddingIndex(case_vectors, masks=self._case_type_masks())
+            self._strategy_index = EmbeddingIndex(strategy_vectors)
+
+            if loaded is None:
+                self._save_vectors(fingerprint)
+            return True
+
+    def invalidate_index(self) -> None:
+        """Drop the indexes after the corpus changes; the next query rebuilds them."""
+        self._case_index = None
+        self._strategy_index = None
+
+    def _case_type_masks(self) -> Dict[str, np.ndarray]:
+        types = np.array([c["type"] for c in self.cases], dtype=object)
+        return {ct.value: types == ct.value for ct in CaseType}
+
+    async def _embed_corpus(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed corpus texts with bounded concurrency, bypassing the query cache.
+
+        Raises:
+            EmbeddingUnavailableError: if any text could not be embedded
+        """
+        semaphore = asyncio.Semaphore(CORPUS_EMBED_CONCURRENCY)
+
+        async def embed(text: str) -> List[float]:
+            async with semaphore:
+                return await self._fetch_embedding(text)
+
+        return list(await asyncio.gather(*(embed(t) for t in texts)))
+
+    def _load_vectors(self, fingerprint: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        if self.vectors_path is None or not self.vectors_path.exists():
+            return None
+        try:
+            with np.load(self.vectors_path, allow_pickle=False) as data:
+                if str(data["fingerprint"]) != fingerprint:
+                    logger.info("Persisted case vectors are for a different corpus; re-embedding")
+                    return None
+                return data["cases"], data["strategies"]
+        except Exception as e:
+            logger.warning(f"Failed to load case vectors from {self.vectors_path}: {e}")
+            return None
+
+    def _save_vectors(self, fingerprint: str) -> None:
+        if self.vectors_path is None:
+            return
+        try:
+            self.vectors_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.vectors_path.with_name(self.vectors_path.name + ".tmp")
+            with open(tmp_path, "wb") as f:
+                np.savez(
+                    f,
+                    fingerprint=np.array(fingerprint),
+                    cases=self._case_index.raw_vectors,
+                    strategies=self._strategy_index.raw_vectors,
+                )
+            os.replace(tmp_path, self.vectors_path)
+        except Exception as e:
+            logger.warning(f"Failed to save case vectors to {self.vectors_path}: {e}")
+
     async def find_similar_situations(
         self,
         situation: str,
@@ -399,9 +660,25 @@ Return as JSON:
         """Get embedding for text, with caching."""
         cache_key = hashlib.md5(text.encode()).hexdigest()
 
-        if cache_key in self._embedding_cache:
-            return self._embedding_cache[cache_key]
+        cached = self._embedding_cache.get(cache_key)
+        if cached is not None:
+            self._embedding_cache.move_to_end(cache_key)
+            return cached
+
+        try:
+            return await self._fetch_embedding(text, cache_key=cache_key)
+        except EmbeddingUnavailableError as e:
+            logger.error(f"Failed to get embedding: {e}")
+            # Return a simple hash-based pseudo-embedding as fallback
+            return self._fallback_embedding(text)
+
+    async def _fetch_embedding(self, text: str, cache_key: Optional[str] = None) -> List[float]:
+        """
+        Call the provider; cache successful query embeddings when a key is given.
 
+        Raises:
+            EmbeddingUnavailableError: if the provider call fails
+        """
         try:
             from config.ai_providers import AIProvider
             # Use OpenAI embeddings
@@ -409,16 +686,16 @@ Return as JSON:
                 text=text,
                 provider=AIProvider.OPENAI,
             )
+        except Exception as e:
+            raise EmbeddingUnavailableError(str(e)) from e
 
-            embedding = response.embedding
+        embedding = response.embedding
+        if cache_key is not None:
             self._embedding_cache[cache_key] = embedding
+            if len(self._embedding_cache) > QUERY_EMBEDDING_CACHE_SIZE:
+                self._embedding_cache.popitem(last=False)
 
-            return embedding
-
-        except Exception as e:
-            logger.error(f"Failed to get embedding: {e}")
-            # Return a simple hash-based pseudo-embedding as fallback
-            return self._fallback_embedding(text)
+        return embedding
 
     def _fallback_embedding(self, text: str) -> List[float]:
         """Generate a simple fallback embedding when API fails."""
@@ -436,20 +713,13 @@ Return as JSON:
         case_type: Optional[CaseType] = None,
     ) -> List[CaseMatch]:
         """Match cases using embedding similarity."""
-        matches = []
-
-        for case_data in self.SAMPLE_CASES:
-            # Filter by type if specified
-            if case_type and case_data["type"] != case_type.value:
-                continue
-
-            # Get case embedding
-            case_text = f"{case_data['title']} {case_data['summary']} {' '.join(case_data['tags'])}"
-            case_embedding = await self._get_embedding(case_text)
-
-            # Calculate similarity
-            similarity = self._cosine_similarity(query_embedding, case_embedding)
+        if not await self.warm():
+            return []
+        mask = case_type.value if case_type else None
 
+        matches = []
+        for row, similarity in self._case_index.top_k(query_embedding, top_k, mask=mask):
+            case_data = self.cases[row]
             matches.append(CaseMatch(
                 case_id=case_data["id"],
                 case_type=CaseType(case_data["type"]),
@@ -465,10 +735,7 @@ Return as JSON:
                 applicable_irc_sections=case_data.get("irc_sections", []),
                 tags=case_data.get("tags", []),
             ))
-
-        # Sort by similarity and return top_k
-        matches.sort(key=lambda x: x.similarity_score, reverse=True)
-        return matches[:top_k]
+        return matches
 
     async def _match_strategies(
         self,
@@ -476,16 +743,12 @@ Return as JSON:
         top_k: int,
     ) -> List[StrategyMatch]:
         """Match strategies using embedding similarity."""
-        matches = []
-
-        for strategy_data in self.SAMPLE_STRATEGIES:
-            # Get strategy embedding
-            strategy_text = f"{strategy_data['title']} {strategy_data['description']} {' '.join(strategy_data['applicable_situations'])}"
-            strategy_embedding = await self._get_embedding(strategy_text)
-
-            # Calculate similarity
-            similarity = self._cosine_similarity(query_embedding, strategy_embedding)
+        if not await self.warm():
+            return []
 
+        matches = []
+        for row, similarity in self._strategy_index.top_k(query_embedding, top_k):
+            strategy_data = self.strategies[row]
             matches.append(StrategyMatch(
                 strategy_id=strategy_data["id"],
                 title=strategy_data["title"],
@@ -498,10 +761,7 @@ Return as JSON:
                 similarity_score=similarity,
                 source_cases=strategy_data.get("source_cases", []),
             ))
-
-        # Sort by similarity and return top_k
-        matches.sort(key=lambda x: x.similarity_score, reverse=True)
-        return matches[:top_k]
+        return matches
 
     async def _generate_situation_analysis(
         self,
@@ -602,6 +862,8 @@ def get_case_matcher() -> OpenAICaseMatcher:
 
 __all__ = [
     "OpenAICaseMatcher",
+    "EmbeddingIndex",
+    "EmbeddingUnavailableError",
     "CaseMatch",
     "StrategyMatch",
     "SituationAnalysis",
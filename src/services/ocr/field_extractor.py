@@ -8,14 +8,31 @@ from tax documents based on document type.
 from __future__ import annotations
 
 import re
+import threading
 from dataclasses import dataclass, field
-from typing import Optional, List, Dict, Any, Callable, Pattern
+from functools import lru_cache
+from typing import Optional, List, Dict, Any, Callable, Iterator, Pattern, Tuple
 from decimal import Decimal, InvalidOperation
 from datetime import datetime
 from enum import Enum
 
 from .ocr_engine import OCRResult, TextBlock, BoundingBox
 
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+# Shortest literal worth indexing as an anchor
+MIN_ANCHOR_LENGTH = 2
+
+# Longest run of lead characters walked back from an anchor before the
+# search falls back to the start of the text
+MAX_LEAD_SCAN = 256
+
+# Compiled scanners kept per distinct template set
+MAX_CACHED_SCANNERS = 64
+
 
 class FieldType(str, Enum):
     """Types of fields that can be extracted."""
@@ -98,6 +115,246 @@ class ExtractedField:
         }
 
 
+# Non-ASCII characters that match an ASCII letter under re.IGNORECASE
+_IGNORECASE_SPECIALS = {
+    0x0130: "i",  # LATIN CAPITAL LETTER I WITH DOT ABOVE
+    0x0131: "i",  # LATIN SMALL LETTER DOTLESS I
+    0x017F: "s",  # LATIN SMALL LETTER LONG S
+    0x212A: "k",  # KELVIN SIGN
+}
+
+# Maps every character an ASCII letter can match under re.IGNORECASE onto
+# that lowercase letter. Unlike str.lower() it never changes the length of
+# the text, so positions in the folded text are positions in the original.
+_CASE_FOLD_TABLE = {
+    **{ord(c): c.lower() for c in "ABCDEFGHIJKLMNOPQRSTUVWXYZ"},
+    **_IGNORECASE_SPECIALS,
+}
+
+
+def fold_case(text: str) -> str:
+    """Case-fold text for anchor lookup without moving any character."""
+    return text.translate(_CASE_FOLD_TABLE)
+
+
+@dataclass(frozen=True)
+class PatternPlan:
+    """
+    Anchor analysis for one compiled field pattern.
+
+    Every match of the pattern contains one of ``anchors`` (case-folded
+    literals). The part of the match before the anchor is either at most
+    ``max_lead`` characters long, or made only of ``lead_chars``
+    characters. A pattern with no anchors is searched as-is.
+    """
+    pattern: Pattern
+    anchors: Tuple[str, ...] = ()
+    max_lead: Optional[int] = None
+    lead_chars: Optional[Pattern] = None
+
+    def search_start(self, text: str, anchor_pos: int) -> int:
+        """Earliest position a match can start, given the first anchor."""
+        if self.max_lead is not None:
+            return max(0, anchor_pos - self.max_lead)
+        if self.lead_chars is not None:
+            # The match starts inside the run of lead characters before the anchor
+            start = anchor_pos
+            floor = max(0, anchor_pos - MAX_LEAD_SCAN)
+            while start > floor and self.lead_chars.match(text, start - 1):
+                start -= 1
+            return start if start > floor or floor == 0 else 0
+        return 0
+
+
+def _flatten(items) -> list:
+    """Inline group contents so literals inside groups are visible."""
+    flat = []
+    for op, av in items:
+        # Groups with inline flags stay opaque
+        if op is sre_parse.SUBPATTERN and not (av[1] or av[2]):
+            flat.extend(_flatten(av[-1]))
+        else:
+            flat.append((op, av))
+    return flat
+
+
+def _leading_literal(items: list) -> str:
+    """Return the run of ASCII literals a parsed sequence starts with."""
+    chars = []
+    for op, av in _flatten(items):
+        if op is not sre_parse.LITERAL or av > 0x7F:
+            break
+        chars.append(chr(av).lower())
+    return "".join(chars)
+
+
+_CATEGORY_CLASSES = {
+    sre_parse.CATEGORY_SPACE: r"\s",
+    sre_parse.CATEGORY_DIGIT: r"\d",
+    sre_parse.CATEGORY_WORD: r"\w",
+}
+
+
+def _char_class(items) -> Optional[List[str]]:
+    """
+    Collect a character class covering every character a parsed sequence
+    can consume, or None if that set is open-ended (``.``, negations).
+    """
+    parts: List[str] = []
+    for op, av in items:
+        if op is sre_parse.LITERAL:
+            parts.append(re.escape(chr(av)))
+        elif op is sre_parse.IN:
+            for set_op, set_av in av:
+                if set_op is sre_parse.LITERAL:
+                    parts.append(re.escape(chr(set_av)))
+                elif set_op is sre_parse.RANGE:
+                    parts.append(f"{re.escape(chr(set_av[0]))}-{re.escape(chr(set_av[1]))}")
+                elif set_op is sre_parse.CATEGORY and set_av in _CATEGORY_CLASSES:
+                    parts.append(_CATEGORY_CLASSES[set_av])
+                else:
+                    return None
+        elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+            inner = _char_class(av[2])
+            if inner is None:
+                return None
+            parts.extend(inner)
+        elif op is sre_parse.SUBPATTERN:
+            if av[1] or av[2]:
+                return None
+            inner = _char_class(av[-1])
+            if inner is None:
+                return None
+            parts.extend(inner)
+        elif op is sre_parse.BRANCH:
+            for alt in av[1]:
+                inner = _char_class(alt)
+                if inner is None:
+                    return None
+                parts.extend(inner)
+        elif op is not sre_parse.AT:
+            return None
+    return parts
+
+
+@lru_cache(maxsize=4096)
+def plan_pattern(pattern: Pattern) -> PatternPlan:
+    """
+    Find the most selective literal anchor in a pattern.
+
+    Looks at the top-level sequence for a run of literals, or for an
+    alternation whose branches all start with literals. Patterns that
+    cannot be analyzed fall back to an unanchored plan, which behaves
+    exactly like a plain search.
+    """
+    if not isinstance(pattern.pattern, str):
+        return PatternPlan(pattern)
+    try:
+        parsed = sre_parse.parse(pattern.pattern, pattern.flags)
+    except Exception:
+        return PatternPlan(pattern)
+
+    items = _flatten(parsed)
+    best = None
+    i = 0
+    while i < len(items):
+        op, av = items[i]
+        anchors: Tuple[str, ...] = ()
+        if op is sre_parse.LITERAL:
+            run = _leading_literal(items[i:])
+            anchors = (run,) if run else ()
+        elif op is sre_parse.BRANCH:
+            runs = tuple(_leading_literal(list(alt)) for alt in av[1])
+            if all(runs):
+                anchors = tuple(sorted(set(runs)))
+
+        if anchors and min(map(len, anchors)) >= MIN_ANCHOR_LENGTH:
+            lead = items[:i]
+            _, hi = sre_parse.SubPattern(parsed.state, lead).getwidth()
+            max_lead = hi if hi < sre_parse.MAXREPEAT else None
+            lead_chars = None
+            if max_lead is None:
+                parts = _char_class(lead)
+                if parts:
+                    lead_chars = re.compile(
+                        "[" + "".join(parts) + "]",
+                        pattern.flags & (re.IGNORECASE | re.ASCII | re.UNICODE),
+                    )
+            # Prefer anchors that bound the search start, then longer ones
+            bound = 2 if max_lead is not None else 1 if lead_chars is not None else 0
+            score = (bound, min(map(len, anchors)))
+            if best is None or score > best[0]:
+                best = (score, anchors, max_lead, lead_chars)
+
+        i += len(anchors[0]) if op is sre_parse.LITERAL and anchors else 1
+
+    if best is None:
+        return PatternPlan(pattern)
+    _, anchors, max_lead, lead_chars = best
+    return PatternPlan(pattern, anchors=anchors, max_lead=max_lead, lead_chars=lead_chars)
+
+
+class TemplateScanner:
+    """
+    All field patterns for one document type, compiled into one scanner.
+
+    A single pass over the case-folded text records where each anchor
+    first occurs. Field patterns then only run when their anchor is
+    present, starting at the earliest position a match could begin.
+    Results are identical to searching every pattern over the full text.
+    """
+
+    def __init__(self, templates: List[FieldTemplate]):
+        self.plans: List[List[PatternPlan]] = [
+            [plan_pattern(p) for p in template.patterns] for template in templates
+        ]
+        anchors = sorted(
+            {a for plans in self.plans for plan in plans for a in plan.anchors},
+            key=lambda a: (-len(a), a),
+        )
+        self.anchors = anchors
+        self._by_first_char: Dict[str, List[str]] = {}
+        for anchor in anchors:
+            self._by_first_char.setdefault(anchor[0], []).append(anchor)
+        self._scanner = (
+            re.compile("|".join(re.escape(a) for a in anchors)) if anchors else None
+        )
+
+    def locate_anchors(self, text: str) -> Dict[str, int]:
+        """Return the first position of every anchor present in the text."""
+        first: Dict[str, int] = {}
+        if self._scanner is None:
+            return first
+
+        folded = fold_case(text)
+        remaining = len(self.anchors)
+        for match in self._scanner.finditer(folded):
+            # Other anchors may start inside this match; check each position
+            for pos in range(match.start(), match.end()):
+                for anchor in self._by_first_char.get(folded[pos], ()):
+                    if anchor not in first and folded.startswith(anchor, pos):
+                        first[anchor] = pos
+                        remaining -= 1
+            if not remaining:
+                break
+        return first
+
+    def search(
+        self, text: str, template_index: int, first: Dict[str, int]
+    ) -> Iterator[re.Match]:
+        """Yield the pattern matches for one template, in pattern order."""
+        for plan in self.plans[template_index]:
+            if not plan.anchors:
+                match = plan.pattern.search(text)
+            else:
+                positions = [first[a] for a in plan.anchors if a in first]
+                if not positions:
+                    continue
+                match = plan.pattern.search(text, plan.search_start(text, min(positions)))
+            if match:
+                yield match
+
+
 class FieldExtractor:
     """
     Extracts structured fields from OCR results using templates.
@@ -112,6 +369,8 @@ class FieldExtractor:
     def __init__(self):
         self._normalizers = self._setup_normalizers()
         self._validators = self._setup_validators()
+        self._scanners: Dict[Tuple[Tuple[Pattern, ...], ...], TemplateScanner] = {}
+        self._scanners_lock = threading.Lock()
 
     def _setup_normalizers(self) -> Dict[FieldType, Callable]:
         """Setup normalizer functions for each field type."""
@@ -160,23 +419,46 @@ class FieldExtractor:
         """
         extracted = []
         text = ocr_result.raw_text
+        scanner = self.get_scanner(templates)
+        first = scanner.locate_anchors(text)
 
-        for template in templates:
-            field = self._extract_field(text, template, ocr_result.confidence)
+        for index, template in enumerate(templates):
+            matches = scanner.search(text, index, first)
+            field = self._extract_field(text, template, ocr_result.confidence, matches)
             if field:
                 extracted.append(field)
 
         return extracted
 
+    def get_scanner(self, templates: List[FieldTemplate]) -> TemplateScanner:
+        """Return the compiled scanner for a template set, building it once."""
+        key = tuple(tuple(template.patterns) for template in templates)
+        scanner = self._scanners.get(key)
+        if scanner is None:
+            scanner = TemplateScanner(templates)
+            with self._scanners_lock:
+                if len(self._scanners) >= MAX_CACHED_SCANNERS:
+                    self._scanners.pop(next(iter(self._scanners)))
+                self._scanners[key] = scanner
+        return scanner
+
     def _extract_field(
         self,
         text: str,
         template: FieldTemplate,
-        base_confidence: float
+        base_confidence: float,
+        matches=None,
     ) -> Optional[ExtractedField]:
-        """Extract a single field using its template."""
-        for pattern in template.patterns:
-            match = pattern.search(text)
+        """
+        Extract a single field using its template.
+
+        ``matches`` are the template's pattern matches from a TemplateScanner;
+        when omitted every pattern is searched over the full text.
+        """
+        if matches is None:
+            matches = filter(None, (pattern.search(text) for pattern in template.patterns))
+
+        for match in matches:
             if match:
                 # Get the matched value
                 if match.groups():
@@ -41,6 +41,20 @@ from database.persistence import (
     load_tax_return,
 )
 
+# Practice intelligence aggregates (kept current on save/delete)
+try:
+    from cpa_panel.practice_intelligence.aggregates import sync_deleted_return, sync_saved_return
+    _PRACTICE_METRICS_AVAILABLE = True
+except ImportError:
+    _PRACTICE_METRICS_AVAILABLE = False
+
+# Premium report section cache (dropped when the session's return changes)
+try:
+    from export.premium_report_generator import invalidate_report_cache
+    _REPORT_CACHE_AVAILABLE = True
+except ImportError:
+    _REPORT_CACHE_AVAILABLE = False
+
 # Import validation service for comprehensive validation
 try:
     from services.validation_service import ValidationService, ValidationSeverity
@@ -137,6 +151,7 @@ class TaxReturnService:
 
         # Save to persistence
         self._persistence.save_return(session_id, initial_data, return_id)
+        self._after_save(session_id, return_id, initial_data)
 
         # Publish event
         publish_event(TaxReturnCreated(
@@ -254,6 +269,7 @@ class TaxReturnService:
 
         # Save updates
         self._persistence.save_return(session_id, existing, return_id)
+        self._after_save(session_id, return_id, existing)
 
         # Publish event
         if changed_fields:
@@ -277,7 +293,27 @@ class TaxReturnService:
         Returns:
             True if deleted, False if not found
         """
-        return self._persistence.delete_return(return_id)
+        deleted = self._persistence.delete_return(return_id)
+        if deleted and _PRACTICE_METRICS_AVAILABLE:
+            sync_deleted_return(return_id)
+        return deleted
+
+    def _after_save(self, session_id: str, return_id: str, return_data: Dict[str, Any]) -> None:
+        """Refresh state derived from a return after it is saved."""
+        if _REPORT_CACHE_AVAILABLE:
+            invalidate_report_cache(session_id)
+        self._sync_practice_metrics(return_id, return_data)
+
+    def _sync_practice_metrics(self, return_id: str, return_data: Dict[str, Any]) -> None:
+        """Keep the owning firm's practice intelligence aggregates current after a save."""
+        if not _PRACTICE_METRICS_AVAILABLE:
+            return
+        try:
+            firm_id = self._persistence.get_return_firm_id(return_id)
+        except Exception as e:
+            self._logger.warning(f"Could not resolve firm for return {return_id}: {e}")
+            return
+        sync_saved_return(return_id, return_data, firm_id)
 
     def calculate(
         self,
@@ -417,6 +453,7 @@ class TaxReturnService:
 
             # Save updated return
             self._persistence.save_return(session_id, tax_return_data, return_id)
+            self._after_save(session_id, return_id, tax_return_data)
 
             # Calculate computation time
             computation_time_ms = int((time.time() - start_time) * 1000)
@@ -711,6 +748,7 @@ class TaxReturnService:
 
         # Save updated return
         self._persistence.save_return(session_id, return_data, return_id)
+        self._after_save(session_id, return_id, return_data)
 
         self._logger.info(
             f"Applied carryovers to return",
@@ -75,6 +75,7 @@ def create_celery_app(
             "tasks.backup",
             "tasks.database_maintenance",
             "tasks.analytics_refresh",
+            "tasks.platform_metrics",
         ],
     )
 
@@ -179,6 +180,17 @@ def create_celery_app(
                 "schedule": crontab(hour="18-23,0-7", minute=0),  # Hourly 6 PM-7:59 AM UTC
                 "options": {"queue": "analytics"},
             },
+            # --- Superadmin platform metric snapshots ---
+            "apply-platform-metric-events": {
+                "task": "tasks.platform_metrics.apply_platform_metric_events",
+                "schedule": 60.0,  # Every minute
+                "options": {"queue": "analytics"},
+            },
+            "refresh-platform-metrics": {
+                "task": "tasks.platform_metrics.refresh_platform_metrics",
+                "schedule": crontab(minute=5),  # Hourly at :05
+                "options": {"queue": "analytics"},
+            },
         },
     )
 
@@ -11,12 +11,13 @@ Runs on Celery beat schedule. All operations are audit-logged.
 """
 
 import os
+import re
 import sqlite3
 import json
 import logging
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Dict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 from celery import shared_task
 
@@ -32,12 +33,25 @@ SESSION_RETENTION_HOURS = int(os.environ.get("SESSION_RETENTION_HOURS", "72"))
 # How long to keep orphaned uploads (days)
 ORPHAN_UPLOAD_RETENTION_DAYS = int(os.environ.get("ORPHAN_UPLOAD_RETENTION_DAYS", "30"))
 
+# Orphaned upload cleanup: files deleted per batch, and paths listed in reports
+ORPHAN_DELETE_BATCH_SIZE = int(os.environ.get("ORPHAN_DELETE_BATCH_SIZE", "1000"))
+ORPHAN_REPORT_SAMPLE_SIZE = 100
+
+# Directories scanned for orphaned uploads
+UPLOAD_DIRS = ["./data/uploads", "./uploads"]
+
 # How long to keep audit logs (days) — regulatory minimum is often 7 years
 AUDIT_LOG_RETENTION_DAYS = int(os.environ.get("AUDIT_LOG_RETENTION_DAYS", "2555"))  # ~7 years
 
 # How long to keep completed tax return data (days)
 TAX_DATA_RETENTION_DAYS = int(os.environ.get("TAX_DATA_RETENTION_DAYS", "2555"))  # ~7 years
 
+# Retention sweeps: rows deleted per transaction, pause between chunks, and
+# time budget per run (an unfinished sweep resumes from its checkpoint)
+RETENTION_CHUNK_SIZE = int(os.environ.get("RETENTION_CHUNK_SIZE", "5000"))
+RETENTION_CHUNK_PAUSE_MS = int(os.environ.get("RETENTION_CHUNK_PAUSE_MS", "50"))
+RETENTION_MAX_SECONDS = int(os.environ.get("RETENTION_MAX_SECONDS", "900"))
+
 
 # =============================================================================
 # PERIODIC TASKS
@@ -45,37 +59,34 @@ TAX_DATA_RETENTION_DAYS = int(os.environ.get("TAX_DATA_RETENTION_DAYS", "2555"))
 
 
 @shared_task(name="tasks.data_retention.purge_expired_sessions")
-def purge_expired_sessions() -> Dict[str, int]:
+def purge_expired_sessions() -> Dict[str, Any]:
     """
     Remove sessions that have exceeded their TTL.
 
-    Runs hourly. Cleans both SQLite and Redis session stores.
+    Runs hourly. Cleans both SQLite and Redis session stores. SQLite
+    sessions are deleted in bounded chunks (see database.retention); a run
+    that hits RETENTION_MAX_SECONDS resumes where it stopped on the next one.
     """
-    counts = {"sqlite_purged": 0, "redis_purged": 0}
+    counts: Dict[str, Any] = {"sqlite_purged": 0, "redis_purged": 0}
 
-    # SQLite sessions
+    # SQLite sessions, with their documents, upload references and tax returns
     try:
-        from database.session_persistence import get_session_persistence
+        from database.retention import SESSION_SWEEP
+        from database.session_persistence import get_session_persistence, invalidate_report_caches
         persistence = get_session_persistence()
         cutoff = datetime.now(timezone.utc).isoformat()
 
-        with sqlite3.connect(persistence.db_path) as conn:
-            cursor = conn.cursor()
+        sweep = _run_sweep(
+            persistence.db_path, SESSION_SWEEP, cutoff, on_chunk_deleted=invalidate_report_caches,
+        )
+        counts["sqlite_purged"] = sweep["rows_deleted"]
+        counts["sqlite_sweep"] = sweep
 
-            # Find expired sessions
-            cursor.execute(
-                "SELECT session_id FROM session_states WHERE expires_at < ?",
-                (cutoff,),
+        if sweep["rows_deleted"]:
+            logger.info(
+                f"Purged {sweep['rows_deleted']} expired SQLite sessions "
+                f"({sweep['rows_per_second']} rows/s)"
             )
-            expired_ids = [row[0] for row in cursor.fetchall()]
-
-            for sid in expired_ids:
-                persistence.delete_session(sid)
-
-            counts["sqlite_purged"] = len(expired_ids)
-
-        if expired_ids:
-            logger.info(f"Purged {len(expired_ids)} expired SQLite sessions")
 
     except Exception as e:
         logger.error(f"Failed to purge SQLite sessions: {e}")
@@ -92,95 +103,153 @@ def purge_expired_sessions() -> Dict[str, int]:
 
 
 @shared_task(name="tasks.data_retention.cleanup_orphaned_uploads")
-def cleanup_orphaned_uploads() -> Dict[str, int]:
+def cleanup_orphaned_uploads(dry_run: bool = False) -> Dict[str, Any]:
     """
     Remove uploaded files that are no longer referenced by any session or document.
 
     Runs daily. Only deletes files older than ORPHAN_UPLOAD_RETENTION_DAYS.
+    Orphans are the files in the upload directories that are missing from
+    the upload reference index; with dry_run=True nothing is deleted and
+    the report lists what would be.
     """
-    counts = {"files_checked": 0, "files_deleted": 0, "bytes_freed": 0}
-    cutoff = datetime.now(timezone.utc) - timedelta(days=ORPHAN_UPLOAD_RETENTION_DAYS)
+    from database.upload_references import get_upload_reference_index
 
-    upload_dirs = ["./data/uploads", "./uploads"]
+    cutoff = datetime.now(timezone.utc) - timedelta(days=ORPHAN_UPLOAD_RETENTION_DAYS)
+    counts = collect_orphaned_uploads(
+        UPLOAD_DIRS,
+        get_upload_reference_index(),
+        cutoff,
+        dry_run=dry_run,
+    )
 
-    for upload_dir in upload_dirs:
-        if not os.path.isdir(upload_dir):
-            continue
+    if counts["files_deleted"] > 0:
+        mb_freed = counts["bytes_freed"] / (1024 * 1024)
+        logger.info(
+            f"Cleaned up {counts['files_deleted']} orphaned uploads, freed {mb_freed:.1f} MB"
+        )
+    elif dry_run and counts["orphans_found"] > 0:
+        logger.info(
+            f"Dry run: {counts['orphans_found']} orphaned uploads "
+            f"({counts['bytes_reclaimable'] / (1024 * 1024):.1f} MB) would be deleted"
+        )
 
-        for root, dirs, files in os.walk(upload_dir):
-            for filename in files:
-                filepath = os.path.join(root, filename)
-                counts["files_checked"] += 1
+    _log_retention_event("cleanup_orphaned_uploads", {
+        k: v for k, v in counts.items() if k != "sample"
+    })
+    return counts
 
-                try:
-                    mtime = datetime.fromtimestamp(os.path.getmtime(filepath))
-                    if mtime >= cutoff:
-                        continue
 
-                    # Check if this file is still referenced
-                    if _is_file_referenced(filepath):
-                        continue
+def collect_orphaned_uploads(
+    upload_dirs: List[str],
+    index,
+    cutoff: datetime,
+    dry_run: bool = False,
+    batch_size: int = ORPHAN_DELETE_BATCH_SIZE,
+) -> Dict[str, Any]:
+    """
+    Find (and unless dry_run, delete) upload files missing from the index.
 
-                    file_size = os.path.getsize(filepath)
-                    os.remove(filepath)
-                    counts["files_deleted"] += 1
-                    counts["bytes_freed"] += file_size
-                    logger.debug(f"Deleted orphaned upload: {filepath}")
+    Args:
+        upload_dirs: Directories to scan.
+        index: UploadReferenceIndex holding the referenced file paths.
+        cutoff: Only files last modified before this are eligible.
+        dry_run: Report orphans without deleting them.
+        batch_size: Files re-checked against the index and deleted per batch.
 
-                except OSError as e:
-                    logger.warning(f"Could not process {filepath}: {e}")
+    Returns:
+        Counts, plus a sample of orphaned paths.
+    """
+    counts: Dict[str, Any] = {
+        "files_checked": 0,
+        "files_referenced": 0,
+        "orphans_found": 0,
+        "files_deleted": 0,
+        "bytes_freed": 0,
+        "bytes_reclaimable": 0,
+        "dry_run": dry_run,
+        "sample": [],
+    }
+
+    if not index.is_backfilled():
+        # Files written before the index existed must be indexed first,
+        # otherwise every one of them would look orphaned.
+        if not _backfill_upload_references(index, upload_dirs):
+            logger.warning("Upload reference backfill incomplete, skipping orphan cleanup")
+            counts["skipped"] = "backfill_incomplete"
+            return counts
+
+    referenced = index.referenced_paths()
+    cutoff_ts = cutoff.timestamp()
+
+    orphans: List[Tuple[str, int]] = []
+    for path, mtime, size in _scan_upload_files(upload_dirs):
+        counts["files_checked"] += 1
+        if path in referenced:
+            counts["files_referenced"] += 1
+            continue
+        if mtime >= cutoff_ts:
+            continue
+        orphans.append((path, size))
+
+    counts["orphans_found"] = len(orphans)
+    counts["bytes_reclaimable"] = sum(size for _, size in orphans)
+    counts["sample"] = [path for path, _ in orphans[:ORPHAN_REPORT_SAMPLE_SIZE]]
+
+    if dry_run:
+        return counts
+
+    for i in range(0, len(orphans), batch_size):
+        batch = orphans[i:i + batch_size]
+        # Re-check the batch: a file may have been registered since the snapshot
+        still_referenced = index.filter_referenced([path for path, _ in batch])
+        for path, size in batch:
+            if path in still_referenced:
+                continue
+            try:
+                os.remove(path)
+                counts["files_deleted"] += 1
+                counts["bytes_freed"] += size
+            except OSError as e:
+                logger.warning(f"Could not delete {path}: {e}")
 
     # Clean up empty directories
     for upload_dir in upload_dirs:
         if os.path.isdir(upload_dir):
             _remove_empty_dirs(upload_dir)
 
-    if counts["files_deleted"] > 0:
-        mb_freed = counts["bytes_freed"] / (1024 * 1024)
-        logger.info(
-            f"Cleaned up {counts['files_deleted']} orphaned uploads, freed {mb_freed:.1f} MB"
-        )
-
-    _log_retention_event("cleanup_orphaned_uploads", counts)
     return counts
 
 
 @shared_task(name="tasks.data_retention.trim_audit_logs")
-def trim_audit_logs() -> Dict[str, int]:
+def trim_audit_logs(vacuum: bool = False) -> Dict[str, Any]:
     """
     Delete audit log entries older than the retention window.
 
     Runs weekly. Default retention is 7 years (regulatory requirement).
+    Entries are deleted in bounded chunks; freed pages are reused by new
+    entries, so VACUUM (which locks the whole database while it rewrites
+    it) only runs when asked for.
     """
-    counts = {"logs_deleted": 0}
+    counts: Dict[str, Any] = {"logs_deleted": 0}
     cutoff = (datetime.now(timezone.utc) - timedelta(days=AUDIT_LOG_RETENTION_DAYS)).isoformat()
 
     try:
         from audit.audit_logger import AuditLogger
+        from database.retention import AUDIT_LOG_SWEEP
         audit = AuditLogger()
 
-        with sqlite3.connect(audit.db_path) as conn:
-            cursor = conn.cursor()
+        sweep = _run_sweep(audit.db_path, AUDIT_LOG_SWEEP, cutoff)
+        counts["logs_deleted"] = sweep["rows_deleted"]
+        counts["sweep"] = sweep
 
-            cursor.execute(
-                "SELECT COUNT(*) FROM audit_log WHERE timestamp < ?",
-                (cutoff,),
+        if sweep["rows_deleted"]:
+            logger.info(
+                f"Trimmed {sweep['rows_deleted']} audit logs older than {AUDIT_LOG_RETENTION_DAYS} days "
+                f"({sweep['rows_per_second']} rows/s)"
             )
-            count = cursor.fetchone()[0]
-
-            if count > 0:
-                cursor.execute(
-                    "DELETE FROM audit_log WHERE timestamp < ?",
-                    (cutoff,),
-                )
-                conn.commit()
-                counts["logs_deleted"] = count
-
-                # Reclaim disk space
-                cursor.execute("VACUUM")
-                conn.commit()
-
-                logger.info(f"Trimmed {count} audit logs older than {AUDIT_LOG_RETENTION_DAYS} days")
+            if vacuum and sweep["completed"]:
+                with sqlite3.connect(audit.db_path) as conn:
+                    conn.execute("VACUUM")
 
     except Exception as e:
         logger.error(f"Failed to trim audit logs: {e}")
@@ -219,6 +288,21 @@ def cleanup_stale_data() -> Dict[str, int]:
 # =============================================================================
 
 
+def _run_sweep(db_path, sweep, cutoff: str, on_chunk_deleted=None) -> Dict[str, Any]:
+    """Run a chunked retention sweep with the configured chunk size and budget."""
+    from database.retention import run_sweep
+
+    return run_sweep(
+        db_path,
+        sweep,
+        cutoff,
+        chunk_size=RETENTION_CHUNK_SIZE,
+        pause_seconds=RETENTION_CHUNK_PAUSE_MS / 1000,
+        max_seconds=RETENTION_MAX_SECONDS,
+        on_chunk_deleted=on_chunk_deleted,
+    )
+
+
 async def _purge_redis_orphans() -> int:
     """Remove Redis session index entries pointing to expired sessions."""
     purged = 0
@@ -240,38 +324,109 @@ async def _purge_redis_orphans() -> int:
     return purged
 
 
-def _is_file_referenced(filepath: str) -> bool:
-    """Check if an uploaded file is still referenced in the database."""
-    try:
-        from database.session_persistence import get_session_persistence
-        persistence = get_session_persistence()
+def _scan_upload_files(upload_dirs: List[str]) -> Iterator[Tuple[str, float, int]]:
+    """Yield (normalized path, mtime, size) for every file under the upload dirs."""
+    from database.upload_references import normalize_upload_path
 
-        filename = os.path.basename(filepath)
+    stack = [normalize_upload_path(d) for d in upload_dirs if os.path.isdir(d)]
+    seen = set()
+    while stack:
+        directory = stack.pop()
+        if directory in seen:
+            continue
+        seen.add(directory)
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            st = entry.stat(follow_symlinks=False)
+                            yield entry.path, st.st_mtime, st.st_size
+                    except OSError as e:
+                        logger.warning(f"Could not stat {entry.path}: {e}")
+        except OSError as e:
+            logger.warning(f"Could not scan {directory}: {e}")
+
+
+_REFERENCE_TOKEN = re.compile(r"[^\s\"'/\\,;:()\[\]{}<>]+")
+
+
+def _backfill_upload_references(index, upload_dirs: List[str]) -> bool:
+    """
+    Index files stored before the upload reference index existed.
 
-        with sqlite3.connect(persistence.db_path) as conn:
-            cursor = conn.cursor()
+    A file is kept if its name appears in session data, document results or
+    CPA intake storage paths. Every source is read once and tokenized, so
+    this is linear in the data size. Returns False if any source could not
+    be read, in which case nothing is treated as orphaned.
+    """
+    by_name: Dict[str, List[str]] = {}
+    for path, _, _ in _scan_upload_files(upload_dirs):
+        by_name.setdefault(os.path.basename(path), []).append(path)
+
+    # Names the tokenizer would split are matched as substrings instead
+    odd_names = [name for name in by_name if not _REFERENCE_TOKEN.fullmatch(name)]
+    referenced: List[str] = []
+
+    def _match(text: Optional[str]) -> None:
+        if not text:
+            return
+        for token in _REFERENCE_TOKEN.findall(text):
+            paths = by_name.pop(token, None)
+            if paths:
+                referenced.extend(paths)
+        for name in odd_names:
+            if name in by_name and name in text:
+                referenced.extend(by_name.pop(name))
 
-            # Check document_processing table
-            cursor.execute(
-                "SELECT COUNT(*) FROM document_processing WHERE file_path LIKE ?",
-                (f'%{filename}%',),
-            )
-            if cursor.fetchone()[0] > 0:
-                return True
+    try:
+        from database.session_persistence import get_session_persistence, _decrypt_session_data
+        with sqlite3.connect(get_session_persistence().db_path) as conn:
+            for data_json in _read_column(conn, "SELECT data_json FROM session_states"):
+                _match(_decrypt_session_data(data_json) if data_json else None)
+            for result_json in _read_column(conn, "SELECT result_json FROM document_processing"):
+                _match(result_json)
+
+        from database.tenant_persistence import get_tenant_persistence
+        with sqlite3.connect(get_tenant_persistence().db_path) as conn:
+            for branding in _read_column(conn, "SELECT branding FROM tenants"):
+                _match(branding)
+            for urls in _read_column(
+                conn,
+                "SELECT COALESCE(profile_photo_url, '') || ' ' || "
+                "COALESCE(signature_image_url, '') FROM cpa_branding",
+            ):
+                _match(urls)
+
+        from cpa_panel.api.intake_routes import get_db_connection
+        conn = get_db_connection()
+        try:
+            for storage_path in _read_column(conn, "SELECT storage_path FROM client_documents"):
+                _match(storage_path)
+        finally:
+            conn.close()
+    except Exception as e:
+        logger.error(f"Upload reference backfill failed: {e}")
+        return False
 
-            # Check session data for file references
-            cursor.execute(
-                "SELECT COUNT(*) FROM session_states WHERE data_json LIKE ?",
-                (f'%{filename}%',),
-            )
-            if cursor.fetchone()[0] > 0:
-                return True
+    index.register_many(referenced)
+    index.mark_backfilled()
+    logger.info(f"Upload reference backfill indexed {len(referenced)} existing files")
+    return True
 
-    except Exception:
-        # If we can't check, assume referenced (safe default)
-        return True
 
-    return False
+def _read_column(conn: sqlite3.Connection, query: str) -> Iterator[Any]:
+    """Yield the first column of a query; a missing table yields nothing."""
+    try:
+        cursor = conn.execute(query)
+    except sqlite3.OperationalError as e:
+        if "no such table" in str(e):
+            return
+        raise
+    for row in cursor:
+        yield row[0]
 
 
 def _remove_empty_dirs(root_dir: str):
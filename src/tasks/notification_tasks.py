@@ -11,7 +11,6 @@ Tasks:
 import asyncio
 import concurrent.futures
 import logging
-from datetime import datetime, timezone
 
 from celery import shared_task
 
@@ -28,47 +27,63 @@ def process_deadline_reminders():
     error_count = 0
 
     try:
-        from cpa_panel.deadlines.deadline_service import DeadlineService
+        from cpa_panel.deadlines.deadline_models import ReminderType
+        from cpa_panel.deadlines.deadline_service import deadline_service
         from notifications.email_triggers import email_triggers
     except ImportError as e:
         logger.warning(f"Deadline reminder dependencies unavailable: {e}")
         return {"sent": 0, "errors": 0, "skipped": True}
 
     try:
-        deadline_service = DeadlineService()
-        pending = deadline_service.get_pending_reminders()
+        # Pick up the deadlines with due reminders (and reminders already
+        # sent) written by the web workers, via the persisted schedule
+        deadline_service.load_due()
 
+        # Only reminders whose fire date has passed are visited
+        pending = deadline_service.get_due_reminders()
+
+        campaign = []
+        reminder_keys = []
         for reminder in pending:
-            try:
-                deadline = reminder.get("deadline")
-                if not deadline:
-                    continue
+            deadline = reminder["deadline"]
+            if reminder["reminder"].reminder_type != ReminderType.EMAIL:
+                continue
 
-                days_remaining = (deadline.due_date - datetime.now(timezone.utc)).days
-                recipient_email = reminder.get("recipient_email", "")
-                if not recipient_email:
+            campaign.append({
+                "recipient_email": reminder["recipient_email"],
+                "recipient_name": reminder.get("recipient_name", ""),
+                "deadline_type": deadline.title or "Tax Deadline",
+                "due_date": deadline.effective_due_date,
+                "days_remaining": deadline.days_until_due,
+                "client_name": reminder.get("client_name"),
+                "firm_id": reminder.get("firm_id"),
+                "deadline_id": reminder.get("deadline_id"),
+            })
+            reminder_keys.append((reminder["deadline_id"], reminder["reminder_id"]))
+
+        if campaign:
+            # One event loop for the whole campaign so the email queue's
+            # workers reuse their SMTP sessions across reminders
+            results = asyncio.run(_send_deadline_campaign(email_triggers, campaign))
+
+            # A reminder with several recipients is only marked sent once
+            # every one of its emails went out
+            failed = set()
+            for key, result in zip(reminder_keys, results):
+                if not result.success:
+                    logger.error(f"Failed to send deadline reminder: {result.error_message}")
+                    error_count += 1
+                    failed.add(key)
+
+            for deadline_id, reminder_id in dict.fromkeys(reminder_keys):
+                if (deadline_id, reminder_id) in failed:
                     continue
-
-                asyncio.run(
-                    email_triggers.send_deadline_reminder(
-                        recipient_email=recipient_email,
-                        recipient_name=reminder.get("recipient_name", ""),
-                        deadline_type=getattr(deadline, "deadline_type", "Tax Deadline"),
-                        due_date=deadline.due_date,
-                        days_remaining=days_remaining,
-                        client_name=reminder.get("client_name"),
-                        firm_id=reminder.get("firm_id"),
-                    )
-                )
-
-                reminder_id = reminder.get("reminder_id")
-                if reminder_id and hasattr(deadline_service, "mark_reminder_sent"):
-                    deadline_service.mark_reminder_sent(reminder_id)
-
-                sent_count += 1
-            except Exception as e:
-                logger.error(f"Failed to send deadline reminder: {e}")
-                error_count += 1
+                try:
+                    deadline_service.mark_reminder_sent(deadline_id, reminder_id)
+                    sent_count += 1
+                except Exception as e:
+                    logger.error(f"Failed to mark deadline reminder sent: {e}")
+                    error_count += 1
 
     except Exception as e:
         logger.error(f"Deadline reminder scan failed: {e}")
@@ -77,6 +92,16 @@ def process_deadline_reminders():
     return {"sent": sent_count, "errors": error_count}
 
 
+async def _send_deadline_campaign(email_triggers, campaign):
+    """Queue every reminder, wait for delivery, then close the SMTP sessions."""
+    from notifications.email_queue import get_email_queue
+
+    try:
+        return await email_triggers.send_deadline_reminders(campaign)
+    finally:
+        await get_email_queue().stop()
+
+
 @shared_task(name="tasks.notifications.process_nurture_emails")
 def process_nurture_emails():
     """
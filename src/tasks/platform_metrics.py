@@ -0,0 +1,64 @@
+"""Superadmin platform metric snapshot jobs.
+
+- apply_platform_metric_events (every minute): applies queued firm and
+  subscription changes to today's snapshot rows as deltas
+- refresh_platform_metrics (hourly): recomputes the snapshots, cohorts and
+  user counts from the source tables, correcting any drift
+
+See admin_panel.services.platform_metrics.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from tasks.celery_app import celery_app, TaskBase
+
+logger = logging.getLogger(__name__)
+
+
+async def _run(operation: Callable[[Any, AsyncSession], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+    # A fresh engine per run: pooled connections can't outlive asyncio.run's loop
+    from admin_panel.services.platform_metrics import get_platform_metrics_store
+    from database.async_engine import create_engine
+
+    engine = create_engine()
+    try:
+        async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+            return await operation(get_platform_metrics_store(), session)
+    finally:
+        await engine.dispose()
+
+
+@celery_app.task(base=TaskBase, bind=True, name="tasks.platform_metrics.apply_platform_metric_events")
+def apply_platform_metric_events(self) -> Dict[str, Any]:
+    """
+    Apply queued platform metric events to the snapshots.
+
+    Returns:
+        Dict with the number of events and firms applied
+    """
+    result = asyncio.run(_run(lambda store, session: store.apply_pending_events(session)))
+    if result.get("events"):
+        logger.info(f"Applied {result['events']} platform metric events for {result['firms']} firms")
+    return result
+
+
+@celery_app.task(base=TaskBase, bind=True, name="tasks.platform_metrics.refresh_platform_metrics")
+def refresh_platform_metrics(self) -> Dict[str, Any]:
+    """
+    Recompute the platform metric snapshots from the source tables.
+
+    Returns:
+        Dict with the snapshot day, row counts and duration
+    """
+    result = asyncio.run(_run(lambda store, session: store.refresh(session)))
+    logger.info(
+        f"Platform metrics refreshed: {result['firms']} firms, "
+        f"{result['subscriptions']} subscriptions in {result['duration_ms']}ms"
+    )
+    return result
@@ -645,6 +645,15 @@ async def tax_app_error_handler(request: Request, exc: TaxAppError):
     )
 
 
+# Saturated calculation executor -> 503 with Retry-After
+try:
+    from services.async_calculation_pipeline import PipelineOverloadedError
+    from web.dependencies import pipeline_overloaded_handler
+    app.add_exception_handler(PipelineOverloadedError, pipeline_overloaded_handler)
+except ImportError as e:
+    logger.warning(f"Calculation overload handler not registered: {e}")
+
+
 @app.exception_handler(RequestValidationError)
 async def validation_error_handler(request: Request, exc: RequestValidationError):
     """Handle Pydantic validation errors with user-friendly messages."""
@@ -95,6 +95,10 @@ def _upload_to_storage(content: bytes, folder: str, filename: str) -> str:
     file_path = upload_dir / filename
     with open(file_path, "wb") as fh:
         fh.write(content)
+
+    # Index the file so orphaned-upload cleanup keeps it
+    from ..database.upload_references import OWNER_BRANDING, get_upload_reference_index
+    get_upload_reference_index().register(file_path, owner_type=OWNER_BRANDING)
     return f"/uploads/{folder}/{filename}"
 
 
@@ -22,14 +22,20 @@ Usage in endpoints:
 """
 
 from typing import AsyncGenerator, Optional
+from datetime import datetime, timezone
 from functools import lru_cache
 
-from fastapi import Depends
+from fastapi import Depends, Request
+from fastapi.responses import JSONResponse
 
 from database.unit_of_work import UnitOfWork, get_unit_of_work
 from domain.repositories import IUnitOfWork
 from services.async_tax_return_service import AsyncTaxReturnService
-from services.async_calculation_pipeline import AsyncCalculationPipeline, create_async_pipeline
+from services.async_calculation_pipeline import (
+    AsyncCalculationPipeline,
+    PipelineOverloadedError,
+    create_async_pipeline,
+)
 from services.validation_service import ValidationService
 from calculator.engine import FederalTaxEngine
 from calculator.state.state_tax_engine import StateTaxEngine
@@ -173,6 +179,28 @@ def get_default_pipeline() -> AsyncCalculationPipeline:
     return create_async_pipeline()
 
 
+async def pipeline_overloaded_handler(request: Request, exc: PipelineOverloadedError) -> JSONResponse:
+    """
+    Exception handler for a saturated calculation executor.
+
+    Routes using get_async_pipeline / get_default_pipeline let
+    PipelineOverloadedError propagate; this turns it into a 503 with a
+    Retry-After header so clients back off instead of treating the
+    rejection as a failed calculation. Registered on the app in web/app.py.
+    """
+    return JSONResponse(
+        status_code=503,
+        content={
+            "error": True,
+            "code": "SERVICE_OVERLOADED",
+            "message": "The calculation service is busy. Please try again shortly.",
+            "details": {"retry_after": exc.retry_after},
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        },
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
 # Optional: Cache-backed service
 try:
     from cache.calculation_cache import CalculationCache
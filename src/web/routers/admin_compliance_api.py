@@ -12,10 +12,12 @@ All compliance operations are themselves audited.
 """
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime, timedelta, timezone
 from uuid import uuid4
+import json
 import logging
 
 from rbac.dependencies import require_auth, require_platform_admin, require_permission
@@ -333,28 +335,51 @@ async def get_audit_logs(
     action: Optional[str] = Query(None, description="Filter by action type"),
     days: int = Query(7, ge=1, le=90, description="Days to look back"),
     limit: int = Query(100, le=500, description="Maximum results"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
 ):
     """
     Get audit logs.
 
-    Returns a chronological list of auditable events.
+    Returns a chronological list of auditable events, newest first. Pass
+    next_cursor back as cursor for the following page. The first page also
+    carries a total, estimated for large ranges.
     """
     logs = []
+    next_cursor = None
+    estimate = None
+    audit_logger = None
+    start_date = datetime.now(timezone.utc) - timedelta(days=days)
     try:
-        from audit.audit_logger import get_audit_logger
+        from audit.audit_logger import decode_cursor, get_audit_logger
+        try:
+            decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
         audit_logger = get_audit_logger()
-        start_date = datetime.now(timezone.utc) - timedelta(days=days)
-        logs = audit_logger.query(
+        page = audit_logger.query_page(
             user_id=user_id,
             start_date=start_date,
             limit=limit,
+            cursor=cursor,
         )
+        logs, next_cursor = page["events"], page["next_cursor"]
+    except HTTPException:
+        raise
     except Exception as e:
         logger.warning(f"Could not query audit logs: {e}")
 
+    if audit_logger is not None and cursor is None:
+        try:
+            estimate = audit_logger.estimate_count(user_id=user_id, start_date=start_date)
+        except Exception as e:
+            logger.warning(f"Could not estimate audit log count: {e}")
+
     return {
         "logs": logs,
         "total": len(logs),
+        "next_cursor": next_cursor,
+        "estimated_total": estimate["count"] if estimate else None,
+        "estimated_total_exact": estimate["exact"] if estimate else None,
         "date_range": {
             "from": (datetime.now(timezone.utc) - timedelta(days=days)).isoformat(),
             "to": datetime.now(timezone.utc).isoformat(),
@@ -362,6 +387,34 @@ async def get_audit_logs(
     }
 
 
+@router.get("/audit-logs/export")
+async def export_audit_logs(
+    ctx: AuthContext = Depends(require_platform_admin),
+    user_id: Optional[str] = Query(None, description="Filter by user"),
+    days: int = Query(365, ge=1, le=3650, description="Days to look back"),
+):
+    """
+    Export audit logs as newline-delimited JSON, oldest first.
+
+    Streams the log in keyset batches, so a full dump is not held in memory.
+    """
+    from audit.audit_logger import get_audit_logger
+
+    audit_logger = get_audit_logger()
+    start_date = datetime.now(timezone.utc) - timedelta(days=days)
+
+    def _lines():
+        for event in audit_logger.export(user_id=user_id, start_date=start_date):
+            yield json.dumps(event, default=str) + "\n"
+
+    logger.info(f"Audit log export by {ctx.user_id}: user_id={user_id}, days={days}")
+    return StreamingResponse(
+        _lines(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="audit_log.ndjson"'},
+    )
+
+
 # =============================================================================
 # DATA ACCESS AUDIT
 # =============================================================================
@@ -407,6 +407,7 @@ def _erase_uploaded_files(
 ) -> int:
     """Delete uploaded document files from filesystem."""
     deleted_count = 0
+    deleted_paths = []
     upload_dirs = [
         "./data/uploads",
         "./uploads",
@@ -430,10 +431,21 @@ def _erase_uploaded_files(
                     try:
                         os.remove(filepath)
                         deleted_count += 1
+                        deleted_paths.append(filepath)
                         logger.debug(f"Deleted upload: {filepath}")
                     except OSError as e:
                         logger.warning(f"Could not delete {filepath}: {e}")
 
+    # Drop index entries for the erased files
+    try:
+        from database.upload_references import get_upload_reference_index
+        index = get_upload_reference_index()
+        index.unregister(deleted_paths)
+        if identifier_type == "session_id":
+            index.unregister_session(identifier_value)
+    except Exception as e:
+        logger.warning(f"Could not update upload reference index: {e}")
+
     return deleted_count
 
 
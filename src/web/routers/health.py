@@ -539,6 +539,40 @@ async def calculation_metrics() -> JSONResponse:
     return JSONResponse(content=metrics)
 
 
+@router.get("/metrics/firm-status-cache")
+async def firm_status_cache_metrics() -> JSONResponse:
+    """
+    Firm subscription status cache metrics.
+
+    Returns:
+    - Hit/miss/expired counts and hit rate
+    - Local and cross-process invalidation counts
+    - Average and maximum age of served entries (staleness)
+    """
+    from rbac.firm_status_cache import get_firm_status_cache
+
+    metrics = get_firm_status_cache().get_stats()
+    metrics["collected_at"] = datetime.now(timezone.utc).isoformat() + "Z"
+    return JSONResponse(content=metrics)
+
+
+@router.get("/metrics/calculation-executor")
+async def calculation_executor_metrics() -> JSONResponse:
+    """
+    Calculation executor load metrics.
+
+    Returns:
+    - Pending, running and queued engine calls (queue depth)
+    - Admitted, completed, failed and rejected (admission control) counts
+    - Average/maximum queue wait and average run time
+    """
+    from services.async_calculation_pipeline import get_calculation_executor
+
+    metrics = get_calculation_executor().get_stats()
+    metrics["collected_at"] = datetime.now(timezone.utc).isoformat() + "Z"
+    return JSONResponse(content=metrics)
+
+
 @router.get("/health/info")
 async def application_info() -> JSONResponse:
     """
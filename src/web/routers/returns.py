@@ -38,6 +38,13 @@ except ImportError:
     _JOURNEY_EVENTS_AVAILABLE = False
 from rbac.roles import Role
 
+# Practice intelligence aggregates (kept current on save/delete)
+try:
+    from cpa_panel.practice_intelligence.aggregates import sync_deleted_return, sync_saved_return
+    _PRACTICE_METRICS_AVAILABLE = True
+except ImportError:
+    _PRACTICE_METRICS_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/returns", tags=["Tax Returns"])
@@ -144,6 +151,16 @@ async def save_return(request: Request, ctx: AuthContext = Depends(require_auth)
             except Exception:
                 pass
 
+        # Practice intelligence: fold this return into its owning firm's aggregates
+        if _PRACTICE_METRICS_AVAILABLE:
+            get_firm = getattr(persistence, "get_return_firm_id", None)
+            try:
+                owner = get_firm(saved_id) if get_firm else (str(ctx.firm_id) if ctx.firm_id else None)
+            except Exception as e:
+                logger.warning(f"Could not resolve firm for return {saved_id}: {e}")
+            else:
+                sync_saved_return(saved_id, tax_return_data, owner)
+
         return JSONResponse({
             "status": "success",
             "return_id": saved_id,
@@ -238,6 +255,9 @@ async def delete_return(return_id: str, request: Request, ctx: AuthContext = Dep
         # Delete (with same ownership scope)
         persistence.delete_return(return_id, **scope)
 
+        if _PRACTICE_METRICS_AVAILABLE:
+            sync_deleted_return(return_id)
+
         return JSONResponse({
             "status": "success",
             "message": "Return deleted",
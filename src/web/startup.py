@@ -226,6 +226,31 @@ async def on_startup_irs_rag_warmup():
         logger.warning(f"IRS RAG warmup initialization failed: {e}")
 
 
+async def on_startup_case_matcher_warmup():
+    """Embed the case/strategy corpus in the background so first queries skip it."""
+    try:
+        from services.case_matcher import get_case_matcher
+
+        import asyncio
+        asyncio.create_task(get_case_matcher().warm())
+        logger.info("Case matcher index warming started (background task)")
+    except ImportError:
+        logger.debug("Case matcher not available")
+    except Exception as e:
+        logger.warning(f"Case matcher warmup initialization failed: {e}")
+
+
+async def on_startup_deadlines():
+    """Load persisted CPA deadlines into the deadline service."""
+    try:
+        from cpa_panel.deadlines.deadline_service import deadline_service
+
+        count = deadline_service.load()
+        logger.info(f"Loaded {count} deadlines")
+    except Exception as e:
+        logger.warning(f"Deadline load failed (non-fatal): {e}")
+
+
 async def on_shutdown_database():
     """Close database connections on application shutdown."""
     try:
@@ -268,6 +293,50 @@ async def on_shutdown_websocket_pubsub():
     except Exception as e:
         logger.warning(f"Error stopping WebSocket broadcaster: {e}")
 
+    try:
+        from realtime.connection_manager import connection_manager
+        if not await connection_manager.flush(timeout=2.0):
+            logger.warning("WebSocket outbound queues not fully drained on shutdown")
+    except Exception as e:
+        logger.warning(f"Error flushing WebSocket outbound queues: {e}")
+
+
+async def on_startup_firm_status_cache():
+    """Subscribe to cross-worker firm status invalidations."""
+    try:
+        from rbac.firm_status_cache import get_firm_status_cache
+        if await get_firm_status_cache().start_listener():
+            logger.info("Firm status cache invalidation listener started")
+    except Exception as e:
+        logger.warning(f"Firm status cache listener failed to start (non-fatal): {e}")
+
+
+async def on_shutdown_firm_status_cache():
+    """Stop the firm status invalidation listener."""
+    try:
+        from rbac.firm_status_cache import get_firm_status_cache
+        await get_firm_status_cache().stop_listener()
+    except Exception as e:
+        logger.warning(f"Error stopping firm status cache listener: {e}")
+
+
+async def on_shutdown_email_queue():
+    """Deliver queued emails and close pooled SMTP sessions."""
+    try:
+        from notifications.email_queue import get_email_queue
+        await get_email_queue().stop()
+    except Exception as e:
+        logger.warning(f"Error stopping email queue: {e}")
+
+
+async def on_shutdown_calculation_executor():
+    """Let in-flight calculations finish and stop the calculation workers."""
+    try:
+        from services.async_calculation_pipeline import reset_calculation_executor
+        reset_calculation_executor(wait=True)
+    except Exception as e:
+        logger.warning(f"Error stopping calculation executor: {e}")
+
 
 def register_lifecycle_events(app):
     """Register all startup and shutdown event handlers on the app."""
@@ -278,7 +347,13 @@ def register_lifecycle_events(app):
     app.on_event("startup")(on_startup_auto_save)
     app.on_event("startup")(on_startup_production_readiness_check)
     app.on_event("startup")(on_startup_irs_rag_warmup)
+    app.on_event("startup")(on_startup_case_matcher_warmup)
+    app.on_event("startup")(on_startup_deadlines)
     app.on_event("startup")(on_startup_websocket_pubsub)
+    app.on_event("startup")(on_startup_firm_status_cache)
     app.on_event("shutdown")(on_shutdown_database)
     app.on_event("shutdown")(on_shutdown_auto_save)
     app.on_event("shutdown")(on_shutdown_websocket_pubsub)
+    app.on_event("shutdown")(on_shutdown_firm_status_cache)
+    app.on_event("shutdown")(on_shutdown_email_queue)
+    app.on_event("shutdown")(on_shutdown_calculation_executor)
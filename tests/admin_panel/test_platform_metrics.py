@@ -0,0 +1,242 @@
+"""
+Tests for the materialized superadmin platform metrics.
+
+Checks that a refresh matches aggregates over the source tables, that
+queued firm/subscription events applied as deltas leave the snapshots
+equal to a full recomputation, that the ORM flush hook queues events,
+and that dashboard reads are cached and coalesced.
+"""
+
+import asyncio
+import os
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+from admin_panel.models.platform_metrics import (
+    PlatformChurnCohort,
+    PlatformDailyMetrics,
+    PlatformMetricContribution,
+    PlatformMetricEvent,
+    PlatformMrrByTier,
+)
+from admin_panel.services.platform_metrics import (
+    PlatformMetricsStore,
+    monthly_amount,
+    queue_subscription_metric_events,
+)
+
+SOURCE_SCHEMA = [
+    """CREATE TABLE firms (firm_id TEXT PRIMARY KEY, name TEXT, is_active BOOLEAN,
+        created_at TIMESTAMP, updated_at TIMESTAMP, deleted_at TIMESTAMP)""",
+    """CREATE TABLE users (user_id TEXT PRIMARY KEY, firm_id TEXT, is_active BOOLEAN, last_login_at TIMESTAMP)""",
+    """CREATE TABLE subscription_plans (plan_id TEXT PRIMARY KEY, name TEXT, code TEXT,
+        monthly_price NUMERIC, annual_price NUMERIC)""",
+    """CREATE TABLE subscriptions (subscription_id TEXT PRIMARY KEY, firm_id TEXT, plan_id TEXT,
+        billing_cycle TEXT, status TEXT, stripe_subscription_id TEXT, cancelled_at TIMESTAMP,
+        created_at TIMESTAMP, updated_at TIMESTAMP)""",
+    """CREATE TABLE feature_flags (feature_key TEXT, rollout_percentage INTEGER, is_enabled_globally BOOLEAN)""",
+]
+SNAPSHOT_TABLES = [
+    PlatformDailyMetrics.__table__,
+    PlatformMrrByTier.__table__,
+    PlatformChurnCohort.__table__,
+    PlatformMetricContribution.__table__,
+    PlatformMetricEvent.__table__,
+]
+PLANS = {"starter": (199, 1990), "professional": (499, 4990), "enterprise": (999, 9990)}
+NOW = datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+@pytest.fixture
+async def factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'platform.db'}", poolclass=NullPool)
+    async with engine.begin() as conn:
+        for statement in SOURCE_SCHEMA:
+            await conn.execute(text(statement))
+        for table in SNAPSHOT_TABLES:
+            await conn.run_sync(table.create)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+async def _seed(factory, firms=60, seed=3):
+    rng = random.Random(seed)
+    async with factory() as session:
+        for code, (monthly, annual) in PLANS.items():
+            await session.execute(text(
+                "INSERT INTO subscription_plans VALUES (:id, :name, :code, :monthly, :annual)"
+            ), {"id": f"plan-{code}", "name": code.title(), "code": code, "monthly": monthly, "annual": annual})
+        for i in range(firms):
+            firm_id = str(uuid4())
+            created = NOW - timedelta(days=rng.randrange(400))
+            deleted = NOW if rng.random() < 0.05 else None
+            await session.execute(text(
+                "INSERT INTO firms VALUES (:id, :name, :active, :created, :created, :deleted)"
+            ), {"id": firm_id, "name": f"Firm {i}", "active": rng.random() < 0.85,
+                "created": created, "deleted": deleted})
+            for _ in range(rng.randrange(1, 4)):
+                await session.execute(text("INSERT INTO users VALUES (:id, :firm, :active, :login)"), {
+                    "id": str(uuid4()), "firm": firm_id, "active": rng.random() < 0.9,
+                    "login": NOW - timedelta(days=rng.randrange(60)) if rng.random() < 0.9 else None,
+                })
+            status = rng.choice(["active", "active", "active", "trialing", "cancelled", "past_due", "ACTIVE"])
+            await session.execute(text(
+                "INSERT INTO subscriptions VALUES (:id, :firm, :plan, :cycle, :status, :stripe, :cancelled, "
+                ":created, :created)"
+            ), {
+                "id": str(uuid4()), "firm": firm_id, "plan": f"plan-{rng.choice(list(PLANS))}",
+                "cycle": rng.choice(["monthly", "annual", "yearly"]), "status": status,
+                "stripe": f"sub_{i}", "cancelled": NOW - timedelta(days=rng.randrange(120)) if status == "cancelled" else None,
+                "created": created,
+            })
+        await session.commit()
+
+
+async def _source_totals(factory):
+    """The figures the superadmin endpoints used to aggregate per request."""
+    async with factory() as session:
+        firms = (await session.execute(text(
+            "SELECT COUNT(*), SUM(CASE WHEN is_active THEN 1 ELSE 0 END) FROM firms WHERE deleted_at IS NULL"
+        ))).fetchone()
+        subs = (await session.execute(text("""
+            SELECT s.status, s.billing_cycle, sp.code, sp.monthly_price, sp.annual_price
+            FROM subscriptions s LEFT JOIN subscription_plans sp ON sp.plan_id = s.plan_id
+        """))).fetchall()
+    by_tier = {}
+    for status, cycle, code, monthly, annual in subs:
+        if status.lower() == "active":
+            entry = by_tier.setdefault(code, {"count": 0, "mrr": 0.0})
+            entry["count"] += 1
+            entry["mrr"] += float(monthly_amount(monthly, annual, cycle))
+    return {
+        "total_firms": firms[0],
+        "active_firms": firms[1],
+        "trial_firms": sum(1 for s in subs if s[0] in ("trialing", "trial")),
+        "by_tier": {t: {"count": v["count"], "mrr": round(v["mrr"], 2)} for t, v in by_tier.items()},
+    }
+
+
+async def test_first_read_builds_snapshots_matching_source(factory):
+    await _seed(factory)
+    store = PlatformMetricsStore(session_factory=factory, cache_ttl=0)
+
+    dashboard = await store.dashboard()
+    mrr = await store.mrr_breakdown()
+    expected = await _source_totals(factory)
+
+    assert dashboard["total_firms"] == expected["total_firms"]
+    assert dashboard["active_firms"] == expected["active_firms"]
+    assert dashboard["trial_firms"] == expected["trial_firms"]
+    assert mrr["by_tier"] == expected["by_tier"]
+    assert mrr["total_mrr"] == pytest.approx(sum(v["mrr"] for v in expected["by_tier"].values()))
+    assert dashboard["total_mrr"] == mrr["total_mrr"]
+    assert store.get_stats()["refreshes"] == 1
+
+
+async def test_events_applied_as_deltas_match_full_refresh(factory):
+    await _seed(factory)
+    store = PlatformMetricsStore(session_factory=factory, cache_ttl=0)
+    async with factory() as session:
+        await store.refresh(session)
+
+    async with factory() as session:
+        subs = (await session.execute(text("SELECT subscription_id, firm_id, status FROM subscriptions"))).fetchall()
+        changed = set()
+        for sub_id, firm_id, status in subs[:10]:
+            new_status = "cancelled" if status.lower() == "active" else "active"
+            await session.execute(text(
+                "UPDATE subscriptions SET status = :status, cancelled_at = :now, updated_at = :now "
+                "WHERE subscription_id = :id"
+            ), {"status": new_status, "now": NOW, "id": sub_id})
+            changed.add(firm_id)
+        for sub_id, firm_id, _ in subs[10:15]:
+            await session.execute(text(
+                "UPDATE subscriptions SET plan_id = 'plan-enterprise', billing_cycle = 'annual' WHERE subscription_id = :id"
+            ), {"id": sub_id})
+            changed.add(firm_id)
+        new_firm = str(uuid4())
+        await session.execute(text("INSERT INTO firms VALUES (:id, 'New', 1, :now, :now, NULL)"), {"id": new_firm, "now": NOW})
+        await session.execute(text(
+            "INSERT INTO subscriptions VALUES (:id, :firm, 'plan-professional', 'monthly', 'active', NULL, NULL, :now, :now)"
+        ), {"id": str(uuid4()), "firm": new_firm, "now": NOW})
+        await session.execute(text("UPDATE firms SET deleted_at = :now WHERE firm_id = :id"), {"now": NOW, "id": subs[20][1]})
+        for firm_id in changed | {new_firm, subs[20][1]}:
+            await session.execute(text("INSERT INTO platform_metric_events (firm_id) VALUES (:id)"), {"id": firm_id})
+        await session.commit()
+
+    async with factory() as session:
+        applied = await store.apply_pending_events(session)
+    assert applied["events"] == len(changed) + 2
+
+    async with factory() as session:
+        assert (await store.check_consistency(session))["consistent"]
+        assert (await session.execute(text("SELECT COUNT(*) FROM platform_metric_events"))).scalar() == 0
+
+    incremental = (await store.dashboard(), await store.mrr_breakdown())
+    async with factory() as session:
+        await store.refresh(session)
+    refreshed = (await store.dashboard(), await store.mrr_breakdown())
+    for key in ("total_firms", "active_firms", "trial_firms", "total_mrr", "tier_distribution"):
+        assert incremental[0][key] == refreshed[0][key]
+    assert incremental[1]["by_tier"] == refreshed[1]["by_tier"]
+
+
+async def test_churn_reads_cancellations_and_cohorts(factory):
+    await _seed(factory, firms=120)
+    store = PlatformMetricsStore(session_factory=factory, cache_ttl=0)
+    churn = await store.churn_analysis("quarter")
+
+    async with factory() as session:
+        cancelled = (await session.execute(text(
+            "SELECT COUNT(*) FROM subscriptions WHERE status = 'cancelled' AND cancelled_at > :since"
+        ), {"since": (NOW - timedelta(days=90)).strftime("%Y-%m-%d") + " 23:59:59.999999"})).scalar()
+    assert churn["churned_firms"] == cancelled
+    assert sum(entry["churned"] for entry in churn["by_tier"].values()) == cancelled
+    assert churn["cohorts"] and all(row["started"] >= row["churned"] for row in churn["cohorts"])
+    assert churn["at_risk_firms"] == len(churn["at_risk_list"]) <= 20
+
+
+async def test_reads_are_cached_and_coalesced(factory):
+    await _seed(factory, firms=10)
+    store = PlatformMetricsStore(session_factory=factory, cache_ttl=60)
+
+    first, second = await asyncio.gather(store.dashboard(), store.dashboard())
+    assert first is second
+    assert await store.dashboard() is first
+    stats = store.get_stats()
+    assert stats["cache_misses"] == 1 and stats["cache_hits"] == 2
+
+    async with factory() as session:
+        await queue_subscription_metric_events(session, "s.stripe_subscription_id = :sub_id", {"sub_id": "sub_1"})
+        await session.commit()
+        await store.apply_pending_events(session)
+    assert store.get_stats()["cache_entries"] == 0
+
+
+def test_orm_flush_queues_platform_metric_events(tmp_path):
+    from admin_panel.models.firm import Firm
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'orm.db'}")
+    Firm.__table__.create(engine)
+    PlatformMetricEvent.__table__.create(engine)
+    firm_id = uuid4()
+    with Session(engine) as session:
+        session.add(Firm(firm_id=firm_id, name="Acme"))
+        session.commit()
+        firm = session.get(Firm, firm_id)
+        firm.is_active = False
+        session.commit()
+        session.get(Firm, firm_id)
+        session.commit()  # unchanged, nothing queued
+        queued = session.execute(text("SELECT firm_id FROM platform_metric_events")).scalars().all()
+    assert queued == [str(firm_id), str(firm_id)]
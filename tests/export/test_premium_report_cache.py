@@ -0,0 +1,198 @@
+"""
+Tests for parallel, cached section generation in PremiumReportGenerator.
+"""
+
+import threading
+
+import pytest
+
+from cpa_panel.adapters.tax_return_adapter import DatabaseTaxReturn, TaxReturnWrapper
+from export.premium_report_generator import (
+    PremiumReportGenerator,
+    ReportFormat,
+    ReportSection,
+    ReportTier,
+    SectionCache,
+    TIER_SECTIONS,
+    fingerprint_tax_return,
+    invalidate_report_cache,
+)
+
+
+class _OfflineGenerator(PremiumReportGenerator):
+    """Generator with external services disabled and a swappable return."""
+
+    def __init__(self, tax_return, **kwargs):
+        super().__init__(**kwargs)
+        self.tax_return = tax_return
+        self.built = []
+        self._built_lock = threading.Lock()
+
+    @property
+    def advisory_service(self):
+        return None
+
+    @property
+    def scenario_service(self):
+        return None
+
+    def _get_tax_return(self, session_id):
+        return self.tax_return
+
+    def _generate_section(self, section, tax_return, session_id):
+        with self._built_lock:
+            self.built.append(section)
+        return super()._generate_section(section, tax_return, session_id)
+
+
+def _wrapped_return(**overrides):
+    data = dict(session_id="sess-1", w2_income=85000.0, agi=85000.0)
+    data.update(overrides)
+    return TaxReturnWrapper(DatabaseTaxReturn(**data), client_name="Pat Example")
+
+
+@pytest.fixture
+def generator():
+    return _OfflineGenerator(_wrapped_return(), section_cache=SectionCache())
+
+
+class TestFingerprint:
+    def test_same_data_same_fingerprint(self):
+        assert fingerprint_tax_return(_wrapped_return()) == fingerprint_tax_return(_wrapped_return())
+
+    def test_changed_data_changes_fingerprint(self):
+        assert fingerprint_tax_return(_wrapped_return()) != fingerprint_tax_return(
+            _wrapped_return(w2_income=90000.0)
+        )
+
+    def test_unserializable_return_disables_caching(self):
+        assert fingerprint_tax_return(object()) is None
+
+
+class TestSectionCaching:
+    def test_reexport_reuses_all_sections(self, generator):
+        first = generator.generate("sess-1", ReportTier.STANDARD, ReportFormat.JSON)
+        built_first = len(generator.built)
+        second = generator.generate("sess-1", ReportTier.STANDARD, ReportFormat.HTML)
+
+        assert built_first == len(TIER_SECTIONS[ReportTier.STANDARD])
+        assert len(generator.built) == built_first
+        assert second.metadata["sections_from_cache"] == len(second.sections)
+        assert [s.section_id for s in first.sections] == [s.section_id for s in second.sections]
+        assert [s.content for s in first.sections] == [s.content for s in second.sections]
+
+    def test_tier_upgrade_builds_only_new_sections(self, generator):
+        generator.generate("sess-1", ReportTier.BASIC, ReportFormat.JSON)
+        generator.built.clear()
+
+        generator.generate("sess-1", ReportTier.PREMIUM, ReportFormat.JSON)
+
+        expected = set(TIER_SECTIONS[ReportTier.PREMIUM]) - set(TIER_SECTIONS[ReportTier.BASIC])
+        assert set(generator.built) == expected
+
+    def test_changed_return_rebuilds(self, generator):
+        generator.generate("sess-1", ReportTier.BASIC, ReportFormat.JSON)
+        generator.built.clear()
+
+        generator.tax_return = _wrapped_return(w2_income=120000.0)
+        report = generator.generate("sess-1", ReportTier.BASIC, ReportFormat.JSON)
+
+        assert set(generator.built) == set(TIER_SECTIONS[ReportTier.BASIC])
+        assert report.metadata["sections_from_cache"] == 0
+
+    def test_cached_sections_are_isolated_copies(self, generator):
+        first = generator.generate("sess-1", ReportTier.BASIC, ReportFormat.JSON)
+        first.sections[0].content["tampered"] = True
+
+        second = generator.generate("sess-1", ReportTier.BASIC, ReportFormat.JSON)
+        assert "tampered" not in second.sections[0].content
+
+    def test_action_items_cached_for_premium(self, generator):
+        generator.generate("sess-1", ReportTier.PREMIUM, ReportFormat.JSON)
+        calls = []
+        original = generator._generate_action_items
+        generator._generate_action_items = lambda *a: calls.append(1) or original(*a)
+
+        report = generator.generate("sess-1", ReportTier.PREMIUM, ReportFormat.JSON)
+
+        assert calls == []
+        assert report.metadata["section_timings_ms"]["action_item_list"] == 0.0
+
+
+class _FailingAdvisory:
+    """Advisory service whose optimizer is unreachable."""
+
+    @property
+    def optimizer_adapter(self):
+        raise ConnectionError("optimizer unavailable")
+
+
+class _DegradedGenerator(_OfflineGenerator):
+    @property
+    def advisory_service(self):
+        return _FailingAdvisory()
+
+
+class TestDegradedOutput:
+    def test_degraded_sections_are_not_cached(self):
+        generator = _DegradedGenerator(_wrapped_return(), section_cache=SectionCache())
+        generator.generate("sess-1", ReportTier.PREMIUM, ReportFormat.JSON)
+        generator.built.clear()
+
+        report = generator.generate("sess-1", ReportTier.PREMIUM, ReportFormat.JSON)
+
+        assert ReportSection.CREDIT_ANALYSIS in generator.built
+        assert ReportSection.DEDUCTION_ANALYSIS in generator.built
+        assert report.metadata["sections_from_cache"] < len(report.sections)
+
+    def test_degraded_action_items_are_rebuilt(self):
+        generator = _DegradedGenerator(_wrapped_return(), section_cache=SectionCache())
+        generator.generate("sess-1", ReportTier.PREMIUM, ReportFormat.JSON)
+        calls = []
+        original = generator._generate_action_items
+        generator._generate_action_items = lambda *a: calls.append(1) or original(*a)
+
+        generator.generate("sess-1", ReportTier.PREMIUM, ReportFormat.JSON)
+
+        assert calls == [1]
+
+
+class TestInvalidation:
+    def test_invalidate_drops_session_entries(self):
+        cache = SectionCache()
+        cache.set(("sess-1", "fp", "tax_summary"), {"a": 1})
+        cache.set(("sess-2", "fp", "tax_summary"), {"b": 2})
+
+        assert cache.invalidate_session("sess-1") == 1
+        assert cache.get(("sess-1", "fp", "tax_summary")) is None
+        assert cache.get(("sess-2", "fp", "tax_summary")) == {"b": 2}
+
+    def test_module_invalidation_is_safe_for_unknown_session(self):
+        assert invalidate_report_cache("no-such-session") == 0
+
+
+class TestParallelGeneration:
+    def test_parallel_matches_sequential(self):
+        parallel = _OfflineGenerator(_wrapped_return(), max_workers=4, section_cache=SectionCache())
+        sequential = _OfflineGenerator(_wrapped_return(), max_workers=1, section_cache=SectionCache())
+
+        a = parallel.generate("sess-1", ReportTier.PREMIUM, ReportFormat.JSON)
+        b = sequential.generate("sess-1", ReportTier.PREMIUM, ReportFormat.JSON)
+
+        assert [s.section_id for s in a.sections] == [s.section_id for s in b.sections]
+        assert [s.content for s in a.sections] == [s.content for s in b.sections]
+
+    def test_timings_reported_per_section(self, generator):
+        report = generator.generate("sess-1", ReportTier.STANDARD, ReportFormat.JSON)
+        timings = report.metadata["section_timings_ms"]
+
+        for section in TIER_SECTIONS[ReportTier.STANDARD]:
+            assert section.value in timings
+            assert timings[section.value] >= 0
+
+    def test_html_uses_prerendered_section_fragments(self, generator):
+        report = generator.generate("sess-1", ReportTier.BASIC, ReportFormat.HTML)
+        summary = next(s for s in report.sections if s.section_id == ReportSection.TAX_SUMMARY)
+
+        assert summary.html
+        assert summary.html in report.html_content
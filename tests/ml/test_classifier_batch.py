@@ -0,0 +1,158 @@
+"""
+Tests for the batched classification path.
+
+classify_batch() must return the same answers as calling classify() once per
+document, for each classifier and for the ensemble cascade.
+"""
+import pytest
+
+from ml.classifiers.base import BaseClassifier, ClassificationResult
+from ml.classifiers.ensemble_classifier import EnsembleClassifier
+from ml.classifiers.regex_classifier import RegexClassifier
+from ml.classifiers.tfidf_classifier import TFIDFClassifier
+from ml.training.synthetic_data_generator import SyntheticDataGenerator
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    texts, _ = SyntheticDataGenerator(seed=7).generate_dataset(samples_per_type=3)
+    return texts + ["", "nothing to see here", "W-2 1099-INT mixed signals"]
+
+
+def _assert_same(batch, single):
+    assert len(batch) == len(single)
+    for b, s in zip(batch, single):
+        assert b.document_type == s.document_type
+        assert b.confidence == pytest.approx(s.confidence, abs=1e-9)
+        assert b.probabilities.keys() == s.probabilities.keys()
+        for key, value in s.probabilities.items():
+            assert b.probabilities[key] == pytest.approx(value, abs=1e-9)
+        assert b.classifier_used == s.classifier_used
+
+
+class _NoOpenAI:
+    name = "openai"
+
+    def is_available(self):
+        return False
+
+
+class _FlakyClassifier(BaseClassifier):
+    """Fails on texts containing 'boom'; its batch call always raises."""
+
+    name = "tfidf"
+
+    def is_available(self):
+        return True
+
+    def classify(self, text):
+        if "boom" in text:
+            raise RuntimeError("boom")
+        return ClassificationResult(document_type="w2", confidence=0.6, classifier_used=self.name)
+
+    def classify_batch(self, texts):
+        raise RuntimeError("batch unsupported")
+
+
+class _PartialBatchClassifier(_FlakyClassifier):
+    """Batch call drops the last item and returns None for 'boom' texts."""
+
+    def __init__(self):
+        super().__init__()
+        self.single_calls = []
+
+    def classify(self, text):
+        self.single_calls.append(text)
+        return super().classify(text)
+
+    def classify_batch(self, texts):
+        results = [
+            None if "boom" in text
+            else ClassificationResult(document_type="w2", confidence=0.6, classifier_used=self.name)
+            for text in texts
+        ]
+        return results[:-1]
+
+
+class TestRegexBatch:
+    def test_batch_matches_single(self, corpus):
+        clf = RegexClassifier()
+        _assert_same(clf.classify_batch(corpus), [clf.classify(t) for t in corpus])
+
+    def test_combined_prefilter_matches_individual_patterns(self, corpus):
+        combined = RegexClassifier._get_compiled_indicators()
+        for text in corpus:
+            lowered = text.lower()
+            for doc_type, (any_indicator, patterns) in combined.items():
+                individual = any(p.search(lowered) for _, p in patterns)
+                assert bool(any_indicator.search(lowered)) == individual, doc_type
+
+    def test_patterns_compiled_once(self):
+        assert RegexClassifier._get_compiled_indicators() is RegexClassifier._get_compiled_indicators()
+
+
+class TestTFIDFBatch:
+    @pytest.fixture(scope="class")
+    def clf(self):
+        clf = TFIDFClassifier()
+        if not clf.is_available():
+            pytest.skip("TF-IDF model not available")
+        return clf
+
+    def test_batch_matches_single(self, clf, corpus):
+        _assert_same(clf.classify_batch(corpus), [clf.classify(t) for t in corpus])
+
+    def test_single_transform_for_batch(self, clf, corpus, monkeypatch):
+        calls = []
+        original = clf._vectorizer.transform
+        monkeypatch.setattr(clf._vectorizer, "transform", lambda x: calls.append(len(x)) or original(x))
+
+        clf.classify_batch(corpus)
+
+        assert calls == [len([t for t in corpus if t])]
+
+
+class TestEnsembleBatch:
+    @pytest.fixture(scope="class")
+    def ensemble(self):
+        return EnsembleClassifier(openai_classifier=_NoOpenAI())
+
+    def test_batch_matches_single(self, ensemble, corpus):
+        batch = ensemble.classify_batch(corpus)
+        single = [ensemble.classify(t) for t in corpus]
+
+        _assert_same(batch, single)
+        for b, s in zip(batch, single):
+            assert b.metadata.get("reason") == s.metadata.get("reason")
+            assert b.metadata.get("classifiers_used") == s.metadata.get("classifiers_used")
+
+    def test_empty_batch(self, ensemble):
+        assert ensemble.classify_batch([]) == []
+
+    def test_empty_text_in_batch(self, ensemble):
+        [result] = ensemble.classify_batch([""])
+        assert result.document_type == "unknown"
+        assert result.metadata["reason"] == "empty_text"
+
+    def test_failed_batch_falls_back_per_document(self):
+        ensemble = EnsembleClassifier(
+            openai_classifier=_NoOpenAI(), tfidf_classifier=_FlakyClassifier()
+        )
+        texts = ["Form W-2 wages", "boom W-2"]
+
+        batch = ensemble.classify_batch(texts)
+        single = [ensemble.classify(t) for t in texts]
+
+        _assert_same(batch, single)
+        assert batch[1].metadata["classifiers_used"] == ["regex"]
+
+    def test_partial_batch_retries_only_missing_items(self):
+        flaky = _PartialBatchClassifier()
+        ensemble = EnsembleClassifier(openai_classifier=_NoOpenAI(), tfidf_classifier=flaky)
+        texts = ["Form W-2 wages", "boom W-2", "Form W-2 box 1", "W-2 employer copy"]
+
+        stage = ensemble._run_stage(flaky, texts)
+
+        assert flaky.single_calls == ["boom W-2", "W-2 employer copy"]
+        assert stage[1] is None
+        assert all(r is not None for i, r in enumerate(stage) if i != 1)
@@ -0,0 +1,139 @@
+"""
+Minimal in-process SMTP server for delivery tests and benchmarks.
+
+Speaks enough ESMTP for smtplib: EHLO/HELO, AUTH PLAIN, MAIL, RCPT, DATA,
+RSET, NOOP, QUIT, and optionally advertises PIPELINING. Each batch of
+replies can be delayed to model network round-trip time.
+"""
+
+import base64
+import socket
+import socketserver
+import threading
+import time
+
+
+class StubSMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, latency=0.0, pipelining=True, reject=(), defer=(), drop_after=None, drop_before_ack=False):
+        super().__init__(("127.0.0.1", 0), _StubHandler)
+        self.latency = latency
+        self.pipelining = pipelining
+        self.reject = set(reject)
+        self.defer = set(defer)  # recipients answered with a 4xx "try later"
+        self.drop_after = drop_after  # close a connection after N messages
+        self.drop_before_ack = drop_before_ack  # close after a message body, before its 250
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.logins = 0
+        self.messages = []
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class _StubHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+        sock = self.request
+        buffer = b""
+        in_data = False
+        data_lines = []
+        envelope = {"from": None, "to": []}
+        sent_on_connection = 0
+        sock.sendall(b"220 stub ESMTP\r\n")
+
+        while True:
+            try:
+                chunk = sock.recv(65536)
+            except OSError:
+                return
+            if not chunk:
+                return
+            buffer += chunk
+            replies = []
+            while b"\r\n" in buffer:
+                line, buffer = buffer.split(b"\r\n", 1)
+                if in_data:
+                    if line == b".":
+                        in_data = False
+                        with server.lock:
+                            server.messages.append((envelope["from"], list(envelope["to"]), b"\r\n".join(data_lines)))
+                        data_lines = []
+                        envelope = {"from": None, "to": []}
+                        sent_on_connection += 1
+                        if server.drop_before_ack:
+                            sock.shutdown(socket.SHUT_RDWR)
+                            return
+                        replies.append(b"250 queued")
+                    else:
+                        data_lines.append(line[1:] if line.startswith(b"..") else line)
+                    continue
+
+                command = line.decode(errors="replace")
+                verb = command.split(" ", 1)[0].upper()
+                if verb == "EHLO":
+                    features = ["stub", "AUTH PLAIN", "8BITMIME"]
+                    if server.pipelining:
+                        features.insert(1, "PIPELINING")
+                    for i, feature in enumerate(features):
+                        sep = " " if i == len(features) - 1 else "-"
+                        replies.append(f"250{sep}{feature}".encode())
+                elif verb == "HELO":
+                    replies.append(b"250 stub")
+                elif verb == "AUTH":
+                    parts = command.split()
+                    if len(parts) == 3:
+                        base64.b64decode(parts[2])
+                        with server.lock:
+                            server.logins += 1
+                        replies.append(b"235 authenticated")
+                    else:
+                        replies.append(b"504 unsupported")
+                elif verb == "MAIL":
+                    envelope["from"] = command.split(":", 1)[1].strip("<> ")
+                    replies.append(b"250 ok")
+                elif verb == "RCPT":
+                    address = command.split(":", 1)[1].strip("<> ")
+                    if address in server.reject:
+                        replies.append(b"550 no such user")
+                    elif address in server.defer:
+                        replies.append(b"450 mailbox busy, try later")
+                    else:
+                        envelope["to"].append(address)
+                        replies.append(b"250 ok")
+                elif verb == "DATA":
+                    if envelope["to"]:
+                        in_data = True
+                        replies.append(b"354 go ahead")
+                    else:
+                        replies.append(b"554 no valid recipients")
+                elif verb in ("RSET", "NOOP"):
+                    envelope = {"from": None, "to": []}
+                    replies.append(b"250 ok")
+                elif verb == "QUIT":
+                    sock.sendall(b"221 bye\r\n")
+                    return
+                else:
+                    replies.append(b"502 not implemented")
+
+            if replies:
+                if server.latency:
+                    time.sleep(server.latency)
+                sock.sendall(b"".join(r + b"\r\n" for r in replies))
+            if server.drop_after and sent_on_connection >= server.drop_after and not in_data:
+                sock.shutdown(socket.SHUT_RDWR)
+                return
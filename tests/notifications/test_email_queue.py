@@ -0,0 +1,347 @@
+"""
+Tests for persistent SMTP sessions and the async email delivery queue.
+
+Runs against the in-process stub server in smtp_stub.py.
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from notifications.email_provider import DeliveryResult, DeliveryStatus, EmailMessage
+from notifications.email_queue import EmailDeliveryQueue, set_email_queue
+from notifications.smtp_provider import SMTPProvider
+from smtp_stub import StubSMTPServer
+
+
+@pytest.fixture
+def smtp_server():
+    server = StubSMTPServer().start()
+    yield server
+    server.stop()
+
+
+def _provider(server, **kwargs):
+    return SMTPProvider(
+        host="127.0.0.1", port=server.port, username="user", password="secret",
+        use_tls=False, from_email="noreply@example.com", **kwargs,
+    )
+
+
+def _message(i, to=None):
+    return EmailMessage(to=to or f"client{i}@example.com", subject=f"Reminder {i}", body_text=f"Body {i}")
+
+
+class TestSMTPSession:
+    def test_send_batch_uses_one_connection(self, smtp_server):
+        provider = _provider(smtp_server)
+        results = provider.send_batch([_message(i) for i in range(10)])
+
+        assert all(r.success for r in results)
+        assert smtp_server.connections == 1
+        assert smtp_server.logins == 1
+        assert len(smtp_server.messages) == 10
+
+    def test_single_send_still_works(self, smtp_server):
+        result = _provider(smtp_server).send(_message(1))
+        assert result.success
+        assert result.status == DeliveryStatus.SENT
+        assert smtp_server.messages[0][1] == ["client1@example.com"]
+
+    def test_reconnects_after_server_drop(self):
+        server = StubSMTPServer(drop_after=2).start()
+        try:
+            session = _provider(server).open_session()
+            results = [session.send(_message(i)) for i in range(5)]
+            session.close()
+        finally:
+            server.stop()
+
+        assert all(r.success for r in results)
+        assert len(server.messages) == 5
+        assert session.reconnects >= 1
+        assert server.connections == 3
+
+    def test_recycles_connection_after_message_cap(self, smtp_server):
+        provider = _provider(smtp_server, max_messages_per_connection=3)
+        results = provider.send_batch([_message(i) for i in range(7)])
+
+        assert all(r.success for r in results)
+        assert smtp_server.connections == 3
+
+    @pytest.mark.parametrize("pipelining", [True, False])
+    def test_refused_recipient_bounces_without_breaking_session(self, pipelining):
+        server = StubSMTPServer(pipelining=pipelining, reject={"bad@example.com"}).start()
+        try:
+            results = _provider(server).send_batch([
+                _message(1), _message(2, to="bad@example.com"), _message(3),
+            ])
+        finally:
+            server.stop()
+
+        assert [r.success for r in results] == [True, False, True]
+        assert results[1].status == DeliveryStatus.BOUNCED
+        assert results[1].error_code == "RECIPIENTS_REFUSED"
+        assert server.connections == 1
+        assert [m[1] for m in server.messages] == [["client1@example.com"], ["client3@example.com"]]
+
+    def test_pipelined_body_is_dot_stuffed(self, smtp_server):
+        session = _provider(smtp_server).open_session()
+        session._sendmail("noreply@example.com", ["a@example.com"], "Subject: x\n\nline\n.leading dot\nend")
+        session.close()
+        assert smtp_server.messages[0][2] == b"Subject: x\r\n\r\nline\r\n.leading dot\r\nend"
+
+    def test_unreachable_server_returns_connection_error(self):
+        provider = SMTPProvider(host="127.0.0.1", port=1, use_tls=False, timeout=1)
+        result = provider.send(_message(1))
+        assert not result.success
+        assert result.error_code == "CONNECTION_ERROR"
+
+    def test_deferred_recipient_is_transient(self):
+        server = StubSMTPServer(defer={"client1@example.com"}, reject={"client2@example.com"}).start()
+        try:
+            session = _provider(server).open_session()
+            deferred = session.send(_message(1))
+            refused = session.send(_message(2))
+            session.close()
+        finally:
+            server.stop()
+
+        assert deferred.error_code == "SMTP_TRANSIENT"
+        assert deferred.status == DeliveryStatus.FAILED
+        assert refused.error_code == "RECIPIENTS_REFUSED"
+        assert refused.status == DeliveryStatus.BOUNCED
+
+
+    @pytest.mark.parametrize("pipelining", [True, False])
+    def test_drop_after_data_is_not_resent(self, pipelining):
+        server = StubSMTPServer(pipelining=pipelining, drop_before_ack=True).start()
+        try:
+            session = _provider(server).open_session()
+            result = session.send(_message(1))
+            session.close()
+        finally:
+            server.stop()
+
+        assert not result.success
+        assert result.error_code == "DELIVERY_UNCERTAIN"
+        assert session.reconnects == 0
+        assert len(server.messages) == 1
+
+
+class FlakyProvider:
+    """Provider that fails the first ``failures`` sends with ``error_code``."""
+
+    provider_name = "flaky"
+
+    def __init__(self, failures=0, delay=0.0, error_code="SMTP_TRANSIENT"):
+        self.failures = failures
+        self.delay = delay
+        self.error_code = error_code
+        self.sent = []
+        self.attempts = 0
+
+    def send(self, message):
+        self.attempts += 1
+        if self.delay:
+            time.sleep(self.delay)
+        if self.failures:
+            self.failures -= 1
+            return DeliveryResult(success=False, status=DeliveryStatus.FAILED, error_code=self.error_code)
+        self.sent.append(message.to)
+        return DeliveryResult(success=True, status=DeliveryStatus.SENT, provider=self.provider_name)
+
+
+class TestEmailDeliveryQueue:
+    async def test_campaign_reuses_one_session_per_worker(self, smtp_server):
+        queue = EmailDeliveryQueue(provider=_provider(smtp_server), workers=3)
+        results = await queue.send_batch([_message(i) for i in range(30)])
+        stats = queue.get_stats()
+        await queue.stop()
+
+        assert all(r.success for r in results)
+        assert len(smtp_server.messages) == 30
+        assert smtp_server.connections <= 3
+        assert smtp_server.logins == smtp_server.connections
+        assert stats["sent"] == 30
+        assert stats["connections_opened"] == smtp_server.connections
+
+    async def test_results_keep_input_order(self):
+        provider = FlakyProvider()
+        queue = EmailDeliveryQueue(provider=provider, workers=4)
+        messages = [_message(i) for i in range(20)]
+        results = await queue.send_batch(messages)
+        await queue.stop()
+
+        assert len(results) == 20
+        assert sorted(provider.sent) == sorted(m.to for m in messages)
+
+    async def test_transient_failures_are_retried(self):
+        provider = FlakyProvider(failures=2)
+        queue = EmailDeliveryQueue(provider=provider, workers=1, max_retries=2, retry_backoff=0)
+        result = await queue.send(_message(1))
+        stats = queue.get_stats()
+        await queue.stop()
+
+        assert result.success
+        assert stats["retries"] == 2
+
+    async def test_gives_up_after_max_retries(self):
+        queue = EmailDeliveryQueue(provider=FlakyProvider(failures=5), workers=1, max_retries=1, retry_backoff=0)
+        result = await queue.send(_message(1))
+        await queue.stop()
+
+        assert not result.success
+        assert result.error_code == "SMTP_TRANSIENT"
+
+    async def test_permanent_failures_are_not_retried(self):
+        provider = FlakyProvider(failures=1, error_code="SMTP_ERROR")
+        queue = EmailDeliveryQueue(provider=provider, workers=1, max_retries=2, retry_backoff=0)
+        result = await queue.send(_message(1))
+        await queue.stop()
+
+        assert result.error_code == "SMTP_ERROR"
+        assert provider.attempts == 1
+
+    async def test_invalid_message_fails_without_killing_worker(self, smtp_server):
+        queue = EmailDeliveryQueue(provider=_provider(smtp_server), workers=1)
+        bad = EmailMessage(to="a@example.com", subject="", body_text="x")
+        results = await queue.send_batch([bad, _message(2)])
+        await queue.stop()
+
+        assert results[0].error_code == "SEND_ERROR"
+        assert results[1].success
+
+    async def test_stop_drains_queue(self):
+        provider = FlakyProvider(delay=0.01)
+        queue = EmailDeliveryQueue(provider=provider, workers=2)
+        futures = await queue.enqueue_batch([_message(i) for i in range(10)])
+        await queue.stop()
+
+        assert all(f.done() and f.result().success for f in futures)
+        assert len(provider.sent) == 10
+        assert queue.get_stats()["workers"] == 0
+
+    async def test_event_loop_stays_responsive(self):
+        queue = EmailDeliveryQueue(provider=FlakyProvider(delay=0.05), workers=2)
+        futures = await queue.enqueue_batch([_message(i) for i in range(8)])
+
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        assert time.perf_counter() - start < 0.04
+
+        await asyncio.gather(*futures)
+        await queue.stop()
+
+    def test_restarts_on_new_event_loop(self):
+        provider = FlakyProvider()
+        queue = EmailDeliveryQueue(provider=provider, workers=2)
+
+        assert asyncio.run(queue.send(_message(1))).success
+        assert asyncio.run(queue.send(_message(2))).success
+        assert len(provider.sent) == 2
+
+
+class TestDeadlineReminderCampaign:
+    async def test_campaign_goes_through_queue(self, smtp_server):
+        from notifications.email_triggers import EmailTriggerService
+
+        queue = EmailDeliveryQueue(provider=_provider(smtp_server), workers=2)
+        set_email_queue(queue)
+        try:
+            due = datetime.now(timezone.utc) + timedelta(days=7)
+            results = await EmailTriggerService().send_deadline_reminders([
+                {
+                    "recipient_email": f"client{i}@example.com",
+                    "recipient_name": f"Client {i}",
+                    "deadline_type": "Form 1040",
+                    "due_date": due,
+                    "days_remaining": 7,
+                }
+                for i in range(6)
+            ])
+            await queue.stop()
+        finally:
+            set_email_queue(None)
+
+        assert len(results) == 6
+        assert all(r.success for r in results)
+        assert smtp_server.logins <= 2
+        assert {m[1][0] for m in smtp_server.messages} == {f"client{i}@example.com" for i in range(6)}
+
+    async def test_campaign_reports_each_reminder_when_one_raises(self, smtp_server):
+        from notifications.email_triggers import EmailTriggerService
+
+        queue = EmailDeliveryQueue(provider=_provider(smtp_server), workers=2)
+        set_email_queue(queue)
+        try:
+            due = datetime.now(timezone.utc) + timedelta(days=7)
+            reminders = [
+                {
+                    "recipient_email": f"client{i}@example.com",
+                    "recipient_name": f"Client {i}",
+                    "deadline_type": "Form 1040",
+                    "due_date": due,
+                    "days_remaining": 7,
+                }
+                for i in range(3)
+            ]
+            reminders[1]["due_date"] = None  # fails while building the email
+            results = await EmailTriggerService().send_deadline_reminders(reminders)
+            await queue.stop()
+        finally:
+            set_email_queue(None)
+
+        assert [r.success for r in results] == [True, False, True]
+        assert results[1].status == DeliveryStatus.FAILED
+        assert len(smtp_server.messages) == 2
+
+    def test_reminder_task_emails_persisted_reminders(self, smtp_server, tmp_path, monkeypatch):
+        """The Celery task loads deadlines written by a web worker and emails each recipient."""
+        from datetime import date
+        from uuid import uuid4
+
+        import cpa_panel.deadlines.deadline_service as deadline_module
+        from cpa_panel.deadlines.deadline_models import DeadlineType, ReminderType
+        from cpa_panel.deadlines.deadline_service import DeadlineService
+        from database.deadline_persistence import DeadlinePersistence
+        from tasks.notification_tasks import process_deadline_reminders
+
+        db_path = tmp_path / "deadlines.db"
+        contacts = {
+            "cpa": ("cpa@firm.example.com", "Smith CPA"),
+            "client": ("client@example.com", "Jane Client"),
+        }
+
+        def lookup(firm_id, client_id):
+            return contacts
+
+        web = DeadlineService(persistence=DeadlinePersistence(db_path), contact_lookup=lookup)
+        deadline = web.create_deadline(
+            firm_id=uuid4(),
+            client_id=uuid4(),
+            deadline_type=DeadlineType.FILING,
+            due_date=date.today() + timedelta(days=5),
+            auto_reminders=False,
+        )
+        web.add_reminder(deadline.id, 7, ReminderType.EMAIL, "both")
+        web.add_reminder(deadline.id, 7, ReminderType.SMS, "cpa")
+
+        def run_worker():
+            # Each run starts from an empty worker-side service, like a fresh Celery process
+            worker = DeadlineService(persistence=DeadlinePersistence(db_path), contact_lookup=lookup)
+            monkeypatch.setattr(deadline_module, "deadline_service", worker)
+            set_email_queue(EmailDeliveryQueue(provider=_provider(smtp_server), workers=2))
+            try:
+                return process_deadline_reminders()
+            finally:
+                set_email_queue(None)
+
+        assert run_worker() == {"sent": 1, "errors": 0}
+        assert sorted(m[1][0] for m in smtp_server.messages) == ["client@example.com", "cpa@firm.example.com"]
+
+        # Marked sent in persistence: the next run sends nothing
+        assert run_worker() == {"sent": 0, "errors": 0}
+        assert len(smtp_server.messages) == 2
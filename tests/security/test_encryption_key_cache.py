@@ -0,0 +1,180 @@
+"""Tests for cached field ciphers, bulk PII encryption and key rotation."""
+
+import secrets
+
+import pytest
+
+import database.encrypted_fields as ef
+from database.lead_state_persistence import LeadStatePersistence
+from security.encryption import DataEncryptor, get_encryptor, reset_encryptor
+
+
+@pytest.fixture
+def master_key(monkeypatch):
+    key = secrets.token_hex(32)
+    monkeypatch.setenv("ENCRYPTION_MASTER_KEY", key)
+    ef.clear_encryption_key_cache()
+    yield key
+    ef.clear_encryption_key_cache()
+
+
+def _rotate(monkeypatch):
+    monkeypatch.setenv("ENCRYPTION_MASTER_KEY", secrets.token_hex(32))
+    ef.clear_encryption_key_cache()
+
+
+class TestFieldCipherCache:
+    def test_cipher_derived_once_per_field_type(self, master_key):
+        assert ef._get_cipher("ssn") is ef._get_cipher("ssn")
+        assert ef._get_cipher("ssn") is not ef._get_cipher("email")
+        # Unknown field types share the generic context
+        assert ef._get_cipher("unknown") is ef._get_cipher("generic")
+
+    def test_roundtrip_uses_cached_cipher(self, master_key, monkeypatch):
+        ef.encrypt_pii("warm", field_type="email")
+        calls = []
+        original = ef._derive_field_key
+        monkeypatch.setattr(ef, "_derive_field_key", lambda *a: calls.append(a) or original(*a))
+
+        for i in range(20):
+            token = ef.encrypt_pii(f"user{i}@example.com", field_type="email")
+            assert ef.decrypt_pii(token, field_type="email") == f"user{i}@example.com"
+        assert calls == []
+
+    def test_rotation_invalidates_cached_ciphers(self, master_key, monkeypatch):
+        old_cipher = ef._get_cipher("ssn")
+        token = ef.encrypt_ssn("123-45-6789", tenant_id="t1")
+
+        _rotate(monkeypatch)
+
+        assert ef._get_cipher("ssn") is not old_cipher
+        with pytest.raises(ValueError):
+            ef.decrypt_ssn(token, tenant_id="t1")
+        assert ef.decrypt_ssn(ef.encrypt_ssn("123-45-6789", "t1"), "t1") == "123-45-6789"
+
+    def test_clearing_only_key_cache_still_rebuilds_ciphers(self, master_key, monkeypatch):
+        old_cipher = ef._get_cipher("email")
+        monkeypatch.setenv("ENCRYPTION_MASTER_KEY", secrets.token_hex(32))
+        ef.get_encryption_key.cache_clear()
+        assert ef._get_cipher("email") is not old_cipher
+
+
+class TestBulkFieldEncryption:
+    def test_encrypt_many_matches_single_value_format(self, master_key):
+        values = ["a@example.com", "", None, "b@example.com"]
+        tokens = ef.encrypt_many(values, field_type="email", associated_data=b"t1")
+
+        assert tokens[1] == "" and tokens[2] == ""
+        assert ef.decrypt_pii(tokens[0], field_type="email", associated_data=b"t1") == "a@example.com"
+        assert ef.decrypt_many(tokens, field_type="email", associated_data=b"t1") == [
+            "a@example.com", "", "", "b@example.com",
+        ]
+
+    def test_decrypt_many_strict_raises(self, master_key):
+        good = ef.encrypt_pii("x", field_type="name")
+        with pytest.raises(ValueError):
+            ef.decrypt_many([good, "v1:bad:data:here"], field_type="name")
+
+    def test_decrypt_many_lenient_marks_failures(self, master_key):
+        good = ef.encrypt_pii("x", field_type="name")
+        wrong_field = ef.encrypt_pii("y", field_type="ssn")
+        assert ef.decrypt_many([good, wrong_field], field_type="name", strict=False) == ["x", None]
+
+    async def test_async_helpers_offload_large_batches(self, master_key, monkeypatch):
+        monkeypatch.setattr(ef, "PII_OFFLOAD_THRESHOLD", 10)
+        values = [f"{i:09d}" for i in range(50)]
+        tokens = await ef.encrypt_many_async(values, field_type="ssn")
+        assert await ef.decrypt_many_async(tokens, field_type="ssn") == values
+        assert await ef.decrypt_many_async(tokens[:3], field_type="ssn") == values[:3]
+
+
+class TestLeadListing:
+    def test_list_leads_decrypts_columns_in_bulk(self, master_key, tmp_path, monkeypatch):
+        store = LeadStatePersistence(db_path=tmp_path / "leads.db")
+        for i in range(5):
+            store.save_lead(
+                lead_id=f"lead-{i}", session_id=f"s{i}", tenant_id="acme", current_state="BROWSING",
+                metadata={"email": f"lead{i}@example.com", "phone": "555-010-0000", "name": f"Lead {i}"},
+            )
+
+        calls = []
+        original = ef.decrypt_many
+        monkeypatch.setattr(
+            "database.lead_state_persistence.decrypt_many",
+            lambda values, **kw: calls.append(len(values)) or original(values, **kw),
+        )
+        leads = store.list_leads(tenant_id="acme")
+
+        assert sorted(lead.metadata["email"] for lead in leads) == [f"lead{i}@example.com" for i in range(5)]
+        assert calls == [5, 5]  # one call for emails, one for phones
+
+    def test_corrupt_row_falls_back_to_masked_values(self, master_key, tmp_path, monkeypatch):
+        store = LeadStatePersistence(db_path=tmp_path / "leads.db")
+        store.save_lead(lead_id="good", session_id="s1", tenant_id="acme", current_state="BROWSING",
+                        metadata={"email": "good@example.com"})
+        _rotate(monkeypatch)
+        store.save_lead(lead_id="new", session_id="s2", tenant_id="acme", current_state="BROWSING",
+                        metadata={"email": "new@example.com"})
+
+        by_id = {lead.lead_id: lead.metadata for lead in store.list_leads(tenant_id="acme")}
+        assert by_id["new"]["email"] == "new@example.com"
+        assert by_id["good"]["email"] == by_id["good"]["email_masked"]
+
+
+class TestDataEncryptorKeyCache:
+    def test_decrypt_reuses_derived_key(self, monkeypatch):
+        enc = DataEncryptor(master_key="k" * 64)
+        token = enc.encrypt("123456789")
+        derivations = []
+        original = enc._derive_key
+        monkeypatch.setattr(enc, "_derive_key", lambda salt: derivations.append(salt) or original(salt))
+
+        for _ in range(5):
+            assert enc.decrypt(token) == "123456789"
+        assert len(derivations) == 1
+
+    def test_encrypt_does_not_cache_fresh_salts(self):
+        enc = DataEncryptor(master_key="k" * 64)
+        assert enc.decrypt(enc.encrypt("keep")) == "keep"
+        cached = list(enc._cipher_cache)
+
+        for i in range(10):
+            enc.encrypt(str(i))
+        enc.encrypt_many(["a", "b"])
+
+        assert list(enc._cipher_cache) == cached
+
+    def test_encrypt_many_derives_once(self, monkeypatch):
+        enc = DataEncryptor(master_key="k" * 64)
+        derivations = []
+        original = enc._derive_key
+        monkeypatch.setattr(enc, "_derive_key", lambda salt: derivations.append(salt) or original(salt))
+
+        values = [f"value-{i}" for i in range(25)]
+        tokens = enc.encrypt_many(values, associated_data=b"ssn")
+
+        assert len(set(tokens)) == 25
+        assert len(derivations) == 1
+        assert enc.decrypt_many(tokens, associated_data=b"ssn") == values
+        assert len(derivations) == 2
+
+    def test_cache_is_bounded(self):
+        enc = DataEncryptor(master_key="k" * 64)
+        enc.KEY_CACHE_SIZE = 3
+        tokens = [enc.encrypt(str(i)) for i in range(6)]
+        for token in tokens:
+            enc.decrypt(token)
+        assert len(enc._cipher_cache) == 3
+
+    def test_rotated_encryptor_cannot_reuse_old_keys(self, monkeypatch):
+        monkeypatch.setenv("ENCRYPTION_MASTER_KEY", "a" * 64)
+        reset_encryptor()
+        token = get_encryptor().encrypt("secret")
+
+        monkeypatch.setenv("ENCRYPTION_MASTER_KEY", "b" * 64)
+        reset_encryptor()
+        try:
+            with pytest.raises(Exception):
+                get_encryptor().decrypt(token)
+        finally:
+            reset_encryptor()
@@ -0,0 +1,131 @@
+"""Tests for batched persistence in AnalyticsEventService."""
+
+import asyncio
+import time
+
+import pytest
+from sqlalchemy import Column, Table, func, select
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from src.database.models import AnalyticsEventRecord
+from src.events.journey_events import AdvisorMessageSent, LeadStateChanged
+from src.services.analytics_event_service import AnalyticsEventService
+
+
+def _create_schema(sync_conn):
+    # analytics_events references firms; a stub is enough for SQLite
+    metadata = AnalyticsEventRecord.metadata
+    firms = metadata.tables.get("firms")
+    if firms is None:
+        firms = Table("firms", metadata, Column("firm_id", UUID(as_uuid=True), primary_key=True))
+    metadata.create_all(sync_conn, tables=[firms, AnalyticsEventRecord.__table__])
+
+
+@pytest.fixture
+async def session_factory(tmp_path):
+    # NullPool: the worker thread runs its own event loop
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'analytics.db'}", poolclass=NullPool
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(_create_schema)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+async def _count(session_factory):
+    async with session_factory() as session:
+        return (await session.execute(select(func.count()).select_from(AnalyticsEventRecord))).scalar()
+
+
+def _message(i=0):
+    return AdvisorMessageSent(session_id=f"s{i}", tenant_id="t1", user_id="u1", message_text="hi")
+
+
+class TestBatchWriting:
+    async def test_batch_is_one_bulk_insert(self, session_factory):
+        service = AnalyticsEventService(session_factory)
+        for i in range(25):
+            service._handle_advisor_message_sent(_message(i))
+
+        batch = service._next_batch()
+        assert len(batch) == 25
+        assert await service._persist_batch(batch) == 25
+
+        assert await _count(session_factory) == 25
+        metrics = service.get_metrics()
+        assert metrics["batches"] == 1
+        assert metrics["persisted"] == 25
+        assert metrics["queue_depth"] == 0
+
+    async def test_mixed_event_types_persist(self, session_factory):
+        service = AnalyticsEventService(session_factory)
+        service._handle_advisor_message_sent(_message())
+        service._handle_lead_state_changed(LeadStateChanged(
+            lead_id="l1", tenant_id="t1", user_id="u1",
+            from_state="new", to_state="qualified", trigger="manual",
+        ))
+
+        await service._persist_batch(service._next_batch())
+
+        async with session_factory() as session:
+            rows = (await session.execute(select(AnalyticsEventRecord))).scalars().all()
+        lead = next(r for r in rows if r.event_type == "LeadStateChanged")
+        assert lead.lead_new_state == "qualified"
+        assert lead.event_payload["to_state"] == "qualified"
+        assert lead.occurred_at is not None
+
+    async def test_bad_row_does_not_lose_batch(self, session_factory):
+        service = AnalyticsEventService(session_factory)
+        for i in range(3):
+            service._handle_advisor_message_sent(_message(i))
+        batch = service._next_batch()
+        batch[1]["tenant_id"] = None  # violates NOT NULL
+
+        assert await service._persist_batch(batch) == 2
+        assert service.get_metrics()["failed"] == 1
+        assert await _count(session_factory) == 2
+
+    def test_batch_size_caps_drain(self, session_factory):
+        service = AnalyticsEventService(session_factory, batch_size=10)
+        for i in range(25):
+            service._handle_advisor_message_sent(_message(i))
+
+        assert [len(service._next_batch()) for _ in range(3)] == [10, 10, 5]
+
+    def test_flush_interval_bounds_wait(self, session_factory):
+        service = AnalyticsEventService(session_factory, flush_interval_ms=50)
+        service._handle_advisor_message_sent(_message())
+
+        start = time.monotonic()
+        batch = service._next_batch()
+        assert len(batch) == 1
+        assert time.monotonic() - start < 0.5
+
+
+class TestQueueBounds:
+    def test_full_queue_drops_and_counts(self, session_factory):
+        service = AnalyticsEventService(session_factory, queue_maxsize=5)
+        for i in range(8):
+            service._handle_advisor_message_sent(_message(i))
+
+        metrics = service.get_metrics()
+        assert metrics["enqueued"] == 5
+        assert metrics["dropped"] == 3
+        assert metrics["queue_depth"] == 5
+
+
+class TestShutdown:
+    async def test_shutdown_flushes_queue(self, session_factory):
+        service = AnalyticsEventService(session_factory, flush_interval_ms=10_000)
+        service._start_worker()
+        for i in range(50):
+            service._handle_advisor_message_sent(_message(i))
+
+        stopped = await asyncio.to_thread(service.shutdown, 10.0)
+
+        assert stopped
+        assert service.get_metrics()["persisted"] == 50
+        assert await _count(session_factory) == 50
@@ -1,5 +1,10 @@
 """Tests for AsyncCalculationPipeline."""
 
+import asyncio
+import copy
+import threading
+import time
+
 import pytest
 from unittest.mock import MagicMock, patch
 from dataclasses import dataclass
@@ -12,7 +17,10 @@ from services.async_calculation_pipeline import (
     AsyncFederalCalculationStep,
     AsyncStateCalculationStep,
     AsyncOutputValidationStep,
+    CalculationExecutor,
     PipelineContext,
+    PipelineOverloadedError,
+    PipelineRequest,
     create_async_pipeline,
 )
 from models.tax_return import TaxReturn
@@ -583,3 +591,246 @@ class TestCreateAsyncPipeline:
 
         step_names = [s.name for s in pipeline._steps]
         assert step_names == ["prepare", "federal_calculation"]
+
+
+def _valid_return():
+    mock_return = MagicMock()
+    mock_return.taxpayer.first_name = "John"
+    mock_return.taxpayer.last_name = "Doe"
+    mock_return.taxpayer.filing_status.value = "single"
+    mock_return.income.w2_forms = []
+    mock_return.income.self_employment_income = 0
+    mock_return.income.qualified_dividends = 0
+    mock_return.income.dividend_income = 0
+    return mock_return
+
+
+def _breakdown(total_tax=10000):
+    breakdown = MagicMock()
+    breakdown.total_tax = total_tax
+    breakdown.agi = 75000
+    breakdown.taxable_income = 60000
+    breakdown.effective_tax_rate = 0.1
+    breakdown.total_payments = total_tax
+    breakdown.refund_or_owed = 0
+    return breakdown
+
+
+@pytest.fixture
+def executor():
+    executor = CalculationExecutor(workers=2, max_pending=8, kind="thread")
+    yield executor
+    executor.shutdown()
+
+
+class TestCalculationExecutor:
+    """Tests for off-loop execution and admission control."""
+
+    @pytest.mark.asyncio
+    async def test_federal_engine_runs_off_the_event_loop(self, executor):
+        """Engine should be called from an executor thread."""
+        threads = []
+        engine = MagicMock()
+        engine.calculate.side_effect = lambda tr: threads.append(threading.get_ident()) or _breakdown()
+
+        step = AsyncFederalCalculationStep(engine=engine, executor=executor)
+        context = await step.execute(PipelineContext(tax_return=MagicMock(), tax_return_data={}))
+
+        assert context.breakdown.total_tax == 10000
+        assert threads and threads[0] != threading.get_ident()
+        assert executor.get_stats()["completed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_event_loop_stays_responsive(self, executor):
+        """A slow calculation should not block other coroutines."""
+        engine = MagicMock()
+        engine.calculate.side_effect = lambda tr: time.sleep(0.3) or _breakdown()
+        step = AsyncFederalCalculationStep(engine=engine, executor=executor)
+
+        calc = asyncio.ensure_future(step.execute(PipelineContext(tax_return=MagicMock(), tax_return_data={})))
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        assert time.perf_counter() - start < 0.2
+        assert not calc.done()
+        await calc
+
+    @pytest.mark.asyncio
+    async def test_rejects_work_beyond_max_pending(self):
+        """Admission control should reject instead of queueing without bound."""
+        executor = CalculationExecutor(workers=1, max_pending=2, kind="thread")
+        release = threading.Event()
+        try:
+            running = [asyncio.ensure_future(executor.run(release.wait, 5)) for _ in range(2)]
+            await asyncio.sleep(0.05)
+            stats = executor.get_stats()
+            assert stats["pending"] == 2
+            assert stats["queue_depth"] == 1
+
+            with pytest.raises(PipelineOverloadedError):
+                await executor.run(lambda: None)
+
+            release.set()
+            await asyncio.gather(*running)
+            stats = executor.get_stats()
+            assert stats["rejected"] == 1
+            assert stats["completed"] == 2
+            assert stats["max_queue_depth"] == 1
+            assert stats["pending"] == 0
+        finally:
+            release.set()
+            executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_process_pool_result_copied_into_original_return(self):
+        """Updates made on a worker's copy should land on the caller's return."""
+
+        class CopyingExecutor:
+            """Mimics a process pool: the function sees a copy of its args."""
+
+            async def run(self, fn, *args):
+                return fn(*copy.deepcopy(args))
+
+        class Engine:
+            def calculate(self, tax_return):
+                tax_return.adjusted_gross_income = 75000.0
+                return _breakdown()
+
+        class Return:
+            adjusted_gross_income = None
+
+        original = Return()
+        step = AsyncFederalCalculationStep(engine=Engine(), executor=CopyingExecutor())
+        context = await step.execute(PipelineContext(tax_return=original, tax_return_data={}))
+
+        assert context.tax_return is original
+        assert original.adjusted_gross_income == 75000.0
+
+    @pytest.mark.asyncio
+    async def test_overload_carries_retry_after(self):
+        """Rejections should tell the web layer how long clients should wait."""
+        executor = CalculationExecutor(workers=1, max_pending=1, kind="thread")
+        release = threading.Event()
+        try:
+            blocker = asyncio.ensure_future(executor.run(release.wait, 5))
+            await asyncio.sleep(0.01)
+            with pytest.raises(PipelineOverloadedError) as exc_info:
+                await executor.run(lambda: None)
+            assert exc_info.value.retry_after > 0
+            release.set()
+            await blocker
+        finally:
+            release.set()
+            executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_pipeline_surfaces_overload(self):
+        """Overload should propagate to the caller, not become a calculation error."""
+        executor = CalculationExecutor(workers=1, max_pending=1, kind="thread")
+        release = threading.Event()
+        try:
+            blocker = asyncio.ensure_future(executor.run(release.wait, 5))
+            await asyncio.sleep(0.01)
+            pipeline = AsyncCalculationPipeline(steps=[
+                AsyncFederalCalculationStep(engine=MagicMock(), executor=executor),
+            ])
+            with pytest.raises(PipelineOverloadedError):
+                await pipeline.execute(tax_return=_valid_return(), tax_return_data={})
+            release.set()
+            await blocker
+        finally:
+            release.set()
+            executor.shutdown()
+
+
+class TestOverlappingStages:
+    """Tests for concurrent stages and batch execution."""
+
+    def test_state_and_output_validation_share_a_stage(self):
+        """Default pipeline groups the steps that only need the federal result."""
+        pipeline = AsyncCalculationPipeline()
+        stages = [[step.name for step in stage] for stage in pipeline._stages()]
+        assert stages == [
+            ["input_validation"],
+            ["prepare"],
+            ["federal_calculation"],
+            ["state_calculation", "output_validation"],
+        ]
+
+    @pytest.mark.asyncio
+    async def test_parallel_safe_steps_overlap(self, executor):
+        """Output-side steps should run while the state engine is still working."""
+        overlapped = threading.Event()
+
+        class SignalStep(AsyncPipelineStep):
+            parallel_safe = True
+
+            @property
+            def name(self):
+                return "signal"
+
+            async def execute(self, context):
+                overlapped.set()
+                return context
+
+        federal = MagicMock()
+        federal.calculate.return_value = _breakdown()
+        state = MagicMock()
+        state.calculate.side_effect = lambda *a, **kw: {"tax_liability": 1 if overlapped.wait(2) else 0}
+
+        pipeline = AsyncCalculationPipeline(steps=[
+            AsyncFederalCalculationStep(engine=federal, executor=executor),
+            AsyncStateCalculationStep(engine=state, executor=executor),
+            SignalStep(),
+            AsyncOutputValidationStep(),
+        ])
+        context = await pipeline.execute(
+            tax_return=_valid_return(), tax_return_data={"state_of_residence": "CA"}
+        )
+
+        assert context.state_result == {"tax_liability": 1}
+        assert context.is_valid
+        assert set(context.step_timings) >= {"federal_calculation", "state_calculation", "output_validation"}
+
+    @pytest.mark.asyncio
+    async def test_execute_batch_preserves_order(self, executor):
+        """Batch results should line up with the requests."""
+        engine = MagicMock()
+        engine.calculate.side_effect = lambda tr: time.sleep(0.01) or _breakdown(tr.tax)
+
+        pipeline = AsyncCalculationPipeline(steps=[
+            AsyncValidationStep(),
+            AsyncFederalCalculationStep(engine=engine, executor=executor),
+            AsyncOutputValidationStep(),
+        ])
+        requests = []
+        for i in range(12):
+            tax_return = _valid_return()
+            tax_return.tax = 1000 * (i + 1)
+            requests.append(PipelineRequest(tax_return=tax_return, tax_return_data={}, return_id=f"r{i}"))
+
+        contexts = await pipeline.execute_batch(requests, concurrency=4)
+
+        assert [c.return_id for c in contexts] == [f"r{i}" for i in range(12)]
+        assert [c.breakdown.total_tax for c in contexts] == [1000 * (i + 1) for i in range(12)]
+        assert executor.get_stats()["max_queue_depth"] >= 1
+
+    @pytest.mark.asyncio
+    async def test_execute_batch_reports_rejections_per_return(self):
+        """A rejected return should get an error context, not fail the batch."""
+        executor = CalculationExecutor(workers=1, max_pending=1, kind="thread")
+        try:
+            engine = MagicMock()
+            engine.calculate.side_effect = lambda tr: time.sleep(0.05) or _breakdown()
+            pipeline = AsyncCalculationPipeline(steps=[
+                AsyncFederalCalculationStep(engine=engine, executor=executor),
+            ])
+            requests = [PipelineRequest(tax_return=_valid_return(), tax_return_data={}) for _ in range(3)]
+
+            contexts = await pipeline.execute_batch(requests, concurrency=3)
+
+            rejected = [c for c in contexts if not c.is_valid]
+            assert len(rejected) == 2
+            assert "Calculation rejected" in rejected[0].errors[0]
+            assert sum(c.breakdown is not None for c in contexts) == 1
+        finally:
+            executor.shutdown()
@@ -0,0 +1,130 @@
+"""
+Tests for AuditLogger keyset pagination, count estimation and export.
+"""
+
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from audit.audit_logger import AuditEventType, AuditLogger, decode_cursor
+
+
+BASE = datetime(2025, 1, 1)
+
+
+@pytest.fixture
+def audit(tmp_path):
+    return AuditLogger(str(tmp_path / "audit.db"))
+
+
+def _seed(audit, count, users=("u1", "u2"), step=timedelta(minutes=1)):
+    with sqlite3.connect(audit.db_path) as conn:
+        for i in range(count):
+            # Pairs of events share a timestamp so pages split ties
+            conn.execute(
+                "INSERT INTO audit_log (event_id, event_type, severity, timestamp, user_id, action, "
+                "resource_type, resource_id, details, success) VALUES (?, ?, 'info', ?, ?, 'x', 'tax_return', ?, ?, 1)",
+                (
+                    f"e{i:05d}",
+                    AuditEventType.TAX_RETURN_UPDATE.value if i % 3 else AuditEventType.AUTH_LOGIN.value,
+                    (BASE + step * (i // 2)).isoformat(),
+                    users[i % len(users)],
+                    f"r{i % 7}",
+                    '{"n": %d}' % i,
+                ),
+            )
+
+
+def _ids(events):
+    return [event["event_id"] for event in events]
+
+
+class TestQueryPage:
+    def test_cursor_pages_match_offset_pages(self, audit):
+        _seed(audit, 95)
+        expected = _ids(audit.query(limit=1000))
+
+        seen, cursor = [], None
+        while True:
+            page = audit.query_page(limit=10, cursor=cursor)
+            seen.extend(_ids(page["events"]))
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+        assert seen == expected
+        assert len(seen) == 95
+        assert _ids(audit.query(limit=10, offset=30)) == expected[30:40]
+
+    def test_filtered_pages(self, audit):
+        _seed(audit, 60)
+        first = audit.query_page(limit=7, user_id="u1", event_type=AuditEventType.TAX_RETURN_UPDATE)
+        second = audit.query(
+            user_id="u1", event_type=AuditEventType.TAX_RETURN_UPDATE, limit=7, cursor=first["next_cursor"],
+        )
+        events = first["events"] + second
+        assert all(e["user_id"] == "u1" and e["event_type"] == "tax_return.update" for e in events)
+        assert len(set(_ids(events))) == 14
+        assert events[0]["details"] == {"n": int(events[0]["event_id"][1:])}
+
+    def test_last_page_has_no_cursor(self, audit):
+        _seed(audit, 10)
+        page = audit.query_page(limit=10)
+        assert len(page["events"]) == 10 and page["next_cursor"] is None
+
+    def test_invalid_cursor(self, audit):
+        with pytest.raises(ValueError):
+            audit.query_page(cursor="not-a-cursor")
+
+    def test_decode_cursor_round_trips_page_cursor(self, audit):
+        _seed(audit, 10)
+        page = audit.query_page(limit=3)
+        last = page["events"][-1]
+        assert decode_cursor(page["next_cursor"]) == (last["timestamp"], last["event_id"])
+        assert decode_cursor(None) is None
+        with pytest.raises(ValueError):
+            decode_cursor("not-a-cursor")
+
+    def test_filtered_page_uses_composite_index(self, audit):
+        with sqlite3.connect(audit.db_path) as conn:
+            plan = conn.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM audit_log WHERE user_id = ? AND (timestamp, event_id) < (?, ?) "
+                "ORDER BY timestamp DESC, event_id DESC LIMIT 10",
+                ("u1", "t", "e"),
+            ).fetchall()
+        details = " ".join(row[-1] for row in plan)
+        assert "idx_audit_user_time" in details
+        assert "TEMP B-TREE" not in details
+
+
+class TestEstimateCount:
+    def test_small_ranges_are_exact(self, audit):
+        _seed(audit, 50)
+        assert audit.estimate_count(user_id="u2") == {"count": 25, "exact": True}
+
+    def test_large_ranges_are_estimated(self, audit):
+        _seed(audit, 3000)
+        estimate = audit.estimate_count(exact_limit=500)
+        assert not estimate["exact"]
+        assert estimate["count"] == pytest.approx(3000, rel=0.05)
+
+        ranged = audit.estimate_count(exact_limit=500, start_date=BASE + timedelta(minutes=500))
+        assert ranged["count"] == pytest.approx(2000, rel=0.05)
+
+
+class TestExport:
+    def test_export_streams_everything_oldest_first(self, audit):
+        _seed(audit, 45)
+        exported = list(audit.export(batch_size=10))
+        assert _ids(exported) == list(reversed(_ids(audit.query(limit=1000))))
+
+    def test_export_applies_filters(self, audit):
+        _seed(audit, 45)
+        exported = list(audit.export(batch_size=4, resource_id="r3"))
+        assert exported and all(e["resource_id"] == "r3" for e in exported)
+        assert len(exported) == len(audit.query(resource_id="r3", limit=1000))
@@ -0,0 +1,143 @@
+"""
+Tests for parallel batch export jobs.
+
+Covers the archive contents and manifest, per-return failures, rolling
+parts, resuming after a failure or a corrupted part, the process-pool
+executor and the ProfessionalExporter entry point.
+"""
+
+import json
+import os
+import sys
+import zipfile
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from export.batch_export import BatchExportJob, run_batch_export
+from export.professional_formats import ExportFormat, ProfessionalExporter
+from models.tax_return import TaxReturn
+from models.taxpayer import TaxpayerInfo, FilingStatus
+from models.income import Income
+from models.deductions import Deductions
+from models.credits import TaxCredits
+
+
+def _load_return_data(return_id):
+    if return_id.startswith("missing"):
+        return None
+    return {
+        "taxpayer": {"first_name": "Pat", "last_name": return_id},
+        "filing_status": "single",
+        "w2_wages": 50000,
+        "tax_year": 2025,
+    }
+
+
+def _load_tax_return(return_id):
+    tax_return = TaxReturn(
+        tax_year=2025,
+        taxpayer=TaxpayerInfo(first_name="Pat", last_name="Smith", ssn="123-45-6789",
+                              filing_status=FilingStatus.SINGLE),
+        income=Income(w2_wages=85000.0, federal_withholding=16000.0),
+        deductions=Deductions(use_standard_deduction=True),
+        credits=TaxCredits(),
+    )
+    tax_return.calculate()
+    return tax_return
+
+
+def _members(output_dir, job):
+    names = {}
+    for part in job.parts:
+        with zipfile.ZipFile(os.path.join(output_dir, part)) as archive:
+            for name in archive.namelist():
+                if name != "manifest.json":
+                    names[name] = archive.read(name).decode()
+    return names
+
+
+class TestRunBatchExport:
+
+    def test_exports_every_return_with_manifest(self, tmp_path):
+        ids = [f"r{i}" for i in range(25)] + ["missing-1"]
+        job = run_batch_export(ids, "drake_csv", str(tmp_path), _load_return_data, job_id="job1", workers=4)
+
+        assert job.counts() == {"total": 26, "exported": 25, "failed": 1, "pending": 0}
+        assert job.status == "completed_with_errors"
+        assert job.entries["missing-1"].errors == ["LookupError: Tax return not found"]
+        members = _members(str(tmp_path), job)
+        assert len(members) == 25
+        assert "LastName,r7,1040," in members["r7_drake.csv"]
+
+        with zipfile.ZipFile(tmp_path / job.parts[0]) as archive:
+            manifest = json.loads(archive.read("manifest.json"))
+        assert {e["return_id"] for e in manifest["returns"]} == set(ids)
+        assert job.stats["returns_processed"] == 26 and job.stats["returns_per_second"] > 0
+
+        saved = BatchExportJob.load(str(tmp_path), "job1")
+        assert saved.counts() == job.counts()
+
+    def test_rolls_parts(self, tmp_path):
+        job = run_batch_export([f"r{i}" for i in range(10)], "lacerte_csv", str(tmp_path),
+                               _load_return_data, job_id="job2", part_size=4)
+        assert job.parts == ["job2-001.zip", "job2-002.zip", "job2-003.zip"]
+        assert len(_members(str(tmp_path), job)) == 10
+
+    def test_resume_retries_failures_and_corrupt_parts(self, tmp_path):
+        output_dir = str(tmp_path)
+        ids = [f"r{i}" for i in range(9)]
+
+        def flaky(return_id):
+            if return_id == "r8":
+                raise ConnectionError("db unavailable")
+            return _load_return_data(return_id)
+
+        job = run_batch_export(ids, "drake_csv", output_dir, flaky, job_id="job3", part_size=4, workers=1)
+        assert job.counts()["failed"] == 1
+        # Simulate a crash that left the second part unreadable
+        with open(os.path.join(output_dir, "job3-002.zip"), "r+b") as f:
+            f.truncate(20)
+
+        calls = []
+
+        def loader(return_id):
+            calls.append(return_id)
+            return _load_return_data(return_id)
+
+        job = run_batch_export(ids, "drake_csv", output_dir, loader, job_id="job3", part_size=4)
+
+        assert sorted(calls) == ["r4", "r5", "r6", "r7", "r8"]
+        assert job.status == "completed"
+        assert job.counts() == {"total": 9, "exported": 9, "failed": 0, "pending": 0}
+        assert "job3-002.zip" not in job.parts
+        assert len(_members(output_dir, job)) == 9
+
+    def test_resume_rejects_other_format(self, tmp_path):
+        run_batch_export(["r1"], "drake_csv", str(tmp_path), _load_return_data, job_id="job4")
+        with pytest.raises(ValueError):
+            run_batch_export(["r1"], "lacerte_csv", str(tmp_path), _load_return_data, job_id="job4")
+
+    def test_unknown_format(self, tmp_path):
+        with pytest.raises(ValueError):
+            run_batch_export(["r1"], "quickbooks", str(tmp_path), _load_return_data)
+
+    def test_process_executor(self, tmp_path):
+        job = run_batch_export([f"r{i}" for i in range(6)], "universal_json", str(tmp_path),
+                               _load_return_data, job_id="job5", workers=2, executor="process")
+        members = _members(str(tmp_path), job)
+        assert json.loads(members["r3_universal.json"])["taxpayer"]["last_name"] == "r3"
+
+
+class TestProfessionalExporterBatchToZip:
+
+    def test_professional_format(self, tmp_path):
+        job = ProfessionalExporter().export_batch_to_zip(
+            ["a/1", "b-2"], ExportFormat.DRAKE, str(tmp_path), _load_tax_return, job_id="job6",
+        )
+        members = _members(str(tmp_path), job)
+        assert len(members) == 2
+        name = job.entries["a/1"].filename
+        assert name.startswith("a_1_") and name.endswith(".dra")
+        assert "LastName=Smith" in members[name]
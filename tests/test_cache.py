@@ -606,6 +606,7 @@ class TestCalculationCacheOperations:
             f"{CALC_PREFIX}return-123",
             {"total_tax": 15000},
             ttl=3600,
+            tags=["calc", "calc:return-123"],
         )
 
     @pytest.mark.asyncio
@@ -626,17 +627,17 @@ class TestCalculationCacheOperations:
     @pytest.mark.asyncio
     async def test_invalidate_calculation(self):
         """Should delete calculation cache entries."""
-        from cache.calculation_cache import CalculationCache, CALC_PREFIX
+        from cache.calculation_cache import CalculationCache
 
         mock_client = AsyncMock()
-        mock_client.delete_pattern.return_value = 3
+        mock_client.invalidate_tags.return_value = 3
 
         cache = CalculationCache(client=mock_client)
 
         result = await cache.invalidate_calculation("return-123")
 
         assert result is True
-        mock_client.delete_pattern.assert_called_with(f"{CALC_PREFIX}return-123*")
+        mock_client.invalidate_tags.assert_called_with("calc:return-123")
 
 
 class TestCalculationCacheReturnData:
@@ -676,7 +677,7 @@ class TestCalculationCacheReturnData:
         from cache.calculation_cache import CalculationCache
 
         mock_client = AsyncMock()
-        mock_client.delete_pattern.return_value = 1
+        mock_client.invalidate_tags.return_value = 1
         mock_client.delete.return_value = True
 
         cache = CalculationCache(client=mock_client)
@@ -725,17 +726,17 @@ class TestCalculationCacheScenarios:
     @pytest.mark.asyncio
     async def test_invalidate_scenarios(self):
         """Should invalidate all scenarios for a return."""
-        from cache.calculation_cache import CalculationCache, SCENARIO_PREFIX
+        from cache.calculation_cache import CalculationCache
 
         mock_client = AsyncMock()
-        mock_client.delete_pattern.return_value = 5
+        mock_client.invalidate_tags.return_value = 5
 
         cache = CalculationCache(client=mock_client)
 
         result = await cache.invalidate_scenarios("return-123")
 
         assert result == 5
-        mock_client.delete_pattern.assert_called_with(f"{SCENARIO_PREFIX}return-123:*")
+        mock_client.invalidate_tags.assert_called_with("scenario:return-123")
 
 
 class TestCalculationCacheBulkOperations:
@@ -806,10 +807,10 @@ class TestCacheInvalidator:
     @pytest.mark.asyncio
     async def test_on_config_changed(self):
         """Should invalidate all calculations on config change."""
-        from cache.calculation_cache import CacheInvalidator, CalculationCache, CALC_PREFIX
+        from cache.calculation_cache import CacheInvalidator, CalculationCache
 
         mock_client = AsyncMock()
-        mock_client.delete_pattern.return_value = 100
+        mock_client.invalidate_tags.return_value = 100
 
         mock_cache = AsyncMock(spec=CalculationCache)
         mock_cache.client = mock_client
@@ -818,7 +819,7 @@ class TestCacheInvalidator:
 
         await invalidator.on_config_changed()
 
-        mock_client.delete_pattern.assert_called_once_with(f"{CALC_PREFIX}*")
+        mock_cache.invalidate_all_calculations.assert_called_once()
 
     @pytest.mark.asyncio
     async def test_on_prior_year_updated(self):
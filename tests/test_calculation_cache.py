@@ -27,6 +27,7 @@ class TestCalculationCache:
         client.set = AsyncMock(return_value=True)
         client.delete = AsyncMock(return_value=True)
         client.delete_pattern = AsyncMock(return_value=1)
+        client.invalidate_tags = AsyncMock(return_value=1)
         return client
 
     @pytest.fixture
@@ -127,24 +128,24 @@ class TestCalculationCache:
     @pytest.mark.asyncio
     async def test_invalidate_calculation(self, cache, mock_redis_client):
         """Invalidate deletes calculation cache."""
-        mock_redis_client.delete_pattern.return_value = 3
+        mock_redis_client.invalidate_tags.return_value = 3
 
         result = await cache.invalidate_calculation("return-123")
 
         assert result is True
-        mock_redis_client.delete_pattern.assert_called_once()
-        pattern = mock_redis_client.delete_pattern.call_args[0][0]
-        assert "return-123" in pattern
+        mock_redis_client.invalidate_tags.assert_called_once_with("calc:return-123")
+        mock_redis_client.delete_pattern.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_invalidate_return(self, cache, mock_redis_client):
         """Invalidate return clears all related caches."""
-        mock_redis_client.delete_pattern.return_value = 2
+        mock_redis_client.invalidate_tags.return_value = 2
         mock_redis_client.delete.return_value = True
 
         result = await cache.invalidate_return("return-123")
 
-        # Should call delete_pattern twice (calc and scenarios) and delete once (return data)
+        # Two tag invalidations (calc and scenarios) and one delete (return data)
+        assert mock_redis_client.invalidate_tags.call_count == 2
         assert result > 0
 
     @pytest.mark.asyncio
@@ -229,9 +230,7 @@ class TestCacheInvalidator:
         """Config change invalidates all calculations."""
         await invalidator.on_config_changed()
 
-        mock_cache.client.delete_pattern.assert_called_once()
-        pattern = mock_cache.client.delete_pattern.call_args[0][0]
-        assert CALC_PREFIX in pattern
+        mock_cache.invalidate_all_calculations.assert_called_once()
 
     @pytest.mark.asyncio
     async def test_on_prior_year_updated(self, invalidator, mock_cache):
@@ -0,0 +1,202 @@
+"""
+Tests for the precomputed embedding index in OpenAICaseMatcher.
+"""
+
+import hashlib
+import random
+from types import SimpleNamespace
+
+import numpy as np
+
+from services.case_matcher import (
+    CaseType,
+    EmbeddingIndex,
+    OpenAICaseMatcher,
+    _case_text,
+)
+
+
+class FakeAIService:
+    """Deterministic embeddings derived from the text; counts provider calls."""
+
+    def __init__(self, dim=24):
+        self.dim = dim
+        self.calls = []
+        self.failing = set()
+
+    async def get_embedding(self, text, provider=None):
+        self.calls.append(text)
+        if text in self.failing:
+            raise RuntimeError("provider unavailable")
+        seed = int(hashlib.sha256(text.encode()).hexdigest()[:8], 16)
+        rng = random.Random(seed)
+        return SimpleNamespace(embedding=[rng.uniform(-1, 1) for _ in range(self.dim)])
+
+
+def _make_cases(n):
+    types = [CaseType.TAX_COURT, CaseType.IRS_RULING, CaseType.CIRCUIT_COURT]
+    return [
+        {
+            "id": f"case_{i}",
+            "type": types[i % len(types)].value,
+            "title": f"Case {i}",
+            "summary": f"Summary for case number {i}",
+            "key_facts": [],
+            "outcome": "unknown",
+            "tags": [f"tag{i % 7}"],
+        }
+        for i in range(n)
+    ]
+
+
+def _legacy_ranking(matcher, query, cases, case_type=None):
+    """Ordering produced by the old per-case loop."""
+    scored = []
+    for case in cases:
+        if case_type and case["type"] != case_type.value:
+            continue
+        seed = int(hashlib.sha256(_case_text(case).encode()).hexdigest()[:8], 16)
+        rng = random.Random(seed)
+        vector = [rng.uniform(-1, 1) for _ in range(len(query))]
+        scored.append((matcher._cosine_similarity(query, vector), case["id"]))
+    scored.sort(key=lambda x: x[0], reverse=True)
+    return scored
+
+
+class TestEmbeddingIndex:
+    def test_scores_match_pairwise_cosine(self):
+        rng = np.random.default_rng(0)
+        vectors = rng.normal(size=(50, 16)).tolist()
+        query = rng.normal(size=16).tolist()
+        index = EmbeddingIndex(vectors)
+        matcher = OpenAICaseMatcher(ai_service=FakeAIService(), vectors_path=None)
+
+        expected = [matcher._cosine_similarity(query, v) for v in vectors]
+        assert np.allclose(index.scores(query), expected, atol=1e-5)
+
+    def test_top_k_sorted_with_stable_ties(self):
+        index = EmbeddingIndex([[1, 0], [0, 1], [1, 0], [0.5, 0.5]])
+        result = index.top_k([1, 0], 3)
+        assert [row for row, _ in result] == [0, 2, 3]
+
+    def test_zero_vectors_score_zero(self):
+        index = EmbeddingIndex([[0, 0], [1, 0]])
+        assert index.scores([1, 0]).tolist() == [0.0, 1.0]
+        assert index.scores([0, 0]).tolist() == [0.0, 0.0]
+
+    def test_dimension_mismatch_uses_shared_prefix(self):
+        vectors = [[1.0, 2.0, 3.0], [3.0, -1.0, 0.5]]
+        index = EmbeddingIndex(vectors)
+        matcher = OpenAICaseMatcher(ai_service=FakeAIService(), vectors_path=None)
+        query = [0.5, 1.5]
+
+        expected = [matcher._cosine_similarity(query, v) for v in vectors]
+        assert np.allclose(index.scores(query), expected, atol=1e-6)
+
+    def test_mask_limits_candidates(self):
+        masks = {"even": np.array([True, False, True, False])}
+        index = EmbeddingIndex([[1, 0], [1, 0], [0, 1], [1, 0]], masks=masks)
+        assert [row for row, _ in index.top_k([1, 0], 10, mask="even")] == [0, 2]
+        assert index.top_k([1, 0], 10, mask="missing") == []
+
+
+class TestCaseMatcher:
+    async def test_ranking_matches_legacy_loop(self):
+        ai = FakeAIService()
+        cases = _make_cases(200)
+        matcher = OpenAICaseMatcher(ai_service=ai, cases=cases, vectors_path=None)
+        query = (await ai.get_embedding("home office deduction")).embedding
+
+        matches = await matcher._match_cases(query, top_k=10)
+        legacy = _legacy_ranking(matcher, query, cases)[:10]
+
+        assert [m.case_id for m in matches] == [case_id for _, case_id in legacy]
+        assert np.allclose([m.similarity_score for m in matches], [s for s, _ in legacy], atol=1e-5)
+
+    async def test_case_type_filter(self):
+        ai = FakeAIService()
+        cases = _make_cases(60)
+        matcher = OpenAICaseMatcher(ai_service=ai, cases=cases, vectors_path=None)
+        query = (await ai.get_embedding("ruling")).embedding
+
+        matches = await matcher._match_cases(query, top_k=100, case_type=CaseType.IRS_RULING)
+        legacy = _legacy_ranking(matcher, query, cases, CaseType.IRS_RULING)
+
+        assert len(matches) == 20
+        assert all(m.case_type == CaseType.IRS_RULING for m in matches)
+        assert [m.case_id for m in matches] == [case_id for _, case_id in legacy]
+
+    async def test_corpus_embedded_once(self):
+        ai = FakeAIService()
+        matcher = OpenAICaseMatcher(ai_service=ai, vectors_path=None)
+
+        await matcher.find_relevant_cases("gambling business")
+        corpus_calls = len(ai.calls)
+        await matcher.find_relevant_cases("hobby loss")
+        await matcher.find_applicable_strategies("s corp election")
+
+        assert corpus_calls == len(matcher.cases) + len(matcher.strategies) + 1
+        assert len(ai.calls) == corpus_calls + 2
+
+    async def test_persisted_vectors_skip_corpus_embedding(self, tmp_path):
+        path = tmp_path / "case_vectors.npz"
+        first = OpenAICaseMatcher(ai_service=FakeAIService(), vectors_path=path)
+        await first.warm()
+        assert path.exists()
+
+        ai = FakeAIService()
+        second = OpenAICaseMatcher(ai_service=ai, vectors_path=path)
+        await second.warm()
+
+        assert ai.calls == []
+        assert np.allclose(second._case_index.matrix, first._case_index.matrix)
+
+    async def test_changed_corpus_ignores_persisted_vectors(self, tmp_path):
+        path = tmp_path / "case_vectors.npz"
+        await OpenAICaseMatcher(ai_service=FakeAIService(), vectors_path=path).warm()
+
+        ai = FakeAIService()
+        matcher = OpenAICaseMatcher(ai_service=ai, cases=_make_cases(5), vectors_path=path)
+        await matcher.warm()
+
+        assert len(ai.calls) == 5 + len(matcher.strategies)
+
+    async def test_query_cache_is_bounded(self, monkeypatch):
+        monkeypatch.setattr("services.case_matcher.QUERY_EMBEDDING_CACHE_SIZE", 3)
+        matcher = OpenAICaseMatcher(ai_service=FakeAIService(), vectors_path=None)
+        for i in range(10):
+            await matcher._get_embedding(f"query {i}")
+        assert len(matcher._embedding_cache) == 3
+
+    async def test_failed_corpus_embedding_is_not_indexed_or_persisted(self, tmp_path, monkeypatch):
+        path = tmp_path / "case_vectors.npz"
+        ai = FakeAIService()
+        matcher = OpenAICaseMatcher(ai_service=ai, vectors_path=path)
+        ai.failing.add(_case_text(matcher.cases[0]))
+        query = (await ai.get_embedding("home office")).embedding
+
+        assert await matcher.warm() is False
+        assert await matcher._match_cases(query, top_k=3) == []
+        assert matcher._case_index is None
+        assert not path.exists()
+
+        # Within the retry window no provider calls are made
+        calls = len(ai.calls)
+        assert await matcher.warm() is False
+        assert len(ai.calls) == calls
+
+        ai.failing.clear()
+        monkeypatch.setattr(matcher, "_warm_retry_at", 0.0)
+        assert await matcher.warm() is True
+        assert path.exists()
+        assert len(await matcher._match_cases(query, top_k=3)) == 3
+
+    async def test_query_embedding_falls_back_when_provider_fails(self):
+        ai = FakeAIService()
+        matcher = OpenAICaseMatcher(ai_service=ai, vectors_path=None)
+        ai.failing.add("hobby loss")
+
+        embedding = await matcher._get_embedding("hobby loss")
+
+        assert embedding == matcher._fallback_embedding("hobby loss")
+        assert len(matcher._embedding_cache) == 0
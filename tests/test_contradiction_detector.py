@@ -0,0 +1,141 @@
+"""
+Tests for the onboarding ContradictionDetector.
+
+Covers declared rule inputs and incremental per-session checks: results
+must match a full check while only rules reading changed fields re-run.
+"""
+
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from onboarding.contradiction_detector import (
+    Contradiction,
+    ContradictionDetector,
+    ContradictionSeverity,
+    reads,
+)
+
+
+ANSWERS = {
+    "filing_status": ["single", "mfj", "mfs", "hoh", "qw"],
+    "spouse_name": [None, "Pat"],
+    "spouse_death_year": [None, 2023, 2024],
+    "has_dependent_child": [True, False],
+    "claiming_eitc": [True, False],
+    "claiming_aotc": [True, False],
+    "claiming_ctc": [True, False],
+    "dependents": [[], [{"name": "Kid", "age": 19, "ssn": "", "relationship": "cousin"}],
+                   [{"name": "Kid", "age": 5, "ssn": "123-45-6789", "relationship": "son"}]],
+    "wages": [50_000, -10],
+    "self_employment_income": [0, 20_000],
+    "ordinary_dividends": [100, 1_000],
+    "qualified_dividends": [50, 5_000],
+    "investment_income": [0, 20_000],
+    "will_itemize": [True, False],
+    "total_itemized_deductions": [5_000, 40_000],
+    "salt_deduction": [5_000, 15_000],
+    "prior_aotc_years": [0, 4],
+    "claiming_dependent_care_credit": [True, False],
+    "earned_income": [0, 40_000],
+}
+
+
+def _ids(result):
+    return [c.id for c in result.contradictions]
+
+
+class _Counting:
+    def __init__(self, contradiction_id, field_name):
+        self.calls = 0
+        self.contradiction_id = contradiction_id
+        self.field_name = field_name
+        self.__name__ = contradiction_id
+
+    def __call__(self, data):
+        self.calls += 1
+        if data.get(self.field_name):
+            return Contradiction(
+                id=self.contradiction_id,
+                severity=ContradictionSeverity.WARNING,
+                title="t",
+                message="m",
+                fields_involved=[self.field_name],
+            )
+        return None
+
+
+class TestIncrementalCheck:
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_matches_full_check_over_interview(self, seed):
+        rng = random.Random(seed)
+        detector = ContradictionDetector()
+        data = {}
+        for _ in range(50):
+            name = rng.choice(list(ANSWERS))
+            data[name] = rng.choice(ANSWERS[name])
+            incremental = detector.check(data, session_id="s1", changed_fields=[name])
+            full = detector.check(data)
+            assert _ids(incremental) == _ids(full)
+            assert incremental.has_errors == full.has_errors
+
+    def test_detects_changes_without_changed_fields(self):
+        detector = ContradictionDetector()
+        data = {"filing_status": "hoh"}
+        assert _ids(detector.check(data, session_id="s1")) == []
+
+        data["spouse_name"] = "Pat"
+        assert _ids(detector.check(data, session_id="s1")) == ["hoh_with_spouse"]
+
+        del data["spouse_name"]
+        assert _ids(detector.check(data, session_id="s1")) == []
+
+    def test_only_affected_rules_rerun(self):
+        detector = ContradictionDetector()
+        declared = _Counting("declared", "flag_a")
+        undeclared = _Counting("undeclared", "flag_b")
+        detector.add_rule(declared, inputs=["flag_a"])
+        detector.add_rule(undeclared)
+
+        detector.check({}, session_id="s1")
+        assert (declared.calls, undeclared.calls) == (1, 1)
+
+        result = detector.check({"wages": 1}, session_id="s1", changed_fields=["wages"])
+        assert (declared.calls, undeclared.calls) == (1, 2)
+        assert _ids(result) == []
+
+        result = detector.check({"wages": 1, "flag_a": True}, session_id="s1", changed_fields=["flag_a"])
+        assert declared.calls == 2
+        assert _ids(result) == ["declared"]
+
+    def test_reads_decorator_declares_inputs(self):
+        detector = ContradictionDetector()
+
+        @reads("flag")
+        def rule(data):
+            return _Counting("decorated", "flag")(data)
+
+        detector.add_rule(rule)
+        assert detector._rules[-1].inputs == frozenset({"flag"})
+
+    def test_clear_session_and_cache_bound(self):
+        detector = ContradictionDetector(session_cache_size=2)
+        for sid in ("a", "b", "c"):
+            detector.check({"wages": -1}, session_id=sid)
+        assert list(detector._sessions) == ["b", "c"]
+
+        detector.clear_session("b")
+        assert list(detector._sessions) == ["c"]
+
+    def test_rule_added_after_session_start_triggers_full_run(self):
+        detector = ContradictionDetector()
+        detector.check({"flag": True}, session_id="s1")
+        detector.add_rule(_Counting("late", "flag"), inputs=["flag"])
+
+        result = detector.check({"flag": True}, session_id="s1", changed_fields=[])
+        assert _ids(result) == ["late"]
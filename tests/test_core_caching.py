@@ -0,0 +1,187 @@
+"""Tests for the lock-striped LRU/TTL MemoryCache in core.caching."""
+
+import threading
+
+import pytest
+
+import core.caching as caching
+from core.caching import MemoryCache, cached
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(caching.time, "time", lambda: now[0])
+    return now
+
+
+class TestBasics:
+    def test_set_get_delete(self):
+        cache = MemoryCache()
+        cache.set("k", {"v": 1})
+        assert cache.get("k") == {"v": 1}
+        assert cache.delete("k") is True
+        assert cache.delete("k") is False
+        assert cache.get("k", "missing") == "missing"
+
+    def test_entries_expire(self, clock):
+        cache = MemoryCache(default_ttl=10)
+        cache.set("short", 1, ttl=5)
+        cache.set("long", 2)
+        clock[0] += 6
+        assert cache.get("short") is None
+        assert cache.get("long") == 2
+
+    def test_stats_keep_existing_keys(self):
+        cache = MemoryCache(max_size=100)
+        cache.set("a", 1)
+        cache.get("a")
+        cache.get("b")
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["sets"] == 1
+        assert stats["size"] == 1
+        assert stats["max_size"] == 100
+        assert stats["hit_rate_percent"] == 50.0
+
+    def test_clear_counts_all_shards(self):
+        cache = MemoryCache(max_size=10000)
+        assert cache.stats()["shards"] > 1
+        for i in range(500):
+            cache.set(f"k{i}", i)
+        assert cache.clear() == 500
+        assert cache.stats()["size"] == 0
+
+
+class TestEviction:
+    def test_full_cache_evicts_least_recently_used(self):
+        cache = MemoryCache(max_size=3)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.set("c", 3)
+        cache.get("a")  # "b" is now least recently used
+        cache.set("d", 4)
+
+        assert cache.get("b") is None
+        assert [cache.get(k) for k in ("a", "c", "d")] == [1, 3, 4]
+        assert cache.stats()["evictions"] == 1
+
+    def test_expired_entries_are_evicted_before_live_ones(self, clock):
+        cache = MemoryCache(max_size=3)
+        cache.set("old", 1, ttl=1)
+        cache.set("b", 2, ttl=100)
+        cache.set("c", 3, ttl=100)
+        clock[0] += 5
+        cache.set("d", 4)
+
+        assert cache.get("b") == 2
+        assert cache.get("old") is None
+        assert cache.stats()["size"] == 3
+
+    def test_resetting_key_does_not_evict(self):
+        cache = MemoryCache(max_size=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.set("a", 10)
+        assert cache.get("a") == 10
+        assert cache.get("b") == 2
+        assert cache.stats()["evictions"] == 0
+
+    def test_stale_heap_items_are_ignored(self, clock):
+        cache = MemoryCache(max_size=10)
+        cache.set("k", 1, ttl=1)
+        cache.set("k", 2, ttl=100)  # re-set: the ttl=1 heap item is now stale
+        clock[0] += 5
+        assert cache._cleanup() == 0
+        assert cache.get("k") == 2
+
+    def test_size_stays_bounded_under_churn(self):
+        cache = MemoryCache(max_size=1000)
+        for i in range(20000):
+            cache.set(f"key:{i}", i)
+        assert cache.stats()["size"] <= 1000
+        shard = cache._shards[0]
+        assert len(shard.expiry_heap) <= 2 * len(shard.entries) + 64
+
+
+class TestInvalidatePattern:
+    def _filled(self):
+        cache = MemoryCache(max_size=10000)
+        for i in range(50):
+            cache.set(f"dashboard:cpa-{i % 5}:{i}", i)
+            cache.set(f"lead:{i}:summary", i)
+            cache.set(f"leads:cpa-{i % 5}:page{i}", i)
+        cache.set("plainkey", 0)
+        return cache
+
+    def test_segment_prefix(self):
+        cache = self._filled()
+        assert cache.invalidate_pattern("dashboard:") == 50
+        assert cache.get("dashboard:cpa-0:0") is None
+        assert cache.get("lead:0:summary") == 0
+
+    def test_nested_segment_prefix(self):
+        cache = self._filled()
+        assert cache.invalidate_pattern("dashboard:cpa-1:") == 10
+        assert cache.get("dashboard:cpa-2:2") == 2
+
+    def test_partial_segment_matches_like_startswith(self):
+        cache = self._filled()
+        # "lead:1" matches lead:1, lead:10..19 but not "leads:"
+        assert cache.invalidate_pattern("lead:1") == 11
+        assert cache.get("leads:cpa-1:page1") == 1
+        assert cache.get("lead:2:summary") == 2
+
+    def test_pattern_without_separator_scans(self):
+        cache = self._filled()
+        assert cache.invalidate_pattern("plain") == 1
+        assert cache.invalidate_pattern("missing:") == 0
+
+    def test_index_is_cleaned_on_delete(self):
+        cache = MemoryCache()
+        cache.set("a:b:c", 1)
+        cache.delete("a:b:c")
+        assert all(not shard.prefixes for shard in cache._shards)
+
+    def test_cached_decorator_invalidate_all(self, monkeypatch):
+        monkeypatch.setattr(caching, "cache", MemoryCache())
+        calls = []
+
+        @cached(ttl=60, key_prefix="dashboard")
+        def stats(cpa_id):
+            calls.append(cpa_id)
+            return {"cpa": cpa_id}
+
+        stats("a")
+        stats("a")
+        stats.invalidate_all()
+        stats("a")
+        assert calls == ["a", "a"]
+
+
+def test_concurrent_access_is_consistent():
+    cache = MemoryCache(max_size=2000)
+    errors = []
+
+    def worker(n):
+        try:
+            for i in range(2000):
+                key = f"t{n}:{i % 300}"
+                cache.set(key, i)
+                cache.get(key)
+                if i % 500 == 0:
+                    cache.invalidate_pattern(f"t{n}:")
+        except Exception as e:  # pragma: no cover - surfaced below
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    stats = cache.stats()
+    assert stats["size"] <= 2000
+    assert stats["sets"] == 8 * 2000
@@ -0,0 +1,144 @@
+"""
+Tests for the streaming CSV export service.
+
+Runs the keyset-paginated exports against a SQLite database and checks
+that every firm row comes out exactly once and in key order across batch
+boundaries (including timestamp ties), that gzip output decodes to the
+same CSV, and that the first page query runs before the header is
+yielded, so query failures surface before any bytes are produced.
+"""
+
+import csv
+import gzip
+import io
+import os
+import sys
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from cpa_panel.services.csv_export_service import EXPORTS, stream_export
+
+
+SCHEMA = [
+    """CREATE TABLE clients (client_id TEXT PRIMARY KEY, firm_id TEXT, external_id TEXT,
+       first_name TEXT, last_name TEXT, email TEXT, phone TEXT, state TEXT, is_active INTEGER, created_at TEXT)""",
+    """CREATE TABLE lead_magnet_leads (id INTEGER PRIMARY KEY AUTOINCREMENT, lead_id TEXT, firm_id TEXT,
+       first_name TEXT, email TEXT, filing_status TEXT, complexity TEXT, lead_score INTEGER,
+       lead_temperature TEXT, estimated_engagement_value REAL, savings_range_high REAL,
+       engaged INTEGER, converted INTEGER, created_at TEXT)""",
+    """CREATE TABLE audit_logs (log_id TEXT PRIMARY KEY, firm_id TEXT, timestamp TEXT, event_type TEXT,
+       event_category TEXT, severity TEXT, user_id TEXT, user_role TEXT, description TEXT)""",
+]
+
+
+class _Sessions:
+    """Session scope that counts how many sessions the export opened."""
+
+    def __init__(self, factory):
+        self.factory = factory
+        self.opened = 0
+
+    @asynccontextmanager
+    async def __call__(self):
+        self.opened += 1
+        async with self.factory() as session:
+            yield session
+
+
+@pytest.fixture
+async def sessions(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'export.db'}", poolclass=NullPool)
+    base = datetime(2026, 1, 1)
+    async with engine.begin() as conn:
+        for statement in SCHEMA:
+            await conn.execute(text(statement))
+        for i in range(53):
+            for firm in ("firm-a", "firm-b"):
+                await conn.execute(text(
+                    "INSERT INTO clients VALUES (:id, :firm, NULL, 'First', :last, :email, NULL, 'CA', 1, :ts)"
+                ), {"id": f"{firm}-client-{i:03d}", "firm": firm, "last": f"L{i}",
+                    "email": f"{firm}-{i}@example.com", "ts": base.isoformat()})
+                await conn.execute(text(
+                    "INSERT INTO lead_magnet_leads (lead_id, firm_id, first_name, email, lead_score, "
+                    "engaged, converted, created_at) VALUES (:id, :firm, 'P', 'p@example.com', 50, :e, 0, :ts)"
+                ), {"id": f"{firm}-lead-{i}", "firm": firm, "e": i % 2, "ts": base.isoformat()})
+                # Three events per timestamp so keyset ties straddle batch boundaries
+                await conn.execute(text(
+                    "INSERT INTO audit_logs VALUES (:id, :firm, :ts, 'login', 'auth', 'info', 'u1', 'cpa', :id)"
+                ), {"id": f"{firm}-log-{i:03d}", "firm": firm, "ts": (base + timedelta(minutes=i // 3)).isoformat()})
+    yield _Sessions(async_sessionmaker(engine, expire_on_commit=False))
+    await engine.dispose()
+
+
+async def _collect(export_type, sessions, **kwargs):
+    chunks = [chunk async for chunk in stream_export(export_type, "firm-a", session_scope=sessions, **kwargs)]
+    return chunks
+
+
+def _rows(data: bytes):
+    return list(csv.reader(io.StringIO(data.decode("utf-8"))))
+
+
+class TestStreamExport:
+
+    @pytest.mark.parametrize("export_type", ["clients", "leads", "activity"])
+    async def test_every_firm_row_once_in_key_order(self, sessions, export_type):
+        chunks = await _collect(export_type, sessions, batch_size=7)
+        rows = _rows(b"".join(chunks))
+
+        assert rows[0] == list(EXPORTS[export_type].header)
+        body = rows[1:]
+        assert len(body) == 53
+        assert len({tuple(r) for r in body}) == 53
+        # header chunk + 8 batches (7 full, 1 partial)
+        assert len(chunks) == 1 + 8
+        assert sessions.opened == 8
+
+    async def test_client_rows_are_firm_scoped_and_ordered(self, sessions):
+        rows = _rows(b"".join(await _collect("clients", sessions, batch_size=10)))[1:]
+        ids = [r[0] for r in rows]
+        assert ids == sorted(ids)
+        assert all(i.startswith("firm-a-") for i in ids)
+        assert rows[0][2] == "First L0" and rows[0][6] == "active"
+
+    async def test_gzip_output_matches_plain(self, sessions):
+        plain = b"".join(await _collect("leads", sessions, batch_size=5))
+        compressed = b"".join(await _collect("leads", sessions, batch_size=5, gzip_output=True))
+        assert gzip.decompress(compressed) == plain
+
+    async def test_first_query_runs_before_header(self, sessions):
+        stream = stream_export("activity", "firm-a", session_scope=sessions)
+        first = await stream.__anext__()
+        assert first.decode().startswith("timestamp,action")
+        assert sessions.opened == 1
+        await stream.aclose()
+
+    async def test_query_failure_raises_before_any_bytes(self):
+        @asynccontextmanager
+        async def broken():
+            raise RuntimeError("database unavailable")
+            yield
+
+        stream = stream_export("clients", "firm-a", session_scope=broken)
+        with pytest.raises(RuntimeError):
+            await stream.__anext__()
+
+    async def test_missing_firm_is_rejected(self, sessions):
+        with pytest.raises(ValueError):
+            await stream_export("clients", "", session_scope=sessions).__anext__()
+        assert sessions.opened == 0
+
+    async def test_empty_export_is_header_only(self, sessions):
+        chunks = [c async for c in stream_export("clients", "firm-none", session_scope=sessions)]
+        assert _rows(b"".join(chunks)) == [list(EXPORTS["clients"].header)]
+
+    async def test_unknown_export_type(self, sessions):
+        with pytest.raises(KeyError):
+            await _collect("invoices", sessions)
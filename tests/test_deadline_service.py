@@ -0,0 +1,292 @@
+"""
+Tests for the DeadlineService indexes and reminder schedule.
+
+Query results must match a linear scan over every deadline while the
+firm/client/session indexes, the per-firm date index and the reminder
+heap stay consistent across updates, extensions, completion and deletes.
+"""
+
+import os
+import random
+import sqlite3
+import sys
+from datetime import date, timedelta
+from uuid import uuid4
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from cpa_panel.deadlines.deadline_models import DeadlineStatus, DeadlineType, ReminderType
+from cpa_panel.deadlines.deadline_service import DeadlineService
+from database.deadline_persistence import DeadlinePersistence
+
+
+TODAY = date.today()
+
+
+def _scan_reminders(service, firm_id, today):
+    """Reference: every unsent reminder due on or before today."""
+    due = []
+    for deadline in service._deadlines.values():
+        if deadline.firm_id != firm_id or deadline.status in [DeadlineStatus.COMPLETED, DeadlineStatus.WAIVED]:
+            continue
+        for reminder in deadline.reminders:
+            fire_date = deadline.effective_due_date - timedelta(days=reminder.days_before)
+            if not reminder.is_sent and fire_date <= today:
+                due.append((fire_date, reminder.id))
+    return sorted(due)
+
+
+def _firm_contact(firm_id, client_id):
+    """Contact lookup with only a firm address: one reminder entry per reminder."""
+    return {"cpa": (f"{firm_id}@firm.example.com", "Firm")}
+
+
+def _ids(deadlines):
+    return [d.id for d in deadlines]
+
+
+def _populate(service, rng, firms, clients, n):
+    for _ in range(n):
+        service.create_deadline(
+            firm_id=rng.choice(firms),
+            deadline_type=rng.choice(list(DeadlineType)),
+            due_date=TODAY + timedelta(days=rng.randint(-60, 120)),
+            client_id=rng.choice(clients),
+            session_id=f"s{rng.randint(0, 20)}",
+        )
+
+
+class TestIndexedQueries:
+
+    def test_queries_match_linear_scan_after_mutations(self):
+        rng = random.Random(3)
+        service = DeadlineService()
+        firms = [uuid4() for _ in range(3)]
+        clients = [uuid4() for _ in range(15)]
+        _populate(service, rng, firms, clients, 300)
+
+        for deadline in rng.sample(list(service._deadlines.values()), 80):
+            action = rng.choice(["update", "extend", "complete", "delete"])
+            if action == "update":
+                service.update_deadline(deadline.id, due_date=TODAY + timedelta(days=rng.randint(-30, 90)))
+            elif action == "extend":
+                service.file_extension(deadline.id, deadline.due_date + timedelta(days=180))
+            elif action == "complete":
+                service.complete_deadline(deadline.id)
+            else:
+                service.delete_deadline(deadline.id)
+
+        for firm_id in firms:
+            everything = sorted(
+                (d for d in service._deadlines.values() if d.firm_id == firm_id),
+                key=lambda d: (d.effective_due_date, d.id),
+            )
+            open_ = [d for d in everything if d.status != DeadlineStatus.COMPLETED]
+            assert _ids(service.get_deadlines_for_firm(firm_id)) == _ids(open_)
+
+            window = [d for d in open_ if TODAY <= d.effective_due_date <= TODAY + timedelta(days=30)]
+            assert _ids(service.get_upcoming_deadlines(firm_id, days_ahead=30)) == _ids(window)
+
+            month = TODAY.replace(day=1)
+            view = service.get_calendar_view(firm_id, month.year, month.month)
+            expected = [d for d in everything if d.effective_due_date.year == month.year
+                        and d.effective_due_date.month == month.month]
+            assert view["total_deadlines"] == len(expected)
+
+            client_id = clients[0]
+            assert _ids(service.get_deadlines_for_client(firm_id, client_id)) == \
+                _ids([d for d in open_ if d.client_id == client_id])
+
+        assert sorted(_ids(service.get_deadlines_for_session("s1"))) == \
+            sorted(d.id for d in service._deadlines.values() if d.session_id == "s1")
+
+
+class TestReminderSchedule:
+
+    def test_pending_reminders_match_scan(self):
+        rng = random.Random(5)
+        service = DeadlineService(contact_lookup=_firm_contact)
+        firms = [uuid4() for _ in range(2)]
+        _populate(service, rng, firms, [uuid4() for _ in range(5)], 200)
+        for deadline in rng.sample(list(service._deadlines.values()), 40):
+            service.update_deadline(deadline.id, due_date=deadline.due_date + timedelta(days=rng.randint(-20, 20)))
+        for deadline in rng.sample(list(service._deadlines.values()), 20):
+            service.complete_deadline(deadline.id)
+
+        for firm_id in firms:
+            pending = service.get_pending_reminders(firm_id)
+            got = [(date.fromisoformat(p["should_send_on"]), p["reminder"]["id"]) for p in pending]
+            expected = [(fire_date, str(rid)) for fire_date, rid in _scan_reminders(service, firm_id, TODAY)]
+            assert sorted(got) == expected
+
+    def test_sent_reminders_leave_the_schedule(self):
+        service = DeadlineService(contact_lookup=_firm_contact)
+        firm_id = uuid4()
+        deadline = service.create_deadline(firm_id, DeadlineType.FILING, TODAY + timedelta(days=2))
+        due = service.get_due_reminders()
+        # 30/14/7/3 day email reminders plus the 3 day SMS
+        assert len(due) == 5
+        assert {item["firm_id"] for item in due} == {firm_id}
+
+        for item in due:
+            assert service.mark_reminder_sent(item["deadline_id"], item["reminder_id"])
+        assert service.get_due_reminders() == []
+        # Sent reminders leave the due set; the two 1-day reminders are still queued
+        assert service._due[firm_id] == {}
+        assert len(service._reminder_heaps[firm_id]) == 2
+        later = service.get_due_reminders(today=deadline.due_date - timedelta(days=1))
+        assert [i["reminder"].days_before for i in later] == [1, 1]
+
+    def test_rescheduled_deadline_moves_its_reminders(self):
+        service = DeadlineService(contact_lookup=_firm_contact)
+        firm_id = uuid4()
+        deadline = service.create_deadline(firm_id, DeadlineType.CUSTOM, TODAY + timedelta(days=3))
+        assert [i["reminder"].days_before for i in service.get_due_reminders()] == [7, 3]
+
+        service.update_deadline(deadline.id, due_date=TODAY + timedelta(days=60))
+        assert service.get_due_reminders() == []
+        assert len(service.get_due_reminders(today=TODAY + timedelta(days=57))) == 2
+
+    def test_waived_extension_reminders_start_when_filed(self):
+        service = DeadlineService(contact_lookup=_firm_contact)
+        firm_id = uuid4()
+        _, extension, *_ = service.generate_standard_deadlines(firm_id, tax_year=2025)
+        fire_on = extension.due_date - timedelta(days=1)
+        assert all(i["deadline_id"] != extension.id for i in service.get_due_reminders(today=fire_on))
+
+        service.file_extension(extension.id, extension.due_date + timedelta(days=30))
+        assert all(i["deadline_id"] != extension.id for i in service.get_due_reminders(today=fire_on))
+        due = service.get_due_reminders(today=extension.effective_due_date)
+        assert {i["deadline_id"] for i in due} >= {extension.id}
+
+    def test_deleted_deadline_is_dropped(self):
+        service = DeadlineService(contact_lookup=_firm_contact)
+        firm_id = uuid4()
+        deadline = service.create_deadline(firm_id, DeadlineType.CUSTOM, TODAY, client_id=uuid4(), session_id="s")
+        service.delete_deadline(deadline.id)
+
+        assert service.get_due_reminders() == []
+        assert service.get_deadlines_for_firm(firm_id, include_completed=True) == []
+        assert service.get_deadlines_for_session("s") == []
+        assert service._reminder_heaps[firm_id] == []
+
+    def test_added_reminder_is_scheduled(self):
+        service = DeadlineService(contact_lookup=_firm_contact)
+        firm_id = uuid4()
+        deadline = service.create_deadline(firm_id, DeadlineType.CUSTOM, TODAY + timedelta(days=40),
+                                           auto_reminders=False)
+        reminder = service.add_reminder(deadline.id, 45)
+
+        assert [i["reminder_id"] for i in service.get_due_reminders()] == [reminder.id]
+        assert service.add_reminder(uuid4(), 1) is None
+
+    def test_recipients_resolved_from_recipient_type(self):
+        contacts = {"cpa": ("cpa@firm.example.com", "Firm"), "client": ("client@example.com", "Jane Client")}
+        service = DeadlineService(contact_lookup=lambda firm_id, client_id: contacts)
+        deadline = service.create_deadline(uuid4(), DeadlineType.CUSTOM, TODAY + timedelta(days=2),
+                                           client_id=uuid4(), auto_reminders=False)
+        service.add_reminder(deadline.id, 5, ReminderType.EMAIL, "both")
+        service.add_reminder(deadline.id, 4, ReminderType.EMAIL, "client")
+
+        due = service.get_due_reminders()
+        assert [(i["recipient_type"], i["recipient_email"]) for i in due] == [
+            ("cpa", "cpa@firm.example.com"),
+            ("client", "client@example.com"),
+            ("client", "client@example.com"),
+        ]
+        assert all(i["client_name"] == "Jane Client" for i in due)
+
+    def test_recipient_without_email_is_skipped(self):
+        service = DeadlineService(contact_lookup=lambda firm_id, client_id: {"cpa": (None, "Firm")})
+        deadline = service.create_deadline(uuid4(), DeadlineType.CUSTOM, TODAY, auto_reminders=False)
+        service.add_reminder(deadline.id, 1)
+
+        assert service.get_due_reminders() == []
+
+
+class TestPersistence:
+
+    def test_load_restores_deadlines_and_indexes(self, tmp_path):
+        path = tmp_path / "deadlines.db"
+        web = DeadlineService(persistence=DeadlinePersistence(path))
+        firm_id, client_id = uuid4(), uuid4()
+        kept = web.create_deadline(firm_id, DeadlineType.FILING, TODAY + timedelta(days=10),
+                                   client_id=client_id, session_id="s1")
+        web.update_deadline(kept.id, due_date=TODAY + timedelta(days=12), notes="call client")
+        dropped = web.create_deadline(firm_id, DeadlineType.CUSTOM, TODAY)
+        web.delete_deadline(dropped.id)
+        _, extension, *_ = web.generate_standard_deadlines(firm_id, tax_year=2025)
+
+        worker = DeadlineService(persistence=DeadlinePersistence(path))
+        assert worker.load() == len(web._deadlines)
+
+        restored = worker.get_deadline(kept.id)
+        assert restored.to_dict() == web.get_deadline(kept.id).to_dict()
+        assert worker.get_deadline(dropped.id) is None
+        assert worker.get_deadline(extension.id).status == DeadlineStatus.WAIVED
+        assert _ids(worker.get_deadlines_for_client(firm_id, client_id)) == [kept.id]
+        assert _ids(worker.get_deadlines_for_session("s1")) == [kept.id]
+
+    def test_sent_reminder_survives_stale_save(self, tmp_path):
+        path = tmp_path / "deadlines.db"
+        web = DeadlineService(persistence=DeadlinePersistence(path), contact_lookup=_firm_contact)
+        deadline = web.create_deadline(uuid4(), DeadlineType.CUSTOM, TODAY + timedelta(days=2))
+
+        worker = DeadlineService(persistence=DeadlinePersistence(path), contact_lookup=_firm_contact)
+        worker.load()
+        for item in worker.get_due_reminders():
+            worker.mark_reminder_sent(item["deadline_id"], item["reminder_id"])
+
+        # The web worker still holds the unsent reminders and saves the deadline again
+        web.update_deadline(deadline.id, notes="updated")
+
+        fresh = DeadlineService(persistence=DeadlinePersistence(path), contact_lookup=_firm_contact)
+        fresh.load()
+        assert fresh.get_due_reminders() == []
+
+    def test_load_due_reads_only_deadlines_with_due_reminders(self, tmp_path):
+        path = tmp_path / "deadlines.db"
+        web = DeadlineService(persistence=DeadlinePersistence(path), contact_lookup=_firm_contact)
+        firm_id = uuid4()
+        due = web.create_deadline(firm_id, DeadlineType.CUSTOM, TODAY + timedelta(days=2))
+        web.create_deadline(firm_id, DeadlineType.CUSTOM, TODAY + timedelta(days=60))
+        done = web.create_deadline(firm_id, DeadlineType.CUSTOM, TODAY + timedelta(days=1))
+        web.complete_deadline(done.id)
+        gone = web.create_deadline(firm_id, DeadlineType.CUSTOM, TODAY)
+        web.delete_deadline(gone.id)
+
+        worker = DeadlineService(persistence=DeadlinePersistence(path), contact_lookup=_firm_contact)
+        assert worker.load_due() == 1
+        assert set(worker._deadlines) == {due.id}
+        items = worker.get_due_reminders()
+        assert {i["deadline_id"] for i in items} == {due.id}
+        for item in items:
+            worker.mark_reminder_sent(item["deadline_id"], item["reminder_id"])
+
+        # Sent reminders leave the schedule even after a stale save from the web worker
+        web.update_deadline(due.id, notes="updated")
+        assert DeadlineService(persistence=DeadlinePersistence(path)).load_due() == 0
+
+    def test_load_due_backfills_schedule_for_existing_deadlines(self, tmp_path):
+        path = tmp_path / "deadlines.db"
+        web = DeadlineService(persistence=DeadlinePersistence(path))
+        deadline = web.create_deadline(uuid4(), DeadlineType.CUSTOM, TODAY + timedelta(days=2))
+        with DeadlinePersistence(path)._connect() as conn:
+            conn.execute("DELETE FROM cpa_deadline_reminder_schedule")
+
+        worker = DeadlineService(persistence=DeadlinePersistence(path))
+        assert worker.load_due() == 1
+        assert set(worker._deadlines) == {deadline.id}
+        assert DeadlinePersistence(path).is_schedule_backfilled()
+
+    def test_mark_reminder_sent_survives_persistence_error(self, tmp_path):
+        persistence = DeadlinePersistence(tmp_path / "deadlines.db")
+        service = DeadlineService(persistence=persistence, contact_lookup=_firm_contact)
+        service.create_deadline(uuid4(), DeadlineType.CUSTOM, TODAY + timedelta(days=2))
+        item = service.get_due_reminders()[0]
+
+        def fail(*args):
+            raise sqlite3.OperationalError("database is locked")
+
+        persistence.mark_reminder_sent = fail
+        assert service.mark_reminder_sent(item["deadline_id"], item["reminder_id"])
@@ -0,0 +1,169 @@
+"""
+Tests for single-pass template scanning in FieldExtractor.
+
+The anchor scanner must produce exactly what searching every pattern over
+the full text produces.
+"""
+
+import random
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from services.ocr.field_extractor import (
+    DOCUMENT_TEMPLATES,
+    FieldExtractor,
+    FieldTemplate,
+    FieldType,
+    TemplateScanner,
+    _CASE_FOLD_TABLE,
+    fold_case,
+    plan_pattern,
+)
+from services.ocr.ocr_engine import OCRResult
+
+
+W2_TEXT = """Form W-2 Wage and Tax Statement 2025
+a Employee's social security number 123-45-6789
+b Employer identification number (EIN) 12-3456789
+c Employer's name, address, and ZIP code
+Acme Corporation
+123 Main St, Springfield, IL 62701
+1 Wages, tips, other compensation $85,000.00
+2 Federal income tax withheld $12,750.00
+3 Social security wages 85000.00
+4 Social security tax withheld 5,270.00
+5 Medicare wages and tips 85,000.00
+6 Medicare tax withheld 1,232.50
+"""
+
+INT_TEXT = """Form 1099-INT Interest Income
+PAYER'S name: First National Bank
+PAYER'S TIN: 98-7654321
+RECIPIENT'S TIN 123-45-6789
+1 Interest income $1,250.00
+4 Federal income tax withheld $125.00
+"""
+
+NOISE_WORDS = (
+    "employer", "wages", "box", "payer", "tips", "interest", "federal", "EIN",
+    "withheld", "1", "2", "12", "$", "1,000.00", "\n", "name", "social", "tax",
+    "KELVINK", "ſecurity", "dıvidends", "Ġ",
+)
+
+
+def _reference(extractor, text, templates, confidence=90.0):
+    """Original behaviour: search every pattern over the full text."""
+    fields = []
+    for template in templates:
+        field = extractor._extract_field(text, template, confidence)
+        if field:
+            fields.append(field)
+    return [f.to_dict() for f in fields]
+
+
+def _extract(extractor, text, templates, confidence=90.0):
+    result = OCRResult(raw_text=text, blocks=[], confidence=confidence, engine_used="test")
+    return [f.to_dict() for f in extractor.extract(result, templates)]
+
+
+def _noise(rng, words):
+    return " ".join(rng.choice(NOISE_WORDS) for _ in range(words))
+
+
+class TestScannerEquivalence:
+    @pytest.mark.parametrize("doc_type", sorted(DOCUMENT_TEMPLATES))
+    @pytest.mark.parametrize("text", [W2_TEXT, INT_TEXT, "", "nothing relevant here"])
+    def test_matches_reference(self, doc_type, text):
+        extractor = FieldExtractor()
+        templates = DOCUMENT_TEMPLATES[doc_type]()
+        assert _extract(extractor, text, templates) == _reference(extractor, text, templates)
+
+    @pytest.mark.parametrize("seed", range(25))
+    def test_matches_reference_on_noisy_text(self, seed):
+        rng = random.Random(seed)
+        extractor = FieldExtractor()
+        text = _noise(rng, 200) + "\n" + rng.choice([W2_TEXT, INT_TEXT]) + _noise(rng, 200)
+        for doc_type in DOCUMENT_TEMPLATES:
+            templates = DOCUMENT_TEMPLATES[doc_type]()
+            assert _extract(extractor, text, templates) == _reference(extractor, text, templates)
+
+    def test_large_text_with_late_fields(self):
+        extractor = FieldExtractor()
+        text = "lorem ipsum dolor sit amet\n" * 20000 + W2_TEXT
+        templates = DOCUMENT_TEMPLATES["w2"]()
+        extracted = _extract(extractor, text, templates)
+        assert extracted == _reference(extractor, text, templates)
+        assert any(f["field_name"] == "wages" and f["normalized_value"] == 85000.0 for f in extracted)
+
+    def test_case_sensitive_custom_template(self):
+        extractor = FieldExtractor()
+        templates = [
+            FieldTemplate(
+                field_name="code",
+                field_label="Code",
+                field_type=FieldType.STRING,
+                patterns=[re.compile(r"CODE:\s*(\w+)")],
+            )
+        ]
+        text = "code: lower\nCODE: UPPER"
+        extracted = _extract(extractor, text, templates)
+        assert extracted == _reference(extractor, text, templates)
+        assert extracted[0]["raw_value"] == "UPPER"
+
+    def test_required_field_missing(self):
+        extractor = FieldExtractor()
+        templates = DOCUMENT_TEMPLATES["w2"]()
+        extracted = _extract(extractor, "unrelated", templates)
+        assert extracted == _reference(extractor, "unrelated", templates)
+        assert all(f["validation_errors"] == ["Required field not found"] for f in extracted)
+
+
+class TestPatternPlans:
+    def test_literal_anchor_with_bounded_lead(self):
+        plan = plan_pattern(re.compile(r"EIN[:\s]*(\d{2}-?\d{7})", re.IGNORECASE))
+        assert plan.anchors == ("ein",)
+        assert plan.max_lead == 0
+
+    def test_branch_anchors(self):
+        plan = plan_pattern(re.compile(r"(?:wages.*?tips|box\s*1)[:\s]*(\d+)", re.IGNORECASE))
+        assert plan.anchors == ("box", "wages")
+
+    def test_unbounded_lead(self):
+        plan = plan_pattern(re.compile(r"(?:1\s+)?rents[:\s]*(\d+)", re.IGNORECASE))
+        assert plan.anchors == ("rents",)
+        assert plan.max_lead is None
+
+    def test_no_literal_is_unanchored(self):
+        plan = plan_pattern(re.compile(r"\b1[.\s]+([\d,]+\.\d{2})\b"))
+        assert plan.anchors == ()
+
+    def test_scanner_built_once_per_template_set(self):
+        extractor = FieldExtractor()
+        first = extractor.get_scanner(DOCUMENT_TEMPLATES["w2"]())
+        assert extractor.get_scanner(DOCUMENT_TEMPLATES["w2"]()) is first
+
+    def test_overlapping_anchors_all_located(self):
+        scanner = TemplateScanner([
+            FieldTemplate("a", "A", FieldType.STRING, patterns=[r"boxes(\d)"]),
+            FieldTemplate("b", "B", FieldType.STRING, patterns=[r"xes(\d)"]),
+        ])
+        assert scanner.locate_anchors("BOXES1") == {"boxes": 0, "xes": 2}
+
+
+class TestCaseFold:
+    def test_preserves_length(self):
+        text = "Employer İıſK ÄÖÜ ß"
+        assert len(fold_case(text)) == len(text)
+
+    def test_covers_every_ignorecase_ascii_match(self):
+        # Every character an ASCII letter matches case-insensitively must fold onto it
+        candidates = "".join(map(chr, range(0x80, 0x110000)))
+        for ch in re.findall(r"[a-z]", candidates, re.IGNORECASE):
+            letter = _CASE_FOLD_TABLE.get(ord(ch))
+            assert letter is not None, hex(ord(ch))
+            assert re.fullmatch(letter, ch, re.IGNORECASE)
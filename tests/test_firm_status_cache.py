@@ -0,0 +1,212 @@
+"""Tests for the firm subscription status cache used by require_auth."""
+
+import asyncio
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+
+import rbac.dependencies as deps
+from rbac.context import AuthContext
+from rbac.firm_status_cache import (
+    FIRM_NOT_FOUND,
+    FirmStatus,
+    FirmStatusCache,
+    get_firm_status_cache,
+    notify_firm_status_changed,
+)
+from rbac.roles import Role
+
+ACTIVE = FirmStatus(exists=True, subscription_status="active")
+
+
+class CountingLoader:
+    def __init__(self, status=ACTIVE, delay=0.0):
+        self.status = status
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self, firm_id):
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return self.status
+
+
+class TestFirmStatusCache:
+    async def test_hit_after_first_load(self):
+        cache = FirmStatusCache(ttl=60)
+        loader = CountingLoader()
+
+        for _ in range(5):
+            assert await cache.get_or_load("f1", loader) == ACTIVE
+
+        assert loader.calls == 1
+        stats = cache.get_stats()
+        assert stats["hits"] == 4
+        assert stats["misses"] == 1
+
+    async def test_entry_expires(self, monkeypatch):
+        cache = FirmStatusCache(ttl=10)
+        loader = CountingLoader()
+        now = [1000.0]
+        monkeypatch.setattr("rbac.firm_status_cache.time.monotonic", lambda: now[0])
+
+        await cache.get_or_load("f1", loader)
+        now[0] += 5
+        await cache.get_or_load("f1", loader)
+        now[0] += 6
+        await cache.get_or_load("f1", loader)
+
+        assert loader.calls == 2
+        assert cache.get_stats()["expired"] == 1
+        assert cache.get_stats()["max_served_age_seconds"] == 5.0
+
+    async def test_negative_entries_use_short_ttl(self, monkeypatch):
+        cache = FirmStatusCache(ttl=60, negative_ttl=5)
+        loader = CountingLoader(status=FIRM_NOT_FOUND)
+        now = [0.0]
+        monkeypatch.setattr("rbac.firm_status_cache.time.monotonic", lambda: now[0])
+
+        await cache.get_or_load("missing", loader)
+        await cache.get_or_load("missing", loader)
+        now[0] += 6
+        await cache.get_or_load("missing", loader)
+
+        assert loader.calls == 2
+
+    async def test_concurrent_misses_share_one_load(self):
+        cache = FirmStatusCache()
+        loader = CountingLoader(delay=0.01)
+
+        results = await asyncio.gather(*(cache.get_or_load("f1", loader) for _ in range(20)))
+
+        assert loader.calls == 1
+        assert all(r == ACTIVE for r in results)
+        assert cache.get_stats()["coalesced_loads"] == 19
+
+    async def test_loader_errors_are_not_cached(self):
+        cache = FirmStatusCache()
+
+        async def failing(firm_id):
+            raise RuntimeError("db down")
+
+        with pytest.raises(RuntimeError):
+            await cache.get_or_load("f1", failing)
+        assert cache.get("f1") is None
+
+    async def test_none_result_is_not_cached(self):
+        cache = FirmStatusCache()
+        loader = CountingLoader(status=None)
+        await cache.get_or_load("f1", loader)
+        await cache.get_or_load("f1", loader)
+        assert loader.calls == 2
+
+    async def test_invalidation_during_load_discards_result(self):
+        cache = FirmStatusCache()
+
+        async def racing_loader(firm_id):
+            cache.invalidate(firm_id)  # status changed while the query ran
+            return ACTIVE
+
+        await cache.get_or_load("f1", racing_loader)
+        assert cache.get("f1") is None
+
+    async def test_invalidate_drops_entry(self):
+        cache = FirmStatusCache()
+        loader = CountingLoader()
+        await cache.get_or_load("f1", loader)
+        await cache.get_or_load("f2", loader)
+
+        cache.invalidate("f1")
+        assert cache.get("f1") is None
+        assert cache.get("f2") == ACTIVE
+
+        cache.invalidate()
+        assert cache.get_stats()["size"] == 0
+
+    def test_max_entries_bounds_size(self):
+        cache = FirmStatusCache(max_entries=10)
+        for i in range(50):
+            cache.set(f"f{i}", ACTIVE)
+        assert cache.get_stats()["size"] <= 10
+
+
+class TestCrossProcessInvalidation:
+    async def test_invalidation_reaches_other_worker(self):
+        fakeredis = pytest.importorskip("fakeredis")
+        server = fakeredis.FakeServer()
+        worker_a = FirmStatusCache()
+        worker_b = FirmStatusCache()
+        assert await worker_a.start_listener(fakeredis.aioredis.FakeRedis(server=server, decode_responses=True))
+        assert await worker_b.start_listener(fakeredis.aioredis.FakeRedis(server=server, decode_responses=True))
+        try:
+            worker_b.set("f1", ACTIVE)
+
+            worker_a.invalidate("f1")
+            await worker_a.publish_invalidation("f1")
+
+            for _ in range(100):
+                if worker_b.get_stats()["remote_invalidations"]:
+                    break
+                await asyncio.sleep(0.01)
+            assert worker_b.get("f1") is None
+        finally:
+            await worker_a.stop_listener()
+            await worker_b.stop_listener()
+
+
+class TestSubscriptionCheck:
+    @pytest.fixture(autouse=True)
+    def production(self, monkeypatch):
+        monkeypatch.setenv("APP_ENVIRONMENT", "production")
+        monkeypatch.setattr("rbac.firm_status_cache._firm_status_cache", FirmStatusCache())
+
+    def _ctx(self, firm_id):
+        return AuthContext.for_firm_user(
+            user_id=uuid4(), email="a@example.com", name="A",
+            role=Role.STAFF, firm_id=firm_id, firm_name="Firm",
+        )
+
+    async def test_repeat_requests_skip_database(self, monkeypatch):
+        loader = CountingLoader()
+        monkeypatch.setattr(deps, "_load_firm_status", loader)
+        ctx = self._ctx(uuid4())
+
+        for _ in range(10):
+            await deps._check_firm_subscription(ctx)
+
+        assert loader.calls == 1
+
+    async def test_cancellation_takes_effect_after_notify(self, monkeypatch):
+        loader = CountingLoader()
+        monkeypatch.setattr(deps, "_load_firm_status", loader)
+        firm_id = uuid4()
+        ctx = self._ctx(firm_id)
+        await deps._check_firm_subscription(ctx)
+
+        loader.status = FirmStatus(exists=True, subscription_status="cancelled")
+        await notify_firm_status_changed(firm_id)
+
+        with pytest.raises(HTTPException) as exc:
+            await deps._check_firm_subscription(ctx)
+        assert exc.value.status_code == 403
+
+    async def test_missing_firm_rejected_from_cache(self, monkeypatch):
+        loader = CountingLoader(status=FIRM_NOT_FOUND)
+        monkeypatch.setattr(deps, "_load_firm_status", loader)
+        ctx = self._ctx(uuid4())
+
+        for _ in range(3):
+            with pytest.raises(HTTPException):
+                await deps._check_firm_subscription(ctx)
+        assert loader.calls == 1
+        assert get_firm_status_cache().get_stats()["hits"] == 2
+
+    async def test_deleted_firm_rejected(self, monkeypatch):
+        monkeypatch.setattr(deps, "_load_firm_status", CountingLoader(
+            status=FirmStatus(exists=True, subscription_status="active", deleted=True)
+        ))
+        with pytest.raises(HTTPException) as exc:
+            await deps._check_firm_subscription(self._ctx(uuid4()))
+        assert "deactivated" in exc.value.detail
@@ -0,0 +1,307 @@
+"""
+Tests for batched lead magnet event ingestion and the funnel rollups.
+
+Checks that tracked events are buffered and written in batches together
+with their hourly/daily rollups and the session screen, that funnel KPIs
+read from the rollups match the previous raw-event query, that a bad row
+or an unreachable database doesn't lose the rest of a batch, and that
+lead statistics aggregated in SQL match per-row aggregation.
+"""
+
+import json
+import os
+import random
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from cpa_panel.services.lead_magnet.events import FunnelEventBuffer, EVENT_COLUMNS
+from cpa_panel.services.lead_magnet_service import LeadMagnetService
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_PATH", str(tmp_path / "lead_magnet.db"))
+    svc = LeadMagnetService()
+    yield svc
+    svc.flush_events()
+
+
+def _query(service, sql, params=()):
+    conn = sqlite3.connect(str(service._sqlite_db_path))
+    conn.row_factory = sqlite3.Row
+    try:
+        return [dict(row) for row in conn.execute(sql, params).fetchall()]
+    finally:
+        conn.close()
+
+
+def _legacy_kpi_counts(service, date_from=None, date_to=None, **filters):
+    """The previous get_funnel_kpis queries, run against the raw events."""
+    where, params = ["1=1"], []
+    if date_from:
+        where.append("date(created_at) >= date(?)")
+        params.append(date_from)
+    if date_to:
+        where.append("date(created_at) <= date(?)")
+        params.append(date_to)
+    for column, value in filters.items():
+        if value:
+            where.append(f"{column} = ?")
+            params.append(value)
+    clause = " AND ".join(where)
+    counts = {
+        (row["event_name"], row["step"]): row["cnt"]
+        for row in _query(service, f"SELECT event_name, step, COUNT(*) AS cnt FROM lead_magnet_events "
+                                   f"WHERE {clause} GROUP BY event_name, step", params)
+    }
+    score = _query(service, f"SELECT COUNT(*) AS cnt FROM lead_magnet_events WHERE {clause} "
+                            "AND event_name = 'step_complete' AND (step = 'score_interaction' "
+                            "OR metadata_json LIKE '%subscore_click%')", params)[0]["cnt"]
+    return counts, score
+
+
+def _synthetic_events(session_id, n, seed=5):
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    steps = [("start", None), ("step_complete", "profile"), ("step_complete", "teaser_view"),
+             ("step_complete", "contact_view"), ("step_complete", "score_interaction"),
+             ("lead_submit", "contact"), ("report_view", None), ("drop_off", "profile")]
+    events = []
+    for i in range(n):
+        name, step = rng.choice(steps)
+        metadata = {"action": "subscore_click"} if name == "step_complete" and rng.random() < 0.1 else {}
+        events.append({
+            "event_id": f"evt-{i:06d}",
+            "session_id": session_id,
+            "cpa_id": rng.choice([None, "cpa-1", "cpa-2"]),
+            "event_name": name,
+            "step": step,
+            "variant_id": rng.choice(["A", "B"]),
+            "utm_source": rng.choice([None, "google", "newsletter"]),
+            "utm_medium": None,
+            "utm_campaign": None,
+            "device_type": rng.choice(["mobile", "desktop"]),
+            "metadata_json": json.dumps(metadata),
+            "created_at": (start + timedelta(minutes=rng.randrange(60 * 24 * 60))).isoformat(),
+        })
+    return events
+
+
+def test_track_event_is_buffered_and_flushed_with_rollups(service):
+    session = service.start_assessment(utm_source="google", device_type="mobile")
+    service._event_buffer.batch_size = 3
+    service._event_buffer.flush_interval = 3600
+
+    service.track_event(session.session_id, "start")
+    service.track_event(session.session_id, "step_complete", step="profile")
+    assert _query(service, "SELECT COUNT(*) AS n FROM lead_magnet_events")[0]["n"] == 0
+
+    service.track_event(session.session_id, "step_complete", step="teaser_view")
+    assert _query(service, "SELECT COUNT(*) AS n FROM lead_magnet_events")[0]["n"] == 3
+    assert service.get_event_ingest_metrics()["batches"] == 1
+
+    daily = _query(service, "SELECT SUM(event_count) AS n FROM lead_magnet_event_rollups WHERE granularity = 'day'")
+    hourly = _query(service, "SELECT SUM(event_count) AS n FROM lead_magnet_event_rollups WHERE granularity = 'hour'")
+    assert daily[0]["n"] == hourly[0]["n"] == 3
+    screen = _query(service, "SELECT current_screen FROM lead_magnet_sessions WHERE session_id = ?",
+                    (session.session_id,))
+    assert screen[0]["current_screen"] == "teaser_view"
+
+
+def test_kpis_read_from_rollups_match_raw_event_query(service):
+    session = service.start_assessment()
+    buffer = FunnelEventBuffer(service._get_db_connection, batch_size=500, flush_interval_ms=60000)
+    for event in _synthetic_events(session.session_id, 3000):
+        buffer.add(event)
+    buffer.flush()
+
+    for filters in [
+        {},
+        {"date_from": "2025-01-10", "date_to": "2025-02-03"},
+        {"variant_id": "B", "utm_source": "google"},
+        {"cpa_id": "cpa-1", "device_type": "mobile", "date_to": "2025-01-31"},
+    ]:
+        kpis = service.get_funnel_kpis(**filters)
+        counts, score = _legacy_kpi_counts(service, **filters)
+        assert kpis["counts"]["events_total"] == sum(counts.values())
+        assert kpis["counts"]["start"] == counts.get(("start", None), 0)
+        assert kpis["counts"]["profile_complete"] == counts.get(("step_complete", "profile"), 0)
+        assert kpis["counts"]["lead_submit"] == counts.get(("lead_submit", "contact"), 0)
+        assert kpis["counts"]["score_interaction"] == score
+
+
+def test_timeseries_hour_buckets_sum_to_day_buckets(service):
+    session = service.start_assessment()
+    buffer = FunnelEventBuffer(service._get_db_connection, batch_size=200)
+    for event in _synthetic_events(session.session_id, 800):
+        buffer.add(event)
+    buffer.flush()
+
+    busiest = max(service.get_funnel_timeseries("day", event_name="start"), key=lambda row: row["count"])
+    day = busiest["bucket"]
+    days = service.get_funnel_timeseries("day", date_from=day, date_to=day, event_name="start")
+    hours = service.get_funnel_timeseries("hour", date_from=day, date_to=day, event_name="start")
+    assert days == [busiest]
+    assert all(row["bucket"].startswith(day + "T") for row in hours)
+    assert sum(row["count"] for row in hours) == busiest["count"]
+    with pytest.raises(ValueError):
+        service.get_funnel_timeseries("minute")
+
+
+def test_bad_row_does_not_block_the_batch(service):
+    session = service.start_assessment()
+    events = _synthetic_events(session.session_id, 10)
+    events[4]["event_id"] = events[3]["event_id"]  # UNIQUE violation
+    buffer = FunnelEventBuffer(service._get_db_connection, batch_size=100, flush_interval_ms=60000)
+    for event in events:
+        buffer.add(event)
+    assert buffer.flush() == 9
+
+    assert _query(service, "SELECT COUNT(*) AS n FROM lead_magnet_events")[0]["n"] == 9
+    rolled = _query(service, "SELECT SUM(event_count) AS n FROM lead_magnet_event_rollups WHERE granularity = 'day'")
+    assert rolled[0]["n"] == 9
+    assert buffer.get_metrics()["failed"] == 1
+
+
+def test_unreachable_database_requeues(service):
+    session = service.start_assessment()
+    healthy = service._get_db_connection
+    state = {"down": True}
+
+    def connect():
+        if state["down"]:
+            raise sqlite3.OperationalError("unable to open database file")
+        return healthy()
+
+    buffer = FunnelEventBuffer(connect, batch_size=100, flush_interval_ms=60000)
+    for event in _synthetic_events(session.session_id, 5):
+        buffer.add(event)
+    assert buffer.flush() == 0
+    assert buffer.pending == 5
+
+    state["down"] = False
+    assert buffer.flush() == 5
+    assert buffer.pending == 0
+
+
+def test_locked_database_requeues_instead_of_dropping(service):
+    session = service.start_assessment()
+    healthy = service._get_db_connection
+    state = {"locked": True}
+
+    class LockedCursor:
+        def __init__(self, cursor):
+            self._cursor = cursor
+
+        def executemany(self, sql, rows):
+            if state["locked"]:
+                raise sqlite3.OperationalError("database is locked")
+            return self._cursor.executemany(sql, rows)
+
+    class LockedConnection:
+        def __init__(self, conn):
+            self._conn = conn
+
+        def cursor(self):
+            return LockedCursor(self._conn.cursor())
+
+        def __getattr__(self, name):
+            return getattr(self._conn, name)
+
+    buffer = FunnelEventBuffer(lambda: LockedConnection(healthy()), batch_size=100, flush_interval_ms=60000)
+    for event in _synthetic_events(session.session_id, 5):
+        buffer.add(event)
+    assert buffer.flush() == 0
+    assert buffer.pending == 5
+    assert buffer.get_metrics()["failed"] == 0
+
+    state["locked"] = False
+    assert buffer.flush() == 5
+    assert _query(service, "SELECT COUNT(*) AS n FROM lead_magnet_events")[0]["n"] == 5
+
+
+def test_idle_buffer_flushes_in_background(service):
+    session = service.start_assessment()
+    buffer = FunnelEventBuffer(service._get_db_connection, batch_size=100, flush_interval_ms=50)
+    for event in _synthetic_events(session.session_id, 3):
+        buffer.add(event)
+
+    deadline = time.monotonic() + 5
+    while buffer.pending and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert buffer.pending == 0
+    assert _query(service, "SELECT COUNT(*) AS n FROM lead_magnet_events")[0]["n"] == 3
+
+    buffer.add(_synthetic_events(session.session_id, 1)[0] | {"event_id": "evt-close"})
+    buffer.close()
+    assert buffer.pending == 0
+    assert _query(service, "SELECT COUNT(*) AS n FROM lead_magnet_events")[0]["n"] == 4
+    assert not buffer._flusher.is_alive()
+
+
+def test_rebuild_matches_incremental_rollups(service):
+    session = service.start_assessment()
+    buffer = FunnelEventBuffer(service._get_db_connection, batch_size=37)
+    for event in _synthetic_events(session.session_id, 500):
+        buffer.add(event)
+    buffer.flush()
+
+    sql = "SELECT * FROM lead_magnet_event_rollups ORDER BY " + ", ".join(
+        ["granularity", "bucket", "cpa_id", "event_name", "step", "variant_id", "utm_source", "device_type"]
+    )
+    incremental = _query(service, sql)
+    assert service.rebuild_event_rollups() == 500
+    assert _query(service, sql) == incremental
+
+
+def test_rollups_backfilled_for_existing_events(tmp_path, monkeypatch):
+    db = tmp_path / "legacy.db"
+    monkeypatch.setenv("DATABASE_PATH", str(db))
+    LeadMagnetService()
+    conn = sqlite3.connect(str(db))
+    conn.execute("DROP TABLE lead_magnet_event_rollups")
+    conn.executemany(
+        f"INSERT INTO lead_magnet_events ({', '.join(EVENT_COLUMNS)}) VALUES ({', '.join('?' for _ in EVENT_COLUMNS)})",
+        [tuple(event[c] for c in EVENT_COLUMNS) for event in _synthetic_events("s-1", 50)],
+    )
+    conn.commit()
+    conn.close()
+
+    service = LeadMagnetService()
+    assert service.get_funnel_kpis()["counts"]["events_total"] == 50
+
+
+def test_lead_statistics_aggregated_in_sql(service):
+    rng = random.Random(9)
+    rows = []
+    for i in range(200):
+        rows.append((
+            f"lead-{i}", f"s-{i}", rng.choice(["cpa-1", "cpa-2"]), f"l{i}@example.com",
+            rng.choice(["simple", "moderate", "complex", "professional"]),
+            rng.randrange(0, 100), rng.choice(["hot", "warm", "cold"]),
+            rng.uniform(0, 5000), rng.random() < 0.3, rng.random() < 0.1,
+        ))
+    conn = sqlite3.connect(str(service._sqlite_db_path))
+    conn.executemany(
+        "INSERT INTO lead_magnet_leads (lead_id, session_id, cpa_id, email, complexity, lead_score, "
+        "lead_temperature, estimated_engagement_value, engaged, converted) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        rows,
+    )
+    conn.commit()
+    conn.close()
+
+    stats = service.get_lead_statistics("cpa-1")
+    mine = [r for r in rows if r[2] == "cpa-1"]
+    assert stats["total_leads"] == len(mine)
+    assert stats["by_temperature"]["hot"] == sum(1 for r in mine if r[6] == "hot")
+    assert stats["by_complexity"]["complex"] == sum(1 for r in mine if r[4] == "complex")
+    assert stats["engaged_count"] == sum(1 for r in mine if r[8])
+    assert stats["converted_count"] == sum(1 for r in mine if r[9])
+    assert stats["average_lead_score"] == pytest.approx(sum(r[5] for r in mine) / len(mine))
+    assert stats["total_potential_value"] == pytest.approx(sum(r[7] for r in mine))
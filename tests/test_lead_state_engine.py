@@ -580,3 +580,133 @@ class TestTransitionHistory:
         transition = lead.transitions[0]
 
         assert isinstance(transition.timestamp, datetime)
+
+
+# =============================================================================
+# PRIORITY INDEX
+# =============================================================================
+
+class TestPriorityIndex:
+    """Priority queue, Kanban pages and totals served from the engine index."""
+
+    SIGNALS = list(SIGNAL_CATALOG)
+
+    @pytest.fixture
+    def engine(self):
+        import random
+        from datetime import timedelta
+
+        rng = random.Random(3)
+        engine = LeadStateEngine()
+        for i in range(300):
+            for _ in range(rng.randint(1, 6)):
+                engine.process_signal(f"lead-{i:03d}", rng.choice(self.SIGNALS),
+                                      session_id=f"s{i}", tenant_id="t1" if i % 3 else "t2")
+            lead = engine.get_lead(f"lead-{i:03d}")
+            if lead.transitions:
+                # Spread last activity over two weeks so recency bonuses differ
+                lead.transitions[-1].timestamp -= timedelta(days=rng.randint(0, 14), hours=rng.randint(0, 23))
+                engine._index.upsert(lead)
+        return engine
+
+    def _expected_order(self, engine, tenant_id):
+        from cpa_panel.services.pipeline_service import LeadPipelineService
+
+        service = LeadPipelineService()
+        leads = [l for l in engine._leads.values() if l.tenant_id == tenant_id and l.is_monetizable]
+        return sorted(
+            leads,
+            key=lambda l: (-service._calculate_priority_score(l),
+                           -(l.transitions[-1].timestamp.timestamp() if l.transitions else float("-inf")),
+                           l.lead_id),
+        )
+
+    def test_priority_pages_match_full_sort(self, engine):
+        expected = self._expected_order(engine, "t1")
+
+        seen, cursor = [], None
+        while True:
+            page, cursor, total = engine.get_priority_page("t1", limit=7, cursor=cursor)
+            seen.extend(lead.lead_id for _, lead in page)
+            if cursor is None:
+                break
+
+        assert total == len(expected)
+        assert seen == [l.lead_id for l in expected]
+
+    def test_index_follows_signals_and_transitions(self, engine):
+        engine.process_signal("new-lead", "commitment.complex_situation", session_id="sx", tenant_id="t1")
+
+        page, _, total = engine.get_priority_page("t1", limit=1000)
+        scores = {lead.lead_id: score for score, lead in page}
+        assert scores["new-lead"] == 50 + 2 + 15  # HIGH_LEVERAGE, one signal, active today
+        assert [l.lead_id for _, l in page] == [l.lead_id for l in self._expected_order(engine, "t1")]
+
+        totals = engine.get_state_totals("t1")
+        in_memory = [l for l in engine._leads.values() if l.tenant_id == "t1"]
+        for state in LeadState:
+            count = sum(1 for l in in_memory if l.current_state == state)
+            assert totals[state.name]["count"] == count
+
+    def test_state_pages_cover_column(self, engine):
+        expected = sorted(
+            (l for l in engine._leads.values() if l.tenant_id == "t2" and l.current_state == LeadState.HIGH_LEVERAGE),
+            key=lambda l: (l.created_at, l.lead_id),
+        )
+        seen, cursor = [], None
+        while True:
+            leads, cursor = engine.get_state_page(LeadState.HIGH_LEVERAGE, "t2", limit=5, cursor=cursor)
+            seen.extend(l.lead_id for l in leads)
+            if cursor is None:
+                break
+        assert seen == [l.lead_id for l in expected]
+
+    def test_all_tenant_view(self, engine):
+        totals = engine.get_state_totals()
+        assert sum(t["count"] for t in totals.values()) == len(engine._leads)
+
+    def test_invalid_cursor(self, engine):
+        with pytest.raises(ValueError):
+            engine.get_priority_page("t1", cursor="not-a-cursor")
+
+    def test_malformed_cursor_shapes(self, engine):
+        from cpa_panel.lead_state.priority_index import encode_cursor
+
+        for parts in [(), ("x",), (1.0, "x"), ("high", None, "lead-001"), (10, None, 5), (True, None, "a")]:
+            with pytest.raises(ValueError):
+                engine.get_priority_page("t1", cursor=encode_cursor(*parts))
+        for parts in [(), (1.0,), ("x", "lead-001"), (1.0, 2), (1.0, "a", "b")]:
+            with pytest.raises(ValueError):
+                engine.get_state_page(LeadState.HIGH_LEVERAGE, "t1", cursor=encode_cursor(*parts))
+        with pytest.raises(ValueError):
+            engine.get_state_page(LeadState.HIGH_LEVERAGE, "t1", cursor=encode_cursor({"a": 1}))
+
+    def test_malformed_cursor_is_a_400(self, engine):
+        from cpa_panel.services.pipeline_service import LeadPipelineService
+        from cpa_panel.lead_state.priority_index import encode_cursor
+
+        service = LeadPipelineService()
+        service._engine = engine
+        assert service.get_priority_queue("t1", cursor=encode_cursor("a", "b", "c"))["success"] is False
+        assert service.get_pipeline_column("CURIOUS", "t1", cursor=encode_cursor(1))["success"] is False
+
+    def test_pipeline_service_uses_index(self, engine):
+        from cpa_panel.services.pipeline_service import LeadPipelineService
+
+        service = LeadPipelineService()
+        service._engine = engine
+
+        queue = service.get_priority_queue("t1", limit=5)
+        assert len(queue["priority_queue"]) == 5
+        assert queue["next_cursor"]
+        scores = [l["priority_score"] for l in queue["priority_queue"]]
+        assert scores == sorted(scores, reverse=True)
+
+        pipeline = service.get_pipeline_by_state("t1", limit=3)
+        column = pipeline["pipeline"]["HIGH_LEVERAGE"]
+        assert len(column["leads"]) == 3
+        assert column["count"] > 3
+        assert column["total_value"] == column["count"] * 1200
+
+        more = service.get_pipeline_column("HIGH_LEVERAGE", "t1", limit=3, cursor=column["next_cursor"])
+        assert {l["lead_id"] for l in more["leads"]}.isdisjoint({l["lead_id"] for l in column["leads"]})
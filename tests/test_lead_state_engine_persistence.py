@@ -281,3 +281,55 @@ class TestTenantIsolation:
         # Should not find with wrong tenant
         lead = engine.get_lead("lead-001", tenant_id="tenant-b")
         assert lead is None
+
+
+class TestIndexAcrossWorkers:
+    """Engines sharing one database (one per worker) see each other's changes."""
+
+    def test_index_refreshes_from_persistence(self, persistence, monkeypatch):
+        monkeypatch.setattr("cpa_panel.lead_state.engine.INDEX_REFRESH_INTERVAL_SECONDS", 0)
+        worker_a = LeadStateEngine(persistence=persistence)
+        worker_b = LeadStateEngine(persistence=persistence)
+
+        worker_a.process_signal("lead-1", "commitment.business_owner", session_id="s1", tenant_id="t1")
+        page, _, total = worker_b.get_priority_page("t1")
+        assert total == 1
+
+        # Created, signalled and advanced on worker A after B's first load
+        worker_a.process_signal("lead-2", "evaluation.compared_scenarios", session_id="s2", tenant_id="t1")
+        worker_a.process_signal("lead-2", "commitment.complex_situation", session_id="s2", tenant_id="t1")
+        page, _, total = worker_b.get_priority_page("t1")
+        assert total == 2
+        assert {lead.lead_id for _, lead in page} == {"lead-1", "lead-2"}
+        assert worker_b.get_state_totals("t1")["HIGH_LEVERAGE"]["count"] == 2
+
+    def test_refresh_is_throttled(self, persistence, monkeypatch):
+        engine = LeadStateEngine(persistence=persistence)
+        engine.get_state_totals("t1")
+        calls = []
+        monkeypatch.setattr(persistence, "list_leads_updated_since", lambda *a, **k: calls.append(a) or [])
+        engine.get_state_totals("t1")
+        assert calls == []
+
+    def test_first_load_reads_history_in_bulk(self, persistence, monkeypatch):
+        writer = LeadStateEngine(persistence=persistence)
+        for i in range(5):
+            writer.process_signal(f"lead-{i}", "evaluation.compared_scenarios", session_id=f"s{i}", tenant_id="t1")
+            writer.process_signal(f"lead-{i}", "commitment.complex_situation", session_id=f"s{i}", tenant_id="t1")
+        writer.process_signal("other", "commitment.business_owner", session_id="s9", tenant_id="t2")
+
+        def per_lead(*args, **kwargs):
+            raise AssertionError("history read per lead")
+
+        monkeypatch.setattr(persistence, "get_signal_ids_for_lead", per_lead)
+        monkeypatch.setattr(persistence, "get_transitions_for_lead", per_lead)
+        reader = LeadStateEngine(persistence=persistence)
+        _, _, total = reader.get_priority_page("t1")
+
+        assert total == 5
+        for i in range(5):
+            restored = reader.get_lead(f"lead-{i}")
+            original = writer.get_lead(f"lead-{i}")
+            assert restored.signals_received == original.signals_received
+            assert [t.to_state for t in restored.transitions] == [t.to_state for t in original.transitions]
+        assert "other" not in reader._leads
@@ -0,0 +1,200 @@
+"""
+Tests for the incremental practice intelligence aggregates.
+
+Checks that folding return saves, updates, moves and deletes into the
+stored accumulators produces exactly the metrics PracticeIntelligenceService
+computes from the full lists, that the totals survive a new store on the
+same database, and that rebuild() and check_consistency() agree.
+"""
+
+import json
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from cpa_panel.practice_intelligence.aggregates import (
+    PortfolioAggregateStore,
+    complexity_tier_for,
+    load_portfolio_records,
+    portfolio_record,
+)
+from cpa_panel.practice_intelligence.intelligence_service import PracticeIntelligenceService
+from database.practice_metrics_persistence import PracticeMetricsPersistence
+
+TENANT = "firm-a"
+ENGAGEMENT_TYPES = ["tax_preparation", "tax_advisory", "tax_planning", "amended_return", "audit_representation"]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return PortfolioAggregateStore(PracticeMetricsPersistence(tmp_path / "metrics.db"))
+
+
+def _random_return(rng):
+    data = {
+        "tax_year": rng.choice([2024, 2025]),
+        "engagement_type": rng.choice(ENGAGEMENT_TYPES),
+        "total_income": rng.choice([40000, 90000, 250000, 600000, 1500000]),
+        "total_tax": round(rng.uniform(0, 90000), 2),
+        "total_deductions": round(rng.uniform(0, 80000), 2),
+    }
+    if rng.random() < 0.7:
+        data["refund_amount"] = round(rng.uniform(0, 9000), 2)
+    return data
+
+
+def _recomputed(returns):
+    records = [portfolio_record(return_id, data) for return_id, data in returns.items()]
+    return PracticeIntelligenceService().get_portfolio_metrics(
+        tenant_id=TENANT,
+        engagements=records,
+        current_year_returns=[r for r in records if r["tax_year"] == 2025],
+        prior_year_returns=[r for r in records if r["tax_year"] == 2024] or None,
+        current_year=2025,
+        prior_year=2024,
+    ).to_dict()["metrics"]
+
+
+def _stored(store):
+    return store.portfolio_metrics(TENANT, 2025, 2024).to_dict()["metrics"]
+
+
+def test_complexity_tier_thresholds():
+    assert complexity_tier_for(50000, 0) == "tier_1_simple"
+    assert complexity_tier_for(80000, 0) == "tier_2_moderate"
+    assert complexity_tier_for(80000, 60000) == "tier_3_complex"
+    assert complexity_tier_for(600000, 0) == "tier_4_high_net_worth"
+    assert complexity_tier_for(2000000, 0) == "tier_5_ultra_complex"
+
+
+def test_portfolio_record_reads_api_field_names():
+    record = portfolio_record("r1", {"tax_year": 2024, "status": "planning", "tax_liability": 1200,
+                                     "refund_or_owed": -50, "total_income": 100000})
+    assert record["engagement_type"] == "tax_advisory"
+    assert record["total_tax"] == 1200
+    assert record["refund_amount"] == 0
+    assert record["complexity_tier"] == "tier_2_moderate"
+
+
+def test_incremental_updates_match_full_recomputation(store):
+    rng = random.Random(7)
+    returns = {}
+    for step in range(300):
+        action = rng.random()
+        if returns and action < 0.2:
+            return_id = rng.choice(sorted(returns))
+            del returns[return_id]
+            store.remove_return(return_id)
+        else:
+            # New return, or an update that may change its year, tier or fields
+            return_id = rng.choice(sorted(returns)) if returns and action < 0.5 else f"r{step}"
+            returns[return_id] = _random_return(rng)
+            store.record_return(TENANT, return_id, returns[return_id])
+
+    assert _stored(store) == _recomputed(returns)
+
+
+def test_delete_subtracts_back_to_empty(store):
+    store.record_return(TENANT, "r1", {"tax_year": 2025, "total_income": 300000, "total_tax": 0.1})
+    store.record_return(TENANT, "r1", {"tax_year": 2024, "total_income": 300000, "total_tax": 0.2})
+    store.remove_return("r1")
+    store.remove_return("r1")
+
+    mix = store.advisory_mix(TENANT)
+    assert mix.advisory_count == 0 and mix.compliance_count == 0 and mix.breakdown == {}
+    assert store.complexity_distribution(TENANT, 2024).total_returns == 0
+    assert store.persistence.load_aggregates(TENANT)[2024]["field_totals"] == {"total_tax": "0.0"}
+
+
+def test_return_moving_between_tenants(store):
+    store.record_return(TENANT, "r1", {"tax_year": 2025, "engagement_type": "tax_advisory"})
+    store.record_return("firm-b", "r1", {"tax_year": 2025, "engagement_type": "tax_advisory"})
+
+    assert store.advisory_mix(TENANT).advisory_count == 0
+    assert store.advisory_mix("firm-b").advisory_count == 1
+
+
+def test_aggregates_persist_across_store_instances(tmp_path):
+    db = tmp_path / "metrics.db"
+    first = PortfolioAggregateStore(PracticeMetricsPersistence(db))
+    rng = random.Random(3)
+    returns = {f"r{i}": _random_return(rng) for i in range(40)}
+    for return_id, data in returns.items():
+        first.record_return(TENANT, return_id, data)
+
+    second = PortfolioAggregateStore(PracticeMetricsPersistence(db))
+    assert _stored(second) == _recomputed(returns)
+
+
+def test_rebuild_and_consistency_check(store):
+    rng = random.Random(11)
+    returns = {f"r{i}": _random_return(rng) for i in range(60)}
+    records = [portfolio_record(return_id, data) for return_id, data in returns.items()]
+
+    assert not store.is_built(TENANT)
+    summary = store.rebuild(TENANT, engagements=records, returns=records)
+    assert summary == {"engagements": 60, "returns": 60, "tax_years": 2}
+    assert store.is_built(TENANT)
+    assert _stored(store) == _recomputed(returns)
+    assert store.check_consistency(TENANT, records, records, 2025, 2024)["consistent"]
+
+    # A change that bypasses the hooks shows up as drift; the hooks then
+    # keep working on top of the rebuilt contributions
+    records[0] = dict(records[0], engagement_type="tax_planning", tax_year=2025)
+    result = store.check_consistency(TENANT, records, records, 2025, 2024)
+    assert not result["consistent"]
+    assert "advisory_compliance_mix" in result["differences"]
+
+    store.rebuild(TENANT, engagements=records, returns=records)
+    store.remove_return(records[1]["return_id"])
+    remaining = records[:1] + records[2:]
+    assert store.check_consistency(TENANT, remaining, remaining, 2025, 2024)["consistent"]
+
+
+class _FakeResult:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def fetchall(self):
+        return self._rows
+
+
+class _FakeSession:
+    """Answers the rebuild query from (return_id, tax_year, return_data) rows."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.params = None
+
+    async def execute(self, query, params=None):
+        self.params = params
+        return _FakeResult(self.rows)
+
+
+async def test_rebuild_load_matches_incremental_hooks(tmp_path):
+    rng = random.Random(5)
+    returns = {f"r{i}": _random_return(rng) for i in range(40)}
+    # Fields the rebuild used to zero-fill: a missing refund must stay excluded
+    returns["r0"].pop("refund_amount", None)
+    returns["r1"]["refund_or_owed"] = -300
+    returns["r1"].pop("refund_amount", None)
+
+    incremental = PortfolioAggregateStore(PracticeMetricsPersistence(tmp_path / "a.db"))
+    for return_id, data in returns.items():
+        incremental.record_return(TENANT, return_id, data)
+
+    session = _FakeSession([
+        (return_id, data["tax_year"], json.dumps(data)) for return_id, data in returns.items()
+    ])
+    records = await load_portfolio_records(session, TENANT)
+    assert session.params == {"firm_id": TENANT}
+
+    rebuilt = PortfolioAggregateStore(PracticeMetricsPersistence(tmp_path / "b.db"))
+    rebuilt.rebuild(TENANT, engagements=records, returns=records)
+
+    assert _stored(rebuilt) == _stored(incremental)
+    assert incremental.check_consistency(TENANT, records, records, 2025, 2024)["consistent"]
@@ -0,0 +1,113 @@
+"""Tests for tag-based invalidation in the Redis client and calculation cache."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+import cache.redis_client as redis_client_module
+from cache.calculation_cache import CalculationCache, tax_year_tag, tenant_tag
+from cache.redis_client import RedisClient
+
+
+@pytest.fixture
+async def client():
+    settings = MagicMock()
+    settings.key_prefix = "test:"
+    settings.default_ttl = 300
+    client = RedisClient(settings=settings)
+    client._client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    client._connected = True
+    yield client
+    await client._client.aclose()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(redis_client_module.time, "time", lambda: now[0])
+    return now
+
+
+class TestInvalidateTags:
+    async def test_deletes_only_tagged_keys(self, client):
+        await client.set("calc:r1", {"tax": 1}, ttl=60, tags=["calc:r1", "year:2025"])
+        await client.set("calc:r2", {"tax": 2}, ttl=60, tags=["calc:r2", "year:2024"])
+        await client.set("untagged", 1, ttl=60)
+
+        assert await client.invalidate_tags("year:2025") == 1
+        assert await client.get("calc:r1") is None
+        assert await client.get("calc:r2") == {"tax": 2}
+        assert await client.get("untagged") == 1
+        assert not await client._client.exists("test:tags:year:2025")
+
+    async def test_multiple_tags_and_batches(self, client, monkeypatch):
+        monkeypatch.setattr(redis_client_module, "TAG_INVALIDATION_BATCH", 7)
+        for i in range(30):
+            await client.set(f"k{i}", i, ttl=60, tags=["even" if i % 2 == 0 else "odd"])
+
+        assert await client.invalidate_tags("even", "odd", "missing") == 30
+        assert await client._client.dbsize() == 0
+
+    async def test_expired_members_are_pruned_on_write(self, client, clock):
+        await client.set("short", 1, ttl=10, tags=["t"])
+        clock[0] += 20
+        await client.set("long", 2, ttl=100, tags=["t"])
+
+        members = await client._client.zrange("test:tags:t", 0, -1)
+        assert members == ["test:long"]
+
+    async def test_tag_ttl_never_shrinks(self, client):
+        await client.set("long", 1, ttl=1000, tags=["t"])
+        await client.set("short", 2, ttl=10, tags=["t"])
+        assert await client._client.ttl("test:tags:t") > 900
+
+        await client.set("longer", 3, ttl=5000, tags=["t"])
+        assert await client._client.ttl("test:tags:t") > 4000
+
+    async def test_delete_pattern_still_works(self, client, monkeypatch):
+        monkeypatch.setattr(redis_client_module, "TAG_INVALIDATION_BATCH", 3)
+        for i in range(10):
+            await client.set(f"old:{i}", i, ttl=60)
+        await client.set("keep", 1, ttl=60)
+
+        assert await client.delete_pattern("old:*") == 10
+        assert await client.get("keep") == 1
+
+
+class TestCalculationCacheTags:
+    async def test_invalidate_return_removes_calculations_and_scenarios(self, client):
+        cache = CalculationCache(client=client)
+        await cache.set_calculation("r1", {"tax": 1})
+        await cache.set_calculation("r1", {"tax": 1}, context_hash="abc")
+        await cache.set_scenario_calculation("r1", "s1", {"tax": 2})
+        await cache.set_return_data("r1", {"data": 1})
+        await cache.set_calculation("r2", {"tax": 3})
+
+        # Calculations count once, however many versions were cached
+        assert await cache.invalidate_return("r1") == 3
+        assert await cache.get_calculation("r1") is None
+        assert await cache.get_calculation("r1", context_hash="abc") is None
+        assert await cache.get_scenario_calculation("r1", "s1") is None
+        assert await cache.get_calculation("r2") == {"tax": 3}
+
+    async def test_return_id_prefix_does_not_overmatch(self, client):
+        # The old "calc:r1*" pattern also matched calc:r10
+        cache = CalculationCache(client=client)
+        await cache.set_calculation("r1", {"tax": 1})
+        await cache.set_calculation("r10", {"tax": 10})
+
+        await cache.invalidate_calculation("r1")
+        assert await cache.get_calculation("r10") == {"tax": 10}
+
+    async def test_tenant_and_tax_year_invalidation(self, client):
+        cache = CalculationCache(client=client)
+        await cache.set_calculation("r1", {"tax": 1}, tags=[tenant_tag("acme"), tax_year_tag(2025)])
+        await cache.set_calculation("r2", {"tax": 2}, tags=[tenant_tag("acme"), tax_year_tag(2024)])
+        await cache.set_calculation("r3", {"tax": 3}, tags=[tenant_tag("other"), tax_year_tag(2025)])
+
+        assert await cache.invalidate_tax_year(2025) == 2
+        assert await cache.get_calculation("r2") == {"tax": 2}
+        assert await cache.invalidate_tenant("acme") == 1
+        assert await cache.invalidate_all_calculations() == 0
@@ -0,0 +1,199 @@
+"""
+Tests for the chunked retention sweeps behind the data retention tasks.
+"""
+
+import sqlite3
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from database.retention import (
+    AUDIT_LOG_SWEEP,
+    SESSION_SWEEP,
+    load_checkpoint,
+    run_sweep,
+)
+from database.session_persistence import SessionPersistence
+from tasks import data_retention
+
+
+NOW = datetime.now(timezone.utc)
+
+
+@pytest.fixture
+def persistence(tmp_path):
+    return SessionPersistence(tmp_path / "sessions.db")
+
+
+def _add_sessions(db_path, count, expires_at, prefix):
+    with sqlite3.connect(db_path) as conn:
+        for i in range(count):
+            sid = f"{prefix}-{i:04d}"
+            # Several sessions share each expiry so chunks split ties
+            expiry = (expires_at + timedelta(seconds=i // 3)).isoformat()
+            conn.execute(
+                "INSERT INTO session_states (session_id, created_at, last_activity, expires_at) "
+                "VALUES (?, ?, ?, ?)",
+                (sid, NOW.isoformat(), NOW.isoformat(), expiry),
+            )
+            conn.execute(
+                "INSERT INTO document_processing (document_id, session_id, created_at) VALUES (?, ?, ?)",
+                (f"doc-{sid}", sid, NOW.isoformat()),
+            )
+            conn.execute(
+                "INSERT INTO upload_references (file_path, owner_type, document_id, session_id, created_at) "
+                "VALUES (?, 'document', ?, ?, ?)",
+                (f"/uploads/{sid}.pdf", f"doc-{sid}", sid, NOW.isoformat()),
+            )
+            conn.execute(
+                "INSERT INTO session_tax_returns (session_id, created_at, updated_at) VALUES (?, ?, ?)",
+                (sid, NOW.isoformat(), NOW.isoformat()),
+            )
+
+
+def _count(db_path, table):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+class TestSessionSweep:
+    def test_deletes_expired_sessions_and_dependents_in_chunks(self, persistence):
+        _add_sessions(persistence.db_path, 25, NOW - timedelta(days=2), "old")
+        _add_sessions(persistence.db_path, 5, NOW + timedelta(days=1), "live")
+
+        result = run_sweep(persistence.db_path, SESSION_SWEEP, NOW.isoformat(), chunk_size=4, pause_seconds=0)
+
+        assert result["rows_deleted"] == 25
+        assert result["chunks"] == 7
+        assert result["completed"] and not result["resumed"]
+        assert result["dependent_rows_deleted"] == {
+            "document_processing": 25, "upload_references": 25, "session_tax_returns": 25,
+        }
+        for table in ("session_states", "document_processing", "upload_references", "session_tax_returns"):
+            assert _count(persistence.db_path, table) == 5
+        assert load_checkpoint(persistence.db_path, SESSION_SWEEP.name) is None
+
+    def test_keeps_non_document_upload_references(self, persistence):
+        _add_sessions(persistence.db_path, 2, NOW - timedelta(days=2), "old")
+        with sqlite3.connect(persistence.db_path) as conn:
+            conn.execute(
+                "INSERT INTO upload_references (file_path, owner_type, session_id, created_at) "
+                "VALUES ('/uploads/logo.png', 'branding', 'old-0000', ?)",
+                (NOW.isoformat(),),
+            )
+            conn.execute(
+                "INSERT INTO upload_references (file_path, owner_type, session_id, created_at) "
+                "VALUES ('/uploads/intake.pdf', 'client_document', 'old-0001', ?)",
+                (NOW.isoformat(),),
+            )
+
+        run_sweep(persistence.db_path, SESSION_SWEEP, NOW.isoformat(), pause_seconds=0)
+
+        with sqlite3.connect(persistence.db_path) as conn:
+            paths = [row[0] for row in conn.execute("SELECT file_path FROM upload_references")]
+        assert paths == ["/uploads/logo.png"]
+
+    def test_interrupted_sweep_resumes_from_checkpoint(self, persistence):
+        _add_sessions(persistence.db_path, 30, NOW - timedelta(days=2), "old")
+
+        first = run_sweep(
+            persistence.db_path, SESSION_SWEEP, NOW.isoformat(), chunk_size=7, pause_seconds=0, max_seconds=0,
+        )
+        assert first["rows_deleted"] == 7 and not first["completed"]
+        checkpoint = load_checkpoint(persistence.db_path, SESSION_SWEEP.name)
+        assert checkpoint["rows_deleted"] == 7
+        assert checkpoint["last_id"] == "old-0006"
+
+        second = run_sweep(persistence.db_path, SESSION_SWEEP, NOW.isoformat(), chunk_size=7, pause_seconds=0)
+        assert second["resumed"] and second["completed"]
+        assert second["rows_deleted"] == 23
+        assert _count(persistence.db_path, "session_states") == 0
+        assert load_checkpoint(persistence.db_path, SESSION_SWEEP.name) is None
+
+    def test_cleanup_expired_sessions_uses_sweep(self, persistence):
+        _add_sessions(persistence.db_path, 12, NOW - timedelta(hours=1), "old")
+        _add_sessions(persistence.db_path, 3, NOW + timedelta(hours=1), "live")
+
+        assert persistence.cleanup_expired_sessions(batch_size=5) == 12
+        assert _count(persistence.db_path, "document_processing") == 3
+
+    def test_reports_ids_deleted_by_each_chunk(self, persistence):
+        _add_sessions(persistence.db_path, 10, NOW - timedelta(days=2), "old")
+        _add_sessions(persistence.db_path, 2, NOW + timedelta(days=1), "live")
+        chunks = []
+
+        run_sweep(
+            persistence.db_path, SESSION_SWEEP, NOW.isoformat(), chunk_size=4, pause_seconds=0,
+            on_chunk_deleted=chunks.append,
+        )
+
+        assert [len(ids) for ids in chunks] == [4, 4, 2]
+        assert sorted(sid for ids in chunks for sid in ids) == [f"old-{i:04d}" for i in range(10)]
+
+    def test_cleanup_expired_sessions_invalidates_report_cache(self, persistence, monkeypatch):
+        import database.session_persistence as session_module
+
+        invalidated = []
+        monkeypatch.setattr(session_module, "_invalidate_report_cache", invalidated.append)
+        _add_sessions(persistence.db_path, 7, NOW - timedelta(hours=1), "old")
+        _add_sessions(persistence.db_path, 2, NOW + timedelta(hours=1), "live")
+
+        assert persistence.cleanup_expired_sessions(batch_size=3) == 7
+        assert sorted(invalidated) == [f"old-{i:04d}" for i in range(7)]
+
+    def test_chunk_bounds_use_the_expiry_index(self, persistence):
+        run_sweep(persistence.db_path, SESSION_SWEEP, NOW.isoformat(), pause_seconds=0)
+        with sqlite3.connect(persistence.db_path) as conn:
+            plan = conn.execute(
+                "EXPLAIN QUERY PLAN DELETE FROM session_states "
+                "WHERE (expires_at, session_id) <= (?, ?) AND (expires_at, session_id) > (?, ?)",
+                ("a", "b", "c", "d"),
+            ).fetchall()
+        assert "idx_session_expires_id" in plan[0][-1]
+
+
+class TestRetentionTasks:
+    def test_purge_expired_sessions_task(self, persistence, monkeypatch):
+        import database.session_persistence as session_module
+
+        monkeypatch.setattr(session_module, "get_session_persistence", lambda: persistence)
+        monkeypatch.setattr(data_retention, "_log_retention_event", lambda *args: None)
+        monkeypatch.setattr(data_retention, "RETENTION_CHUNK_PAUSE_MS", 0)
+        invalidated = []
+        monkeypatch.setattr(session_module, "_invalidate_report_cache", invalidated.append)
+        _add_sessions(persistence.db_path, 6, NOW - timedelta(hours=1), "old")
+
+        counts = data_retention.purge_expired_sessions()
+
+        assert counts["sqlite_purged"] == 6
+        assert len(invalidated) == 6
+        assert counts["sqlite_sweep"]["completed"]
+        assert "rows_per_second" in counts["sqlite_sweep"]
+
+    def test_trim_audit_logs_task(self, tmp_path, monkeypatch):
+        from audit.audit_logger import AuditLogger
+
+        db_path = tmp_path / "audit.db"
+        audit = AuditLogger(str(db_path))
+        with sqlite3.connect(db_path) as conn:
+            for i, age in enumerate([3000, 2900, 2600, 10, 1]):
+                conn.execute(
+                    "INSERT INTO audit_log (event_id, event_type, severity, timestamp, action, "
+                    "resource_type, success) VALUES (?, 'data.export', 'info', ?, 'x', 'y', 1)",
+                    (f"e{i}", (NOW - timedelta(days=age)).isoformat()),
+                )
+        monkeypatch.setattr("audit.audit_logger.AuditLogger", lambda: audit)
+        monkeypatch.setattr(data_retention, "_log_retention_event", lambda *args: None)
+        monkeypatch.setattr(data_retention, "RETENTION_CHUNK_SIZE", 2)
+        monkeypatch.setattr(data_retention, "RETENTION_CHUNK_PAUSE_MS", 0)
+
+        counts = data_retention.trim_audit_logs()
+
+        assert counts["logs_deleted"] == 3
+        assert counts["sweep"]["chunks"] == 2
+        assert _count(db_path, "audit_log") == 2
+        assert load_checkpoint(db_path, AUDIT_LOG_SWEEP.name) is None
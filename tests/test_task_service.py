@@ -0,0 +1,147 @@
+"""
+Tests for the TaskService indexed task store.
+
+List views must match a scan over every task, in the same order, while
+the indexes follow creates, updates, (re)assignment, status changes and
+deletes; pages chained through cursors must cover the full list.
+"""
+
+import os
+import random
+import sys
+from datetime import date, timedelta
+from uuid import uuid4
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from cpa_panel.tasks.task_models import TaskCategory, TaskPriority, TaskStatus
+from cpa_panel.tasks.task_service import TaskService
+
+
+TODAY = date.today()
+PRIORITY_ORDER = {TaskPriority.URGENT: 0, TaskPriority.HIGH: 1, TaskPriority.NORMAL: 2, TaskPriority.LOW: 3}
+
+
+def _scan(service, firm_id, status=None, category=None, priority=None, assigned_to=None,
+          client_id=None, session_id=None, include_completed=False, tags=None):
+    """Reference: the filter-and-sort scan the index replaces."""
+    tasks = [
+        t for t in service._tasks.values()
+        if t.firm_id == firm_id
+        and (not status or t.status == status)
+        and (not category or t.category == category)
+        and (not priority or t.priority == priority)
+        and (not assigned_to or t.assigned_to == assigned_to)
+        and (not client_id or t.client_id == client_id)
+        and (not session_id or t.session_id == session_id)
+        and (include_completed or t.status != TaskStatus.COMPLETED)
+        and (not tags or any(tag in t.tags for tag in tags))
+    ]
+    tasks.sort(key=lambda t: (PRIORITY_ORDER[t.priority], t.due_date or date.max))
+    return [t.id for t in tasks]
+
+
+def _ids(tasks):
+    return [t.id for t in tasks]
+
+
+@pytest.fixture
+def world():
+    rng = random.Random(9)
+    service = TaskService()
+    firms = [uuid4() for _ in range(2)]
+    staff = [uuid4() for _ in range(4)]
+    clients = [uuid4() for _ in range(6)]
+
+    for _ in range(400):
+        parent = rng.choice(list(service._tasks)) if service._tasks and rng.random() < 0.2 else None
+        service.create_task(
+            firm_id=rng.choice(firms),
+            title="t",
+            category=rng.choice(list(TaskCategory)),
+            client_id=rng.choice(clients + [None]),
+            session_id=rng.choice(["s1", "s2", None]),
+            parent_task_id=parent,
+            assigned_to=rng.choice(staff + [None]),
+            priority=rng.choice(list(TaskPriority)),
+            due_date=rng.choice([None, TODAY + timedelta(days=rng.randint(-20, 40))]),
+            tags=rng.sample(["a", "b", "c"], rng.randint(0, 2)),
+        )
+
+    for task in rng.sample(list(service._tasks.values()), 200):
+        action = rng.choice(["update", "assign", "unassign", "status", "block", "delete"])
+        if action == "update":
+            service.update_task(task.id, priority=rng.choice(list(TaskPriority)),
+                                due_date=TODAY + timedelta(days=rng.randint(-10, 10)))
+        elif action == "assign":
+            service.reassign_task(task.id, rng.choice(staff))
+        elif action == "unassign":
+            service.unassign_task(task.id)
+        elif action == "status":
+            service.update_status(task.id, rng.choice(list(TaskStatus)))
+        elif action == "block":
+            service.block_task(task.id, "waiting")
+        else:
+            service.delete_task(task.id)
+    return service, firms, staff, clients
+
+
+class TestIndexedQueries:
+
+    def test_filtered_lists_match_scan(self, world):
+        service, firms, staff, clients = world
+        for firm_id in firms:
+            cases = [
+                {},
+                {"include_completed": True},
+                {"status": TaskStatus.BLOCKED},
+                {"priority": TaskPriority.HIGH},
+                {"assigned_to": staff[0]},
+                {"assigned_to": staff[1], "client_id": clients[0], "include_completed": True},
+                {"client_id": clients[2], "session_id": "s1"},
+                {"session_id": "s2", "category": TaskCategory.REVIEW},
+                {"tags": ["a"], "priority": TaskPriority.URGENT},
+            ]
+            for filters in cases:
+                assert _ids(service.get_tasks_for_firm(firm_id, **filters)) == _scan(service, firm_id, **filters)
+
+    def test_pages_chain_to_full_list(self, world):
+        service, firms, staff, _ = world
+        for filters in ({}, {"assigned_to": staff[2], "include_completed": True}):
+            pages, cursor = [], None
+            while True:
+                tasks, cursor = service.get_tasks_page(firms[0], limit=7, cursor=cursor, **filters)
+                pages.extend(tasks)
+                if cursor is None:
+                    break
+            assert _ids(pages) == _scan(service, firms[0], **filters)
+
+    def test_views_match_scan(self, world):
+        service, firms, _, _ = world
+        firm_id = firms[1]
+        tasks = list(service._tasks.values())
+        open_ = (TaskStatus.COMPLETED, TaskStatus.CANCELLED)
+
+        assert sorted(_ids(service.get_unassigned_tasks(firm_id))) == sorted(
+            t.id for t in tasks if t.firm_id == firm_id and t.assigned_to is None and t.status not in open_)
+
+        overdue = service.get_overdue_tasks(firm_id)
+        assert sorted(_ids(overdue)) == sorted(t.id for t in tasks if t.firm_id == firm_id and t.is_overdue)
+        assert [t.due_date for t in overdue] == sorted(t.due_date for t in overdue)
+
+        assert sorted(_ids(service.get_tasks_for_session("s1"))) == sorted(
+            t.id for t in tasks if t.session_id == "s1" and t.status != TaskStatus.COMPLETED)
+
+        parent = next(t.parent_task_id for t in tasks if t.parent_task_id in service._tasks)
+        assert _ids(service.get_subtasks(parent)) == [t.id for t in tasks if t.parent_task_id == parent]
+
+        kanban = service.get_kanban_view(firm_id)
+        assert [t["id"] for t in kanban["blocked"]] == \
+            [str(i) for i in _scan(service, firm_id, status=TaskStatus.BLOCKED)]
+
+    def test_invalid_cursor(self, world):
+        service, firms, _, _ = world
+        with pytest.raises(ValueError):
+            service.get_tasks_page(firms[0], cursor="not-a-cursor")
@@ -0,0 +1,206 @@
+"""
+Tests for the upload reference index and index-based orphaned upload cleanup.
+"""
+
+import os
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from database.session_persistence import SessionPersistence
+from database.upload_references import (
+    OWNER_BRANDING,
+    OWNER_CLIENT_DOCUMENT,
+    OWNER_DOCUMENT,
+    UploadReferenceIndex,
+    normalize_upload_path,
+)
+from tasks import data_retention
+from tasks.data_retention import collect_orphaned_uploads
+
+
+OLD = time.time() - 90 * 86400
+
+
+def _write(path: Path, content: bytes = b"x", mtime: float = OLD) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+@pytest.fixture
+def index(tmp_path):
+    idx = UploadReferenceIndex(tmp_path / "refs.db")
+    idx.mark_backfilled()
+    return idx
+
+
+@pytest.fixture
+def upload_dir(tmp_path):
+    d = tmp_path / "uploads"
+    d.mkdir()
+    return d
+
+
+def _cutoff(days: int = 30) -> datetime:
+    return datetime.now(timezone.utc) - timedelta(days=days)
+
+
+class TestUploadReferenceIndex:
+    def test_register_and_lookup(self, index, upload_dir):
+        path = _write(upload_dir / "s1" / "doc-1.pdf")
+        key = index.register(path, document_id="doc-1", session_id="s1")
+
+        assert key == normalize_upload_path(path)
+        assert index.referenced_paths() == {key}
+        assert index.filter_referenced([key, "/nope"]) == {key}
+
+    def test_register_is_idempotent(self, index, upload_dir):
+        path = upload_dir / "a.pdf"
+        index.register(path)
+        index.register(path)
+        assert index.count() == 1
+
+    def test_unregister_and_unregister_session(self, index, upload_dir):
+        index.register(upload_dir / "a.pdf", session_id="s1")
+        index.register(upload_dir / "b.pdf", session_id="s1")
+        index.register(upload_dir / "c.pdf", session_id="s2")
+
+        assert index.unregister([upload_dir / "c.pdf"]) == 1
+        assert index.unregister_session("s1") == 2
+        assert index.count() == 0
+
+    def test_unregister_many_chunks(self, index, upload_dir):
+        paths = [upload_dir / f"{i}.pdf" for i in range(1200)]
+        index.register_many(paths)
+        assert index.unregister(paths) == 1200
+
+
+class TestSessionPersistenceHooks:
+    def test_delete_session_releases_session_owned_uploads(self, tmp_path):
+        db = tmp_path / "sessions.db"
+        persistence = SessionPersistence(db_path=db)
+        index = UploadReferenceIndex(db)
+        index.register(tmp_path / "s1.pdf", owner_type=OWNER_DOCUMENT, session_id="s1")
+        index.register(tmp_path / "intake.pdf", owner_type=OWNER_CLIENT_DOCUMENT, session_id="s1")
+        index.register(tmp_path / "logo.png", owner_type=OWNER_BRANDING, session_id="s1")
+        index.register(tmp_path / "other.pdf", owner_type=OWNER_CLIENT_DOCUMENT, session_id="s2")
+
+        persistence.delete_session("s1")
+
+        assert index.referenced_paths() == {
+            normalize_upload_path(tmp_path / "logo.png"),
+            normalize_upload_path(tmp_path / "other.pdf"),
+        }
+
+    def test_delete_document_releases_upload(self, tmp_path):
+        db = tmp_path / "sessions.db"
+        persistence = SessionPersistence(db_path=db)
+        index = UploadReferenceIndex(db)
+        index.register(tmp_path / "d.pdf", document_id="doc-1", session_id="s1")
+        index.register(
+            tmp_path / "intake.pdf", owner_type=OWNER_CLIENT_DOCUMENT, document_id="doc-2", session_id="s1",
+        )
+
+        persistence.delete_document("doc-1")
+        persistence.delete_document("doc-2")
+
+        assert index.count() == 0
+
+
+class TestCollectOrphanedUploads:
+    def test_deletes_only_old_unreferenced_files(self, index, upload_dir):
+        kept = _write(upload_dir / "s1" / "kept.pdf")
+        orphan = _write(upload_dir / "s1" / "orphan.pdf", b"12345")
+        recent = _write(upload_dir / "s2" / "recent.pdf", mtime=time.time())
+        index.register(kept)
+
+        counts = collect_orphaned_uploads([str(upload_dir)], index, _cutoff())
+
+        assert counts["files_checked"] == 3
+        assert counts["files_referenced"] == 1
+        assert counts["files_deleted"] == 1
+        assert counts["bytes_freed"] == 5
+        assert kept.exists() and recent.exists() and not orphan.exists()
+
+    def test_dry_run_reports_without_deleting(self, index, upload_dir):
+        orphans = [_write(upload_dir / f"o{i}.pdf", b"ab") for i in range(3)]
+
+        counts = collect_orphaned_uploads([str(upload_dir)], index, _cutoff(), dry_run=True)
+
+        assert counts["dry_run"] is True
+        assert counts["orphans_found"] == 3
+        assert counts["bytes_reclaimable"] == 6
+        assert counts["files_deleted"] == 0
+        assert sorted(counts["sample"]) == sorted(normalize_upload_path(p) for p in orphans)
+        assert all(p.exists() for p in orphans)
+
+    def test_batches_recheck_index_before_deleting(self, index, upload_dir, monkeypatch):
+        late = _write(upload_dir / "late.pdf")
+        original = index.filter_referenced
+
+        def register_then_filter(paths):
+            # Simulates an upload registered after the snapshot was taken
+            index.register(late)
+            return original(paths)
+
+        monkeypatch.setattr(index, "filter_referenced", register_then_filter)
+        counts = collect_orphaned_uploads([str(upload_dir)], index, _cutoff(), batch_size=1)
+
+        assert counts["orphans_found"] == 1
+        assert counts["files_deleted"] == 0
+        assert late.exists()
+
+    def test_removes_empty_directories(self, index, upload_dir):
+        _write(upload_dir / "s1" / "orphan.pdf")
+        collect_orphaned_uploads([str(upload_dir)], index, _cutoff())
+        assert not (upload_dir / "s1").exists()
+
+    def test_skips_cleanup_when_backfill_fails(self, tmp_path, upload_dir, monkeypatch):
+        index = UploadReferenceIndex(tmp_path / "fresh.db")
+        orphan = _write(upload_dir / "legacy.pdf")
+        monkeypatch.setattr(data_retention, "_backfill_upload_references", lambda idx, dirs: False)
+
+        counts = collect_orphaned_uploads([str(upload_dir)], index, _cutoff())
+
+        assert counts["skipped"] == "backfill_incomplete"
+        assert orphan.exists()
+
+
+class TestBackfill:
+    def test_backfill_indexes_files_named_in_session_data(self, tmp_path, upload_dir, monkeypatch):
+        db = tmp_path / "sessions.db"
+        persistence = SessionPersistence(db_path=db)
+        persistence.save_document_result(
+            "doc-1", "s1", result={"file": f"{upload_dir}/s1/doc-1.pdf"}
+        )
+        monkeypatch.setattr(
+            "database.session_persistence.get_session_persistence", lambda: persistence
+        )
+        monkeypatch.setattr(
+            "database.tenant_persistence.get_tenant_persistence",
+            lambda: type("T", (), {"db_path": tmp_path / "tenants.db"})(),
+        )
+        intake_db = tmp_path / "intake.db"
+        monkeypatch.setattr(
+            "cpa_panel.api.intake_routes.get_db_connection", lambda: sqlite3.connect(intake_db)
+        )
+
+        referenced = _write(upload_dir / "s1" / "doc-1.pdf")
+        spaced = _write(upload_dir / "s1" / "my scan.pdf")
+        orphan = _write(upload_dir / "s1" / "doc-2.pdf")
+        persistence.save_document_result("doc-3", "s1", result={"name": "my scan.pdf"})
+
+        index = UploadReferenceIndex(db)
+        counts = collect_orphaned_uploads([str(upload_dir)], index, _cutoff())
+
+        assert index.is_backfilled()
+        assert counts["files_deleted"] == 1
+        assert referenced.exists() and spaced.exists() and not orphan.exists()
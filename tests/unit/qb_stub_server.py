@@ -0,0 +1,240 @@
+"""
+Local stub of the QuickBooks Online accounting API.
+
+Serves the two endpoints the sync service uses, for any number of
+companies (realms):
+
+    GET /v3/company/{realm}/query?query=SELECT ... FROM JournalEntry|Account ...
+    GET /v3/company/{realm}/cdc?entities=...&changedSince=...
+
+Enough of the query language is understood for the sync paths: COUNT(*),
+WHERE clauses of `Field >= 'value'` joined with AND (TxnDate,
+MetaData.LastUpdatedTime), ORDERBY Id, STARTPOSITION / MAXRESULTS.
+
+Behaves like QBO where the sync logic cares:
+- Bearer token must be "token-<realm>" (else 401)
+- More than `realm_concurrency` in-flight requests for a realm -> 429
+- CDC returns at most 1000 objects per entity, deleted ones as
+  {"Id": ..., "status": "Deleted"}
+- HTTP/1.1 keep-alive, with `handshake_latency` charged per new
+  connection (stands in for TCP+TLS setup) and `latency` per request
+
+Used by tests/unit/test_qb_sync.py and scripts/bench_quickbooks_sync.py.
+"""
+
+import json
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+_PATH = re.compile(r"^/v3/company/(?P<realm>[^/]+)/(?P<op>query|cdc)$")
+_SQL = re.compile(
+    r"^SELECT (?P<what>\*|COUNT\(\*\)) FROM (?P<entity>\w+)"
+    r"(?: WHERE (?P<where>.*?))?"
+    r"(?: ORDERBY Id)?"
+    r"(?: STARTPOSITION (?P<start>\d+) MAXRESULTS (?P<max>\d+))?$"
+)
+_CONDITION = re.compile(r"^(?P<field>[\w.]+) >= '(?P<value>[^']*)'$")
+
+CDC_LIMIT = 1000
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _ts(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _journal_entry(entry_id: int, updated: str) -> dict:
+    return {
+        "Id": str(entry_id),
+        "TxnDate": f"2025-{entry_id % 12 + 1:02d}-{entry_id % 28 + 1:02d}",
+        "DocNumber": f"JE-{entry_id}",
+        "SyncToken": "0",
+        "MetaData": {"CreateTime": updated, "LastUpdatedTime": updated},
+        "Line": [
+            {"Id": "0", "Amount": 100.0 + entry_id,
+             "JournalEntryLineDetail": {"PostingType": "Debit", "AccountRef": {"value": "1", "name": "Cash"}}},
+            {"Id": "1", "Amount": 100.0 + entry_id,
+             "JournalEntryLineDetail": {"PostingType": "Credit", "AccountRef": {"value": "2", "name": "Revenue"}}},
+        ],
+    }
+
+
+def _account(account_id: int, updated: str) -> dict:
+    return {
+        "Id": str(account_id),
+        "Name": f"Account {account_id}",
+        "AccountType": "Bank" if account_id % 2 else "Income",
+        "CurrentBalance": float(account_id * 10),
+        "Active": True,
+        "MetaData": {"CreateTime": updated, "LastUpdatedTime": updated},
+    }
+
+
+class _Realm:
+    def __init__(self, journal_entries: int, accounts: int, created: str):
+        self.entities = {
+            "JournalEntry": {i: _journal_entry(i, created) for i in range(1, journal_entries + 1)},
+            "Account": {i: _account(i, created) for i in range(1, accounts + 1)},
+        }
+        self.deleted = {"JournalEntry": {}, "Account": {}}  # id -> deleted at
+        self.in_flight = 0
+
+
+class QBStubServer:
+    """Threaded QBO stub; use as a context manager or call start()/stop()."""
+
+    def __init__(self, latency: float = 0.0, handshake_latency: float = 0.0, realm_concurrency: int = 10):
+        self.latency = latency
+        self.handshake_latency = handshake_latency
+        self.realm_concurrency = realm_concurrency
+        self.realms = {}
+        self.connections = 0
+        self.requests = 0
+        self.throttled = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    # -- data ---------------------------------------------------------------
+
+    def add_company(self, realm_id: str, journal_entries: int = 0, accounts: int = 0, age_days: int = 60) -> None:
+        created = (_now() - timedelta(days=age_days)).isoformat()
+        self.realms[realm_id] = _Realm(journal_entries, accounts, created)
+
+    def touch(self, realm_id: str, entity: str, ids) -> None:
+        """Mark records as updated now."""
+        now = _now().isoformat()
+        with self._lock:
+            for entity_id in ids:
+                self.realms[realm_id].entities[entity][entity_id]["MetaData"]["LastUpdatedTime"] = now
+
+    def delete(self, realm_id: str, entity: str, ids) -> None:
+        now = _now().isoformat()
+        with self._lock:
+            realm = self.realms[realm_id]
+            for entity_id in ids:
+                realm.entities[entity].pop(entity_id, None)
+                realm.deleted[entity][entity_id] = now
+
+    # -- lifecycle ----------------------------------------------------------
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "QBStubServer":
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _handler(self))
+        self._server.daemon_threads = True
+        self._server.request_queue_size = 1024
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # -- request handling ---------------------------------------------------
+
+    def handle(self, path: str, query: dict, authorization: str):
+        match = _PATH.match(path)
+        if not match or match["realm"] not in self.realms:
+            return 404, {"Fault": {"Error": [{"Message": "Not found", "code": "610"}]}}
+        realm_id = match["realm"]
+        if authorization != f"Bearer token-{realm_id}":
+            return 401, {"Fault": {"Error": [{"Message": "AuthenticationFailed", "code": "3200"}]}}
+
+        realm = self.realms[realm_id]
+        with self._lock:
+            self.requests += 1
+            if realm.in_flight >= self.realm_concurrency:
+                self.throttled += 1
+                return 429, {"Fault": {"Error": [{"Message": "ThrottleExceeded", "code": "3001"}]}}
+            realm.in_flight += 1
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+            with self._lock:
+                if match["op"] == "cdc":
+                    return 200, self._cdc(realm, query)
+                return self._query(realm, query.get("query", [""])[0])
+        finally:
+            with self._lock:
+                realm.in_flight -= 1
+
+    def _query(self, realm: _Realm, sql: str):
+        parsed = _SQL.match(sql.strip())
+        if not parsed or parsed["entity"] not in realm.entities:
+            return 400, {"Fault": {"Error": [{"Message": f"Invalid query: {sql}", "code": "4000"}]}}
+        entity = parsed["entity"]
+        rows = sorted(realm.entities[entity].values(), key=lambda r: int(r["Id"]))
+        for condition in (parsed["where"] or "").split(" AND ") if parsed["where"] else []:
+            cond = _CONDITION.match(condition.strip())
+            if not cond:
+                return 400, {"Fault": {"Error": [{"Message": f"Invalid condition: {condition}", "code": "4000"}]}}
+            if cond["field"] == "MetaData.LastUpdatedTime":
+                since = _ts(cond["value"])
+                rows = [r for r in rows if _ts(r["MetaData"]["LastUpdatedTime"]) >= since]
+            else:
+                rows = [r for r in rows if r.get(cond["field"], "") >= cond["value"]]
+
+        if parsed["what"] != "*":
+            return 200, {"QueryResponse": {"totalCount": len(rows)}, "time": _now().isoformat()}
+        start = int(parsed["start"] or 1)
+        page = rows[start - 1:start - 1 + int(parsed["max"] or 100)]
+        return 200, {"QueryResponse": {entity: page} if page else {}, "time": _now().isoformat()}
+
+    def _cdc(self, realm: _Realm, query: dict):
+        since = _ts(query["changedSince"][0])
+        responses = []
+        for entity in query["entities"][0].split(","):
+            changed = [r for r in realm.entities[entity].values()
+                       if _ts(r["MetaData"]["LastUpdatedTime"]) >= since]
+            changed += [{"Id": str(i), "status": "Deleted"}
+                        for i, at in realm.deleted[entity].items() if _ts(at) >= since]
+            responses.append({entity: changed[:CDC_LIMIT]})
+        return {"CDCResponse": [{"QueryResponse": responses}], "time": _now().isoformat()}
+
+
+def _handler(stub: QBStubServer):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            with stub._lock:
+                stub.connections += 1
+            if stub.handshake_latency:
+                time.sleep(stub.handshake_latency)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            status, body = stub.handle(url.path, parse_qs(url.query), self.headers.get("Authorization", ""))
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
@@ -0,0 +1,248 @@
+"""
+Unit tests for the QuickBooks multi-company sync service.
+
+Runs against the local QBO stub (tests/unit/qb_stub_server.py).
+
+Tests cover:
+- Full sync with concurrent pagination over one pooled client
+- CDC incremental sync from the stored cursor (updates and deletes)
+- Stale cursor fallback to a full pull
+- CDC overflow fallback to a paged LastUpdatedTime query (deletes kept)
+- Per-realm limiters and per-event-loop pooled clients on a shared service
+- 429 retry under per-realm throttling
+- Per-company auth failures not affecting other companies
+- Query/CDC client methods
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from qb_stub_server import QBStubServer
+from src.integrations.quickbooks.client import QuickBooksAPIClient
+from src.integrations.quickbooks.sync import (
+    CompanySyncResult,
+    InMemoryCursorStore,
+    QBCompany,
+    QuickBooksSyncService,
+)
+
+
+def _company(realm_id):
+    return QBCompany(realm_id=realm_id, access_token=f"token-{realm_id}")
+
+
+class _Collector:
+    def __init__(self):
+        self.upserts = {}
+        self.deleted = {}
+
+    async def __call__(self, company, entity, records, deleted_ids):
+        key = (company.realm_id, entity)
+        self.upserts.setdefault(key, []).extend(records)
+        self.deleted.setdefault(key, []).extend(deleted_ids)
+
+
+@pytest.fixture
+def stub():
+    with QBStubServer() as server:
+        yield server
+
+
+def _service(stub, **kwargs):
+    kwargs.setdefault("realm_requests_per_minute", 60_000)
+    kwargs.setdefault("retry_delay", 0.01)
+    return QuickBooksSyncService(base_url=stub.base_url, **kwargs)
+
+
+class TestClientQueries:
+
+    async def test_query_count_and_changes(self, stub):
+        stub.add_company("r1", journal_entries=5, accounts=2)
+        client = QuickBooksAPIClient(base_url=stub.base_url)
+
+        page = await client.query_entities("r1", "token-r1", "JournalEntry", start_position=2, max_results=2)
+        assert [je["Id"] for je in page] == ["2", "3"]
+        assert await client.count_entities("r1", "token-r1", "Account") == 2
+
+        since = datetime.now(timezone.utc).isoformat()
+        stub.touch("r1", "Account", [1])
+        stub.delete("r1", "JournalEntry", [4])
+        changes, server_time = await client.get_changes("r1", "token-r1", ["JournalEntry", "Account"], since)
+        assert [a["Id"] for a in changes["Account"]] == ["1"]
+        assert changes["JournalEntry"] == [{"Id": "4", "status": "Deleted"}]
+        assert server_time
+
+
+class TestFullSync:
+
+    async def test_pages_fetched_over_pooled_connections(self, stub):
+        stub.add_company("r1", journal_entries=2_500, accounts=30)
+        service = _service(stub, realm_max_concurrent=4)
+        sink = _Collector()
+
+        [result] = await service.sync_companies([_company("r1")], sink=sink)
+        await service.aclose()
+
+        assert result.success
+        assert result.mode == {"JournalEntry": "full", "Account": "full"}
+        assert result.upserted == {"JournalEntry": 2_500, "Account": 30}
+        ids = {je["id"] for je in sink.upserts[("r1", "JournalEntry")]}
+        assert len(ids) == 2_500
+        # count + 3 JE pages, count + 1 account page
+        assert result.requests == 6
+        assert stub.connections <= 4
+
+    async def test_start_date_filters_journal_entries(self, stub):
+        stub.add_company("r1", journal_entries=100, accounts=1)
+        service = _service(stub, start_date="2025-07-01")
+        sink = _Collector()
+
+        [result] = await service.sync_companies([_company("r1")], sink=sink)
+        await service.aclose()
+
+        records = sink.upserts[("r1", "JournalEntry")]
+        assert records and all(r["txn_date"] >= "2025-07-01" for r in records)
+        assert result.upserted["JournalEntry"] == len(records)
+
+    async def test_many_companies_share_the_pool(self, stub):
+        for i in range(40):
+            stub.add_company(f"r{i}", journal_entries=10, accounts=3)
+        service = _service(stub, concurrency=8, max_connections=6)
+
+        results = await service.sync_companies([_company(f"r{i}") for i in range(40)])
+        await service.aclose()
+
+        assert all(r.success for r in results)
+        assert [r.realm_id for r in results] == [f"r{i}" for i in range(40)]
+        assert stub.connections <= 6
+
+
+class TestIncrementalSync:
+
+    async def test_second_run_uses_cdc(self, stub):
+        stub.add_company("r1", journal_entries=50, accounts=5)
+        store = InMemoryCursorStore()
+        service = _service(stub, cursor_store=store)
+        company = _company("r1")
+        await service.sync_companies([company])
+
+        stub.touch("r1", "JournalEntry", [3, 7])
+        stub.delete("r1", "Account", [2])
+        sink = _Collector()
+        [result] = await service.sync_companies([company], sink=sink)
+        await service.aclose()
+
+        assert result.mode == {"JournalEntry": "cdc", "Account": "cdc"}
+        assert result.requests == 1
+        assert sorted(r["id"] for r in sink.upserts[("r1", "JournalEntry")]) == ["3", "7"]
+        assert sink.deleted[("r1", "Account")] == ["2"]
+        assert await store.get(company, "JournalEntry") is not None
+
+    async def test_stale_cursor_falls_back_to_full(self, stub):
+        stub.add_company("r1", journal_entries=20, accounts=2)
+        store = InMemoryCursorStore()
+        company = _company("r1")
+        stale = (datetime.now(timezone.utc) - timedelta(days=45)).isoformat()
+        for entity in ("JournalEntry", "Account"):
+            await store.set(company, entity, stale)
+        service = _service(stub, cursor_store=store)
+
+        [result] = await service.sync_companies([company])
+        await service.aclose()
+
+        assert result.mode == {"JournalEntry": "full", "Account": "full"}
+        assert result.upserted["JournalEntry"] == 20
+        assert await store.get(company, "JournalEntry") != stale
+
+    async def test_cdc_overflow_pages_through_updates(self, stub):
+        stub.add_company("r1", journal_entries=1_500, accounts=2)
+        store = InMemoryCursorStore()
+        service = _service(stub, cursor_store=store)
+        company = _company("r1")
+        await service.sync_companies([company])
+
+        stub.touch("r1", "JournalEntry", range(1, 1_201))
+        [result] = await service.sync_companies([company])
+        await service.aclose()
+
+        assert result.mode["JournalEntry"] == "incremental"
+        assert result.upserted["JournalEntry"] == 1_200
+        assert result.mode["Account"] == "cdc"
+
+    async def test_cdc_overflow_delivers_deletes_before_paging(self, stub):
+        stub.add_company("r1", journal_entries=1_500, accounts=2)
+        store = InMemoryCursorStore()
+        service = _service(stub, cursor_store=store)
+        company = _company("r1")
+        await service.sync_companies([company])
+
+        stub.touch("r1", "JournalEntry", range(1, 996))
+        stub.delete("r1", "JournalEntry", range(1_001, 1_006))
+        sink = _Collector()
+        [result] = await service.sync_companies([company], sink=sink)
+        await service.aclose()
+
+        assert result.mode["JournalEntry"] == "incremental"
+        assert sorted(sink.deleted[("r1", "JournalEntry")]) == [str(i) for i in range(1_001, 1_006)]
+        assert result.deleted["JournalEntry"] == 5
+        assert result.upserted["JournalEntry"] == 995
+
+
+class TestSharedService:
+
+    async def test_realm_limiter_shared_across_syncs(self, stub):
+        service = _service(stub)
+        assert service._limiter("r1") is service._limiter("r1")
+        assert service._limiter("r1") is not service._limiter("r2")
+        await service.aclose()
+
+    def test_service_usable_from_successive_event_loops(self, stub):
+        stub.add_company("r1", journal_entries=5, accounts=1)
+        service = _service(stub)
+
+        async def run():
+            [result] = await service.sync_companies([_company("r1")])
+            return result
+
+        # e.g. one asyncio.run per Celery task against the shared service
+        first = asyncio.run(run())
+        second = asyncio.run(run())
+
+        assert first.success and first.upserted["JournalEntry"] == 5
+        assert second.success and second.mode["JournalEntry"] == "cdc"
+
+
+class TestFailures:
+
+    async def test_rate_limited_requests_are_retried(self):
+        with QBStubServer(latency=0.02, realm_concurrency=1) as stub:
+            stub.add_company("r1", journal_entries=3_000, accounts=1)
+            service = _service(stub, realm_max_concurrent=4, max_retries=8)
+            [result] = await service.sync_companies([_company("r1")])
+            await service.aclose()
+
+        assert result.success
+        assert result.upserted["JournalEntry"] == 3_000
+        assert result.retries > 0
+        assert stub.throttled == result.retries
+
+    async def test_auth_failure_isolated_to_company(self, stub):
+        stub.add_company("good", journal_entries=5, accounts=1)
+        stub.add_company("bad", journal_entries=5, accounts=1)
+        store = InMemoryCursorStore()
+        service = _service(stub, cursor_store=store)
+        bad = QBCompany(realm_id="bad", access_token="expired")
+
+        good_result, bad_result = await service.sync_companies([_company("good"), bad])
+        await service.aclose()
+
+        assert good_result.success
+        assert isinstance(bad_result, CompanySyncResult)
+        assert bad_result.error.startswith("auth:")
+        assert await store.get(bad, "JournalEntry") is None
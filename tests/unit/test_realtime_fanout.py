@@ -0,0 +1,208 @@
+"""Tests for serialize-once WebSocket fan-out in ConnectionManager."""
+
+import asyncio
+import json
+from uuid import uuid4
+
+from realtime.connection_manager import (
+    ConnectionInfo,
+    ConnectionManager,
+    OutboundQueue,
+    OverflowPolicy,
+    _OutboundFrame,
+)
+from realtime.events import EventPriority, EventType, RealtimeEvent
+
+
+class FakeWebSocket:
+    """Records frames; optionally blocks forever to simulate a stalled client."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.frames = []
+
+    async def send_text(self, text):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.frames.append(text)
+
+    async def close(self):
+        pass
+
+
+def _register(manager, firm_id, websocket):
+    user_id = uuid4()
+    conn = ConnectionInfo(
+        websocket=websocket,
+        user_id=user_id,
+        firm_id=firm_id,
+        user_email=f"{user_id}@example.com",
+        user_role="staff",
+    )
+    manager._connections[user_id] = conn
+    manager._firm_connections.setdefault(firm_id, set()).add(user_id)
+    return conn
+
+
+class TestFanOut:
+    """Tests for firm fan-out through outbound queues."""
+
+    async def test_firm_broadcast_reaches_every_connection(self):
+        manager = ConnectionManager()
+        firm_id = uuid4()
+        sockets = [FakeWebSocket() for _ in range(20)]
+        for ws in sockets:
+            _register(manager, firm_id, ws)
+
+        event = RealtimeEvent(event_type=EventType.RETURN_UPDATED, firm_id=firm_id, data={"x": 1})
+        await manager._broadcast_to_firm(event)
+        assert await manager.flush(timeout=1.0)
+
+        for ws in sockets:
+            assert len(ws.frames) == 1
+            assert json.loads(ws.frames[0])["id"] == str(event.id)
+
+    async def test_event_serialized_once(self, monkeypatch):
+        manager = ConnectionManager()
+        firm_id = uuid4()
+        for _ in range(50):
+            _register(manager, firm_id, FakeWebSocket())
+
+        calls = []
+        original = RealtimeEvent.to_dict
+
+        def counting_to_dict(self):
+            calls.append(1)
+            return original(self)
+
+        monkeypatch.setattr(RealtimeEvent, "to_dict", counting_to_dict)
+        await manager._broadcast_to_firm(RealtimeEvent(firm_id=firm_id))
+        await manager.flush(timeout=1.0)
+
+        assert len(calls) == 1
+
+    async def test_slow_client_does_not_delay_others(self):
+        manager = ConnectionManager(send_timeout=0.05)
+        firm_id = uuid4()
+        slow = _register(manager, firm_id, FakeWebSocket(delay=10))
+        fast = [_register(manager, firm_id, FakeWebSocket()) for _ in range(5)]
+
+        await manager._broadcast_to_firm(RealtimeEvent(firm_id=firm_id))
+        await asyncio.sleep(0.01)
+
+        for conn in fast:
+            assert len(conn.websocket.frames) == 1
+        assert slow.websocket.frames == []
+
+        await asyncio.sleep(0.1)
+        assert slow.send_timeouts == 1
+
+    async def test_remove_connection_stops_writer(self):
+        manager = ConnectionManager()
+        conn = _register(manager, uuid4(), FakeWebSocket())
+        manager.fan_out([conn], RealtimeEvent())
+        task = conn.writer_task
+
+        await manager._remove_connection(conn)
+        await asyncio.sleep(0)
+
+        assert task.cancelled() or task.done()
+        assert conn.writer_task is None
+
+    async def test_control_frames_use_the_writer_and_jump_the_queue(self):
+        manager = ConnectionManager()
+        firm_id = uuid4()
+        conn = _register(manager, firm_id, FakeWebSocket(delay=0.01))
+        for i in range(3):
+            manager.fan_out([conn], RealtimeEvent(firm_id=firm_id, data={"i": i}))
+        await asyncio.sleep(0)
+
+        await manager.handle_message(conn.user_id, {"type": "heartbeat"})
+        assert await manager.flush(timeout=1.0)
+
+        types = [json.loads(frame)["type"] for frame in conn.websocket.frames]
+        assert len(types) == 4
+        # The first fan-out frame was already being written; the reply goes next
+        assert types[1] == EventType.HEARTBEAT.value
+
+    async def test_flush_waits_for_in_flight_send(self):
+        manager = ConnectionManager()
+        conn = _register(manager, uuid4(), FakeWebSocket(delay=0.05))
+        manager.fan_out([conn], RealtimeEvent())
+        await asyncio.sleep(0.01)
+        assert len(conn.outbound) == 0 and conn.outbound.pending == 1
+
+        assert await manager.flush(timeout=1.0)
+        assert len(conn.websocket.frames) == 1
+
+    async def test_stats_include_outbound_counters(self):
+        manager = ConnectionManager()
+        _register(manager, uuid4(), FakeWebSocket())
+        stats = manager.get_stats()
+        assert stats["outbound"] == {"depth": 0, "dropped": 0, "coalesced": 0, "send_timeouts": 0}
+
+
+class TestOutboundQueue:
+    """Tests for bounded queue overflow and coalescing."""
+
+    def _frame(self, text, priority=EventPriority.NORMAL, key=None):
+        return _OutboundFrame(text=text, priority=priority, coalesce_key=key)
+
+    def test_drop_oldest_evicts_unprotected_frame(self):
+        queue = OutboundQueue(maxsize=2)
+        queue.put(self._frame("a"))
+        queue.put(self._frame("b"))
+        assert queue.put(self._frame("c")) == "queued"
+        assert [f.text for f in queue._frames] == ["b", "c"]
+        assert queue.dropped == 1
+
+    def test_high_priority_frames_survive_overflow(self):
+        queue = OutboundQueue(maxsize=2)
+        queue.put(self._frame("urgent", EventPriority.URGENT))
+        queue.put(self._frame("normal"))
+        queue.put(self._frame("new"))
+        assert [f.text for f in queue._frames] == ["urgent", "new"]
+
+    def test_low_priority_frame_dropped_when_queue_all_protected(self):
+        queue = OutboundQueue(maxsize=1)
+        queue.put(self._frame("high", EventPriority.HIGH))
+        assert queue.put(self._frame("low", EventPriority.LOW)) == "dropped"
+        assert [f.text for f in queue._frames] == ["high"]
+
+    def test_drop_newest_policy(self):
+        queue = OutboundQueue(maxsize=1, policy=OverflowPolicy.DROP_NEWEST)
+        queue.put(self._frame("a"))
+        assert queue.put(self._frame("b")) == "dropped"
+        assert [f.text for f in queue._frames] == ["a"]
+
+    def test_coalesce_replaces_in_place(self):
+        queue = OutboundQueue(maxsize=10)
+        key = ("presence_update", "s1", "u1")
+        queue.put(self._frame("p1", key=key))
+        queue.put(self._frame("other"))
+        assert queue.put(self._frame("p2", key=key)) == "coalesced"
+        assert [f.text for f in queue._frames] == ["p2", "other"]
+        assert queue.coalesced == 1
+
+    async def test_presence_updates_coalesce_for_stalled_client(self):
+        manager = ConnectionManager()
+        conn = _register(manager, uuid4(), FakeWebSocket(delay=10))
+        session_id = "sess-1"
+        user_id = str(uuid4())
+
+        def presence(i):
+            return RealtimeEvent(
+                event_type=EventType.PRESENCE_UPDATE,
+                session_id=session_id,
+                data={"user_id": user_id, "active_field": f"f{i}"},
+            )
+
+        manager.fan_out([conn], presence(0))
+        await asyncio.sleep(0.01)
+        for i in range(1, 5):
+            manager.fan_out([conn], presence(i))
+
+        # First frame is in flight; the rest collapse into one queued frame
+        assert len(conn.outbound) == 1
+        assert json.loads(conn.outbound._frames[0].text)["data"]["active_field"] == "f4"
+        await manager._remove_connection(conn)